@@ -2,26 +2,39 @@
 API Dependencies - Shared dependencies for all routers
 
 Usage:
-    from api.dependencies import get_db, DB_PATH, get_current_user
+    from api.dependencies import get_db, db_connect, db_session, DB_PATH, get_current_user, off_loop, service
 
     @router.get("/endpoint")
     async def endpoint(db = Depends(get_db)):
         ...
 
+    @router.get("/heavy")
+    @off_loop                       # blocking body runs on the DB executor
+    def heavy():
+        conn = db_connect()
+        ...
+
     @router.get("/protected")
     async def protected(user = Depends(get_current_user)):
         ...
+
+    @router.get("/lazy")
+    async def lazy(emails = Depends(service('email_service'))):
+        ...
 """
 
 import os
 import sqlite3
 from pathlib import Path
-from typing import Generator, Optional
+from typing import Any, Callable, Generator, Optional
 from contextlib import contextmanager
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from services.connection_pool import get_pool
+from services.async_db import off_loop, get_db_executor  # noqa: F401 - re-exported for routers
+
 # Security scheme for JWT Bearer tokens
 security = HTTPBearer(auto_error=False)
 
@@ -40,8 +53,8 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
     """
     Database dependency for FastAPI endpoints.
 
-    Yields a SQLite connection with Row factory enabled.
-    Connection is automatically closed when the request completes.
+    Yields a pooled SQLite connection with Row factory enabled.
+    Connection is returned to the pool when the request completes.
 
     Usage:
         @router.get("/items")
@@ -50,9 +63,10 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
             cursor.execute("SELECT * FROM items")
             return cursor.fetchall()
     """
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")  # CRITICAL: Enable FK enforcement
+    conn = get_pool(DB_PATH).acquire(
+        row_factory=sqlite3.Row,
+        foreign_keys=True,  # CRITICAL: Enable FK enforcement
+    )
     try:
         yield conn
     finally:
@@ -69,9 +83,10 @@ def get_db_context():
             cursor = db.cursor()
             cursor.execute("SELECT * FROM items")
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")  # CRITICAL: Enable FK enforcement
+    conn = get_pool(DB_PATH).acquire(
+        row_factory=sqlite3.Row,
+        foreign_keys=True,  # CRITICAL: Enable FK enforcement
+    )
     try:
         yield conn
     finally:
@@ -80,15 +95,65 @@ def get_db_context():
 
 def get_db_connection() -> sqlite3.Connection:
     """
-    Get a raw database connection (caller responsible for closing).
+    Get a pooled database connection (caller responsible for closing).
 
+    close() returns the connection to the pool.
     Prefer get_db() with Depends() or get_db_context() instead.
     This is for backward compatibility with existing code.
     """
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")  # CRITICAL: Enable FK enforcement
-    return conn
+    return get_pool(DB_PATH).acquire(
+        row_factory=sqlite3.Row,
+        foreign_keys=True,  # CRITICAL: Enable FK enforcement
+    )
+
+
+def db_connect() -> sqlite3.Connection:
+    """
+    Pooled drop-in replacement for sqlite3.connect(DB_PATH) in routers.
+
+    Same defaults as a fresh sqlite3 connection (tuple rows, FK enforcement
+    off), but close() returns it to the pool instead of tearing it down.
+    """
+    return get_pool(DB_PATH).acquire()
+
+
+@contextmanager
+def db_session():
+    """
+    Pooled replacement for `with sqlite3.connect(DB_PATH) as conn:`.
+
+    Commits on success, rolls back on exception, then returns the
+    connection to the pool.
+    """
+    conn = get_pool(DB_PATH).acquire()
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def get_pool_stats() -> dict:
+    """Connection pool counters for the main database (checkouts, waits, lock retries)"""
+    return get_pool(DB_PATH).stats()
+
+
+def service(name: str) -> Callable[[], Any]:
+    """
+    Dependency resolving a registered service (api.services) on first use.
+
+    Usage:
+        @router.get("/emails/stats")
+        async def stats(emails = Depends(service('email_service'))):
+            return emails.get_email_stats()
+    """
+    def resolve() -> Any:
+        # Import here to avoid circular imports (api.services imports DB_PATH)
+        from api.services import get_service
+        return get_service(name)
+
+    resolve.__name__ = f"service_{name}"
+    return resolve
 
 
 # ============================================================================
@@ -161,7 +161,10 @@ def list_response(
     data: List[Any],
     total: Optional[int] = None,
     page: int = 1,
-    per_page: int = 50
+    per_page: int = 50,
+    has_more: Optional[bool] = None,
+    next_cursor: Optional[str] = None,
+    total_estimated: bool = False
 ) -> dict:
     """
     Standard response envelope for list endpoints.
@@ -171,6 +174,10 @@ def list_response(
         total: Total count of all items (for pagination). If None, uses len(data)
         page: Current page number (1-indexed)
         per_page: Items per page
+        has_more: Whether another page exists. Keyset-paginated lists pass it
+                  (with next_cursor); otherwise it is derived from total.
+        next_cursor: Cursor for the next page of a keyset-paginated list
+        total_estimated: total is an estimate (sqlite_stat1), not a count
 
     Returns:
         Standardized response dict with data and meta
@@ -182,15 +189,21 @@ def list_response(
     if total is None:
         total = len(data)
 
+    meta = {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "has_more": (page * per_page) < total if has_more is None else has_more
+    }
+    if has_more is not None:
+        meta["next_cursor"] = next_cursor
+    if total_estimated:
+        meta["total_estimated"] = True
+
     return {
         "success": True,
         "data": data,
-        "meta": {
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "has_more": (page * per_page) < total
-        }
+        "meta": meta
     }
 
 
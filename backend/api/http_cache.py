@@ -0,0 +1,237 @@
+"""
+HTTP Cache - data-version ETags and conditional GET for polled read endpoints
+
+The dashboard polls a handful of read endpoints every few seconds. Each of
+them is registered in CACHED_ROUTES with the tables it reads. For a GET on
+one of these routes, the middleware builds an ETag from:
+- the route's data_versions stamp (migrations 112/119/120)
+- the query string
+- the credentials
+- the current period (hour, or minute for time-windowed lists), since the
+  endpoints also compare against date('now')
+
+Then:
+- If-None-Match matches  -> 304 Not Modified, the endpoint does not run
+- the body for this ETag is cached -> served as is, the endpoint does not run
+- otherwise              -> the endpoint runs and its 200 JSON body is kept
+
+A stamp is normally one `PRAGMA data_version` (DataVersionService), so a
+poll that hits reads no table pages. A route reading a table without a
+counter is never cached. Hit ratios per route: GET /api/health/http-cache.
+
+Usage (main.py):
+    @app.middleware("http")
+    async def conditional_get(request, call_next):
+        return await get_http_cache(DB_PATH).handle(request, call_next)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', '1') == '1'
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+HTTP_CACHE_MAX_ENTRY_BYTES = int(os.getenv('HTTP_CACHE_MAX_ENTRY_BYTES', str(2 * 1024 * 1024)))
+
+HOURLY = '%Y-%m-%d %H'
+MINUTELY = '%Y-%m-%d %H:%M'
+
+
+class CachedRoute:
+    """A GET route served through the cache"""
+
+    __slots__ = ('tables', 'period', 'auth')
+
+    def __init__(self, tables: Iterable[str], period: str = HOURLY, auth: bool = False):
+        self.tables = tuple(sorted(set(tables)))
+        self.period = period    # strftime format; a new period means a new ETag
+        self.auth = auth        # endpoint requires a bearer token (get_current_user)
+
+
+_DASHBOARD_TABLES = (
+    'projects', 'proposals', 'invoices', 'project_milestones', 'rfis', 'meetings',
+    'emails', 'email_content', 'email_proposal_links', 'email_project_links',
+    'ai_suggestions', 'tasks', 'commitments', 'deliverables', 'training_data',
+    'kpi_project_snapshot', 'kpi_global_snapshot',
+)
+_MY_DAY_TABLES = ('tasks', 'meetings', 'proposals', 'ai_suggestions', 'commitments', 'deliverables')
+
+# Path -> route. The tables must cover everything the endpoint reads: a
+# missing one serves stale data until another listed table changes.
+CACHED_ROUTES: Dict[str, CachedRoute] = {
+    '/api/dashboard/stats': CachedRoute(_DASHBOARD_TABLES),
+    '/api/dashboard/kpis': CachedRoute(_DASHBOARD_TABLES),
+    '/api/dashboard/decision-tiles': CachedRoute(_DASHBOARD_TABLES),
+    '/api/dashboard/meetings': CachedRoute(['meetings'], period=MINUTELY),
+    '/api/dashboard/actions': CachedRoute(_DASHBOARD_TABLES),
+    '/api/dashboard/portfolio-exceptions': CachedRoute(_DASHBOARD_TABLES),
+
+    '/api/my-day': CachedRoute(_MY_DAY_TABLES),
+
+    '/api/suggestions': CachedRoute(['ai_suggestions', 'emails']),
+    '/api/suggestions/stats': CachedRoute(['ai_suggestions']),
+    '/api/suggestions/grouped': CachedRoute(['ai_suggestions', 'proposals']),
+
+    '/api/proposals': CachedRoute(['proposals'], auth=True),
+    '/api/proposals/stats': CachedRoute(['proposals'], auth=True),
+    '/api/proposals/at-risk': CachedRoute(['proposals'], auth=True),
+    '/api/proposals/needs-follow-up': CachedRoute(['proposals'], auth=True),
+    '/api/proposals/weekly-changes': CachedRoute(['proposals', 'change_log'], auth=True),
+    '/api/proposals/needs-attention': CachedRoute(
+        ['proposals', 'emails', 'email_proposal_links'], auth=True),
+    '/api/proposal-tracker/stats': CachedRoute(['proposals'], auth=True),
+    '/api/proposal-tracker/list': CachedRoute(['proposals', 'emails', 'email_proposal_links'], auth=True),
+}
+
+_COUNTERS = ('requests', 'not_modified', 'body_hits', 'misses', 'uncacheable', 'bypassed')
+
+
+class HTTPCache:
+    """ETags and cached response bodies for CACHED_ROUTES"""
+
+    def __init__(self, db_path: str, routes: Optional[Dict[str, CachedRoute]] = None,
+                 max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.routes = CACHED_ROUTES if routes is None else routes
+        self.max_bytes = max_bytes
+        # Import here to keep the service layer off the cold-start path
+        from services.data_version_service import get_data_version_service
+        self.versions = get_data_version_service(db_path)
+        self._bodies: 'OrderedDict[str, Tuple[str, bytes, Dict[str, str]]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _bump(self, path: str, counter: str):
+        with self._lock:
+            stats = self._stats.setdefault(path, dict.fromkeys(_COUNTERS, 0))
+            stats['requests'] += 1
+            stats[counter] += 1
+
+    def _variant(self, request: Request, route: CachedRoute) -> str:
+        """What, besides the data, the response depends on"""
+        parts = [
+            request.url.path,
+            '&'.join(sorted(request.url.query.split('&'))),
+            request.headers.get('authorization', ''),
+            time.strftime(route.period),
+        ]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _token_valid(request: Request) -> bool:
+        """Bearer token decodes and is unexpired (get_current_user runs on a miss)"""
+        from api.security import decode_access_token
+
+        scheme, _, token = request.headers.get('authorization', '').partition(' ')
+        if scheme.lower() != 'bearer' or not token:
+            return False
+        token_data = decode_access_token(token)
+        return bool(token_data and token_data.staff_id)
+
+    async def handle(self, request: Request, call_next) -> Response:
+        route = self.routes.get(request.url.path) if HTTP_CACHE_ENABLED else None
+        if route is None or request.method != 'GET':
+            return await call_next(request)
+        path = request.url.path
+
+        # No valid token: let the endpoint answer (401) and cache nothing
+        if route.auth and not self._token_valid(request):
+            self._bump(path, 'bypassed')
+            return await call_next(request)
+
+        stamp = self.versions.stamp(route.tables)
+        if stamp is None:
+            self._bump(path, 'uncacheable')
+            return await call_next(request)
+
+        variant = self._variant(request, route)
+        etag = '"' + hashlib.sha256(f"{variant}\n{stamp}".encode('utf-8')).hexdigest()[:32] + '"'
+        cache_headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if_none_match = request.headers.get('if-none-match', '')
+        if etag in (tag.strip().removeprefix('W/') for tag in if_none_match.split(',')):
+            self._bump(path, 'not_modified')
+            return Response(status_code=304, headers=cache_headers)
+
+        with self._lock:
+            cached = self._bodies.get(variant)
+            if cached is not None and cached[0] == etag:
+                self._bodies.move_to_end(variant)
+        if cached is not None and cached[0] == etag:
+            self._bump(path, 'body_hits')
+            return Response(content=cached[1], headers={**cached[2], **cache_headers})
+
+        # The stamp was read before the endpoint ran, so a write racing with
+        # it only makes this body newer than its ETag - the next poll sees a
+        # new stamp and refetches
+        self._bump(path, 'misses')
+        response = await call_next(request)
+        if response.status_code != 200 or 'set-cookie' in response.headers:
+            return response
+
+        body = b''.join([chunk async for chunk in response.body_iterator])
+        headers = {k: v for k, v in response.headers.items() if k != 'content-length'}
+        self._store(variant, etag, body, headers)
+        return Response(content=body, status_code=200, headers={**headers, **cache_headers})
+
+    def _store(self, variant: str, etag: str, body: bytes, headers: Dict[str, str]):
+        if len(body) > HTTP_CACHE_MAX_ENTRY_BYTES:
+            return
+        with self._lock:
+            previous = self._bodies.pop(variant, None)
+            if previous is not None:
+                self._bytes -= len(previous[1])
+            self._bodies[variant] = (etag, body, headers)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes and self._bodies:
+                _, (_, evicted, _) = self._bodies.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._bodies.clear()
+            self._bytes = 0
+            self._stats.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and hit ratio per route, plus body cache size"""
+        with self._lock:
+            routes = {}
+            for path, counters in sorted(self._stats.items()):
+                hits = counters['not_modified'] + counters['body_hits']
+                routes[path] = {
+                    **counters,
+                    'hit_ratio': round(hits / counters['requests'], 3) if counters['requests'] else 0.0,
+                }
+            return {
+                'enabled': HTTP_CACHE_ENABLED,
+                'entries': len(self._bodies),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'routes': routes,
+            }
+
+
+_caches: Dict[str, HTTPCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache(db_path: str) -> HTTPCache:
+    """Shared instance per database"""
+    key = str(Path(db_path).expanduser().resolve())
+    cache = _caches.get(key)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(key)
+            if cache is None:
+                cache = HTTPCache(key)
+                _caches[key] = cache
+    return cache
@@ -8,6 +8,7 @@ Access docs at: http://localhost:8000/docs
 """
 
 import os
+import threading
 import time
 from pathlib import Path
 from contextlib import asynccontextmanager
@@ -18,6 +19,7 @@ from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from api.rate_limit import limiter
+from api.http_cache import get_http_cache
 
 # Add paths for imports
 import sys
@@ -30,6 +32,8 @@ from utils.logger import get_logger
 
 # Import DB_PATH from dependencies for consistency
 from api.dependencies import DB_PATH
+from services.connection_pool import close_all_pools
+from services.async_db import QueryTimeout, DatabaseBusy, shutdown_db_executor
 
 # Import all routers
 from api.routers import (
@@ -84,6 +88,11 @@ ALLOWED_ORIGINS = os.getenv(
     'http://localhost:3000,http://localhost:3001,http://localhost:3002'
 ).split(',')
 
+# Services are created on first use (api.services). With warm-up on, they are
+# created in a background thread once the app is serving, so the first
+# requests don't pay for it. Set to 0 for fast `--reload` cycles.
+WARM_SERVICES = os.getenv('API_WARM_SERVICES', '1') == '1'
+
 # ============================================================================
 # APP LIFECYCLE
 # ============================================================================
@@ -94,8 +103,16 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Bensley Intelligence API starting up")
     logger.info(f"📂 Database: {DB_PATH}")
     logger.info("📚 API documentation available at /docs")
+    if WARM_SERVICES:
+        from api.services import registry
+        threading.Thread(target=registry.warm, name="service-warmup", daemon=True).start()
     yield
     logger.info("🛑 Bensley Intelligence API shutting down")
+    shutdown_db_executor()
+    # Write out pattern usage still pending before the pools close
+    from services.usage_counters import flush_all_usage_counters
+    flush_all_usage_counters()
+    close_all_pools()
 
 
 # ============================================================================
@@ -117,6 +134,13 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 # MIDDLEWARE
 # ============================================================================
 
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """ETag/304 and cached bodies for polled read endpoints (api/http_cache.py)"""
+    # Registered before CORS so 304s and cached bodies still get CORS headers
+    return await get_http_cache(DB_PATH).handle(request, call_next)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -231,6 +255,37 @@ app.include_router(reports.router)
 # GLOBAL EXCEPTION HANDLERS
 # ============================================================================
 
+@app.exception_handler(QueryTimeout)
+async def query_timeout_handler(request: Request, exc: QueryTimeout):
+    """A database call ran past its deadline and was cancelled"""
+    logger.warning(f"Query timeout on {request.method} {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=504,
+        content={
+            "error": True,
+            "code": "QUERY_TIMEOUT",
+            "message": "The database took too long to answer. Try again or narrow the request.",
+            "path": str(request.url.path)
+        }
+    )
+
+
+@app.exception_handler(DatabaseBusy)
+async def database_busy_handler(request: Request, exc: DatabaseBusy):
+    """The DB executor queue is full - shed load instead of queueing forever"""
+    logger.warning(f"Database busy on {request.method} {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={
+            "error": True,
+            "code": "DATABASE_BUSY",
+            "message": "Too many requests are waiting on the database. Try again shortly.",
+            "path": str(request.url.path)
+        }
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle uncaught exceptions gracefully"""
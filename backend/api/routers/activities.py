@@ -16,16 +16,15 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, date
 import sqlite3
-import os
 import json
 
-router = APIRouter(prefix="/api/activities", tags=["activities"])
+from api.dependencies import db_connect
 
-DB_PATH = os.getenv("DATABASE_PATH", "database/bensley_master.db")
+router = APIRouter(prefix="/api/activities", tags=["activities"])
 
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -14,10 +14,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional, List
 from pydantic import BaseModel, Field
 from datetime import datetime
-import sqlite3
 import os
 
-from api.dependencies import DB_PATH, require_role
+from api.dependencies import DB_PATH, require_role, db_connect, db_session
 from api.services import proposal_service, admin_service, override_service
 from api.helpers import list_response, item_response, action_response
 
@@ -1106,7 +1105,7 @@ async def get_transcript_status():
         - Pending transcript_link suggestions
     """
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with db_session() as conn:
             cursor = conn.cursor()
 
             # Count unlinked transcripts
@@ -1441,7 +1440,7 @@ async def list_threads(
     """
     try:
         import sqlite3
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
 
         # Base query for threads with stats
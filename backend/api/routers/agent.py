@@ -12,7 +12,7 @@ from typing import Optional
 import sqlite3
 from datetime import datetime, timedelta
 
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
 from api.helpers import item_response, list_response
 
 router = APIRouter(prefix="/api", tags=["agent"])
@@ -22,7 +22,7 @@ router = APIRouter(prefix="/api", tags=["agent"])
 async def get_follow_up_summary():
     """Get follow-up agent summary"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -118,7 +118,7 @@ async def get_follow_up_proposals(
 ):
     """Get proposals needing follow-up"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -184,7 +184,7 @@ async def draft_follow_up_email(
 ):
     """Draft a follow-up email for a proposal based on actual correspondence and status"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -11,7 +11,7 @@ import sqlite3
 from datetime import datetime, timedelta
 from typing import Optional
 
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
 from api.helpers import item_response
 
 router = APIRouter(prefix="/api", tags=["analytics"])
@@ -21,7 +21,7 @@ router = APIRouter(prefix="/api", tags=["analytics"])
 async def get_dashboard_analytics():
     """Get comprehensive dashboard analytics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -113,7 +113,7 @@ async def get_analytics_trends(months: int = 12):
     - cycle_times: Average days in each stage
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -14,7 +14,7 @@ import sqlite3
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 
-from api.dependencies import get_db, get_current_user, DB_PATH
+from api.dependencies import get_db, get_current_user, db_connect
 from api.security import verify_password, get_password_hash, create_access_token, Token
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
@@ -59,8 +59,7 @@ async def login(request: LoginRequest):
 
     Returns JWT token if credentials are valid.
     """
-    # Create thread-local connection
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
@@ -12,7 +12,7 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 import sqlite3
 
-from api.dependencies import DB_PATH
+from api.dependencies import DB_PATH, db_connect
 from api.helpers import list_response, item_response, action_response
 
 router = APIRouter(prefix="/api", tags=["contacts"])
@@ -33,7 +33,7 @@ async def get_contacts(
 ):
     """Get list of contacts with optional filtering"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -59,8 +59,8 @@ async def get_contacts(
                 c.contact_id IN (
                     SELECT DISTINCT c2.contact_id
                     FROM contacts c2
-                    JOIN emails e ON LOWER(c2.email) = LOWER(e.sender_email) OR LOWER(c2.email) = LOWER(e.sender_email)
-                    JOIN email_project_links epl ON e.email_id = epl.email_id
+                    JOIN email_participants ep ON ep.address = LOWER(TRIM(c2.email)) AND ep.role = 'from'
+                    JOIN email_project_links epl ON ep.email_id = epl.email_id
                     WHERE epl.project_id = ?
                 )
             """)
@@ -111,7 +111,7 @@ async def get_contacts(
 async def get_contact_stats():
     """Get contact statistics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -149,7 +149,7 @@ async def get_contact_stats():
 async def get_contact(contact_id: int):
     """Get a single contact with linked projects"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -181,7 +181,7 @@ async def get_contact(contact_id: int):
             FROM projects p
             JOIN email_project_links epl ON p.project_id = epl.project_id
             JOIN emails e ON epl.email_id = e.email_id
-            WHERE LOWER(e.sender_email) = LOWER(?)
+            WHERE e.sender_address = LOWER(TRIM(?))
             GROUP BY p.project_id
             ORDER BY email_count DESC
             LIMIT 20
@@ -197,7 +197,7 @@ async def get_contact(contact_id: int):
                 e.date,
                 e.snippet
             FROM emails e
-            WHERE LOWER(e.sender_email) = LOWER(?)
+            WHERE e.sender_address = LOWER(TRIM(?))
             ORDER BY e.date DESC
             LIMIT 10
         """, (contact.get('email'),))
@@ -231,7 +231,7 @@ async def create_contact(
 ):
     """Create a new contact"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -280,7 +280,7 @@ async def update_contact(
 ):
     """Update an existing contact"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -348,7 +348,7 @@ async def update_contact(
 async def delete_contact(contact_id: int):
     """Delete a contact"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Check if contact exists
@@ -382,7 +382,7 @@ async def enrich_contact(contact_id: int):
     try:
         from services.signature_parser_service import SignatureParserService
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("SELECT contact_id, email, name FROM contacts WHERE contact_id = ?", (contact_id,))
@@ -19,8 +19,9 @@ from api.services import (
     email_service,
     financial_service,
     training_service,
+    kpi_snapshot_service,
 )
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect, off_loop
 from api.helpers import list_response, item_response
 
 router = APIRouter(prefix="/api", tags=["dashboard"])
@@ -30,16 +31,30 @@ router = APIRouter(prefix="/api", tags=["dashboard"])
 # ROLE-BASED STATISTICS HELPER
 # ============================================================================
 
-async def get_role_based_stats(role: str) -> dict:
+def get_role_based_stats(role: str) -> dict:
     """Get role-specific dashboard statistics
 
+    Served from the KPI snapshot tables (migration 110) when they exist,
+    otherwise computed live. Either way the result carries a "snapshot"
+    entry saying where the numbers came from and how fresh they are.
+
     Args:
         role: Role identifier (executive, pm, finance)
 
     Returns:
         Role-specific KPI dictionary
     """
-    conn = sqlite3.connect(DB_PATH)
+    if role in ("executive", "bill", "pm", "finance") and kpi_snapshot_service.ensure_fresh():
+        return kpi_snapshot_service.get_role_stats(role)
+
+    stats = _live_role_stats(role)
+    stats["snapshot"] = {"source": "live", "refreshed_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")}
+    return stats
+
+
+def _live_role_stats(role: str) -> dict:
+    """Role KPIs straight from invoices/projects/proposals (pre-snapshot path)"""
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
@@ -204,7 +219,8 @@ async def get_role_based_stats(role: str) -> dict:
 # ============================================================================
 
 @router.get("/dashboard/stats")
-async def get_dashboard_stats(role: Optional[str] = Query(None, description="Role filter: executive, pm, finance")):
+@off_loop
+def get_dashboard_stats(role: Optional[str] = Query(None, description="Role filter: executive, pm, finance")):
     """Get comprehensive dashboard statistics with optional role-based filtering
 
     Args:
@@ -217,7 +233,7 @@ async def get_dashboard_stats(role: Optional[str] = Query(None, description="Rol
     try:
         # Role-based stats
         if role:
-            return await get_role_based_stats(role)
+            return get_role_based_stats(role)
 
         # Legacy comprehensive stats (backward compatible)
         # Get proposal stats
@@ -312,8 +328,134 @@ def calculate_trend(current: float, previous: float) -> dict:
         return {"value": round(change_pct, 1), "direction": "down", "label": f"{change_pct:.1f}%"}
 
 
+def _live_kpi_totals(cursor) -> dict:
+    """Period-independent /dashboard/kpis figures straight from the base tables
+
+    Same keys as KpiSnapshotService.get_kpi_totals(); used until migration 110
+    is applied.
+    """
+    # Total contract value for active projects
+    cursor.execute("""
+        SELECT COALESCE(SUM(total_fee_usd), 0) as total_contract_value
+        FROM projects
+        WHERE is_active_project = 1
+    """)
+    total_contract_value = cursor.fetchone()['total_contract_value'] or 0
+
+    # Paid amount for active projects only
+    cursor.execute("""
+        SELECT COALESCE(SUM(i.payment_amount), 0) as total_paid
+        FROM invoices i
+        JOIN projects p ON i.project_code = p.project_code
+        WHERE p.is_active_project = 1
+    """)
+    paid_for_active = cursor.fetchone()['total_paid'] or 0
+
+    # Outstanding for active projects
+    cursor.execute("""
+        SELECT COALESCE(SUM(i.invoice_amount - COALESCE(i.payment_amount, 0)), 0) as outstanding
+        FROM invoices i
+        JOIN projects p ON i.project_code = p.project_code
+        WHERE p.is_active_project = 1
+        AND (i.invoice_amount - COALESCE(i.payment_amount, 0)) > 0
+    """)
+    outstanding_for_active = cursor.fetchone()['outstanding'] or 0
+
+    # Outstanding 30 days ago (trend baseline)
+    cursor.execute("""
+        SELECT COALESCE(SUM(i.invoice_amount - COALESCE(i.payment_amount, 0)), 0) as outstanding
+        FROM invoices i
+        JOIN projects p ON i.project_code = p.project_code
+        WHERE p.is_active_project = 1
+        AND i.invoice_date <= date('now', '-30 days')
+        AND (i.invoice_amount - COALESCE(i.payment_amount, 0)) > 0
+    """)
+    outstanding_prev = cursor.fetchone()['outstanding'] or 0
+
+    # Active proposals = not signed contracts, not completed/cancelled/lost
+    cursor.execute("""
+        SELECT COUNT(*) as count
+        FROM projects
+        WHERE is_active_project = 0
+        AND status NOT IN ('Completed', 'completed', 'Cancelled', 'cancelled', 'lost', 'declined', 'archived')
+    """)
+    active_proposals = cursor.fetchone()['count'] or 0
+
+    # Average days to payment (for paid invoices)
+    cursor.execute("""
+        SELECT AVG(julianday(payment_date) - julianday(invoice_date)) as avg_days
+        FROM invoices
+        WHERE payment_date IS NOT NULL AND invoice_date IS NOT NULL
+        AND payment_date >= invoice_date
+    """)
+    avg_days_to_payment = round(cursor.fetchone()['avg_days'] or 0, 1)
+
+    # Largest outstanding invoice
+    cursor.execute("""
+        SELECT invoice_number, project_id,
+               (invoice_amount - COALESCE(payment_amount, 0)) as outstanding
+        FROM invoices
+        WHERE (invoice_amount - COALESCE(payment_amount, 0)) > 0
+        ORDER BY outstanding DESC
+        LIMIT 1
+    """)
+    row = cursor.fetchone()
+    largest_outstanding = {
+        "amount": row['outstanding'] if row else 0,
+        "invoice_number": row['invoice_number'] if row else None
+    }
+
+    # Won = active projects (is_active_project=1), lost = status in lost/declined/cancelled
+    cursor.execute("""
+        SELECT
+            SUM(CASE WHEN is_active_project = 1 THEN 1 ELSE 0 END) as won,
+            SUM(CASE WHEN status IN ('lost', 'declined', 'cancelled', 'Cancelled') THEN 1 ELSE 0 END) as lost
+        FROM projects
+    """)
+    row = cursor.fetchone()
+    won = row['won'] or 0
+
+    # Pipeline value from proposals table (all now USD after data fix)
+    cursor.execute("""
+        SELECT COALESCE(SUM(project_value), 0) as pipeline
+        FROM proposals
+        WHERE current_status NOT IN ('Lost', 'Declined', 'Dormant', 'Contract Signed', 'Contract signed', 'Cancelled')
+        AND project_value > 0
+    """)
+    pipeline_value = cursor.fetchone()['pipeline'] or 0
+
+    # Overdue invoices count and amount (active projects only)
+    cursor.execute("""
+        SELECT COUNT(*) as count,
+               COALESCE(SUM(i.invoice_amount - COALESCE(i.payment_amount, 0)), 0) as amount
+        FROM invoices i
+        JOIN projects p ON i.project_code = p.project_code
+        WHERE p.is_active_project = 1
+        AND i.due_date < date('now')
+        AND (i.invoice_amount - COALESCE(i.payment_amount, 0)) > 0
+    """)
+    overdue = cursor.fetchone()
+
+    return {
+        "total_contract_value": total_contract_value,
+        "paid_for_active": paid_for_active,
+        "outstanding_for_active": outstanding_for_active,
+        "outstanding_prev": outstanding_prev,
+        "active_projects": won,
+        "active_proposals": active_proposals,
+        "won": won,
+        "lost": row['lost'] or 0,
+        "avg_days_to_payment": avg_days_to_payment,
+        "largest_outstanding": largest_outstanding,
+        "pipeline_value": pipeline_value,
+        "overdue_count": overdue['count'] or 0,
+        "overdue_amount": overdue['amount'] or 0,
+    }
+
+
 @router.get("/dashboard/kpis")
-async def get_dashboard_kpis(
+@off_loop
+def get_dashboard_kpis(
     period: str = Query("all_time", description="Time period: this_month, last_3_months, this_year, last_year, all_time, custom"),
     start_date: Optional[str] = Query(None, description="Start date for custom period (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date for custom period (YYYY-MM-DD)")
@@ -326,7 +468,7 @@ async def get_dashboard_kpis(
     Returns KPIs with comparison to previous period.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -348,36 +490,19 @@ async def get_dashboard_kpis(
         }
         period_label = period_labels.get(period, "All Time")
 
-        # ========== REMAINING CONTRACT VALUE (not period-filtered) ==========
-        # Total contract value for active projects
-        cursor.execute("""
-            SELECT COALESCE(SUM(total_fee_usd), 0) as total_contract_value
-            FROM projects
-            WHERE is_active_project = 1
-        """)
-        total_contract_value = cursor.fetchone()['total_contract_value'] or 0
+        # ========== PERIOD-INDEPENDENT TOTALS ==========
+        # From the KPI snapshot when available (migration 110)
+        if kpi_snapshot_service.ensure_fresh():
+            totals = kpi_snapshot_service.get_kpi_totals()
+        else:
+            totals = _live_kpi_totals(cursor)
+            totals["snapshot"] = {"source": "live", "refreshed_at": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")}
 
-        # Paid amount for active projects only
-        cursor.execute("""
-            SELECT COALESCE(SUM(i.payment_amount), 0) as total_paid
-            FROM invoices i
-            JOIN projects p ON i.project_code = p.project_code
-            WHERE p.is_active_project = 1
-        """)
-        paid_for_active = cursor.fetchone()['total_paid'] or 0
+        # Remaining contract value: Total - Paid - Outstanding = not yet invoiced
+        total_contract_value = totals["total_contract_value"]
+        paid_for_active = totals["paid_for_active"]
+        outstanding_for_active = totals["outstanding_for_active"]
         all_time_paid = paid_for_active  # Keep for compatibility
-
-        # Outstanding for active projects
-        cursor.execute("""
-            SELECT COALESCE(SUM(i.invoice_amount - COALESCE(i.payment_amount, 0)), 0) as outstanding
-            FROM invoices i
-            JOIN projects p ON i.project_code = p.project_code
-            WHERE p.is_active_project = 1
-            AND (i.invoice_amount - COALESCE(i.payment_amount, 0)) > 0
-        """)
-        outstanding_for_active = cursor.fetchone()['outstanding'] or 0
-
-        # Correct calculation: Total - Paid - Outstanding = Remaining (not yet invoiced)
         remaining_contract_value = total_contract_value - paid_for_active - outstanding_for_active
 
         # ========== PAID IN PERIOD ==========
@@ -407,25 +532,9 @@ async def get_dashboard_kpis(
         # For "paid", up is good
 
         # ========== OUTSTANDING INVOICES (active projects only) ==========
-        cursor.execute("""
-            SELECT COALESCE(SUM(i.invoice_amount - COALESCE(i.payment_amount, 0)), 0) as outstanding
-            FROM invoices i
-            JOIN projects p ON i.project_code = p.project_code
-            WHERE p.is_active_project = 1
-            AND (i.invoice_amount - COALESCE(i.payment_amount, 0)) > 0
-        """)
-        outstanding_invoices = cursor.fetchone()['outstanding'] or 0
-
+        outstanding_invoices = outstanding_for_active
         # Compare to 30 days ago for outstanding trend
-        cursor.execute("""
-            SELECT COALESCE(SUM(i.invoice_amount - COALESCE(i.payment_amount, 0)), 0) as outstanding
-            FROM invoices i
-            JOIN projects p ON i.project_code = p.project_code
-            WHERE p.is_active_project = 1
-            AND i.invoice_date <= date('now', '-30 days')
-            AND (i.invoice_amount - COALESCE(i.payment_amount, 0)) > 0
-        """)
-        outstanding_prev = cursor.fetchone()['outstanding'] or outstanding_invoices
+        outstanding_prev = totals["outstanding_prev"] or outstanding_invoices
         outstanding_trend = calculate_trend(outstanding_invoices, outstanding_prev)
         # For outstanding, down is good (invert the direction meaning)
         if outstanding_trend["direction"] == "up":
@@ -474,60 +583,17 @@ async def get_dashboard_kpis(
         contracts_trend = calculate_trend(contracts_signed_count, contracts_prev)
 
         # ========== ACTIVE PROJECTS & PROPOSALS ==========
-        cursor.execute("""
-            SELECT COUNT(*) as count
-            FROM projects
-            WHERE is_active_project = 1
-        """)
-        active_projects = cursor.fetchone()['count'] or 0
-
-        # Active proposals = not signed contracts, not completed/cancelled/lost
-        cursor.execute("""
-            SELECT COUNT(*) as count
-            FROM projects
-            WHERE is_active_project = 0
-            AND status NOT IN ('Completed', 'completed', 'Cancelled', 'cancelled', 'lost', 'declined', 'archived')
-        """)
-        active_proposals = cursor.fetchone()['count'] or 0
+        active_projects = totals["active_projects"]
+        active_proposals = totals["active_proposals"]
 
         # ========== ADDITIONAL KPIs ==========
-
-        # Average days to payment (for paid invoices)
-        cursor.execute("""
-            SELECT AVG(julianday(payment_date) - julianday(invoice_date)) as avg_days
-            FROM invoices
-            WHERE payment_date IS NOT NULL AND invoice_date IS NOT NULL
-            AND payment_date >= invoice_date
-        """)
-        row = cursor.fetchone()
-        avg_days_to_payment = round(row['avg_days'] or 0, 1)
-
-        # Largest outstanding invoice
-        cursor.execute("""
-            SELECT invoice_number, project_id,
-                   (invoice_amount - COALESCE(payment_amount, 0)) as outstanding
-            FROM invoices
-            WHERE (invoice_amount - COALESCE(payment_amount, 0)) > 0
-            ORDER BY outstanding DESC
-            LIMIT 1
-        """)
-        row = cursor.fetchone()
-        largest_outstanding = {
-            "amount": row['outstanding'] if row else 0,
-            "invoice_number": row['invoice_number'] if row else None
-        }
+        avg_days_to_payment = totals["avg_days_to_payment"]
+        largest_outstanding = totals["largest_outstanding"]
 
         # Win rate (won / (won + lost) for projects)
         # Note: "won" = is_active_project=1, "lost" = status in lost/declined/cancelled
-        cursor.execute("""
-            SELECT
-                SUM(CASE WHEN is_active_project = 1 THEN 1 ELSE 0 END) as won,
-                SUM(CASE WHEN status IN ('lost', 'declined', 'cancelled', 'Cancelled') THEN 1 ELSE 0 END) as lost
-            FROM projects
-        """)
-        row = cursor.fetchone()
-        won = row['won'] or 0
-        lost = row['lost'] or 0
+        won = totals["won"]
+        lost = totals["lost"]
         # Only calculate win rate if we have meaningful data (at least some lost deals tracked)
         if lost > 0:
             win_rate = round((won / (won + lost) * 100), 1)
@@ -537,28 +603,9 @@ async def get_dashboard_kpis(
         else:
             win_rate = 0
 
-        # Pipeline value from proposals table (all now USD after data fix)
-        cursor.execute("""
-            SELECT COALESCE(SUM(project_value), 0) as pipeline
-            FROM proposals
-            WHERE current_status NOT IN ('Lost', 'Declined', 'Dormant', 'Contract Signed', 'Contract signed', 'Cancelled')
-            AND project_value > 0
-        """)
-        pipeline_value = cursor.fetchone()['pipeline'] or 0
-
-        # Overdue invoices count and amount (active projects only)
-        cursor.execute("""
-            SELECT COUNT(*) as count,
-                   COALESCE(SUM(i.invoice_amount - COALESCE(i.payment_amount, 0)), 0) as amount
-            FROM invoices i
-            JOIN projects p ON i.project_code = p.project_code
-            WHERE p.is_active_project = 1
-            AND i.due_date < date('now')
-            AND (i.invoice_amount - COALESCE(i.payment_amount, 0)) > 0
-        """)
-        row = cursor.fetchone()
-        overdue_count = row['count'] or 0
-        overdue_amount = row['amount'] or 0
+        pipeline_value = totals["pipeline_value"]
+        overdue_count = totals["overdue_count"]
+        overdue_amount = totals["overdue_amount"]
 
         conn.close()
 
@@ -618,17 +665,19 @@ async def get_dashboard_kpis(
                 "value": paid_in_period if period == "this_year" else all_time_paid,
                 "trend": paid_trend
             },
-            "trend_period_days": 30
+            "trend_period_days": 30,
+            "snapshot": totals["snapshot"]
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
 @router.get("/dashboard/decision-tiles")
-async def get_decision_tiles():
+@off_loop
+def get_decision_tiles():
     """Get actionable decision tiles for dashboard"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -699,10 +748,11 @@ async def get_decision_tiles():
 # ============================================================================
 
 @router.get("/briefing/daily")
-async def get_daily_briefing():
+@off_loop
+def get_daily_briefing():
     """Executive daily briefing - actionable intelligence for PROPOSALS needing follow-up"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -807,10 +857,11 @@ async def get_daily_briefing():
 
 
 @router.get("/dashboard/meetings")
-async def get_dashboard_meetings():
+@off_loop
+def get_dashboard_meetings():
     """Get upcoming meetings for dashboard"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -832,7 +883,8 @@ async def get_dashboard_meetings():
 
 
 @router.get("/dashboard/actions")
-async def get_action_items():
+@off_loop
+def get_action_items():
     """
     Get all actionable items across the system - the "What Needs Attention" view.
 
@@ -845,7 +897,7 @@ async def get_action_items():
     - Pending tasks
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1129,12 +1181,13 @@ async def get_action_items():
 # ============================================================================
 
 @router.get("/dashboard/portfolio-exceptions")
-async def get_portfolio_exceptions():
+@off_loop
+def get_portfolio_exceptions():
     """Get all projects with exceptions (overdue invoices, stale, etc.)
 
     Returns only projects that need attention - healthy projects are counted but not listed.
     """
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
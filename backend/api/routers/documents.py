@@ -28,16 +28,29 @@ router = APIRouter(prefix="/api", tags=["documents"])
 async def get_all_documents(
     project_code: Optional[str] = Query(None, description="Filter by project code"),
     document_type: Optional[str] = Query(None, description="Filter by document type"),
-    limit: int = Query(100, ge=1, le=500)
+    limit: int = Query(100, ge=1, le=500),
+    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description="meta.next_cursor of the previous page")
 ):
     """Get all documents with optional filtering"""
     try:
-        documents = document_service.get_all_documents(
+        result = document_service.get_all_documents(
             project_code=project_code,
             document_type=document_type,
-            limit=limit
+            limit=limit,
+            page=page,
+            cursor=cursor
         )
-        return list_response(documents, len(documents))
+        return list_response(
+            result['items'],
+            result['total'],
+            page,
+            limit,
+            has_more=result['has_more'],
+            next_cursor=result['next_cursor']
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid request")
     except Exception as e:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
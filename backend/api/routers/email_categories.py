@@ -6,7 +6,7 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 import sqlite3
 
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
 from api.helpers import list_response, item_response, action_response
 
 router = APIRouter(prefix="/api/email-categories", tags=["email-categories"])
@@ -16,7 +16,7 @@ router = APIRouter(prefix="/api/email-categories", tags=["email-categories"])
 async def get_categories():
     """Get all email categories"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -43,7 +43,7 @@ async def get_categories():
 async def get_category_stats():
     """Get category statistics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -85,7 +85,7 @@ async def get_uncategorized(
 ):
     """Get uncategorized emails for review"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -118,7 +118,7 @@ async def assign_category(category_id: int, email_id: int):
         svc = EmailCategoryService()
 
         # Get category name
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM email_categories WHERE category_id = ?", (category_id,))
         row = cursor.fetchone()
@@ -153,7 +153,7 @@ async def assign_category(category_id: int, email_id: int):
 async def get_rules(category_id: Optional[int] = None):
     """Get categorization rules"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -12,11 +12,10 @@ Endpoints:
 
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional, List
-import sqlite3
 import logging
 
 from api.services import email_service, email_intelligence_service, email_orchestrator
-from api.dependencies import DB_PATH
+from api.dependencies import DB_PATH, db_session
 from api.models import EmailCategoryRequest, EmailLinkRequest, BulkCategoryRequest
 from api.helpers import list_response, item_response, action_response
 
@@ -37,7 +36,8 @@ async def get_emails(
     project_code: Optional[str] = None,
     search: Optional[str] = None,
     inbox_source: Optional[str] = Query(None, description="Filter by source inbox (e.g., projects@bensley.com)"),
-    inbox_category: Optional[str] = Query(None, description="Filter by inbox category (projects, invoices, internal, general)")
+    inbox_category: Optional[str] = Query(None, description="Filter by inbox category (projects, invoices, internal, general)"),
+    cursor: Optional[str] = Query(None, description="meta.next_cursor of the previous page")
 ):
     """Get paginated list of emails with optional filtering"""
     try:
@@ -48,14 +48,20 @@ async def get_emails(
             project_code=project_code,
             search=search,
             inbox_source=inbox_source,
-            inbox_category=inbox_category
+            inbox_category=inbox_category,
+            cursor=cursor
         )
         return list_response(
             result.get('emails', []),
             result.get('total', 0),
             page,
-            per_page
+            per_page,
+            has_more=result.get('has_more', False),
+            next_cursor=result.get('next_cursor'),
+            total_estimated=result.get('total_estimated', False)
         )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid request")
     except Exception as e:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
@@ -81,9 +87,8 @@ async def get_inbox_stats():
     """
     try:
         import sqlite3
-        from api.dependencies import DB_PATH
 
-        with sqlite3.connect(DB_PATH) as conn:
+        with db_session() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.cursor()
 
@@ -290,7 +295,7 @@ async def bulk_approve_emails(
         for email_id in email_ids:
             try:
                 # Find pending suggestion for this email
-                with sqlite3.connect(DB_PATH) as conn:
+                with db_session() as conn:
                     cursor = conn.cursor()
                     cursor.execute("""
                         SELECT suggestion_id, project_code
@@ -321,7 +326,7 @@ async def bulk_approve_emails(
 
                     # Learn pattern if requested
                     if learn_patterns:
-                        with sqlite3.connect(DB_PATH) as conn:
+                        with db_session() as conn:
                             cursor = conn.cursor()
                             cursor.execute("SELECT sender_email FROM emails WHERE email_id = ?", (email_id,))
                             sender_row = cursor.fetchone()
@@ -379,7 +384,7 @@ async def quick_approve_email(
         ai_service = AILearningService(DB_PATH)
 
         # Find the pending suggestion for this email
-        with sqlite3.connect(DB_PATH) as conn:
+        with db_session() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT suggestion_id, project_code
@@ -395,7 +400,7 @@ async def quick_approve_email(
         if not suggestion:
             # No existing suggestion - create direct link
             # Get proposal_id from project_code
-            with sqlite3.connect(DB_PATH) as conn:
+            with db_session() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     SELECT proposal_id, project_name FROM proposals WHERE project_code = ?
@@ -408,7 +413,7 @@ async def quick_approve_email(
             proposal_id, project_name = proposal
 
             # Create direct link
-            with sqlite3.connect(DB_PATH) as conn:
+            with db_session() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT OR REPLACE INTO email_proposal_links
@@ -420,7 +425,7 @@ async def quick_approve_email(
             pattern_result = None
             if learn_pattern:
                 # Get sender email to learn pattern
-                with sqlite3.connect(DB_PATH) as conn:
+                with db_session() as conn:
                     cursor = conn.cursor()
                     cursor.execute("SELECT sender_email FROM emails WHERE email_id = ?", (email_id,))
                     sender_row = cursor.fetchone()
@@ -459,7 +464,7 @@ async def quick_approve_email(
             pattern_result = None
             if learn_pattern and result.get('success'):
                 # Learn pattern from this approval
-                with sqlite3.connect(DB_PATH) as conn:
+                with db_session() as conn:
                     cursor = conn.cursor()
                     cursor.execute("SELECT sender_email FROM emails WHERE email_id = ?", (email_id,))
                     sender_row = cursor.fetchone()
@@ -623,7 +628,7 @@ async def confirm_email_link(
     2. Logs for AI training
     """
     try:
-        with sqlite3.connect(DB_PATH) as conn:
+        with db_session() as conn:
             cursor = conn.cursor()
 
             # Update confidence to 1.0 to mark as confirmed
@@ -10,19 +10,27 @@ Endpoints:
     GET /api/files/by-proposal/{proposal_id}/search - Search files
     GET /api/files/by-milestone/{milestone_id} - Get milestone files
     GET /api/files/{file_id} - Get file by ID
+    GET /api/files/{file_id}/content - Download file content (via blob store, auth)
+    GET /api/files/attachments/{attachment_id}/content - Download email attachment (auth)
+    GET /api/files/documents/{document_id}/content - Download indexed document (auth)
     POST /api/files - Create file record
     PATCH /api/files/{file_id} - Update file
     PATCH /api/files/{file_id}/mark-latest - Mark as latest version
     DELETE /api/files/{file_id} - Delete file
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from typing import Optional, List
 from pydantic import BaseModel, Field
+import logging
 
-from api.services import file_service
+from api.services import file_service, document_service
+from api.dependencies import get_current_user
 from api.helpers import list_response, item_response, action_response
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api", tags=["files"])
 
 
@@ -75,7 +83,7 @@ async def get_files_by_proposal(
         response["files"] = files  # Backward compat
         response["count"] = len(files)  # Backward compat
         return response
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -85,7 +93,7 @@ async def get_workspace_summary(proposal_id: int):
     try:
         summary = file_service.get_workspace_summary(proposal_id)
         return item_response(summary)
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -100,7 +108,7 @@ async def get_files_by_type(proposal_id: int, file_type: str):
         response["files"] = files  # Backward compat
         response["count"] = len(files)  # Backward compat
         return response
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -115,7 +123,7 @@ async def get_files_by_category(proposal_id: int, category: str):
         response["files"] = files  # Backward compat
         response["count"] = len(files)  # Backward compat
         return response
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -130,7 +138,7 @@ async def get_file_versions(proposal_id: int, filename: str):
         response["versions"] = versions  # Backward compat
         response["count"] = len(versions)  # Backward compat
         return response
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -148,7 +156,7 @@ async def search_files(
         response["files"] = files  # Backward compat
         response["count"] = len(files)  # Backward compat
         return response
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -162,7 +170,7 @@ async def get_files_by_milestone(milestone_id: int):
         response["files"] = files  # Backward compat
         response["count"] = len(files)  # Backward compat
         return response
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -180,8 +188,48 @@ async def get_file(file_id: int):
         return item_response(file)
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
+        raise HTTPException(status_code=500, detail="An internal error occurred")
+
+
+@router.get("/files/{file_id}/content", dependencies=[Depends(get_current_user)])
+async def get_file_content(file_id: int):
+    """Stream a file's content (deduplicated files are served from the blob store)"""
+    try:
+        content = file_service.get_file_content(file_id)
+    except Exception:
+        logger.exception("Error locating content for file %d", file_id)
+        raise HTTPException(status_code=500, detail="An internal error occurred")
+    if not content:
+        raise HTTPException(status_code=404, detail=f"Content for file {file_id} not found")
+    return FileResponse(content["path"], filename=content["filename"])
+
+
+@router.get("/files/attachments/{attachment_id}/content", dependencies=[Depends(get_current_user)])
+async def get_attachment_content(attachment_id: int):
+    """Stream an email attachment's content from the blob store"""
+    try:
+        content = file_service.get_attachment_content(attachment_id)
+    except Exception:
+        logger.exception("Error locating content for attachment %d", attachment_id)
+        raise HTTPException(status_code=500, detail="An internal error occurred")
+    if not content:
+        raise HTTPException(status_code=404, detail=f"Attachment {attachment_id} not found")
+    return FileResponse(content["path"], filename=content["filename"],
+                        media_type=content["mime_type"] or None)
+
+
+@router.get("/files/documents/{document_id}/content", dependencies=[Depends(get_current_user)])
+async def get_document_content(document_id: int):
+    """Stream an indexed document's content from the blob store"""
+    try:
+        content = document_service.get_document_file(document_id)
+    except Exception:
+        logger.exception("Error locating content for document %d", document_id)
         raise HTTPException(status_code=500, detail="An internal error occurred")
+    if not content:
+        raise HTTPException(status_code=404, detail=f"Document {document_id} not found")
+    return FileResponse(content["path"], filename=content["file_name"])
 
 
 @router.post("/files")
@@ -190,7 +238,7 @@ async def create_file(request: CreateFileRequest):
     try:
         file_id = file_service.create_file(request.dict())
         return action_response(True, data={"file_id": file_id}, message="File created")
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -208,7 +256,7 @@ async def update_file(file_id: int, request: UpdateFileRequest):
         return action_response(True, message="File updated")
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -222,7 +270,7 @@ async def mark_as_latest(file_id: int):
         return action_response(True, message="Marked as latest version")
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -236,7 +284,7 @@ async def delete_file(file_id: int):
         return action_response(True, message="File deleted")
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -246,7 +294,7 @@ async def bulk_update_onedrive_paths(request: BulkUpdateOnedriveRequest):
     try:
         count = file_service.bulk_update_onedrive_paths(request.updates)
         return action_response(True, data={"updated": count}, message=f"Updated {count} files")
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -280,7 +328,7 @@ async def upload_file(
             uploaded_by=uploaded_by,
         )
         return {"success": True, "message": "File uploaded successfully", **result}
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -290,9 +338,9 @@ async def get_download_url(file_id: int):
     try:
         result = await onedrive_service.get_download_url(file_id)
         return {"success": True, **result}
-    except ValueError as e:
+    except ValueError:
         raise HTTPException(status_code=404, detail="An internal error occurred")
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -306,7 +354,7 @@ async def get_files_by_project(project_code: str, category: Optional[str] = None
         response["files"] = files
         response["count"] = len(files)
         return response
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
@@ -320,7 +368,7 @@ async def delete_uploaded_file(file_id: int):
         return action_response(True, message="File deleted")
     except HTTPException:
         raise
-    except Exception as e:
+    except Exception:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
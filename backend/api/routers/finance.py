@@ -15,7 +15,7 @@ Endpoints:
 from fastapi import APIRouter, Depends, HTTPException, Query
 import sqlite3
 
-from api.dependencies import DB_PATH, require_role
+from api.dependencies import require_role, db_connect
 from api.helpers import item_response, list_response
 
 # RBAC: All finance endpoints require executive or finance role
@@ -32,7 +32,7 @@ router = APIRouter(
 async def get_dashboard_metrics():
     """Get financial dashboard metrics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -94,7 +94,7 @@ async def get_dashboard_metrics():
 async def get_recent_payments(limit: int = Query(5, ge=1, le=50)):
     """Get recent payments"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -132,7 +132,7 @@ async def get_recent_payments(limit: int = Query(5, ge=1, le=50)):
 async def get_projected_invoices(limit: int = Query(5, ge=1, le=50)):
     """Get projected upcoming invoices"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -172,7 +172,7 @@ async def get_projected_invoices(limit: int = Query(5, ge=1, le=50)):
 async def get_projects_by_outstanding(limit: int = Query(5, ge=1, le=50)):
     """Get projects sorted by outstanding balance"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -211,7 +211,7 @@ async def get_projects_by_outstanding(limit: int = Query(5, ge=1, le=50)):
 async def get_oldest_unpaid_invoices(limit: int = Query(5, ge=1, le=50)):
     """Get oldest unpaid invoices"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -263,7 +263,7 @@ async def get_oldest_unpaid_invoices(limit: int = Query(5, ge=1, le=50)):
 async def get_projects_by_remaining(limit: int = Query(5, ge=1, le=50)):
     """Get projects by remaining contract value"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -4,12 +4,17 @@ Health Router - System health and status endpoints
 Endpoints:
     GET /health - Health check
     GET /api/health - Health check (API prefixed)
+    GET /api/health/db - Connection pool and DB executor health and stats
+    GET /api/health/http-cache - ETag/conditional GET hit ratios per route
 """
 
 from fastapi import APIRouter, HTTPException
 from datetime import datetime
 
-from api.dependencies import get_db_connection
+from api.dependencies import get_db_connection, DB_PATH
+from api.http_cache import get_http_cache
+from services.connection_pool import get_pool
+from services.async_db import get_db_executor
 
 router = APIRouter(tags=["health"])
 
@@ -41,3 +46,38 @@ async def health_check():
         }
     except Exception as e:
         raise HTTPException(status_code=503, detail="An internal error occurred")
+
+
+@router.get("/api/health/db")
+async def database_pool_health():
+    """
+    Connection pool health and contention stats.
+
+    Reports checkouts, wait time and lock retries so contention is visible
+    without digging through 'database locked' warnings in the logs, plus
+    queue wait, timeouts and rejections for the off-loop DB executor.
+    """
+    pool = get_pool(DB_PATH)
+    health = pool.health_check()
+    return {
+        "status": "healthy" if health["healthy"] else "degraded",
+        "journal_mode": health["journal_mode"],
+        "errors": health["errors"],
+        "pool": pool.stats(),
+        "executor": get_db_executor().stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/api/health/http-cache")
+async def http_cache_stats():
+    """
+    Conditional GET stats for the polled read endpoints.
+
+    Per route: 304s, cached bodies served, misses (endpoint ran), requests
+    that could not be cached, and the resulting hit ratio.
+    """
+    return {
+        **get_http_cache(DB_PATH).stats(),
+        "timestamp": datetime.now().isoformat()
+    }
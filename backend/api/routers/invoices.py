@@ -15,7 +15,7 @@ from typing import Optional
 import sqlite3
 
 from api.services import financial_service, invoice_service
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
 from api.models import InvoiceCreateRequest, InvoiceUpdateRequest
 from api.helpers import list_response, item_response, action_response
 
@@ -65,7 +65,7 @@ async def get_recent_invoices(limit: int = Query(20, ge=1, le=100)):
     """Get most recent invoices. Returns standardized list response."""
     try:
         # Use direct SQL for recent invoices
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("""
@@ -241,7 +241,7 @@ async def update_invoice(invoice_number: str, request: InvoiceUpdateRequest):
         updates = request.dict(exclude_unset=True)
 
         # Build SQL update dynamically
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -295,7 +295,7 @@ async def get_revenue_trends(months: int = Query(12, ge=1, le=24)):
     Returns invoiced amounts, paid amounts, and collection rates by month.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -351,7 +351,7 @@ async def get_client_payment_behavior(limit: int = Query(10, ge=1, le=50)):
     Returns top projects by payments with average days to pay and collection metrics.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
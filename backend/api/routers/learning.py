@@ -13,7 +13,7 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 import sqlite3
 
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
 from api.helpers import item_response, list_response
 
 router = APIRouter(prefix="/api", tags=["learning"])
@@ -23,7 +23,7 @@ router = APIRouter(prefix="/api", tags=["learning"])
 async def get_learning_stats():
     """Get AI learning statistics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -78,7 +78,7 @@ async def get_learning_stats():
 async def get_learning_patterns(pattern_type: Optional[str] = None):
     """Get learned patterns"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -115,7 +115,7 @@ async def get_learning_suggestions(
 ):
     """Get AI suggestions pending review"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -157,7 +157,7 @@ async def approve_learning_suggestion(
 ):
     """Approve an AI suggestion"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -189,7 +189,7 @@ async def reject_learning_suggestion(
 ):
     """Reject an AI suggestion"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -11,8 +11,9 @@ from datetime import datetime, date, timedelta
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 
-from api.dependencies import DB_PATH
+from api.dependencies import DB_PATH, db_connect
 from api.helpers import action_response
+from services.section_composer import Section, SectionComposer
 
 router = APIRouter(prefix="/api", tags=["my-day"])
 
@@ -23,7 +24,7 @@ router = APIRouter(prefix="/api", tags=["my-day"])
 
 def get_db():
     """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -50,6 +51,249 @@ def get_greeting(hour: int) -> str:
         return "Good evening"
 
 
+# ============================================================================
+# MY DAY SECTIONS
+# ============================================================================
+# Each section runs its queries on its own pooled reader, concurrently with
+# the others (services/section_composer.py). A section that fails or times
+# out shows its default and is listed in meta.degraded.
+
+OPEN_PROPOSAL_FILTER = "status NOT IN ('won', 'lost', 'cancelled', 'on_hold', 'inactive')"
+
+
+def fetch_tasks(conn, inputs: dict) -> dict:
+    """Tasks due today, overdue tasks and the active total"""
+    today, user_id = inputs["today"], inputs["user_id"]
+
+    # Get tasks due today (assignee='us' or Bill)
+    tasks_today = [row_to_dict(row) for row in conn.execute("""
+        SELECT * FROM tasks
+        WHERE status NOT IN ('completed', 'cancelled')
+        AND due_date = ?
+        AND (COALESCE(assignee, 'us') = 'us' OR assignee = ?)
+        ORDER BY
+            CASE priority
+                WHEN 'critical' THEN 0
+                WHEN 'high' THEN 1
+                WHEN 'medium' THEN 2
+                ELSE 3
+            END
+        LIMIT 20
+    """, [today, user_id]).fetchall()]
+
+    # Get overdue tasks
+    tasks_overdue = [row_to_dict(row) for row in conn.execute("""
+        SELECT * FROM tasks
+        WHERE status NOT IN ('completed', 'cancelled')
+        AND due_date < ?
+        AND (COALESCE(assignee, 'us') = 'us' OR assignee = ?)
+        ORDER BY due_date ASC,
+            CASE priority
+                WHEN 'critical' THEN 0
+                WHEN 'high' THEN 1
+                WHEN 'medium' THEN 2
+                ELSE 3
+            END
+        LIMIT 10
+    """, [today, user_id]).fetchall()]
+
+    # Total active tasks count
+    total_active_tasks = conn.execute("""
+        SELECT COUNT(*) FROM tasks
+        WHERE status NOT IN ('completed', 'cancelled')
+        AND (COALESCE(assignee, 'us') = 'us' OR assignee = ?)
+    """, [user_id]).fetchone()[0]
+
+    return {
+        "today": tasks_today,
+        "overdue": tasks_overdue,
+        "today_count": len(tasks_today),
+        "overdue_count": len(tasks_overdue),
+        "total_active": total_active_tasks,
+    }
+
+
+def fetch_meetings(conn, inputs: dict) -> dict:
+    """Today's meetings"""
+    meetings_today = [row_to_dict(row) for row in conn.execute("""
+        SELECT * FROM meetings
+        WHERE meeting_date = ?
+        AND status NOT IN ('cancelled')
+        ORDER BY start_time ASC
+    """, [inputs["today"]]).fetchall()]
+
+    # Check if any meetings have video links
+    has_virtual = any(
+        m.get('location') and
+        ('zoom' in m['location'].lower() or 'teams' in m['location'].lower() or 'meet' in m['location'].lower())
+        for m in meetings_today
+    )
+
+    return {
+        "today": meetings_today,
+        "count": len(meetings_today),
+        "has_virtual": has_virtual,
+    }
+
+
+def fetch_proposals(conn, inputs: dict) -> dict:
+    """Proposals where ball_in_court='us' (we need to act)"""
+    today = inputs["today"]
+    proposals_needing_action = [row_to_dict(row) for row in conn.execute(f"""
+        SELECT
+            p.proposal_id, p.project_code, p.project_name, p.client_company as client_name,
+            p.status, p.ball_in_court, p.waiting_for, p.last_contact_date,
+            p.next_action_date as next_followup_date, p.win_probability as probability,
+            CASE
+                WHEN p.next_action_date < ? THEN 'overdue'
+                WHEN p.next_action_date = ? THEN 'today'
+                ELSE 'upcoming'
+            END as urgency,
+            (julianday(?) - julianday(p.last_contact_date)) as days_since_contact
+        FROM proposals p
+        WHERE p.ball_in_court = 'us'
+        AND p.{OPEN_PROPOSAL_FILTER}
+        ORDER BY
+            CASE WHEN p.next_action_date IS NULL THEN 1 ELSE 0 END,
+            p.next_action_date ASC
+        LIMIT 10
+    """, [today, today, today]).fetchall()]
+
+    # Get count of all "our ball" proposals
+    total_our_ball = conn.execute(f"""
+        SELECT COUNT(*) FROM proposals
+        WHERE ball_in_court = 'us'
+        AND {OPEN_PROPOSAL_FILTER}
+    """).fetchone()[0]
+
+    return {
+        "needing_followup": proposals_needing_action,
+        "count": len(proposals_needing_action),
+        "total_our_ball": total_our_ball,
+    }
+
+
+def fetch_suggestions_queue(conn, inputs: dict) -> dict:
+    """Top pending AI suggestions, pending total and count by type"""
+    top_suggestions = [row_to_dict(row) for row in conn.execute("""
+        SELECT
+            suggestion_id, suggestion_type, title, description,
+            priority, confidence_score, project_code, created_at
+        FROM ai_suggestions
+        WHERE status = 'pending'
+        ORDER BY
+            CASE priority
+                WHEN 'high' THEN 0
+                WHEN 'medium' THEN 1
+                ELSE 2
+            END,
+            confidence_score DESC,
+            created_at DESC
+        LIMIT 5
+    """).fetchall()]
+
+    total_pending = conn.execute("SELECT COUNT(*) FROM ai_suggestions WHERE status = 'pending'").fetchone()[0]
+
+    suggestions_by_type = {row['suggestion_type']: row['count'] for row in conn.execute("""
+        SELECT suggestion_type, COUNT(*) as count
+        FROM ai_suggestions
+        WHERE status = 'pending'
+        GROUP BY suggestion_type
+    """).fetchall()}
+
+    return {
+        "top_suggestions": top_suggestions,
+        "total_pending": total_pending,
+        "by_type": suggestions_by_type,
+    }
+
+
+def fetch_week_ahead(conn, inputs: dict) -> dict:
+    """Deadlines, meetings, decision dates and deliverables in the next 7 days"""
+    today, week_end = inputs["today"], inputs["week_end"]
+
+    # Upcoming deadlines this week
+    upcoming_deadlines = [row_to_dict(row) for row in conn.execute("""
+        SELECT * FROM tasks
+        WHERE status NOT IN ('completed', 'cancelled')
+        AND due_date > ? AND due_date <= ?
+        ORDER BY due_date ASC
+        LIMIT 10
+    """, [today, week_end]).fetchall()]
+
+    # Meetings this week
+    meetings_this_week = conn.execute("""
+        SELECT COUNT(*) FROM meetings
+        WHERE meeting_date > ? AND meeting_date <= ?
+        AND status NOT IN ('cancelled')
+    """, [today, week_end]).fetchone()[0]
+
+    # Proposal action dates this week (next_action_date)
+    decision_dates = [row_to_dict(row) for row in conn.execute(f"""
+        SELECT project_code, project_name, client_company as client_name, next_action_date as decision_date
+        FROM proposals
+        WHERE next_action_date > ? AND next_action_date <= ?
+        AND {OPEN_PROPOSAL_FILTER}
+    """, [today, week_end]).fetchall()]
+
+    # Deliverables due this week
+    deliverables_due = [row_to_dict(row) for row in conn.execute("""
+        SELECT deliverable_id, name, project_code, due_date, status
+        FROM deliverables
+        WHERE status NOT IN ('approved', 'cancelled')
+        AND due_date > ? AND due_date <= ?
+        ORDER BY due_date ASC
+        LIMIT 5
+    """, [today, week_end]).fetchall()]
+
+    return {
+        "upcoming_deadlines": upcoming_deadlines,
+        "meetings_this_week": meetings_this_week,
+        "decision_dates": decision_dates,
+        "deliverables_due": deliverables_due,
+    }
+
+
+def fetch_commitments(conn, inputs: dict) -> dict:
+    """Overdue commitments, ours and theirs (for follow-up)"""
+    overdue = {}
+    for side in ("our", "their"):
+        overdue[side] = [row_to_dict(row) for row in conn.execute("""
+            SELECT * FROM commitments
+            WHERE commitment_type = ?
+            AND fulfillment_status = 'pending'
+            AND due_date < ?
+            ORDER BY due_date ASC
+            LIMIT 5
+        """, [f"{side}_commitment", inputs["today"]]).fetchall()]
+
+    return {
+        "our_overdue": overdue["our"],
+        "their_overdue": overdue["their"],
+        "our_overdue_count": len(overdue["our"]),
+        "their_overdue_count": len(overdue["their"]),
+    }
+
+
+my_day_sections = SectionComposer(DB_PATH, [
+    Section("tasks", fetch_tasks, timeout=5, ttl=60, tables=("tasks",),
+            default={"today": [], "overdue": [], "today_count": 0, "overdue_count": 0, "total_active": 0}),
+    Section("meetings", fetch_meetings, timeout=5, ttl=60, tables=("meetings",),
+            default={"today": [], "count": 0, "has_virtual": False}),
+    Section("proposals", fetch_proposals, timeout=5, ttl=60, tables=("proposals",),
+            default={"needing_followup": [], "count": 0, "total_our_ball": 0}),
+    Section("suggestions_queue", fetch_suggestions_queue, timeout=5, ttl=30, tables=("ai_suggestions",),
+            default={"top_suggestions": [], "total_pending": 0, "by_type": {}}),
+    Section("week_ahead", fetch_week_ahead, timeout=5, ttl=300,
+            tables=("tasks", "meetings", "proposals", "deliverables"),
+            default={"upcoming_deadlines": [], "meetings_this_week": 0, "decision_dates": [],
+                     "deliverables_due": []}),
+    Section("commitments", fetch_commitments, timeout=5, ttl=120, tables=("commitments",),
+            default={"our_overdue": [], "their_overdue": [], "our_overdue_count": 0,
+                     "their_overdue_count": 0}),
+])
+
+
 # ============================================================================
 # MY DAY ENDPOINT
 # ============================================================================
@@ -69,19 +313,15 @@ async def get_my_day(
     - Proposals needing follow-up
     - AI suggestions to review
     - Week ahead preview
+    - meta: per-section status and latency, and which sections degraded
     """
     try:
-        conn = get_db()
-        cursor = conn.cursor()
         today = get_today()
         now = datetime.now()
 
         # Determine display name
         display_name = user_name or user_id.capitalize()
 
-        # ============================================================
-        # 1. GREETING
-        # ============================================================
         greeting = {
             "text": get_greeting(now.hour),
             "name": display_name,
@@ -90,267 +330,18 @@ async def get_my_day(
             "formatted_date": now.strftime("%B %d, %Y"),
         }
 
-        # ============================================================
-        # 2. TODAY'S TASKS
-        # ============================================================
-
-        # Get tasks due today (assignee='us' or Bill)
-        cursor.execute("""
-            SELECT * FROM tasks
-            WHERE status NOT IN ('completed', 'cancelled')
-            AND due_date = ?
-            AND (COALESCE(assignee, 'us') = 'us' OR assignee = ?)
-            ORDER BY
-                CASE priority
-                    WHEN 'critical' THEN 0
-                    WHEN 'high' THEN 1
-                    WHEN 'medium' THEN 2
-                    ELSE 3
-                END
-            LIMIT 20
-        """, [today, user_id])
-        tasks_today = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Get overdue tasks
-        cursor.execute("""
-            SELECT * FROM tasks
-            WHERE status NOT IN ('completed', 'cancelled')
-            AND due_date < ?
-            AND (COALESCE(assignee, 'us') = 'us' OR assignee = ?)
-            ORDER BY due_date ASC,
-                CASE priority
-                    WHEN 'critical' THEN 0
-                    WHEN 'high' THEN 1
-                    WHEN 'medium' THEN 2
-                    ELSE 3
-                END
-            LIMIT 10
-        """, [today, user_id])
-        tasks_overdue = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Total active tasks count
-        cursor.execute("""
-            SELECT COUNT(*) FROM tasks
-            WHERE status NOT IN ('completed', 'cancelled')
-            AND (COALESCE(assignee, 'us') = 'us' OR assignee = ?)
-        """, [user_id])
-        total_active_tasks = cursor.fetchone()[0]
-
-        tasks = {
-            "today": tasks_today,
-            "overdue": tasks_overdue,
-            "today_count": len(tasks_today),
-            "overdue_count": len(tasks_overdue),
-            "total_active": total_active_tasks,
-        }
-
-        # ============================================================
-        # 3. TODAY'S MEETINGS
-        # ============================================================
-
-        cursor.execute("""
-            SELECT * FROM meetings
-            WHERE meeting_date = ?
-            AND status NOT IN ('cancelled')
-            ORDER BY start_time ASC
-        """, [today])
-        meetings_today = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Check if any meetings have video links
-        has_virtual = any(
-            m.get('location') and
-            ('zoom' in m['location'].lower() or 'teams' in m['location'].lower() or 'meet' in m['location'].lower())
-            for m in meetings_today
-        )
-
-        meetings = {
-            "today": meetings_today,
-            "count": len(meetings_today),
-            "has_virtual": has_virtual,
-        }
-
-        # ============================================================
-        # 4. PROPOSALS NEEDING FOLLOW-UP
-        # ============================================================
-
-        # Get proposals where ball_in_court='us' (we need to act)
-        cursor.execute("""
-            SELECT
-                p.proposal_id, p.project_code, p.project_name, p.client_company as client_name,
-                p.status, p.ball_in_court, p.waiting_for, p.last_contact_date,
-                p.next_action_date as next_followup_date, p.win_probability as probability,
-                CASE
-                    WHEN p.next_action_date < ? THEN 'overdue'
-                    WHEN p.next_action_date = ? THEN 'today'
-                    ELSE 'upcoming'
-                END as urgency,
-                (julianday(?) - julianday(p.last_contact_date)) as days_since_contact
-            FROM proposals p
-            WHERE p.ball_in_court = 'us'
-            AND p.status NOT IN ('won', 'lost', 'cancelled', 'on_hold', 'inactive')
-            ORDER BY
-                CASE WHEN p.next_action_date IS NULL THEN 1 ELSE 0 END,
-                p.next_action_date ASC
-            LIMIT 10
-        """, [today, today, today])
-        proposals_needing_action = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Get count of all "our ball" proposals
-        cursor.execute("""
-            SELECT COUNT(*) FROM proposals
-            WHERE ball_in_court = 'us'
-            AND status NOT IN ('won', 'lost', 'cancelled', 'on_hold', 'inactive')
-        """)
-        total_our_ball = cursor.fetchone()[0]
-
-        proposals = {
-            "needing_followup": proposals_needing_action,
-            "count": len(proposals_needing_action),
-            "total_our_ball": total_our_ball,
-        }
-
-        # ============================================================
-        # 5. AI SUGGESTIONS QUEUE
-        # ============================================================
-
-        # Get top pending suggestions by priority
-        cursor.execute("""
-            SELECT
-                suggestion_id, suggestion_type, title, description,
-                priority, confidence_score, project_code, created_at
-            FROM ai_suggestions
-            WHERE status = 'pending'
-            ORDER BY
-                CASE priority
-                    WHEN 'high' THEN 0
-                    WHEN 'medium' THEN 1
-                    ELSE 2
-                END,
-                confidence_score DESC,
-                created_at DESC
-            LIMIT 5
-        """)
-        top_suggestions = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Total pending count
-        cursor.execute("SELECT COUNT(*) FROM ai_suggestions WHERE status = 'pending'")
-        total_pending = cursor.fetchone()[0]
-
-        # Count by type
-        cursor.execute("""
-            SELECT suggestion_type, COUNT(*) as count
-            FROM ai_suggestions
-            WHERE status = 'pending'
-            GROUP BY suggestion_type
-        """)
-        suggestions_by_type = {row['suggestion_type']: row['count'] for row in cursor.fetchall()}
-
-        suggestions_queue = {
-            "top_suggestions": top_suggestions,
-            "total_pending": total_pending,
-            "by_type": suggestions_by_type,
-        }
-
-        # ============================================================
-        # 6. WEEK AHEAD PREVIEW
-        # ============================================================
-
-        week_end = (date.today() + timedelta(days=7)).isoformat()
-
-        # Upcoming deadlines this week
-        cursor.execute("""
-            SELECT * FROM tasks
-            WHERE status NOT IN ('completed', 'cancelled')
-            AND due_date > ? AND due_date <= ?
-            ORDER BY due_date ASC
-            LIMIT 10
-        """, [today, week_end])
-        upcoming_deadlines = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Meetings this week
-        cursor.execute("""
-            SELECT COUNT(*) FROM meetings
-            WHERE meeting_date > ? AND meeting_date <= ?
-            AND status NOT IN ('cancelled')
-        """, [today, week_end])
-        meetings_this_week = cursor.fetchone()[0]
-
-        # Proposal action dates this week (next_action_date)
-        cursor.execute("""
-            SELECT project_code, project_name, client_company as client_name, next_action_date as decision_date
-            FROM proposals
-            WHERE next_action_date > ? AND next_action_date <= ?
-            AND status NOT IN ('won', 'lost', 'cancelled', 'on_hold', 'inactive')
-        """, [today, week_end])
-        decision_dates = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Deliverables due this week
-        cursor.execute("""
-            SELECT deliverable_id, name, project_code, due_date, status
-            FROM deliverables
-            WHERE status NOT IN ('approved', 'cancelled')
-            AND due_date > ? AND due_date <= ?
-            ORDER BY due_date ASC
-            LIMIT 5
-        """, [today, week_end])
-        deliverables_due = [row_to_dict(row) for row in cursor.fetchall()]
-
-        week_ahead = {
-            "upcoming_deadlines": upcoming_deadlines,
-            "meetings_this_week": meetings_this_week,
-            "decision_dates": decision_dates,
-            "deliverables_due": deliverables_due,
-        }
-
-        # ============================================================
-        # 7. COMMITMENTS (NEW)
-        # ============================================================
-
-        # Our overdue commitments
-        cursor.execute("""
-            SELECT * FROM commitments
-            WHERE commitment_type = 'our_commitment'
-            AND fulfillment_status = 'pending'
-            AND due_date < ?
-            ORDER BY due_date ASC
-            LIMIT 5
-        """, [today])
-        our_overdue = [row_to_dict(row) for row in cursor.fetchall()]
-
-        # Their overdue commitments (for follow-up)
-        cursor.execute("""
-            SELECT * FROM commitments
-            WHERE commitment_type = 'their_commitment'
-            AND fulfillment_status = 'pending'
-            AND due_date < ?
-            ORDER BY due_date ASC
-            LIMIT 5
-        """, [today])
-        their_overdue = [row_to_dict(row) for row in cursor.fetchall()]
-
-        commitments = {
-            "our_overdue": our_overdue,
-            "their_overdue": their_overdue,
-            "our_overdue_count": len(our_overdue),
-            "their_overdue_count": len(their_overdue),
-        }
-
-        conn.close()
-
-        # ============================================================
-        # BUILD RESPONSE
-        # ============================================================
+        sections, meta = await my_day_sections.compose({
+            "today": today,
+            "week_end": (date.today() + timedelta(days=7)).isoformat(),
+            "user_id": user_id,
+        })
 
         return {
             "success": True,
             "greeting": greeting,
-            "tasks": tasks,
-            "meetings": meetings,
-            "proposals": proposals,
-            "suggestions_queue": suggestions_queue,
-            "week_ahead": week_ahead,
-            "commitments": commitments,
+            **sections,
             "generated_at": datetime.now().isoformat(),
+            "meta": meta,
         }
 
     except Exception as e:
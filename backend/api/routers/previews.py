@@ -11,14 +11,15 @@ import sqlite3
 import json
 from datetime import datetime, timedelta
 
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
+from api.services import file_service
 
 router = APIRouter(prefix="/api/preview", tags=["previews"])
 
 
 def get_db():
     """Get database connection."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -217,8 +218,9 @@ async def get_contact_preview(contact_id: int):
                 c.company,
                 c.role,
                 c.is_primary_contact as is_primary,
-                (SELECT COUNT(*) FROM emails e WHERE e.sender_email = c.email OR e.to_address LIKE '%' || c.email || '%') as email_count,
-                (SELECT MAX(date) FROM emails e WHERE e.sender_email = c.email) as last_contact_date
+                (SELECT COUNT(DISTINCT ep.email_id) FROM email_participants ep
+                 WHERE ep.address = LOWER(TRIM(c.email))) as email_count,
+                (SELECT MAX(e.date) FROM emails e WHERE e.sender_address = LOWER(TRIM(c.email))) as last_contact_date
             FROM contacts c
             WHERE c.contact_id = ?
             LIMIT 1
@@ -326,3 +328,93 @@ async def get_email_preview(email_id: int):
         }
     finally:
         conn.close()
+
+
+# =============================================================================
+# ATTACHMENT / DOCUMENT PREVIEW
+# =============================================================================
+
+def _blob_preview(owner_table: str, owner_id: int, path: Optional[str]) -> dict:
+    """Content fields shared by attachment and document previews"""
+    store = file_service.blob_store
+    info = store.blob_info(owner_table, owner_id)
+    return {
+        "available": store.resolve_owner(owner_table, owner_id, path) is not None,
+        "content_hash": info["sha256"] if info else None,
+        # Other emails/files carrying the identical file
+        "shared_with": max((info["ref_count"] if info else 1) - 1, 0),
+    }
+
+
+@router.get("/attachment/{attachment_id}")
+async def get_attachment_preview(attachment_id: int):
+    """
+    Get lightweight attachment preview for hover cards.
+    Returns: filename, type, size, email subject, availability, duplicates
+    """
+    conn = get_db()
+    try:
+        row = conn.execute("""
+            SELECT a.attachment_id, a.filename, a.file_type, a.file_size, a.mime_type,
+                   a.category, a.stored_path, a.email_id, e.subject, e.date
+            FROM attachments a
+            LEFT JOIN emails e ON a.email_id = e.email_id
+            WHERE a.attachment_id = ?
+        """, (attachment_id,)).fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Attachment not found: {attachment_id}")
+
+    return {
+        "success": True,
+        "preview": {
+            "attachment_id": row["attachment_id"],
+            "filename": row["filename"],
+            "file_type": row["file_type"] or "",
+            "file_size": int(row["file_size"] or 0),
+            "mime_type": row["mime_type"] or "",
+            "category": row["category"] or "",
+            "email_id": row["email_id"],
+            "email_subject": row["subject"] or "(No Subject)",
+            "email_date": row["date"] or "",
+            **_blob_preview("attachments", attachment_id, row["stored_path"]),
+        }
+    }
+
+
+@router.get("/document/{document_id}")
+async def get_document_preview(document_id: int):
+    """
+    Get lightweight document preview for hover cards.
+    Returns: name, type, project, pages, text excerpt, availability
+    """
+    conn = get_db()
+    try:
+        row = conn.execute("""
+            SELECT document_id, file_name, file_path, document_type, file_size,
+                   project_code, page_count, modified_date, substr(text_content, 1, 300) AS excerpt
+            FROM documents
+            WHERE document_id = ?
+        """, (document_id,)).fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
+
+    return {
+        "success": True,
+        "preview": {
+            "document_id": row["document_id"],
+            "file_name": row["file_name"],
+            "document_type": row["document_type"] or "",
+            "file_size": int(row["file_size"] or 0),
+            "project_code": row["project_code"],
+            "page_count": row["page_count"],
+            "modified_date": row["modified_date"] or "",
+            "excerpt": row["excerpt"] or "",
+            **_blob_preview("documents", document_id, row["file_path"]),
+        }
+    }
@@ -21,13 +21,16 @@ from api.services import (
     proposal_service,
     financial_service,
     contract_service,
+    timeline_service,
 )
 from api.dependencies import (
     DB_PATH,
+    db_connect,
     get_db,
     get_current_user,
     get_current_user_optional,
     get_user_access_level,
+    off_loop,
 )
 from api.models import ProjectCreateRequest
 from api.helpers import list_response, item_response, action_response
@@ -98,7 +101,8 @@ def can_access_project(user: dict, project_code: str, db: sqlite3.Connection) ->
 # ============================================================================
 
 @router.get("/projects/active")
-async def get_active_projects(
+@off_loop
+def get_active_projects(
     user: dict = Depends(get_current_user_optional),
     db: sqlite3.Connection = Depends(get_db)
 ):
@@ -195,10 +199,11 @@ async def get_active_projects(
 
 
 @router.get("/projects/linking-list")
-async def get_projects_for_linking():
+@off_loop
+def get_projects_for_linking():
     """Get simplified project list for email linking dropdowns"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -230,10 +235,11 @@ async def get_projects_for_linking():
 # ============================================================================
 
 @router.get("/projects/{project_code}")
-async def get_project(project_code: str):
+@off_loop
+def get_project(project_code: str):
     """Get project details by project code"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -255,10 +261,11 @@ async def get_project(project_code: str):
 
 
 @router.get("/projects/{project_code}/financial-summary")
-async def get_project_financial_summary(project_code: str):
+@off_loop
+def get_project_financial_summary(project_code: str):
     """Get financial summary for a project"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -360,7 +367,8 @@ async def get_project_financial_summary(project_code: str):
 # ============================================================================
 
 @router.get("/projects/{project_code}/contacts")
-async def get_project_contacts(project_code: str):
+@off_loop
+def get_project_contacts(project_code: str):
     """
     Get contacts associated with a project.
 
@@ -369,7 +377,7 @@ async def get_project_contacts(project_code: str):
     2. project_contact_links (manually linked or AI suggested)
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -431,7 +439,8 @@ async def get_project_contacts(project_code: str):
 # ============================================================================
 
 @router.get("/projects/{project_code}/scope")
-async def get_project_scope(project_code: str):
+@off_loop
+def get_project_scope(project_code: str):
     """Get project scope details"""
     try:
         result = contract_service.get_scope(project_code)
@@ -445,7 +454,8 @@ async def get_project_scope(project_code: str):
 
 
 @router.get("/projects/{project_code}/contract")
-async def get_project_contract(project_code: str):
+@off_loop
+def get_project_contract(project_code: str):
     """Get project contract details"""
     try:
         result = contract_service.get_contract(project_code)
@@ -459,7 +469,8 @@ async def get_project_contract(project_code: str):
 
 
 @router.get("/projects/{project_code}/fee-breakdown")
-async def get_project_fee_breakdown(project_code: str):
+@off_loop
+def get_project_fee_breakdown(project_code: str):
     """Get fee breakdown for a project. Returns standardized list response."""
     try:
         result = financial_service.get_fee_breakdown(project_code)
@@ -473,14 +484,15 @@ async def get_project_fee_breakdown(project_code: str):
 
 
 @router.get("/projects/{project_code}/phases")
-async def get_project_phases(project_code: str):
+@off_loop
+def get_project_phases(project_code: str):
     """
     Get project phases with status for phase progress visualization.
 
     Returns phases grouped by discipline with completion status.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -571,10 +583,11 @@ async def get_project_phases(project_code: str):
 
 
 @router.get("/projects/{project_code}/timeline")
-async def get_project_timeline(project_code: str):
+@off_loop
+def get_project_timeline(project_code: str):
     """Get project timeline - key dates and milestones. Returns standardized list response."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -652,10 +665,11 @@ async def get_project_timeline(project_code: str):
 
 
 @router.get("/projects/{project_code}/hierarchy")
-async def get_project_hierarchy(project_code: str):
+@off_loop
+def get_project_hierarchy(project_code: str):
     """Get project financial hierarchy: disciplines → phases → invoices"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -821,10 +835,11 @@ def _calculate_phase_status(start: str, deadline: str, actual: str) -> str:
 
 
 @router.get("/projects/{project_code}/phase-timeline")
-async def get_project_phase_timeline(project_code: str):
+@off_loop
+def get_project_phase_timeline(project_code: str):
     """Get phase timeline for a project (Issue #242)."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("""
@@ -872,10 +887,11 @@ async def get_project_phase_timeline(project_code: str):
 
 
 @router.patch("/projects/{project_code}/phase-timeline")
-async def update_project_phase_timeline(project_code: str, request: PhaseTimelineUpdate):
+@off_loop
+def update_project_phase_timeline(project_code: str, request: PhaseTimelineUpdate):
     """Update phase timeline fields for a project (Issue #242)."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
         cursor.execute("SELECT project_id FROM projects WHERE project_code = ?", (project_code,))
         if not cursor.fetchone():
@@ -911,13 +927,14 @@ async def update_project_phase_timeline(project_code: str, request: PhaseTimelin
 
 
 @router.get("/phase-fees")
-async def get_all_phase_fees(
+@off_loop
+def get_all_phase_fees(
     project_code: Optional[str] = None,
     scope: Optional[str] = None
 ):
     """Get all phase fee breakdowns with optional filtering"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -948,10 +965,11 @@ async def get_all_phase_fees(
 
 
 @router.post("/phase-fees")
-async def create_phase_fee(request: CreatePhaseFeeRequest):
+@off_loop
+def create_phase_fee(request: CreatePhaseFeeRequest):
     """Create a new phase fee breakdown"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Generate breakdown_id
@@ -992,10 +1010,11 @@ async def create_phase_fee(request: CreatePhaseFeeRequest):
 
 
 @router.put("/phase-fees/{breakdown_id}")
-async def update_phase_fee(breakdown_id: str, request: UpdatePhaseFeeRequest):
+@off_loop
+def update_phase_fee(breakdown_id: str, request: UpdatePhaseFeeRequest):
     """Update a phase fee breakdown"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         updates = []
@@ -1034,10 +1053,11 @@ async def update_phase_fee(breakdown_id: str, request: UpdatePhaseFeeRequest):
 
 
 @router.delete("/phase-fees/{breakdown_id}")
-async def delete_phase_fee(breakdown_id: str):
+@off_loop
+def delete_phase_fee(breakdown_id: str):
     """Delete a phase fee breakdown"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM project_fee_breakdown WHERE breakdown_id = ?", (breakdown_id,))
@@ -1060,242 +1080,50 @@ async def delete_phase_fee(breakdown_id: str):
 # ============================================================================
 
 @router.get("/projects/{project_code}/unified-timeline")
-async def get_unified_timeline(
+@off_loop
+def get_unified_timeline(
     project_code: str,
     limit: int = Query(100, ge=1, le=500),
     item_types: Optional[str] = Query(None, description="Comma-separated types: email,transcript,invoice,rfi"),
-    person: Optional[str] = Query(None, description="Filter by person (sender email or name)"),
+    person: Optional[str] = Query(None, description="Filter by person (email address, @domain or name)"),
     date_from: Optional[str] = Query(None, description="Start date filter (YYYY-MM-DD)"),
-    date_to: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)")
+    date_to: Optional[str] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """Get unified timeline combining emails, transcripts, invoices, and RFIs for a project.
 
-    Returns chronological list with each item having:
+    Returns one page, newest first, with each item having:
     - type: email, transcript, invoice, rfi
     - date: ISO date string
     - title: Subject/title of the item
     - summary: Brief description
     - id: Item ID for linking
     - email_category: For emails, internal/client/external
+
+    Pass `next_cursor` back as `cursor` for the next (older) page; it is
+    null on the last page.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        # First get project_id from project_code
-        cursor.execute("SELECT project_id FROM projects WHERE project_code = ?", (project_code,))
-        project_row = cursor.fetchone()
-
-        if not project_row:
-            conn.close()
-            raise HTTPException(status_code=404, detail=f"Project {project_code} not found")
-
-        project_id = project_row['project_id']
-
-        # Parse item_types filter
         type_filter = None
         if item_types:
             type_filter = [t.strip().lower() for t in item_types.split(',')]
 
-        timeline_items = []
-
-        # Bensley internal domains
-        internal_domains = ['bensley.com', 'bensley.co.id']
-
-        # Get emails (from email_project_links)
-        if not type_filter or 'email' in type_filter:
-            # Build query with optional filters
-            email_query = """
-                SELECT
-                    e.email_id as id,
-                    'email' as type,
-                    e.date,
-                    e.subject as title,
-                    COALESCE(e.snippet, SUBSTR(e.body_full, 1, 200)) as summary,
-                    e.sender_email as sender,
-                    e.sender_name,
-                    e.recipient_emails,
-                    ec.category,
-                    e.folder,
-                    epl.confidence,
-                    epl.link_method
-                FROM emails e
-                JOIN email_project_links epl ON e.email_id = epl.email_id
-                LEFT JOIN email_content ec ON e.email_id = ec.email_id
-                WHERE epl.project_id = ?
-            """
-            params = [project_id]
-
-            # Add person filter
-            if person:
-                email_query += " AND (e.sender_email LIKE ? OR e.sender_name LIKE ? OR e.recipient_emails LIKE ?)"
-                person_pattern = f"%{person}%"
-                params.extend([person_pattern, person_pattern, person_pattern])
-
-            # Add date filters
-            if date_from:
-                email_query += " AND e.date >= ?"
-                params.append(date_from)
-            if date_to:
-                email_query += " AND e.date <= ?"
-                params.append(date_to + " 23:59:59")
-
-            email_query += " ORDER BY e.date DESC LIMIT ?"
-            params.append(limit)
-
-            cursor.execute(email_query, params)
-
-            for row in cursor.fetchall():
-                item = dict(row)
-                item['date'] = item.get('date', '')
-
-                # Determine email_category (internal/external)
-                sender = (item.get('sender') or '').lower()
-                is_internal = any(domain in sender for domain in internal_domains)
-
-                # Check category field for more context
-                category = item.get('category', '') or ''
-
-                if is_internal or category == 'internal':
-                    item['email_category'] = 'internal'
-                elif category in ['contract', 'design', 'financial', 'meeting', 'administrative']:
-                    # These are likely project-related client communications
-                    item['email_category'] = 'client'
-                else:
-                    item['email_category'] = 'external'
-
-                # Determine direction
-                if item.get('folder') == 'SENT' or item.get('folder') == 'Sent':
-                    item['direction'] = 'sent'
-                else:
-                    item['direction'] = 'received'
-
-                timeline_items.append(item)
-
-        # Get transcripts
-        if not type_filter or 'transcript' in type_filter:
-            cursor.execute("""
-                SELECT
-                    id,
-                    'transcript' as type,
-                    COALESCE(meeting_date, recorded_date, created_at) as date,
-                    COALESCE(meeting_title, audio_filename, 'Meeting Transcript') as title,
-                    COALESCE(summary, 'No summary available') as summary,
-                    participants,
-                    duration_seconds
-                FROM meeting_transcripts
-                WHERE project_id = ? OR detected_project_code = ?
-                ORDER BY COALESCE(meeting_date, recorded_date, created_at) DESC
-                LIMIT ?
-            """, (project_id, project_code, limit))
-
-            for row in cursor.fetchall():
-                item = dict(row)
-                timeline_items.append(item)
-
-        # Get invoices
-        if not type_filter or 'invoice' in type_filter:
-            cursor.execute("""
-                SELECT
-                    invoice_id as id,
-                    'invoice' as type,
-                    COALESCE(invoice_date, '') as date,
-                    invoice_number as title,
-                    printf('$%.2f - %s', invoice_amount, COALESCE(status, 'unknown')) as summary,
-                    invoice_amount,
-                    payment_amount,
-                    status
-                FROM invoices
-                WHERE project_id = ?
-                ORDER BY invoice_date DESC
-                LIMIT ?
-            """, (project_id, limit))
-
-            for row in cursor.fetchall():
-                item = dict(row)
-                timeline_items.append(item)
-
-        # Get RFIs (if table exists)
-        if not type_filter or 'rfi' in type_filter:
-            try:
-                cursor.execute("""
-                    SELECT
-                        rfi_id as id,
-                        'rfi' as type,
-                        COALESCE(created_at, '') as date,
-                        COALESCE(rfi_number, 'RFI') || ': ' || COALESCE(subject, 'No subject') as title,
-                        COALESCE(description, 'No description') as summary,
-                        status,
-                        priority
-                    FROM rfis
-                    WHERE project_id = ?
-                    ORDER BY created_at DESC
-                    LIMIT ?
-                """, (project_id, limit))
-
-                for row in cursor.fetchall():
-                    item = dict(row)
-                    timeline_items.append(item)
-            except sqlite3.OperationalError:
-                # RFIs table might not exist or have different schema
-                pass
-
-        conn.close()
-
-        # Sort all items by date descending
-        def get_date_key(item):
-            date_str = item.get('date', '')
-            if not date_str:
-                return ''
-            return date_str
-
-        timeline_items.sort(key=get_date_key, reverse=True)
-
-        # Limit to requested size
-        timeline_items = timeline_items[:limit]
-
-        # Extract unique people (for filter dropdown)
-        people_set = set()
-        for item in timeline_items:
-            if item.get('type') == 'email':
-                sender = item.get('sender_name') or item.get('sender')
-                if sender:
-                    # Clean up sender - remove email-style formatting
-                    sender_clean = sender.split('<')[0].strip().strip('"')
-                    if sender_clean and '@' not in sender_clean:
-                        people_set.add(sender_clean)
-            elif item.get('type') == 'transcript':
-                participants = item.get('participants', '')
-                if participants:
-                    for p in participants.split(','):
-                        p_clean = p.strip()
-                        if p_clean:
-                            people_set.add(p_clean)
-
-        unique_people = sorted(list(people_set))
-
-        # Count email categories
-        email_category_counts = {
-            "internal": sum(1 for i in timeline_items if i.get('type') == 'email' and i.get('email_category') == 'internal'),
-            "client": sum(1 for i in timeline_items if i.get('type') == 'email' and i.get('email_category') == 'client'),
-            "external": sum(1 for i in timeline_items if i.get('type') == 'email' and i.get('email_category') == 'external'),
-        }
+        try:
+            page = timeline_service.get_project_timeline(
+                project_code,
+                limit=limit,
+                item_types=type_filter,
+                person=person,
+                date_from=date_from,
+                date_to=date_to,
+                cursor=cursor,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        return {
-            "success": True,
-            "project_code": project_code,
-            "timeline": timeline_items,
-            "total": len(timeline_items),
-            "item_counts": {
-                "email": sum(1 for i in timeline_items if i.get('type') == 'email'),
-                "transcript": sum(1 for i in timeline_items if i.get('type') == 'transcript'),
-                "invoice": sum(1 for i in timeline_items if i.get('type') == 'invoice'),
-                "rfi": sum(1 for i in timeline_items if i.get('type') == 'rfi'),
-            },
-            "email_category_counts": email_category_counts,
-            "unique_people": unique_people,
-        }
+        if page is None:
+            raise HTTPException(status_code=404, detail=f"Project {project_code} not found")
+        return page
 
     except HTTPException:
         raise
@@ -1307,7 +1135,8 @@ async def get_unified_timeline(
 # ============================================================================
 
 @router.get("/projects/{project_code}/team")
-async def get_project_team(project_code: str):
+@off_loop
+def get_project_team(project_code: str):
     """
     Get team assignments for a project from contact_project_mappings.
     
@@ -1317,7 +1146,7 @@ async def get_project_team(project_code: str):
     Example: GET /api/projects/25%20BK-033/team
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
@@ -1380,7 +1209,8 @@ async def get_project_team(project_code: str):
 
 
 @router.get("/projects/{project_code}/schedule")
-async def get_project_schedule(project_code: str, days: int = 30):
+@off_loop
+def get_project_schedule(project_code: str, days: int = 30):
     """
     Get schedule entries for a project showing who worked when.
 
@@ -1390,7 +1220,7 @@ async def get_project_schedule(project_code: str, days: int = 30):
     Example: GET /api/projects/25%20BK-033/schedule?days=365
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1447,10 +1277,11 @@ async def get_project_schedule(project_code: str, days: int = 30):
 
 
 @router.get("/projects/{project_code}/schedule-team")
-async def get_project_schedule_team(project_code: str):
+@off_loop
+def get_project_schedule_team(project_code: str):
     """Get Bensley staff assigned to project from schedule_entries (internal team, not clients)."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("""
@@ -1485,14 +1316,15 @@ PROJECT_ROLES = [
 
 
 @router.get("/staff")
-async def get_staff_list():
+@off_loop
+def get_staff_list():
     """
     Get list of active Bensley staff for team assignment dropdown.
 
     Returns all active staff members sorted by name.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1537,14 +1369,15 @@ async def get_staff_list():
 
 
 @router.get("/projects/{project_code}/assignments")
-async def get_project_assignments(project_code: str):
+@off_loop
+def get_project_assignments(project_code: str):
     """
     Get explicit team assignments for a project from project_team table.
 
     Returns staff members assigned to this project with their roles.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1611,14 +1444,15 @@ class AddTeamMemberRequest(BaseModel):
 
 
 @router.post("/projects/{project_code}/assignments")
-async def add_project_assignment(project_code: str, request: AddTeamMemberRequest):
+@off_loop
+def add_project_assignment(project_code: str, request: AddTeamMemberRequest):
     """
     Add a staff member to a project with a role.
 
     Creates a new entry in project_team table.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1670,7 +1504,8 @@ class UpdateTeamMemberRequest(BaseModel):
 
 
 @router.put("/projects/{project_code}/assignments/{assignment_id}")
-async def update_project_assignment(
+@off_loop
+def update_project_assignment(
     project_code: str,
     assignment_id: int,
     request: UpdateTeamMemberRequest
@@ -1679,7 +1514,7 @@ async def update_project_assignment(
     Update a team member's role on a project.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Build update query dynamically
@@ -1726,14 +1561,15 @@ async def update_project_assignment(
 
 
 @router.delete("/projects/{project_code}/assignments/{assignment_id}")
-async def remove_project_assignment(project_code: str, assignment_id: int):
+@off_loop
+def remove_project_assignment(project_code: str, assignment_id: int):
     """
     Remove a team member from a project.
 
     Sets is_active = 0 (soft delete).
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -1786,14 +1622,15 @@ class DailyWorkReview(BaseModel):
 
 
 @router.post("/projects/{project_code}/daily-work")
-async def submit_daily_work(project_code: str, request: DailyWorkSubmission):
+@off_loop
+def submit_daily_work(project_code: str, request: DailyWorkSubmission):
     """
     Submit daily work for a project.
 
     Junior architects use this to log their daily work with optional file attachments.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1839,7 +1676,8 @@ async def submit_daily_work(project_code: str, request: DailyWorkSubmission):
 
 
 @router.get("/projects/{project_code}/daily-work")
-async def get_project_daily_work(
+@off_loop
+def get_project_daily_work(
     project_code: str,
     status: Optional[str] = Query(None, description="Filter by review_status"),
     staff_id: Optional[int] = Query(None, description="Filter by staff"),
@@ -1853,7 +1691,7 @@ async def get_project_daily_work(
     Supports filtering by status, staff, and date range.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1931,10 +1769,11 @@ async def get_project_daily_work(
 
 
 @router.get("/daily-work/{daily_work_id}")
-async def get_daily_work_detail(daily_work_id: int):
+@off_loop
+def get_daily_work_detail(daily_work_id: int):
     """Get a single daily work submission with full details."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1962,14 +1801,15 @@ async def get_daily_work_detail(daily_work_id: int):
 
 
 @router.patch("/daily-work/{daily_work_id}/review")
-async def review_daily_work(daily_work_id: int, request: DailyWorkReview):
+@off_loop
+def review_daily_work(daily_work_id: int, request: DailyWorkReview):
     """
     Add review to daily work submission.
 
     Used by Bill/Brian to provide feedback on junior architect work.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         # Verify submission exists
@@ -2009,10 +1849,11 @@ async def review_daily_work(daily_work_id: int, request: DailyWorkReview):
 
 
 @router.patch("/daily-work/{daily_work_id}")
-async def update_daily_work(daily_work_id: int, request: DailyWorkSubmission):
+@off_loop
+def update_daily_work(daily_work_id: int, request: DailyWorkSubmission):
     """Update a daily work submission (before review)."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         import json
@@ -2050,10 +1891,11 @@ async def update_daily_work(daily_work_id: int, request: DailyWorkSubmission):
 
 
 @router.delete("/daily-work/{daily_work_id}")
-async def delete_daily_work(daily_work_id: int):
+@off_loop
+def delete_daily_work(daily_work_id: int):
     """Delete a daily work submission."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM daily_work WHERE daily_work_id = ?", (daily_work_id,))
@@ -2078,7 +1920,8 @@ async def delete_daily_work(daily_work_id: int):
 # ============================================================================
 
 @router.get("/projects/{project_code}/progress")
-async def get_project_progress(project_code: str):
+@off_loop
+def get_project_progress(project_code: str):
     """
     Get comprehensive project progress including per-phase breakdown.
 
@@ -2109,7 +1952,8 @@ class UpdatePhaseProgressRequest(BaseModel):
 
 
 @router.patch("/projects/{project_code}/phases/{phase_id}/progress")
-async def update_phase_progress(
+@off_loop
+def update_phase_progress(
     project_code: str,
     phase_id: int,
     request: UpdatePhaseProgressRequest
@@ -2144,7 +1988,8 @@ async def update_phase_progress(
 
 
 @router.get("/projects/progress-summary")
-async def get_projects_progress_summary(
+@off_loop
+def get_projects_progress_summary(
     project_codes: Optional[str] = Query(None, description="Comma-separated project codes")
 ):
     """
@@ -2178,7 +2023,8 @@ async def get_projects_progress_summary(
 # ============================================================================
 
 @router.get("/projects/{project_code}/health")
-async def get_project_health(project_code: str):
+@off_loop
+def get_project_health(project_code: str):
     """
     Calculate and return project health score.
 
@@ -2195,7 +2041,7 @@ async def get_project_health(project_code: str):
     - metrics: Breakdown by category
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -21,13 +21,11 @@ import logging
 
 from api.rate_limit import limiter
 from api.services import proposal_service, proposal_tracker_service
-from api.dependencies import DB_PATH, get_current_user
-from services.proposal_detail_story_service import ProposalDetailStoryService
+from api.services import proposal_detail_story_service as story_service
+from api.dependencies import DB_PATH, get_current_user, db_connect
 
 logger = logging.getLogger(__name__)
 
-# Initialize story service
-story_service = ProposalDetailStoryService(DB_PATH)
 from api.models import CreateProposalRequest
 from api.helpers import list_response, item_response, action_response
 
@@ -46,6 +44,7 @@ async def list_proposals(
     per_page: int = Query(20, ge=1, le=100),
     sort_by: str = Query("health_score", regex="^(proposal_id|project_code|project_title|status|health_score|days_since_contact|is_active_project|created_at|updated_at)$"),
     sort_order: str = Query("ASC", regex="^(ASC|DESC)$"),
+    cursor: Optional[str] = Query(None, description="meta.next_cursor of the previous page"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -59,14 +58,17 @@ async def list_proposals(
             page=page,
             per_page=per_page,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor
         )
         # Standardize response format (Issue #126)
         return list_response(
             result.get('items', []),
             total=result.get('total', 0),
             page=result.get('page', page),
-            per_page=result.get('per_page', per_page)
+            per_page=result.get('per_page', per_page),
+            has_more=result.get('has_more', False),
+            next_cursor=result.get('next_cursor')
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail="Invalid request")
@@ -624,7 +626,7 @@ async def get_proposal_timeline(
     Example: GET /api/proposals/25%20BK-033/timeline
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -749,7 +751,7 @@ async def get_proposal_conversation(project_code: str, current_user: dict = Depe
     Example: GET /api/proposals/25%20BK-033/conversation
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -829,7 +831,7 @@ async def get_proposal_stakeholders(project_code: str, current_user: dict = Depe
     Example: GET /api/proposals/25%20BK-033/stakeholders
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -921,7 +923,7 @@ async def get_proposal_stakeholders(project_code: str, current_user: dict = Depe
 async def get_proposal_documents(project_code: str, current_user: dict = Depends(get_current_user)):
     """Get documents/attachments for a proposal. Requires authentication."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -980,7 +982,7 @@ async def get_proposal_documents(project_code: str, current_user: dict = Depends
 async def get_proposal_briefing(project_code: str, current_user: dict = Depends(get_current_user)):
     """Get briefing data for a proposal including client info, financials, and milestones. Requires authentication."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1095,7 +1097,7 @@ async def get_proposal_story(project_code: str, current_user: dict = Depends(get
     Refactored: Logic moved to ProposalDetailStoryService (#117)
     """
     try:
-        return story_service.get_story(project_code)
+        return await story_service.get_story(project_code)
     except ValueError as e:
         raise HTTPException(status_code=404, detail="Invalid request")
     except Exception as e:
@@ -1108,7 +1110,7 @@ async def get_proposal_story(project_code: str, current_user: dict = Depends(get
 async def get_proposals_summary(current_user: dict = Depends(get_current_user)):
     """Get proposals summary for dashboard - pipeline value, activity, meetings, etc. Requires authentication."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1283,7 +1285,7 @@ async def chat_about_proposal(
     is_correction_request = any(kw in question.lower() for kw in correction_keywords)
 
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1469,7 +1471,7 @@ Guidelines:
                 # Create suggestion if we have enough data
                 if correction_data.get('type') and correction_data.get('new'):
                     try:
-                        suggestion_conn = sqlite3.connect(DB_PATH)
+                        suggestion_conn = db_connect()
                         suggestion_cursor = suggestion_conn.cursor()
 
                         # Build suggestion title and description
@@ -171,7 +171,7 @@ async def get_query_examples():
 
 @router.get("/query/stats")
 async def get_query_stats():
-    """Get query usage statistics"""
+    """Get query usage statistics, answer-cache hit rates/savings and governor counters"""
     try:
         stats = query_service.get_stats()
         return item_response(stats)
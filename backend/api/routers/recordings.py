@@ -12,7 +12,7 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Form
 from typing import Optional
 import json
 
-from api.dependencies import DB_PATH
+from api.dependencies import DB_PATH, db_connect
 
 router = APIRouter(prefix="/api/recordings", tags=["recordings"])
 
@@ -98,7 +98,7 @@ async def get_recording_status(transcript_id: int):
     """Check processing status of a recording."""
     import sqlite3
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
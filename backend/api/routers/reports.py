@@ -19,13 +19,11 @@ from pathlib import Path
 backend_path = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_path))
 
-from api.dependencies import DB_PATH
-from services.weekly_report_service import WeeklyReportService
+from api.dependencies import db_connect
+from api.services import weekly_report_service as report_service
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
-report_service = WeeklyReportService(DB_PATH)
-
 
 @router.get("/weekly-proposals")
 async def list_weekly_reports(
@@ -38,7 +36,7 @@ async def list_weekly_reports(
     Returns paginated list of historical reports with summary metrics.
     """
     import sqlite3
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
@@ -84,7 +82,7 @@ async def get_latest_report():
     Returns complete report including all metrics and HTML preview.
     """
     import sqlite3
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
@@ -119,7 +117,7 @@ async def get_report_by_id(report_id: int):
     Get a specific weekly report by ID.
     """
     import sqlite3
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     cursor = conn.cursor()
 
@@ -157,7 +155,6 @@ async def generate_and_archive_report(
     This creates a report for the specified period (or last week by default),
     stores it in the database for history, and returns the full report.
     """
-    import sqlite3
 
     # Generate report using existing service
     report = report_service.generate_report(start_date, end_date)
@@ -169,7 +166,7 @@ async def generate_and_archive_report(
     attention = report.get('attention_required', {})
 
     # Store in database
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     cursor = conn.cursor()
 
     cursor.execute("""
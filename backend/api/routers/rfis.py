@@ -24,7 +24,7 @@ from pydantic import BaseModel, Field
 from datetime import date
 import sqlite3
 
-from api.dependencies import DB_PATH
+from api.dependencies import DB_PATH, db_connect
 from api.services import rfi_service
 from api.helpers import list_response, item_response, action_response
 
@@ -116,7 +116,7 @@ async def list_rfis(
             mapped = map_rfis_for_frontend(rfis)
             return {"success": True, "total": len(mapped), "rfis": mapped}
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -20,16 +20,11 @@ from pathlib import Path
 backend_path = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_path))
 
-from api.dependencies import DB_PATH
-from services.proposal_story_service import ProposalStoryService
-from services.activity_extractor import ActivityExtractor
+from api.dependencies import db_connect
+from api.services import proposal_story_service as story_service, activity_extractor as extractor
 
 router = APIRouter(prefix="/api/story", tags=["story"])
 
-# Initialize services with correct DB path
-story_service = ProposalStoryService(DB_PATH)
-extractor = ActivityExtractor(DB_PATH)
-
 
 class ExtractionResponse(BaseModel):
     success: bool
@@ -168,9 +163,7 @@ def _run_batch_extraction(email_limit: int, transcript_limit: int) -> dict:
 @router.get("/stats")
 async def get_extraction_stats():
     """Get statistics on extraction coverage."""
-    import sqlite3
-
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = db_connect()
     cursor = conn.cursor()
 
     # Count linked emails
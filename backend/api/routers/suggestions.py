@@ -18,7 +18,8 @@ import json
 from api.services import admin_service, ai_learning_service, email_orchestrator
 from backend.services.suggestion_handlers import HandlerRegistry, ChangePreview
 from backend.services.contact_context_service import get_contact_context_service
-from api.dependencies import DB_PATH
+from backend.services.pagination import count_total, keyset_page
+from api.dependencies import DB_PATH, db_connect, off_loop
 from api.models import (
     SuggestionApproveRequest, SuggestionRejectRequest, BulkApproveRequest,
     BulkRejectRequest, BulkApproveByIdsRequest, SuggestionRejectWithCorrectionRequest,
@@ -34,23 +35,21 @@ router = APIRouter(prefix="/api", tags=["suggestions"])
 # ============================================================================
 
 @router.get("/suggestions")
-async def get_suggestions(
+@off_loop
+def get_suggestions(
     status: Optional[str] = Query(None, description="Filter by status: pending, approved, rejected"),
     suggestion_type: Optional[str] = Query(None, description="Filter by type"),
     field_name: Optional[str] = Query(None, description="Filter by field_name: new_contact, project_alias, etc."),
     min_confidence: Optional[float] = Query(None, ge=0, le=1),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
     # Also support page/per_page for backward compat
     page: int = Query(None, ge=1),
     per_page: int = Query(None, ge=1, le=200)
 ):
-    """Get AI suggestions with optional filtering"""
+    """Get AI suggestions with optional filtering, highest confidence first"""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
         # Handle page/per_page if provided (backward compat)
         if page is not None and per_page is not None:
             offset = (page - 1) * per_page
@@ -61,45 +60,49 @@ async def get_suggestions(
         params = []
 
         if status:
-            where_clauses.append("status = ?")
+            where_clauses.append("s.status = ?")
             params.append(status)
         else:
             # Default to pending
-            where_clauses.append("status = 'pending'")
+            where_clauses.append("s.status = 'pending'")
 
         # Filter by suggestion_type (field_name is alias for backward compat)
         filter_type = field_name or suggestion_type
         if filter_type:
-            where_clauses.append("suggestion_type = ?")
+            where_clauses.append("s.suggestion_type = ?")
             params.append(filter_type)
 
         if min_confidence is not None:
-            where_clauses.append("confidence_score >= ?")
+            where_clauses.append("s.confidence_score >= ?")
             params.append(min_confidence)
 
-        where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
+        where_sql = " AND ".join(where_clauses)
 
-        # Get total count
-        cursor.execute(f"SELECT COUNT(*) FROM ai_suggestions WHERE {where_sql}", params)
-        total = cursor.fetchone()[0]
-
-        # Get paginated results with email context for faster review
-        cursor.execute(f"""
-            SELECT
-                s.*,
-                e.subject as email_subject,
-                e.sender_name as email_sender_name,
-                e.sender_email as email_sender,
-                SUBSTR(COALESCE(e.snippet, e.body_preview, ''), 1, 200) as email_preview
-            FROM ai_suggestions s
-            LEFT JOIN emails e ON s.source_type = 'email' AND s.source_id = e.email_id
-            WHERE {where_sql.replace('status', 's.status').replace('suggestion_type', 's.suggestion_type').replace('confidence_score', 's.confidence_score')}
-            ORDER BY s.confidence_score DESC, s.created_at DESC
-            LIMIT ? OFFSET ?
-        """, params + [limit, offset])
+        conn = db_connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            # Keyset on (confidence_score, suggestion_id) - suggestion_id
+            # follows created_at, and idx_ai_suggestions_status_confidence
+            # (migration 119) serves the order for a status filter
+            result = keyset_page(conn, f"""
+                SELECT
+                    s.*,
+                    e.subject as email_subject,
+                    e.sender_name as email_sender_name,
+                    e.sender_email as email_sender,
+                    SUBSTR(COALESCE(e.snippet, e.body_preview, ''), 1, 200) as email_preview
+                FROM ai_suggestions s
+                LEFT JOIN emails e ON s.source_type = 'email' AND s.source_id = e.email_id
+                WHERE {where_sql}
+            """, params, sort_column='confidence_score', id_column='suggestion_id',
+                cursor=cursor, per_page=limit, offset=offset)
+
+            total, _ = count_total(conn, DB_PATH, f"SELECT 1 FROM ai_suggestions s WHERE {where_sql}",
+                                   params, 'cached', ['ai_suggestions'])
+        finally:
+            conn.close()
 
-        suggestions = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        suggestions = result['items']
 
         # Return in format expected by frontend
         return {
@@ -109,16 +112,21 @@ async def get_suggestions(
             "returned": len(suggestions),
             "limit": limit,
             "offset": offset,
+            "has_more": result['has_more'],
+            "next_cursor": result['next_cursor'],
         }
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid request")
     except Exception as e:
         raise HTTPException(status_code=500, detail="An internal error occurred")
 
 
 @router.get("/suggestions/stats")
-async def get_suggestion_stats():
+@off_loop
+def get_suggestion_stats():
     """Get suggestion statistics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -185,7 +193,8 @@ async def get_suggestion_stats():
 
 
 @router.get("/suggestions/grouped")
-async def get_suggestions_grouped(
+@off_loop
+def get_suggestions_grouped(
     status: str = Query("pending", description="Filter by status: pending, approved, rejected")
 ):
     """
@@ -208,7 +217,8 @@ async def get_suggestions_grouped(
 # ============================================================================
 
 @router.post("/suggestions/{suggestion_id}/approve")
-async def approve_suggestion(suggestion_id: int, request: Optional[SuggestionApproveRequest] = None):
+# Not @off_loop: may call the LLM, which must not hold a DB executor slot or hit its deadline
+def approve_suggestion(suggestion_id: int, request: Optional[SuggestionApproveRequest] = None):
     """Approve an AI suggestion from ai_suggestions table"""
     try:
         # Use ai_learning_service which works with ai_suggestions table
@@ -223,7 +233,7 @@ async def approve_suggestion(suggestion_id: int, request: Optional[SuggestionApp
         # Learn contact context from notes if provided
         if request and request.notes:
             try:
-                conn = sqlite3.connect(DB_PATH)
+                conn = db_connect()
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
 
@@ -263,7 +273,8 @@ async def approve_suggestion(suggestion_id: int, request: Optional[SuggestionApp
 
 
 @router.post("/suggestions/{suggestion_id}/reject")
-async def reject_suggestion(suggestion_id: int, request: Optional[SuggestionRejectRequest] = None):
+@off_loop
+def reject_suggestion(suggestion_id: int, request: Optional[SuggestionRejectRequest] = None):
     """Reject an AI suggestion"""
     try:
         reason = request.reason if request else None
@@ -283,10 +294,11 @@ async def reject_suggestion(suggestion_id: int, request: Optional[SuggestionReje
 
 
 @router.post("/suggestions/bulk-approve")
-async def bulk_approve_suggestions(request: BulkApproveRequest):
+@off_loop
+def bulk_approve_suggestions(request: BulkApproveRequest):
     """Bulk approve suggestions above confidence threshold"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -316,7 +328,8 @@ async def bulk_approve_suggestions(request: BulkApproveRequest):
 
 
 @router.post("/suggestions/bulk-approve-by-ids")
-async def bulk_approve_by_ids(request: BulkApproveByIdsRequest):
+@off_loop
+def bulk_approve_by_ids(request: BulkApproveByIdsRequest):
     """Bulk approve suggestions by ID list"""
     try:
         approved_count = 0
@@ -350,7 +363,8 @@ async def bulk_approve_by_ids(request: BulkApproveByIdsRequest):
 
 
 @router.post("/suggestions/bulk-reject")
-async def bulk_reject_suggestions(request: BulkRejectRequest):
+@off_loop
+def bulk_reject_suggestions(request: BulkRejectRequest):
     """Bulk reject suggestions by ID list"""
     try:
         rejected_count = 0
@@ -384,7 +398,8 @@ async def bulk_reject_suggestions(request: BulkRejectRequest):
 
 
 @router.post("/suggestions/{suggestion_id}/correct")
-async def correct_suggestion(
+@off_loop
+def correct_suggestion(
     suggestion_id: int,
     corrected_project_id: Optional[int] = None,
     corrected_project_code: Optional[str] = None,
@@ -392,7 +407,7 @@ async def correct_suggestion(
 ):
     """Approve a suggestion with corrections (modified data)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -493,7 +508,8 @@ async def correct_suggestion(
 # ============================================================================
 
 @router.get("/suggestions/email-links")
-async def get_email_link_suggestions(
+@off_loop
+def get_email_link_suggestions(
     status: str = "pending",
     min_confidence: float = 0.0,
     limit: int = 50,
@@ -501,7 +517,7 @@ async def get_email_link_suggestions(
 ):
     """Get email link suggestions specifically"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -546,10 +562,11 @@ async def get_email_link_suggestions(
 
 
 @router.post("/suggestions/{suggestion_id}/approve-email-link")
-async def approve_email_link_suggestion(suggestion_id: int):
+@off_loop
+def approve_email_link_suggestion(suggestion_id: int):
     """Specifically approve an email_link suggestion and create the actual link"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -634,7 +651,8 @@ async def approve_email_link_suggestion(suggestion_id: int):
 # ============================================================================
 
 @router.get("/suggestions/transcript-links")
-async def get_transcript_link_suggestions(
+@off_loop
+def get_transcript_link_suggestions(
     status: str = "pending",
     min_confidence: float = 0.0,
     limit: int = 50,
@@ -642,7 +660,7 @@ async def get_transcript_link_suggestions(
 ):
     """Get transcript link suggestions specifically"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -688,10 +706,11 @@ async def get_transcript_link_suggestions(
 
 
 @router.post("/suggestions/{suggestion_id}/approve-transcript-link")
-async def approve_transcript_link_suggestion(suggestion_id: int):
+@off_loop
+def approve_transcript_link_suggestion(suggestion_id: int):
     """Specifically approve a transcript_link suggestion and create the actual link"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -766,7 +785,8 @@ async def approve_transcript_link_suggestion(suggestion_id: int):
 # ============================================================================
 
 @router.get("/intel/suggestions")
-async def get_intel_suggestions(limit: int = Query(20, ge=1, le=100)):
+@off_loop
+def get_intel_suggestions(limit: int = Query(20, ge=1, le=100)):
     """Get AI intelligence suggestions"""
     try:
         suggestions = ai_learning_service.get_pending_suggestions(limit=limit)
@@ -779,7 +799,8 @@ async def get_intel_suggestions(limit: int = Query(20, ge=1, le=100)):
 
 
 @router.post("/intel/suggestions/{suggestion_id}/decision")
-async def record_suggestion_decision(
+@off_loop
+def record_suggestion_decision(
     suggestion_id: int,
     decision: str = Query(..., regex="^(approve|reject)$")
 ):
@@ -800,7 +821,8 @@ async def record_suggestion_decision(
 
 
 @router.get("/intel/patterns")
-async def get_learned_patterns():
+@off_loop
+def get_learned_patterns():
     """Get patterns learned by AI"""
     try:
         patterns = ai_learning_service.get_learned_patterns()
@@ -812,7 +834,8 @@ async def get_learned_patterns():
 
 
 @router.get("/intel/decisions")
-async def get_recent_decisions(limit: int = Query(50, ge=1, le=200)):
+@off_loop
+def get_recent_decisions(limit: int = Query(50, ge=1, le=200)):
     """Get recent AI decisions"""
     try:
         decisions = ai_learning_service.get_recent_decisions(limit=limit)
@@ -829,7 +852,8 @@ async def get_recent_decisions(limit: int = Query(50, ge=1, le=200)):
 # ============================================================================
 
 @router.get("/suggestions/{suggestion_id}/preview")
-async def get_suggestion_preview(suggestion_id: int):
+@off_loop
+def get_suggestion_preview(suggestion_id: int):
     """
     Get a preview of what changes a suggestion will make.
 
@@ -841,7 +865,7 @@ async def get_suggestion_preview(suggestion_id: int):
         - changes: List of field-level changes
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -898,7 +922,8 @@ async def get_suggestion_preview(suggestion_id: int):
 
 
 @router.post("/suggestions/{suggestion_id}/rollback")
-async def rollback_suggestion(suggestion_id: int):
+@off_loop
+def rollback_suggestion(suggestion_id: int):
     """
     Rollback an approved suggestion, undoing its changes.
 
@@ -911,7 +936,7 @@ async def rollback_suggestion(suggestion_id: int):
         - message: Description of what was done
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -982,7 +1007,8 @@ async def rollback_suggestion(suggestion_id: int):
 
 
 @router.get("/suggestions/{suggestion_id}/source")
-async def get_suggestion_source(suggestion_id: int):
+@off_loop
+def get_suggestion_source(suggestion_id: int):
     """
     Get the source content (email or transcript) that triggered a suggestion.
 
@@ -992,7 +1018,7 @@ async def get_suggestion_source(suggestion_id: int):
         - metadata: Additional info (subject, sender, date, etc.)
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1124,7 +1150,8 @@ async def get_suggestion_source(suggestion_id: int):
 # ============================================================================
 
 @router.post("/suggestions/{suggestion_id}/reject-with-correction")
-async def reject_with_correction(
+# Not @off_loop: may call the LLM, which must not hold a DB executor slot or hit its deadline
+def reject_with_correction(
     suggestion_id: int,
     request: SuggestionRejectWithCorrectionRequest
 ):
@@ -1140,7 +1167,7 @@ async def reject_with_correction(
     Works with: email_link, contact_link, transcript_link suggestion types
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1585,7 +1612,8 @@ async def reject_with_correction(
 
 
 @router.post("/suggestions/{suggestion_id}/approve-with-context")
-async def approve_with_context(
+@off_loop
+def approve_with_context(
     suggestion_id: int,
     request: SuggestionApproveWithContextRequest
 ):
@@ -1598,7 +1626,7 @@ async def approve_with_context(
     - contact_role: Specify the role of a new contact
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1640,7 +1668,7 @@ async def approve_with_context(
             raise HTTPException(status_code=400, detail=approve_result.get('message', 'Approval failed'))
 
         # Now create patterns if requested
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1744,7 +1772,8 @@ async def approve_with_context(
 # ============================================================================
 
 @router.get("/patterns")
-async def get_patterns(
+@off_loop
+def get_patterns(
     pattern_type: Optional[str] = Query(None, description="Filter by pattern type"),
     target_code: Optional[str] = Query(None, description="Filter by project/proposal code"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
@@ -1753,7 +1782,7 @@ async def get_patterns(
 ):
     """Get all learned patterns with optional filtering"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1807,10 +1836,11 @@ async def get_patterns(
 
 
 @router.get("/patterns/stats")
-async def get_pattern_stats():
+@off_loop
+def get_pattern_stats():
     """Get pattern statistics summary"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1861,10 +1891,11 @@ async def get_pattern_stats():
 
 
 @router.post("/patterns")
-async def create_pattern(request: PatternCreateRequest):
+@off_loop
+def create_pattern(request: PatternCreateRequest):
     """Manually create a pattern"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1926,10 +1957,11 @@ async def create_pattern(request: PatternCreateRequest):
 
 
 @router.put("/patterns/{pattern_id}")
-async def update_pattern(pattern_id: int, request: PatternUpdateRequest):
+@off_loop
+def update_pattern(pattern_id: int, request: PatternUpdateRequest):
     """Update an existing pattern"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1980,10 +2012,11 @@ async def update_pattern(pattern_id: int, request: PatternUpdateRequest):
 
 
 @router.delete("/patterns/{pattern_id}")
-async def delete_pattern(pattern_id: int):
+@off_loop
+def delete_pattern(pattern_id: int):
     """Delete a pattern"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM email_learned_patterns WHERE pattern_id = ?", (pattern_id,))
@@ -2004,10 +2037,11 @@ async def delete_pattern(pattern_id: int):
 
 
 @router.get("/patterns/{pattern_id}")
-async def get_pattern(pattern_id: int):
+@off_loop
+def get_pattern(pattern_id: int):
     """Get a single pattern with its usage history"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -2052,7 +2086,8 @@ async def get_pattern(pattern_id: int):
 # ============================================================================
 
 @router.get("/suggestions/{suggestion_id}/full-context")
-async def get_suggestion_full_context(suggestion_id: int):
+@off_loop
+def get_suggestion_full_context(suggestion_id: int):
     """
     Get full context for reviewing a suggestion, including:
     - The suggestion itself
@@ -2062,7 +2097,7 @@ async def get_suggestion_full_context(suggestion_id: int):
     - Any existing user feedback
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -2123,11 +2158,11 @@ async def get_suggestion_full_context(suggestion_id: int):
                 FROM emails e
                 JOIN email_project_links epl ON e.email_id = epl.email_id
                 JOIN projects p ON epl.project_id = p.project_id
-                WHERE e.sender_email LIKE ?
+                WHERE e.sender_address = LOWER(TRIM(?))
                 AND p.project_code = ?
                 ORDER BY e.date DESC
                 LIMIT 5
-            """, (f"%{contact_info.get('email', '')}%", project_code))
+            """, (contact_info.get('email') or '', project_code))
             sample_emails = [dict(row) for row in cursor.fetchall()]
 
             # Build explanation
@@ -2322,10 +2357,11 @@ async def get_suggestion_full_context(suggestion_id: int):
 
 
 @router.get("/suggestion-tags")
-async def get_suggestion_tags():
+@off_loop
+def get_suggestion_tags():
     """Get available tags for suggestions (for autocomplete)"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -2348,7 +2384,8 @@ async def get_suggestion_tags():
 
 
 @router.post("/suggestions/{suggestion_id}/save-feedback")
-async def save_suggestion_feedback(
+@off_loop
+def save_suggestion_feedback(
     suggestion_id: int,
     context_notes: Optional[str] = None,
     tags: Optional[str] = None,  # JSON array string
@@ -2357,7 +2394,7 @@ async def save_suggestion_feedback(
 ):
     """Save user feedback for a suggestion without approving/rejecting"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -2410,7 +2447,8 @@ async def save_suggestion_feedback(
 # ============================================================================
 
 @router.get("/contact-context/{email}")
-async def get_contact_context(email: str):
+@off_loop
+def get_contact_context(email: str):
     """
     Get stored context for a contact.
 
@@ -2444,7 +2482,8 @@ async def get_contact_context(email: str):
 
 
 @router.get("/contact-context")
-async def list_contact_contexts(
+@off_loop
+def list_contact_contexts(
     relationship_type: Optional[str] = Query(None, description="Filter by relationship type"),
     is_multi_project: Optional[bool] = Query(None, description="Filter by multi-project flag"),
     limit: int = Query(50, ge=1, le=200),
@@ -2452,7 +2491,7 @@ async def list_contact_contexts(
 ):
     """List all stored contact contexts"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -2499,7 +2538,8 @@ async def list_contact_contexts(
 
 
 @router.get("/contact-context-stats")
-async def get_contact_context_stats():
+@off_loop
+def get_contact_context_stats():
     """Get statistics about stored contact context"""
     try:
         context_service = get_contact_context_service()
@@ -2513,7 +2553,8 @@ async def get_contact_context_stats():
 
 
 @router.post("/contact-context/{email}/update")
-async def update_contact_context(
+@off_loop
+def update_contact_context(
     email: str,
     role: Optional[str] = None,
     relationship_type: Optional[str] = None,
@@ -2567,7 +2608,8 @@ async def update_contact_context(
 
 
 @router.get("/multi-project-contacts")
-async def get_multi_project_contacts():
+@off_loop
+def get_multi_project_contacts():
     """Get all contacts marked as working on multiple projects"""
     try:
         context_service = get_contact_context_service()
@@ -2586,7 +2628,8 @@ async def get_multi_project_contacts():
 # ============================================================================
 
 @router.get("/suggestions/context-aware/status")
-async def get_context_aware_status():
+@off_loop
+def get_context_aware_status():
     """Get the status of context-aware suggestion generation"""
     try:
         from backend.services.context_aware_suggestion_service import get_context_aware_service
@@ -2602,7 +2645,8 @@ async def get_context_aware_status():
 
 
 @router.post("/suggestions/context-aware/toggle")
-async def toggle_context_aware(enable: bool = True):
+@off_loop
+def toggle_context_aware(enable: bool = True):
     """Enable or disable context-aware suggestion generation"""
     try:
         from backend.services.context_aware_suggestion_service import get_context_aware_service
@@ -2620,28 +2664,34 @@ async def toggle_context_aware(enable: bool = True):
 
 
 @router.post("/suggestions/context-aware/generate")
-async def generate_context_aware_suggestions(
+# Not @off_loop: up to `limit` LLM calls - runs on FastAPI's threadpool with no deadline
+def generate_context_aware_suggestions(
     email_id: Optional[int] = None,
     limit: int = Query(50, ge=1, le=200, description="Max emails to process in batch"),
-    hours_back: int = Query(24, ge=1, le=168, description="Hours to look back for unprocessed emails")
+    hours_back: int = Query(24, ge=1, le=168, description="Hours to look back for unprocessed emails"),
+    use_cache: bool = Query(True, description="Reuse LLM responses for emails whose prompt is unchanged"),
+    resume: bool = Query(False, description="First finish analyses an interrupted batch left behind (within limit)")
 ):
     """
     Generate context-aware suggestions for emails.
 
     If email_id is provided, processes that single email.
     Otherwise, processes up to `limit` unprocessed emails from the last `hours_back` hours.
+    Pass use_cache=false to force fresh LLM calls.
     """
     try:
         from backend.services.context_aware_suggestion_service import get_context_aware_service
         service = get_context_aware_service(DB_PATH)
 
         if email_id:
-            result = service.generate_suggestions_for_email(email_id)
+            result = service.generate_suggestions_for_email(email_id, use_cache=use_cache)
         else:
             result = service.generate_suggestions_batch(
                 email_ids=None,
                 limit=limit,
-                hours_back=hours_back
+                hours_back=hours_back,
+                resume=resume,
+                use_cache=use_cache
             )
 
         return {
@@ -2653,7 +2703,8 @@ async def generate_context_aware_suggestions(
 
 
 @router.get("/suggestions/context-aware/context")
-async def get_context_bundle():
+@off_loop
+def get_context_bundle():
     """
     Get the current context bundle used for GPT analysis.
 
@@ -2683,7 +2734,8 @@ async def get_context_bundle():
 
 
 @router.post("/suggestions/context-aware/refresh-context")
-async def refresh_context_bundle():
+@off_loop
+def refresh_context_bundle():
     """Force refresh the context bundle cache"""
     try:
         from backend.services.context_aware_suggestion_service import get_context_aware_service
@@ -2701,7 +2753,8 @@ async def refresh_context_bundle():
 
 
 @router.get("/suggestions/context-aware/usage")
-async def get_gpt_usage_stats(
+@off_loop
+def get_gpt_usage_stats(
     days: int = Query(30, ge=1, le=365, description="Number of days to look back")
 ):
     """Get GPT API usage statistics for cost monitoring"""
@@ -15,7 +15,7 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
 from api.helpers import list_response, item_response, action_response
 
 
@@ -46,7 +46,7 @@ class CreatePMRequest(BaseModel):
 
 def get_db():
     """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_connect()
     conn.row_factory = sqlite3.Row
     return conn
 
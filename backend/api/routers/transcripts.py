@@ -16,7 +16,7 @@ from datetime import datetime, date
 import sqlite3
 import json
 
-from api.dependencies import DB_PATH
+from api.dependencies import db_connect
 from api.helpers import list_response, item_response
 
 
@@ -67,7 +67,7 @@ async def get_transcripts(
 ):
     """Get list of meeting transcripts"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -127,7 +127,7 @@ async def get_transcripts(
 async def get_transcript_stats():
     """Get transcript statistics including orphan metrics"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -171,7 +171,7 @@ async def get_orphaned_transcripts():
     These need manual review and linking.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -208,7 +208,7 @@ async def get_orphaned_transcripts():
 async def get_transcript(transcript_id: int):
     """Get a single transcript by ID"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -243,7 +243,7 @@ async def get_transcript(transcript_id: int):
 async def get_transcripts_by_project(project_code: str):
     """Get transcripts for a specific project"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -276,7 +276,7 @@ async def get_transcripts_by_project(project_code: str):
 async def get_project_transcripts(project_code: str):
     """Get transcripts for a specific project or proposal"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -342,7 +342,7 @@ async def update_transcript(
 ):
     """Update a transcript - link to project, add summary, etc."""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -441,7 +441,7 @@ async def save_claude_summary(transcript_id: int, request: ClaudeSummaryRequest)
     Returns the created task IDs and meeting ID (if created).
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_connect()
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
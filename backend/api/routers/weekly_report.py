@@ -18,14 +18,10 @@ from pathlib import Path
 backend_path = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(backend_path))
 
-from api.dependencies import DB_PATH
-from services.weekly_report_service import WeeklyReportService
+from api.services import weekly_report_service as report_service
 
 router = APIRouter(prefix="/api/weekly-report", tags=["weekly-report"])
 
-# Initialize service
-report_service = WeeklyReportService(DB_PATH)
-
 
 @router.get("")
 async def get_weekly_report(
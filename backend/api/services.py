@@ -1,15 +1,27 @@
 """
-API Services - Centralized service initialization for all routers
+API Services - Centralized, lazily-initialized services for all routers
 
-This module initializes all services once and makes them available to routers.
-Import services from here rather than initializing them in each router.
+Services are registered here by name and created on first use, not at
+import. Importing a service gives a lightweight proxy. The service module
+is imported, and the service instantiated with DB_PATH, the first time an
+attribute is used. `uvicorn --reload` therefore starts serving /health
+without importing openai, the PDF stack and ~35 service modules. Each
+service is still created once per process.
 
 Usage:
     from api.services import proposal_service, email_service
+
+    # or, as a FastAPI dependency (overridable in tests):
+    from api.dependencies import service
+    async def endpoint(emails=Depends(service('email_service'))): ...
 """
 
 import sys
+import threading
+import time
+from importlib import import_module
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
 
 # Add backend to path for service imports
 backend_path = Path(__file__).parent.parent
@@ -25,125 +37,163 @@ from utils.logger import get_logger
 # Initialize logger
 logger = get_logger(__name__)
 
-# Import all services
-from services.proposal_service import ProposalService
-from services.email_service import EmailService
-from services.milestone_service import MilestoneService
-from services.financial_service import FinancialService
-from services.rfi_service import RFIService
-from services.file_service import FileService
-from services.context_service import ContextService
-from services.meeting_service import MeetingService
-from services.outreach_service import OutreachService
-from services.override_service import OverrideService
-from services.training_service import TrainingService
-from services.proposal_query_service import ProposalQueryService
-from services.query_service import QueryService
-from services.contract_service import ContractService
-from services.proposal_tracker_service import ProposalTrackerService
-from services.training_data_service import TrainingDataService
-from services.admin_service import AdminService
-from services.email_intelligence_service import EmailIntelligenceService
-from services.deliverables_service import DeliverablesService
-from services.proposal_intelligence_service import ProposalIntelligenceService
-from services.ai_learning_service import AILearningService
-from services.follow_up_agent import FollowUpAgent
-from services.calendar_service import CalendarService
-from services.document_service import DocumentService
-from services.meeting_briefing_service import MeetingBriefingService
-from services.user_learning_service import UserLearningService
-from services.invoice_service import InvoiceService
-from services.email_orchestrator import EmailOrchestrator
-from services.onedrive_service import get_onedrive_service
-
-# Orphaned services now being connected (Dec 2025)
-from services.pattern_first_linker import get_pattern_linker
-from services.proposal_version_service import ProposalVersionService
-from services.transcript_consolidation_service import TranscriptConsolidationService
-from services.batch_suggestion_service import get_batch_service
-
-# Initialize all services
-try:
-    logger.info(f"📂 Loading services with database: {DB_PATH}")
-
-    proposal_service = ProposalService(DB_PATH)
-    email_service = EmailService(DB_PATH)
-    milestone_service = MilestoneService(DB_PATH)
-    financial_service = FinancialService(DB_PATH)
-    rfi_service = RFIService(DB_PATH)
-    file_service = FileService(DB_PATH)
-    context_service = ContextService(DB_PATH)
-    meeting_service = MeetingService(DB_PATH)
-    outreach_service = OutreachService(DB_PATH)
-    override_service = OverrideService(DB_PATH)
-    training_service = TrainingService(DB_PATH)
-    proposal_query_service = ProposalQueryService(DB_PATH)
-    query_service = QueryService(DB_PATH)
-    contract_service = ContractService(DB_PATH)
-    proposal_tracker_service = ProposalTrackerService(DB_PATH)
-    admin_service = AdminService(DB_PATH)
-    training_data_service = TrainingDataService(DB_PATH)
-    email_intelligence_service = EmailIntelligenceService(DB_PATH)
-    deliverables_service = DeliverablesService(DB_PATH)
-    proposal_intelligence_service = ProposalIntelligenceService(DB_PATH)
-    ai_learning_service = AILearningService(DB_PATH)
-    follow_up_agent = FollowUpAgent(DB_PATH)
-    calendar_service = CalendarService(DB_PATH)
-    document_service = DocumentService(DB_PATH)
-    meeting_briefing_service = MeetingBriefingService(DB_PATH)
-    user_learning_service = UserLearningService(DB_PATH)
-    invoice_service = InvoiceService(DB_PATH)
-    email_orchestrator = EmailOrchestrator(DB_PATH)
-    onedrive_service = get_onedrive_service(DB_PATH)
+# Service name -> (module, callable). The callable is a service class or a
+# get_* factory; either is called with DB_PATH.
+SERVICE_FACTORIES: Dict[str, Tuple[str, str]] = {
+    'proposal_service': ('services.proposal_service', 'ProposalService'),
+    'email_service': ('services.email_service', 'EmailService'),
+    'milestone_service': ('services.milestone_service', 'MilestoneService'),
+    'financial_service': ('services.financial_service', 'FinancialService'),
+    'rfi_service': ('services.rfi_service', 'RFIService'),
+    'file_service': ('services.file_service', 'FileService'),
+    'context_service': ('services.context_service', 'ContextService'),
+    'meeting_service': ('services.meeting_service', 'MeetingService'),
+    'outreach_service': ('services.outreach_service', 'OutreachService'),
+    'override_service': ('services.override_service', 'OverrideService'),
+    'training_service': ('services.training_service', 'TrainingService'),
+    'proposal_query_service': ('services.proposal_query_service', 'ProposalQueryService'),
+    'query_service': ('services.query_service', 'QueryService'),
+    'contract_service': ('services.contract_service', 'ContractService'),
+    'proposal_tracker_service': ('services.proposal_tracker_service', 'ProposalTrackerService'),
+    'admin_service': ('services.admin_service', 'AdminService'),
+    'training_data_service': ('services.training_data_service', 'TrainingDataService'),
+    'email_intelligence_service': ('services.email_intelligence_service', 'EmailIntelligenceService'),
+    'deliverables_service': ('services.deliverables_service', 'DeliverablesService'),
+    'proposal_intelligence_service': ('services.proposal_intelligence_service', 'ProposalIntelligenceService'),
+    'ai_learning_service': ('services.ai_learning_service', 'AILearningService'),
+    'follow_up_agent': ('services.follow_up_agent', 'FollowUpAgent'),
+    'calendar_service': ('services.calendar_service', 'CalendarService'),
+    'document_service': ('services.document_service', 'DocumentService'),
+    'meeting_briefing_service': ('services.meeting_briefing_service', 'MeetingBriefingService'),
+    'user_learning_service': ('services.user_learning_service', 'UserLearningService'),
+    'invoice_service': ('services.invoice_service', 'InvoiceService'),
+    'email_orchestrator': ('services.email_orchestrator', 'EmailOrchestrator'),
+    'onedrive_service': ('services.onedrive_service', 'get_onedrive_service'),
 
     # Orphaned services now being wired up (Dec 2025)
-    pattern_linker = get_pattern_linker(DB_PATH)
-    proposal_version_service = ProposalVersionService(DB_PATH)
-    transcript_consolidation_service = TranscriptConsolidationService(DB_PATH)
-    batch_suggestion_service = get_batch_service(DB_PATH)
+    'pattern_linker': ('services.pattern_first_linker', 'get_pattern_linker'),
+    'proposal_version_service': ('services.proposal_version_service', 'ProposalVersionService'),
+    'transcript_consolidation_service': ('services.transcript_consolidation_service',
+                                         'TranscriptConsolidationService'),
+    'batch_suggestion_service': ('services.batch_suggestion_service', 'get_batch_service'),
+
+    # Precomputed dashboard KPIs (migration 110)
+    'kpi_snapshot_service': ('services.kpi_snapshot_service', 'get_kpi_snapshot_service'),
+
+    # Keyset-paginated unified project timeline (migration 118)
+    'timeline_service': ('services.timeline_service', 'TimelineService'),
+
+    # Previously created by the story/report routers at import
+    'proposal_story_service': ('services.proposal_story_service', 'ProposalStoryService'),
+    'proposal_detail_story_service': ('services.proposal_detail_story_service', 'ProposalDetailStoryService'),
+    'activity_extractor': ('services.activity_extractor', 'ActivityExtractor'),
+    'weekly_report_service': ('services.weekly_report_service', 'WeeklyReportService'),
+}
+
+
+class ServiceRegistry:
+    """Creates each registered service once, on first request"""
+
+    def __init__(self, db_path: str, factories: Dict[str, Tuple[str, str]]):
+        self.db_path = db_path
+        self.factories = factories
+        self._services: Dict[str, Any] = {}
+        self._load_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def get(self, name: str) -> Any:
+        """
+        The named service, created on first call.
+
+        Raises:
+            KeyError: Unknown service
+            RuntimeError: The service failed to initialize
+        """
+        service = self._services.get(name)
+        if service is not None:
+            return service
+
+        module_name, attr = self.factories[name]
+        # One lock per service: a slow service (or the warm-up thread) does
+        # not hold up requests for the others
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            service = self._services.get(name)
+            if service is None:
+                started = time.perf_counter()
+                try:
+                    factory: Callable[[str], Any] = getattr(import_module(module_name), attr)
+                    service = factory(self.db_path)
+                except Exception as e:
+                    logger.error(f"❌ Failed to initialize {name}: {e}")
+                    raise RuntimeError(f"Cannot initialize {name}: {e}") from e
+                self._load_ms[name] = (time.perf_counter() - started) * 1000
+                self._services[name] = service
+                logger.info(f"Initialized {name} in {self._load_ms[name]:.0f}ms")
+        return service
+
+    def warm(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Create services ahead of first use; returns load time per service (ms)"""
+        for name in names or self.factories:
+            try:
+                self.get(name)
+            except RuntimeError:
+                pass  # logged by get(); the endpoint will report it
+        return self.loaded()
+
+    def loaded(self) -> Dict[str, float]:
+        """Services created so far and how long each took (ms)"""
+        return dict(self._load_ms)
+
+
+class LazyService:
+    """Stands in for a registered service until an attribute is used"""
+
+    __slots__ = ('_service_name',)
+
+    def __init__(self, name: str):
+        object.__setattr__(self, '_service_name', name)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(registry.get(self._service_name), attr)
+
+    def __setattr__(self, attr: str, value: Any):
+        setattr(registry.get(self._service_name), attr, value)
+
+    def __repr__(self) -> str:
+        return f"<LazyService {self._service_name}>"
+
+
+if not Path(DB_PATH).expanduser().exists():
+    # Fail at startup, as eager initialization did, rather than on every request
+    logger.error(f"❌ Failed to initialize services: Database not found: {DB_PATH}")
+    raise RuntimeError(f"Cannot initialize services: Database not found: {DB_PATH}")
+
+registry = ServiceRegistry(DB_PATH, SERVICE_FACTORIES)
+
+
+def get_service(name: str) -> Any:
+    """The named service instance (not a proxy)"""
+    return registry.get(name)
+
 
-    logger.info("✅ All services initialized successfully")
+def __getattr__(name: str) -> Any:
+    # `from api.services import x_service` lands here the first time and
+    # binds a proxy - nothing is imported until the proxy is used
+    if name in SERVICE_FACTORIES:
+        proxy = LazyService(name)
+        globals()[name] = proxy
+        return proxy
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-except Exception as e:
-    logger.error(f"❌ Failed to initialize services: {e}")
-    raise RuntimeError(f"Cannot initialize services: {e}")
 
 # Export all services
 __all__ = [
-    'proposal_service',
-    'email_service',
-    'milestone_service',
-    'financial_service',
-    'rfi_service',
-    'file_service',
-    'context_service',
-    'meeting_service',
-    'outreach_service',
-    'override_service',
-    'training_service',
-    'proposal_query_service',
-    'query_service',
-    'contract_service',
-    'proposal_tracker_service',
-    'admin_service',
-    'training_data_service',
-    'email_intelligence_service',
-    'deliverables_service',
-    'proposal_intelligence_service',
-    'ai_learning_service',
-    'follow_up_agent',
-    'calendar_service',
-    'document_service',
-    'meeting_briefing_service',
-    'user_learning_service',
-    'invoice_service',
-    'email_orchestrator',
-    'onedrive_service',
-    # Newly wired services (Dec 2025)
-    'pattern_linker',
-    'proposal_version_service',
-    'transcript_consolidation_service',
-    'batch_suggestion_service',
+    *SERVICE_FACTORIES,
+    'registry',
+    'get_service',
     'DB_PATH',
     'logger',
 ]
@@ -0,0 +1,140 @@
+"""
+API Startup Profile - what `import api.main` costs, module by module
+
+Runs the import in a fresh interpreter under `python -X importtime` and
+reports:
+- wall time
+- cumulative time of the target module
+- the most expensive modules
+- self time summed per top-level package
+- which known-heavy third-party packages were loaded at all
+
+Services are created lazily (api.services), so a cold start should load
+none of HEAVY_MODULES and no service module.
+
+Usage (from backend/):
+    python -m api.startup_profile
+    python -m api.startup_profile --top 30 --budget-ms 2500
+    DATABASE_PATH=/path/to/db python -m api.startup_profile --json
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Imports a cold start must not pay for
+HEAVY_MODULES = ('openai', 'anthropic', 'pdfplumber', 'PyPDF2', 'reportlab', 'pandas', 'numpy', 'openpyxl')
+
+STARTUP_BUDGET_MS = float(os.getenv('API_STARTUP_BUDGET_MS', '3000'))
+
+_LINE_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {target}
+wall_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({{'wall_ms': wall_ms, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """`-X importtime` lines as {'module', 'self_ms', 'cumulative_ms', 'depth'}"""
+    records = []
+    for line in stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            records.append({
+                'module': match.group(4),
+                'self_ms': int(match.group(1)) / 1000,
+                'cumulative_ms': int(match.group(2)) / 1000,
+                'depth': len(match.group(3)) // 2,
+            })
+    return records
+
+
+def profile_startup(target: str = 'api.main', env: Optional[Dict[str, str]] = None,
+                    top: int = 20) -> Dict:
+    """
+    Import `target` in a fresh interpreter and profile it.
+
+    Args:
+        target: Module to import
+        env: Extra environment (DATABASE_PATH etc.) on top of os.environ
+        top: Number of modules to list
+
+    Returns:
+        {'target', 'wall_ms', 'import_ms', 'module_count', 'heavy_modules',
+         'service_modules', 'top_modules', 'by_package'}
+
+    Raises:
+        RuntimeError: The import failed
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(target=target)],
+        cwd=BACKEND_DIR, env={**os.environ, **(env or {})},
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    records = parse_importtime(result.stderr)
+
+    by_package: Dict[str, float] = defaultdict(float)
+    for record in records:
+        by_package[record['module'].split('.')[0]] += record['self_ms']
+
+    target_record = next((r for r in records if r['module'] == target), None)
+    loaded = set(probe['modules'])
+    return {
+        'target': target,
+        'wall_ms': round(probe['wall_ms'], 1),
+        'import_ms': round(target_record['cumulative_ms'], 1) if target_record else None,
+        'module_count': len(records),
+        'heavy_modules': [name for name in HEAVY_MODULES if name in loaded],
+        'service_modules': sorted(name for name in loaded if name.startswith('services.')),
+        'top_modules': sorted(records, key=lambda r: r['cumulative_ms'], reverse=True)[:top],
+        'by_package': dict(sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile API cold-start imports")
+    parser.add_argument('--target', default='api.main', help="Module to import (default: api.main)")
+    parser.add_argument('--top', type=int, default=20, help="Modules/packages to list")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                        help="Exit 1 if the import takes longer (default: API_STARTUP_BUDGET_MS or 3000)")
+    parser.add_argument('--json', action='store_true', help="Print the profile as JSON")
+    args = parser.parse_args()
+
+    profile = profile_startup(args.target, top=args.top)
+    if args.json:
+        print(json.dumps(profile, indent=2))
+    else:
+        print(f"import {profile['target']}: {profile['import_ms']}ms "
+              f"(wall {profile['wall_ms']}ms, {profile['module_count']} modules, "
+              f"budget {args.budget_ms:.0f}ms)")
+        print(f"heavy packages loaded: {', '.join(profile['heavy_modules']) or 'none'}")
+        print(f"service modules loaded: {len(profile['service_modules'])}")
+        print(f"\n{'cumulative ms':>14}  {'self ms':>9}  module")
+        for record in profile['top_modules']:
+            print(f"{record['cumulative_ms']:>14.1f}  {record['self_ms']:>9.1f}  "
+                  f"{'  ' * record['depth']}{record['module']}")
+        print(f"\n{'self ms':>14}  package")
+        for package, self_ms in profile['by_package'].items():
+            print(f"{self_ms:>14.1f}  {package}")
+
+    if profile['import_ms'] is not None and profile['import_ms'] > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
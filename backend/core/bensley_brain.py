@@ -675,6 +675,11 @@ class BensleyBrain:
             'emails': []
         }
 
+        # Ranked FTS5 search when the indexes exist (migration 105)
+        search = self._get_search_service()
+        if all(search.is_available(s) for s in results):
+            return search.search(query, sources=list(results.keys()), limit=limit)
+
         with self._get_connection() as conn:
             cursor = conn.cursor()
             query_lower = f"%{query.lower()}%"
@@ -699,7 +704,7 @@ class BensleyBrain:
             """, (query_lower, query_lower, query_lower, limit))
             results['contacts'] = [dict(row) for row in cursor.fetchall()]
 
-            # Search emails (using FTS if available)
+            # Search emails
             try:
                 cursor.execute("""
                     SELECT email_id, subject, sender_email, date, snippet
@@ -714,6 +719,13 @@ class BensleyBrain:
 
         return results
 
+    def _get_search_service(self):
+        """Shared FTS search service (created on first search)"""
+        if not hasattr(self, '_search_service'):
+            from services.search_service import SearchService
+            self._search_service = SearchService(self.db_path)
+        return self._search_service
+
     # =========================================================================
     # STATISTICS
     # =========================================================================
@@ -5,7 +5,14 @@ sync_master.py - FINAL VERSION with correct email columns
 
 import sqlite3
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
+
+# Add project root to path for backend.services
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+from backend.services.email_participants import index_emails_after, max_email_id
 
 class MasterSync:
     def __init__(self, base_path):
@@ -185,6 +192,7 @@ class MasterSync:
         
         try:
             # Use correct column names from emails.db
+            last_id = max_email_id(self.conn)
             self.cursor.execute("""
                 INSERT OR IGNORE INTO emails (
                     message_id, thread_id, date, sender_email, sender_name,
@@ -205,6 +213,8 @@ class MasterSync:
             """)
             
             self.stats['emails_synced'] = self.cursor.rowcount
+            # Sender addresses for indexed contact lookups, committed with the rows
+            index_emails_after(self.conn, last_id)
             print(f"   ✅ Synced {self.stats['emails_synced']} emails")
             
         except Exception as e:
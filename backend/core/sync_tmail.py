@@ -11,9 +11,15 @@ from email.header import decode_header
 import sqlite3
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 
+# Add project root to path for backend.services
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+from backend.services.email_participants import index_email_participants
+
 # Paths
 DESKTOP = Path.home() / "Desktop"
 BDS_DIR = DESKTOP / "BDS_SYSTEM"
@@ -173,6 +179,8 @@ def fetch_and_store_emails(mail, db_conn):
                         recipients, cc, subject, body_text[:5000], body_html[:5000],
                         date_sent, has_attachments, attachment_count
                     ))
+                    # Normalized participants, committed with the row
+                    index_email_participants(db_conn, [cursor.lastrowid])
                     
                     new_count += 1
                     
@@ -16,7 +16,6 @@ import re
 import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 
 from .base_service import BaseService
 from .suggestion_handlers import HandlerRegistry
@@ -34,6 +33,7 @@ class AILearningService(BaseService):
         api_key = os.environ.get('OPENAI_API_KEY')
         self.ai_enabled = bool(api_key)
         if self.ai_enabled:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
         # Initialize learning service for email pattern learning
         self.pattern_learner = LearningService(str(self.db_path))
@@ -93,7 +93,10 @@ class AILearningService(BaseService):
             except Exception as e:
                 logger.warning(f"Context-aware exception for email {email_id}: {e}, falling back to rule-based")
 
-        # Original rule-based suggestion generation
+        return self._generate_rule_based_suggestions(email_id)
+
+    def _generate_rule_based_suggestions(self, email_id: int) -> List[Dict]:
+        """Original rule-based suggestion generation (no LLM call)"""
         suggestions = []
 
         # Get email and its content
@@ -1257,8 +1260,27 @@ class AILearningService(BaseService):
         """, [hours, limit])
 
         total_suggestions = 0
-        for email in emails:
-            suggestions = self.generate_suggestions_from_email(email['email_id'])
+        email_ids = [email['email_id'] for email in emails]
+
+        # Context-aware: one rate-limited, resumable batch through the LLM
+        # dispatcher instead of one blocking call per email
+        if self.use_context_aware and self.context_aware_service and email_ids:
+            try:
+                result = self.context_aware_service.generate_suggestions_batch(
+                    email_ids=email_ids, limit=limit, resume=True
+                )
+                total_suggestions += result.get('suggestions_created', 0)
+                email_ids = result.get('failed_email_ids', [])
+                if email_ids:
+                    logger.warning(f"Context-aware failed for {len(email_ids)} emails, falling back to rule-based")
+            except Exception as e:
+                logger.warning(f"Context-aware batch exception: {e}, falling back to rule-based")
+            for email_id in email_ids:
+                total_suggestions += len(self._generate_rule_based_suggestions(email_id))
+            email_ids = []
+
+        for email_id in email_ids:
+            suggestions = self.generate_suggestions_from_email(email_id)
             total_suggestions += len(suggestions)
 
         return {
@@ -0,0 +1,275 @@
+"""
+Async Database Access
+
+Runs blocking SQLite work for async endpoints on a dedicated, bounded thread
+pool so a slow aggregate never stalls the event loop (and with it every other
+request uvicorn is serving).
+
+- A fixed number of worker threads (DB_EXECUTOR_WORKERS) share the
+  connection pool; at most DB_EXECUTOR_MAX_QUEUE calls may wait for a worker
+  before new ones are rejected with DatabaseBusy
+- Every call has a deadline (DB_QUERY_TIMEOUT_SECONDS by default). When it
+  passes - or the request is cancelled because the client went away - a call
+  that has not started is dropped and a running one has its reader queries
+  interrupted (see QueryScope in connection_pool)
+- Writes through pool.writer() are never interrupted
+
+Usage:
+    from services.async_db import off_loop, get_db_executor
+
+    @router.get("/dashboard/kpis")
+    @off_loop
+    def get_dashboard_kpis(period: str = "month"):
+        conn = db_connect()                 # plain blocking code, runs on a worker
+        ...
+
+    rows = await get_db_executor().fetch_all(db_path, "SELECT ...", (arg,))
+    result = await get_db_executor().run(service.get_stats, timeout=5)
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .connection_pool import QueryScope, get_pool, use_scope
+
+logger = logging.getLogger(__name__)
+
+
+# Tunables (override via environment)
+EXECUTOR_WORKERS = int(os.getenv('DB_EXECUTOR_WORKERS', '8'))
+EXECUTOR_MAX_QUEUE = int(os.getenv('DB_EXECUTOR_MAX_QUEUE', '200'))
+QUERY_TIMEOUT_SECONDS = float(os.getenv('DB_QUERY_TIMEOUT_SECONDS', '30'))
+SLOW_CALL_SECONDS = float(os.getenv('DB_SLOW_CALL_SECONDS', '2'))
+
+
+class QueryTimeout(TimeoutError):
+    """A database call ran past its deadline and was cancelled"""
+
+
+class DatabaseBusy(RuntimeError):
+    """Too many database calls are already waiting for a worker"""
+
+
+def _call_name(fn: Callable) -> str:
+    while isinstance(fn, functools.partial):
+        fn = fn.func
+    return getattr(fn, '__qualname__', repr(fn))
+
+
+class DatabaseExecutor:
+    """
+    Bounded thread pool for blocking database work.
+
+    One instance serves the whole process; get it with get_db_executor().
+    """
+
+    def __init__(self, workers: int = EXECUTOR_WORKERS, max_queue: int = EXECUTOR_MAX_QUEUE,
+                 timeout: float = QUERY_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db')
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            'calls': 0,
+            'completed': 0,
+            'timeouts': 0,
+            'cancelled': 0,
+            'rejected': 0,
+            'queue_wait_ms': 0.0,
+            'max_queue_wait_ms': 0.0,
+            'slow_calls': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Running work
+    # ------------------------------------------------------------------
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run fn(*args) on a database worker and await the result.
+
+        Args:
+            fn: Blocking callable (bind keyword arguments with functools.partial)
+            timeout: Seconds before the call is cancelled (default: QUERY_TIMEOUT_SECONDS)
+
+        Raises:
+            QueryTimeout: The deadline passed (queue wait counts towards it)
+            DatabaseBusy: The wait queue is full
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._stats['rejected'] += 1
+                raise DatabaseBusy(f"{self._pending} database calls already in flight")
+            self._pending += 1
+            self._stats['calls'] += 1
+
+        scope = QueryScope()
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+        try:
+            future = self._executor.submit(self._call, scope, submitted, context, fn, args)
+        except BaseException:
+            self._finished(None)
+            raise
+        future.add_done_callback(self._finished)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            scope.cancel()
+            self._bump('timeouts')
+            logger.warning(f"Database call {_call_name(fn)} cancelled after {timeout:.1f}s")
+            raise QueryTimeout(f"{_call_name(fn)} exceeded {timeout:.1f}s") from None
+        except asyncio.CancelledError:
+            # Client disconnected / request task cancelled
+            future.cancel()
+            scope.cancel()
+            self._bump('cancelled')
+            raise
+
+    def _call(self, scope: QueryScope, submitted: float, context: contextvars.Context,
+              fn: Callable, args: tuple) -> Any:
+        started = time.perf_counter()
+        waited_ms = (started - submitted) * 1000
+        with self._lock:
+            self._stats['queue_wait_ms'] += waited_ms
+            if waited_ms > self._stats['max_queue_wait_ms']:
+                self._stats['max_queue_wait_ms'] = waited_ms
+
+        if scope.cancelled:
+            raise sqlite3.OperationalError("interrupted")
+        try:
+            with use_scope(scope):
+                return context.run(fn, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed > SLOW_CALL_SECONDS and not scope.cancelled:
+                self._bump('slow_calls')
+                logger.info(f"Slow database call {_call_name(fn)}: {elapsed:.2f}s")
+
+    def _finished(self, future):
+        with self._lock:
+            self._pending -= 1
+            if future is not None and not future.cancelled():
+                self._stats['completed'] += 1
+
+    # ------------------------------------------------------------------
+    # Query helpers
+    # ------------------------------------------------------------------
+
+    async def fetch_all(self, db_path: Union[str, Path], sql: str, params: tuple = (),
+                        timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Run a SELECT on a pooled reader and return rows as dicts"""
+        def query():
+            with get_pool(db_path).reader() as conn:
+                return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        return await self.run(query, timeout=timeout)
+
+    async def fetch_one(self, db_path: Union[str, Path], sql: str, params: tuple = (),
+                        timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Run a SELECT on a pooled reader and return the first row as a dict (or None)"""
+        def query():
+            with get_pool(db_path).reader() as conn:
+                row = conn.execute(sql, params).fetchone()
+                return dict(row) if row else None
+        return await self.run(query, timeout=timeout)
+
+    async def execute(self, db_path: Union[str, Path], sql: str, params: tuple = (),
+                      timeout: Optional[float] = None) -> int:
+        """Run a write on the serialized writer; returns rows affected"""
+        def write():
+            with get_pool(db_path).writer() as conn:
+                return conn.execute(sql, params).rowcount
+        return await self.run(write, timeout=timeout)
+
+    # ------------------------------------------------------------------
+    # Stats & lifecycle
+    # ------------------------------------------------------------------
+
+    def _bump(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of executor counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = self._pending
+        started = stats['calls'] - stats['rejected']
+        stats['avg_queue_wait_ms'] = round(stats['queue_wait_ms'] / started, 3) if started else 0.0
+        stats['queue_wait_ms'] = round(stats['queue_wait_ms'], 3)
+        stats['max_queue_wait_ms'] = round(stats['max_queue_wait_ms'], 3)
+        stats['workers'] = self.workers
+        stats['max_queue'] = self.max_queue
+        stats['timeout_seconds'] = self.timeout
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# ============================================================================
+# SHARED EXECUTOR
+# ============================================================================
+
+_executor: Optional[DatabaseExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> DatabaseExecutor:
+    """Get the process-wide database executor (created on first use)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = DatabaseExecutor()
+    return _executor
+
+
+def shutdown_db_executor():
+    """Stop the shared executor (shutdown hook / tests)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+def off_loop(fn: Optional[Callable] = None, *, timeout: Optional[float] = None):
+    """
+    Turn a blocking endpoint into an async one that runs on the database executor.
+
+    Place it under the route decorator. FastAPI still sees the original
+    signature (parameters, Depends, response model) through __wrapped__.
+
+        @router.get("/dashboard/kpis")
+        @off_loop(timeout=10)
+        def get_dashboard_kpis(...):
+            ...
+
+    Not for endpoints that call an LLM: the call would hold one of the few
+    executor slots past the deadline (cancelling only interrupts SQLite).
+    Leave those as plain def so they run on FastAPI's threadpool.
+    """
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await get_db_executor().run(functools.partial(func, *args, **kwargs),
+                                               timeout=timeout)
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
@@ -17,7 +17,8 @@ from datetime import datetime
 from typing import Optional, Dict, List, Any
 from pathlib import Path
 
-from openai import OpenAI
+
+from .llm_dispatcher import get_llm_dispatcher
 
 DB_PATH = os.getenv('DATABASE_PATH', 'database/bensley_master.db')
 AUDIO_STORAGE_PATH = Path(os.getenv('AUDIO_STORAGE_PATH', 'uploads/audio'))
@@ -28,6 +29,7 @@ class AudioProcessor:
 
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
+        from openai import OpenAI
         self.client = OpenAI()
         AUDIO_STORAGE_PATH.mkdir(parents=True, exist_ok=True)
 
@@ -58,7 +60,8 @@ class AudioProcessor:
         analysis = await self.analyze_transcript(
             transcript_text,
             project_code=project_code,
-            attendees=attendees
+            attendees=attendees,
+            transcript_id=transcript_id
         )
 
         self.update_transcript(
@@ -67,6 +70,7 @@ class AudioProcessor:
             key_points=analysis.get('key_points'),
             action_items=analysis.get('action_items')
         )
+        get_llm_dispatcher(self.db_path).mark_applied([analysis.get('job_id')])
 
         task_ids = []
         if analysis.get('action_items'):
@@ -117,9 +121,16 @@ class AudioProcessor:
         self,
         transcript: str,
         project_code: Optional[str] = None,
-        attendees: Optional[List[str]] = None
+        attendees: Optional[List[str]] = None,
+        transcript_id: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Use GPT to summarize transcript and extract action items"""
+        """
+        Use GPT to summarize transcript and extract action items.
+
+        The request goes through the LLM dispatcher (shared rate limits,
+        retries on 429/5xx). With a transcript_id it is also a durable
+        llm_jobs row, so a reprocessed recording reuses a stored response.
+        """
         if not transcript or len(transcript.strip()) < 50:
             return {'summary': 'Recording too short for analysis', 'key_points': [], 'action_items': []}
 
@@ -146,22 +157,29 @@ Respond in JSON format:
     ]
 }}"""
 
+        request = {
+            'model': "gpt-4o-mini",
+            'messages': [
+                {"role": "system", "content": "You are a meeting analyst. Extract actionable insights from meeting transcripts. Always respond with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': 2000,
+            'temperature': 0.3,
+            'response_format': {"type": "json_object"}
+        }
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a meeting analyst. Extract actionable insights from meeting transcripts. Always respond with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.3,
-                response_format={"type": "json_object"}
+            [outcome] = await get_llm_dispatcher(self.db_path).dispatch(
+                'transcript_summary', [(transcript_id, request)]
             )
-            result = json.loads(response.choices[0].message.content)
+            if not outcome['success']:
+                raise RuntimeError(outcome['error'])
+            result = json.loads(outcome['content'])
             return {
                 'summary': result.get('summary', ''),
                 'key_points': result.get('key_points', []),
-                'action_items': result.get('action_items', [])
+                'action_items': result.get('action_items', []),
+                'job_id': outcome['job_id']
             }
         except Exception as e:
             return {'summary': f'Analysis failed: {str(e)}', 'key_points': [], 'action_items': []}
@@ -14,6 +14,9 @@ from typing import Optional, List, Dict, Any
 from contextlib import contextmanager
 from dotenv import load_dotenv
 
+from .connection_pool import get_pool
+from .pagination import count_total, keyset_page
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 
@@ -36,29 +39,42 @@ class BaseService:
         if not self.db_path.exists():
             raise FileNotFoundError(f"Database not found: {self.db_path}")
 
-        # Connection will be created per-request for thread safety
+        # Connections are borrowed from the shared pool per operation
         self._conn = None
+        self._pool = get_pool(self.db_path)
 
     @contextmanager
     def get_connection(self):
         """
-        Context manager for database connections with OneDrive sync handling
+        Context manager for a pooled database connection
+
+        Connections come from the shared pool (WAL mode, 60s busy timeout for
+        OneDrive sync). Commit explicitly if you write; uncommitted work is
+        rolled back when the connection is returned.
 
         Usage:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(...)
         """
-        conn = sqlite3.connect(self.db_path, timeout=60.0)  # 60 second timeout for OneDrive sync
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        conn.execute("PRAGMA busy_timeout = 60000")  # Additional 60s timeout for busy db
         # TEMPORARILY DISABLED: FK enforcement causes issues with legacy schema mismatches
         # TODO: Re-enable after comprehensive FK audit (see Issue #402)
-        # conn.execute("PRAGMA foreign_keys = ON")  # CRITICAL: Enable FK enforcement
-        try:
+        with self._pool.reader(row_factory=sqlite3.Row, foreign_keys=False) as conn:
+            yield conn
+
+    @contextmanager
+    def get_write_connection(self):
+        """
+        Context manager for the pool's serialized writer connection
+
+        Commits on success, rolls back on exception.
+
+        Usage:
+            with self.get_write_connection() as conn:
+                conn.execute("UPDATE ...")
+        """
+        with self._pool.writer(row_factory=sqlite3.Row, foreign_keys=False) as conn:
             yield conn
-        finally:
-            conn.close()
 
     def _retry_on_lock(self, operation, max_retries=10, initial_delay=1.0):
         """
@@ -85,6 +101,7 @@ class BaseService:
                         logging.error(f"Database still locked after {max_retries} attempts")
                         raise
 
+                    self._pool.record_lock_retry()
                     logging.warning(
                         f"Database locked (attempt {attempt + 1}/{max_retries}), "
                         f"retrying in {delay:.1f}s... (OneDrive sync likely in progress)"
@@ -133,10 +150,9 @@ class BaseService:
             Number of affected rows
         """
         def _do_update():
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(sql, params)
-                conn.commit()
                 return cursor.rowcount
 
         return self._retry_on_lock(_do_update)
@@ -153,17 +169,16 @@ class BaseService:
             Number of affected rows
         """
         def _do_many():
-            with self.get_connection() as conn:
+            with self.get_write_connection() as conn:
                 cursor = conn.cursor()
                 cursor.executemany(sql, params_list)
-                conn.commit()
                 return cursor.rowcount
 
         return self._retry_on_lock(_do_many)
 
     def get_last_insert_id(self) -> int:
-        """Get the ID of the last inserted row"""
-        with self.get_connection() as conn:
+        """Get the ID of the last row inserted through execute_update/execute_many"""
+        with self.get_write_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT last_insert_rowid()")
             return cursor.fetchone()[0]
@@ -233,32 +248,95 @@ class BaseService:
             raise ValueError(f"Invalid sort order: {order}. Must be 'ASC' or 'DESC'")
         return order_upper
 
-    def paginate(self, sql: str, params: tuple = (), page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    def paginate(self, sql: str, params: tuple = (), page: int = 1, per_page: int = 20,
+                 total: str = 'exact', count_tables: List[str] = ()) -> Dict[str, Any]:
         """
-        Paginate query results
+        Paginate query results with LIMIT/OFFSET
+
+        Deep pages re-read every row before them - prefer paginate_keyset
+        for long lists.
 
         Args:
             sql: Base SQL query (without LIMIT/OFFSET)
             params: Query parameters
             page: Page number (1-indexed)
             per_page: Results per page
+            total: 'exact' or 'cached' (see services.pagination)
+            count_tables: Tables whose data_versions stamp keeps a cached total valid
 
         Returns:
             Dict with 'items', 'total', 'page', 'per_page', 'pages'
         """
-        # Get total count
-        count_sql = f"SELECT COUNT(*) as total FROM ({sql})"
-        total = self.execute_query(count_sql, params, fetch_one=True)['total']
+        with self.get_connection() as conn:
+            # Get total count
+            total_rows, _ = count_total(conn, str(self.db_path), sql, params, total, count_tables)
 
-        # Get paginated results
-        offset = (page - 1) * per_page
-        paginated_sql = f"{sql} LIMIT ? OFFSET ?"
-        items = self.execute_query(paginated_sql, params + (per_page, offset))
+            # Get paginated results
+            offset = (page - 1) * per_page
+            paginated_sql = f"{sql} LIMIT ? OFFSET ?"
+            items = [dict(row) for row in conn.execute(paginated_sql, tuple(params) + (per_page, offset))]
 
         return {
             'items': items,
-            'total': total,
+            'total': total_rows,
             'page': page,
             'per_page': per_page,
-            'pages': (total + per_page - 1) // per_page  # Ceiling division
+            'pages': (total_rows + per_page - 1) // per_page  # Ceiling division
         }
+
+    def paginate_keyset(
+        self,
+        sql: str,
+        params: tuple = (),
+        sort_column: str = 'rowid',
+        id_column: str = 'rowid',
+        descending: bool = True,
+        cursor: Optional[str] = None,
+        page: int = 1,
+        per_page: int = 20,
+        total: str = 'cached',
+        count_tables: List[str] = (),
+        estimate_table: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Paginate query results with a keyset cursor
+
+        Each page seeks past the previous page's last (sort_column, id_column)
+        instead of skipping rows with OFFSET. The total is reused while the
+        queried tables are unchanged instead of being recounted per page.
+
+        Args:
+            sql: Base SQL query (without ORDER BY/LIMIT); sort_column and
+                 id_column name its result columns
+            params: Query parameters
+            sort_column: Result column to sort by (may be NULL)
+            id_column: Unique, non-NULL result column that breaks ties
+            descending: Sort direction
+            cursor: 'next_cursor' of the previous page
+            page: Page number, used only without a cursor (OFFSET fallback)
+            per_page: Results per page
+            total: 'exact', 'cached' or 'estimate' (see services.pagination)
+            count_tables: Tables whose data_versions stamp keeps a cached total valid
+            estimate_table: Table whose sqlite_stat1 count is the 'estimate' total
+
+        Returns:
+            Dict with 'items', 'total', 'total_estimated', 'page', 'per_page',
+            'pages', 'has_more', 'next_cursor'
+
+        Raises:
+            ValueError: Malformed cursor, or one from a different sort
+        """
+        with self.get_connection() as conn:
+            result = keyset_page(conn, sql, params, sort_column, id_column, descending,
+                                 cursor, per_page, (page - 1) * per_page)
+            total_rows, estimated = count_total(conn, str(self.db_path), sql, params, total,
+                                                count_tables, estimate_table)
+
+        result.update({
+            'total': total_rows,
+            'total_estimated': estimated,
+            'page': page,
+            'per_page': per_page,
+            'pages': (total_rows + per_page - 1) // per_page,
+        })
+        return result
@@ -16,6 +16,7 @@ import re
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from .base_service import BaseService
+from .usage_counters import get_usage_counters
 
 logger = logging.getLogger(__name__)
 
@@ -359,12 +360,7 @@ class BatchSuggestionService(BaseService):
     def _increment_pattern_usage(self, pattern_id: int):
         """Increment times_used counter for pattern analytics"""
         try:
-            self.execute_update("""
-                UPDATE email_learned_patterns
-                SET times_used = times_used + 1,
-                    last_used_at = datetime('now')
-                WHERE pattern_id = ?
-            """, [pattern_id])
+            get_usage_counters(self.db_path).record('email_learned_patterns', pattern_id)
         except Exception as e:
             logger.warning(f"Failed to increment pattern usage: {e}")
 
@@ -0,0 +1,443 @@
+"""
+Blob Store - content-addressed storage for attachments and project files
+
+Every distinct file body is stored once, keyed by SHA-256:
+
+    files/blobs/ab/cd/abcd1234...   (BLOB_STORE_DIR)
+
+blobs (migration 109) has one row per stored blob with a reference count;
+blob_refs links an owner row (attachments, email_attachments,
+project_files, documents) to its blob and keeps the path the owner row
+recorded, so paths written before the store existed still resolve.
+Triggers keep blobs.ref_count in step with blob_refs.
+
+Writers pass their own connection so refs commit with the owner row:
+
+    store = BlobStore(db_path)
+    sha256, path = store.put_file(conn, spooled_path, sha256=known_hash, move=True)
+    store.add_ref(conn, 'attachments', attachment_id, sha256, logical_path=str(path))
+
+Readers go through resolve() / resolve_owner(), which fall back to the raw
+path for files that were never ingested. materialize() gives a blob its
+original filename (hard link under .materialized/) on first request only,
+for consumers that need a real name or extension.
+
+Anything handed to an HTTP client goes through servable() first: only
+paths inside the store or the serve roots (files/ plus FILE_SERVE_ROOTS,
+os.pathsep separated) are served, whatever path an owner row records.
+"""
+
+import os
+import shutil
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+FILES_ROOT = Path(__file__).resolve().parent.parent.parent / 'files'
+DEFAULT_ROOT = FILES_ROOT / 'blobs'
+HASH_CHUNK_SIZE = 1024 * 1024
+GC_GRACE_HOURS = 24
+
+# owner_table -> (primary key column, path column)
+OWNER_TABLES = {
+    'attachments': ('attachment_id', 'stored_path'),
+    'email_attachments': ('attachment_id', 'filepath'),
+    'project_files': ('file_id', 'file_path'),
+    'documents': ('document_id', 'file_path'),
+}
+
+
+def hash_file(path) -> Tuple[str, int]:
+    """SHA-256 hex digest and size of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class BlobStore(BaseService):
+    """SHA-256 keyed file store with reference-counted owner links"""
+
+    def __init__(self, db_path: Optional[str] = None, root: Optional[str] = None,
+                 serve_roots: Optional[List[str]] = None):
+        super().__init__(db_path)
+        self.root = Path(root or os.getenv('BLOB_STORE_DIR') or DEFAULT_ROOT)
+        if serve_roots is None:
+            serve_roots = [str(FILES_ROOT)] + [
+                p for p in os.getenv('FILE_SERVE_ROOTS', '').split(os.pathsep) if p
+            ]
+        self.serve_roots = [Path(p).expanduser().resolve() for p in [self.root, *serve_roots]]
+        self._has_refs = False
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def _materialized_dir(self, sha256: str) -> Path:
+        return self.root / '.materialized' / sha256
+
+    # ------------------------------------------------------------------
+    # Writes (caller's connection / transaction)
+    # ------------------------------------------------------------------
+
+    def put_file(self, conn: sqlite3.Connection, src, sha256: Optional[str] = None,
+                 move: bool = False, link: bool = False) -> Tuple[str, Path]:
+        """
+        Store a file's content, returning (sha256, blob path)
+
+        Args:
+            conn: Connection the blobs row is written on (caller commits)
+            src: File to ingest
+            sha256: Digest if already known (e.g. from the streaming parser)
+            move: Take ownership of src - renamed into place, or removed if
+                  the content is already stored
+            link: Without move, hard link instead of copying where possible
+                  (only if src will be deleted or never modified afterwards)
+        """
+        src = Path(src)
+        size = src.stat().st_size
+        if sha256 is None:
+            sha256, size = hash_file(src)
+
+        # Row first: it takes the write lock, so gc() cannot remove the blob
+        # between the exists() check below and the caller's add_ref()
+        conn.execute(
+            "INSERT OR IGNORE INTO blobs (sha256, size) VALUES (?, ?)", (sha256, size)
+        )
+
+        dest = self.blob_path(sha256)
+        if dest.exists():
+            if move:
+                src.unlink()
+        else:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if move:
+                try:
+                    os.replace(src, dest)
+                except OSError:
+                    # Different filesystem - copy then drop the source
+                    self._copy_into_place(src, dest)
+                    src.unlink()
+            else:
+                self._copy_into_place(src, dest, link=link)
+
+        return sha256, dest
+
+    @staticmethod
+    def _copy_into_place(src: Path, dest: Path, link: bool = False):
+        """Copy via a temp file in the target directory so readers never see a partial blob"""
+        fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix='.incoming-')
+        os.close(fd)
+        try:
+            if link:
+                os.remove(tmp)
+                try:
+                    os.link(src, tmp)
+                except OSError:
+                    shutil.copyfile(src, tmp)
+            else:
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def add_ref(self, conn: sqlite3.Connection, owner_table: str, owner_id: int,
+                sha256: str, logical_path: Optional[str] = None):
+        """Point an owner row at a blob (replaces any previous ref for that row)"""
+        existing = conn.execute(
+            "SELECT sha256 FROM blob_refs WHERE owner_table = ? AND owner_id = ?",
+            (owner_table, owner_id)
+        ).fetchone()
+        if existing:
+            conn.execute("""
+                UPDATE blob_refs SET sha256 = ?, logical_path = ?
+                WHERE owner_table = ? AND owner_id = ?
+            """, (sha256, logical_path, owner_table, owner_id))
+        else:
+            conn.execute("""
+                INSERT INTO blob_refs (owner_table, owner_id, sha256, logical_path)
+                VALUES (?, ?, ?, ?)
+            """, (owner_table, owner_id, sha256, logical_path))
+
+    def release(self, conn: sqlite3.Connection, owner_table: str, owner_id: int) -> int:
+        """Drop an owner row's ref; the blob is left for gc(). Returns refs removed."""
+        if not self._refs_available():
+            return 0
+        cursor = conn.execute(
+            "DELETE FROM blob_refs WHERE owner_table = ? AND owner_id = ?", (owner_table, owner_id)
+        )
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _refs_available(self) -> bool:
+        """False until migration 109 has been applied (reads use raw paths)"""
+        if not self._has_refs:
+            self._has_refs = self.table_exists('blob_refs')
+        return self._has_refs
+
+    def resolve(self, path: Optional[str]) -> Optional[Path]:
+        """
+        Where the content for a recorded path actually lives
+
+        Ingested paths map to their blob; anything else is returned as-is
+        if it exists on disk. None if neither.
+        """
+        if not path:
+            return None
+        if not self._refs_available():
+            candidate = Path(path).expanduser()
+            return candidate if candidate.exists() else None
+        row = self.execute_query(
+            "SELECT sha256 FROM blob_refs WHERE logical_path = ? LIMIT 1", (str(path),), fetch_one=True
+        )
+        if row:
+            blob = self.blob_path(row['sha256'])
+            if blob.exists():
+                return blob
+            logger.warning(f"Blob {row['sha256']} for {path} is missing from {self.root}")
+        candidate = Path(path).expanduser()
+        return candidate if candidate.exists() else None
+
+    def resolve_owner(self, owner_table: str, owner_id: int,
+                      fallback_path: Optional[str] = None) -> Optional[Path]:
+        """Content path for an owner row, via its ref or else its recorded path"""
+        if not self._refs_available():
+            return self.resolve(fallback_path)
+        row = self.execute_query(
+            "SELECT sha256 FROM blob_refs WHERE owner_table = ? AND owner_id = ?",
+            (owner_table, owner_id), fetch_one=True
+        )
+        if row:
+            blob = self.blob_path(row['sha256'])
+            if blob.exists():
+                return blob
+        return self.resolve(fallback_path)
+
+    def servable(self, path) -> Optional[Path]:
+        """
+        path, fully resolved, if it lies inside the store or a serve root
+
+        None for anything else (recorded paths are client-supplied, so
+        /etc/passwd or the database must never be served). Symlinks are
+        followed before the check.
+        """
+        if path is None:
+            return None
+        resolved = Path(path).expanduser().resolve()
+        if not resolved.is_file():
+            return None
+        if any(resolved.is_relative_to(root) for root in self.serve_roots):
+            return resolved
+        logger.warning(f"Refusing to serve {resolved}: outside the blob store and serve roots")
+        return None
+
+    def blob_info(self, owner_table: str, owner_id: int) -> Optional[Dict[str, Any]]:
+        """sha256, size and ref_count of an owner row's blob"""
+        if not self._refs_available():
+            return None
+        return self.execute_query("""
+            SELECT b.sha256, b.size, b.ref_count
+            FROM blob_refs r JOIN blobs b ON b.sha256 = r.sha256
+            WHERE r.owner_table = ? AND r.owner_id = ?
+        """, (owner_table, owner_id), fetch_one=True)
+
+    def materialize(self, sha256: str, filename: str) -> Path:
+        """
+        A path to the blob under its original filename, created on first use
+
+        Hard link when the filesystem allows it (no extra space), copy otherwise.
+        """
+        name = Path(filename).name or sha256
+        target = self._materialized_dir(sha256) / name
+        if target.exists():
+            return target
+
+        blob = self.blob_path(sha256)
+        if not blob.exists():
+            raise FileNotFoundError(f"Blob not found: {sha256}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(blob, target)
+        except FileExistsError:
+            pass
+        except OSError:
+            self._copy_into_place(blob, target)
+        return target
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _recorded_paths(self, files_root: Path) -> Dict[Path, List[Tuple[str, int, str]]]:
+        """Owner rows whose recorded path lies under files_root, by resolved path"""
+        owners: Dict[Path, List[Tuple[str, int, str]]] = defaultdict(list)
+        with self.get_connection() as conn:
+            tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table, (pk, column) in OWNER_TABLES.items():
+                if table not in tables:
+                    continue
+                columns = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    continue
+                for owner_id, recorded in conn.execute(
+                    f"SELECT {pk}, {column} FROM {table} WHERE {column} IS NOT NULL AND {column} != ''"
+                ):
+                    path = Path(recorded).expanduser().resolve()
+                    if files_root in path.parents:
+                        owners[path].append((table, owner_id, recorded))
+        return owners
+
+    def ingest_existing(self, files_root='files', dry_run: bool = False,
+                        keep_originals: bool = False) -> Dict[str, int]:
+        """
+        Move files already referenced by the database into the store
+
+        Every file under files_root that an owner row points at is hashed,
+        stored once and linked to all of its owners; duplicates collapse to
+        one blob. Owner rows keep their recorded path (it resolves through
+        blob_refs). Originals are deleted only after the refs are committed,
+        so an interrupted run loses nothing and can simply be re-run.
+        Files no row refers to are left alone.
+        """
+        files_root = Path(files_root).expanduser().resolve()
+        store_root = self.root.expanduser().resolve()
+        result = {'files': 0, 'bytes': 0, 'duplicates': 0, 'duplicate_bytes': 0,
+                  'refs': 0, 'missing': 0, 'errors': 0}
+        seen = set()
+
+        for path, owners in sorted(self._recorded_paths(files_root).items()):
+            if store_root == path or store_root in path.parents:
+                continue
+            if not path.is_file():
+                result['missing'] += 1
+                continue
+            try:
+                sha256, size = hash_file(path)
+                result['files'] += 1
+                result['bytes'] += size
+                if sha256 in seen or self.blob_path(sha256).exists():
+                    result['duplicates'] += 1
+                    result['duplicate_bytes'] += size
+                seen.add(sha256)
+                if dry_run:
+                    continue
+
+                with self.get_write_connection() as conn:
+                    self.put_file(conn, path, sha256=sha256, link=not keep_originals)
+                    for table, owner_id, recorded in owners:
+                        self.add_ref(conn, table, owner_id, sha256, logical_path=recorded)
+                        result['refs'] += 1
+
+                if not keep_originals:
+                    path.unlink()
+            except Exception as e:
+                logger.error(f"Could not ingest {path}: {e}")
+                result['errors'] += 1
+
+        logger.info(f"Blob ingest{' (dry run)' if dry_run else ''}: {result}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored vs logical bytes - the difference is what dedup saves"""
+        stored = self.execute_query(
+            "SELECT COUNT(*) AS blobs, COALESCE(SUM(size), 0) AS bytes FROM blobs", fetch_one=True
+        )
+        logical = self.execute_query("""
+            SELECT COUNT(*) AS refs, COALESCE(SUM(b.size), 0) AS bytes
+            FROM blob_refs r JOIN blobs b ON b.sha256 = r.sha256
+        """, fetch_one=True)
+        unreferenced = self.count_rows('blobs', 'ref_count <= 0')
+        return {
+            'blobs': stored['blobs'],
+            'stored_bytes': stored['bytes'],
+            'refs': logical['refs'],
+            'logical_bytes': logical['bytes'],
+            'saved_bytes': logical['bytes'] - stored['bytes'],
+            'unreferenced_blobs': unreferenced,
+        }
+
+    def _drop_dangling_refs(self, conn: sqlite3.Connection) -> int:
+        """Remove refs whose owner row has been deleted"""
+        dropped = 0
+        existing = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table, (pk, _) in OWNER_TABLES.items():
+            if table not in existing:
+                continue
+            cursor = conn.execute(f"""
+                DELETE FROM blob_refs
+                WHERE owner_table = ?
+                  AND owner_id NOT IN (SELECT {pk} FROM {table})
+            """, (table,))
+            dropped += cursor.rowcount
+        return dropped
+
+    def gc(self, grace_hours: float = GC_GRACE_HOURS, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Delete blobs nothing references any more
+
+        A blob is collected once its ref_count has been zero for grace_hours
+        (so an import that has written the blob but not yet its ref is safe).
+        Files under the store with no blobs row and older than the grace
+        period (interrupted writes) are removed too.
+        """
+        result = {'dangling_refs': 0, 'blobs_deleted': 0, 'bytes_freed': 0, 'orphan_files': 0}
+        cutoff = f'-{grace_hours * 3600:.0f} seconds'
+
+        with self.get_write_connection() as conn:
+            if not dry_run:
+                result['dangling_refs'] = self._drop_dangling_refs(conn)
+
+            rows = conn.execute("""
+                SELECT sha256, size FROM blobs
+                WHERE ref_count <= 0
+                  AND COALESCE(unreferenced_at, created_at) <= datetime('now', ?)
+            """, (cutoff,)).fetchall()
+
+            for sha256, size in rows:
+                result['blobs_deleted'] += 1
+                result['bytes_freed'] += size or 0
+                if dry_run:
+                    continue
+                conn.execute("DELETE FROM blobs WHERE sha256 = ? AND ref_count <= 0", (sha256,))
+                shutil.rmtree(self._materialized_dir(sha256), ignore_errors=True)
+                try:
+                    self.blob_path(sha256).unlink()
+                except FileNotFoundError:
+                    pass
+
+            known = {r[0] for r in conn.execute("SELECT sha256 FROM blobs")}
+
+        # Files on disk that never got (or lost) their blobs row
+        oldest = time.time() - grace_hours * 3600
+        if self.root.exists():
+            for shard in self.root.glob('[0-9a-f][0-9a-f]/[0-9a-f][0-9a-f]'):
+                for path in shard.iterdir():
+                    if path.name in known or path.stat().st_mtime > oldest:
+                        continue
+                    result['orphan_files'] += 1
+                    result['bytes_freed'] += path.stat().st_size
+                    if not dry_run:
+                        path.unlink()
+
+        logger.info(f"Blob GC{' (dry run)' if dry_run else ''}: {result}")
+        return result
@@ -16,7 +16,6 @@ import json
 import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from openai import OpenAI
 from pathlib import Path
 
 # Database path
@@ -33,6 +32,7 @@ class CalendarService:
         """Initialize OpenAI client"""
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
 
     def _get_connection(self) -> sqlite3.Connection:
@@ -0,0 +1,521 @@
+"""
+SQLite Connection Pool
+
+Shared connection manager used by BaseService and the API dependencies.
+
+Opening a connection and re-applying pragmas costs more than most of the
+queries we run, so connections are kept open and reused:
+- Reader connections are parked per thread (plus a small shared overflow
+  stack) and handed out exclusively while checked out
+- A single writer connection serializes INSERT/UPDATE/DELETE work behind a
+  lock and retries when another process holds the database lock
+- Every connection runs in WAL mode with tuned cache/mmap/synchronous pragmas
+- Idle connections are health-checked before being handed out again
+
+Usage:
+    from services.connection_pool import get_pool
+
+    pool = get_pool(db_path)
+
+    with pool.reader() as conn:
+        conn.execute("SELECT ...")
+
+    with pool.writer() as conn:
+        conn.execute("UPDATE ...")      # committed on exit, rolled back on error
+
+    conn = pool.acquire()               # drop-in for sqlite3.connect(db_path)
+    ...
+    conn.close()                        # returns the connection to the pool
+
+    pool.stats()                        # checkouts, wait time, lock retries, ...
+
+    with use_scope(scope):              # reader queries in this block abort
+        ...                             # once another thread calls scope.cancel()
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Union
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+# Tunables (override via environment)
+JOURNAL_MODE = os.getenv('DB_JOURNAL_MODE', 'WAL').upper()
+SYNCHRONOUS = os.getenv('DB_SYNCHRONOUS', 'NORMAL').upper()
+CACHE_SIZE_KB = int(os.getenv('DB_CACHE_SIZE_KB', '65536'))        # 64 MB page cache
+MMAP_SIZE = int(os.getenv('DB_MMAP_SIZE', str(256 * 1024 * 1024)))  # 256 MB
+BUSY_TIMEOUT_MS = int(os.getenv('DB_BUSY_TIMEOUT_MS', '60000'))     # OneDrive sync can hold locks
+MAX_IDLE_READERS = int(os.getenv('DB_POOL_MAX_IDLE', '8'))
+HEALTH_CHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTH_CHECK_SECONDS', '30'))
+WRITE_MAX_RETRIES = int(os.getenv('DB_WRITE_MAX_RETRIES', '10'))
+PROGRESS_CHECK_OPS = int(os.getenv('DB_PROGRESS_CHECK_OPS', '20000'))  # VM steps between cancel checks
+
+
+class QueryScope:
+    """
+    Reader connections checked out by one unit of work, so another thread
+    can cancel it.
+
+    cancel() interrupts whatever statement is running and installs a
+    progress handler check so later statements in the same scope abort
+    too (sqlite3.OperationalError: interrupted). The writer is never
+    tracked - writes always run to completion.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._conns: set = set()
+
+    def _should_abort(self) -> int:
+        return 1 if self.cancelled else 0
+
+    def track(self, conn: 'PooledConnection'):
+        conn.set_progress_handler(self._should_abort, PROGRESS_CHECK_OPS)
+        conn._scope = self
+        with self._lock:
+            self._conns.add(conn)
+
+    def untrack(self, conn: 'PooledConnection'):
+        # Under the lock so cancel() can never interrupt a connection that
+        # has already gone back to the pool
+        with self._lock:
+            self._conns.discard(conn)
+        conn._scope = None
+        conn.set_progress_handler(None, 0)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for conn in self._conns:
+                conn.interrupt()
+
+
+_scope_local = threading.local()
+
+
+@contextmanager
+def use_scope(scope: QueryScope):
+    """Track reader connections acquired on this thread in `scope`"""
+    previous = getattr(_scope_local, 'scope', None)
+    _scope_local.scope = scope
+    try:
+        yield scope
+    finally:
+        _scope_local.scope = previous
+
+
+def current_scope() -> Optional[QueryScope]:
+    """The scope work on this thread is running under, if any"""
+    return getattr(_scope_local, 'scope', None)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection that returns itself to its pool on close().
+
+    Being a real sqlite3.Connection subclass means existing code (row_factory
+    assignment, `with conn:` transactions, pandas.read_sql) keeps working.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool: Optional['ConnectionPool'] = None
+        self._checked_out = False
+        self._is_writer = False
+        self._foreign_keys = False
+        self._last_used = time.monotonic()
+        self._scope: Optional[QueryScope] = None
+
+    def close(self):
+        """Release back to the pool (or really close if the pool is gone)"""
+        if self._pool is None:
+            self.really_close()
+        elif self._checked_out and not self._is_writer:
+            self._pool.release(self)
+        # The writer stays open until the pool closes it
+
+    def really_close(self):
+        """Close the underlying SQLite handle"""
+        try:
+            sqlite3.Connection.close(self)
+        except sqlite3.Error:
+            pass
+
+
+class ConnectionPool:
+    """
+    Connection pool for a single SQLite database file.
+
+    One pool exists per database path; get one with get_pool().
+    """
+
+    def __init__(self, db_path: Union[str, Path], max_idle: int = MAX_IDLE_READERS):
+        self.db_path = str(Path(db_path).expanduser())
+        self.max_idle = max_idle
+
+        self._local = threading.local()
+        self._idle: List[PooledConnection] = []
+        self._idle_lock = threading.Lock()
+
+        self._writer: Optional[PooledConnection] = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+
+        self._journal_mode: Optional[str] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'reader_checkouts': 0,
+            'writer_checkouts': 0,
+            'thread_reuse_hits': 0,
+            'overflow_reuse_hits': 0,
+            'connections_opened': 0,
+            'connections_closed': 0,
+            'in_use': 0,
+            'wait_time_ms': 0.0,
+            'max_wait_ms': 0.0,
+            'lock_retries': 0,
+            'health_check_failures': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Connection setup
+    # ------------------------------------------------------------------
+
+    def _open(self) -> PooledConnection:
+        """Open and configure a new connection"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            factory=PooledConnection,
+        )
+        conn._pool = self
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+        # journal_mode is persistent in the file - only needs setting once
+        if self._journal_mode is None:
+            try:
+                row = conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}").fetchone()
+                self._journal_mode = (row[0] if row else JOURNAL_MODE).upper()
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Could not set journal_mode={JOURNAL_MODE}: {e}")
+                self._journal_mode = 'UNKNOWN'
+
+        conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+        conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        self._bump('connections_opened')
+        return conn
+
+    def _prepare(self, conn: PooledConnection, row_factory, foreign_keys: bool):
+        """Reset per-checkout state"""
+        conn.row_factory = row_factory
+        if conn._foreign_keys != foreign_keys:
+            conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
+            conn._foreign_keys = foreign_keys
+        conn._checked_out = True
+
+    def _is_healthy(self, conn: PooledConnection) -> bool:
+        """Ping connections that have been idle for a while"""
+        if time.monotonic() - conn._last_used < HEALTH_CHECK_INTERVAL:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            self._bump('health_check_failures')
+            conn.really_close()
+            self._bump('connections_closed')
+            return False
+
+    # ------------------------------------------------------------------
+    # Readers
+    # ------------------------------------------------------------------
+
+    def acquire(self, row_factory=None, foreign_keys: bool = False) -> PooledConnection:
+        """
+        Check out a reader connection.
+
+        Defaults mirror a bare sqlite3.connect() (tuple rows, FK enforcement
+        off) so this can replace ad-hoc connects. Call close() to release.
+
+        Args:
+            row_factory: Row factory for this checkout (e.g. sqlite3.Row)
+            foreign_keys: Enable PRAGMA foreign_keys for this checkout
+
+        Returns:
+            A checked-out PooledConnection
+        """
+        scope = getattr(_scope_local, 'scope', None)
+        if scope is not None and scope.cancelled:
+            raise sqlite3.OperationalError("interrupted")
+
+        start = time.perf_counter()
+        conn = None
+
+        home = getattr(self._local, 'conn', None)
+        if home is not None:
+            self._local.conn = None
+            if self._is_healthy(home):
+                conn = home
+                self._bump('thread_reuse_hits')
+
+        while conn is None:
+            with self._idle_lock:
+                candidate = self._idle.pop() if self._idle else None
+            if candidate is None:
+                conn = self._open()
+            elif self._is_healthy(candidate):
+                conn = candidate
+                self._bump('overflow_reuse_hits')
+
+        self._prepare(conn, row_factory, foreign_keys)
+        if scope is not None:
+            scope.track(conn)
+        self._record_checkout('reader_checkouts', start)
+        return conn
+
+    def release(self, conn: PooledConnection):
+        """Return a reader connection to the pool"""
+        if not conn._checked_out:
+            return
+        if conn._scope is not None:
+            conn._scope.untrack(conn)
+        conn._checked_out = False
+        conn._last_used = time.monotonic()
+        self._bump('in_use', -1)
+
+        try:
+            if conn.in_transaction:
+                # Uncommitted work is discarded, same as closing a connection
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            conn.really_close()
+            self._bump('connections_closed')
+            return
+
+        if getattr(self._local, 'conn', None) is None:
+            self._local.conn = conn
+            return
+
+        with self._idle_lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+
+        conn.really_close()
+        self._bump('connections_closed')
+
+    @contextmanager
+    def reader(self, row_factory=sqlite3.Row, foreign_keys: bool = False):
+        """
+        Context manager for a pooled reader connection.
+
+        The connection may still be used for writes (commit explicitly);
+        anything left uncommitted is rolled back on release.
+        """
+        conn = self.acquire(row_factory=row_factory, foreign_keys=foreign_keys)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def writer(self, row_factory=sqlite3.Row, foreign_keys: bool = False):
+        """
+        Context manager for the serialized writer connection.
+
+        Takes the write lock up front (BEGIN IMMEDIATE), retrying with
+        exponential backoff while another process holds it. Commits on
+        success, rolls back on exception. Re-entrant within a thread.
+        """
+        start = time.perf_counter()
+        with self._writer_lock:
+            if self._writer_depth > 0:
+                # Nested use joins the outer transaction
+                self._record_checkout('writer_checkouts', start)
+                self._writer_depth += 1
+                try:
+                    yield self._writer
+                finally:
+                    self._writer_depth -= 1
+                    self._bump('in_use', -1)
+                return
+
+            if self._writer is None or not self._is_healthy(self._writer):
+                self._writer = self._open()
+                self._writer._is_writer = True
+
+            conn = self._writer
+            self._prepare(conn, row_factory, foreign_keys)
+            self._begin_immediate(conn)
+            self._record_checkout('writer_checkouts', start)
+
+            self._writer_depth = 1
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except BaseException:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                self._writer_depth = 0
+                conn._checked_out = False
+                conn._last_used = time.monotonic()
+                self._bump('in_use', -1)
+
+    def _begin_immediate(self, conn: PooledConnection):
+        """Start a write transaction, backing off while the DB is locked"""
+        delay = 0.05
+        for attempt in range(WRITE_MAX_RETRIES):
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e).lower() or attempt == WRITE_MAX_RETRIES - 1:
+                    raise
+                self.record_lock_retry()
+                logger.warning(
+                    f"Database locked acquiring write lock "
+                    f"(attempt {attempt + 1}/{WRITE_MAX_RETRIES}), retrying in {delay:.2f}s"
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+
+    # ------------------------------------------------------------------
+    # Stats & health
+    # ------------------------------------------------------------------
+
+    def _bump(self, key: str, amount: Union[int, float] = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _record_checkout(self, key: str, start: float):
+        waited_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self._stats[key] += 1
+            self._stats['in_use'] += 1
+            self._stats['wait_time_ms'] += waited_ms
+            if waited_ms > self._stats['max_wait_ms']:
+                self._stats['max_wait_ms'] = waited_ms
+
+    def record_lock_retry(self):
+        """Count a 'database is locked' retry (also used by BaseService._retry_on_lock)"""
+        self._bump('lock_retries')
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._idle_lock:
+            stats['idle_overflow'] = len(self._idle)
+
+        checkouts = stats['reader_checkouts'] + stats['writer_checkouts']
+        stats['checkouts'] = checkouts
+        stats['avg_wait_ms'] = round(stats['wait_time_ms'] / checkouts, 3) if checkouts else 0.0
+        stats['wait_time_ms'] = round(stats['wait_time_ms'], 3)
+        stats['max_wait_ms'] = round(stats['max_wait_ms'], 3)
+        stats['db_path'] = self.db_path
+        stats['journal_mode'] = self._journal_mode
+        return stats
+
+    def health_check(self) -> Dict[str, Any]:
+        """Verify a reader and the writer can reach the database"""
+        result = {'healthy': True, 'journal_mode': self._journal_mode, 'errors': []}
+        try:
+            with self.reader() as conn:
+                conn.execute("SELECT 1").fetchone()
+                result['journal_mode'] = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        except sqlite3.Error as e:
+            result['healthy'] = False
+            result['errors'].append(f"reader: {e}")
+
+        if self._writer_lock.acquire(timeout=1.0):
+            try:
+                if self._writer is not None and self._writer_depth == 0:
+                    self._writer.execute("SELECT 1").fetchone()
+            except sqlite3.Error as e:
+                result['healthy'] = False
+                result['errors'].append(f"writer: {e}")
+                self._writer.really_close()
+                self._writer = None
+            finally:
+                self._writer_lock.release()
+        return result
+
+    def close_all(self):
+        """Close idle connections and the writer (checked-out ones close on release)"""
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        home = getattr(self._local, 'conn', None)
+        if home is not None:
+            idle.append(home)
+            self._local.conn = None
+        for conn in idle:
+            conn.really_close()
+            self._bump('connections_closed')
+
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.really_close()
+                self._writer = None
+                self._bump('connections_closed')
+
+
+# ============================================================================
+# POOL REGISTRY
+# ============================================================================
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: Union[str, Path, None] = None) -> ConnectionPool:
+    """
+    Get the shared pool for a database path (created on first use)
+
+    Args:
+        db_path: Path to SQLite database (defaults to DATABASE_PATH from .env)
+    """
+    if db_path is None:
+        db_path = os.getenv('DATABASE_PATH', 'database/bensley_master.db')
+    key = str(Path(db_path).expanduser().resolve())
+
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(key)
+                _pools[key] = pool
+    return pool
+
+
+def all_pool_stats() -> List[Dict[str, Any]]:
+    """Stats for every pool opened in this process"""
+    return [pool.stats() for pool in list(_pools.values())]
+
+
+def close_all_pools():
+    """Close every pool (shutdown hook / tests)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -22,7 +22,6 @@ import re
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-from openai import OpenAI
 
 from .base_service import BaseService
 
@@ -76,6 +75,7 @@ class ContactContextService(BaseService):
         api_key = os.environ.get('OPENAI_API_KEY')
         self.ai_enabled = bool(api_key)
         if self.ai_enabled:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
 
     # =========================================================================
@@ -0,0 +1,575 @@
+"""
+Contact Name Index - phonetic and trigram lookup of contacts by name (migration 121)
+
+Names heard in meetings ("Kara", "Steven Lim") and names in signatures need
+to be matched to contacts. Comparing the name against every contact one by
+one is slow, and capping the list (the transcript matcher used the first
+100 contacts) misses everyone past the cap.
+
+Every contact name is indexed under two kinds of keys:
+- p:<code>  phonetic code of each name token (Double Metaphone style,
+            primary and alternate code), so Caragh / Kara or Stephen /
+            Steven share keys
+- t:<tri>   character trigrams of each token ($ka, kar, ara, ra$), for
+            spelling variants phonetics do not cover
+
+Keys are persisted in contact_name_keys (key -> contact_id postings). The
+name's tokens and their codes are persisted in contact_name_entries. Triggers on
+contacts queue changed contact_ids in contact_name_index_queue. The first
+lookup loads the postings into memory. Later lookups re-check the queue
+only after the contacts data_versions stamp moves, then re-index only the
+queued contacts. A lookup scores only the contacts that share keys with
+the name, and takes well under a millisecond.
+
+Usage:
+    index = get_contact_name_index(db_path)
+    index.candidates('Kara', k=5)        # [{contact_id, name, email, role, company, score}]
+    index.best_match('Steven Lim')       # best candidate with score >= 0.85, or None
+    index.duplicate_groups()             # same person under several contacts
+"""
+
+import heapq
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+# Without a contacts data_versions counter, reload at most this often
+INDEX_REFRESH_SECONDS = 60
+# Trigram postings longer than this are too common to narrow anything down
+MAX_TRIGRAM_POSTING = 500
+# Contacts scored per lookup (those whose keys overlap the name's most)
+MAX_SCORED_CANDIDATES = 48
+# Queue rows re-indexed per write transaction
+DRAIN_BATCH = 2000
+
+_CONTACT_COLUMNS = 'contact_id, name, email, role, company'
+
+# (token, phonetic codes) per name token
+Tokens = Tuple[Tuple[str, FrozenSet[str]], ...]
+# A contact's tokens, their trigrams and its number of index keys
+IndexedName = Tuple[Tokens, FrozenSet[str], int]
+
+
+# ============================================================================
+# NAME KEYS
+# ============================================================================
+
+_VOWELS = set('aeiouy')
+
+
+def phonetic_codes(word: str) -> Tuple[str, str]:
+    """
+    (primary, alternate) phonetic code of one lower-case name token.
+
+    A compact Double Metaphone: the common English spelling rules plus
+    alternate codes for ambiguous letters (G before e/i/y, J, initial W,
+    TH). Codes are at most 4 characters.
+    """
+    w = word
+    if not w:
+        return '', ''
+    primary: List[str] = []
+    alternate: List[str] = []
+
+    def add(p: str, a: Optional[str] = None):
+        primary.append(p)
+        alternate.append(p if a is None else a)
+
+    def at(i: int, length: int = 1) -> str:
+        return w[i:i + length] if 0 <= i else ''
+
+    i = 0
+    if w[:2] in ('gn', 'kn', 'pn', 'wr', 'ps'):
+        i = 1
+    elif w[0] == 'x':
+        add('S')
+        i = 1
+    elif w[0] in _VOWELS:
+        add('A')
+        i = 1
+    elif w[0] == 'w' and len(w) > 1 and w[1] in _VOWELS:
+        add('A', 'F')
+        i = 1
+    elif w[:2] == 'wh':
+        add('A')
+        i = 2
+
+    while i < len(w) and len(''.join(primary)) < 4:
+        c = w[i]
+        nxt = at(i + 1)
+        if c in _VOWELS:
+            i += 1
+            continue
+        if c == nxt and c != 'c':
+            i += 1          # doubled consonant sounds once
+            continue
+        if c == 'b':
+            add('P')
+        elif c == 'c':
+            if at(i, 2) == 'ch':
+                add('X', 'K')
+                i += 1
+            elif nxt in ('i', 'e', 'y'):
+                add('S')
+            elif nxt in ('c', 'k', 'q'):
+                add('K')
+                i += 1
+            else:
+                add('K')
+        elif c == 'd':
+            if at(i, 2) == 'dg' and at(i + 2) in ('i', 'e', 'y'):
+                add('J')
+                i += 2
+            else:
+                add('T')
+        elif c == 'g':
+            if nxt == 'h':
+                if i == 0:
+                    add('K')
+                # otherwise silent (Caragh, Leigh, Hugh)
+                i += 1
+            elif nxt == 'n':
+                add('N')    # Signe, Agnes: g silent
+                i += 1
+            elif nxt in ('i', 'e', 'y'):
+                add('J', 'K')
+            else:
+                add('K')
+        elif c == 'h':
+            # Pronounced only before a vowel, at the start or after a vowel
+            if nxt in _VOWELS and (i == 0 or at(i - 1) in _VOWELS):
+                add('H')
+        elif c == 'j':
+            add('J', 'H')   # Jose, Juan
+        elif c == 'k':
+            add('K')
+        elif c == 'p':
+            if nxt == 'h':
+                add('F')
+                i += 1
+            else:
+                add('P')
+        elif c == 'q':
+            add('K')
+        elif c == 's':
+            if at(i, 3) == 'sch':
+                add('SK')
+                i += 2
+            elif nxt == 'h':
+                add('X')
+                i += 1
+            elif at(i, 3) in ('sio', 'sia'):
+                add('X', 'S')
+                i += 2
+            else:
+                add('S')
+        elif c == 't':
+            if at(i, 3) in ('tio', 'tia'):
+                add('X')
+                i += 2
+            elif nxt == 'h':
+                add('0', 'T')   # theta
+                i += 1
+            else:
+                add('T')
+        elif c == 'v':
+            add('F')
+        elif c == 'w':
+            pass            # w after the first letter is a vowel sound
+        elif c == 'x':
+            add('KS')
+        elif c == 'z':
+            add('S')
+        elif c.isalpha():
+            add(c.upper())  # f, l, m, n, r
+        i += 1
+
+    return ''.join(primary)[:4], ''.join(alternate)[:4]
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lower-case, accents stripped, letters and single spaces only"""
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return ' '.join(re.sub(r"[^a-z\s]+", ' ', text.replace("'", '')).split())
+
+
+def name_tokens(name: Optional[str]) -> Tokens:
+    """Tokens of a name with their phonetic codes"""
+    tokens = []
+    for token in normalize_name(name).split():
+        codes = frozenset(code for code in phonetic_codes(token) if code)
+        tokens.append((token, codes))
+    return tuple(tokens)
+
+
+def _trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_trigrams(tokens: Tokens) -> Set[str]:
+    trigrams: Set[str] = set()
+    for token, _ in tokens:
+        trigrams |= _trigrams(token)
+    return trigrams
+
+
+def name_keys(tokens: Tokens) -> Set[str]:
+    """Index keys of a tokenized name"""
+    keys: Set[str] = set()
+    for token, codes in tokens:
+        keys.update(f"p:{code}" for code in codes)
+        keys.update(f"t:{tri}" for tri in _trigrams(token))
+    return keys
+
+
+def _encode_tokens(tokens: Tokens) -> str:
+    # "caragh=KR smith=SM0/SMT"
+    return ' '.join(f"{token}={'/'.join(sorted(codes))}" for token, codes in tokens)
+
+
+def _decode_tokens(encoded: str) -> Tokens:
+    tokens = []
+    for part in (encoded or '').split():
+        token, _, codes = part.partition('=')
+        tokens.append((token, frozenset(c for c in codes.split('/') if c)))
+    return tuple(tokens)
+
+
+def score_tokens(query: Tokens, query_trigrams: Set[str], contact: Tokens,
+                 contact_trigrams: FrozenSet[str]) -> float:
+    """
+    0.0-1.0 similarity of a spoken or written name to a contact name.
+
+    Each query token scores 1.0 if the contact has the same token, 0.9 if
+    one sounds the same, and 0.8 if one starts with it (initials, short
+    forms). The token average counts for 85%, and trigram overlap for 15%.
+    """
+    if not query or not contact:
+        return 0.0
+    if tuple(t for t, _ in query) == tuple(t for t, _ in contact):
+        return 1.0
+
+    token_total = 0.0
+    for token, codes in query:
+        best = 0.0
+        for c_token, c_codes in contact:
+            if token == c_token:
+                best = 1.0
+                break
+            if codes & c_codes:
+                best = max(best, 0.9)
+            elif len(token) >= 2 and c_token.startswith(token):
+                best = max(best, 0.8)
+        token_total += best
+    phonetic = token_total / len(query)
+
+    shared = len(query_trigrams & contact_trigrams)
+    trigram = 0.5 * shared / len(query_trigrams) + 0.5 * shared / len(query_trigrams | contact_trigrams)
+
+    return round(0.85 * phonetic + 0.15 * trigram, 3)
+
+
+# ============================================================================
+# INDEX
+# ============================================================================
+
+class ContactNameIndex(BaseService):
+    """In-memory contact name postings, persisted and kept current incrementally"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__(db_path)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._persistent = False
+        self._stamp: Optional[str] = None
+        self._synced_at = 0.0
+
+        self._contacts: Dict[int, Dict] = {}
+        self._names: Dict[int, IndexedName] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._stats = {'lookups': 0, 'reindexed': 0, 'loads': 0}
+
+    # ------------------------------------------------------------------
+    # Keeping current
+    # ------------------------------------------------------------------
+
+    def _contacts_stamp(self) -> Optional[str]:
+        from .data_version_service import get_data_version_service
+        return get_data_version_service(str(self.db_path)).stamp(['contacts'])
+
+    def _sync(self):
+        """Load on first use, then re-index queued contacts after contacts change"""
+        stamp = self._contacts_stamp()
+        if self._loaded and stamp == self._stamp and (
+                stamp is not None or time.monotonic() - self._synced_at < INDEX_REFRESH_SECONDS):
+            return
+        with self._lock:
+            if self._loaded and stamp == self._stamp and stamp is not None:
+                return
+            if not self._loaded or not self._persistent:
+                self._load()
+            if self._persistent:
+                self._drain()
+            self._stamp = stamp
+            self._synced_at = time.monotonic()
+
+    def _load(self):
+        self._contacts.clear()
+        self._names.clear()
+        self._postings.clear()
+        self._persistent = self.table_exists('contact_name_entries')
+
+        with self.get_connection() as conn:
+            for row in conn.execute(f"SELECT {_CONTACT_COLUMNS} FROM contacts WHERE name IS NOT NULL AND name != ''"):
+                self._contacts[row['contact_id']] = dict(row)
+
+            if self._persistent:
+                for row in conn.execute("SELECT contact_id, tokens FROM contact_name_entries"):
+                    if row['contact_id'] in self._contacts:
+                        tokens = _decode_tokens(row['tokens'])
+                        self._names[row['contact_id']] = (tokens, frozenset(name_trigrams(tokens)), 0)
+                key_counts: Dict[int, int] = {}
+                for row in conn.execute("SELECT key, contact_id FROM contact_name_keys"):
+                    if row['contact_id'] in self._names:
+                        self._postings.setdefault(row['key'], set()).add(row['contact_id'])
+                        key_counts[row['contact_id']] = key_counts.get(row['contact_id'], 0) + 1
+                for contact_id, count in key_counts.items():
+                    tokens, trigrams, _ = self._names[contact_id]
+                    self._names[contact_id] = (tokens, trigrams, count)
+            else:
+                # Migration 121 not applied: index in memory only
+                for contact_id, contact in self._contacts.items():
+                    self._add(contact_id, name_tokens(contact['name']))
+
+        self._loaded = True
+        self._stats['loads'] += 1
+
+    def _drain(self):
+        """Re-index the contacts queued by the contacts triggers"""
+        while True:
+            with self.get_write_connection() as conn:
+                queued = conn.execute(
+                    "SELECT contact_id, version FROM contact_name_index_queue LIMIT ?", (DRAIN_BATCH,)
+                ).fetchall()
+                if not queued:
+                    return
+                ids = [row['contact_id'] for row in queued]
+                placeholders = ','.join('?' * len(ids))
+                rows = {
+                    row['contact_id']: dict(row)
+                    for row in conn.execute(
+                        f"SELECT {_CONTACT_COLUMNS} FROM contacts "
+                        f"WHERE contact_id IN ({placeholders}) AND name IS NOT NULL AND name != ''", ids)
+                }
+                indexed: Dict[int, Tokens] = {}
+                conn.execute(f"DELETE FROM contact_name_keys WHERE contact_id IN ({placeholders})", ids)
+                conn.execute(f"DELETE FROM contact_name_entries WHERE contact_id IN ({placeholders})", ids)
+                for contact_id, contact in rows.items():
+                    tokens = name_tokens(contact['name'])
+                    if not tokens:
+                        continue
+                    indexed[contact_id] = tokens
+                    conn.execute("INSERT INTO contact_name_entries (contact_id, tokens) VALUES (?, ?)",
+                                 (contact_id, _encode_tokens(tokens)))
+                    conn.executemany("INSERT OR IGNORE INTO contact_name_keys (key, contact_id) VALUES (?, ?)",
+                                     [(key, contact_id) for key in name_keys(tokens)])
+                # A contact changed again meanwhile keeps its (newer) queue row
+                conn.executemany("DELETE FROM contact_name_index_queue WHERE contact_id = ? AND version = ?",
+                                 [(row['contact_id'], row['version']) for row in queued])
+
+            for contact_id in ids:
+                self._remove(contact_id)
+                if contact_id in indexed:
+                    self._contacts[contact_id] = rows[contact_id]
+                    self._add(contact_id, indexed[contact_id])
+            self._stats['reindexed'] += len(ids)
+            if len(queued) < DRAIN_BATCH:
+                return
+
+    def _add(self, contact_id: int, tokens: Tokens):
+        if not tokens:
+            return
+        keys = name_keys(tokens)
+        self._names[contact_id] = (tokens, frozenset(name_trigrams(tokens)), len(keys))
+        for key in keys:
+            self._postings.setdefault(key, set()).add(contact_id)
+
+    def _remove(self, contact_id: int):
+        indexed = self._names.pop(contact_id, None)
+        self._contacts.pop(contact_id, None)
+        if indexed is None:
+            return
+        for key in name_keys(indexed[0]):
+            posting = self._postings.get(key)
+            if posting is not None:
+                posting.discard(contact_id)
+                if not posting:
+                    del self._postings[key]
+
+    def rebuild(self) -> int:
+        """Re-index every contact (after bulk loads with triggers off); returns contacts indexed"""
+        if not self.table_exists('contact_name_entries'):
+            with self._lock:
+                self._load()
+            return len(self._names)
+        self.execute_update("""
+            INSERT INTO contact_name_index_queue (contact_id)
+            SELECT contact_id FROM contacts
+            WHERE true
+            ON CONFLICT(contact_id) DO UPDATE SET version = version + 1
+        """)
+        with self._lock:
+            self._loaded = False
+            self._load()
+            self._drain()
+            self._stamp = self._contacts_stamp()
+        return len(self._names)
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def candidates(self, name: str, k: int = 10, min_score: float = 0.0,
+                   exclude: Iterable[int] = ()) -> List[Dict]:
+        """
+        Top-k contacts for a name, best first.
+
+        Args:
+            name: Name as heard or written ("Kara", "steven lim")
+            k: Maximum candidates
+            min_score: Drop candidates scoring below this (0.0-1.0)
+            exclude: contact_ids to leave out
+
+        Returns:
+            Contact dicts (contact_id, name, email, role, company) with 'score'
+        """
+        self._sync()
+        query = name_tokens(name)
+        if not query:
+            return []
+        # Postings change under the lock when contacts are re-indexed
+        with self._lock:
+            self._stats['lookups'] += 1
+            query_trigrams = name_trigrams(query)
+            query_keys = name_keys(query)
+
+            postings = self._postings
+            hits: Counter = Counter()
+            for key in query_keys:
+                posting = postings.get(key)
+                if posting and (key[0] == 'p' or len(posting) <= MAX_TRIGRAM_POSTING):
+                    hits.update(posting)
+            for contact_id in exclude:
+                hits.pop(contact_id, None)
+            # One stray trigram in a long name is noise, not a candidate
+            min_shared = min(2, len(query_keys) // 3)
+            if min_shared > 1:
+                hits = Counter({contact_id: n for contact_id, n in hits.items() if n >= min_shared})
+
+            names = self._names
+            if len(hits) > MAX_SCORED_CANDIDATES:
+                # Most shared keys, then the closest key sets (shared over all keys of both)
+                n_query = len(query_keys)
+                hits = heapq.nlargest(
+                    MAX_SCORED_CANDIDATES, hits.most_common(2 * MAX_SCORED_CANDIDATES),
+                    key=lambda item: item[1] / (n_query + names[item[0]][2] - item[1]),
+                )
+            else:
+                hits = hits.items()
+
+            scored = []
+            for contact_id, _ in hits:
+                tokens, trigrams, _ = names[contact_id]
+                score = score_tokens(query, query_trigrams, tokens, trigrams)
+                if score >= min_score and score > 0:
+                    scored.append((score, -contact_id))
+            return [
+                {**self._contacts[-neg_id], 'score': score}
+                for score, neg_id in heapq.nlargest(k, scored)
+            ]
+
+    def best_match(self, name: str, min_score: float = 0.85) -> Optional[Dict]:
+        """The best candidate scoring at least min_score, or None"""
+        found = self.candidates(name, k=1, min_score=min_score)
+        return found[0] if found else None
+
+    def get_contact(self, contact_id: int) -> Optional[Dict]:
+        self._sync()
+        contact = self._contacts.get(contact_id)
+        return dict(contact) if contact else None
+
+    def duplicate_groups(self, min_score: float = 0.95) -> List[List[Dict]]:
+        """
+        Contacts whose names match each other, grouped (likely one person
+        with several addresses). Names of a single token are skipped - a
+        first name alone says too little.
+        """
+        self._sync()
+        parent: Dict[int, int] = {}
+
+        def find(x: int) -> int:
+            while parent.get(x, x) != x:
+                x = parent[x]
+            return x
+
+        for contact_id, (tokens, _, _) in list(self._names.items()):
+            if len(tokens) < 2:
+                continue
+            for match in self.candidates(self._contacts[contact_id]['name'], k=5, min_score=min_score,
+                                         exclude=(contact_id,)):
+                if len(self._names[match['contact_id']][0]) >= 2:
+                    parent[find(match['contact_id'])] = find(contact_id)
+
+        groups: Dict[int, List[Dict]] = {}
+        for contact_id in parent:
+            groups.setdefault(find(contact_id), []).append(dict(self._contacts[contact_id]))
+        for root in list(groups):
+            if root not in parent:
+                groups[root].append(dict(self._contacts[root]))
+        return sorted(
+            (sorted(group, key=lambda c: c['contact_id']) for group in groups.values()),
+            key=lambda group: group[0]['contact_id'],
+        )
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            'contacts': len(self._names),
+            'keys': len(self._postings),
+            'persistent': self._persistent,
+        }
+
+
+# ============================================================================
+# SHARED INSTANCES
+# ============================================================================
+
+_indexes: Dict[str, ContactNameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_contact_name_index(db_path: Optional[str] = None) -> ContactNameIndex:
+    """Shared instance per database (postings load on first lookup)"""
+    key = str(Path(db_path or os.getenv('DATABASE_PATH', 'database/bensley_master.db')).expanduser().resolve())
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = ContactNameIndex(key)
+                _indexes[key] = index
+    return index
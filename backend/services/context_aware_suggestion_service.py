@@ -10,17 +10,23 @@ Part of Phase 2.0: Context-Aware AI Suggestions
 import os
 import logging
 import json
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
 from .base_service import BaseService
 from .context_bundler import ContextBundler, get_context_bundler
 from .gpt_suggestion_analyzer import GPTSuggestionAnalyzer, GPTUsageTracker
+from .llm_batch_service import LLMBatchService
 from .suggestion_writer import SuggestionWriter
 from .thread_context_service import ThreadContextService, get_thread_context_service
 
 logger = logging.getLogger(__name__)
 
+# llm_jobs kind for batch-API backfills (kept apart from online analysis, whose
+# resume would otherwise send jobs that are waiting in a batch)
+BACKFILL_KIND = "suggestion_backfill"
+
 
 class ContextAwareSuggestionService(BaseService):
     """
@@ -44,14 +50,22 @@ class ContextAwareSuggestionService(BaseService):
 
         # Analyzer is initialized lazily (requires API key)
         self._analyzer: Optional[GPTSuggestionAnalyzer] = None
+        self._batch_service: Optional[LLMBatchService] = None
 
     @property
     def analyzer(self) -> GPTSuggestionAnalyzer:
         """Lazy initialization of GPT analyzer"""
         if self._analyzer is None:
-            self._analyzer = GPTSuggestionAnalyzer()
+            self._analyzer = GPTSuggestionAnalyzer(db_path=self.db_path)
         return self._analyzer
 
+    @property
+    def batch_service(self) -> LLMBatchService:
+        """Lazy initialization of the batch API service (shares the analyzer's job queue)"""
+        if self._batch_service is None:
+            self._batch_service = LLMBatchService(self.db_path, dispatcher=self.analyzer.dispatcher)
+        return self._batch_service
+
     def is_enabled(self) -> bool:
         """Check if context-aware suggestions are enabled"""
         # Check environment variable first
@@ -85,12 +99,13 @@ class ContextAwareSuggestionService(BaseService):
             logger.error(f"Failed to update config: {e}")
             raise
 
-    def generate_suggestions_for_email(self, email_id: int) -> Dict[str, Any]:
+    def generate_suggestions_for_email(self, email_id: int, use_cache: bool = True) -> Dict[str, Any]:
         """
         Generate suggestions for a single email using context-aware analysis.
 
         Args:
             email_id: ID of email to analyze
+            use_cache: Reuse the LLM response for an unchanged prompt
 
         Returns:
             Dict with results including suggestions created and usage stats
@@ -114,8 +129,8 @@ class ContextAwareSuggestionService(BaseService):
             }
 
         # Get context and analyze
-        context_prompt = self.bundler.format_for_prompt()
-        result = self.analyzer.analyze_email(email, context_prompt)
+        context = self.bundler.get_prompt_context()
+        result = self.analyzer.analyze_email(email, context, use_cache=use_cache)
 
         if not result.get("success"):
             return {
@@ -129,6 +144,7 @@ class ContextAwareSuggestionService(BaseService):
         suggestion_ids = self.writer.write_suggestions_from_analysis(
             email_id, analysis, email
         )
+        self.analyzer.dispatcher.mark_applied([result.get("job_id")])
 
         # Log usage
         self._log_usage(result, [email_id])
@@ -146,23 +162,35 @@ class ContextAwareSuggestionService(BaseService):
         email_ids: List[int] = None,
         limit: int = 100,
         hours_back: int = 24,
+        resume: bool = False,
+        use_cache: bool = True,
     ) -> Dict[str, Any]:
         """
         Generate suggestions for multiple emails in batch.
 
         Args:
             email_ids: Specific email IDs to process, or None for recent unprocessed
-            limit: Maximum emails to process
+            limit: Maximum emails to process, resumed ones included
             hours_back: If email_ids not provided, look back this many hours
+            resume: First finish emails an interrupted earlier batch left in
+                    llm_jobs (stored responses are written without a new call)
+            use_cache: Reuse LLM responses for emails whose prompt is unchanged
 
         Returns:
-            Dict with batch results
+            Dict with batch results (failed_email_ids: emails GPT could not analyze)
         """
         start_time = datetime.now()
 
         # Get emails to process
         if email_ids is None:
             email_ids = self._get_unprocessed_emails(limit, hours_back)
+        if resume:
+            pending = [int(ref) for ref in self.analyzer.dispatcher.unfinished("suggestion_analysis", limit=limit)
+                       if str(ref).isdigit()]
+            if pending:
+                logger.info(f"Resuming {len(pending)} unfinished email analyses")
+                email_ids = pending + [eid for eid in (email_ids or []) if eid not in pending]
+        email_ids = (email_ids or [])[:limit]
 
         if not email_ids:
             return {
@@ -182,52 +210,186 @@ class ContextAwareSuggestionService(BaseService):
                 "emails_processed": 0,
             }
 
-        # Get context (cached)
-        context_prompt = self.bundler.format_for_prompt()
+        # Get context (cached, formatted once per bundle version)
+        context = self.bundler.get_prompt_context()
 
         # Analyze batch
-        results = self.analyzer.analyze_batch(emails, context_prompt)
+        results = self.analyzer.analyze_batch(emails, context, use_cache=use_cache)
 
         # Process results
         total_suggestions = 0
         successful = 0
         failed = 0
         total_cost = 0.0
+        total_baseline_cost = 0.0
+        cache_hits = 0
+        cache_saved = 0.0
+        failed_email_ids = []
 
         for i, result in enumerate(results):
             if result.get("success"):
                 analysis = result.get("analysis", {})
                 email_id = emails[i].get("email_id")
-                suggestions = self.writer.write_suggestions_from_analysis(
-                    email_id, analysis, emails[i]
-                )
+                try:
+                    suggestions = self.writer.write_suggestions_from_analysis(
+                        email_id, analysis, emails[i]
+                    )
+                except Exception as e:
+                    # Fail the job so a resumed batch does not retry the same write forever
+                    logger.error(f"Writing suggestions for email {email_id} failed: {e}")
+                    if result.get("job_id") is not None:
+                        self.analyzer.dispatcher.set_job_status(result["job_id"], "failed", error=str(e))
+                    failed += 1
+                    failed_email_ids.append(email_id)
+                    continue
+                self.analyzer.dispatcher.mark_applied([result.get("job_id")])
                 total_suggestions += len(suggestions)
                 successful += 1
                 if result.get("usage"):
                     total_cost += result["usage"].get("estimated_cost_usd", 0)
+                    total_baseline_cost += result["usage"].get("baseline_cost_usd", 0)
+                    cache_hits += result["usage"].get("response_cache") == "hit"
+                    cache_saved += result["usage"].get("response_cache_saved_usd") or 0
+                # Per email, so prompt savings can be compared request by request
+                self._log_usage(result, [email_id], request_type="batch_suggestion_analysis")
             else:
                 failed += 1
-
-        # Log batch usage
-        batch_usage = {
-            "input_tokens": sum(r.get("usage", {}).get("input_tokens", 0) for r in results if r.get("success")),
-            "output_tokens": sum(r.get("usage", {}).get("output_tokens", 0) for r in results if r.get("success")),
-            "estimated_cost_usd": total_cost,
-            "processing_time_ms": int((datetime.now() - start_time).total_seconds() * 1000),
-        }
-
-        self._log_batch_usage(batch_usage, [e.get("email_id") for e in emails])
+                failed_email_ids.append(emails[i].get("email_id"))
 
         return {
             "success": True,
             "emails_processed": len(emails),
             "successful": successful,
             "failed": failed,
+            "failed_email_ids": failed_email_ids,
             "suggestions_created": total_suggestions,
             "cost_usd": round(total_cost, 4),
+            "baseline_cost_usd": round(total_baseline_cost, 4),
+            "response_cache_hits": cache_hits,
+            "response_cache_saved_usd": round(cache_saved, 4),
             "processing_time_seconds": round((datetime.now() - start_time).total_seconds(), 2),
         }
 
+    def backfill_suggestions(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        email_ids: List[int] = None,
+        limit: int = 5000,
+        wait: bool = True,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Offline bulk mode: analyze many emails through the provider's batch API.
+
+        Half the per-token price of generate_suggestions_batch, with results
+        within 24 hours. Results are written as each batch finishes. Re-running
+        is safe and is how an interrupted backfill resumes: finished batches
+        are applied, open ones are polled, and only emails without a request
+        in flight are submitted.
+
+        Args:
+            since / until: Email date range (YYYY-MM-DD) when email_ids is not given
+            email_ids: Specific emails to backfill
+            limit: Maximum emails to submit this run
+            wait: Poll until every open batch has been applied (False: submit and return)
+            poll_interval: Seconds between polls
+            timeout: Stop waiting after this many seconds (batches keep running)
+            use_cache: Answer unchanged prompts from the LLM response cache
+
+        Returns:
+            Dict with submit counts, applied results and cost
+        """
+        start_time = time.monotonic()
+        batches = self.batch_service
+        context = self.bundler.get_prompt_context()
+        totals = {"applied": 0, "failed": 0, "suggestions_created": 0, "cost_usd": 0.0, "baseline_cost_usd": 0.0}
+
+        # Results of earlier runs that were never written
+        batches.poll(BACKFILL_KIND)
+        self._apply_backfill_results(context, totals)
+
+        if email_ids is None:
+            email_ids = self._get_backfill_emails(since, until, limit)
+        emails = [e for e in (self._load_email(eid) for eid in email_ids[:limit]) if e is not None]
+        submitted = batches.submit(BACKFILL_KIND, self.analyzer.batch_requests(emails, context), cache=use_cache)
+        self._apply_backfill_results(context, totals)  # cache answers
+
+        while wait and batches.open_batches(BACKFILL_KIND):
+            if timeout is not None and time.monotonic() - start_time > timeout:
+                logger.info("Backfill: timeout reached, batches keep running; re-run to collect them")
+                break
+            time.sleep(poll_interval)
+            batches.poll(BACKFILL_KIND)
+            self._apply_backfill_results(context, totals)
+
+        return {
+            "success": True,
+            "emails_submitted": submitted["submitted"],
+            "batch_ids": submitted["batch_ids"],
+            "from_cache": submitted["cached"],
+            "in_flight": submitted["in_flight"],
+            "open_batches": len(batches.open_batches(BACKFILL_KIND)),
+            "results_applied": totals["applied"],
+            "failed": totals["failed"],
+            "suggestions_created": totals["suggestions_created"],
+            "cost_usd": round(totals["cost_usd"], 4),
+            "baseline_cost_usd": round(totals["baseline_cost_usd"], 4),
+            "processing_time_seconds": round(time.monotonic() - start_time, 2),
+        }
+
+    def _apply_backfill_results(self, context, totals: Dict[str, Any]):
+        """Write every answered, unapplied backfill job and mark it applied"""
+        dispatcher = self.analyzer.dispatcher
+        while True:
+            outcomes = self.batch_service.ready(BACKFILL_KIND, limit=500)
+            if not outcomes:
+                return
+            for outcome in outcomes:
+                email_id = int(outcome["ref_id"])
+                email = self._load_email(email_id)
+                if email is None:
+                    dispatcher.set_job_status(outcome["job_id"], "failed", error="email no longer exists")
+                    continue
+                result = self.analyzer.result_from_outcome(email, context, outcome)
+                if not result.get("success"):
+                    dispatcher.set_job_status(outcome["job_id"], "failed", error=str(result.get("error"))[:2000])
+                    totals["failed"] += 1
+                    continue
+                suggestions = self.writer.write_suggestions_from_analysis(
+                    email_id, result.get("analysis", {}), email
+                )
+                dispatcher.mark_applied([outcome["job_id"]])
+                self._log_usage(result, [email_id], request_type="batch_backfill_analysis")
+                totals["applied"] += 1
+                totals["suggestions_created"] += len(suggestions)
+                totals["cost_usd"] += result["usage"].get("estimated_cost_usd", 0)
+                totals["baseline_cost_usd"] += result["usage"].get("baseline_cost_usd", 0)
+
+    def _get_backfill_emails(self, since: Optional[str], until: Optional[str], limit: int) -> List[int]:
+        """Emails in a date range not yet analyzed (online or by an earlier backfill), oldest first"""
+        emails = self.execute_query("""
+            SELECT e.email_id
+            FROM emails e
+            WHERE (? IS NULL OR e.date >= ?)
+            AND (? IS NULL OR e.date < date(?, '+1 day'))
+            AND NOT EXISTS (
+                SELECT 1 FROM ai_suggestions s
+                WHERE s.source_type = 'email'
+                AND s.source_id = e.email_id
+                AND s.suggested_data LIKE '%"match_type": "context_aware"%'
+            )
+            AND NOT EXISTS (
+                SELECT 1 FROM llm_jobs j
+                WHERE j.kind = ? AND j.ref_id = CAST(e.email_id AS TEXT) AND j.status = 'applied'
+            )
+            ORDER BY e.date
+            LIMIT ?
+        """, (since, since, until, until, BACKFILL_KIND, limit))
+        return [e["email_id"] for e in emails]
+
     def _load_email(self, email_id: int) -> Optional[Dict[str, Any]]:
         """Load email data for analysis, including thread context"""
         email = self.execute_query("""
@@ -316,14 +478,15 @@ class ContextAwareSuggestionService(BaseService):
 
         return [e["email_id"] for e in emails]
 
-    def _log_usage(self, result: Dict[str, Any], email_ids: List[int]):
+    def _log_usage(self, result: Dict[str, Any], email_ids: List[int],
+                   request_type: str = "suggestion_analysis"):
         """Log single request usage to database"""
         usage = result.get("usage", {})
         try:
             with self.get_connection() as conn:
                 tracker = GPTUsageTracker(conn)
                 tracker.log_usage(
-                    request_type="suggestion_analysis",
+                    request_type=request_type,
                     model=usage.get("model", "gpt-4o-mini"),
                     input_tokens=usage.get("input_tokens", 0),
                     output_tokens=usage.get("output_tokens", 0),
@@ -332,28 +495,16 @@ class ContextAwareSuggestionService(BaseService):
                     processing_time_ms=usage.get("processing_time_ms", 0),
                     success=result.get("success", False),
                     error_message=result.get("error"),
+                    cached_input_tokens=usage.get("cached_input_tokens"),
+                    baseline_input_tokens=usage.get("baseline_input_tokens"),
+                    baseline_cost=usage.get("baseline_cost_usd"),
+                    context_version=usage.get("context_version"),
+                    response_cache=usage.get("response_cache"),
+                    response_cache_saved=usage.get("response_cache_saved_usd"),
                 )
         except Exception as e:
             logger.error(f"Failed to log usage: {e}")
 
-    def _log_batch_usage(self, usage: Dict[str, Any], email_ids: List[int]):
-        """Log batch usage to database"""
-        try:
-            with self.get_connection() as conn:
-                tracker = GPTUsageTracker(conn)
-                tracker.log_usage(
-                    request_type="batch_suggestion_analysis",
-                    model="gpt-4o-mini",
-                    input_tokens=usage.get("input_tokens", 0),
-                    output_tokens=usage.get("output_tokens", 0),
-                    estimated_cost=usage.get("estimated_cost_usd", 0),
-                    email_ids=email_ids,
-                    processing_time_ms=usage.get("processing_time_ms", 0),
-                    success=True,
-                )
-        except Exception as e:
-            logger.error(f"Failed to log batch usage: {e}")
-
     def get_usage_stats(self, days: int = 30) -> Dict[str, Any]:
         """Get usage statistics for the past N days"""
         stats = self.execute_query("""
@@ -374,7 +525,7 @@ class ContextAwareSuggestionService(BaseService):
         total_emails = sum(s.get("emails_processed", 0) or 0 for s in stats)
         total_requests = sum(s.get("requests", 0) or 0 for s in stats)
 
-        return {
+        result = {
             "daily_stats": stats,
             "total_cost_usd": round(total_cost, 4),
             "total_emails_processed": total_emails,
@@ -382,6 +533,26 @@ class ContextAwareSuggestionService(BaseService):
             "avg_cost_per_email": round(total_cost / total_emails, 6) if total_emails > 0 else 0,
         }
 
+        # LLM response cache hit/miss (migration 115)
+        columns = {c["name"] for c in self.execute_query("PRAGMA table_info(gpt_usage_log)")}
+        if "response_cache" in columns:
+            cache = self.execute_query("""
+                SELECT
+                    COALESCE(SUM(response_cache = 'hit'), 0) as hits,
+                    COALESCE(SUM(response_cache = 'miss'), 0) as misses,
+                    COALESCE(SUM(response_cache = 'bypass'), 0) as bypassed,
+                    COALESCE(SUM(response_cache_saved_usd), 0) as saved_usd
+                FROM gpt_usage_log
+                WHERE created_at >= datetime('now', '-' || ? || ' days')
+            """, (days,), fetch_one=True)
+            lookups = cache["hits"] + cache["misses"]
+            result["response_cache"] = {
+                **cache,
+                "saved_usd": round(cache["saved_usd"], 4),
+                "hit_rate": round(cache["hits"] / lookups, 3) if lookups else 0.0,
+            }
+        return result
+
     def get_context_stats(self) -> Dict[str, Any]:
         """Get statistics about the current context bundle"""
         return self.bundler.get_stats()
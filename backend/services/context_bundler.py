@@ -9,16 +9,123 @@ Part of Phase 2.0: Context-Aware AI Suggestions
 """
 
 import os
+import re
+import json
+import hashlib
 import logging
 import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from datetime import datetime, timedelta
 
 from .base_service import BaseService
 
 logger = logging.getLogger(__name__)
 
+# "25 BK-033", "25BK033", "25 bk 33" -> "25 BK-033"
+_PROJECT_CODE_RE = re.compile(r'\b(\d{2})\s*-?\s*BK\s*-?\s*(\d{2,3})\b', re.I)
+_EMAIL_RE = re.compile(r'[\w.+-]+@([\w-]+(?:\.[\w-]+)+)')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_INTERNAL_DOMAINS = ('bensley.com', 'bensleydesign.com', 'bensley.co.th', 'bensley.id')
+
+# Words too common in proposal and client names to suggest a match on their own
+_GENERIC_NAME_WORDS = {
+    'the', 'and', 'for', 'with', 'hotel', 'hotels', 'resort', 'resorts', 'villa', 'villas',
+    'project', 'projects', 'design', 'residence', 'residences', 'house', 'club', 'beach',
+    'island', 'city', 'new', 'phase', 'group', 'limited', 'ltd', 'company', 'international',
+    'development', 'developments', 'holdings', 'proposal', 'interior', 'interiors',
+    'landscape', 'architecture', 'private', 'estate', 'luxury', 'spa', 'co', 'inc', 'llc',
+}
+
+
+def normalize_project_code(code: str) -> Optional[str]:
+    """Canonical "YY BK-NNN" form of a project code, or None"""
+    match = _PROJECT_CODE_RE.search(code or "")
+    if not match:
+        return None
+    return f"{match.group(1)} BK-{int(match.group(2)):03d}"
+
+
+def _name_words(text: Optional[str]) -> Set[str]:
+    return {w for w in _WORD_RE.findall((text or "").lower())
+            if len(w) >= 4 and w not in _GENERIC_NAME_WORDS}
+
+
+@dataclass
+class PromptContext:
+    """
+    Prompt-ready sections of one bundle version.
+
+    The sections that are the same for every email (business context,
+    learned patterns, multi-project contacts) go in the system prompt, so
+    the provider's prompt-prefix cache can serve them. Proposals are picked
+    per email with candidate_proposals().
+    """
+    version: str
+    text: str                       # Full context, as format_for_prompt() returns it
+    business_context: str
+    active_proposals: str           # Full "## Active Proposals" section
+    learned_patterns: str
+    multi_project_contacts: str
+    proposals: List[Dict[str, Any]] = field(default_factory=list)
+    proposal_lines: Dict[str, str] = field(default_factory=dict)     # code -> formatted line
+    contact_codes: Dict[str, Set[str]] = field(default_factory=dict)  # address or domain -> codes
+    keyword_codes: Dict[str, Set[str]] = field(default_factory=dict)  # subject keyword -> codes
+
+    def candidate_proposals(self, email: Dict[str, Any], limit: int = 15) -> List[Dict[str, Any]]:
+        """
+        Active proposals this email plausibly relates to, best first.
+
+        Signals: a project code in the subject/body, the thread already being
+        linked to it, a sender/recipient/domain mapped to it, a learned subject
+        keyword, or distinctive words of its name or client in the email.
+        """
+        subject = (email.get("subject") or "").lower()
+        body = (email.get("body_full") or email.get("body") or "")[:5000].lower()
+        text = f"{subject}\n{body}"
+        words = set(_WORD_RE.findall(text))
+        thread = email.get("thread_context") or {}
+
+        scores: Dict[str, float] = {}
+
+        def add(code: Optional[str], points: float):
+            code = normalize_project_code(code) if code else None
+            if code:
+                scores[code] = scores.get(code, 0) + points
+
+        for match in _PROJECT_CODE_RE.finditer(text):
+            add(match.group(0), 10)
+        for link in thread.get("existing_project_links") or []:
+            add(link.get("project_code"), 8)
+
+        participants = " ".join(filter(None, [
+            email.get("sender_email"), email.get("recipient_emails"),
+            " ".join(p for p in thread.get("external_participants") or thread.get("participants") or [] if p),
+        ])).lower()
+        for match in _EMAIL_RE.finditer(participants):
+            address, domain = match.group(0), match.group(1)
+            for key in (address, domain):
+                if domain in _INTERNAL_DOMAINS and key == domain:
+                    continue
+                for code in self.contact_codes.get(key, ()):
+                    add(code, 6)
+
+        for keyword, codes in self.keyword_codes.items():
+            if keyword in subject:
+                for code in codes:
+                    add(code, 4)
+
+        for p in self.proposals:
+            name_hits = len(_name_words(p.get("project_name")) & words)
+            client_hits = len(_name_words(p.get("client_company")) & words)
+            if name_hits or client_hits:
+                add(p.get("project_code"), 2 * min(name_hits, 3) + 2 * min(client_hits, 2))
+
+        by_code = {normalize_project_code(p.get("project_code")): p for p in self.proposals}
+        ranked = sorted((code for code in scores if code in by_code), key=lambda c: -scores[c])
+        return [by_code[code] for code in ranked[:limit]]
+
 
 class ContextBundler(BaseService):
     """
@@ -40,6 +147,7 @@ class ContextBundler(BaseService):
         super().__init__(db_path)
         self._cache: Optional[Dict[str, Any]] = None
         self._cache_time: Optional[float] = None
+        self._prompt_context: Optional[PromptContext] = None
 
         # Path to business context file
         self.business_md_path = self._find_business_md()
@@ -98,6 +206,9 @@ class ContextBundler(BaseService):
         # Calculate token estimate for monitoring
         bundle["estimated_tokens"] = self._estimate_tokens(bundle)
 
+        # Same content -> same version, so formatted prompts survive a rebuild
+        bundle["version"] = self._bundle_version(bundle)
+
         # Update cache
         self._cache = bundle
         self._cache_time = time.time()
@@ -112,11 +223,19 @@ class ContextBundler(BaseService):
             f"Patterns: {len(bundle.get('learned_patterns', []))} | "
             f"Contact mappings: {len(bundle.get('contact_mappings', []))} | "
             f"Multi-project contacts: {len(bundle.get('multi_project_contacts', []))} | "
-            f"Tokens: ~{bundle['estimated_tokens']}"
+            f"Tokens: ~{bundle['estimated_tokens']} | "
+            f"Version: {bundle['version']}"
         )
 
         return bundle
 
+    @staticmethod
+    def _bundle_version(bundle: Dict[str, Any]) -> str:
+        """Stable hash of the bundle content (everything but build metadata)"""
+        content = {k: v for k, v in bundle.items() if k not in ("built_at", "estimated_tokens", "version")}
+        payload = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
     def _is_cache_valid(self) -> bool:
         """Check if cached bundle is still valid"""
         if self._cache is None or self._cache_time is None:
@@ -423,8 +542,6 @@ PROPOSALS = sales pipeline (priority), PROJECTS = active contracts."""
 
         Rough estimate: ~4 characters per token for English text.
         """
-        import json
-
         # Serialize relevant parts
         context_str = bundle.get("business_context", "")
         proposals_str = json.dumps(bundle.get("active_proposals", []))
@@ -441,49 +558,118 @@ PROPOSALS = sales pipeline (priority), PROJECTS = active contracts."""
         Format the context bundle as a string for GPT prompt injection.
 
         Returns a formatted string optimized for token efficiency.
+        Memoized per bundle version.
         """
-        bundle = self.get_bundle()
-
-        parts = []
+        return self.get_prompt_context().text
 
-        # Business context (already formatted)
-        parts.append(bundle["business_context"])
+    def get_prompt_context(self) -> PromptContext:
+        """
+        Formatted prompt sections for the current bundle, built once per
+        bundle version (the bundle is rebuilt every 5 minutes, but its
+        version only changes when its content does).
+        """
+        bundle = self.get_bundle()
+        cached = self._prompt_context
+        if cached is not None and cached.version == bundle["version"]:
+            return cached
+
+        business_context = bundle["business_context"]
+        proposals_section = "\n".join(self._format_proposals_section(bundle))
+        patterns_section = "\n".join(self._format_patterns_section(bundle))
+        mappings_section = "\n".join(self._format_contact_mappings_section(bundle))
+        multi_project_section = "\n".join(self._format_multi_project_section(bundle))
+        staff_section = "\n".join(self._format_staff_section(bundle))
+
+        text = "\n".join(part for part in (
+            business_context, proposals_section, patterns_section,
+            mappings_section, multi_project_section, staff_section,
+        ) if part)
+
+        context = PromptContext(
+            version=bundle["version"],
+            text=text,
+            business_context=business_context,
+            active_proposals=proposals_section,
+            learned_patterns=patterns_section,
+            multi_project_contacts=multi_project_section,
+            proposals=bundle["active_proposals"][:85],
+            proposal_lines={
+                p.get("project_code"): self._format_proposal_line(p)
+                for p in bundle["active_proposals"][:85]
+            },
+            contact_codes=self._index_contact_codes(bundle),
+            keyword_codes=self._index_keyword_codes(bundle),
+        )
+        self._prompt_context = context
+        return context
+
+    @staticmethod
+    def _index_contact_codes(bundle: Dict[str, Any]) -> Dict[str, Set[str]]:
+        """Sender address / domain -> project codes, from approved links and learned patterns"""
+        index: Dict[str, Set[str]] = {}
+        for m in bundle.get("contact_mappings", []):
+            if m.get("email") and m.get("project_code"):
+                index.setdefault(m["email"].lower(), set()).add(m["project_code"])
+        for p in bundle.get("learned_patterns", []):
+            pattern_type = p.get("pattern_type") or ""
+            key = (p.get("pattern_key_normalized") or p.get("pattern_key") or "").lower().lstrip("@")
+            if key and p.get("target_code") and ("sender" in pattern_type or "domain" in pattern_type):
+                index.setdefault(key, set()).add(p["target_code"])
+        return index
+
+    @staticmethod
+    def _index_keyword_codes(bundle: Dict[str, Any]) -> Dict[str, Set[str]]:
+        """Learned subject keyword -> project codes"""
+        index: Dict[str, Set[str]] = {}
+        for p in bundle.get("learned_patterns", []):
+            pattern_type = p.get("pattern_type") or ""
+            key = (p.get("pattern_key") or "").lower().strip()
+            if key and p.get("target_code") and "keyword" in pattern_type and "skip" not in pattern_type:
+                index.setdefault(key, set()).add(p["target_code"])
+        return index
+
+    def _format_proposal_line(self, p: Dict[str, Any]) -> str:
+        """One proposal: CODE: Name | Client | Country | Status | Last Activity"""
+        client = p.get('client_company') or '-'
+        country = p.get('country') or '-'
+
+        # Build activity string for follow-up detection
+        days = p.get('days_since_email')
+        we_sent = p.get('we_sent_last')
+        status = p.get('status', 'unknown')
+
+        activity = ""
+        if days is not None and days > 0:
+            if we_sent:
+                activity = f" | ⚠️ {days}d ago (WE sent last - awaiting response)"
+            else:
+                activity = f" | {days}d ago (THEY sent last)"
+
+            # Flag stale submitted proposals
+            if status == 'submitted' and we_sent and days > 14:
+                activity += " 🔴 NEEDS FOLLOW-UP"
+        elif p.get('email_count', 0) == 0:
+            activity = " | No emails linked"
+
+        return (
+            f"- {p.get('project_code', 'N/A')}: {p.get('project_name', 'Unknown')} | "
+            f"{client} | {country} | {status}{activity}"
+        )
 
+    def _format_proposals_section(self, bundle: Dict[str, Any]) -> List[str]:
         # Active proposals (compact format with country for disambiguation)
-        parts.append("\n## Active Proposals (prioritize for email linking)")
+        parts = ["\n## Active Proposals (prioritize for email linking)"]
         parts.append("Format: CODE: Name | Client | Country | Status | Last Activity")
         if bundle["active_proposals"]:
             for p in bundle["active_proposals"][:85]:  # Include all active proposals
-                client = p.get('client_company') or '-'
-                country = p.get('country') or '-'
-
-                # Build activity string for follow-up detection
-                days = p.get('days_since_email')
-                we_sent = p.get('we_sent_last')
-                status = p.get('status', 'unknown')
-
-                activity = ""
-                if days is not None and days > 0:
-                    if we_sent:
-                        activity = f" | ⚠️ {days}d ago (WE sent last - awaiting response)"
-                    else:
-                        activity = f" | {days}d ago (THEY sent last)"
-
-                    # Flag stale submitted proposals
-                    if status == 'submitted' and we_sent and days > 14:
-                        activity += " 🔴 NEEDS FOLLOW-UP"
-                elif p.get('email_count', 0) == 0:
-                    activity = " | No emails linked"
-
-                parts.append(
-                    f"- {p.get('project_code', 'N/A')}: {p.get('project_name', 'Unknown')} | "
-                    f"{client} | {country} | {status}{activity}"
-                )
+                parts.append(self._format_proposal_line(p))
         else:
             parts.append("(No active proposals)")
+        return parts
 
+    def _format_patterns_section(self, bundle: Dict[str, Any]) -> List[str]:
         # Learned patterns (compact format) - include ALL pattern types
-        parts.append("\n## Learned Email Patterns (MUST USE - high-confidence mappings from user corrections)")
+        parts = ["\n## Learned Email Patterns (MUST USE - high-confidence mappings from user corrections)"]
         if bundle["learned_patterns"]:
             # Domain patterns (e.g., @bdlbali.com → 25 BK-033)
             domain_patterns = [p for p in bundle["learned_patterns"]
@@ -553,6 +739,10 @@ PROPOSALS = sales pipeline (priority), PROJECTS = active contracts."""
                         f"(merged into {p.get('target_name', 'Unknown')})"
                     )
 
+        return parts
+
+    def _format_contact_mappings_section(self, bundle: Dict[str, Any]) -> List[str]:
+        parts = []
         # Contact-to-project mappings (from approved links)
         if bundle.get("contact_mappings"):
             parts.append("\n## Known Contact-Project Associations (from approved links)")
@@ -561,13 +751,18 @@ PROPOSALS = sales pipeline (priority), PROJECTS = active contracts."""
                     f"- {m.get('email', 'N/A')} → {m.get('project_code', 'N/A')} ({m.get('project_name', 'Unknown')})"
                 )
 
+        return parts
+
+    def _format_multi_project_section(self, bundle: Dict[str, Any]) -> List[str]:
         # Multi-project contacts
-        parts.append("\n## Multi-Project Contacts (DO NOT auto-link to single project)")
+        parts = ["\n## Multi-Project Contacts (DO NOT auto-link to single project)"]
         if bundle["multi_project_contacts"]:
             parts.append(", ".join(bundle["multi_project_contacts"][:20]))
+        return parts
 
+    def _format_staff_section(self, bundle: Dict[str, Any]) -> List[str]:
         # Known staff with personal emails
-        parts.append("\n## Known Staff (Personal Emails - classify as INTERNAL)")
+        parts = ["\n## Known Staff (Personal Emails - classify as INTERNAL)"]
         if bundle.get("known_staff"):
             for s in bundle["known_staff"][:20]:
                 role_info = f" ({s.get('role')})" if s.get('role') else ""
@@ -575,7 +770,7 @@ PROPOSALS = sales pipeline (priority), PROJECTS = active contracts."""
         else:
             parts.append("(None learned yet)")
 
-        return "\n".join(parts)
+        return parts
 
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the context bundle"""
@@ -583,6 +778,7 @@ PROPOSALS = sales pipeline (priority), PROJECTS = active contracts."""
 
         return {
             "built_at": bundle.get("built_at"),
+            "version": bundle.get("version"),
             "estimated_tokens": bundle.get("estimated_tokens", 0),
             "proposal_count": len(bundle.get("active_proposals", [])),
             "project_count": len(bundle.get("active_projects", [])),
@@ -0,0 +1,120 @@
+"""
+Data Version Service - per-table change counters (migration 112)
+
+data_versions holds one counter per tracked table; triggers bump it on
+every insert, update and delete. A "stamp" over a set of tables changes
+whenever any of them does, which makes it a cheap validity check for
+anything derived from those tables (cached query results, HTTP ETags).
+
+Stamps are read on every polled request, so the counters are kept in
+memory. A private connection asks SQLite for `PRAGMA data_version`, which
+changes whenever another connection commits. The data_versions rows are
+only re-read after such a commit. While nothing is written, a stamp costs
+one pragma and reads no table pages.
+
+Usage:
+    versions = get_data_version_service(db_path)
+    stamp = versions.stamp(['invoices', 'projects'])   # None if any table is untracked
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersionService(BaseService):
+    """Reads the per-table counters kept by the data_versions triggers"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__(db_path)
+        self._available = False
+        self._watch: Optional[sqlite3.Connection] = None
+        self._watch_lock = threading.Lock()
+        self._seen_data_version: Optional[int] = None
+        self._counters: Dict[str, int] = {}
+
+    def available(self) -> bool:
+        """True once migration 112 is applied"""
+        if not self._available:
+            self._available = self.table_exists('data_versions')
+        return self._available
+
+    def versions(self, tables: Iterable[str]) -> Dict[str, Optional[int]]:
+        """Current counter per table (None for tables without triggers)"""
+        tables = sorted(set(tables))
+        result: Dict[str, Optional[int]] = dict.fromkeys(tables)
+        if not tables or not self.available():
+            return result
+        counters = self._current_counters()
+        for table in tables:
+            result[table] = counters.get(table)
+        return result
+
+    def _current_counters(self) -> Dict[str, int]:
+        """All counters, re-read only after another connection has committed"""
+        with self._watch_lock:
+            try:
+                if self._watch is None:
+                    # Never writes, so every commit is "another connection's"
+                    self._watch = sqlite3.connect(self.db_path, check_same_thread=False,
+                                                  isolation_level=None)
+                data_version = self._watch.execute("PRAGMA data_version").fetchone()[0]
+                if data_version != self._seen_data_version:
+                    self._counters = dict(self._watch.execute(
+                        "SELECT table_name, version FROM data_versions"
+                    ).fetchall())
+                    self._seen_data_version = data_version
+                return self._counters
+            except sqlite3.Error as e:
+                logger.warning(f"data_versions watch failed, reading directly: {e}")
+                self._close_watch()
+        return {row['table_name']: row['version']
+                for row in self.execute_query("SELECT table_name, version FROM data_versions")}
+
+    def _close_watch(self):
+        if self._watch is not None:
+            self._watch.close()
+        self._watch = None
+        self._seen_data_version = None
+
+    def close(self):
+        """Close the watch connection (reopened on next use)"""
+        with self._watch_lock:
+            self._close_watch()
+
+    def stamp(self, tables: Iterable[str]) -> Optional[str]:
+        """
+        Version stamp over a set of tables.
+
+        Returns:
+            'table:version,...' (sorted), or None if any table is not tracked
+            - callers must then treat the data as uncacheable
+        """
+        versions = self.versions(tables)
+        if not versions or any(version is None for version in versions.values()):
+            return None
+        return ','.join(f"{table}:{version}" for table, version in versions.items())
+
+
+_services: Dict[str, DataVersionService] = {}
+_services_lock = threading.Lock()
+
+
+def get_data_version_service(db_path: Optional[str] = None) -> DataVersionService:
+    """Shared instance per database"""
+    key = str(Path(db_path or os.getenv('DATABASE_PATH', 'database/bensley_master.db')).expanduser().resolve())
+    service = _services.get(key)
+    if service is None:
+        with _services_lock:
+            service = _services.get(key)
+            if service is None:
+                service = DataVersionService(key)
+                _services[key] = service
+    return service
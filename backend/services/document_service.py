@@ -5,15 +5,26 @@ Handles all document-related operations:
 - Document retrieval and search
 - Document-proposal linking
 - Document statistics
+- Document content (read through the blob store)
 """
 
 from typing import Optional, List, Dict, Any
 from .base_service import BaseService
+from .blob_store import BlobStore
+from .search_service import SearchService
 
 
 class DocumentService(BaseService):
     """Service for document operations"""
 
+    _blob_store = None
+
+    @property
+    def blob_store(self) -> BlobStore:
+        if self._blob_store is None:
+            self._blob_store = BlobStore(self.db_path)
+        return self._blob_store
+
     def get_all_documents(
         self,
         search_query: Optional[str] = None,
@@ -22,7 +33,8 @@ class DocumentService(BaseService):
         project_code: Optional[str] = None,
         page: int = 1,
         per_page: int = 20,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Get all documents with search and filtering
@@ -35,9 +47,13 @@ class DocumentService(BaseService):
             page: Page number
             per_page: Results per page
             limit: Alternative to per_page for direct limit
+            cursor: next_cursor of the previous page (keyset pagination)
 
         Returns:
-            Paginated document results
+            Paginated document results with 'has_more' and 'next_cursor'
+
+        Raises:
+            ValueError: Invalid cursor
         """
         # Use limit as per_page if provided
         if limit:
@@ -76,9 +92,15 @@ class DocumentService(BaseService):
             )"""
             params.append(proposal_id)
 
-        sql += " ORDER BY d.modified_date DESC"
-
-        return self.paginate(sql, tuple(params), page, per_page)
+        return self.paginate_keyset(
+            sql, tuple(params),
+            sort_column='modified_date',
+            id_column='document_id',
+            cursor=cursor,
+            page=page,
+            per_page=per_page,
+            count_tables=['documents'],
+        )
 
     def get_document_by_id(self, document_id: int) -> Optional[Dict[str, Any]]:
         """Get document by ID"""
@@ -94,6 +116,43 @@ class DocumentService(BaseService):
         """
         return self.execute_query(sql, (document_id,), fetch_one=True)
 
+    def get_document_file(self, document_id: int, materialize: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Locate a document's content
+
+        Args:
+            document_id: Document ID
+            materialize: Return a path carrying the original file name (for
+                         tools that go by extension) instead of the bare blob
+
+        Returns:
+            {'document_id', 'file_name', 'path', 'sha256'} or None if the
+            document or its content is missing (or outside the serve roots)
+        """
+        doc = self.execute_query(
+            "SELECT document_id, file_name, file_path FROM documents WHERE document_id = ?",
+            (document_id,), fetch_one=True
+        )
+        if not doc:
+            return None
+
+        path = self.blob_store.servable(
+            self.blob_store.resolve_owner('documents', document_id, doc['file_path'])
+        )
+        if path is None:
+            return None
+
+        info = self.blob_store.blob_info('documents', document_id)
+        if info and materialize:
+            path = self.blob_store.materialize(info['sha256'], doc['file_name'])
+
+        return {
+            'document_id': document_id,
+            'file_name': doc['file_name'],
+            'path': str(path),
+            'sha256': info['sha256'] if info else None,
+        }
+
     def get_documents_for_proposal(self, project_code: str) -> List[Dict[str, Any]]:
         """Get all documents for a proposal"""
         sql = """
@@ -115,7 +174,10 @@ class DocumentService(BaseService):
 
     def search_documents(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
-        Search documents by filename
+        Search documents by filename, project code, type and extracted text
+
+        Uses the documents_fts index (BM25-ranked, with snippet/highlight)
+        and falls back to a filename LIKE scan if the index hasn't been created.
 
         Args:
             query: Search term
@@ -124,6 +186,10 @@ class DocumentService(BaseService):
         Returns:
             List of matching documents
         """
+        search = SearchService(self.db_path)
+        if search.is_available('documents'):
+            return search.search_source('documents', query, limit=limit)
+
         sql = """
             SELECT
                 d.document_id,
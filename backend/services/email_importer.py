@@ -8,6 +8,7 @@ import email
 from email.header import decode_header
 import sqlite3
 import os
+import re
 import sys
 from datetime import datetime
 from dotenv import load_dotenv
@@ -17,6 +18,10 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 from utils.logger import get_logger
+from backend.services.imap_sync import ImapUidSync
+from backend.services.mime_stream import parse_stream
+from backend.services.blob_store import BlobStore
+from backend.services.email_participants import index_email_participants
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -28,7 +33,7 @@ class EmailImporter:
         self.username = os.getenv('EMAIL_USERNAME')
         self.password = os.getenv('EMAIL_PASSWORD')
         self.db_path = os.getenv('DATABASE_PATH', 'database/bensley_master.db')
-        self.attachments_dir = os.getenv('ATTACHMENTS_DIR', 'files/attachments')
+        self.blob_store = None
 
     def connect(self):
         """Connect to IMAP server"""
@@ -58,105 +63,67 @@ class EmailImporter:
             return []
 
     def import_emails(self, folder='INBOX', limit=100):
-        """Import emails from a folder"""
+        """
+        Import new emails from a folder
+
+        Only messages above the folder's UID high-water mark are fetched,
+        and bodies are downloaded only for Message-IDs not already in the
+        database (see imap_sync.ImapUidSync). Messages are downloaded in
+        bounded windows and parsed as a stream, with attachments spooled
+        straight to disk (see mime_stream), so a 50 MB drawing set does
+        not need to fit in memory.
+        """
         print(f"\n📧 Importing emails from {folder}...")
 
         try:
-            # Select folder
-            self.imap.select(folder)
-
-            # Search for all emails
-            status, messages = self.imap.search(None, 'ALL')
-            email_ids = messages[0].split()
-
-            total = len(email_ids)
-            print(f"   Found {total} emails")
-
-            # Limit if specified
-            if limit:
-                email_ids = email_ids[-limit:]  # Get most recent
-                print(f"   Importing last {len(email_ids)} emails...")
-
             # Connect to database
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
+            # Spool inside the store root so keeping a part is a rename
+            self.blob_store = BlobStore(self.db_path)
+            spool_dir = str(self.blob_store.root / '.spool')
+
+            sync = ImapUidSync(self.imap, conn, folder, account_email=self.username or '')
+            if not sync.select():
+                print(f"❌ Could not select folder {folder}")
+                conn.close()
+                return 0
+
+            pending = sync.plan(limit=limit)
+            print(f"   Found {sync.stats['new_uids']} new emails since last import")
+            print(f"   Downloading {len(pending)} ({sync.stats['known']} already imported)...")
+
             imported = 0
-            skipped = 0
+            skipped = sync.stats['known']
 
-            for i, email_id in enumerate(email_ids, 1):
+            for i, (new_msg, chunks) in enumerate(sync.stream(pending), 1):
                 if i % 10 == 0:
-                    print(f"   Processing {i}/{len(email_ids)}...")
+                    print(f"   Processing {i}/{len(pending)}...")
 
                 try:
-                    # Fetch email
-                    status, msg_data = self.imap.fetch(email_id, '(RFC822)')
-
-                    for response_part in msg_data:
-                        if isinstance(response_part, tuple):
-                            # Parse email
-                            msg = email.message_from_bytes(response_part[1])
-
-                            # Extract fields
-                            message_id = msg['Message-ID'] or f"imported-{email_id.decode()}"
-                            subject = self.decode_header_value(msg['Subject'])
-                            sender = self.decode_header_value(msg['From'])
-                            recipients = self.decode_header_value(msg['To'])
-                            date_str = msg['Date']
-
-                            # Parse date
-                            try:
-                                date = email.utils.parsedate_to_datetime(date_str)
-                            except (ValueError, TypeError):
-                                date = datetime.now()
-
-                            # Get body
-                            body = self.get_email_body(msg)
-                            snippet = body[:500] if body else ""
-
-                            # Check if already exists
-                            cursor.execute("""
-                                SELECT email_id FROM emails
-                                WHERE message_id = ?
-                            """, (message_id,))
-
-                            if cursor.fetchone():
-                                skipped += 1
-                                continue
-
-                            # Insert into database FIRST to get email_id
-                            cursor.execute("""
-                                INSERT INTO emails
-                                (message_id, sender_email, recipient_emails, subject, snippet, body_full, date, date_normalized, processed, has_attachments, folder)
-                                VALUES (?, ?, ?, ?, ?, ?, ?, datetime(?), 0, 0, ?)
-                            """, (message_id, sender, recipients, subject, snippet, body, date, date, folder))
-
-                            email_id = cursor.lastrowid
-
-                            # Now save attachments with email_id
-                            attachments = self.save_attachments(msg, date, email_id, cursor)
-
-                            # Update has_attachments flag if we saved any
-                            if attachments:
-                                cursor.execute("""
-                                    UPDATE emails SET has_attachments = 1 WHERE email_id = ?
-                                """, (email_id,))
-
-                            imported += 1
-
+                    # Parse email - spool files not kept are removed on exit
+                    with parse_stream(chunks, spool_dir=spool_dir) as parsed:
+                        self._import_message(parsed, new_msg, folder, cursor)
+                    sync.mark_done(new_msg.uid)
+                    imported += 1
                 except Exception as e:
-                    logger.warning(f"Error processing email {email_id}: {e}")
-                    print(f"   ⚠️  Error processing email {email_id}: {e}")
+                    # Left below the high-water mark, so the next import retries it
+                    sync.mark_failed(new_msg.uid)
+                    logger.warning(f"Error processing email UID {new_msg.uid}: {e}")
+                    print(f"   ⚠️  Error processing email UID {new_msg.uid}: {e}")
                     continue
 
+            last_uid = sync.save_state()
             conn.commit()
             conn.close()
 
-            logger.info(f"Email import complete: imported={imported}, skipped={skipped}")
+            logger.info(f"Email import complete: imported={imported}, skipped={skipped}, last_uid={last_uid}")
             print(f"\n✅ Import complete!")
             print(f"   Imported: {imported}")
             print(f"   Skipped (duplicates): {skipped}")
-            print(f"   Total in database: {imported + skipped}")
+            if sync.stats['deferred']:
+                print(f"   Deferred to next run: {sync.stats['deferred']}")
 
             return imported
 
@@ -165,6 +132,48 @@ class EmailImporter:
             print(f"❌ Error importing emails: {e}")
             return 0
 
+    def _import_message(self, parsed, new_msg, folder, cursor):
+        """Insert one parsed message and its attachments, returning the email_id"""
+        headers = parsed.headers
+
+        # Extract fields
+        message_id = new_msg.message_id or f"imported-{new_msg.uid}"
+        subject = self.decode_header_value(headers['Subject'])
+        sender = self.decode_header_value(headers['From'])
+        recipients = self.decode_header_value(headers['To'])
+        date_str = headers['Date']
+
+        # Parse date
+        try:
+            date = email.utils.parsedate_to_datetime(date_str)
+        except (ValueError, TypeError):
+            date = datetime.now()
+
+        # Get body
+        body = parsed.body
+        snippet = body[:500] if body else ""
+
+        # Insert into database FIRST to get email_id
+        cursor.execute("""
+            INSERT INTO emails
+            (message_id, sender_email, recipient_emails, subject, snippet, body_full, date, date_normalized, processed, has_attachments, folder)
+            VALUES (?, ?, ?, ?, ?, ?, ?, datetime(?), 0, 0, ?)
+        """, (message_id, sender, recipients, subject, snippet, body, date, date, folder))
+
+        email_id = cursor.lastrowid
+        index_email_participants(cursor.connection, [email_id])
+
+        # Now save attachments with email_id
+        attachments = self.save_attachments(parsed.attachments, date, email_id, cursor)
+
+        # Update has_attachments flag if we saved any
+        if attachments:
+            cursor.execute("""
+                UPDATE emails SET has_attachments = 1 WHERE email_id = ?
+            """, (email_id,))
+
+        return email_id
+
     def decode_header_value(self, header):
         """Decode email header"""
         if not header:
@@ -198,50 +207,17 @@ class EmailImporter:
 
         return ''.join(header_parts)
 
-    def get_email_body(self, msg):
-        """Extract email body - prefer plain text, fall back to HTML"""
-        import re
-        body = ""
-        html_body = ""
-
-        if msg.is_multipart():
-            for part in msg.walk():
-                content_type = part.get_content_type()
-                try:
-                    payload = part.get_payload(decode=True)
-                    if payload:
-                        text = payload.decode('utf-8', errors='ignore')
-                        if content_type == 'text/plain' and not body:
-                            body = text
-                        elif content_type == 'text/html' and not html_body:
-                            html_body = text
-                except Exception:
-                    pass
-        else:
-            try:
-                payload = msg.get_payload(decode=True)
-                if payload:
-                    body = payload.decode('utf-8', errors='ignore')
-            except Exception:
-                pass
-
-        # Fall back to HTML if no plain text
-        if not body and html_body:
-            body = re.sub(r'<style[^>]*>.*?</style>', '', html_body, flags=re.DOTALL)
-            body = re.sub(r'<script[^>]*>.*?</script>', '', body, flags=re.DOTALL)
-            body = re.sub(r'<[^>]+>', ' ', body)
-            body = re.sub(r'&nbsp;', ' ', body)
-            body = re.sub(r'\s+', ' ', body).strip()
-
-        return body
-
-    def save_attachments(self, msg, email_date, email_id, cursor):
+    def save_attachments(self, spooled, email_date, email_id, cursor):
         """
-        Extract and save email attachments to BY_DATE folder structure
+        Store spooled attachments in the content-addressed blob store
         AND track in database
 
+        Content already in the store (the same contract PDF on every reply
+        in a thread) is not written again - the new row gets a reference to
+        the existing blob.
+
         Args:
-            msg: Email message object
+            spooled: SpooledAttachment list from mime_stream (decoded parts on disk)
             email_date: datetime object of email date
             email_id: Database email_id for linking
             cursor: Database cursor for inserting attachment records
@@ -251,52 +227,12 @@ class EmailImporter:
         """
         attachments = []
 
-        if not msg.is_multipart():
-            return attachments
-
-        # Create date-based subdirectory (YYYY-MM format)
-        date_folder = email_date.strftime('%Y-%m')
-        save_dir = os.path.join(self.attachments_dir, date_folder)
-
-        # Ensure directory exists
-        os.makedirs(save_dir, exist_ok=True)
-
-        # Walk through all parts of the email
-        for part in msg.walk():
-            # Skip multipart containers
-            if part.get_content_maintype() == 'multipart':
-                continue
-
-            # Check if this part is an attachment
-            content_disposition = part.get_content_disposition()
-            if content_disposition != 'attachment':
-                continue
-
-            # Get filename
-            filename = part.get_filename()
-            if not filename:
+        for part in spooled:
+            # Only real attachments with a filename (the parser spools nothing else)
+            if part.disposition != 'attachment' or not part.filename:
                 continue
 
-            # Decode filename (handles MIME-encoded headers like =?utf-8?Q?...?=)
-            if isinstance(filename, bytes):
-                filename = filename.decode('utf-8', errors='ignore')
-
-            # Decode MIME-encoded header
-            try:
-                from email.header import decode_header
-                decoded_parts = decode_header(filename)
-                decoded_filename = ''
-                for part_data, encoding in decoded_parts:
-                    if isinstance(part_data, bytes):
-                        decoded_filename += part_data.decode(encoding or 'utf-8', errors='ignore')
-                    else:
-                        decoded_filename += part_data
-                filename = decoded_filename
-            except (UnicodeDecodeError, LookupError):
-                pass  # If decoding fails, use original filename
-
-            # Clean filename (remove path separators)
-            filename = filename.replace('/', '_').replace('\\', '_')
+            filename = self._decode_filename(part.filename)
 
             # FILTER OUT EMAIL SIGNATURE/BANNER IMAGES
             # Skip common inline image patterns
@@ -316,71 +252,53 @@ class EmailImporter:
                 continue
 
             # Skip all-numeric filenames (e.g., "1762867487977.png") - usually inline images
-            import re
             if re.match(r'^\d+\.(png|jpg|jpeg|gif)$', filename_lower):
                 continue
 
-            # Get MIME type
-            mime_type = part.get_content_type()
-
-            # Get binary data
-            try:
-                payload = part.get_payload(decode=True)
-            except Exception as e:
-                print(f"      ⚠️  Error getting payload for {filename}: {e}")
-                continue
-
-            if not payload:
+            if not part.size:
                 continue
 
             # Skip very small images (likely logos/icons) - under 50KB
-            if len(payload) < 50000:  # 50KB
+            if part.size < 50000:  # 50KB
                 # If it's an image and small, skip it
                 if any(ext in filename_lower for ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']):
                     continue
 
+            mime_type = part.mime_type
+
             # Classify document type based on filename
             document_type = self.classify_document(filename, mime_type)
 
-            # Full path to save
-            filepath = os.path.join(save_dir, filename)
-
-            # Handle duplicate filenames
-            counter = 1
-            base_name, ext = os.path.splitext(filename)
-            original_filename = filename
-            while os.path.exists(filepath):
-                filename = f"{base_name}_{counter}{ext}"
-                filepath = os.path.join(save_dir, filename)
-                counter += 1
-
-            # Save file
             try:
-                if payload:
-                    filesize = len(payload)
-
-                    with open(filepath, 'wb') as f:
-                        f.write(payload)
-
+                sha256, blob = self.blob_store.put_file(cursor.connection, part.path,
+                                                        sha256=part.sha256, move=True)
+                filepath = str(blob)
+                cursor.execute("SELECT ref_count FROM blobs WHERE sha256 = ?", (sha256,))
+                shared = cursor.fetchone()[0]
+                if shared:
+                    print(f"      📎 Already stored: {filename} ({shared} other reference(s))")
+                else:
                     print(f"      📎 Saved: {filename} ({document_type})")
 
-                    # Extract file type (extension without dot)
-                    file_ext = os.path.splitext(filename)[1].lower().lstrip('.')
-
-                    # Insert into database (corrected table and column names)
-                    cursor.execute("""
-                        INSERT INTO attachments
-                        (email_id, filename, stored_path, file_size, file_type, mime_type, category)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (email_id, filename, filepath, filesize, file_ext, mime_type, document_type))
-
-                    attachments.append({
-                        'filename': filename,
-                        'filepath': filepath,
-                        'filesize': filesize,
-                        'mime_type': mime_type,
-                        'document_type': document_type
-                    })
+                # Extract file type (extension without dot)
+                file_ext = os.path.splitext(filename)[1].lower().lstrip('.')
+
+                cursor.execute("""
+                    INSERT INTO attachments
+                    (email_id, filename, stored_path, file_size, file_type, mime_type, category, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (email_id, filename, filepath, part.size, file_ext, mime_type, document_type, sha256))
+                self.blob_store.add_ref(cursor.connection, 'attachments', cursor.lastrowid,
+                                        sha256, logical_path=filepath)
+
+                attachments.append({
+                    'filename': filename,
+                    'filepath': filepath,
+                    'filesize': part.size,
+                    'mime_type': mime_type,
+                    'document_type': document_type,
+                    'content_hash': sha256,
+                })
 
             except Exception as e:
                 print(f"      ⚠️  Error saving {filename}: {e}")
@@ -388,6 +306,21 @@ class EmailImporter:
 
         return attachments
 
+    def _decode_filename(self, filename):
+        """Decode a MIME-encoded filename (=?utf-8?Q?...?=) and strip path separators"""
+        try:
+            decoded_filename = ''
+            for part_data, encoding in decode_header(filename):
+                if isinstance(part_data, bytes):
+                    decoded_filename += part_data.decode(encoding or 'utf-8', errors='ignore')
+                else:
+                    decoded_filename += part_data
+            filename = decoded_filename
+        except (UnicodeDecodeError, LookupError):
+            pass  # If decoding fails, use original filename
+
+        return filename.replace('/', '_').replace('\\', '_')
+
     def classify_document(self, filename, mime_type):
         """
         Classify document type based on filename and MIME type
@@ -82,7 +82,7 @@ def process_emails(
 
     # Step 1: Pattern matching
     logger.info(f"Step 1: Pattern matching for {limit} emails...")
-    pattern_result = linker.process_batch(email_ids, limit)
+    pattern_result = linker.process_batch(email_ids, limit, bulk=True)
 
     result = {
         "total": pattern_result["total"],
@@ -157,11 +157,12 @@ def _analyze_with_gpt(
 
     # Get context
     bundler = get_context_bundler(db_path)
-    context_prompt = bundler.format_for_prompt()
+    context = bundler.get_prompt_context()
 
     # Analyze with GPT
-    analyzer = GPTSuggestionAnalyzer()
-    results = analyzer.analyze_batch([dict(e) for e in emails], context_prompt, max_workers)
+    analyzer = GPTSuggestionAnalyzer(db_path=db_path, job_kind="email_link_analysis")
+    results = analyzer.analyze_batch([dict(e) for e in emails], context, max_workers)
+    analyzer.dispatcher.mark_applied([r.get("job_id") for r in results if r.get("success")])
 
     total_cost = sum(
         r.get("usage", {}).get("estimated_cost_usd", 0)
@@ -66,13 +66,14 @@ class EmailOrchestrator(BaseService):
 
         # Step 0: Auto-link via pattern matching (instant, no GPT cost)
         try:
-            link_result = self.pattern_linker.process_batch(email_ids=None, limit=limit)
+            link_result = self.pattern_linker.process_batch(email_ids=None, limit=limit, bulk=True)
             result["pattern_linking"] = {
                 "total": link_result.get("total", 0),
                 "auto_linked": link_result.get("auto_linked", 0),
                 "links_applied": link_result.get("links_applied", 0),
                 "needs_gpt": link_result.get("needs_gpt", 0),
                 "skipped_spam": link_result.get("skipped_spam", 0),
+                "timings": link_result.get("timings", {}),
             }
             logger.info(f"Pattern linking: {link_result.get('auto_linked', 0)} auto-linked, "
                        f"{link_result.get('needs_gpt', 0)} need GPT")
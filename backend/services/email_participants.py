@@ -0,0 +1,242 @@
+"""
+Email Participants
+
+Normalized sender/recipient addresses for the emails table (migration 117).
+
+emails.sender_email and recipient_emails keep the raw header text
+("Name <x@y.com>", comma-separated To: lines). Each email also gets:
+- emails.sender_address / sender_domain - lower-cased bare address and domain
+- email_participants(email_id, address, domain, role) - one row per address,
+  role 'from' for the sender and 'to' for recipient_emails
+
+Per-contact lookups then seek an index (`sender_address = ?`,
+`email_participants.address = ?`) instead of scanning with
+`LOWER(sender_email) LIKE '%x@y%'`.
+
+Importers call index_email_participants() with the ids they just inserted,
+or index_emails_after() after a bulk INSERT OR IGNORE, on the same
+connection and inside the same transaction. Existing rows are backfilled by
+scripts/maintenance/backfill_email_participants.py.
+
+All functions take a sqlite3 connection. On a database without migration 117
+they do nothing.
+"""
+
+import json
+import logging
+import re
+from email.utils import getaddresses
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Max ids per IN (...) clause
+CHUNK_SIZE = 500
+
+_WHITESPACE = re.compile(r'\s')
+
+
+def normalize_address(value: Optional[str]) -> Optional[str]:
+    """
+    Lower-cased bare address from one header value.
+
+    'Jane Doe <Jane@Client.com>' -> 'jane@client.com'. Returns the first
+    address if there are several, and None if there is none.
+    """
+    addresses = parse_addresses(value)
+    return addresses[0] if addresses else None
+
+
+def parse_addresses(value: Optional[str]) -> List[str]:
+    """All addresses in a header value, normalized and de-duplicated in order.
+
+    Accepts RFC 2822 lists (quoted names may contain commas) and JSON arrays,
+    which some importers stored in recipient_emails.
+    """
+    if not value:
+        return []
+
+    fields = [value]
+    if value.lstrip().startswith('['):
+        try:
+            parsed = json.loads(value)
+            if isinstance(parsed, list):
+                fields = [str(item) for item in parsed if item]
+        except ValueError:
+            pass
+
+    addresses = []
+    for _, address in getaddresses(fields):
+        address = address.strip().strip('<>"\'').lower()
+        if address.startswith('mailto:'):
+            address = address[len('mailto:'):]
+        local, _, domain = address.partition('@')
+        if not local or not domain or _WHITESPACE.search(address):
+            continue
+        if address not in addresses:
+            addresses.append(address)
+    return addresses
+
+
+def address_domain(address: Optional[str]) -> Optional[str]:
+    """Domain part of a normalized address"""
+    if not address or '@' not in address:
+        return None
+    return address.split('@', 1)[1]
+
+
+def participant_rows(email_id: int, sender_email: Optional[str],
+                     recipient_emails: Optional[str]) -> List[Tuple[int, str, str, str]]:
+    """(email_id, address, domain, role) rows for one email"""
+    rows = []
+    sender = normalize_address(sender_email)
+    if sender:
+        rows.append((email_id, sender, address_domain(sender), 'from'))
+    for address in parse_addresses(recipient_emails):
+        rows.append((email_id, address, address_domain(address), 'to'))
+    return rows
+
+
+def participant_condition(term: Optional[str], email_id_column: str = "e.email_id",
+                          role: Optional[str] = None) -> Optional[Tuple[str, List[Any]]]:
+    """
+    Indexed filter for a person search term, or None if the term is not an
+    address.
+
+    'x@y.com' matches that participant and '@y.com' matches anyone at the
+    domain. Names ('Jane') return None - callers keep their name match.
+
+    Returns:
+        (sql, params) such as ("e.email_id IN (SELECT ...)", ['x@y.com'])
+    """
+    term = (term or '').strip().lower()
+    if not term or '@' not in term:
+        return None
+
+    role_sql = " AND role = ?" if role else ""
+    role_params = [role] if role else []
+    if term.startswith('@'):
+        domain = term[1:]
+        if not domain:
+            return None
+        return (f"{email_id_column} IN (SELECT email_id FROM email_participants "
+                f"WHERE domain = ?{role_sql})", [domain] + role_params)
+
+    address = normalize_address(term)
+    if not address:
+        return None
+    return (f"{email_id_column} IN (SELECT email_id FROM email_participants "
+            f"WHERE address = ?{role_sql})", [address] + role_params)
+
+
+def has_participant_index(conn) -> bool:
+    """True if migration 117 has been applied"""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'email_participants'"
+    ).fetchone() is not None
+
+
+def index_email_participants(conn, email_ids: Iterable[int]) -> int:
+    """
+    (Re)index the given emails: set sender_address/sender_domain and replace
+    their email_participants rows.
+
+    Idempotent. Does not commit - callers index inside their import
+    transaction.
+
+    Returns:
+        Number of emails indexed
+    """
+    email_ids = list(email_ids)
+    if not email_ids or not has_participant_index(conn):
+        return 0
+
+    indexed = 0
+    for start in range(0, len(email_ids), CHUNK_SIZE):
+        chunk = email_ids[start:start + CHUNK_SIZE]
+        placeholders = ','.join('?' * len(chunk))
+        emails = conn.execute(f"""
+            SELECT email_id, sender_email, recipient_emails
+            FROM emails WHERE email_id IN ({placeholders})
+        """, chunk).fetchall()
+
+        senders = []
+        participants = []
+        for email_id, sender_email, recipient_emails in emails:
+            rows = participant_rows(email_id, sender_email, recipient_emails)
+            sender = next((row for row in rows if row[3] == 'from'), None)
+            senders.append((sender[1] if sender else None, sender[2] if sender else None, email_id))
+            participants.extend(rows)
+
+        # Unchanged rows are skipped so re-indexing does not fire update triggers
+        conn.executemany("""
+            UPDATE emails SET sender_address = ?1, sender_domain = ?2
+            WHERE email_id = ?3
+              AND (sender_address IS NOT ?1 OR sender_domain IS NOT ?2)
+        """, senders)
+        conn.execute(f"DELETE FROM email_participants WHERE email_id IN ({placeholders})", chunk)
+        conn.executemany("""
+            INSERT OR IGNORE INTO email_participants (email_id, address, domain, role)
+            VALUES (?, ?, ?, ?)
+        """, participants)
+        indexed += len(emails)
+
+    return indexed
+
+
+def max_email_id(conn) -> int:
+    """Highest email_id so far - take it before a bulk insert, then index_emails_after()"""
+    return conn.execute("SELECT COALESCE(MAX(email_id), 0) FROM emails").fetchone()[0]
+
+
+def index_emails_after(conn, after_id: int) -> int:
+    """Index every email inserted after `after_id` (see max_email_id)"""
+    if not has_participant_index(conn):
+        return 0
+    ids = [row[0] for row in conn.execute(
+        "SELECT email_id FROM emails WHERE email_id > ? ORDER BY email_id", (after_id,)
+    )]
+    return index_email_participants(conn, ids)
+
+
+def backfill_email_participants(conn, after_id: int = 0, batch_size: int = 2000,
+                                limit: Optional[int] = None, progress=None) -> Dict[str, Any]:
+    """
+    Index existing emails in email_id order, committing every batch.
+
+    Safe to stop and re-run. Pass the returned last_email_id as after_id to
+    resume.
+
+    Args:
+        conn: sqlite3 connection (committed after each batch)
+        after_id: Start after this email_id
+        batch_size: Emails per transaction
+        limit: Stop after this many emails
+        progress: Optional callback(indexed_so_far, last_email_id)
+
+    Returns:
+        Dict with emails indexed, participant rows and last_email_id
+    """
+    if not has_participant_index(conn):
+        return {'emails': 0, 'participants': 0, 'last_email_id': after_id,
+                'error': 'email_participants table missing - apply migration 117'}
+
+    indexed = 0
+    last_id = after_id
+    while limit is None or indexed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - indexed)
+        ids = [row[0] for row in conn.execute(
+            "SELECT email_id FROM emails WHERE email_id > ? ORDER BY email_id LIMIT ?",
+            (last_id, size)
+        )]
+        if not ids:
+            break
+        indexed += index_email_participants(conn, ids)
+        conn.commit()
+        last_id = ids[-1]
+        if progress:
+            progress(indexed, last_id)
+
+    participants = conn.execute("SELECT COUNT(*) FROM email_participants").fetchone()[0]
+    logger.info(f"Indexed participants for {indexed} emails (through email_id {last_id})")
+    return {'emails': indexed, 'participants': participants, 'last_email_id': last_id}
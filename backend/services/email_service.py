@@ -10,6 +10,7 @@ Handles all email-related operations:
 
 from typing import Optional, List, Dict, Any
 from .base_service import BaseService
+from .search_service import SearchService
 
 
 class EmailService(BaseService):
@@ -23,7 +24,8 @@ class EmailService(BaseService):
         project_code: Optional[str] = None,
         search: Optional[str] = None,
         inbox_source: Optional[str] = None,
-        inbox_category: Optional[str] = None
+        inbox_category: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """Wrapper for get_all_emails with router-compatible parameters"""
         result = self.get_all_emails(
@@ -32,13 +34,17 @@ class EmailService(BaseService):
             page=page,
             per_page=per_page,
             inbox_source=inbox_source,
-            inbox_category=inbox_category
+            inbox_category=inbox_category,
+            cursor=cursor
         )
         return {
             'emails': result.get('items', []),
             'total': result.get('total', 0),
+            'total_estimated': result.get('total_estimated', False),
             'page': page,
-            'per_page': per_page
+            'per_page': per_page,
+            'has_more': result.get('has_more', False),
+            'next_cursor': result.get('next_cursor')
         }
 
     def get_all_emails(
@@ -51,7 +57,8 @@ class EmailService(BaseService):
         sort_by: str = "date",
         sort_order: str = "DESC",
         inbox_source: Optional[str] = None,
-        inbox_category: Optional[str] = None
+        inbox_category: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Get all emails with search, filtering, pagination, and sorting
@@ -66,9 +73,13 @@ class EmailService(BaseService):
             sort_order: ASC or DESC
             inbox_source: Filter by source inbox (e.g., projects@bensley.com)
             inbox_category: Filter by inbox category (projects, invoices, internal, general)
+            cursor: next_cursor of the previous page (keyset pagination)
 
         Returns:
-            Paginated email results
+            Paginated email results with 'has_more' and 'next_cursor'
+
+        Raises:
+            ValueError: Invalid sort parameters or cursor
         """
         sql = """
             SELECT
@@ -106,9 +117,15 @@ class EmailService(BaseService):
         params = []
 
         if search_query:
-            sql += " AND (e.subject LIKE ? OR e.sender_email LIKE ?)"
-            search_term = f"%{search_query}%"
-            params.extend([search_term, search_term])
+            fts_filter = SearchService(self.db_path).match_filter('emails', search_query, 'e.email_id')
+            if fts_filter:
+                clause, match = fts_filter
+                sql += f" AND {clause}"
+                params.append(match)
+            else:
+                sql += " AND (e.subject LIKE ? OR e.sender_email LIKE ?)"
+                search_term = f"%{search_query}%"
+                params.extend([search_term, search_term])
 
         if category:
             sql += " AND ec.category = ?"
@@ -133,9 +150,20 @@ class EmailService(BaseService):
         validated_sort_by = self.validate_sort_column(sort_by, allowed_columns)
         validated_sort_order = self.validate_sort_order(sort_order)
 
-        sql += f" ORDER BY e.{validated_sort_by} {validated_sort_order}"
-
-        return self.paginate(sql, tuple(params), page, per_page)
+        return self.paginate_keyset(
+            sql, tuple(params),
+            sort_column=validated_sort_by,
+            id_column='email_id',
+            descending=validated_sort_order == 'DESC',
+            cursor=cursor,
+            page=page,
+            per_page=per_page,
+            # The unfiltered inbox total is only shown as "N emails" - the
+            # ANALYZE row count is close enough and costs nothing
+            total='cached' if params else 'estimate',
+            count_tables=['emails', 'email_content', 'email_proposal_links'],
+            estimate_table='emails',
+        )
 
     def get_email_by_id(self, email_id: int) -> Optional[Dict[str, Any]]:
         """Get email by ID with full content"""
@@ -280,7 +308,10 @@ class EmailService(BaseService):
 
     def search_emails(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
-        Search emails by subject or sender
+        Search emails by subject, sender, snippet and body
+
+        Uses the emails_fts index (BM25-ranked, with snippet/highlight) and
+        falls back to a LIKE scan if the index hasn't been created.
 
         Args:
             query: Search term
@@ -289,6 +320,10 @@ class EmailService(BaseService):
         Returns:
             List of matching emails
         """
+        search = SearchService(self.db_path)
+        if search.is_available('emails'):
+            return search.search_source('emails', query, limit=limit)
+
         sql = """
             SELECT
                 e.email_id,
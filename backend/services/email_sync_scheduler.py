@@ -0,0 +1,366 @@
+"""
+Email Sync Scheduler
+
+Parallel multi-account IMAP sync. Replaces the sequential account/folder
+walk in scheduled_email_sync.run_sync, where one slow mailbox held up
+every other inbox.
+
+- A bounded pool of network workers, one IMAP connection per
+  (account, folder) task, each running the incremental UID sync from
+  imap_sync.ImapUidSync
+- Bodies arrive in BODY.PEEK[]<offset.size> windows and are fed straight
+  into the streaming MIME parser (mime_stream), so no message is ever held
+  whole - per worker, memory is bounded by the window size however large
+  the mail is
+- Every database write (emails and their participant index, sync state, run
+  metrics) goes through one writer thread that batches inserts into short
+  transactions on the pool's writer connection - workers only ever read
+- Per-account progress, throughput and errors are written to
+  email_sync_runs (migration 107) while the run is in progress
+
+Usage:
+    from backend.services.email_sync_scheduler import EmailSyncScheduler
+
+    scheduler = EmailSyncScheduler(db_path, build_row=email_row, connect=open_imap)
+    summary = scheduler.run(accounts)   # accounts: [{'email', 'password', 'folders'}]
+
+`build_row(parsed, uid, message_id, account_email, folder)` turns a
+mime_stream.ParsedEmail into a dict of emails columns (or None to drop the
+message); attachments are not spooled. `connect(account)` returns a
+logged-in imaplib connection.
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .connection_pool import get_pool
+from .email_participants import index_emails_after, max_email_id
+from .imap_sync import BODY_CHUNK_SIZE, ImapUidSync
+from .mime_stream import ParsedEmail, parse_stream
+
+logger = logging.getLogger(__name__)
+
+SYNC_WORKERS = int(os.getenv('EMAIL_SYNC_WORKERS', '4'))
+WRITE_BATCH_SIZE = int(os.getenv('EMAIL_SYNC_WRITE_BATCH', '50'))
+WRITE_FLUSH_SECONDS = 0.5
+
+
+class _SyncWriter(threading.Thread):
+    """
+    Single consumer for every sync write
+
+    Ops arrive on a queue: ('email', account, folder, row), ('state', params),
+    ('progress', account, deltas), ('folder_done', account, error) and
+    ('stop',). Email rows are buffered and flushed in one transaction when
+    the batch fills, the queue goes idle, or any other op arrives - so a
+    folder's state update is never committed before its messages. If a
+    flush fails, every folder with rows in it keeps its old high-water mark
+    (its 'state' op is dropped), so the lost messages are fetched again.
+    """
+
+    def __init__(self, db_path: str, run_id: str, batch_size: int = WRITE_BATCH_SIZE):
+        super().__init__(name='email-sync-writer', daemon=True)
+        self.pool = get_pool(db_path)
+        self.run_id = run_id
+        self.batch_size = batch_size
+        # Bounded, so parsed rows cannot pile up faster than they are written
+        self.queue: queue.Queue = queue.Queue(maxsize=batch_size * 4)
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self._buffer: List[tuple] = []
+        self._failed_folders: Set[Tuple[str, str]] = set()
+        self.error: Optional[Exception] = None
+
+    # -- producer side --------------------------------------------------
+
+    def put(self, *op):
+        self.queue.put(op)
+
+    def stop(self):
+        self.queue.put(('stop',))
+        self.join()
+
+    # -- metrics ----------------------------------------------------------
+
+    def start_account(self, account_email: str, folders: List[str]):
+        """Create the account's email_sync_runs row (called before workers start)"""
+        self.accounts[account_email] = {
+            'folders_total': len(folders),
+            'folders_done': 0,
+            'started': time.perf_counter(),
+            'new_uids': 0, 'messages_fetched': 0, 'imported': 0, 'skipped': 0,
+            'errors': 0, 'bytes_fetched': 0, 'error_messages': [],
+        }
+        with self.pool.writer() as conn:
+            conn.execute("""
+                INSERT INTO email_sync_runs (run_id, account_email, folders, status, started_at)
+                VALUES (?, ?, ?, 'running', ?)
+            """, (self.run_id, account_email, ','.join(folders), datetime.now().isoformat()))
+
+    def _write_metrics(self, conn, account_email: str):
+        m = self.accounts[account_email]
+        elapsed = time.perf_counter() - m['started']
+        finished = m['folders_done'] >= m['folders_total']
+
+        status = 'running'
+        if finished:
+            failed = len(m['error_messages'])
+            status = 'completed' if not failed else ('failed' if failed >= m['folders_total'] else 'partial')
+
+        conn.execute("""
+            UPDATE email_sync_runs SET
+                status = ?, folders_done = ?, new_uids = ?, messages_fetched = ?,
+                imported = ?, skipped = ?, errors = ?, bytes_fetched = ?,
+                duration_seconds = ?, messages_per_second = ?, error_message = ?,
+                finished_at = ?
+            WHERE run_id = ? AND account_email = ?
+        """, (
+            status, m['folders_done'], m['new_uids'], m['messages_fetched'],
+            m['imported'], m['skipped'], m['errors'], m['bytes_fetched'],
+            round(elapsed, 3),
+            round(m['messages_fetched'] / elapsed, 2) if elapsed > 0 else None,
+            '; '.join(m['error_messages']) or None,
+            datetime.now().isoformat() if finished else None,
+            self.run_id, account_email,
+        ))
+
+    # -- consumer side ----------------------------------------------------
+
+    def _flush(self):
+        """Insert buffered email rows in one transaction (INSERT OR IGNORE -
+        the same message can arrive through two accounts in the same run)"""
+        if not self._buffer:
+            return
+
+        rows, self._buffer = self._buffer, []
+
+        # Group by account and column set so each group is one executemany
+        groups: Dict[tuple, List[tuple]] = {}
+        for account_email, _, row in rows:
+            groups.setdefault((account_email, tuple(row)), []).append(tuple(row.values()))
+
+        # (imported, ignored) per account - applied only once the batch commits
+        counts: Dict[str, List[int]] = {}
+        try:
+            with self.pool.writer() as conn:
+                last_id = max_email_id(conn)
+                for (account_email, columns), values in groups.items():
+                    cursor = conn.executemany(
+                        f"INSERT OR IGNORE INTO emails ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' * len(columns))})",
+                        values,
+                    )
+                    # rowcount = rows actually inserted (ignored rows and trigger writes excluded)
+                    account_counts = counts.setdefault(account_email, [0, 0])
+                    account_counts[0] += cursor.rowcount
+                    account_counts[1] += len(values) - cursor.rowcount
+
+                index_emails_after(conn, last_id)
+        except Exception:
+            # Rows are gone from the buffer; keep their folders' marks where they were
+            for account_email, folder, _ in rows:
+                self._failed_folders.add((account_email, folder))
+                self.accounts[account_email]['errors'] += 1
+            raise
+
+        with self.pool.writer() as conn:
+            for account_email, (imported, ignored) in counts.items():
+                m = self.accounts[account_email]
+                m['imported'] += imported
+                m['skipped'] += ignored
+                self._write_metrics(conn, account_email)
+
+    def run(self):
+        last_flush = time.perf_counter()
+        while True:
+            try:
+                op = self.queue.get(timeout=WRITE_FLUSH_SECONDS)
+            except queue.Empty:
+                op = None
+
+            try:
+                if op is None or op[0] != 'email':
+                    self._flush()
+                    last_flush = time.perf_counter()
+
+                if op is None:
+                    continue
+
+                kind = op[0]
+                if kind == 'stop':
+                    return
+                if kind == 'email':
+                    self._buffer.append((op[1], op[2], op[3]))
+                    if (len(self._buffer) >= self.batch_size or
+                            time.perf_counter() - last_flush > WRITE_FLUSH_SECONDS):
+                        self._flush()
+                        last_flush = time.perf_counter()
+                elif kind == 'state':
+                    account_email, folder = op[1][:2]
+                    if (account_email, folder) in self._failed_folders:
+                        logger.warning(f"{account_email}:{folder} - email insert failed, "
+                                       f"keeping the previous high-water mark")
+                        continue
+                    with self.pool.writer() as conn:
+                        conn.execute(ImapUidSync.STATE_UPSERT_SQL, op[1])
+                elif kind == 'progress':
+                    m = self.accounts[op[1]]
+                    for key, value in op[2].items():
+                        m[key] += value
+                    with self.pool.writer() as conn:
+                        self._write_metrics(conn, op[1])
+                elif kind == 'folder_done':
+                    m = self.accounts[op[1]]
+                    m['folders_done'] += 1
+                    if op[2]:
+                        m['error_messages'].append(op[2])
+                    with self.pool.writer() as conn:
+                        self._write_metrics(conn, op[1])
+            except Exception as e:
+                # Keep consuming so producers never block; report at the end
+                logger.error(f"Sync writer error: {e}", exc_info=True)
+                self.error = e
+
+
+class EmailSyncScheduler:
+    """Bounded worker pool syncing many accounts/folders in parallel"""
+
+    def __init__(
+        self,
+        db_path: str,
+        build_row: Callable[[ParsedEmail, int, Optional[str], str, str], Optional[Dict[str, Any]]],
+        connect: Callable[[Dict[str, Any]], Any],
+        max_workers: int = SYNC_WORKERS,
+        max_per_folder: Optional[int] = None,
+        body_delay: float = 0.0,
+        write_batch_size: int = WRITE_BATCH_SIZE,
+        chunk_size: int = BODY_CHUNK_SIZE,
+    ):
+        """
+        Args:
+            db_path: SQLite database
+            build_row: (parsed, uid, message_id, account_email, folder) -> emails row dict
+            connect: account dict -> logged-in IMAP connection
+            max_workers: Concurrent IMAP connections
+            max_per_folder: Max bodies per folder per run (rest deferred)
+            body_delay: Courtesy delay after each body download
+            write_batch_size: Email rows per insert transaction
+            chunk_size: Bytes per partial body fetch (peak body memory per worker)
+        """
+        self.db_path = db_path
+        self.build_row = build_row
+        self.connect = connect
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.max_per_folder = max_per_folder
+        self.body_delay = body_delay
+        self.write_batch_size = write_batch_size
+        self._pool = get_pool(db_path)
+
+    def _sync_folder(self, writer: _SyncWriter, account: Dict[str, Any], folder: str):
+        """Network worker: one IMAP connection, one folder"""
+        account_email = account['email']
+        error = None
+        imap = None
+        try:
+            imap = self.connect(account)
+            with self._pool.reader(row_factory=None) as conn:
+                sync = ImapUidSync(imap, conn, folder, account_email, body_delay=self.body_delay)
+                if not sync.select():
+                    raise RuntimeError(f"could not select {folder}")
+
+                pending = sync.plan(limit=self.max_per_folder)
+                writer.put('progress', account_email, {
+                    'new_uids': sync.stats['new_uids'], 'skipped': sync.stats['known'],
+                })
+
+                fetched_bytes = 0
+                for stub, chunks in sync.stream(pending, chunk_size=self.chunk_size):
+                    # Parsed as the windows arrive; a failed parse or download
+                    # keeps the mark below the UID so it is fetched next run
+                    try:
+                        parsed = parse_stream(chunks, spool_attachments=False)
+                        row = self.build_row(parsed, stub.uid, stub.message_id, account_email, folder)
+                    except Exception as e:
+                        logger.warning(f"Parse failed for {account_email}:{folder} UID {stub.uid}: {e}")
+                        sync.mark_failed(stub.uid)
+                        continue
+                    fetched_bytes += parsed.bytes_read
+                    if row:
+                        writer.put('email', account_email, folder, row)
+                    sync.mark_done(stub.uid)
+
+                writer.put('progress', account_email, {
+                    'messages_fetched': sync.stats['fetched'],
+                    'bytes_fetched': fetched_bytes,
+                    'errors': sync.stats['errors'],
+                })
+                params = sync.state_params()
+                if params:
+                    writer.put('state', params)
+                logger.info(f"{account_email}:{folder} - {sync.stats['fetched']} fetched, "
+                            f"{sync.stats['known']} known, up to UID {sync.last_uid}")
+        except Exception as e:
+            error = f"{folder}: {e}"
+            logger.error(f"Sync failed for {account_email}:{folder}: {e}")
+            writer.put('progress', account_email, {'errors': 1})
+        finally:
+            if imap is not None:
+                try:
+                    imap.logout()
+                except Exception:
+                    pass
+            writer.put('folder_done', account_email, error)
+
+    def run(self, accounts: List[Dict[str, Any]], run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Sync every folder of every account
+
+        Args:
+            accounts: [{'email', 'password', 'folders'}, ...]
+            run_id: Identifier for email_sync_runs (default: timestamp + random suffix)
+
+        Returns:
+            {'run_id', 'accounts': {email: metrics}, 'totals': {...}, 'duration_seconds'}
+        """
+        run_id = run_id or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        started = time.perf_counter()
+
+        writer = _SyncWriter(self.db_path, run_id, self.write_batch_size)
+        tasks = []
+        for account in accounts:
+            folders = list(account.get('folders') or ['INBOX'])
+            writer.start_account(account['email'], folders)
+            tasks.extend((account, folder) for folder in folders)
+        writer.start()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='email-sync') as workers:
+            futures = [
+                workers.submit(self._sync_folder, writer, account, folder)
+                for account, folder in tasks
+            ]
+            wait(futures)
+        writer.stop()
+
+        keys = ('new_uids', 'messages_fetched', 'imported', 'skipped', 'errors', 'bytes_fetched')
+        results = {}
+        for email, m in writer.accounts.items():
+            results[email] = {key: m[key] for key in keys}
+            results[email]['failed_folders'] = m['error_messages']
+        totals = {key: sum(r[key] for r in results.values()) for key in keys}
+        if writer.error:
+            totals['writer_error'] = str(writer.error)
+
+        return {
+            'run_id': run_id,
+            'accounts': results,
+            'totals': totals,
+            'duration_seconds': round(time.perf_counter() - started, 3),
+        }
@@ -17,6 +17,7 @@ from datetime import datetime
 from .base_service import BaseService
 from .gpt_suggestion_analyzer import GPTSuggestionAnalyzer
 from .context_bundler import get_context_bundler
+from .usage_counters import get_usage_counters
 
 logger = logging.getLogger(__name__)
 
@@ -83,7 +84,7 @@ class EmailTaggerService(BaseService):
     def gpt_analyzer(self) -> GPTSuggestionAnalyzer:
         """Lazy-load GPT analyzer"""
         if self._gpt_analyzer is None:
-            self._gpt_analyzer = GPTSuggestionAnalyzer()
+            self._gpt_analyzer = GPTSuggestionAnalyzer(db_path=self.db_path, job_kind="email_tagging")
         return self._gpt_analyzer
 
     def tag_batch(
@@ -459,15 +460,8 @@ class EmailTaggerService(BaseService):
         # Increment pattern usage counter if we found a match
         if best_match and best_match.get('pattern_id'):
             try:
-                with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("""
-                        UPDATE category_patterns
-                        SET times_matched = times_matched + 1,
-                            last_matched_at = datetime('now')
-                        WHERE pattern_id = ?
-                    """, [best_match['pattern_id']])
-                    conn.commit()
+                # Batched write-behind (times_matched, last_matched_at)
+                get_usage_counters(self.db_path).record('category_patterns', best_match['pattern_id'])
             except Exception as e:
                 logger.warning(f"Failed to increment pattern counter: {e}")
 
@@ -484,7 +478,10 @@ class EmailTaggerService(BaseService):
     def _analyze_with_gpt(self, email: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze email with GPT using full category context"""
         context_prompt = self._build_category_context()
-        return self.gpt_analyzer.analyze_email(email, context_prompt)
+        result = self.gpt_analyzer.analyze_email(email, context_prompt)
+        # Tags are returned to the caller, not written; nothing to resume
+        self.gpt_analyzer.dispatcher.mark_applied([result.get("job_id")])
+        return result
 
     def _build_category_context(self) -> str:
         """Build context prompt including all categories"""
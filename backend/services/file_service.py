@@ -1,16 +1,30 @@
 """
 Service layer for project files metadata
 Handles file tracking, OneDrive integration, and version management
+
+File content is read through the content-addressed blob store
+(see blob_store.py) - file_path is the path recorded for the file,
+which may now live as a shared blob.
 """
 
 from typing import List, Dict, Optional, Any
 from datetime import datetime, date
+from pathlib import Path
 import sqlite3
 
+from .blob_store import BlobStore
+
 
 class FileService:
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self._blob_store = None
+
+    @property
+    def blob_store(self) -> BlobStore:
+        if self._blob_store is None:
+            self._blob_store = BlobStore(self.db_path)
+        return self._blob_store
 
     def _get_connection(self):
         """Create database connection"""
@@ -174,12 +188,68 @@ class FileService:
 
         return success
 
+    def get_file_content(self, file_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Locate the content of a file record
+
+        Returns:
+            {'file_id', 'filename', 'path', 'sha256'} or None if the record
+            or its content is missing (or lies outside the serve roots - see
+            BlobStore.servable). path is the blob if the file has been
+            ingested into the blob store, else the recorded file_path.
+        """
+        file = self.get_file_by_id(file_id)
+        if not file:
+            return None
+
+        path = self.blob_store.servable(
+            self.blob_store.resolve_owner('project_files', file_id, file.get('file_path'))
+        )
+        if path is None:
+            return None
+
+        info = self.blob_store.blob_info('project_files', file_id)
+        return {
+            'file_id': file_id,
+            'filename': file.get('filename') or Path(path).name,
+            'path': str(path),
+            'sha256': info['sha256'] if info else None,
+        }
+
+    def get_attachment_content(self, attachment_id: int) -> Optional[Dict[str, Any]]:
+        """Locate an email attachment's content - same shape as get_file_content plus mime_type"""
+        conn = self._get_connection()
+        row = conn.execute("""
+            SELECT attachment_id, filename, stored_path, mime_type
+            FROM attachments WHERE attachment_id = ?
+        """, (attachment_id,)).fetchone()
+        conn.close()
+        if not row:
+            return None
+
+        path = self.blob_store.servable(
+            self.blob_store.resolve_owner('attachments', attachment_id, row['stored_path'])
+        )
+        if path is None:
+            return None
+
+        info = self.blob_store.blob_info('attachments', attachment_id)
+        return {
+            'attachment_id': attachment_id,
+            'filename': row['filename'] or Path(path).name,
+            'mime_type': row['mime_type'],
+            'path': str(path),
+            'sha256': info['sha256'] if info else None,
+        }
+
     def delete_file(self, file_id: int) -> bool:
-        """Delete a file record"""
+        """Delete a file record (its blob is garbage collected once unreferenced)"""
         conn = self._get_connection()
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM project_files WHERE file_id = ?", (file_id,))
+        if cursor.rowcount > 0:
+            self.blob_store.release(conn, 'project_files', file_id)
         conn.commit()
         success = cursor.rowcount > 0
         conn.close()
@@ -8,6 +8,8 @@ from datetime import date
 import sqlite3
 import re
 
+from .kpi_snapshot_service import get_kpi_snapshot_service
+
 
 class FinancialService:
     def __init__(self, db_path: str):
@@ -19,6 +21,11 @@ class FinancialService:
         conn.row_factory = sqlite3.Row
         return conn
 
+    def _kpi_snapshot(self):
+        """KPI snapshot service once migration 110 is applied, else None"""
+        kpis = get_kpi_snapshot_service(self.db_path)
+        return kpis if kpis.ensure_fresh() else None
+
     def get_invoice_stats(self) -> Dict[str, Any]:
         """
         Get basic invoice statistics for the /api/invoices/stats endpoint
@@ -62,9 +69,16 @@ class FinancialService:
         Get aging summary across all unpaid invoices
         Groups by aging buckets (Current, 1-30 days, 31-60 days, etc.)
 
+        Served from the KPI snapshot when available (adds a 'snapshot'
+        staleness entry).
+
         Returns:
             Dictionary with counts and totals for each aging bucket
         """
+        kpis = self._kpi_snapshot()
+        if kpis is not None:
+            return kpis.get_invoice_aging_summary()
+
         conn = self._get_connection()
         cursor = conn.cursor()
 
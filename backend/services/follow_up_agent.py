@@ -15,7 +15,6 @@ import os
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 
 from .base_service import BaseService
 from .ai_learning_service import AILearningService
@@ -29,6 +28,7 @@ class FollowUpAgent(BaseService):
         api_key = os.environ.get('OPENAI_API_KEY')
         self.ai_enabled = bool(api_key)
         if self.ai_enabled:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
         self.learning_service = AILearningService(db_path)
 
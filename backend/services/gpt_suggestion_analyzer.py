@@ -9,13 +9,13 @@ Part of Phase 2.0: Context-Aware AI Suggestions
 
 import os
 import json
+import hashlib
 import logging
-import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from openai import OpenAI
+from .context_bundler import PromptContext
+from .llm_dispatcher import get_llm_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +23,20 @@ logger = logging.getLogger(__name__)
 GPT_PRICING = {
     "gpt-4o-mini": {
         "input_per_1m": 0.15,   # $0.15 per 1M input tokens
+        "cached_input_per_1m": 0.075,  # prompt-prefix cache hits bill at half price
         "output_per_1m": 0.60,  # $0.60 per 1M output tokens
+        "batch_multiplier": 0.5,  # batch API requests bill at half price
     }
 }
 
+# Proposals sent with each email (only those the email plausibly matches)
+MAX_CANDIDATE_PROPOSALS = int(os.getenv("GPT_MAX_CANDIDATE_PROPOSALS", "15"))
+
+CANDIDATE_PROPOSALS_NOTE = """## Active Proposals
+{count} proposals are active. The ones this email plausibly relates to (by
+project code, sender, thread, or name) are listed with the email. Link to one
+of those, or to a project code the email states explicitly."""
+
 
 class GPTSuggestionAnalyzer:
     """
@@ -34,6 +44,10 @@ class GPTSuggestionAnalyzer:
 
     Uses structured JSON output for reliable parsing.
     Tracks token usage for cost monitoring.
+
+    The system prompt depends only on the context bundle version and is
+    memoized; per-email content (candidate proposals, the email) goes in the
+    user message, after the cacheable prefix.
     """
 
     SYSTEM_PROMPT_TEMPLATE = """You are an AI assistant for Bensley Design Studios, a luxury hospitality design firm.
@@ -535,157 +549,270 @@ Include commitments with:
 {multi_project_contacts}
 """
 
-    def __init__(self, model: str = "gpt-4o-mini", max_tokens: int = 1000):
+    def __init__(self, model: str = "gpt-4o-mini", max_tokens: int = 1000,
+                 db_path: Optional[str] = None, job_kind: str = "suggestion_analysis",
+                 use_cache: bool = True):
         """
         Initialize the analyzer.
 
         Args:
             model: OpenAI model to use
             max_tokens: Maximum tokens for response
+            db_path: Database holding the llm_jobs queue (default DATABASE_PATH)
+            job_kind: llm_jobs kind for this analyzer's requests
+            use_cache: Answer identical earlier requests from the LLM response cache
         """
         api_key = os.environ.get("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
 
-        self.client = OpenAI(api_key=api_key)
+        self.dispatcher = get_llm_dispatcher(db_path)
+        self.job_kind = job_kind
+        self.use_cache = use_cache
         self.model = model
         self.max_tokens = max_tokens
 
-    def analyze_email(
-        self,
-        email: Dict[str, Any],
-        context_prompt: str,
-    ) -> Dict[str, Any]:
-        """
-        Analyze a single email with GPT.
+        # context version (or hash of a context string) -> (system prompt, baseline tokens)
+        self._system_prompts: Dict[str, Tuple[str, int]] = {}
 
-        Args:
-            email: Email data (subject, body, sender, date)
-            context_prompt: Pre-formatted context from ContextBundler
+    def _system_prompt(self, context: Union[str, PromptContext]) -> Tuple[str, int]:
+        """
+        System prompt for a context, memoized per bundle version.
 
         Returns:
-            Dict with analysis results and usage stats
+            (system prompt, estimated tokens of the full-proposal-list prompt
+            it replaces - ~4 chars per token)
         """
-        start_time = time.time()
+        if isinstance(context, PromptContext):
+            key = context.version
+        else:
+            key = hashlib.sha256(context.encode("utf-8")).hexdigest()
+        cached = self._system_prompts.get(key)
+        if cached is not None:
+            return cached
+
+        if isinstance(context, PromptContext):
+            prompt = self.SYSTEM_PROMPT_TEMPLATE.format(
+                business_context=context.business_context,
+                active_proposals=CANDIDATE_PROPOSALS_NOTE.format(count=len(context.proposals)),
+                learned_patterns=context.learned_patterns,
+                multi_project_contacts=context.multi_project_contacts,
+            )
+            baseline = self.SYSTEM_PROMPT_TEMPLATE.format(
+                business_context=context.business_context,
+                active_proposals=context.active_proposals,
+                learned_patterns=context.learned_patterns,
+                multi_project_contacts=context.multi_project_contacts,
+            )
+        else:
+            # Pre-formatted context string (e.g. with extra sections appended by the caller)
+            prompt = baseline = self.SYSTEM_PROMPT_TEMPLATE.format(
+                business_context=context.split("## Active Proposals")[0] if "## Active Proposals" in context else context[:2000],
+                active_proposals=self._extract_section(context, "## Active Proposals"),
+                learned_patterns=self._extract_section(context, "## Learned Email Patterns"),
+                multi_project_contacts=self._extract_section(context, "## Multi-Project Contacts"),
+            )
 
+        if len(self._system_prompts) >= 8:  # one bundle version at a time in practice
+            self._system_prompts.clear()
+        self._system_prompts[key] = (prompt, len(baseline) // 4)
+        return self._system_prompts[key]
+
+    def _format_candidate_proposals(self, candidates: List[Dict[str, Any]], context: PromptContext) -> str:
+        """Candidate proposals block that precedes the email in the user message"""
+        parts = ["## Candidate Proposals (matched to this email)"]
+        if candidates:
+            parts.append("Format: CODE: Name | Client | Country | Status | Last Activity")
+            for p in candidates:
+                parts.append(context.proposal_lines.get(p.get("project_code"), f"- {p.get('project_code')}"))
+        else:
+            parts.append("(No active proposal matches this email's code, sender, thread or name)")
+        return "\n".join(parts) + "\n\n"
+
+    def _prepare(self, email: Dict[str, Any], context_prompt: Union[str, PromptContext]) -> Dict[str, Any]:
+        """chat.completions request for one email, plus what _finish needs for the usage report"""
         # Build the system prompt with context
-        system_prompt = self.SYSTEM_PROMPT_TEMPLATE.format(
-            business_context=context_prompt.split("## Active Proposals")[0] if "## Active Proposals" in context_prompt else context_prompt[:2000],
-            active_proposals=self._extract_section(context_prompt, "## Active Proposals"),
-            learned_patterns=self._extract_section(context_prompt, "## Learned Email Patterns"),
-            multi_project_contacts=self._extract_section(context_prompt, "## Multi-Project Contacts"),
-        )
+        system_prompt, baseline_system_tokens = self._system_prompt(context_prompt)
 
         # Format email for user message
         user_message = self._format_email_message(email)
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+        email_tokens = len(user_message) // 4
+        candidate_count = None
+        if isinstance(context_prompt, PromptContext):
+            candidates = context_prompt.candidate_proposals(email, MAX_CANDIDATE_PROPOSALS)
+            candidate_count = len(candidates)
+            user_message = self._format_candidate_proposals(candidates, context_prompt) + user_message
+
+        return {
+            "request": {
+                "model": self.model,
+                "messages": [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_message},
                 ],
-                max_tokens=self.max_tokens,
-                temperature=0.1,  # Low temperature for consistent output
-                response_format={"type": "json_object"},
-            )
-
-            # Parse response
-            content = response.choices[0].message.content
-            analysis = json.loads(content)
-
-            # Calculate costs
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
-            cost = self._calculate_cost(input_tokens, output_tokens)
-
-            processing_time = int((time.time() - start_time) * 1000)
-
+                "max_tokens": self.max_tokens,
+                "temperature": 0.1,  # Low temperature for consistent output
+                "response_format": {"type": "json_object"},
+            },
+            "sent_estimate": (len(system_prompt) + len(user_message)) // 4,
+            "baseline_estimate": baseline_system_tokens + email_tokens,
+            "candidate_count": candidate_count,
+            "context_version": context_prompt.version if isinstance(context_prompt, PromptContext) else None,
+        }
+
+    def _finish(self, email: Dict[str, Any], prepared: Dict[str, Any], outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a dispatcher outcome into the analysis result"""
+        if not outcome.get("success"):
+            logger.error(f"GPT API call failed for email {email.get('email_id')}: {outcome.get('error')}")
             return {
-                "success": True,
-                "analysis": analysis,
-                "usage": {
-                    "input_tokens": input_tokens,
-                    "output_tokens": output_tokens,
-                    "estimated_cost_usd": cost,
-                    "processing_time_ms": processing_time,
-                    "model": self.model,
-                },
+                "success": False,
+                "error": outcome.get("error"),
                 "email_id": email.get("email_id"),
+                "job_id": outcome.get("job_id"),
             }
 
-        except json.JSONDecodeError as e:
+        try:
+            analysis = json.loads(outcome["content"])
+        except (TypeError, json.JSONDecodeError) as e:
             logger.error(f"Failed to parse GPT response as JSON: {e}")
+            self.dispatcher.cache.invalidate(prepared["request"])
             return {
                 "success": False,
                 "error": f"JSON parse error: {str(e)}",
                 "email_id": email.get("email_id"),
+                "job_id": outcome.get("job_id"),
             }
 
-        except Exception as e:
-            logger.error(f"GPT API call failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "email_id": email.get("email_id"),
-            }
+        # Calculate costs
+        usage = outcome["usage"]
+        input_tokens = usage.get("prompt_tokens") or 0
+        output_tokens = usage.get("completion_tokens") or 0
+        cached_tokens = usage.get("cached_tokens") or 0
+        cost = self._calculate_cost(input_tokens, output_tokens, cached_tokens, batch=bool(outcome.get("batch")))
+        saved = 0.0
+        if outcome.get("cache") == "hit":
+            # Answered from the response cache: nothing billed
+            cost, saved = 0.0, cost
+
+        # What the same request would have cost with every proposal in the prompt
+        baseline_tokens = round(input_tokens * prepared["baseline_estimate"] / max(prepared["sent_estimate"], 1))
+        baseline_cost = self._calculate_cost(baseline_tokens, output_tokens)
+
+        candidate_count = prepared["candidate_count"]
+        logger.info(
+            f"Email {email.get('email_id')}: {input_tokens} input tokens "
+            f"({cached_tokens} cached, {candidate_count if candidate_count is not None else 'all'} proposals) "
+            f"vs ~{baseline_tokens} with the full context | "
+            f"${cost:.5f} vs ${baseline_cost:.5f}"
+            + (" (stored response)" if outcome.get("resumed") else "")
+            + (" (response cache hit)" if outcome.get("cache") == "hit" else "")
+        )
+
+        return {
+            "success": True,
+            "analysis": analysis,
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cached_input_tokens": cached_tokens,
+                "estimated_cost_usd": cost,
+                "baseline_input_tokens": baseline_tokens,
+                "baseline_cost_usd": baseline_cost,
+                "candidate_proposals": candidate_count,
+                "context_version": prepared["context_version"],
+                "response_cache": outcome.get("cache"),
+                "response_cache_saved_usd": saved,
+                "processing_time_ms": outcome.get("elapsed_ms", 0),
+                "model": self.model,
+            },
+            "email_id": email.get("email_id"),
+            "job_id": outcome.get("job_id"),
+        }
+
+    def batch_requests(
+        self,
+        emails: List[Dict[str, Any]],
+        context_prompt: Union[str, PromptContext],
+    ) -> List[Tuple[Any, Dict[str, Any]]]:
+        """(email_id, request) pairs for LLMBatchService.submit - the requests analyze_batch would send"""
+        return [(email.get("email_id"), self._prepare(email, context_prompt)["request"]) for email in emails]
+
+    def result_from_outcome(
+        self,
+        email: Dict[str, Any],
+        context_prompt: Union[str, PromptContext],
+        outcome: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Analysis result for an outcome collected later (LLMBatchService.ready), as analyze_email returns it"""
+        return self._finish(email, self._prepare(email, context_prompt), outcome)
+
+    def analyze_email(
+        self,
+        email: Dict[str, Any],
+        context_prompt: Union[str, PromptContext],
+        use_cache: Optional[bool] = None,
+    ) -> Dict[str, Any]:
+        """
+        Analyze a single email with GPT.
+
+        Args:
+            email: Email data (subject, body, sender, date)
+            context_prompt: ContextBundler.get_prompt_context() (proposals are
+                            narrowed per email), or a pre-formatted context string
+                            from ContextBundler.format_for_prompt() (all proposals)
+            use_cache: Override the analyzer's use_cache for this call
+
+        Returns:
+            Dict with analysis results and usage stats (job_id: the llm_jobs row
+            to mark applied once the results are written)
+        """
+        return self.analyze_batch([email], context_prompt, use_cache=use_cache)[0]
 
     def analyze_batch(
         self,
         emails: List[Dict[str, Any]],
-        context_prompt: str,
+        context_prompt: Union[str, PromptContext],
         max_workers: int = 10,
+        use_cache: Optional[bool] = None,
     ) -> List[Dict[str, Any]]:
         """
-        Analyze multiple emails with shared context using parallel processing.
+        Analyze multiple emails with shared context through the LLM dispatcher.
+
+        Requests are rate limited (requests and tokens per minute), retried on
+        429/5xx, and recorded in llm_jobs, so an interrupted batch resumes
+        without paying again for responses that already arrived. An email
+        whose prompt is unchanged since an earlier run is answered from the
+        LLM response cache unless use_cache is False.
 
         Args:
             emails: List of email data dicts
-            context_prompt: Pre-formatted context from ContextBundler
-            max_workers: Max concurrent API calls (default 10, OpenAI allows 500 RPM)
+            context_prompt: Context from ContextBundler (see analyze_email)
+            max_workers: Max concurrent API calls (the dispatcher adapts below it)
+            use_cache: Override the analyzer's use_cache for this call
 
         Returns:
             List of analysis results in same order as input emails
         """
-        results = [None] * len(emails)  # Preserve order
-        total_cost = 0.0
-        total_input_tokens = 0
-        total_output_tokens = 0
-
-        def analyze_with_index(args):
-            idx, email = args
-            return idx, self.analyze_email(email, context_prompt)
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(analyze_with_index, (i, email)): i
-                for i, email in enumerate(emails)
-            }
-
-            for future in as_completed(futures):
-                try:
-                    idx, result = future.result()
-                    results[idx] = result
-
-                    if result.get("success") and result.get("usage"):
-                        total_cost += result["usage"].get("estimated_cost_usd", 0)
-                        total_input_tokens += result["usage"].get("input_tokens", 0)
-                        total_output_tokens += result["usage"].get("output_tokens", 0)
-                except Exception as e:
-                    idx = futures[future]
-                    logger.error(f"Failed to analyze email at index {idx}: {e}")
-                    results[idx] = {
-                        "success": False,
-                        "error": str(e),
-                    }
-
-        logger.info(
-            f"Batch analysis complete: {len(emails)} emails, "
-            f"${total_cost:.4f} cost, "
-            f"{total_input_tokens} input tokens, "
-            f"{total_output_tokens} output tokens"
+        prepared = [self._prepare(email, context_prompt) for email in emails]
+        outcomes = self.dispatcher.dispatch_sync(
+            self.job_kind,
+            [(email.get("email_id"), p["request"])
+             for email, p in zip(emails, prepared, strict=True)],
+            max_concurrency=max_workers,
+            cache=self.use_cache if use_cache is None else use_cache,
         )
+        results = [self._finish(email, p, outcome)
+                   for email, p, outcome in zip(emails, prepared, outcomes, strict=True)]
+
+        succeeded = [r["usage"] for r in results if r.get("success")]
+        if len(emails) > 1:
+            logger.info(
+                f"Batch analysis complete: {len(emails)} emails ({len(succeeded)} ok, "
+                f"{sum(1 for u in succeeded if u['response_cache'] == 'hit')} from cache), "
+                f"${sum(u['estimated_cost_usd'] for u in succeeded):.4f} cost, "
+                f"{sum(u['input_tokens'] for u in succeeded)} input tokens, "
+                f"{sum(u['output_tokens'] for u in succeeded)} output tokens"
+            )
 
         return results
 
@@ -826,12 +953,16 @@ Include commitments with:
             return context[start:]
         return context[start:next_section]
 
-    def _calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
-        """Calculate estimated cost based on token usage"""
+    def _calculate_cost(self, input_tokens: int, output_tokens: int, cached_input_tokens: int = 0,
+                        batch: bool = False) -> float:
+        """Calculate estimated cost based on token usage (batch: sent through the batch API)"""
         pricing = GPT_PRICING.get(self.model, GPT_PRICING["gpt-4o-mini"])
 
-        input_cost = (input_tokens / 1_000_000) * pricing["input_per_1m"]
+        input_cost = ((input_tokens - cached_input_tokens) / 1_000_000) * pricing["input_per_1m"]
+        input_cost += (cached_input_tokens / 1_000_000) * pricing.get("cached_input_per_1m", pricing["input_per_1m"])
         output_cost = (output_tokens / 1_000_000) * pricing["output_per_1m"]
+        if batch:
+            return round((input_cost + output_cost) * pricing.get("batch_multiplier", 1.0), 6)
 
         return round(input_cost + output_cost, 6)
 
@@ -863,17 +994,28 @@ class GPTUsageTracker:
         processing_time_ms: int,
         success: bool = True,
         error_message: str = None,
+        cached_input_tokens: int = None,
+        baseline_input_tokens: int = None,
+        baseline_cost: float = None,
+        context_version: str = None,
+        response_cache: str = None,
+        response_cache_saved: float = None,
     ):
-        """Log a GPT API request to the database"""
+        """
+        Log a GPT API request to the database.
+
+        cached_input_tokens / baseline_* / context_version need migration 113,
+        response_cache ('hit', 'miss', 'bypass') / response_cache_saved need
+        migration 115; without them they are not recorded.
+        """
         try:
             cursor = self.conn.cursor()
-            cursor.execute("""
-                INSERT INTO gpt_usage_log (
-                    request_type, model, input_tokens, output_tokens,
-                    estimated_cost_usd, email_ids, batch_size,
-                    processing_time_ms, success, error_message
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            columns = [
+                "request_type", "model", "input_tokens", "output_tokens",
+                "estimated_cost_usd", "email_ids", "batch_size",
+                "processing_time_ms", "success", "error_message",
+            ]
+            values = [
                 request_type,
                 model,
                 input_tokens,
@@ -884,7 +1026,18 @@ class GPTUsageTracker:
                 processing_time_ms,
                 1 if success else 0,
                 error_message,
-            ))
+            ]
+            existing = {row[1] for row in cursor.execute("PRAGMA table_info(gpt_usage_log)")}
+            if "baseline_input_tokens" in existing:
+                columns += ["cached_input_tokens", "baseline_input_tokens", "baseline_cost_usd", "context_version"]
+                values += [cached_input_tokens, baseline_input_tokens, baseline_cost, context_version]
+            if "response_cache" in existing:
+                columns += ["response_cache", "response_cache_saved_usd"]
+                values += [response_cache, response_cache_saved]
+            cursor.execute(
+                f"INSERT INTO gpt_usage_log ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                values,
+            )
             self.conn.commit()
         except Exception as e:
             logger.error(f"Failed to log GPT usage: {e}")
@@ -0,0 +1,412 @@
+"""
+IMAP Incremental Sync
+
+UID-based sync engine shared by scheduled_email_sync and EmailImporter.
+Instead of SEARCH ALL + a full RFC822 download of the last N messages on
+every run, it:
+
+1. Reads UIDVALIDITY and the last synced UID for (account, folder) from
+   email_sync_state (migration 106)
+2. Asks the server only for UIDs above that mark
+3. Fetches Message-ID headers for those UIDs in batched UID sets with
+   BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)] and drops messages already in emails
+4. Downloads full bodies (BODY.PEEK[] - never sets \\Seen) only for the rest,
+   either whole (fetch) or in BODY.PEEK[]<offset.size> windows (stream)
+5. Advances the mark to the highest UID below every message not yet
+   stored - callers report each message with mark_done() / mark_failed(),
+   so a message that fails to parse or insert is fetched again next run
+
+A UIDVALIDITY change means the server renumbered the mailbox: the mark is
+reset and message_id dedup keeps the resync from creating duplicates.
+
+Usage:
+    from backend.services.imap_sync import ImapUidSync
+
+    sync = ImapUidSync(imap_conn, db_conn, 'INBOX', account_email='lukas@bensley.com')
+    if sync.select():
+        for message in sync.fetch(sync.plan(limit=100)):
+            try:
+                ...  # parse message.raw, insert into emails
+                sync.mark_done(message.uid)
+            except Exception:
+                sync.mark_failed(message.uid)
+        sync.save_state()
+        db_conn.commit()
+
+    stream() is the same with the body delivered in bounded chunks:
+        for message, chunks in sync.stream(sync.plan(limit=100)):
+            parsed = parse_stream(chunks, ...)   # see mime_stream
+"""
+
+import os
+import re
+import time
+import logging
+from email.parser import BytesHeaderParser
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEADER_BATCH_SIZE = int(os.getenv('IMAP_HEADER_BATCH_SIZE', '250'))
+BODY_CHUNK_SIZE = int(os.getenv('IMAP_BODY_CHUNK_SIZE', str(1024 * 1024)))
+SQL_CHUNK_SIZE = 500
+
+_UID_RE = re.compile(rb'UID (\d+)')
+_UIDVALIDITY_RE = re.compile(rb'UIDVALIDITY (\d+)')
+
+
+class NewMessage(NamedTuple):
+    """A message not yet in the database, with its raw RFC822 bytes"""
+    uid: int
+    message_id: Optional[str]
+    raw: bytes
+
+
+def compress_uid_set(uids: List[int]) -> str:
+    """Render UIDs as an IMAP sequence set: [1, 2, 3, 7, 9, 10] -> '1:3,7,9:10'"""
+    parts = []
+    start = prev = None
+    for uid in sorted(uids):
+        if start is None:
+            start = prev = uid
+        elif uid == prev + 1:
+            prev = uid
+        else:
+            parts.append(f"{start}:{prev}" if prev != start else str(start))
+            start = prev = uid
+    if start is not None:
+        parts.append(f"{start}:{prev}" if prev != start else str(start))
+    return ','.join(parts)
+
+
+class ImapUidSync:
+    """Incremental fetch of one IMAP folder using a UID high-water mark"""
+
+    def __init__(self, imap_conn, db_conn, folder: str, account_email: str = '',
+                 header_batch_size: int = HEADER_BATCH_SIZE, body_delay: float = 0.0):
+        """
+        Args:
+            imap_conn: Logged-in imaplib.IMAP4 connection
+            db_conn: sqlite3 connection (state is written on it - caller commits)
+            folder: Folder name, e.g. 'INBOX'
+            account_email: Account the folder belongs to ('' for single-account imports)
+            header_batch_size: UIDs per header FETCH
+            body_delay: Seconds to wait after each body download (server courtesy)
+        """
+        self.imap = imap_conn
+        self.db = db_conn
+        self.folder = folder
+        self.account_email = account_email or ''
+        self.header_batch_size = header_batch_size
+        self.body_delay = body_delay
+
+        self.uidvalidity: Optional[int] = None
+        self.last_uid = 0
+        self._planned: List[int] = []
+        self._done: Set[int] = set()
+        self.failed: Set[int] = set()
+        self._synced_reported = 0
+
+        self.stats = {
+            'new_uids': 0,      # UIDs above the mark on the server
+            'known': 0,         # already imported (message_id match)
+            'pending': 0,       # bodies to download this run
+            'deferred': 0,      # left for the next run (limit)
+            'fetched': 0,
+            'stored': 0,        # reported with mark_done()
+            'expunged': 0,      # gone from the server before download
+            'errors': 0,
+            'resync': False,    # UIDVALIDITY changed / no state yet
+        }
+
+    # ------------------------------------------------------------------
+    # Mailbox + state
+    # ------------------------------------------------------------------
+
+    def _quoted_folder(self) -> str:
+        return self.folder if self.folder.startswith('"') else f'"{self.folder}"'
+
+    def select(self) -> bool:
+        """Select the folder read-only and load the stored sync state"""
+        status, _ = self.imap.select(self._quoted_folder(), readonly=True)
+        if status != 'OK':
+            logger.error(f"Failed to select folder: {self.folder}")
+            return False
+
+        self.uidvalidity = self._read_uidvalidity()
+        self._load_state()
+        return True
+
+    def _read_uidvalidity(self) -> Optional[int]:
+        _, data = self.imap.response('UIDVALIDITY')
+        if data and data[0]:
+            return int(data[0])
+
+        # Not sent with SELECT - ask explicitly
+        status, data = self.imap.status(self._quoted_folder(), '(UIDVALIDITY)')
+        if status == 'OK' and data and data[0]:
+            match = _UIDVALIDITY_RE.search(data[0])
+            if match:
+                return int(match.group(1))
+        return None
+
+    def _load_state(self):
+        row = self.db.execute("""
+            SELECT uidvalidity, last_uid FROM email_sync_state
+            WHERE account_email = ? AND folder = ?
+        """, (self.account_email, self.folder)).fetchone()
+
+        if row and self.uidvalidity is not None and row[0] == self.uidvalidity:
+            self.last_uid = row[1]
+        else:
+            if row:
+                logger.warning(
+                    f"UIDVALIDITY changed for {self.account_email}:{self.folder} "
+                    f"({row[0]} -> {self.uidvalidity}) - resyncing"
+                )
+            self.last_uid = 0
+            self.stats['resync'] = True
+
+    def mark_done(self, uid: int):
+        """Record that a fetched message has been stored - the mark may pass it"""
+        if uid not in self._done:
+            self._done.add(uid)
+            self.stats['stored'] += 1
+
+    def mark_failed(self, uid: int):
+        """Record that storing a fetched message failed - the mark stays below it"""
+        self.failed.add(uid)
+        self.stats['errors'] += 1
+
+    def high_water_mark(self) -> int:
+        """
+        Highest UID such that every planned UID up to it has been handled
+
+        Stops below the first UID not reported with mark_done() (or skipped
+        as known), so failed and unreported messages are retried next run.
+        """
+        mark = self.last_uid
+        for uid in self._planned:
+            if uid not in self._done:
+                break
+            mark = uid
+        return mark
+
+    STATE_UPSERT_SQL = """
+        INSERT INTO email_sync_state
+            (account_email, folder, uidvalidity, last_uid, messages_synced, last_synced_at)
+        VALUES (?, ?, ?, ?, ?, datetime('now'))
+        ON CONFLICT(account_email, folder) DO UPDATE SET
+            uidvalidity = excluded.uidvalidity,
+            last_uid = excluded.last_uid,
+            messages_synced = email_sync_state.messages_synced + excluded.messages_synced,
+            last_synced_at = excluded.last_synced_at
+    """
+
+    def state_params(self) -> Optional[tuple]:
+        """
+        Parameters for STATE_UPSERT_SQL at the current high-water mark
+
+        For callers that write through their own connection (the sync
+        scheduler's writer queue). Returns None if UIDVALIDITY is unknown.
+        """
+        if self.uidvalidity is None:
+            return None
+        self.last_uid = self.high_water_mark()
+        synced, self._synced_reported = self.stats['stored'] - self._synced_reported, self.stats['stored']
+        return (self.account_email, self.folder, self.uidvalidity, self.last_uid, synced)
+
+    def save_state(self) -> int:
+        """
+        Persist UIDVALIDITY and the new high-water mark (no commit)
+
+        Returns:
+            The stored last UID
+        """
+        params = self.state_params()
+        if params:
+            self.db.execute(self.STATE_UPSERT_SQL, params)
+        return self.last_uid
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def _search_new_uids(self) -> List[int]:
+        status, data = self.imap.uid('SEARCH', None, f'UID {self.last_uid + 1}:*')
+        if status != 'OK' or not data or not data[0]:
+            return []
+        # "n:*" always matches the highest UID, even if it is below n
+        return sorted(uid for uid in map(int, data[0].split()) if uid > self.last_uid)
+
+    def _fetch_message_ids(self, uids: List[int]) -> Dict[int, Optional[str]]:
+        """Message-ID header for each UID, fetched in batches"""
+        parser = BytesHeaderParser()
+        message_ids: Dict[int, Optional[str]] = {}
+
+        for i in range(0, len(uids), self.header_batch_size):
+            batch = uids[i:i + self.header_batch_size]
+            status, data = self.imap.uid(
+                'FETCH', compress_uid_set(batch), '(UID BODY.PEEK[HEADER.FIELDS (MESSAGE-ID)])'
+            )
+            if status != 'OK':
+                logger.warning(f"Header fetch failed for {len(batch)} UIDs in {self.folder}")
+                continue
+
+            for j, item in enumerate(data or []):
+                if not isinstance(item, tuple):
+                    continue
+                match = _UID_RE.search(item[0])
+                # Some servers send UID after the literal: b' UID 123)'
+                if not match and j + 1 < len(data) and isinstance(data[j + 1], bytes):
+                    match = _UID_RE.search(data[j + 1])
+                if not match:
+                    continue
+                headers = parser.parsebytes(item[1] or b'')
+                message_ids[int(match.group(1))] = headers.get('Message-ID')
+
+        return message_ids
+
+    def _known_message_ids(self, message_ids: List[str]) -> Set[str]:
+        known = set()
+        for i in range(0, len(message_ids), SQL_CHUNK_SIZE):
+            chunk = message_ids[i:i + SQL_CHUNK_SIZE]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self.db.execute(
+                f"SELECT message_id FROM emails WHERE message_id IN ({placeholders})", chunk
+            ).fetchall()
+            known.update(row[0] for row in rows)
+        return known
+
+    def plan(self, limit: Optional[int] = None) -> List[NewMessage]:
+        """
+        Work out which messages need downloading
+
+        Args:
+            limit: Max bodies to download this run. With a stored mark the
+                   oldest new messages go first and the rest are picked up
+                   next run; on a first sync only the most recent `limit`
+                   UIDs are considered (as the old SEARCH ALL path did).
+
+        Returns:
+            NewMessage stubs (raw empty) for fetch(), oldest first
+        """
+        uids = self._search_new_uids()
+        self.stats['new_uids'] = len(uids)
+
+        if limit and self.stats['resync'] and len(uids) > limit:
+            uids = uids[-limit:]
+
+        message_ids = self._fetch_message_ids(uids)
+        known = self._known_message_ids([mid for mid in message_ids.values() if mid])
+
+        pending = []
+        for uid in uids:
+            message_id = message_ids.get(uid)
+            if message_id and message_id in known:
+                self.stats['known'] += 1
+                self._done.add(uid)
+            else:
+                pending.append(NewMessage(uid, message_id, b''))
+
+        if limit and len(pending) > limit:
+            self.stats['deferred'] = len(pending) - limit
+            cutoff = pending[limit].uid
+            pending = pending[:limit]
+            uids = [uid for uid in uids if uid < cutoff]
+
+        self._planned = uids
+        self.stats['pending'] = len(pending)
+        return pending
+
+    # ------------------------------------------------------------------
+    # Download
+    # ------------------------------------------------------------------
+
+    def fetch(self, pending: List[NewMessage]) -> Iterator[NewMessage]:
+        """
+        Download full messages one at a time
+
+        A UID counts as handled only once the caller reports it with
+        mark_done(); a message the caller fails to store (mark_failed(), or
+        never reported) keeps the mark below it and is fetched next run.
+        A NO/BAD answer or a dropped connection fails the UID the same way;
+        only an OK answer without a body (message expunged since plan())
+        counts as handled.
+        """
+        for stub in pending:
+            try:
+                status, data = self.imap.uid('FETCH', str(stub.uid), '(BODY.PEEK[])')
+            except Exception as e:
+                logger.error(f"Body fetch failed for UID {stub.uid} in {self.folder}: {e}")
+                self.mark_failed(stub.uid)
+                return
+
+            if status != 'OK':
+                logger.warning(f"Body fetch for UID {stub.uid} in {self.folder} answered {status}")
+                self.mark_failed(stub.uid)
+                continue
+
+            raw = next((item[1] for item in data or [] if isinstance(item, tuple)), None)
+            if raw is None:
+                self.stats['expunged'] += 1
+                self._done.add(stub.uid)
+                continue
+
+            self.stats['fetched'] += 1
+            yield NewMessage(stub.uid, stub.message_id, raw)
+
+            if self.body_delay:
+                time.sleep(self.body_delay)
+
+    def _fetch_window(self, uid: int, offset: int, size: int) -> Optional[bytes]:
+        status, data = self.imap.uid('FETCH', str(uid), f'(BODY.PEEK[]<{offset}.{size}>)')
+        if status != 'OK':
+            return None
+        # Past the end some servers send an empty quoted string, not a literal
+        return next((item[1] for item in data or [] if isinstance(item, tuple)), b'')
+
+    def _window_chunks(self, uid: int, first: bytes, size: int) -> Iterator[bytes]:
+        chunk, offset = first, 0
+        while chunk:
+            yield chunk
+            if len(chunk) < size:
+                return
+            offset += len(chunk)
+            chunk = self._fetch_window(uid, offset, size)
+            if chunk is None:
+                raise IOError(f"Body fetch failed for UID {uid} in {self.folder} at byte {offset}")
+
+    def stream(self, pending: List[NewMessage],
+               chunk_size: int = BODY_CHUNK_SIZE) -> Iterator[Tuple[NewMessage, Iterator[bytes]]]:
+        """
+        Download messages as partial fetches of at most chunk_size bytes
+
+        Like fetch(), but yields (stub, chunks) so a streaming parser can
+        consume a message without it ever being held whole in memory. The
+        chunk iterator must be drained before asking for the next message;
+        it raises IOError if the server fails part-way through. Callers
+        report each message with mark_done() / mark_failed() as for fetch().
+        """
+        for stub in pending:
+            try:
+                first = self._fetch_window(stub.uid, 0, chunk_size)
+            except Exception as e:
+                logger.error(f"Body fetch failed for UID {stub.uid} in {self.folder}: {e}")
+                self.mark_failed(stub.uid)
+                return
+
+            if first is None:
+                logger.warning(f"Body fetch for UID {stub.uid} in {self.folder} was refused")
+                self.mark_failed(stub.uid)
+                continue
+            if not first:
+                self.stats['expunged'] += 1
+                self._done.add(stub.uid)
+                continue
+
+            self.stats['fetched'] += 1
+            yield stub, self._window_chunks(stub.uid, first, chunk_size)
+
+            if self.body_delay:
+                time.sleep(self.body_delay)
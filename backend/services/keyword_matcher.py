@@ -0,0 +1,318 @@
+"""
+Keyword Matcher
+
+Aho-Corasick automaton for matching thousands of keywords against email
+text in one pass. Replaces the per-keyword loops in PatternFirstLinker
+(`keyword in text` for every learned pattern) and SmartEmailBrain
+(`re.search(rf'\\b{kw}\\b')` for every index term), which cost
+O(patterns x emails).
+
+- Keywords are case-insensitive and may carry any number of payloads
+  (e.g. one keyword pointing at several proposals with different weights)
+- Optional word-boundary matching with the same semantics as regex `\\b`
+- add()/remove()/sync() update the trie in place. Adding a keyword marks
+  the failure links stale, and the next search recomputes them in one
+  pass over the whole trie. Removing one only clears its output marker,
+  which leaves the links valid. Payload-only changes don't touch the
+  automaton at all.
+
+Usage:
+    from services.keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher(word_boundary=True)
+    matcher.add("mandarin", {"proposal_id": 12}, weight=3)
+    matcher.add("bali", {"proposal_id": 40}, weight=1)
+
+    matcher.find_all("Mandarin Oriental Bali - fee")   # every hit with position
+    matcher.match("Mandarin Oriental Bali - fee")      # {keyword: [hits]}, one entry per keyword
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    """Same definition as regex \\w (str patterns)"""
+    return ch.isalnum() or ch == '_'
+
+
+class KeywordHit(NamedTuple):
+    """One keyword occurrence in the searched text"""
+    keyword: str
+    start: int
+    end: int
+    payload: Any
+    weight: float
+
+
+class KeywordMatcher:
+    """Multi-keyword matcher built on an Aho-Corasick automaton"""
+
+    def __init__(self, word_boundary: bool = False):
+        """
+        Args:
+            word_boundary: Only report keywords that start and end on a word
+                boundary (regex `\\b` semantics). Off = plain substring match.
+        """
+        self.word_boundary = word_boundary
+
+        # Trie - node 0 is the root
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[str]] = [None]   # keyword ending at node
+        self._dict_link: List[int] = [0]             # next node (via fail) with output
+
+        # keyword -> [(payload, weight), ...]
+        self._payloads: Dict[str, List[Tuple[Any, float]]] = {}
+        # keyword -> insertion sequence, for stable result ordering
+        self._sequence: Dict[str, int] = {}
+        self._next_sequence = 0
+        self._alphabet: set = set()
+
+        self._links_dirty = False
+        self.rebuild_count = 0
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def __contains__(self, keyword: str) -> bool:
+        return self._normalize(keyword) in self._payloads
+
+    @staticmethod
+    def _normalize(keyword: str) -> str:
+        return (keyword or '').strip().lower()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def add(self, keyword: str, payload: Any = None, weight: float = 1.0) -> bool:
+        """
+        Add a keyword (or another payload for an existing keyword)
+
+        Returns:
+            False if the keyword is empty after normalization
+        """
+        keyword = self._normalize(keyword)
+        if not keyword:
+            return False
+
+        if keyword in self._payloads:
+            self._payloads[keyword].append((payload, weight))
+            return True
+
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+                self._goto[node][ch] = nxt
+                self._alphabet.add(ch)
+            node = nxt
+
+        self._output[node] = keyword
+        self._payloads[keyword] = [(payload, weight)]
+        self._sequence[keyword] = self._next_sequence
+        self._next_sequence += 1
+        self._links_dirty = True
+        return True
+
+    def remove(self, keyword: str) -> bool:
+        """
+        Remove a keyword and all of its payloads
+
+        The trie nodes stay in place (they may be shared with other
+        keywords); only the output marker is cleared. Dictionary links
+        through the cleared node stay valid (the scan skips it), so no
+        relink is needed.
+
+        Returns:
+            True if the keyword was present
+        """
+        keyword = self._normalize(keyword)
+        if keyword not in self._payloads:
+            return False
+
+        node = 0
+        for ch in keyword:
+            node = self._goto[node][ch]
+        self._output[node] = None
+
+        del self._payloads[keyword]
+        del self._sequence[keyword]
+        return True
+
+    def sync(self, keywords: Dict[str, List[Tuple[Any, float]]]) -> Dict[str, int]:
+        """
+        Bring the matcher in line with a full keyword -> payloads mapping
+
+        Only the difference is applied: vanished keywords are removed, new
+        ones inserted, and existing keywords just get their payloads swapped.
+
+        Args:
+            keywords: {keyword: [(payload, weight), ...]}
+
+        Returns:
+            Counts of added, removed and updated keywords
+        """
+        wanted = {}
+        for keyword, payloads in keywords.items():
+            key = self._normalize(keyword)
+            if key:
+                wanted.setdefault(key, []).extend(payloads)
+
+        removed = [k for k in self._payloads if k not in wanted]
+        for keyword in removed:
+            self.remove(keyword)
+
+        added = updated = 0
+        for keyword, payloads in wanted.items():
+            if keyword in self._payloads:
+                if self._payloads[keyword] != payloads:
+                    self._payloads[keyword] = list(payloads)
+                    updated += 1
+            elif payloads:
+                payload, weight = payloads[0]
+                self.add(keyword, payload, weight)
+                self._payloads[keyword].extend(payloads[1:])
+                added += 1
+
+        return {"added": added, "removed": len(removed), "updated": updated}
+
+    def _build_links(self):
+        """Recompute failure and dictionary links (breadth-first over the trie)"""
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+
+        queue = []
+        for child in goto[0].values():
+            fail[child] = 0
+            dict_link[child] = 0
+            queue.append(child)
+
+        i = 0
+        while i < len(queue):
+            node = queue[i]
+            i += 1
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                dict_link[child] = fail[child] if output[fail[child]] else dict_link[fail[child]]
+                queue.append(child)
+
+        self._links_dirty = False
+        self.rebuild_count += 1
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+
+    def _at_boundary(self, text: str, start: int, end: int) -> bool:
+        """Regex `\\b` on both sides of text[start:end]"""
+        before = start > 0 and _is_word_char(text[start - 1])
+        if before == _is_word_char(text[start]):
+            return False
+        after = end < len(text) and _is_word_char(text[end])
+        return after != _is_word_char(text[end - 1])
+
+    def _scan(self, text: str) -> Iterable[Tuple[str, int, int]]:
+        """Yield (keyword, start, end) for every occurrence in lowercased text"""
+        if self._links_dirty:
+            self._build_links()
+
+        goto, fail, output, dict_link = self._goto, self._fail, self._output, self._dict_link
+        alphabet = self._alphabet
+        check_boundary = self.word_boundary
+
+        state = 0
+        for pos, ch in enumerate(text):
+            if ch not in alphabet:
+                state = 0
+                continue
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+
+            node = state if output[state] else dict_link[state]
+            while node:
+                keyword = output[node]
+                if keyword:  # None once removed
+                    end = pos + 1
+                    start = end - len(keyword)
+                    if not check_boundary or self._at_boundary(text, start, end):
+                        yield keyword, start, end
+                node = dict_link[node]
+
+    def find_all(self, text: str) -> List[KeywordHit]:
+        """
+        Every keyword occurrence in the text, one hit per payload
+
+        Returns:
+            Hits ordered by end position
+        """
+        if not text or not self._payloads:
+            return []
+
+        hits = []
+        for keyword, start, end in self._scan(text.lower()):
+            for payload, weight in self._payloads[keyword]:
+                hits.append(KeywordHit(keyword, start, end, payload, weight))
+        return hits
+
+    def match(self, text: str) -> Dict[str, List[KeywordHit]]:
+        """
+        Keywords present in the text, each reported once (first occurrence)
+
+        Ordered by the order keywords were added, so callers that used to
+        loop over their keyword dict see matches in the same order.
+
+        Returns:
+            {keyword: [hit per payload]}
+        """
+        if not text or not self._payloads:
+            return {}
+
+        first_seen: Dict[str, Tuple[int, int]] = {}
+        for keyword, start, end in self._scan(text.lower()):
+            if keyword not in first_seen:
+                first_seen[keyword] = (start, end)
+
+        result = {}
+        for keyword in sorted(first_seen, key=self._sequence.__getitem__):
+            start, end = first_seen[keyword]
+            result[keyword] = [
+                KeywordHit(keyword, start, end, payload, weight)
+                for payload, weight in self._payloads[keyword]
+            ]
+        return result
+
+    def score(self, text: str, key: str) -> Dict[Any, float]:
+        """
+        Sum hit weights per payload[key] (each keyword counted once)
+
+        Args:
+            text: Text to search
+            key: Payload field to group by (e.g. 'proposal_id')
+
+        Returns:
+            {payload[key]: total weight}
+        """
+        scores: Dict[Any, float] = {}
+        for hits in self.match(text).values():
+            for hit in hits:
+                target = hit.payload[key]
+                scores[target] = scores.get(target, 0) + hit.weight
+        return scores
+
+    def stats(self) -> Dict[str, int]:
+        """Size of the automaton"""
+        return {
+            "keywords": len(self._payloads),
+            "nodes": len(self._goto),
+            "rebuilds": self.rebuild_count,
+        }
@@ -0,0 +1,498 @@
+"""
+KPI Snapshot Service - precomputed dashboard aggregates (migration 110)
+
+Dashboards used to rebuild the same invoice/project/proposal aggregates on
+every request. This service keeps them in summary tables:
+
+- kpi_project_snapshot: per project code - contract value, paid,
+  outstanding, overdue buckets, aging buckets, days-to-payment sums
+- kpi_global_snapshot: proposal pipeline and PM counters (JSON payloads)
+
+Triggers on invoices/projects/proposals/project_milestones/rfis record
+what changed in kpi_dirty; refresh() recomputes only those rows. The
+date-relative columns (overdue, aging, "this week") move with the calendar,
+so the first refresh on a new day rebuilds everything.
+
+Readers call ensure_fresh() first. It refreshes at most every
+KPI_REFRESH_INTERVAL_SECONDS per process and never waits for a refresh
+another thread is running - the snapshot is served as is and every
+response carries its staleness (refreshed_at, pending_changes).
+
+Usage:
+    kpis = get_kpi_snapshot_service(db_path)
+    if kpis.ensure_fresh():
+        stats = kpis.get_role_stats('finance')
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL_SECONDS = float(os.getenv('KPI_REFRESH_INTERVAL_SECONDS', '30'))
+
+ROLES = ('executive', 'pm', 'finance')
+
+# Same definitions the dashboard queries used
+PIPELINE_EXCLUDED_STATUSES = ('Lost', 'Declined', 'Dormant', 'Contract Signed', 'Contract signed', 'Cancelled')
+OPEN_PROPOSAL_EXCLUDED = ('Contract Signed', 'Lost', 'Declined')
+INACTIVE_PROJECT_STATUSES = ('Completed', 'completed', 'Cancelled', 'cancelled', 'lost', 'declined', 'archived')
+LOST_PROJECT_STATUSES = ('lost', 'declined', 'cancelled', 'Cancelled')
+
+AGING_BUCKETS = [
+    ('Current', 'aging_current'),
+    ('1-30 days', 'aging_1_30'),
+    ('31-60 days', 'aging_31_60'),
+    ('61-90 days', 'aging_61_90'),
+    ('90+ days', 'aging_90_plus'),
+]
+
+# Invoice aggregates per project code. {codes} is the set of codes to
+# (re)compute; :today is the as-of date.
+_PROJECT_ROWS_SQL = """
+    WITH codes(code) AS ({codes}),
+    inv AS (
+        SELECT COALESCE(project_code, '') AS code, invoice_number, invoice_date, due_date,
+               payment_date, payment_amount, status,
+               invoice_amount - COALESCE(payment_amount, 0) AS balance,
+               julianday(:today) - julianday(due_date) AS days_overdue
+        FROM invoices
+        WHERE COALESCE(project_code, '') IN (SELECT code FROM codes)
+    ),
+    agg AS (
+        SELECT code,
+            COUNT(*) AS invoice_count,
+            COALESCE(SUM(payment_amount), 0) AS paid_total,
+            COALESCE(SUM(CASE WHEN balance > 0 THEN balance END), 0) AS outstanding_total,
+            COALESCE(SUM(CASE WHEN balance > 0 AND invoice_date <= date(:today, '-30 days')
+                              THEN balance END), 0) AS outstanding_30d_ago,
+            COUNT(CASE WHEN balance > 0 AND due_date < :today THEN 1 END) AS overdue_count,
+            COALESCE(SUM(CASE WHEN balance > 0 AND due_date < :today THEN balance END), 0) AS overdue_amount,
+            COALESCE(SUM(CASE WHEN balance > 0 AND due_date < date(:today, '-30 days')
+                              THEN balance END), 0) AS overdue_30_amount,
+            COALESCE(SUM(CASE WHEN balance > 0 AND due_date < date(:today, '-60 days')
+                              THEN balance END), 0) AS overdue_60_amount,
+            COALESCE(SUM(CASE WHEN balance > 0 AND due_date < date(:today, '-90 days')
+                              THEN balance END), 0) AS overdue_90_amount,
+            COALESCE(SUM(CASE WHEN payment_date >= date(:today, '-7 days') AND payment_date <= :today
+                              THEN payment_amount END), 0) AS recent_payments_7d,
+            COALESCE(SUM(CASE WHEN payment_date IS NOT NULL AND invoice_date IS NOT NULL
+                                   AND payment_date >= invoice_date
+                              THEN julianday(payment_date) - julianday(invoice_date) END), 0) AS payment_days_sum,
+            COUNT(CASE WHEN payment_date IS NOT NULL AND invoice_date IS NOT NULL
+                            AND payment_date >= invoice_date
+                       THEN julianday(payment_date) - julianday(invoice_date) END) AS payment_days_count,
+            COALESCE(MAX(CASE WHEN balance > 0 THEN balance END), 0) AS largest_outstanding,
+            {aging}
+        FROM inv
+        GROUP BY code
+    )
+    SELECT c.code AS project_code,
+           p.project_code IS NOT NULL AS has_project,
+           COALESCE(p.is_active_project, 0) AS is_active_project,
+           p.status,
+           COALESCE(p.total_fee_usd, 0) AS total_fee_usd,
+           p.contract_signed_date,
+           agg.*,
+           (SELECT invoice_number FROM inv
+            WHERE inv.code = c.code AND inv.balance > 0
+            ORDER BY inv.balance DESC LIMIT 1) AS largest_outstanding_invoice
+    FROM codes c
+    LEFT JOIN projects p ON p.project_code = c.code
+    LEFT JOIN agg ON agg.code = c.code
+    WHERE p.project_code IS NOT NULL OR agg.code IS NOT NULL
+"""
+
+# FinancialService.get_invoice_aging_summary buckets (invoices not marked paid)
+_AGING_BUCKET_SQL = """CASE
+            WHEN due_date IS NULL OR due_date >= :today THEN 'aging_current'
+            WHEN days_overdue <= 30 THEN 'aging_1_30'
+            WHEN days_overdue <= 60 THEN 'aging_31_60'
+            WHEN days_overdue <= 90 THEN 'aging_61_90'
+            ELSE 'aging_90_plus'
+        END"""
+
+_ALL_CODES_SQL = """
+    SELECT project_code FROM projects WHERE project_code IS NOT NULL
+    UNION
+    SELECT COALESCE(project_code, '') FROM invoices
+"""
+
+_SNAPSHOT_COLUMNS = [
+    'project_code', 'has_project', 'is_active_project', 'status', 'total_fee_usd',
+    'contract_signed_date', 'invoice_count', 'paid_total', 'outstanding_total',
+    'outstanding_30d_ago', 'overdue_count', 'overdue_amount', 'overdue_30_amount',
+    'overdue_60_amount', 'overdue_90_amount', 'recent_payments_7d', 'payment_days_sum',
+    'payment_days_count', 'largest_outstanding', 'largest_outstanding_invoice',
+] + [f"{prefix}_{kind}" for _, prefix in AGING_BUCKETS for kind in ('count', 'amount')]
+_NULLABLE_COLUMNS = {'status', 'contract_signed_date', 'largest_outstanding_invoice'}
+
+
+def _aging_columns() -> str:
+    columns = []
+    for _, prefix in AGING_BUCKETS:
+        matches = f"status != 'paid' AND {_AGING_BUCKET_SQL} = '{prefix}'"
+        columns.append(f"COUNT(CASE WHEN {matches} THEN 1 END) AS {prefix}_count")
+        columns.append(f"COALESCE(SUM(CASE WHEN {matches} THEN balance END), 0) AS {prefix}_amount")
+    return ',\n            '.join(columns)
+
+
+def _placeholders(values) -> str:
+    return ', '.join('?' for _ in values)
+
+
+class KpiSnapshotService(BaseService):
+    """Maintains and serves the KPI snapshot tables"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__(db_path)
+        self._refresh_lock = threading.Lock()
+        self._last_check = 0.0
+        self._available: Optional[bool] = None
+
+    def available(self) -> bool:
+        """True once migration 110 is applied"""
+        if not self._available:
+            self._available = self.table_exists('kpi_dirty')
+        return self._available
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def ensure_fresh(self) -> bool:
+        """
+        Bring the snapshot up to date if it is due, without blocking readers.
+
+        Returns:
+            False if the snapshot tables don't exist (callers fall back to
+            live queries), True otherwise
+        """
+        if not self.available():
+            return False
+
+        now = time.monotonic()
+        if now - self._last_check < REFRESH_INTERVAL_SECONDS:
+            return True
+        if not self._refresh_lock.acquire(blocking=False):
+            return True  # another request is refreshing - serve what we have
+        try:
+            self._last_check = now
+            self._refresh_locked(full=False)
+        except Exception as e:
+            # A failed refresh leaves the previous snapshot in place
+            logger.error(f"KPI snapshot refresh failed: {e}")
+        finally:
+            self._refresh_lock.release()
+        return True
+
+    def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Recompute dirty snapshot rows (or everything).
+
+        A full rebuild also happens automatically when the snapshot was
+        computed for an earlier date.
+
+        Returns:
+            {'mode': 'full'|'incremental'|'noop', 'projects': n, 'groups': [...], 'duration_ms': ms}
+        """
+        with self._refresh_lock:
+            self._last_check = time.monotonic()
+            return self._refresh_locked(full=full)
+
+    def _refresh_locked(self, full: bool) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with self.get_write_connection() as conn:
+            today = conn.execute("SELECT date('now')").fetchone()[0]
+            meta = conn.execute(
+                "SELECT as_of_date FROM kpi_global_snapshot WHERE metric = 'refresh'"
+            ).fetchone()
+            if meta is None or meta['as_of_date'] != today:
+                full = True
+
+            if full:
+                mode = 'full'
+                conn.execute("DELETE FROM kpi_project_snapshot")
+                projects = self._write_project_rows(conn, _ALL_CODES_SQL, {}, today)
+                groups = ['proposals', 'pm']
+            else:
+                dirty = conn.execute("SELECT scope, key FROM kpi_dirty").fetchall()
+                if not dirty:
+                    return {'mode': 'noop', 'projects': 0, 'groups': [], 'duration_ms': 0.0}
+                mode = 'incremental'
+                codes = sorted({row['key'] for row in dirty if row['scope'] == 'project'})
+                groups = sorted({row['scope'] for row in dirty if row['scope'] != 'project'})
+                projects = 0
+                if codes:
+                    conn.execute(f"DELETE FROM kpi_project_snapshot WHERE project_code IN ({_placeholders(codes)})",
+                                 codes)
+                    params = {f'c{i}': code for i, code in enumerate(codes)}
+                    projects = self._write_project_rows(
+                        conn, f"VALUES {', '.join(f'(:{name})' for name in params)}", params, today)
+
+            if 'proposals' in groups:
+                self._write_group(conn, 'proposals', self._compute_proposals(conn, today), today)
+            if 'pm' in groups:
+                self._write_group(conn, 'pm', self._compute_pm(conn, today), today)
+
+            # Everything recorded so far is now reflected (we hold the write lock)
+            conn.execute("DELETE FROM kpi_dirty")
+
+            duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            result = {'mode': mode, 'projects': projects, 'groups': groups, 'duration_ms': duration_ms}
+            self._write_group(conn, 'refresh', result, today)
+
+        logger.info(f"KPI snapshot {mode} refresh: {projects} projects, groups={groups}, {duration_ms}ms")
+        return result
+
+    def _write_project_rows(self, conn, codes_sql: str, params: Dict[str, Any], today: str) -> int:
+        sql = _PROJECT_ROWS_SQL.format(codes=codes_sql, aging=_aging_columns())
+        rows = conn.execute(sql, {**params, 'today': today}).fetchall()
+
+        columns = _SNAPSHOT_COLUMNS + ['as_of_date']
+        conn.executemany(
+            f"INSERT OR REPLACE INTO kpi_project_snapshot ({', '.join(columns)}) "
+            f"VALUES ({_placeholders(columns)})",
+            [tuple(row[c] if row[c] is not None or c in _NULLABLE_COLUMNS else 0
+                   for c in _SNAPSHOT_COLUMNS) + (today,)
+             for row in rows]
+        )
+        return len(rows)
+
+    def _write_group(self, conn, metric: str, payload: Dict[str, Any], today: str):
+        conn.execute("""
+            INSERT OR REPLACE INTO kpi_global_snapshot (metric, payload, as_of_date, refreshed_at)
+            VALUES (?, ?, ?, datetime('now'))
+        """, (metric, json.dumps(payload), today))
+
+    def _compute_proposals(self, conn, today: str) -> Dict[str, Any]:
+        if not self._has_table(conn, 'proposals'):
+            return {}
+        pipeline = conn.execute(f"""
+            SELECT COUNT(*) AS count, COALESCE(SUM(project_value), 0) AS value
+            FROM proposals
+            WHERE current_status NOT IN ({_placeholders(PIPELINE_EXCLUDED_STATUSES)})
+            AND project_value > 0
+        """, PIPELINE_EXCLUDED_STATUSES).fetchone()
+
+        # WeeklyReportService definitions (status column, open proposals)
+        excluded = _placeholders(OPEN_PROPOSAL_EXCLUDED)
+        open_pipeline = conn.execute(f"""
+            SELECT COUNT(*) AS count,
+                   COALESCE(SUM(project_value), 0) AS value,
+                   COALESCE(SUM(project_value * COALESCE(win_probability, 50) / 100), 0) AS weighted
+            FROM proposals
+            WHERE status NOT IN ({excluded})
+        """, OPEN_PROPOSAL_EXCLUDED).fetchone()
+        open_statuses = OPEN_PROPOSAL_EXCLUDED + ('On Hold',)
+        overdue = conn.execute(f"""
+            SELECT COUNT(*) FROM proposals
+            WHERE action_due < ? AND status NOT IN ({_placeholders(open_statuses)})
+        """, (today,) + open_statuses).fetchone()[0]
+        our_move = conn.execute(f"""
+            SELECT COUNT(*) FROM proposals
+            WHERE ball_in_court = 'us' AND status NOT IN ({_placeholders(open_statuses)})
+        """, open_statuses).fetchone()[0]
+
+        return {
+            'pipeline_value': pipeline['value'],
+            'pipeline_count': pipeline['count'],
+            'open_pipeline_count': open_pipeline['count'],
+            'open_pipeline_value': open_pipeline['value'],
+            'open_pipeline_weighted': open_pipeline['weighted'],
+            'overdue_action_count': overdue,
+            'our_move_count': our_move,
+        }
+
+    def _compute_pm(self, conn, today: str) -> Dict[str, Any]:
+        result = {'deliverables_due_this_week': 0, 'open_rfis_count': 0}
+        if self._has_table(conn, 'project_milestones'):
+            result['deliverables_due_this_week'] = conn.execute("""
+                SELECT COUNT(*) FROM project_milestones
+                WHERE status NOT IN ('completed', 'cancelled')
+                AND planned_date >= ? AND planned_date <= date(?, '+7 days')
+            """, (today, today)).fetchone()[0]
+        if self._has_table(conn, 'rfis'):
+            result['open_rfis_count'] = conn.execute(
+                "SELECT COUNT(*) FROM rfis WHERE status = 'open'"
+            ).fetchone()[0]
+        return result
+
+    @staticmethod
+    def _has_table(conn, name: str) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def staleness(self) -> Dict[str, Any]:
+        """When the snapshot was last refreshed and how many changes are pending"""
+        meta = self.execute_query(
+            "SELECT as_of_date, refreshed_at FROM kpi_global_snapshot WHERE metric = 'refresh'",
+            fetch_one=True
+        )
+        pending = self.execute_query(
+            "SELECT COUNT(*) AS n, MIN(changed_at) AS oldest FROM kpi_dirty", fetch_one=True
+        )
+        age = None
+        if meta:
+            refreshed = datetime.strptime(meta['refreshed_at'], '%Y-%m-%d %H:%M:%S')
+            age = round((datetime.utcnow() - refreshed).total_seconds(), 1)
+        return {
+            'source': 'snapshot',
+            'as_of_date': meta['as_of_date'] if meta else None,
+            'refreshed_at': meta['refreshed_at'] if meta else None,
+            'age_seconds': age,
+            'pending_changes': pending['n'],
+            'oldest_pending_change': pending['oldest'],
+        }
+
+    def _group(self, metric: str) -> Dict[str, Any]:
+        row = self.execute_query(
+            "SELECT payload FROM kpi_global_snapshot WHERE metric = ?", (metric,), fetch_one=True
+        )
+        return json.loads(row['payload']) if row else {}
+
+    def _totals(self, active_only: bool) -> Dict[str, Any]:
+        """Sum of every numeric snapshot column"""
+        sums = ', '.join(
+            f"COALESCE(SUM({c}), 0) AS {c}" for c in _SNAPSHOT_COLUMNS
+            if c not in ('project_code', 'has_project', 'is_active_project', 'status',
+                         'contract_signed_date', 'largest_outstanding', 'largest_outstanding_invoice')
+        )
+        where = "WHERE is_active_project = 1" if active_only else ""
+        return self.execute_query(f"SELECT COUNT(*) AS projects, {sums} FROM kpi_project_snapshot {where}",
+                                  fetch_one=True)
+
+    def get_role_stats(self, role: str) -> Dict[str, Any]:
+        """Role KPIs for /api/dashboard/stats?role=..., same keys as the live version"""
+        if role == 'bill':
+            role = 'executive'
+        if role not in ROLES:
+            raise ValueError(f"Invalid role: {role}")
+
+        active = self._totals(active_only=True)
+        if role == 'executive':
+            active_projects = self.execute_query("""
+                SELECT COUNT(*) AS n FROM kpi_project_snapshot
+                WHERE has_project = 1 AND (status = 'Active' OR is_active_project = 1)
+            """, fetch_one=True)['n']
+            stats = {
+                'role': 'executive',
+                'pipeline_value': round(self._group('proposals').get('pipeline_value', 0) or 0, 2),
+                'active_projects_count': active_projects,
+                'outstanding_invoices_total': round(active['outstanding_total'], 2),
+                'overdue_invoices_count': active['overdue_count'],
+            }
+        elif role == 'pm':
+            pm = self._group('pm')
+            stats = {
+                'role': 'pm',
+                'my_projects_count': self.execute_query("""
+                    SELECT COUNT(*) AS n FROM kpi_project_snapshot
+                    WHERE has_project = 1 AND (status = 'Active' OR is_active_project = 1)
+                """, fetch_one=True)['n'],
+                'deliverables_due_this_week': pm.get('deliverables_due_this_week', 0),
+                'open_rfis_count': pm.get('open_rfis_count', 0),
+            }
+        else:
+            stats = {
+                'role': 'finance',
+                'total_outstanding': round(active['outstanding_total'], 2),
+                'overdue_30_days': round(active['overdue_30_amount'], 2),
+                'overdue_60_days': round(active['overdue_60_amount'], 2),
+                'overdue_90_plus': round(active['overdue_90_amount'], 2),
+                'recent_payments_7_days': round(active['recent_payments_7d'], 2),
+            }
+        stats['snapshot'] = self.staleness()
+        return stats
+
+    def get_kpi_totals(self) -> Dict[str, Any]:
+        """Period-independent figures for /api/dashboard/kpis"""
+        active = self._totals(active_only=True)
+        everything = self._totals(active_only=False)
+        counts = self.execute_query(f"""
+            SELECT
+                SUM(CASE WHEN has_project = 1 AND is_active_project = 0
+                         AND status NOT IN ({_placeholders(INACTIVE_PROJECT_STATUSES)}) THEN 1 ELSE 0 END) AS active_proposals,
+                SUM(CASE WHEN has_project = 1 AND status IN ({_placeholders(LOST_PROJECT_STATUSES)})
+                         THEN 1 ELSE 0 END) AS lost
+            FROM kpi_project_snapshot
+        """, INACTIVE_PROJECT_STATUSES + LOST_PROJECT_STATUSES, fetch_one=True)
+        largest = self.execute_query("""
+            SELECT largest_outstanding AS amount, largest_outstanding_invoice AS invoice_number
+            FROM kpi_project_snapshot WHERE largest_outstanding > 0
+            ORDER BY largest_outstanding DESC LIMIT 1
+        """, fetch_one=True)
+
+        days_count = everything['payment_days_count']
+        return {
+            'total_contract_value': active['total_fee_usd'],
+            'paid_for_active': active['paid_total'],
+            'outstanding_for_active': active['outstanding_total'],
+            'outstanding_prev': active['outstanding_30d_ago'],
+            'active_projects': active['projects'],
+            'active_proposals': counts['active_proposals'] or 0,
+            'won': active['projects'],
+            'lost': counts['lost'] or 0,
+            'avg_days_to_payment': round(everything['payment_days_sum'] / days_count, 1) if days_count else 0,
+            'largest_outstanding': {
+                'amount': largest['amount'] if largest else 0,
+                'invoice_number': largest['invoice_number'] if largest else None,
+            },
+            'pipeline_value': self._group('proposals').get('pipeline_value', 0) or 0,
+            'overdue_count': active['overdue_count'],
+            'overdue_amount': active['overdue_amount'],
+            'snapshot': self.staleness(),
+        }
+
+    def get_invoice_aging_summary(self) -> Dict[str, Any]:
+        """Same shape as FinancialService.get_invoice_aging_summary"""
+        totals = self._totals(active_only=False)
+        buckets: List[Dict[str, Any]] = []
+        for label, prefix in AGING_BUCKETS:
+            count = totals[f'{prefix}_count']
+            if count:
+                buckets.append({
+                    'aging_bucket': label,
+                    'invoice_count': count,
+                    'total_outstanding': totals[f'{prefix}_amount'],
+                })
+        return {
+            'aging_buckets': buckets,
+            'total_unpaid_invoices': sum(b['invoice_count'] for b in buckets),
+            'total_unpaid_amount': sum(b['total_outstanding'] or 0 for b in buckets),
+            'snapshot': self.staleness(),
+        }
+
+    def get_proposal_stats(self) -> Dict[str, Any]:
+        """Proposal pipeline group (WeeklyReportService quick stats / pipeline outlook)"""
+        return self._group('proposals')
+
+
+_services: Dict[str, KpiSnapshotService] = {}
+_services_lock = threading.Lock()
+
+
+def get_kpi_snapshot_service(db_path: Optional[str] = None) -> KpiSnapshotService:
+    """Shared instance per database (so the refresh interval is per process)"""
+    key = str(Path(db_path or os.getenv('DATABASE_PATH', 'database/bensley_master.db')).expanduser().resolve())
+    service = _services.get(key)
+    if service is None:
+        with _services_lock:
+            service = _services.get(key)
+            if service is None:
+                service = KpiSnapshotService(key)
+                _services[key] = service
+    return service
@@ -0,0 +1,357 @@
+"""
+LLM Batch Service - bulk chat completions through the provider's batch API
+
+For backfills (a year of emails) where an answer within 24 hours is fine:
+requests go out as JSONL batch files at half the per-token price instead of
+one synchronous call each.
+
+- submit(): records each request as an llm_jobs row (migration 114) and
+  answers it from the response cache when possible. The rest are packed
+  into batch input files (custom_id = job_id, up to LLM_BATCH_MAX_REQUESTS
+  lines / LLM_BATCH_MAX_MB each). Each file is uploaded, a batch is created,
+  and the batch is recorded in llm_batches (migration 116).
+- poll(): refreshes open batches. Once a batch finishes, its output and
+  error files are read back, so each job becomes done or failed. Lines an
+  expired or cancelled batch never answered go back to pending for the next
+  submit().
+- ready(): done jobs not yet applied, as dispatcher-style outcomes. Callers
+  write them and then call LLMDispatcher.mark_applied().
+
+Every step is idempotent, so an interrupted backfill resumes by running
+again: open batches are polled, ingested results are applied, and only
+requests without a job in flight are submitted.
+
+The installed openai SDK predates the batch endpoints, so BatchAPIClient
+talks to them over httpx. It uses the same OPENAI_BASE_URL/OPENAI_API_KEY
+as the SDK, which is how tests point it at a local stand-in.
+
+Usage:
+    batches = LLMBatchService(db_path)
+    batches.submit('suggestion_backfill', [(email_id, request_kwargs), ...])
+    batches.poll('suggestion_backfill')
+    for outcome in batches.ready('suggestion_backfill'):
+        ...write...
+        batches.dispatcher.mark_applied([outcome['job_id']])
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .base_service import BaseService
+from .llm_dispatcher import LLMDispatcher, get_llm_dispatcher
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_REQUESTS = int(os.getenv('LLM_BATCH_MAX_REQUESTS', '50000'))
+BATCH_MAX_BYTES = int(float(os.getenv('LLM_BATCH_MAX_MB', '190')) * 1024 * 1024)
+COMPLETION_WINDOW = '24h'
+CHAT_ENDPOINT = '/v1/chat/completions'
+
+FINISHED_STATUSES = {'completed', 'expired', 'cancelled', 'failed'}
+
+
+class BatchAPIClient:
+    """Files + batches endpoints of an OpenAI-compatible API"""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: float = 120.0):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx package not installed")
+        api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY environment variable not set")
+        base_url = (base_url or os.environ.get('OPENAI_BASE_URL') or 'https://api.openai.com/v1').rstrip('/')
+        self._http = httpx.Client(base_url=base_url, headers={'Authorization': f'Bearer {api_key}'},
+                                  timeout=timeout)
+
+    @staticmethod
+    def _json(response) -> Dict[str, Any]:
+        response.raise_for_status()
+        return response.json()
+
+    def upload(self, filename: str, content: bytes) -> str:
+        """Upload a batch input file; returns its file id"""
+        return self._json(self._http.post(
+            '/files', data={'purpose': 'batch'}, files={'file': (filename, content, 'application/jsonl')}
+        ))['id']
+
+    def create(self, input_file_id: str, metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return self._json(self._http.post('/batches', json={
+            'input_file_id': input_file_id,
+            'endpoint': CHAT_ENDPOINT,
+            'completion_window': COMPLETION_WINDOW,
+            'metadata': metadata or {},
+        }))
+
+    def retrieve(self, batch_id: str) -> Dict[str, Any]:
+        return self._json(self._http.get(f'/batches/{batch_id}'))
+
+    def content(self, file_id: str) -> str:
+        response = self._http.get(f'/files/{file_id}/content')
+        response.raise_for_status()
+        return response.text
+
+    def close(self):
+        self._http.close()
+
+
+def _summarize_completion(body: Dict[str, Any]) -> Dict[str, Any]:
+    """Chat completion JSON -> the {'content', 'model', 'usage'} shape stored on llm_jobs"""
+    usage = body.get('usage') or {}
+    details = usage.get('prompt_tokens_details') or {}
+    return {
+        'content': body['choices'][0]['message']['content'],
+        'model': body.get('model'),
+        'usage': {
+            'prompt_tokens': usage.get('prompt_tokens'),
+            'completion_tokens': usage.get('completion_tokens'),
+            'cached_tokens': details.get('cached_tokens') or 0,
+        },
+    }
+
+
+class LLMBatchService(BaseService):
+    """Submit, poll and collect provider batch jobs backed by llm_jobs"""
+
+    def __init__(self, db_path: Optional[str] = None, client_factory: Optional[Callable[[], Any]] = None,
+                 dispatcher: Optional[LLMDispatcher] = None, max_requests: int = BATCH_MAX_REQUESTS,
+                 max_bytes: int = BATCH_MAX_BYTES):
+        super().__init__(db_path)
+        # Shares llm_jobs and the response cache with online dispatch
+        self.dispatcher = dispatcher or get_llm_dispatcher(str(self.db_path))
+        self.client_factory = client_factory or BatchAPIClient
+        self.max_requests = max_requests
+        self.max_bytes = max_bytes
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    # ------------------------------------------------------------------
+    # Submit
+    # ------------------------------------------------------------------
+
+    def submit(self, kind: str, items: Sequence[Tuple[Any, Dict[str, Any]]], cache: bool = True) -> Dict[str, Any]:
+        """
+        Queue requests as provider batches.
+
+        Args:
+            kind: llm_jobs kind (keep it distinct from online kinds, so online
+                  resume never picks up a job that is waiting in a batch)
+            items: (ref_id, chat.completions kwargs) pairs; ref_id is required
+            cache: Answer identical earlier requests from the response cache
+
+        Returns:
+            Counts (submitted, cached, already_done, in_flight) and batch_ids
+        """
+        in_flight = self._in_flight_refs(kind)
+        counts = {'submitted': 0, 'cached': 0, 'already_done': 0, 'in_flight': 0, 'batch_ids': []}
+        pending: List[Tuple[int, Dict[str, Any]]] = []
+
+        for ref_id, request in items:
+            if str(ref_id) in in_flight:
+                counts['in_flight'] += 1
+                continue
+            job = self.dispatcher.submit_job(kind, ref_id, request, reuse_done=cache)
+            if job['status'] == 'done':
+                counts['already_done'] += 1
+                continue
+            cached = self.dispatcher.cache.get(request) if cache else None
+            if cached is not None:
+                usage = cached.get('usage') or {}
+                self.dispatcher.set_job_status(job['job_id'], 'done', response=json.dumps(cached),
+                                               input_tokens=usage.get('prompt_tokens'),
+                                               output_tokens=usage.get('completion_tokens'),
+                                               error=None, batch_id=None)
+                counts['cached'] += 1
+                continue
+            pending.append((job['job_id'], request))
+
+        for chunk in self._chunks(pending):
+            counts['batch_ids'].append(self._create_batch(kind, chunk))
+            counts['submitted'] += len(chunk)
+
+        logger.info(f"Batch submit ({kind}): {counts['submitted']} queued in {len(counts['batch_ids'])} batch(es), "
+                    f"{counts['cached']} from cache, {counts['already_done']} already answered, "
+                    f"{counts['in_flight']} still in flight")
+        return counts
+
+    def _in_flight_refs(self, kind: str) -> set:
+        rows = self.execute_query("""
+            SELECT j.ref_id FROM llm_jobs j
+            JOIN llm_batches b ON b.batch_id = j.batch_id
+            WHERE j.kind = ? AND j.status = 'running' AND b.ingested_at IS NULL
+        """, (kind,))
+        return {row['ref_id'] for row in rows}
+
+    @staticmethod
+    def _line(job_id: int, request: Dict[str, Any]) -> str:
+        return json.dumps({'custom_id': str(job_id), 'method': 'POST', 'url': CHAT_ENDPOINT, 'body': request})
+
+    def _chunks(self, pending: List[Tuple[int, Dict[str, Any]]]):
+        chunk, size = [], 0
+        for job_id, request in pending:
+            line_size = len(self._line(job_id, request).encode('utf-8')) + 1
+            if chunk and (len(chunk) >= self.max_requests or size + line_size > self.max_bytes):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append((job_id, request))
+            size += line_size
+        if chunk:
+            yield chunk
+
+    def _create_batch(self, kind: str, chunk: List[Tuple[int, Dict[str, Any]]]) -> str:
+        content = ''.join(self._line(job_id, request) + '\n' for job_id, request in chunk).encode('utf-8')
+        file_id = self.client.upload(f"{kind}-{int(time.time())}.jsonl", content)
+        batch = self.client.create(file_id, metadata={'kind': kind})
+        with self.get_write_connection() as conn:
+            conn.execute("""
+                INSERT INTO llm_batches (batch_id, kind, status, input_file_id, request_count)
+                VALUES (?, ?, ?, ?, ?)
+            """, (batch['id'], kind, batch.get('status', 'validating'), file_id, len(chunk)))
+            conn.executemany("""
+                UPDATE llm_jobs SET status = 'running', batch_id = ?, attempts = attempts + 1,
+                       updated_at = datetime('now')
+                WHERE job_id = ?
+            """, [(batch['id'], job_id) for job_id, _ in chunk])
+        logger.info(f"Created batch {batch['id']} ({kind}): {len(chunk)} requests, {len(content)} bytes")
+        return batch['id']
+
+    # ------------------------------------------------------------------
+    # Poll and ingest
+    # ------------------------------------------------------------------
+
+    def open_batches(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Batches whose results have not been read back yet"""
+        if kind is None:
+            return self.execute_query("SELECT * FROM llm_batches WHERE ingested_at IS NULL ORDER BY created_at")
+        return self.execute_query(
+            "SELECT * FROM llm_batches WHERE kind = ? AND ingested_at IS NULL ORDER BY created_at", (kind,)
+        )
+
+    def poll(self, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Refresh open batches and ingest the finished ones; returns their provider status"""
+        polled = []
+        for row in self.open_batches(kind):
+            try:
+                batch = self.client.retrieve(row['batch_id'])
+            except Exception as e:
+                logger.warning(f"Could not poll batch {row['batch_id']}: {e}")
+                continue
+            counts = batch.get('request_counts') or {}
+            with self.get_write_connection() as conn:
+                conn.execute("""
+                    UPDATE llm_batches SET status = ?, output_file_id = ?, error_file_id = ?,
+                           completed_count = ?, failed_count = ?, updated_at = datetime('now')
+                    WHERE batch_id = ?
+                """, (batch['status'], batch.get('output_file_id'), batch.get('error_file_id'),
+                      counts.get('completed', 0), counts.get('failed', 0), row['batch_id']))
+            if batch['status'] in FINISHED_STATUSES:
+                self._ingest(row['batch_id'], batch)
+            polled.append({'batch_id': row['batch_id'], 'status': batch['status'], 'request_counts': counts})
+        return polled
+
+    def _ingest(self, batch_id: str, batch: Dict[str, Any]):
+        """Read a finished batch's output/error files into its still-running jobs"""
+        waiting = {
+            str(row['job_id']): row for row in self.execute_query(
+                "SELECT job_id, request FROM llm_jobs WHERE batch_id = ? AND status = 'running'", (batch_id,)
+            )
+        }
+        done = failed = 0
+        for file_key in ('output_file_id', 'error_file_id'):
+            if not batch.get(file_key):
+                continue
+            for line in self.client.content(batch[file_key]).splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                job = waiting.pop(str(record.get('custom_id')), None)
+                if job is None:
+                    continue  # ingested before, or not ours
+                response = record.get('response') or {}
+                if response.get('status_code') == 200 and not record.get('error'):
+                    summary = _summarize_completion(response['body'])
+                    self.dispatcher.set_job_status(
+                        job['job_id'], 'done', response=json.dumps(summary),
+                        input_tokens=summary['usage']['prompt_tokens'],
+                        output_tokens=summary['usage']['completion_tokens'], error=None
+                    )
+                    self.dispatcher.cache.put(json.loads(job['request']), summary)
+                    done += 1
+                else:
+                    error = record.get('error') or (response.get('body') or {}).get('error') or response
+                    self.dispatcher.set_job_status(job['job_id'], 'failed', error=json.dumps(error)[:2000])
+                    failed += 1
+
+        # Lines an expired/cancelled/failed batch never answered: send again next time
+        if waiting:
+            with self.get_write_connection() as conn:
+                conn.executemany("""
+                    UPDATE llm_jobs SET status = 'pending', batch_id = NULL, updated_at = datetime('now')
+                    WHERE job_id = ? AND status = 'running'
+                """, [(int(job_id),) for job_id in waiting])
+        with self.get_write_connection() as conn:
+            conn.execute("UPDATE llm_batches SET ingested_at = datetime('now') WHERE batch_id = ?", (batch_id,))
+        logger.info(f"Ingested batch {batch_id} ({batch['status']}): {done} done, {failed} failed, "
+                    f"{len(waiting)} unanswered")
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def ready(self, kind: str, limit: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Answered jobs not yet applied, oldest first, in LLMDispatcher outcome
+        shape plus 'batch' (the provider batch id; None for a cache answer).
+        """
+        rows = self.execute_query("""
+            SELECT job_id, ref_id, response, attempts, batch_id FROM llm_jobs
+            WHERE kind = ? AND status = 'done'
+            ORDER BY job_id LIMIT ?
+        """, (kind, limit))
+        outcomes = []
+        for row in rows:
+            response = json.loads(row['response'])
+            outcomes.append({
+                'job_id': row['job_id'],
+                'ref_id': row['ref_id'],
+                'success': True,
+                'content': response['content'],
+                'usage': response['usage'],
+                'model': response.get('model'),
+                'error': None,
+                'attempts': row['attempts'],
+                'resumed': False,
+                'elapsed_ms': 0,
+                'cache': 'miss' if row['batch_id'] else 'hit',
+                'batch': row['batch_id'],
+            })
+        return outcomes
+
+    def stats(self, kind: Optional[str] = None) -> Dict[str, Any]:
+        """Batches by provider status and the kind's jobs by status"""
+        where, params = ("WHERE kind = ?", (kind,)) if kind else ("", ())
+        batches = self.execute_query(f"""
+            SELECT status, COUNT(*) AS batches, SUM(request_count) AS requests,
+                   SUM(completed_count) AS completed, SUM(failed_count) AS failed
+            FROM llm_batches {where} GROUP BY status
+        """, params)
+        jobs = self.execute_query(f"SELECT status, COUNT(*) AS n FROM llm_jobs {where} GROUP BY status", params)
+        return {
+            'batches': {row['status']: {k: row[k] for k in ('batches', 'requests', 'completed', 'failed')}
+                        for row in batches},
+            'jobs': {row['status']: row['n'] for row in jobs},
+            'open_batches': len(self.open_batches(kind)),
+        }
@@ -0,0 +1,521 @@
+"""
+LLM Dispatcher - rate-limited, retrying, durable queue for chat completions
+
+Every bulk LLM caller (suggestion analysis, transcript summaries) sends its
+requests through here instead of its own thread pool:
+
+- Token buckets for requests/minute and tokens/minute (LLM_RPM_LIMIT,
+  LLM_TPM_LIMIT). Each request reserves its estimated prompt tokens plus
+  max_tokens before it is sent. The buckets shrink to the provider's own
+  limits as soon as x-ratelimit-* headers report them.
+- Adaptive concurrency: starts at the caller's max, halves on every 429,
+  grows by one per window of successes, and never exceeds the
+  x-ratelimit-remaining-requests the provider reports.
+- Retries with jittered exponential backoff on 429, 5xx, timeouts and
+  connection errors (Retry-After / x-ratelimit-reset-* win when present),
+  up to LLM_MAX_ATTEMPTS.
+- Durable jobs (llm_jobs, migration 114): a request is recorded before it
+  is sent and its response as soon as it arrives, so after a crash
+  unfinished work resumes and finished-but-unapplied responses are not
+  paid for twice. Callers mark jobs 'applied' once results are written.
+- Response cache (LLMResponseCache, migration 115): an identical request
+  (model, system prompt, user message, parameters) sent before is answered
+  from llm_response_cache without a provider call. Opt out per call with
+  dispatch(cache=False).
+
+The OpenAI client is created per dispatch with max_retries=0 (retries are
+ours) and honours OPENAI_BASE_URL, so tests point it at a local
+OpenAI-compatible server.
+
+Usage:
+    dispatcher = get_llm_dispatcher(db_path)
+    outcomes = dispatcher.dispatch_sync('suggestion_analysis', [(email_id, request_kwargs), ...])
+    # outcome: {'job_id', 'ref_id', 'success', 'content', 'usage', 'model', 'error',
+    #           'attempts', 'resumed', 'elapsed_ms', 'cache': 'hit' | 'miss' | 'bypass'}
+    dispatcher.mark_applied([o['job_id'] for o in outcomes if o['success']])
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .base_service import BaseService
+from .llm_response_cache import LLMResponseCache
+
+try:
+    import openai
+    from openai import AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+RPM_LIMIT = int(os.getenv('LLM_RPM_LIMIT', '500'))
+TPM_LIMIT = int(os.getenv('LLM_TPM_LIMIT', '200000'))
+MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '10'))
+MAX_ATTEMPTS = int(os.getenv('LLM_MAX_ATTEMPTS', '5'))
+RETRY_BASE_SECONDS = float(os.getenv('LLM_RETRY_BASE_SECONDS', '1.0'))
+RETRY_MAX_SECONDS = float(os.getenv('LLM_RETRY_MAX_SECONDS', '60'))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv('LLM_REQUEST_TIMEOUT_SECONDS', '120'))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """x-ratelimit-reset-* value ("1s", "6m0s", "20ms", "0.5") -> seconds"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """Prompt tokens (~4 chars per token) plus the completion allowance"""
+    chars = sum(len(m.get('content') or '') for m in request.get('messages', []))
+    return chars // 4 + int(request.get('max_tokens') or 500)
+
+
+class TokenBucket:
+    """Refills continuously at limit/minute up to limit; not thread-safe on its own"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.capacity / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (requests larger than the bucket wait for a full one)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60 / self.capacity
+
+    def take(self, amount: float):
+        self.available -= min(amount, self.capacity)
+
+    def observe(self, limit: Optional[float], remaining: Optional[float], now: float):
+        """Adopt the provider's view: its limit, and never more headroom than it reports"""
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.available = min(self.available, float(remaining))
+
+
+class RateLimiter:
+    """Request and token buckets plus a hard pause after 429s (shared across dispatches)"""
+
+    def __init__(self, rpm: int = RPM_LIMIT, tpm: int = TPM_LIMIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self, tokens: int):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(self.paused_until - now,
+                           self.requests.wait_time(1, now),
+                           self.tokens.wait_time(tokens, now))
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+            await asyncio.sleep(min(wait, 5.0))
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def observe_headers(self, headers) -> Dict[str, Optional[float]]:
+        """Update buckets from x-ratelimit-* headers; returns the parsed values"""
+        def number(name):
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        seen = {
+            'limit_requests': number('x-ratelimit-limit-requests'),
+            'limit_tokens': number('x-ratelimit-limit-tokens'),
+            'remaining_requests': number('x-ratelimit-remaining-requests'),
+            'remaining_tokens': number('x-ratelimit-remaining-tokens'),
+            'reset_requests': parse_reset(headers.get('x-ratelimit-reset-requests')),
+            'reset_tokens': parse_reset(headers.get('x-ratelimit-reset-tokens')),
+        }
+        with self._lock:
+            now = time.monotonic()
+            self.requests.observe(seen['limit_requests'], seen['remaining_requests'], now)
+            self.tokens.observe(seen['limit_tokens'], seen['remaining_tokens'], now)
+        return seen
+
+
+class LLMDispatcher(BaseService):
+    """Durable, rate-limited dispatch of chat.completions requests"""
+
+    def __init__(self, db_path: Optional[str] = None, client_factory: Optional[Callable[[], Any]] = None,
+                 max_concurrency: int = MAX_CONCURRENCY, max_attempts: int = MAX_ATTEMPTS,
+                 retry_base_seconds: float = RETRY_BASE_SECONDS, limiter: Optional[RateLimiter] = None,
+                 response_cache: Optional[LLMResponseCache] = None):
+        super().__init__(db_path)
+        self.client_factory = client_factory or self._default_client
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.limiter = limiter or RateLimiter()
+        self.cache = response_cache or LLMResponseCache(str(self.db_path))
+
+        # Adaptive concurrency (shared across dispatches; plain numbers, no loop-bound primitives)
+        self.concurrency = float(max_concurrency)
+        self._remaining_requests: Optional[float] = None  # from the latest response headers
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'rate_limited': 0,
+                       'resumed': 0, 'cache_hits': 0, 'input_tokens': 0, 'output_tokens': 0}
+
+    @staticmethod
+    def _default_client():
+        if not OPENAI_AVAILABLE:
+            raise RuntimeError("openai package not installed")
+        return AsyncOpenAI(max_retries=0, timeout=REQUEST_TIMEOUT_SECONDS)
+
+    def _count(self, **increments):
+        with self._stats_lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    # ------------------------------------------------------------------
+    # Job table
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def request_hash(request: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def submit_job(self, kind: str, ref_id: Optional[Any], request: Dict[str, Any],
+                   reuse_done: bool = True) -> Dict[str, Any]:
+        """
+        Record a job (idempotent per kind/ref_id).
+
+        Returns the job row. A job already 'done' for the same request keeps its
+        stored response (unless reuse_done is False); anything else for a new
+        request (or a finished one being asked for again) goes back to 'pending'.
+        """
+        digest = self.request_hash(request)
+        ref = str(ref_id) if ref_id is not None else digest[:32]
+        payload = json.dumps(request, default=str)
+        with self.get_write_connection() as conn:
+            row = conn.execute(
+                "SELECT job_id, status, request_hash, response, attempts FROM llm_jobs WHERE kind = ? AND ref_id = ?",
+                (kind, ref)
+            ).fetchone()
+            if row is None:
+                cursor = conn.execute(
+                    "INSERT INTO llm_jobs (kind, ref_id, request_hash, request) VALUES (?, ?, ?, ?)",
+                    (kind, ref, digest, payload)
+                )
+                return {'job_id': cursor.lastrowid, 'ref_id': ref, 'status': 'pending', 'response': None,
+                        'attempts': 0, 'resumed': False}
+
+            job_id, status, old_digest, response, attempts = row[0], row[1], row[2], row[3], row[4]
+            if status == 'done' and old_digest == digest and reuse_done:
+                return {'job_id': job_id, 'ref_id': ref, 'status': 'done', 'response': response,
+                        'attempts': attempts, 'resumed': True}
+            conn.execute("""
+                UPDATE llm_jobs SET request_hash = ?, request = ?, status = 'pending', attempts = 0,
+                       response = NULL, error = NULL, completed_at = NULL, updated_at = datetime('now')
+                WHERE job_id = ?
+            """, (digest, payload, job_id))
+            return {'job_id': job_id, 'ref_id': ref, 'status': 'pending', 'response': None,
+                    'attempts': 0, 'resumed': status in ('pending', 'running')}
+
+    def set_job_status(self, job_id: int, status: str, **fields):
+        """Move a job to a status, updating any other llm_jobs columns given"""
+        columns = ["status = ?", "updated_at = datetime('now')"]
+        values: List[Any] = [status]
+        for name, value in fields.items():
+            columns.append(f"{name} = ?")
+            values.append(value)
+        if status in ('done', 'failed'):
+            columns.append("completed_at = datetime('now')")
+        with self.get_write_connection() as conn:
+            conn.execute(f"UPDATE llm_jobs SET {', '.join(columns)} WHERE job_id = ?", (*values, job_id))
+
+    def mark_applied(self, job_ids: Sequence[int]):
+        """Caller has written the results; the job will not be resumed"""
+        job_ids = [j for j in job_ids if j is not None]
+        if not job_ids:
+            return
+        with self.get_write_connection() as conn:
+            conn.executemany(
+                "UPDATE llm_jobs SET status = 'applied', updated_at = datetime('now') WHERE job_id = ? AND status = 'done'",
+                [(j,) for j in job_ids]
+            )
+
+    def unfinished(self, kind: str, limit: int = 500) -> List[str]:
+        """ref_ids of jobs interrupted before their results were applied (oldest first)"""
+        rows = self.execute_query("""
+            SELECT ref_id FROM llm_jobs
+            WHERE kind = ? AND status IN ('pending', 'running', 'done')
+            ORDER BY created_at, job_id LIMIT ?
+        """, (kind, limit))
+        return [row['ref_id'] for row in rows]
+
+    # ------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------
+
+    async def dispatch(self, kind: str, items: Sequence[Tuple[Optional[Any], Dict[str, Any]]],
+                       max_concurrency: Optional[int] = None, cache: bool = True,
+                       cache_ttl: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Run chat.completions requests, in the order given.
+
+        Args:
+            kind: Job kind (suggestion_analysis, transcript_summary, ...)
+            items: (ref_id, chat.completions kwargs) pairs; ref_id None = keyed by request
+            max_concurrency: Upper bound for this dispatch (adaptive below it)
+            cache: Answer identical earlier requests from the response cache
+                   (and store new responses there); False forces a provider call
+            cache_ttl: Seconds new responses stay cached (default LLM_CACHE_TTL_SECONDS)
+
+        Returns:
+            One outcome dict per item (never raises for a failed request)
+        """
+        if not items:
+            return []
+        ceiling = max(1, min(max_concurrency or self.max_concurrency, self.max_concurrency))
+        cache_state = 'miss' if cache and self.cache.available() else 'bypass'
+        self.concurrency = min(self.concurrency, ceiling) or 1.0
+        # cache=False asks for a fresh answer, so a stored unapplied response is not reused either
+        jobs = [self.submit_job(kind, ref_id, request, reuse_done=cache) for ref_id, request in items]
+
+        gate = asyncio.Condition()
+        in_flight = 0
+        client = None
+
+        async def run(job, request):
+            nonlocal in_flight, client
+            if job['status'] == 'done':
+                self._count(resumed=1)
+                return self._outcome(job, json.loads(job['response']), attempts=job['attempts'],
+                                     cache=cache_state)
+            if job['resumed']:
+                self._count(resumed=1)
+            if cache_state == 'miss':
+                cached = self.cache.get(request)
+                if cached is not None:
+                    self._count(cache_hits=1)
+                    usage = cached.get('usage') or {}
+                    self.set_job_status(job['job_id'], 'done', response=json.dumps(cached),
+                                     input_tokens=usage.get('prompt_tokens'),
+                                     output_tokens=usage.get('completion_tokens'), error=None)
+                    return self._outcome(job, cached, attempts=0, cache='hit')
+
+            tokens = estimate_request_tokens(request)
+            started = time.monotonic()
+            attempts = 0
+            while True:
+                attempts += 1
+                async with gate:
+                    while in_flight >= max(1, int(min(self.concurrency, ceiling))):
+                        await gate.wait()
+                    in_flight += 1
+                try:
+                    await self.limiter.acquire(tokens)
+                    if client is None:
+                        client = self.client_factory()
+                    self.set_job_status(job['job_id'], 'running', attempts=attempts)
+                    self._count(requests=1)
+                    response = await self._send(client, request)
+                except Exception as e:
+                    retry_in = self._retry_delay(e, attempts)
+                    if retry_in is None or attempts >= self.max_attempts:
+                        self._count(failed=1)
+                        self.set_job_status(job['job_id'], 'failed', error=str(e)[:2000])
+                        logger.warning(f"LLM job {job['job_id']} ({kind}/{job['ref_id']}) failed after "
+                                       f"{attempts} attempt(s): {e}")
+                        return {**self._outcome(job, None, attempts=attempts, started=started, cache=cache_state),
+                                'error': str(e)}
+                    self._count(retries=1)
+                    logger.info(f"LLM job {job['job_id']} retry {attempts} in {retry_in:.1f}s: {e}")
+                else:
+                    usage = response['usage']
+                    self._count(succeeded=1, input_tokens=usage.get('prompt_tokens') or 0,
+                                output_tokens=usage.get('completion_tokens') or 0)
+                    self.set_job_status(job['job_id'], 'done', response=json.dumps(response),
+                                     input_tokens=usage.get('prompt_tokens'),
+                                     output_tokens=usage.get('completion_tokens'), error=None)
+                    if cache_state == 'miss':
+                        self.cache.put(request, response, cache_ttl)
+                    # Additive increase: about +1 per window of successful requests,
+                    # but never past the requests the provider says are left
+                    cap = float(ceiling)
+                    if self._remaining_requests is not None:
+                        cap = max(1.0, min(cap, self._remaining_requests))
+                    self.concurrency = min(cap, self.concurrency + 1 / max(self.concurrency, 1))
+                    return self._outcome(job, response, attempts=attempts, started=started, cache=cache_state)
+                finally:
+                    async with gate:
+                        in_flight -= 1
+                        gate.notify_all()
+                await asyncio.sleep(retry_in)
+
+        try:
+            return await asyncio.gather(
+                *(run(job, request) for job, (_, request) in zip(jobs, items, strict=True))
+            )
+        finally:
+            if client is not None and hasattr(client, 'close'):
+                try:
+                    await client.close()
+                except Exception:
+                    pass
+
+    def dispatch_sync(self, kind: str, items: Sequence[Tuple[Optional[Any], Dict[str, Any]]],
+                      max_concurrency: Optional[int] = None, cache: bool = True,
+                      cache_ttl: Optional[int] = None) -> List[Dict[str, Any]]:
+        """dispatch() for synchronous callers (runs its own event loop)"""
+        coro = self.dispatch(kind, items, max_concurrency, cache=cache, cache_ttl=cache_ttl)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        # Called from inside a running loop (sync helper used by async code): use a thread
+        result: Dict[str, Any] = {}
+
+        def runner():
+            try:
+                result['value'] = asyncio.run(coro)
+            except BaseException as e:  # re-raised in the caller's thread
+                result['error'] = e
+
+        thread = threading.Thread(target=runner, name='llm-dispatch')
+        thread.start()
+        thread.join()
+        if 'error' in result:
+            raise result['error']
+        return result['value']
+
+    async def _send(self, client, request: Dict[str, Any]) -> Dict[str, Any]:
+        raw = await client.chat.completions.with_raw_response.create(**request)
+        seen = self.limiter.observe_headers(raw.headers)
+        remaining = self._remaining_requests = seen['remaining_requests']
+        if remaining is not None and remaining < self.concurrency:
+            self.concurrency = max(1.0, remaining)
+        completion = raw.parse()
+
+        usage = completion.usage
+        details = getattr(usage, 'prompt_tokens_details', None) if usage else None
+        if isinstance(details, dict):
+            cached = details.get('cached_tokens')
+        else:
+            cached = getattr(details, 'cached_tokens', None)
+        return {
+            'content': completion.choices[0].message.content,
+            'model': completion.model,
+            'usage': {
+                'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+                'completion_tokens': getattr(usage, 'completion_tokens', None),
+                'cached_tokens': cached or 0,
+            },
+        }
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the error is not retryable"""
+        status = getattr(error, 'status_code', None)
+        response = getattr(error, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        if status is not None and status not in RETRYABLE_STATUS:
+            return None
+        if status is None and OPENAI_AVAILABLE and not isinstance(
+                error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return None
+
+        backoff = min(RETRY_MAX_SECONDS, self.retry_base_seconds * 2 ** (attempt - 1))
+        delay = backoff * random.uniform(0.5, 1.5)
+        if headers:
+            self.limiter.observe_headers(headers)
+            hinted = parse_reset(headers.get('retry-after-ms'))
+            hinted = hinted / 1000 if hinted is not None else parse_reset(headers.get('retry-after'))
+            if hinted is None and status == 429:
+                hinted = max(filter(None, [parse_reset(headers.get('x-ratelimit-reset-requests')),
+                                           parse_reset(headers.get('x-ratelimit-reset-tokens'))]), default=None)
+            if hinted is not None:
+                delay = min(RETRY_MAX_SECONDS, hinted) + random.uniform(0, self.retry_base_seconds / 2)
+
+        if status == 429:
+            self._count(rate_limited=1)
+            # Multiplicative decrease, and hold every sender until the window resets
+            self.concurrency = max(1.0, self.concurrency / 2)
+            self.limiter.pause(delay)
+        return delay
+
+    @staticmethod
+    def _outcome(job: Dict[str, Any], response: Optional[Dict[str, Any]], attempts: int,
+                 started: Optional[float] = None, cache: str = 'bypass') -> Dict[str, Any]:
+        return {
+            'job_id': job['job_id'],
+            'ref_id': job['ref_id'],
+            'success': response is not None,
+            'content': response['content'] if response else None,
+            'usage': response['usage'] if response else {},
+            'model': response.get('model') if response else None,
+            'error': None,
+            'attempts': attempts,
+            'resumed': job['resumed'],
+            'elapsed_ms': int((time.monotonic() - started) * 1000) if started is not None else 0,
+            'cache': cache,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since start, current concurrency, the job table by status, and the response cache"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['concurrency'] = round(self.concurrency, 2)
+        stats['jobs'] = {}
+        if self.table_exists('llm_jobs'):
+            for row in self.execute_query(
+                    "SELECT kind, status, COUNT(*) AS n FROM llm_jobs GROUP BY kind, status"):
+                stats['jobs'].setdefault(row['kind'], {})[row['status']] = row['n']
+        stats['response_cache'] = self.cache.stats()
+        return stats
+
+
+_dispatchers: Dict[str, LLMDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_llm_dispatcher(db_path: Optional[str] = None) -> LLMDispatcher:
+    """Shared instance per database, so every caller draws on the same rate limits"""
+    key = str(Path(db_path or os.getenv('DATABASE_PATH', 'database/bensley_master.db')).expanduser().resolve())
+    dispatcher = _dispatchers.get(key)
+    if dispatcher is None:
+        with _dispatchers_lock:
+            dispatcher = _dispatchers.get(key)
+            if dispatcher is None:
+                dispatcher = LLMDispatcher(key)
+                _dispatchers[key] = dispatcher
+    return dispatcher
@@ -0,0 +1,185 @@
+"""
+LLM Response Cache - deterministic chat.completions cache keyed on the prompt
+
+A request's key is sha256(model, system prompt hash, user message hash,
+parameters), so the same email analyzed twice with the same prompt, model
+and temperature is answered from llm_response_cache (migration 115) instead
+of the provider. The reference id (email_id, transcript_id) is not part of
+the key: identical prompts share an answer.
+
+- TTL: entries expire after LLM_CACHE_TTL_SECONDS (default 30 days) or the
+  ttl given to put().
+- Size bound: every PRUNE_EVERY_PUTS stores, expired entries are dropped and
+  least-recently-used ones evicted past LLM_CACHE_MAX_ENTRIES rows or
+  LLM_CACHE_MAX_MB of stored responses.
+- Opt-out: LLMDispatcher.dispatch(cache=False) per call, or
+  LLM_CACHE_ENABLED=false for everything.
+
+LLMDispatcher is the only caller; hits come back as outcomes with
+cache='hit' and no provider request.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '20000'))
+CACHE_MAX_BYTES = int(float(os.getenv('LLM_CACHE_MAX_MB', '100')) * 1024 * 1024)
+
+PRUNE_EVERY_PUTS = 100
+
+
+def _sha(value: Any) -> str:
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def cache_parts(request: Dict[str, Any]) -> Dict[str, str]:
+    """model / system_hash / user_hash / params_hash / cache_key for chat.completions kwargs"""
+    messages = request.get('messages') or []
+    system = [m for m in messages if m.get('role') == 'system']
+    rest = [m for m in messages if m.get('role') != 'system']
+    params = {k: v for k, v in request.items() if k not in ('model', 'messages')}
+    parts = {
+        'model': str(request.get('model')),
+        'system_hash': _sha(system),
+        'user_hash': _sha(rest),
+        'params_hash': _sha(params),
+    }
+    parts['cache_key'] = _sha('\x00'.join(parts[k] for k in ('model', 'system_hash', 'user_hash', 'params_hash')))
+    return parts
+
+
+class LLMResponseCache(BaseService):
+    """Persistent prompt -> response cache for LLMDispatcher"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_seconds: int = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES,
+                 enabled: bool = CACHE_ENABLED):
+        super().__init__(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._table_available = False
+        self._puts = 0
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evicted': 0}
+
+    def _bump(self, **amounts):
+        with self._lock:
+            for key, amount in amounts.items():
+                self._stats[key] += amount
+
+    def available(self) -> bool:
+        """Enabled and the table exists (migration 115)"""
+        if not self.enabled:
+            return False
+        if not self._table_available:
+            self._table_available = self.table_exists('llm_response_cache')
+        return self._table_available
+
+    def get(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Stored response ({'content', 'usage', 'model'}) for an identical, unexpired request"""
+        if not self.available():
+            return None
+        key = cache_parts(request)['cache_key']
+        row = self.execute_query("""
+            SELECT response FROM llm_response_cache
+            WHERE cache_key = ? AND expires_at > datetime('now')
+        """, (key,), fetch_one=True)
+        if not row:
+            self._bump(misses=1)
+            return None
+
+        self._bump(hits=1)
+        with self.get_write_connection() as conn:
+            conn.execute("""
+                UPDATE llm_response_cache SET hit_count = hit_count + 1, last_hit_at = datetime('now')
+                WHERE cache_key = ?
+            """, (key,))
+        return json.loads(row['response'])
+
+    def put(self, request: Dict[str, Any], response: Dict[str, Any], ttl_seconds: Optional[int] = None):
+        """Store a successful response for its request"""
+        if not self.available():
+            return
+        parts = cache_parts(request)
+        payload = json.dumps(response, default=str)
+        usage = response.get('usage') or {}
+        ttl = int(ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        with self.get_write_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO llm_response_cache
+                    (cache_key, model, system_hash, user_hash, params_hash, response, size_bytes,
+                     input_tokens, output_tokens, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', ?))
+            """, (parts['cache_key'], parts['model'], parts['system_hash'], parts['user_hash'],
+                  parts['params_hash'], payload, len(payload.encode('utf-8')),
+                  usage.get('prompt_tokens'), usage.get('completion_tokens'), f'{ttl:+d} seconds'))
+
+            self._puts += 1
+            if self._puts % PRUNE_EVERY_PUTS == 0:
+                self._prune(conn)
+        self._bump(stores=1)
+
+    def invalidate(self, request: Dict[str, Any]):
+        """Forget the response stored for a request (e.g. it did not parse)"""
+        if not self.available():
+            return
+        with self.get_write_connection() as conn:
+            conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?",
+                         (cache_parts(request)['cache_key'],))
+
+    def prune(self) -> int:
+        """Drop expired entries, then evict least recently used past the size bounds"""
+        if not self.available():
+            return 0
+        with self.get_write_connection() as conn:
+            return self._prune(conn)
+
+    def _prune(self, conn) -> int:
+        removed = conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= datetime('now')").rowcount
+        removed += conn.execute("""
+            DELETE FROM llm_response_cache WHERE cache_key IN (
+                SELECT cache_key FROM (
+                    SELECT cache_key,
+                           ROW_NUMBER() OVER recent AS position,
+                           SUM(size_bytes) OVER recent AS running_bytes
+                    FROM llm_response_cache
+                    WINDOW recent AS (ORDER BY COALESCE(last_hit_at, created_at) DESC, cache_key)
+                )
+                WHERE position > ? OR running_bytes > ?
+            )
+        """, (self.max_entries, self.max_bytes)).rowcount
+        if removed:
+            self._bump(evicted=removed)
+            logger.info(f"LLM response cache: evicted {removed} entries")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate since startup, plus what the table holds"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        stats['enabled'] = self.enabled
+        if self.available():
+            persisted = self.execute_query("""
+                SELECT COUNT(*) AS entries,
+                       COALESCE(SUM(size_bytes), 0) AS bytes,
+                       COALESCE(SUM(hit_count), 0) AS hits
+                FROM llm_response_cache
+            """, fetch_one=True)
+            stats['persisted'] = dict(persisted)
+        return stats
@@ -16,7 +16,6 @@ import os
 import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-from openai import OpenAI
 
 DB_PATH = os.getenv("DATABASE_PATH", "database/bensley_master.db")
 
@@ -31,6 +30,7 @@ class MeetingBriefingService:
         """Initialize OpenAI client"""
         api_key = os.getenv("OPENAI_API_KEY")
         if api_key:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
 
     def _get_connection(self) -> sqlite3.Connection:
@@ -0,0 +1,421 @@
+"""
+Streaming MIME Parser
+
+Parses an RFC822 message fed in chunks without building the message tree.
+email.message_from_bytes keeps the whole payload, every part's encoded
+text and (via get_payload(decode=True)) a decoded copy of each attachment
+in memory at once - a 40 MB drawing set costs several times that in RSS.
+
+Here only headers and the text/plain + text/html bodies are kept in memory.
+Attachment parts are transfer-decoded as they arrive and written straight
+to a spool file while their SHA-256 is computed, so memory use is bounded
+by the chunk size no matter how large the message is. Callers dedupe and
+move spooled files by hash (see EmailImporter.save_attachments).
+
+Usage:
+    from backend.services.mime_stream import parse_bytes, parse_stream
+
+    with parse_stream(chunks, spool_dir='files/attachments/.spool') as parsed:
+        parsed.headers['Subject'], parsed.body
+        for att in parsed.attachments:
+            att.filename, att.sha256, att.size, att.path
+    # spool files not moved away by the caller are removed on exit
+"""
+
+import os
+import re
+import hashlib
+import binascii
+import logging
+import tempfile
+from dataclasses import dataclass, field
+from email.message import Message
+from email.parser import BytesHeaderParser
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+MAX_TEXT_BYTES = 10 * 1024 * 1024      # per text body; the rest is dropped
+MAX_HEADER_BYTES = 256 * 1024          # per header block
+
+
+def html_to_text(html: str) -> str:
+    """Crude HTML -> text for bodies that only have an HTML part"""
+    text = re.sub(r'<style[^>]*>.*?</style>', '', html, flags=re.DOTALL)
+    text = re.sub(r'<script[^>]*>.*?</script>', '', text, flags=re.DOTALL)
+    text = re.sub(r'<[^>]+>', ' ', text)
+    text = re.sub(r'&nbsp;', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+@dataclass
+class SpooledAttachment:
+    """An attachment part decoded to a spool file"""
+    filename: Optional[str]
+    mime_type: str
+    disposition: Optional[str]
+    content_id: Optional[str]
+    size: int
+    sha256: str
+    path: str
+
+
+@dataclass
+class ParsedEmail:
+    """Result of a streaming parse - top-level headers, text bodies, spooled parts"""
+    headers: Message
+    text: str = ''
+    html: str = ''
+    attachments: List[SpooledAttachment] = field(default_factory=list)
+    bytes_read: int = 0
+
+    @property
+    def body(self) -> str:
+        """Plain text body, falling back to the HTML body stripped of tags"""
+        if not self.text and self.html:
+            return html_to_text(self.html)
+        return self.text
+
+    def cleanup(self):
+        """Remove spool files the caller did not move away"""
+        for att in self.attachments:
+            try:
+                os.remove(att.path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+
+class _Sink:
+    """Receives the transfer-encoded bytes of one leaf part"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        self.size = 0
+        self._pending = b''
+
+    def write(self, data: bytes):
+        if self.encoding == 'base64':
+            data = self._pending + data.translate(None, b' \t\r\n')
+            cut = len(data) - len(data) % 4
+            self._pending = data[cut:]
+            data = self._decode_base64(data[:cut])
+        elif self.encoding == 'quoted-printable':
+            # Decode whole lines only so =XX escapes and soft breaks stay intact
+            data = self._pending + data
+            cut = data.rfind(b'\n') + 1
+            self._pending = data[cut:]
+            data = binascii.a2b_qp(data[:cut])
+        if data:
+            self.size += len(data)
+            self._emit(data)
+
+    def close(self):
+        if self._pending:
+            if self.encoding == 'base64':
+                data = self._decode_base64(self._pending + b'=' * (-len(self._pending) % 4))
+            else:
+                data = binascii.a2b_qp(self._pending)
+            self._pending = b''
+            if data:
+                self.size += len(data)
+                self._emit(data)
+
+    @staticmethod
+    def _decode_base64(data: bytes) -> bytes:
+        try:
+            return binascii.a2b_base64(data)
+        except binascii.Error:
+            return b''
+
+    def _emit(self, data: bytes):
+        pass
+
+
+class _TextSink(_Sink):
+    def __init__(self, encoding: str):
+        super().__init__(encoding)
+        self.buffer = bytearray()
+
+    def _emit(self, data: bytes):
+        room = MAX_TEXT_BYTES - len(self.buffer)
+        if room > 0:
+            self.buffer += data[:room]
+
+    def text(self) -> str:
+        return self.buffer.decode('utf-8', errors='ignore')
+
+
+class _SpoolSink(_Sink):
+    def __init__(self, encoding: str, spool_dir: Optional[str]):
+        super().__init__(encoding)
+        self.hash = hashlib.sha256()
+        self.file = tempfile.NamedTemporaryFile(dir=spool_dir, prefix='spool-', suffix='.part', delete=False)
+        self.path = self.file.name
+
+    def _emit(self, data: bytes):
+        self.hash.update(data)
+        self.file.write(data)
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+
+class StreamingMimeParser:
+    """
+    Incremental RFC822/MIME parser
+
+    feed() raw bytes in any chunking, then close() for the ParsedEmail.
+    Parts with Content-Disposition: attachment and a filename are spooled
+    when spool_attachments is set, otherwise decoded and dropped. Embedded
+    message/rfc822 parts are parsed in place, so attachments of forwarded
+    mail are found as msg.walk() would.
+    """
+
+    def __init__(self, spool_dir: Optional[str] = None, spool_attachments: bool = True):
+        if spool_dir and spool_attachments:
+            os.makedirs(spool_dir, exist_ok=True)
+        self.spool_dir = spool_dir
+        self.spool_attachments = spool_attachments
+
+        self._buf = bytearray()
+        self._in_headers = True
+        self._at_line_start = True
+        self._newline = b''             # line break held back - may belong to a boundary
+        self._boundaries: List[bytes] = []
+        self._sink: Optional[_Sink] = None
+        self._part: Optional[Message] = None
+        self._text: Optional[_TextSink] = None
+        self._html: Optional[_TextSink] = None
+        self._result: Optional[ParsedEmail] = None
+        self._spooled: List[SpooledAttachment] = []
+        self._open_spools: List[_SpoolSink] = []
+        self._bytes = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def feed(self, data: bytes):
+        self._bytes += len(data)
+        self._buf += data
+        self._process(final=False)
+
+    def close(self) -> ParsedEmail:
+        self._process(final=True)
+        if self._in_headers:
+            self._start_part(bytes(self._buf))
+            self._buf.clear()
+        self._end_part()
+
+        result = self._result
+        result.text = self._text.text() if self._text else ''
+        result.html = self._html.text() if self._html else ''
+        result.attachments = self._spooled
+        result.bytes_read = self._bytes
+        return result
+
+    def abort(self):
+        """Drop everything, removing any spool files written so far"""
+        for sink in self._open_spools:
+            sink.file.close()
+            try:
+                os.remove(sink.path)
+            except FileNotFoundError:
+                pass
+        self._open_spools = []
+        self._spooled = []
+
+    # ------------------------------------------------------------------
+    # State machine
+    # ------------------------------------------------------------------
+
+    def _process(self, final: bool):
+        buf = self._buf
+        pos = 0
+        while pos < len(buf):
+            if self._in_headers:
+                end = self._header_end(buf, pos)
+                if end is None:
+                    if len(buf) - pos <= MAX_HEADER_BYTES and not final:
+                        break
+                    end = len(buf)
+                self._start_part(bytes(buf[pos:end]))
+                pos = end
+                continue
+
+            if self._at_line_start and buf.startswith(b'--', pos) and self._boundaries:
+                eol = buf.find(b'\n', pos)
+                if eol < 0 and not final and len(buf) - pos < self._max_boundary_line():
+                    break
+                line_end = len(buf) if eol < 0 else eol + 1
+                if self._boundary_line(bytes(buf[pos:line_end])):
+                    pos = line_end
+                    continue
+
+            # Body data up to the next line that could be a boundary
+            nxt = buf.find(b'\n--', pos) if self._boundaries else -1
+            if nxt < 0:
+                if final or not self._boundaries:
+                    stop = len(buf)
+                else:
+                    stop = max(pos, len(buf) - 3)   # keep a possible "\r\n-" split
+                self._data(buf[pos:stop], held_newline=b'')
+                pos = stop
+                if not final:
+                    break
+                continue
+
+            brk = nxt - 1 if nxt > pos and buf[nxt - 1] == 0x0D else nxt
+            self._data(buf[pos:brk], held_newline=bytes(buf[brk:nxt + 1]))
+            pos = nxt + 1
+            self._at_line_start = True
+
+        del buf[:pos]
+
+    @staticmethod
+    def _header_end(buf: bytearray, pos: int) -> Optional[int]:
+        """Offset just past the blank line ending a header block"""
+        if buf.startswith(b'\r\n', pos):
+            return pos + 2
+        if buf.startswith(b'\n', pos):
+            return pos + 1
+        ends = [i for i in (buf.find(b'\n\r\n', pos), buf.find(b'\n\n', pos)) if i >= 0]
+        if not ends:
+            return None
+        i = min(ends)
+        return i + (3 if buf.startswith(b'\n\r\n', i) else 2)
+
+    def _max_boundary_line(self) -> int:
+        return max(len(b) for b in self._boundaries) + 8
+
+    def _data(self, data, held_newline: bytes):
+        """Body bytes: flush the previous held line break, hold the new one"""
+        if self._newline and (data or held_newline):
+            self._write(self._newline)
+        if data:
+            self._write(bytes(data))
+        if held_newline or data:
+            self._newline = held_newline
+
+    def _write(self, data: bytes):
+        if self._sink:
+            self._sink.write(data)
+        self._at_line_start = data.endswith(b'\n')
+
+    def _boundary_line(self, line: bytes) -> bool:
+        """Handle a '--boundary' line; False if it is ordinary body text"""
+        marker = line.rstrip()
+        for depth in range(len(self._boundaries) - 1, -1, -1):
+            boundary = self._boundaries[depth]
+            if marker == boundary:
+                closing = False
+            elif marker == boundary + b'--':
+                closing = True
+            else:
+                continue
+            # The line break before a delimiter belongs to the delimiter
+            self._newline = b''
+            self._end_part()
+            del self._boundaries[depth + 1:]
+            if closing:
+                self._boundaries.pop()
+                self._sink = None       # epilogue
+            else:
+                self._in_headers = True
+            self._at_line_start = True
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    # Parts
+    # ------------------------------------------------------------------
+
+    def _start_part(self, header_bytes: bytes):
+        part = BytesHeaderParser().parsebytes(header_bytes)
+        top_level = self._result is None
+        if top_level:
+            self._result = ParsedEmail(headers=part)
+
+        self._in_headers = False
+        self._at_line_start = True
+        self._newline = b''
+        self._part = part
+        self._sink = None
+
+        content_type = part.get_content_type()
+        encoding = str(part.get('Content-Transfer-Encoding', '7bit')).strip().lower()
+
+        if part.get_content_maintype() == 'multipart':
+            boundary = part.get_boundary()
+            if boundary:
+                self._boundaries.append(b'--' + boundary.encode('ascii', errors='ignore'))
+                return      # preamble is discarded
+        if content_type == 'message/rfc822' and encoding in ('7bit', '8bit', 'binary'):
+            self._in_headers = True
+            return
+
+        disposition = part.get_content_disposition()
+        filename = part.get_filename()
+
+        if disposition == 'attachment' and filename:
+            self._sink = _SpoolSink(encoding, self.spool_dir) if self.spool_attachments else _Sink(encoding)
+            if isinstance(self._sink, _SpoolSink):
+                self._open_spools.append(self._sink)
+        elif content_type == 'text/html' and not top_level:
+            if self._html is None:
+                self._sink = self._html = _TextSink(encoding)
+        elif content_type == 'text/plain' or top_level:
+            if self._text is None:
+                self._sink = self._text = _TextSink(encoding)
+            elif not self._text.buffer:
+                # An earlier text/plain part was empty - try this one
+                self._sink = self._text = _TextSink(encoding)
+
+    def _end_part(self):
+        sink, part = self._sink, self._part
+        self._sink = None
+        if sink is None:
+            return
+        sink.close()
+        if isinstance(sink, _SpoolSink):
+            self._open_spools.remove(sink)
+            self._spooled.append(SpooledAttachment(
+                filename=part.get_filename(),
+                mime_type=part.get_content_type(),
+                disposition=part.get_content_disposition(),
+                content_id=part.get('Content-ID'),
+                size=sink.size,
+                sha256=sink.hash.hexdigest(),
+                path=sink.path,
+            ))
+        elif sink is self._html and not sink.buffer:
+            self._html = None       # empty HTML part - let a later one fill in
+
+
+def parse_stream(chunks: Iterable[bytes], spool_dir: Optional[str] = None,
+                 spool_attachments: bool = True) -> ParsedEmail:
+    """Parse a message from an iterable of byte chunks"""
+    parser = StreamingMimeParser(spool_dir, spool_attachments)
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+        return parser.close()
+    except BaseException:
+        parser.abort()
+        raise
+
+
+def parse_bytes(raw: bytes, spool_dir: Optional[str] = None,
+                spool_attachments: bool = True, chunk_size: int = CHUNK_SIZE) -> ParsedEmail:
+    """Parse an in-memory message, feeding it in chunks (no full-tree copy)"""
+    view = memoryview(raw)
+    return parse_stream((view[i:i + chunk_size] for i in range(0, len(view), chunk_size)),
+                        spool_dir, spool_attachments)
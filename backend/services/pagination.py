@@ -0,0 +1,273 @@
+"""
+Pagination - keyset cursors and cached/estimated totals
+
+OFFSET pagination makes SQLite walk and discard every row before the page,
+and BaseService.paginate() also runs a COUNT(*) over the full query for
+every page. Here a page is read with a keyset instead. The query is ordered
+by (sort column, unique id), and the next page starts strictly after the
+last row's values. Deep pages then cost the same as the first one, as long
+as an index serves the order.
+
+Cursors are opaque tokens. They encode the last row's (sort value, id) and
+a scope naming the sort. A cursor from a different sort is rejected with
+ValueError instead of silently returning the wrong rows.
+
+Totals:
+    'exact'    COUNT(*) on every call
+    'cached'   exact COUNT(*), reused while the data_versions stamp of the
+               query's tables is unchanged (migrations 112/119). If any table
+               is untracked, it is reused for COUNT_CACHE_TTL_SECONDS instead.
+    'estimate' sqlite_stat1 row count of one table, for unfiltered lists.
+               Falls back to 'cached' if the table was never analyzed.
+
+Usage:
+    page = keyset_page(conn, sql, params, sort_column='date', id_column='email_id',
+                       cursor=request_cursor, per_page=50)
+    page['items'], page['has_more'], page['next_cursor']
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+COUNT_CACHE_SIZE = int(os.getenv('PAGINATION_COUNT_CACHE_SIZE', '512'))
+COUNT_CACHE_TTL_SECONDS = float(os.getenv('PAGINATION_COUNT_TTL_SECONDS', '60'))
+
+TOTAL_MODES = ('exact', 'cached', 'estimate')
+
+
+def encode_cursor(values: Sequence[Any], scope: str = '') -> str:
+    """Opaque cursor for the position just after a row with these key values"""
+    raw = json.dumps({'s': scope, 'v': list(values)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, scope: str = '', size: Optional[int] = None) -> List[Any]:
+    """
+    Key values from encode_cursor.
+
+    Raises:
+        ValueError: Malformed cursor, one from another scope (sort), or one
+                    with the wrong number of values
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_scope, values = payload['s'], payload['v']
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if cursor_scope != scope or not isinstance(values, list) or (size is not None and len(values) != size):
+        raise ValueError(f"Cursor does not match this listing: {cursor}")
+    return values
+
+
+def cursor_scope(sort_column: str, id_column: str, descending: bool) -> str:
+    return f"{sort_column},{id_column}:{'desc' if descending else 'asc'}"
+
+
+def _keyset_segments(sort_column: str, id_column: str, descending: bool,
+                     position: Optional[List[Any]]) -> List[Tuple[str, List[Any], str]]:
+    """
+    (where, params, order) per segment, read in order until a page is full.
+
+    NULLs sort first in SQLite, and a row-value comparison against NULL is
+    never true. So a nullable sort column is read as two segments: non-NULL
+    values by (sort, id), and NULL values by id. Each segment keeps a plain
+    row-value range that an index on the sort column can seek.
+    """
+    op = '<' if descending else '>'
+    direction = 'DESC' if descending else 'ASC'
+    by_value = (f"{sort_column} IS NOT NULL", f"{sort_column} {direction}, {id_column} {direction}")
+    by_id = (f"{sort_column} IS NULL", f"{id_column} {direction}")
+    segments = [by_value, by_id] if descending else [by_id, by_value]
+
+    if position is None:
+        return [(where, [], order) for where, order in segments]
+
+    value, last_id = position
+    current = 1 if (value is None) == descending else 0
+    where, order = segments[current]
+    if value is None:
+        first = (f"{where} AND {id_column} {op} ?", [last_id], order)
+    else:
+        first = (f"{where} AND ({sort_column}, {id_column}) {op} (?, ?)", [value, last_id], order)
+    return [first] + [(w, [], o) for w, o in segments[current + 1:]]
+
+
+def keyset_page(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Iterable[Any] = (),
+    sort_column: str = 'rowid',
+    id_column: str = 'rowid',
+    descending: bool = True,
+    cursor: Optional[str] = None,
+    per_page: int = 20,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """
+    One page of `sql` in (sort_column, id_column) order.
+
+    Args:
+        conn: Open connection with sqlite3.Row rows
+        sql: SELECT without ORDER BY/LIMIT. It is wrapped as a subquery, so
+             sort_column and id_column are names of its result columns.
+             SQLite flattens the wrapper, so indexes still serve the order.
+        params: Parameters for sql
+        sort_column: Result column to sort by (may be NULL)
+        id_column: Unique, non-NULL result column that breaks ties
+        descending: Newest/largest first
+        cursor: next_cursor of the previous page
+        per_page: Page size
+        offset: Rows to skip when there is no cursor, for clients still
+                sending page numbers or offsets. The result still carries
+                next_cursor.
+
+    Returns:
+        {'items', 'has_more', 'next_cursor'}
+
+    Raises:
+        ValueError: Malformed cursor, or one from a different sort
+    """
+    params = list(params)
+    single_key = sort_column == id_column
+    scope = cursor_scope(sort_column, id_column, descending)
+    position = None
+    if cursor:
+        values = decode_cursor(cursor, scope, 1 if single_key else 2)
+        position = [values[0], values[0]] if single_key else values
+
+    if single_key:
+        direction = 'DESC' if descending else 'ASC'
+        segments = [("1=1", [], f"{id_column} {direction}")]
+        if position:
+            segments = [(f"{id_column} {'<' if descending else '>'} ?", [position[1]], segments[0][2])]
+    else:
+        segments = _keyset_segments(sort_column, id_column, descending, position)
+
+    offset = 0 if cursor else offset
+    wanted = per_page + 1
+    rows: List[Any] = []
+    for where, where_params, order in segments:
+        if len(rows) >= wanted:
+            break
+        query = f"SELECT * FROM ({sql}) WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?"
+        batch = conn.execute(query, params + where_params + [wanted - len(rows), offset]).fetchall()
+        if offset:
+            if batch:
+                offset = 0
+            else:
+                # The OFFSET reaches past this segment into the next one
+                offset -= conn.execute(
+                    f"SELECT COUNT(*) FROM ({sql}) WHERE {where}", params + where_params
+                ).fetchone()[0]
+        rows.extend(batch)
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    items = [dict(row) for row in rows]
+
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        key = [last[id_column]] if single_key else [last[sort_column], last[id_column]]
+        next_cursor = encode_cursor(key, scope)
+    return {'items': items, 'has_more': has_more, 'next_cursor': next_cursor}
+
+
+# ----------------------------------------------------------------------
+# Totals
+# ----------------------------------------------------------------------
+
+_count_cache: 'OrderedDict[str, Tuple[int, Optional[str], float]]' = OrderedDict()
+_count_lock = threading.Lock()
+
+
+def _count_key(db_path: str, sql: str, params: Sequence[Any]) -> str:
+    raw = json.dumps([db_path, sql, list(params)], default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def clear_count_cache():
+    with _count_lock:
+        _count_cache.clear()
+
+
+def table_row_estimate(conn: sqlite3.Connection, table: str) -> Optional[int]:
+    """Row count recorded by the last ANALYZE, or None if never analyzed"""
+    try:
+        stat = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,)).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    if stat and stat[0]:
+        return int(stat[0].split()[0])
+    return None
+
+
+def count_total(
+    conn: sqlite3.Connection,
+    db_path: str,
+    sql: str,
+    params: Sequence[Any] = (),
+    mode: str = 'cached',
+    count_tables: Iterable[str] = (),
+    estimate_table: Optional[str] = None,
+) -> Tuple[int, bool]:
+    """
+    Total rows of `sql` according to `mode` (see module docstring).
+
+    Args:
+        count_tables: Tables the query reads - their data_versions stamp
+                      decides whether a cached count is still valid
+        estimate_table: Table whose sqlite_stat1 count stands in for the
+                        total in 'estimate' mode (the query must not filter it)
+
+    Returns:
+        (total, is_estimate)
+    """
+    if mode not in TOTAL_MODES:
+        raise ValueError(f"Invalid total mode: {mode}. Allowed: {', '.join(TOTAL_MODES)}")
+
+    if mode == 'estimate' and estimate_table:
+        estimate = table_row_estimate(conn, estimate_table)
+        if estimate is not None:
+            return estimate, True
+        mode = 'cached'
+
+    count_sql = f"SELECT COUNT(*) FROM ({sql})"
+    if mode == 'exact':
+        return conn.execute(count_sql, list(params)).fetchone()[0], False
+
+    stamp = None
+    count_tables = list(count_tables)
+    if count_tables:
+        from .data_version_service import get_data_version_service
+        stamp = get_data_version_service(db_path).stamp(count_tables)
+
+    key = _count_key(db_path, sql, params)
+    now = time.monotonic()
+    with _count_lock:
+        cached = _count_cache.get(key)
+        if cached is not None:
+            total, cached_stamp, stored_at = cached
+            fresh = (cached_stamp == stamp) if stamp is not None else (now - stored_at < COUNT_CACHE_TTL_SECONDS)
+            if fresh:
+                _count_cache.move_to_end(key)
+                return total, False
+
+    total = conn.execute(count_sql, list(params)).fetchone()[0]
+    with _count_lock:
+        _count_cache[key] = (total, stamp, now)
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return total, False
@@ -13,12 +13,17 @@ This replaces the overcomplicated context_aware_suggestion_service.
 
 import os
 import re
+import json
+import time
 import logging
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .base_service import BaseService
+from .keyword_matcher import KeywordMatcher
+from .usage_counters import get_usage_counters
 
 logger = logging.getLogger(__name__)
 
@@ -65,11 +70,25 @@ class PatternFirstLinker(BaseService):
     INT_FINANCE = 4  # Invoices, payments
     INT_HR = 5       # HR stuff
 
+    KEYWORD_PATTERN_TYPES = ["keyword_to_proposal", "keyword_to_project", "keyword_to_internal"]
+
+    # Pattern: YY BK-NNN (e.g., 24 BK-058, 25 BK-087)
+    # Can be in brackets [24 BK-058] or plain text
+    PROJECT_CODE_RE = re.compile(r'\b(2[0-5]\s*BK-\d{3})\b', re.IGNORECASE)
+
+    # Max ids per IN (...) clause in bulk mode
+    BULK_CHUNK_SIZE = 500
+
     def __init__(self, db_path: str = None):
         super().__init__(db_path)
         self._patterns_cache = None
         self._patterns_loaded_at = None
         self._cache_ttl_seconds = 300  # 5 min cache
+        # Keyword patterns compiled into one automaton; kept across reloads
+        # and synced with the pattern table instead of rebuilt
+        self._keyword_matcher = KeywordMatcher()
+        self._sent_linker = None
+        self._sender_columns_sql = None
 
     def _load_patterns(self, force_refresh: bool = False) -> Dict[str, Any]:
         """Load all active patterns from database, with caching"""
@@ -117,54 +136,94 @@ class PatternFirstLinker(BaseService):
 
         self._patterns_cache = patterns
         self._patterns_loaded_at = now
+        self._sync_keyword_matcher(patterns)
 
         logger.info(f"Loaded patterns: {sum(len(v) for v in patterns.values())} total")
         return patterns
 
-    def _check_thread_inheritance(self, email: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Check if other emails in this thread are already linked"""
+    # Joined link rows for a set of threads. Shared by the single-email and
+    # bulk paths so both count links the same way.
+    THREAD_LINKS_SQL = """
+        SELECT
+            e.thread_id,
+            e.email_id,
+            COALESCE(epl.proposal_id, eprl.project_id) as target_id,
+            CASE WHEN epl.proposal_id IS NOT NULL THEN 'proposal' ELSE 'project' END as target_type,
+            COALESCE(p.project_code, pr.project_code) as target_code,
+            COALESCE(p.project_name, pr.project_title) as target_name
+        FROM emails e
+        LEFT JOIN email_proposal_links epl ON e.email_id = epl.email_id
+        LEFT JOIN email_project_links eprl ON e.email_id = eprl.email_id
+        LEFT JOIN proposals p ON epl.proposal_id = p.proposal_id
+        LEFT JOIN projects pr ON eprl.project_id = pr.project_id
+        WHERE e.thread_id IN ({placeholders})
+        AND (epl.proposal_id IS NOT NULL OR eprl.project_id IS NOT NULL)
+    """
+
+    def _check_thread_inheritance(
+        self, email: Dict[str, Any], batch: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Check if other emails in this thread are already linked
+
+        Args:
+            email: Email row
+            batch: Prefetched context from _prefetch_batch_context (bulk mode);
+                   without it the thread is queried directly
+        """
         thread_id = email.get("thread_id")
         if not thread_id:
             return None
 
-        # Find existing links in this thread
-        links = self.execute_query("""
-            SELECT DISTINCT
-                COALESCE(epl.proposal_id, eprl.project_id) as target_id,
-                CASE WHEN epl.proposal_id IS NOT NULL THEN 'proposal' ELSE 'project' END as target_type,
-                COALESCE(p.project_code, pr.project_code) as target_code,
-                COALESCE(p.project_name, pr.project_title) as target_name,
-                COUNT(*) as link_count
-            FROM emails e
-            LEFT JOIN email_proposal_links epl ON e.email_id = epl.email_id
-            LEFT JOIN email_project_links eprl ON e.email_id = eprl.email_id
-            LEFT JOIN proposals p ON epl.proposal_id = p.proposal_id
-            LEFT JOIN projects pr ON eprl.project_id = pr.project_id
-            WHERE e.thread_id = ?
-            AND e.email_id != ?
-            AND (epl.proposal_id IS NOT NULL OR eprl.project_id IS NOT NULL)
-            GROUP BY target_id, target_type
-            ORDER BY link_count DESC
-            LIMIT 1
-        """, (thread_id, email.get("email_id")))
-
-        if links:
-            link = links[0]
-            return {
-                "match_type": "thread_inheritance",
-                "target_type": link["target_type"],
-                "target_id": link["target_id"],
-                "target_code": link["target_code"],
-                "target_name": link["target_name"],
-                "confidence": 0.95,
-                "reason": f"Thread already linked ({link['link_count']} emails)",
-            }
-        return None
+        if batch is not None:
+            rows = batch["thread_links"].get(thread_id, [])
+        else:
+            rows = self.execute_query(
+                self.THREAD_LINKS_SQL.format(placeholders="?"), (thread_id,)
+            )
+
+        # Most-linked target among the *other* emails in the thread
+        counts = Counter()
+        targets = {}
+        for row in rows:
+            if row["email_id"] == email.get("email_id"):
+                continue
+            key = (row["target_id"], row["target_type"])
+            counts[key] += 1
+            targets.setdefault(key, row)
+
+        if not counts:
+            return None
+
+        key, link_count = counts.most_common(1)[0]
+        link = targets[key]
+        return {
+            "match_type": "thread_inheritance",
+            "target_type": link["target_type"],
+            "target_id": link["target_id"],
+            "target_code": link["target_code"],
+            "target_name": link["target_name"],
+            "confidence": 0.95,
+            "reason": f"Thread already linked ({link_count} emails)",
+        }
+
+    @property
+    def _sender_columns(self) -> str:
+        """Extra SELECT columns for the normalized sender (migration 117), if present"""
+        if self._sender_columns_sql is None:
+            columns = {row["name"] for row in self.execute_query("PRAGMA table_info(emails)")}
+            self._sender_columns_sql = ", sender_address, sender_domain" if "sender_address" in columns else ""
+        return self._sender_columns_sql
+
+    def _sender(self, email: Dict[str, Any]) -> Tuple[str, str]:
+        """Sender address and domain - the stored columns when loaded, else parsed from sender_email"""
+        sender = email.get("sender_address") or extract_email_address(email.get("sender_email") or "")
+        domain = email.get("sender_domain") or (sender.split("@")[1] if "@" in sender else "")
+        return sender, domain
 
     def _check_sender_pattern(self, email: Dict[str, Any], patterns: Dict) -> Optional[Dict[str, Any]]:
         """Check if sender matches a known pattern"""
-        raw_sender = email.get("sender_email") or ""
-        sender = extract_email_address(raw_sender)
+        sender, _ = self._sender(email)
         if not sender:
             return None
 
@@ -186,13 +245,10 @@ class PatternFirstLinker(BaseService):
 
     def _check_domain_pattern(self, email: Dict[str, Any], patterns: Dict) -> Optional[Dict[str, Any]]:
         """Check if sender domain matches a known pattern"""
-        raw_sender = email.get("sender_email") or ""
-        sender = extract_email_address(raw_sender)
+        sender, domain = self._sender(email)
         if "@" not in sender:
             return None
 
-        domain = sender.split("@")[1]
-
         # Skip internal domains
         if domain in ["bensley.com", "bensleydesign.com", "bensley.co.th", "bensley.co.id"]:
             return None
@@ -212,90 +268,130 @@ class PatternFirstLinker(BaseService):
                 }
         return None
 
+    def _keyword_entries(self, patterns: Dict[str, Any]) -> Dict[str, List]:
+        """Keyword patterns as KeywordMatcher.sync() input"""
+        keywords: Dict[str, List] = {}
+        for rank, ptype in enumerate(self.KEYWORD_PATTERN_TYPES):
+            for order, (keyword, match) in enumerate(patterns.get(ptype, {}).items()):
+                # (rank, order) reproduces the old loop's priority:
+                # pattern type first, then confidence order within the type
+                keywords.setdefault(keyword, []).append(((rank, order, ptype, match), 1.0))
+        return keywords
+
+    def _sync_keyword_matcher(self, patterns: Dict[str, Any]):
+        """Apply keyword pattern changes to the compiled matcher"""
+        changes = self._keyword_matcher.sync(self._keyword_entries(patterns))
+        if any(changes.values()):
+            logger.debug(f"Keyword matcher synced: {changes}")
+
     def _check_keyword_pattern(self, email: Dict[str, Any], patterns: Dict) -> Optional[Dict[str, Any]]:
         """Check if subject/body contains known keywords"""
         subject = (email.get("subject") or "").lower()
         body = (email.get("body_full") or email.get("body") or "")[:1000].lower()
         text = f"{subject} {body}"
 
-        for ptype in ["keyword_to_proposal", "keyword_to_project", "keyword_to_internal"]:
-            for keyword, match in patterns.get(ptype, {}).items():
-                if keyword in text:
-                    return {
-                        "match_type": ptype,
-                        "pattern_id": match.get("pattern_id"),
-                        "target_type": match["target_type"],
-                        "target_id": match["target_id"],
-                        "target_code": match["target_code"],
-                        "target_name": match["target_name"],
-                        "confidence": match["confidence"],
-                        "reason": f"Keyword pattern: '{keyword}'",
-                    }
-        return None
+        if patterns is self._patterns_cache:
+            matcher = self._keyword_matcher
+        else:
+            # Not the cached patterns (e.g. loaded before a refresh): match
+            # them with a throwaway matcher, the shared one tracks the cache
+            matcher = KeywordMatcher()
+            matcher.sync(self._keyword_entries(patterns))
 
-    def _check_project_code_in_subject(self, email: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """
-        Check if email subject contains a project code like [24 BK-058] or 25 BK-087.
-        This is HIGH confidence because project codes are explicit identifiers.
-        """
-        subject = email.get("subject") or ""
+        hits = matcher.find_all(text)
+        if not hits:
+            return None
 
-        # Pattern: YY BK-NNN (e.g., 24 BK-058, 25 BK-087)
-        # Can be in brackets [24 BK-058] or plain text
-        pattern = r'\b(2[0-5]\s*BK-\d{3})\b'
-        matches = re.findall(pattern, subject, re.IGNORECASE)
+        best = min(hits, key=lambda hit: hit.payload[:2])
+        _, _, ptype, match = best.payload
+        return {
+            "match_type": ptype,
+            "pattern_id": match.get("pattern_id"),
+            "target_type": match["target_type"],
+            "target_id": match["target_id"],
+            "target_code": match["target_code"],
+            "target_name": match["target_name"],
+            "confidence": match["confidence"],
+            "reason": f"Keyword pattern: '{best.keyword}'",
+        }
 
+    def _extract_project_code(self, subject: str) -> Optional[str]:
+        """First project code in a subject, normalized (e.g. '24 BK-058')"""
+        matches = self.PROJECT_CODE_RE.findall(subject or "")
         if not matches:
             return None
-
         # Normalize the code (remove extra spaces)
-        code = re.sub(r'\s+', ' ', matches[0].upper())
+        return re.sub(r'\s+', ' ', matches[0].upper())
 
-        # First check proposals table
-        proposal = self.execute_query("""
-            SELECT proposal_id, project_code, project_name
-            FROM proposals WHERE project_code = ?
-        """, (code,), fetch_one=True)
+    def _lookup_project_codes(self, codes: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve project codes to link targets (proposals take precedence)
 
-        if proposal:
-            return {
-                "match_type": "project_code_in_subject",
-                "target_type": "proposal",
-                "target_id": proposal["proposal_id"],
-                "target_code": proposal["project_code"],
-                "target_name": proposal["project_name"],
-                "confidence": 0.98,  # Very high - explicit code
-                "reason": f"Project code in subject: {code}",
-            }
+        Returns:
+            {code: {target_type, target_id, target_code, target_name}}
+        """
+        targets = {}
+        for chunk in self._chunks(sorted(set(codes))):
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.execute_query(f"""
+                SELECT project_id, project_code, project_title as project_name
+                FROM projects WHERE project_code IN ({placeholders})
+            """, tuple(chunk)):
+                targets[row["project_code"]] = {
+                    "target_type": "project",
+                    "target_id": row["project_id"],
+                    "target_code": row["project_code"],
+                    "target_name": row["project_name"],
+                }
+            for row in self.execute_query(f"""
+                SELECT proposal_id, project_code, project_name
+                FROM proposals WHERE project_code IN ({placeholders})
+            """, tuple(chunk)):
+                targets[row["project_code"]] = {
+                    "target_type": "proposal",
+                    "target_id": row["proposal_id"],
+                    "target_code": row["project_code"],
+                    "target_name": row["project_name"],
+                }
+        return targets
 
-        # Then check projects table
-        project = self.execute_query("""
-            SELECT project_id, project_code, project_title as project_name
-            FROM projects WHERE project_code = ?
-        """, (code,), fetch_one=True)
+    def _check_project_code_in_subject(
+        self, email: Dict[str, Any], batch: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Check if email subject contains a project code like [24 BK-058] or 25 BK-087.
+        This is HIGH confidence because project codes are explicit identifiers.
 
-        if project:
-            return {
-                "match_type": "project_code_in_subject",
-                "target_type": "project",
-                "target_id": project["project_id"],
-                "target_code": project["project_code"],
-                "target_name": project["project_name"],
-                "confidence": 0.98,
-                "reason": f"Project code in subject: {code}",
-            }
+        Args:
+            email: Email row
+            batch: Prefetched context (bulk mode); without it the code is looked up directly
+        """
+        code = self._extract_project_code(email.get("subject"))
+        if not code:
+            return None
 
-        return None
+        if batch is not None:
+            target = batch["project_codes"].get(code)
+        else:
+            target = self._lookup_project_codes([code]).get(code)
+
+        if not target:
+            return None
+
+        return {
+            "match_type": "project_code_in_subject",
+            **target,
+            "confidence": 0.98,  # Very high - explicit code
+            "reason": f"Project code in subject: {code}",
+        }
 
     def _is_internal_email(self, email: Dict[str, Any]) -> bool:
         """Check if email is internal (Bensley to Bensley)"""
-        raw_sender = email.get("sender_email") or ""
-        sender = extract_email_address(raw_sender)
+        _, sender_domain = self._sender(email)
         recipients = (email.get("recipient_emails") or "").lower()
 
         internal_domains = ["bensley.com", "bensleydesign.com", "bensley.co.th", "bensley.co.id"]
 
-        sender_domain = sender.split("@")[1] if "@" in sender else ""
         sender_internal = sender_domain in internal_domains
 
         # If sender is internal, check if ALL recipients are also internal
@@ -313,10 +409,8 @@ class PatternFirstLinker(BaseService):
 
     def _is_spam_or_noise(self, email: Dict[str, Any]) -> Optional[str]:
         """Check if email is spam/noise that should be skipped"""
-        raw_sender = email.get("sender_email") or ""
-        sender = extract_email_address(raw_sender)
+        sender, domain = self._sender(email)
         subject = (email.get("subject") or "").lower()
-        domain = sender.split("@")[1] if "@" in sender else ""
 
         # Spam sender patterns (in email address)
         spam_senders = [
@@ -361,10 +455,15 @@ class PatternFirstLinker(BaseService):
 
         return None
 
-    def link_email(self, email: Dict[str, Any]) -> Dict[str, Any]:
+    def link_email(self, email: Dict[str, Any], batch: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Try to link a single email using pattern matching.
 
+        Args:
+            email: Email row
+            batch: Prefetched thread links / project codes from
+                   _prefetch_batch_context (bulk mode) - avoids per-email queries
+
         Returns:
             {
                 "linked": True/False,
@@ -396,9 +495,7 @@ class PatternFirstLinker(BaseService):
 
         # NEW: Check if this is a SENT email (from @bensley.com to external)
         # Use sent_email_linker to match via recipient instead of sender
-        raw_sender = email.get("sender_email") or ""
-        sender = extract_email_address(raw_sender)
-        sender_domain = sender.split("@")[1] if "@" in sender else ""
+        _, sender_domain = self._sender(email)
 
         if sender_domain in ["bensley.com", "bensleydesign.com", "bensley.co.th", "bensley.co.id"]:
             # Check if there are external recipients
@@ -411,9 +508,10 @@ class PatternFirstLinker(BaseService):
 
             if has_external:
                 # Use sent email linker for outbound emails
-                from .sent_email_linker import SentEmailLinker
-                sent_linker = SentEmailLinker(self.db_path)
-                sent_result = sent_linker.link_sent_email(email)
+                if self._sent_linker is None:
+                    from .sent_email_linker import SentEmailLinker
+                    self._sent_linker = SentEmailLinker(self.db_path)
+                sent_result = self._sent_linker.link_sent_email(email)
 
                 if sent_result.get("linked"):
                     return {
@@ -443,7 +541,7 @@ class PatternFirstLinker(BaseService):
         patterns = self._load_patterns()
 
         # Priority 1: Thread inheritance
-        match = self._check_thread_inheritance(email)
+        match = self._check_thread_inheritance(email, batch)
         if match:
             return {
                 "linked": True,
@@ -453,7 +551,7 @@ class PatternFirstLinker(BaseService):
             }
 
         # Priority 1.5: Project code in subject (e.g., [24 BK-058])
-        match = self._check_project_code_in_subject(email)
+        match = self._check_project_code_in_subject(email, batch)
         if match:
             return {
                 "linked": True,
@@ -518,8 +616,6 @@ class PatternFirstLinker(BaseService):
         creates a link_review suggestion so the link can be reviewed and
         provide feedback for pattern learning.
         """
-        import json
-
         try:
             # Flag links for review if pattern confidence is below threshold
             needs_review = 1 if pattern_id and confidence < 0.95 else 0
@@ -556,14 +652,8 @@ class PatternFirstLinker(BaseService):
 
             # Update pattern usage tracking if pattern was used
             if pattern_id:
-                self.execute_update("""
-                    UPDATE email_learned_patterns
-                    SET times_used = times_used + 1,
-                        last_used_at = datetime('now'),
-                        updated_at = datetime('now')
-                    WHERE pattern_id = ?
-                """, (pattern_id,))
-                logger.debug(f"Incremented times_used for pattern {pattern_id}")
+                get_usage_counters(self.db_path).record('email_learned_patterns', pattern_id)
+                logger.debug(f"Recorded use of pattern {pattern_id}")
 
                 # Create link_review suggestion for pattern feedback loop
                 # This allows human review to update times_correct/times_rejected
@@ -585,31 +675,9 @@ class PatternFirstLinker(BaseService):
                             f"existing suggestion {existing['suggestion_id']}"
                         )
                     else:
-                        suggested_data = {
-                            "email_id": email_id,
-                            "link_type": target_type,
-                            f"{target_type}_id": target_id,
-                            "project_code": target_code,
-                            "project_name": target_name,
-                            "pattern_matched": pattern_id,
-                            "match_type": match_type,
-                            "confidence": confidence,
-                        }
-                        self.execute_update("""
-                            INSERT INTO ai_suggestions
-                            (source_type, source_id, suggestion_type, title, description,
-                             suggested_data, confidence_score, project_code, proposal_id,
-                             status, created_at)
-                            VALUES ('email', ?, 'link_review', ?, ?,
-                                    ?, ?, ?, ?, 'pending', datetime('now'))
-                        """, (
-                            email_id,
-                            f"Review: {target_code or target_type + ' #' + str(target_id)}",
-                            f"Pattern match ({match_type}) needs review",
-                            json.dumps(suggested_data),
-                            confidence,
-                            target_code,
-                            target_id if target_type == "proposal" else None,
+                        self.execute_update(self.LINK_REVIEW_SQL, self._link_review_params(
+                            email_id, target_type, target_id, confidence, match_type,
+                            pattern_id, target_code, target_name,
                         ))
                         logger.debug(
                             f"Created link_review for email {email_id}, pattern {pattern_id}"
@@ -620,6 +688,39 @@ class PatternFirstLinker(BaseService):
             logger.error(f"Failed to apply link: {e}")
             return False
 
+    LINK_REVIEW_SQL = """
+        INSERT INTO ai_suggestions
+        (source_type, source_id, suggestion_type, title, description,
+         suggested_data, confidence_score, project_code, proposal_id,
+         status, created_at)
+        VALUES ('email', ?, 'link_review', ?, ?,
+                ?, ?, ?, ?, 'pending', datetime('now'))
+    """
+
+    def _link_review_params(self, email_id: int, target_type: str, target_id: int,
+                            confidence: float, match_type: str, pattern_id: int,
+                            target_code: str, target_name: str) -> Tuple:
+        """Parameters for LINK_REVIEW_SQL (pattern feedback loop suggestion)"""
+        suggested_data = {
+            "email_id": email_id,
+            "link_type": target_type,
+            f"{target_type}_id": target_id,
+            "project_code": target_code,
+            "project_name": target_name,
+            "pattern_matched": pattern_id,
+            "match_type": match_type,
+            "confidence": confidence,
+        }
+        return (
+            email_id,
+            f"Review: {target_code or target_type + ' #' + str(target_id)}",
+            f"Pattern match ({match_type}) needs review",
+            json.dumps(suggested_data),
+            confidence,
+            target_code,
+            target_id if target_type == "proposal" else None,
+        )
+
     def learn_from_correction(self, email_id: int, correct_target_type: str,
                               correct_target_id: int, correct_target_code: str,
                               correct_target_name: str) -> Dict[str, Any]:
@@ -670,27 +771,40 @@ class PatternFirstLinker(BaseService):
             "message": f"Learned: {sender} → {correct_target_code}",
         }
 
-    def process_batch(self, email_ids: List[int] = None, limit: int = 100) -> Dict[str, Any]:
+    def process_batch(self, email_ids: List[int] = None, limit: int = 100,
+                      bulk: bool = False) -> Dict[str, Any]:
         """
         Process a batch of emails with pattern-first approach.
 
+        Args:
+            email_ids: Specific emails to process (default: unlinked emails this year)
+            limit: Max emails when email_ids is not given
+            bulk: Set-based mode - thread links and subject codes are prefetched
+                  for the whole batch and all links are written in one
+                  transaction. Same decisions as the row-by-row mode.
+
         Returns stats on:
         - How many auto-linked (no GPT needed)
         - How many need GPT analysis
         - How many skipped (spam, internal)
+        - Per-stage timings in seconds (bulk mode)
         """
+        stage_start = time.perf_counter()
+
         # Get emails
         if email_ids:
-            placeholders = ",".join("?" * len(email_ids))
-            emails = self.execute_query(f"""
-                SELECT email_id, sender_email, recipient_emails, subject,
-                       body_full, body_preview as body, date, folder, thread_id
-                FROM emails WHERE email_id IN ({placeholders})
-            """, tuple(email_ids))
+            emails = []
+            for chunk in self._chunks(list(email_ids)):
+                placeholders = ",".join("?" * len(chunk))
+                emails.extend(self.execute_query(f"""
+                    SELECT email_id, sender_email, recipient_emails, subject,
+                           body_full, body_preview as body, date, folder, thread_id{self._sender_columns}
+                    FROM emails WHERE email_id IN ({placeholders})
+                """, tuple(chunk)))
         else:
-            emails = self.execute_query("""
+            emails = self.execute_query(f"""
                 SELECT email_id, sender_email, recipient_emails, subject,
-                       body_full, body_preview as body, date, folder, thread_id
+                       body_full, body_preview as body, date, folder, thread_id{self._sender_columns}
                 FROM emails e
                 WHERE NOT EXISTS (
                     SELECT 1 FROM email_proposal_links epl WHERE epl.email_id = e.email_id
@@ -712,6 +826,15 @@ class PatternFirstLinker(BaseService):
             "needs_gpt_ids": [],
         }
 
+        if bulk:
+            timings = {"fetch": time.perf_counter() - stage_start}
+            self._process_batch_bulk([dict(e) for e in emails], results, timings)
+            get_usage_counters(self.db_path).flush()
+            results["timings"] = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+            logger.info(f"Bulk pattern linking: {results['auto_linked']}/{results['total']} "
+                        f"linked, timings {results['timings']}")
+            return results
+
         for email in emails:
             result = self.link_email(dict(email))
 
@@ -738,8 +861,169 @@ class PatternFirstLinker(BaseService):
             elif result.get("method") == "skip_spam":
                 results["skipped_spam"] += 1
 
+        # Pattern usage is counted write-behind; apply it before reporting the batch
+        get_usage_counters(self.db_path).flush()
         return results
 
+    # ------------------------------------------------------------------
+    # Bulk mode
+    # ------------------------------------------------------------------
+
+    def _chunks(self, items: List[Any]) -> List[List[Any]]:
+        size = self.BULK_CHUNK_SIZE
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _prefetch_batch_context(self, emails: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Load everything link_email would query per email, for the whole batch
+
+        Returns:
+            {
+                "thread_links": {thread_id: [link rows]},   # one grouped query
+                "project_codes": {code: target},            # codes seen in subjects
+            }
+        """
+        thread_links: Dict[str, List[Dict[str, Any]]] = {}
+        thread_ids = sorted({e["thread_id"] for e in emails if e.get("thread_id")})
+        for chunk in self._chunks(thread_ids):
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.execute_query(
+                self.THREAD_LINKS_SQL.format(placeholders=placeholders), tuple(chunk)
+            ):
+                thread_links.setdefault(row["thread_id"], []).append(row)
+
+        codes = [self._extract_project_code(e.get("subject")) for e in emails]
+
+        return {
+            "thread_links": thread_links,
+            "project_codes": self._lookup_project_codes([c for c in codes if c]),
+        }
+
+    def _process_batch_bulk(self, emails: List[Dict[str, Any]], results: Dict[str, Any],
+                            timings: Dict[str, float]):
+        """Match the batch in memory, then write every link in one transaction"""
+        stage_start = time.perf_counter()
+        self._load_patterns()
+        batch = self._prefetch_batch_context(emails)
+        timings["prefetch"] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        links = []
+        for email in emails:
+            result = self.link_email(email, batch=batch)
+
+            if result.get("linked"):
+                results["auto_linked"] += 1
+                links.append(result)
+                # Row-by-row mode writes each link before the next email is
+                # matched, so later emails in the same thread inherit it
+                if email.get("thread_id") and result["target_type"] in ("proposal", "project"):
+                    batch["thread_links"].setdefault(email["thread_id"], []).append({
+                        "email_id": email["email_id"],
+                        "target_id": result["target_id"],
+                        "target_type": result["target_type"],
+                        "target_code": result.get("target_code"),
+                        "target_name": result.get("target_name"),
+                    })
+
+            elif result.get("method") == "needs_gpt":
+                results["needs_gpt"] += 1
+                results["needs_gpt_ids"].append(email["email_id"])
+
+            elif result.get("method") == "skip_spam":
+                results["skipped_spam"] += 1
+        timings["match"] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        results["links_applied"] = self.apply_links_bulk(links)
+        timings["write"] = time.perf_counter() - stage_start
+
+    def apply_links_bulk(self, links: List[Dict[str, Any]]) -> int:
+        """
+        Apply many link_email results in a single transaction
+
+        Same writes as apply_link (links, categories, pattern usage,
+        link_review suggestions), batched with executemany.
+
+        Returns:
+            Number of links applied (0 if the transaction failed)
+        """
+        if not links:
+            return 0
+
+        proposal_links, project_links, categories, reviews = [], [], [], []
+        pattern_usage = Counter()
+
+        # FIX #316 duplicate check, preloaded for the whole batch
+        existing = set()
+        email_ids = sorted({link["email_id"] for link in links})
+        for chunk in self._chunks(email_ids):
+            placeholders = ",".join("?" * len(chunk))
+            for row in self.execute_query(f"""
+                SELECT source_id, project_code FROM ai_suggestions
+                WHERE source_id IN ({placeholders})
+                AND suggestion_type IN ('link_review', 'email_link')
+                AND status = 'pending'
+            """, tuple(chunk)):
+                existing.add((row["source_id"], row["project_code"]))
+
+        for link in links:
+            email_id = link["email_id"]
+            target_type = link["target_type"]
+            target_id = link["target_id"]
+            confidence = link["confidence"]
+            pattern_id = link.get("pattern_id")
+            needs_review = 1 if pattern_id and confidence < 0.95 else 0
+
+            if target_type == "proposal":
+                proposal_links.append((email_id, target_id, confidence, link["match_type"], needs_review))
+                categories.append(("PROPOSAL", email_id))
+            elif target_type == "project":
+                project_links.append((email_id, target_id, confidence, link["match_type"], needs_review))
+                categories.append(("PROJECT", email_id))
+            elif target_type == "internal":
+                categories.append(("INTERNAL", email_id))
+
+            if pattern_id:
+                pattern_usage[pattern_id] += 1
+                key = (email_id, link.get("target_code"))
+                if needs_review and target_type in ("proposal", "project") and key not in existing:
+                    existing.add(key)
+                    reviews.append(self._link_review_params(
+                        email_id, target_type, target_id, confidence, link["match_type"],
+                        pattern_id, link.get("target_code"), link.get("target_name"),
+                    ))
+
+        try:
+            with self.get_write_connection() as conn:
+                conn.executemany("""
+                    INSERT OR IGNORE INTO email_proposal_links
+                    (email_id, proposal_id, confidence_score, match_method, created_at, needs_review)
+                    VALUES (?, ?, ?, ?, datetime('now'), ?)
+                """, proposal_links)
+                conn.executemany("""
+                    INSERT OR IGNORE INTO email_project_links
+                    (email_id, project_id, confidence, link_method, created_at, needs_review)
+                    VALUES (?, ?, ?, ?, datetime('now'), ?)
+                """, project_links)
+                conn.executemany("""
+                    UPDATE emails SET primary_category = ?
+                    WHERE email_id = ? AND (primary_category IS NULL OR primary_category = '')
+                """, categories)
+                conn.executemany(self.LINK_REVIEW_SQL, reviews)
+        except Exception as e:
+            logger.error(f"Failed to apply {len(links)} links in bulk: {e}")
+            return 0
+
+        # Pattern uses go through the same write-behind counters as apply_link
+        counters = get_usage_counters(self.db_path)
+        for pid, count in pattern_usage.items():
+            counters.record('email_learned_patterns', pid, count=count)
+
+        logger.debug(f"Bulk applied {len(links)} links, {len(reviews)} link_review suggestions, "
+                     f"{len(pattern_usage)} patterns used")
+        return len(links)
+
     def create_review_suggestions(self, email_ids: List[int],
                                    gpt_results: List[Dict[str, Any]]) -> int:
         """
@@ -747,7 +1031,6 @@ class PatternFirstLinker(BaseService):
         ONE queue - just uncertain links that need human review.
         NOW STORES FULL CONTEXT for the reviewer.
         """
-        import json
         suggestions_created = 0
 
         # Pre-load email data for context
@@ -19,6 +19,7 @@ import re
 from datetime import datetime
 from typing import Dict, List, Any, Optional, Set
 from .base_service import BaseService
+from .section_composer import Section, SectionComposer
 
 
 def _redact_path(path: Optional[str]) -> Optional[str]:
@@ -34,82 +35,122 @@ logger = logging.getLogger(__name__)
 class ProposalDetailStoryService(BaseService):
     """Generate detailed proposal story with timeline, threads, and action items."""
 
-    def get_story(self, project_code: str) -> Dict[str, Any]:
+    def __init__(self, db_path: Optional[str] = None):
+        super().__init__(db_path)
+        # The proposal row first, then its related data in parallel
+        self.sections = SectionComposer(self.db_path, [
+            Section("proposal", self._fetch_proposal, required=True, timeout=5),
+            Section("emails", self._fetch_emails, depends_on=("proposal",), timeout=10, ttl=60,
+                    tables=("emails", "email_proposal_links", "email_content"), default=[]),
+            Section("proposal_attachments", self._fetch_proposal_attachments, depends_on=("proposal",),
+                    timeout=10, ttl=30, default=[]),
+            Section("formal_documents", self._fetch_formal_documents, depends_on=("proposal",),
+                    timeout=5, ttl=30, default=[]),
+            Section("events", self._fetch_events, depends_on=("proposal",), timeout=5, ttl=30, default=[]),
+            Section("status_history", self._fetch_status_history, depends_on=("proposal",),
+                    timeout=5, ttl=30, default=[]),
+        ])
+
+    async def get_story(self, project_code: str) -> Dict[str, Any]:
         """
         Get the complete story/timeline of a proposal.
 
+        The proposal's emails, attachments, documents, events and status
+        history are fetched concurrently. One that fails or times out comes
+        back empty and is listed in meta.degraded.
+
         Args:
             project_code: The project code to fetch
 
         Returns:
-            Complete proposal story with timeline, threads, action items, etc.
+            Complete proposal story with timeline, threads, action items,
+            etc. and meta (per-section status and latency)
 
         Raises:
             ValueError: If proposal not found
+            SectionFailed: If the proposal itself could not be loaded
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-
-            # 1. Get full proposal details
-            proposal = self._get_proposal(cursor, project_code)
-            if not proposal:
-                raise ValueError(f"Proposal {project_code} not found")
-
-            proposal_id = proposal["proposal_id"]
-
-            # 2. Get all related data
-            all_emails = self._get_emails(cursor, proposal_id)
-            proposal_docs = self._get_proposal_attachments(cursor, proposal_id, project_code)
-            formal_docs = self._get_formal_documents(cursor, proposal_id, project_code)
-            events = self._get_events(cursor, proposal_id, project_code)
-            status_history = self._get_status_history(cursor, proposal_id, project_code)
-
-            # 3. Build derived data
-            timeline = self._build_timeline(
-                all_emails, proposal_docs, formal_docs, events, status_history
-            )
-            action_items = self._extract_action_items(proposal, all_emails)
-            threads = self._group_into_threads(all_emails)
-            current_status = self._calculate_current_status(proposal, all_emails)
-
-            # Security: Redact file paths from attachments/documents (#385)
-            def redact_doc_paths(docs: List[Dict]) -> List[Dict]:
-                """Redact filepath fields in document lists."""
-                redacted = []
-                for doc in docs:
-                    d = dict(doc)
-                    for path_field in ['filepath', 'file_path', 'local_path']:
-                        if path_field in d:
-                            d[path_field] = _redact_path(d.get(path_field))
-                    redacted.append(d)
-                return redacted
-
-            return {
-                "success": True,
-                "project_code": project_code,
-                "project_name": proposal.get("project_name"),
-                "client": {
-                    "name": proposal.get("contact_person"),
-                    "company": proposal.get("client_company"),
-                    "email": proposal.get("contact_email")
-                },
-                "value": proposal.get("project_value"),
-                "currency": proposal.get("currency") or "USD",
-                "remarks": proposal.get("remarks"),
-                "correspondence_summary": proposal.get("correspondence_summary"),
-                "internal_notes": proposal.get("internal_notes"),
-                "scope_summary": proposal.get("scope_summary"),
-                "num_proposals_sent": proposal.get("num_proposals_sent"),
-                "first_contact_date": proposal.get("first_contact_date"),
-                "proposal_sent_date": proposal.get("proposal_sent_date"),
-                "timeline": timeline,
-                "proposal_versions": redact_doc_paths(formal_docs),
-                "proposal_attachments": redact_doc_paths(proposal_docs),
-                "events": events,
-                "threads": threads,
-                "action_items": action_items,
-                "current_status": current_status
-            }
+        sections, meta = await self.sections.compose({"project_code": project_code})
+        proposal = sections["proposal"]
+        if not proposal:
+            raise ValueError(f"Proposal {project_code} not found")
+
+        # Copies: section results may be cached and shared between requests
+        all_emails = [dict(row) for row in sections["emails"]]
+        proposal_docs = [dict(row) for row in sections["proposal_attachments"]]
+        formal_docs = [dict(row) for row in sections["formal_documents"]]
+        events = [dict(row) for row in sections["events"]]
+        status_history = [dict(row) for row in sections["status_history"]]
+
+        # Build derived data
+        timeline = self._build_timeline(
+            all_emails, proposal_docs, formal_docs, events, status_history
+        )
+        action_items = self._extract_action_items(proposal, all_emails)
+        threads = self._group_into_threads(all_emails)
+        current_status = self._calculate_current_status(proposal, all_emails)
+
+        # Security: Redact file paths from attachments/documents (#385)
+        def redact_doc_paths(docs: List[Dict]) -> List[Dict]:
+            """Redact filepath fields in document lists."""
+            redacted = []
+            for doc in docs:
+                d = dict(doc)
+                for path_field in ['filepath', 'file_path', 'local_path']:
+                    if path_field in d:
+                        d[path_field] = _redact_path(d.get(path_field))
+                redacted.append(d)
+            return redacted
+
+        return {
+            "success": True,
+            "project_code": project_code,
+            "project_name": proposal.get("project_name"),
+            "client": {
+                "name": proposal.get("contact_person"),
+                "company": proposal.get("client_company"),
+                "email": proposal.get("contact_email")
+            },
+            "value": proposal.get("project_value"),
+            "currency": proposal.get("currency") or "USD",
+            "remarks": proposal.get("remarks"),
+            "correspondence_summary": proposal.get("correspondence_summary"),
+            "internal_notes": proposal.get("internal_notes"),
+            "scope_summary": proposal.get("scope_summary"),
+            "num_proposals_sent": proposal.get("num_proposals_sent"),
+            "first_contact_date": proposal.get("first_contact_date"),
+            "proposal_sent_date": proposal.get("proposal_sent_date"),
+            "timeline": timeline,
+            "proposal_versions": redact_doc_paths(formal_docs),
+            "proposal_attachments": redact_doc_paths(proposal_docs),
+            "events": events,
+            "threads": threads,
+            "action_items": action_items,
+            "current_status": current_status,
+            "meta": meta
+        }
+
+    # Section fetchers - each runs on its own pooled reader
+    def _fetch_proposal(self, conn, inputs: Dict[str, Any]) -> Optional[Dict]:
+        return self._get_proposal(conn.cursor(), inputs["project_code"])
+
+    def _fetch_emails(self, conn, inputs: Dict[str, Any]) -> List[Dict]:
+        return self._get_emails(conn.cursor(), inputs["proposal"]["proposal_id"])
+
+    def _fetch_proposal_attachments(self, conn, inputs: Dict[str, Any]) -> List[Dict]:
+        return self._get_proposal_attachments(conn.cursor(), inputs["proposal"]["proposal_id"],
+                                              inputs["project_code"])
+
+    def _fetch_formal_documents(self, conn, inputs: Dict[str, Any]) -> List[Dict]:
+        return self._get_formal_documents(conn.cursor(), inputs["proposal"]["proposal_id"],
+                                          inputs["project_code"])
+
+    def _fetch_events(self, conn, inputs: Dict[str, Any]) -> List[Dict]:
+        return self._get_events(conn.cursor(), inputs["proposal"]["proposal_id"], inputs["project_code"])
+
+    def _fetch_status_history(self, conn, inputs: Dict[str, Any]) -> List[Dict]:
+        return self._get_status_history(conn.cursor(), inputs["proposal"]["proposal_id"],
+                                        inputs["project_code"])
 
     def _table_exists(self, cursor, table_name: str) -> bool:
         """Check if a table exists in the current database."""
@@ -12,7 +12,6 @@ import os
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
-from openai import OpenAI
 
 from .base_service import BaseService
 
@@ -25,6 +24,7 @@ class ProposalIntelligenceService(BaseService):
         api_key = os.environ.get('OPENAI_API_KEY')
         self.ai_enabled = bool(api_key)
         if self.ai_enabled:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
 
     def get_proposal_context(self, project_code: str) -> Dict[str, Any]:
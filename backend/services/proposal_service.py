@@ -87,7 +87,8 @@ class ProposalService(BaseService):
         page: int = 1,
         per_page: int = 20,
         sort_by: str = 'health_score',
-        sort_order: str = 'ASC'
+        sort_order: str = 'ASC',
+        cursor: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Get all proposals with optional filtering and pagination
@@ -99,9 +100,10 @@ class ProposalService(BaseService):
             per_page: Results per page
             sort_by: Column to sort by
             sort_order: 'ASC' or 'DESC'
+            cursor: next_cursor of the previous page (keyset pagination)
 
         Returns:
-            Paginated results with proposals
+            Paginated results with proposals, 'has_more' and 'next_cursor'
         """
         sql = """
             SELECT
@@ -153,9 +155,16 @@ class ProposalService(BaseService):
         validated_sort_by = self.validate_sort_column(sort_by, allowed_columns)
         validated_sort_order = self.validate_sort_order(sort_order)
 
-        sql += f" ORDER BY {validated_sort_by} {validated_sort_order}"
-
-        result = self.paginate(sql, tuple(params), page, per_page)
+        result = self.paginate_keyset(
+            sql, tuple(params),
+            sort_column=validated_sort_by,
+            id_column='proposal_id',
+            descending=validated_sort_order == 'DESC',
+            cursor=cursor,
+            page=page,
+            per_page=per_page,
+            count_tables=['proposals'],
+        )
         result['items'] = self._enhance_proposals(result['items'])
         return result
 
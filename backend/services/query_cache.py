@@ -0,0 +1,357 @@
+"""
+Query Cache - two-level answer cache for natural-language queries
+
+Level 1 - question -> SQL. Keyed by the normalized question plus a variant
+('ai', or 'patterns:<hash>' for the learned-pattern hints that matched), so
+a new or retired pattern produces a new key. Held in an in-process LRU in
+front of query_sql_cache (migration 112), which survives restarts. Entries
+generated under a different PRAGMA schema_version are ignored.
+
+Level 2 - SQL -> results (and per-question summaries). In-process LRU keyed
+by the SQL text; an entry is valid while the data_versions stamp of the
+tables the SQL read is unchanged (and, for SQL using 'now'/CURRENT_DATE,
+on the same day) and it is younger than QUERY_RESULT_TTL_SECONDS. SQL
+reading a table without data_versions triggers is not result-cached.
+
+Every hit adds the LLM latency and cost it avoided to stats().
+
+Usage:
+    cache = QueryCache(db_path)
+    sql_result = cache.get_sql(question, 'ai')
+    if sql_result is None:
+        sql_result = generate(...)
+        cache.put_sql(question, 'ai', sql_result)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from .base_service import BaseService
+from .data_version_service import get_data_version_service
+
+logger = logging.getLogger(__name__)
+
+SQL_CACHE_SIZE = int(os.getenv('QUERY_SQL_CACHE_SIZE', '512'))
+SQL_CACHE_MAX_ROWS = int(os.getenv('QUERY_SQL_CACHE_MAX_ROWS', '5000'))
+RESULT_CACHE_SIZE = int(os.getenv('QUERY_RESULT_CACHE_SIZE', '256'))
+RESULT_TTL_SECONDS = float(os.getenv('QUERY_RESULT_TTL_SECONDS', '600'))
+
+PRUNE_EVERY_PUTS = 100
+MAX_SUMMARIES_PER_RESULT = 8
+
+_NON_WORD_RE = re.compile(r"[^\w\s\-./&']")
+_TIME_RELATIVE_RE = re.compile(r"'now'|\bcurrent_(date|time|timestamp)\b", re.I)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation (keeping project-code characters), collapse whitespace"""
+    text = _NON_WORD_RE.sub(' ', question.lower())
+    return ' '.join(text.split()).strip(" .'")
+
+
+def _sql_key(normalized: str, variant: str) -> str:
+    return hashlib.sha256(f"{variant}\x00{normalized}".encode('utf-8')).hexdigest()
+
+
+class QueryCache(BaseService):
+    """Question -> SQL and SQL -> result caches for QueryService"""
+
+    def __init__(self, db_path: Optional[str] = None, sql_cache_size: int = SQL_CACHE_SIZE,
+                 result_cache_size: int = RESULT_CACHE_SIZE, result_ttl: float = RESULT_TTL_SECONDS):
+        super().__init__(db_path)
+        self.sql_cache_size = sql_cache_size
+        self.result_cache_size = result_cache_size
+        self.result_ttl = result_ttl
+        self.versions = get_data_version_service(str(self.db_path))
+
+        self._lock = threading.Lock()
+        self._sql: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._results: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._table_available = False
+        self._puts = 0
+        self._stats = {
+            'sql_hits': 0,
+            'sql_persisted_hits': 0,
+            'sql_misses': 0,
+            'result_hits': 0,
+            'result_misses': 0,
+            'result_uncacheable': 0,
+            'summary_hits': 0,
+            'summary_misses': 0,
+            'saved_llm_calls': 0,
+            'saved_llm_ms': 0.0,
+            'saved_cost_usd': 0.0,
+            'saved_query_ms': 0.0,
+        }
+
+    def _bump(self, **amounts):
+        with self._lock:
+            for key, amount in amounts.items():
+                self._stats[key] += amount
+
+    def _saved_llm_call(self, latency_ms: float, cost_usd: float):
+        self._bump(saved_llm_calls=1, saved_llm_ms=latency_ms or 0.0, saved_cost_usd=cost_usd or 0.0)
+
+    def _schema_version(self) -> int:
+        return self.execute_query("PRAGMA schema_version", fetch_one=True)['schema_version']
+
+    def _persisted(self) -> bool:
+        if not self._table_available:
+            self._table_available = self.table_exists('query_sql_cache')
+        return self._table_available
+
+    # ------------------------------------------------------------------
+    # Level 1: question -> SQL
+    # ------------------------------------------------------------------
+
+    def get_sql(self, question: str, variant: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached SQL for a question.
+
+        Returns:
+            {'sql', 'reasoning', 'confidence', 'tables_used', 'patterns_used'}
+            or None on a miss
+        """
+        normalized = normalize_question(question)
+        key = _sql_key(normalized, variant)
+        schema_version = self._schema_version()
+
+        with self._lock:
+            entry = self._sql.get(key)
+            if entry is not None and entry['schema_version'] == schema_version:
+                self._sql.move_to_end(key)
+            else:
+                entry = None
+
+        persisted_hit = False
+        if entry is None and self._persisted():
+            row = self.execute_query(
+                "SELECT * FROM query_sql_cache WHERE cache_key = ? AND schema_version = ?",
+                [key, schema_version], fetch_one=True
+            )
+            if row:
+                entry = {
+                    'normalized': normalized,
+                    'sql': row['sql_text'],
+                    'reasoning': row['reasoning'],
+                    'confidence': row['confidence'],
+                    'tables_used': json.loads(row['tables_used'] or '[]'),
+                    'patterns_used': json.loads(row['patterns_used'] or '[]'),
+                    'generation_ms': row['generation_ms'],
+                    'generation_cost_usd': row['generation_cost_usd'],
+                    'schema_version': row['schema_version'],
+                }
+                self._remember_sql(key, entry)
+                persisted_hit = True
+
+        if entry is None:
+            self._bump(sql_misses=1)
+            return None
+
+        self._bump(sql_hits=1, sql_persisted_hits=int(persisted_hit))
+        self._saved_llm_call(entry['generation_ms'], entry['generation_cost_usd'])
+        if self._persisted():
+            with self.get_write_connection() as conn:
+                conn.execute("""
+                    UPDATE query_sql_cache SET hit_count = hit_count + 1, last_hit_at = datetime('now')
+                    WHERE cache_key = ?
+                """, (key,))
+        return {k: entry[k] for k in ('sql', 'reasoning', 'confidence', 'tables_used', 'patterns_used')}
+
+    def put_sql(self, question: str, variant: str, sql_result: Dict[str, Any]):
+        """Store generated SQL (sql_result from the generator, with generation_ms/cost if known)"""
+        if not sql_result or not sql_result.get('sql'):
+            return
+        normalized = normalize_question(question)
+        key = _sql_key(normalized, variant)
+        entry = {
+            'normalized': normalized,
+            'sql': sql_result['sql'],
+            'reasoning': sql_result.get('reasoning'),
+            'confidence': sql_result.get('confidence'),
+            'tables_used': sql_result.get('tables_used') or [],
+            'patterns_used': sql_result.get('patterns_used') or [],
+            'generation_ms': float(sql_result.get('generation_ms') or 0),
+            'generation_cost_usd': float(sql_result.get('generation_cost_usd') or 0),
+            'schema_version': self._schema_version(),
+        }
+        self._remember_sql(key, entry)
+        if not self._persisted():
+            return
+
+        with self.get_write_connection() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO query_sql_cache
+                    (cache_key, normalized_question, variant, sql_text, reasoning, confidence,
+                     tables_used, patterns_used, generation_ms, generation_cost_usd, schema_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (key, normalized, variant, entry['sql'], entry['reasoning'], entry['confidence'],
+                  json.dumps(entry['tables_used']), json.dumps(entry['patterns_used']),
+                  entry['generation_ms'], entry['generation_cost_usd'], entry['schema_version']))
+
+            self._puts += 1
+            if self._puts % PRUNE_EVERY_PUTS == 0:
+                conn.execute("""
+                    DELETE FROM query_sql_cache WHERE cache_key NOT IN (
+                        SELECT cache_key FROM query_sql_cache
+                        ORDER BY COALESCE(last_hit_at, created_at) DESC LIMIT ?
+                    )
+                """, (SQL_CACHE_MAX_ROWS,))
+
+    def _remember_sql(self, key: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._sql[key] = entry
+            self._sql.move_to_end(key)
+            while len(self._sql) > self.sql_cache_size:
+                self._sql.popitem(last=False)
+
+    def invalidate_question(self, question: str) -> int:
+        """Forget the SQL cached for a question (every variant), e.g. after negative feedback"""
+        normalized = normalize_question(question)
+        with self._lock:
+            keys = [k for k, e in self._sql.items() if e['normalized'] == normalized]
+            for key in keys:
+                del self._sql[key]
+        removed = len(keys)
+        if self._persisted():
+            with self.get_write_connection() as conn:
+                removed = conn.execute(
+                    "DELETE FROM query_sql_cache WHERE normalized_question = ?", (normalized,)
+                ).rowcount
+        return removed
+
+    def invalidate_sql(self, sql: str):
+        """Forget a SQL text at both levels (e.g. it stopped executing)"""
+        logger.info(f"Dropping cached SQL: {' '.join(sql.split())[:200]}")
+        with self._lock:
+            self._results.pop(sql, None)
+            for key in [k for k, e in self._sql.items() if e['sql'] == sql]:
+                del self._sql[key]
+        if self._persisted():
+            with self.get_write_connection() as conn:
+                conn.execute("DELETE FROM query_sql_cache WHERE sql_text = ?", (sql,))
+
+    # ------------------------------------------------------------------
+    # Level 2: SQL -> results
+    # ------------------------------------------------------------------
+
+    def _stamp(self, sql: str, tables: List[str]) -> Optional[str]:
+        stamp = self.versions.stamp(tables)
+        if stamp is not None and _TIME_RELATIVE_RE.search(sql):
+            stamp += f"|{date.today().isoformat()}"
+        return stamp
+
+    def _valid_result(self, sql: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._results.get(sql)
+        if entry is None:
+            return None
+        if (time.monotonic() - entry['stored_at'] > self.result_ttl
+                or self._stamp(sql, entry['tables']) != entry['stamp']):
+            with self._lock:
+                if self._results.get(sql) is entry:
+                    del self._results[sql]
+            return None
+        with self._lock:
+            if sql in self._results:
+                self._results.move_to_end(sql)
+        return entry
+
+    def get_results(self, sql: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached rows for a SQL text if none of the tables it reads changed"""
+        entry = self._valid_result(sql)
+        if entry is None:
+            self._bump(result_misses=1)
+            return None
+        self._bump(result_hits=1, saved_query_ms=entry['query_ms'])
+        return entry['rows']
+
+    def put_results(self, sql: str, rows: List[Dict[str, Any]], tables: List[str], query_ms: float = 0.0):
+        """Cache rows for a SQL text (skipped when a table has no data_versions triggers)"""
+        stamp = self._stamp(sql, tables)
+        if stamp is None:
+            self._bump(result_uncacheable=1)
+            return
+        entry = {
+            'rows': rows,
+            'tables': list(tables),
+            'stamp': stamp,
+            'stored_at': time.monotonic(),
+            'query_ms': query_ms,
+            'summaries': OrderedDict(),
+        }
+        with self._lock:
+            self._results[sql] = entry
+            self._results.move_to_end(sql)
+            while len(self._results) > self.result_cache_size:
+                self._results.popitem(last=False)
+
+    def get_summary(self, sql: str, question: str) -> Optional[str]:
+        """Summary generated earlier for this question over the same (still valid) results"""
+        entry = self._valid_result(sql)
+        summary = entry['summaries'].get(normalize_question(question)) if entry else None
+        if summary is None:
+            self._bump(summary_misses=1)
+            return None
+        self._bump(summary_hits=1)
+        self._saved_llm_call(summary['latency_ms'], summary['cost_usd'])
+        return summary['text']
+
+    def put_summary(self, sql: str, question: str, summary: str,
+                    latency_ms: float = 0.0, cost_usd: float = 0.0):
+        with self._lock:
+            entry = self._results.get(sql)
+            if entry is None:
+                return
+            summaries = entry['summaries']
+            summaries[normalize_question(question)] = {
+                'text': summary, 'latency_ms': latency_ms, 'cost_usd': cost_usd,
+            }
+            while len(summaries) > MAX_SUMMARIES_PER_RESULT:
+                summaries.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates and what the hits saved, since startup (plus persisted totals)"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['sql_entries_in_memory'] = len(self._sql)
+            stats['result_entries_in_memory'] = len(self._results)
+
+        def rate(hits, misses):
+            total = hits + misses
+            return round(hits / total, 3) if total else 0.0
+
+        stats['sql_hit_rate'] = rate(stats['sql_hits'], stats['sql_misses'])
+        stats['result_hit_rate'] = rate(stats['result_hits'], stats['result_misses'])
+        stats['summary_hit_rate'] = rate(stats['summary_hits'], stats['summary_misses'])
+        stats['saved_llm_ms'] = round(stats['saved_llm_ms'], 1)
+        stats['saved_query_ms'] = round(stats['saved_query_ms'], 1)
+        stats['saved_cost_usd'] = round(stats['saved_cost_usd'], 6)
+
+        if self._persisted():
+            persisted = self.execute_query("""
+                SELECT COUNT(*) AS entries,
+                       COALESCE(SUM(hit_count), 0) AS hits,
+                       COALESCE(SUM(hit_count * generation_ms), 0) AS saved_llm_ms,
+                       COALESCE(SUM(hit_count * generation_cost_usd), 0) AS saved_cost_usd
+                FROM query_sql_cache
+            """, fetch_one=True)
+            stats['persisted'] = {
+                'entries': persisted['entries'],
+                'hits': persisted['hits'],
+                'saved_llm_ms': round(persisted['saved_llm_ms'], 1),
+                'saved_cost_usd': round(persisted['saved_cost_usd'], 6),
+            }
+        return stats
@@ -0,0 +1,379 @@
+"""
+Query Governor - guarded execution of AI-generated SQL
+
+QueryService sends LLM-written SQL from /api/query/ask and /api/query/chat
+through here instead of execute_query():
+
+- Statement check: a single SELECT (or WITH ... SELECT), no write/DDL
+  keywords
+- Plan check: EXPLAIN QUERY PLAN must not do a full scan of a table with
+  QUERY_MAX_FULL_SCAN_ROWS+ rows, or of a QUERY_LARGE_TABLE_ROWS+ table on
+  the inner side of a join / inside a correlated subquery (rescanned for
+  every outer row - the emails x email_proposal_links cross join case)
+- Read-only URI connection (mode=ro, query_only)
+- Budget: a progress handler interrupts the statement after
+  QUERY_VM_STEP_BUDGET SQLite VM instructions or QUERY_TIME_BUDGET_SECONDS,
+  or when the request's QueryScope is cancelled (see async_db)
+- Rows: LIMIT is appended when the query has none and rows are fetched in
+  batches until QUERY_MAX_ROWS rows or QUERY_MAX_BYTES are collected
+
+Rejected, cancelled and truncated queries go to query_governor_log
+(migration 111) and the log, so the budgets can be tuned.
+
+Usage:
+    governor = QueryGovernor(db_path)
+    result = governor.execute(sql)      # raises QueryRejected / QueryCancelled
+    rows, truncated = result['rows'], result['truncated']
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base_service import BaseService
+from .connection_pool import current_scope
+
+logger = logging.getLogger(__name__)
+
+
+# Budgets (override via environment)
+MAX_ROWS = int(os.getenv('QUERY_MAX_ROWS', '1000'))
+MAX_BYTES = int(os.getenv('QUERY_MAX_BYTES', str(5 * 1024 * 1024)))
+VM_STEP_BUDGET = int(os.getenv('QUERY_VM_STEP_BUDGET', '200000000'))
+TIME_BUDGET_SECONDS = float(os.getenv('QUERY_TIME_BUDGET_SECONDS', '10'))
+LARGE_TABLE_ROWS = int(os.getenv('QUERY_LARGE_TABLE_ROWS', '20000'))
+MAX_FULL_SCAN_ROWS = int(os.getenv('QUERY_MAX_FULL_SCAN_ROWS', '1000000'))
+
+PROGRESS_OPS = 1000     # VM instructions between budget checks
+FETCH_BATCH = 200
+
+BLOCKED_KEYWORDS = ['drop', 'delete', 'insert', 'update', 'alter', 'create', 'truncate',
+                    'attach', 'detach', 'pragma', 'vacuum', 'reindex']
+
+_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_LIMIT_RE = re.compile(r'\blimit\s+\d+(\s*(,|offset)\s*\d+)?\s*$', re.I)
+_TABLE_REF_RE = re.compile(r'(?:\bfrom|\bjoin|,)\s+([A-Za-z_]\w*)(?:\s+(?:as\s+)?([A-Za-z_]\w*))?', re.I)
+_SCAN_RE = re.compile(r'^SCAN (\S+)')
+_NOT_ALIASES = {'where', 'on', 'using', 'join', 'left', 'right', 'inner', 'outer', 'cross',
+                'natural', 'group', 'order', 'limit', 'union', 'except', 'intersect', 'having',
+                'window', 'as'}
+
+
+class QueryRejected(ValueError):
+    """The governor refused to run a query"""
+
+    def __init__(self, message: str, plan: Optional[List[str]] = None):
+        super().__init__(message)
+        self.plan = plan
+
+
+class QueryCancelled(QueryRejected):
+    """A query was stopped after it exhausted its budget (or its request was cancelled)"""
+
+
+def _strip_comments(sql: str) -> str:
+    return _COMMENT_RE.sub(' ', sql)
+
+
+def estimate_table_rows(conn: sqlite3.Connection, table: str) -> int:
+    """Row estimate from sqlite_stat1 (ANALYZE), else MAX(rowid) - both O(1)-ish"""
+    try:
+        stat = conn.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1",
+                            (table,)).fetchone()
+        if stat and stat[0]:
+            return int(stat[0].split()[0])
+    except sqlite3.OperationalError:
+        pass  # never analyzed
+    try:
+        return conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        return 0  # WITHOUT ROWID
+
+
+def _value_size(value: Any) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return 8
+
+
+class QueryGovernor(BaseService):
+    """Runs untrusted SELECTs with a plan check, read-only connection and budgets"""
+
+    def __init__(self, db_path: Optional[str] = None, max_rows: int = MAX_ROWS,
+                 max_bytes: int = MAX_BYTES, vm_step_budget: int = VM_STEP_BUDGET,
+                 time_budget: float = TIME_BUDGET_SECONDS,
+                 large_table_rows: int = LARGE_TABLE_ROWS,
+                 max_full_scan_rows: int = MAX_FULL_SCAN_ROWS):
+        super().__init__(db_path)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.vm_step_budget = vm_step_budget
+        self.time_budget = time_budget
+        self.large_table_rows = large_table_rows
+        self.max_full_scan_rows = max_full_scan_rows
+
+        self._uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        self._log_available: Optional[bool] = None
+        self._lock = threading.Lock()
+        self._stats = {'executed': 0, 'rejected': 0, 'cancelled': 0, 'truncated': 0}
+
+    # ------------------------------------------------------------------
+    # Checks
+    # ------------------------------------------------------------------
+
+    def check_statement(self, sql: str) -> str:
+        """
+        Validate that sql is a single read-only SELECT.
+
+        Returns:
+            The statement without trailing semicolons
+
+        Raises:
+            QueryRejected
+        """
+        sql = sql.strip().rstrip(';').strip()
+        sql_lower = _strip_comments(sql).lower().strip()
+        if not sql_lower.startswith(('select', 'with')):
+            raise QueryRejected("Only SELECT queries are allowed")
+
+        # Word boundary avoids false positives like 'updated_at'
+        for keyword in BLOCKED_KEYWORDS:
+            if re.search(rf'\b{keyword}\b', sql_lower):
+                raise QueryRejected(f"Operation '{keyword}' is not allowed")
+        if ';' in sql_lower:
+            raise QueryRejected("Only one statement is allowed")
+        return sql
+
+    def with_limit(self, sql: str) -> str:
+        """Append LIMIT max_rows + 1 (so truncation is detectable) unless the query has one"""
+        if _LIMIT_RE.search(_strip_comments(sql).strip()):
+            return sql
+        return f"{sql}\nLIMIT {self.max_rows + 1}"
+
+    def check_plan(self, conn: sqlite3.Connection, sql: str) -> List[str]:
+        """
+        Reject plans that fully scan large tables.
+
+        Returns:
+            EXPLAIN QUERY PLAN details (for the log)
+
+        Raises:
+            QueryRejected
+        """
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+        nodes = {row[0]: (row[1], row[3]) for row in plan}
+        details = [row[3] for row in plan]
+
+        tables = {row[0].lower() for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        aliases = self._table_aliases(sql, tables)
+
+        for node_id, (_, detail) in nodes.items():
+            match = _SCAN_RE.match(detail)
+            if not match:
+                continue
+            name = match.group(1).lower()
+            table = aliases.get(name, name if name in tables else None)
+            if table is None:
+                continue  # CTE or subquery; its own scans are checked separately
+
+            rows = estimate_table_rows(conn, table)
+            if rows >= self.max_full_scan_rows:
+                raise QueryRejected(f"Query plan rejected: full scan of {table} (~{rows:,} rows)",
+                                    plan=details)
+            if rows >= self.large_table_rows and self._is_nested(nodes, node_id):
+                raise QueryRejected(
+                    f"Query plan rejected: full scan of {table} (~{rows:,} rows) repeated for every "
+                    f"row of an outer loop - join it on an indexed column", plan=details)
+        return details
+
+    @staticmethod
+    def _table_aliases(sql: str, tables: set) -> Dict[str, str]:
+        """alias -> table for table references in FROM/JOIN clauses"""
+        aliases = {}
+        for table, alias in _TABLE_REF_RE.findall(_strip_comments(sql)):
+            table = table.lower()
+            if table in tables and alias and alias.lower() not in _NOT_ALIASES:
+                aliases[alias.lower()] = table
+        return aliases
+
+    @staticmethod
+    def _is_nested(nodes: Dict[int, Tuple[int, str]], node_id: int) -> bool:
+        """True if the plan node runs once per row of an enclosing loop"""
+        while node_id in nodes:
+            parent, _ = nodes[node_id]
+            for other_id, (other_parent, detail) in nodes.items():
+                if (other_parent == parent and other_id < node_id
+                        and detail.startswith(('SCAN ', 'SEARCH '))
+                        and '(rowid=?)' not in detail):
+                    return True
+            if parent in nodes and nodes[parent][1].startswith('CORRELATED'):
+                return True
+            node_id = parent
+        return False
+
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, timeout=5)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def execute(self, sql: str) -> Dict[str, Any]:
+        """
+        Run an untrusted SELECT under the governor.
+
+        Returns:
+            {'rows': [dict], 'row_count': n, 'truncated': bool, 'vm_steps': n,
+             'elapsed_ms': ms, 'sql': statement actually run,
+             'tables': tables the statement reads}
+
+        Raises:
+            QueryRejected: statement or plan check failed
+            QueryCancelled: instruction/time budget exhausted or request cancelled
+            sqlite3.Error: the SQL itself is invalid
+        """
+        try:
+            sql = self.with_limit(self.check_statement(sql))
+        except QueryRejected as e:
+            self._record('rejected', str(e), sql)
+            raise
+
+        plan: List[str] = []
+        tables = set()
+        rows: List[Dict[str, Any]] = []
+        size = 0
+        steps = 0
+        reason = None
+        truncated = False
+        start = time.monotonic()
+
+        # The log is written only after the read-only connection (and its
+        # read lock) is gone
+        conn = self._connect()
+        try:
+            plan = self.check_plan(conn, sql)
+
+            scope = current_scope()
+            deadline = time.monotonic() + self.time_budget
+
+            def check_budget():
+                nonlocal steps, reason
+                steps += PROGRESS_OPS
+                if steps > self.vm_step_budget:
+                    reason = f"exceeded the instruction budget ({self.vm_step_budget:,} steps)"
+                elif time.monotonic() > deadline:
+                    reason = f"exceeded the time budget ({self.time_budget:g}s)"
+                elif scope is not None and scope.cancelled:
+                    reason = "request cancelled"
+                return 1 if reason else 0
+
+            def collect_tables(action, arg1, arg2, db_name, trigger):
+                if action == sqlite3.SQLITE_READ and arg1 and not arg1.startswith('sqlite_'):
+                    tables.add(arg1)
+                return sqlite3.SQLITE_OK
+
+            conn.set_progress_handler(check_budget, PROGRESS_OPS)
+            conn.set_authorizer(collect_tables)
+            cursor = conn.execute(sql)
+            conn.set_authorizer(None)
+            try:
+                while not truncated:
+                    batch = cursor.fetchmany(FETCH_BATCH)
+                    if not batch:
+                        break
+                    for row in batch:
+                        if len(rows) >= self.max_rows or size >= self.max_bytes:
+                            truncated = True
+                            break
+                        size += sum(_value_size(value) for value in row)
+                        rows.append(dict(row))
+            finally:
+                cursor.close()
+        except QueryRejected as e:
+            conn.close()
+            self._record('rejected', str(e), sql, plan=e.plan)
+            raise
+        except sqlite3.OperationalError as e:
+            conn.close()
+            if reason is None:
+                raise
+            self._record('cancelled', reason, sql, plan, steps,
+                         (time.monotonic() - start) * 1000, len(rows))
+            raise QueryCancelled(f"Query stopped: {reason}") from e
+        conn.close()
+
+        elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+        if truncated:
+            self._record('truncated', f"capped at {len(rows)} rows / {size:,} bytes",
+                         sql, plan, steps, elapsed_ms, len(rows))
+        self._bump('executed')
+        return {
+            'rows': rows,
+            'row_count': len(rows),
+            'truncated': truncated,
+            'vm_steps': steps,
+            'elapsed_ms': elapsed_ms,
+            'sql': sql,
+            'tables': sorted(tables),
+        }
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def _bump(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _record(self, outcome: str, reason: str, sql: str, plan: Optional[List[str]] = None,
+                steps: Optional[int] = None, elapsed_ms: Optional[float] = None,
+                rows: Optional[int] = None):
+        self._bump(outcome)
+        logger.warning(f"Query governor {outcome}: {reason} | {' '.join(sql.split())[:300]}")
+
+        if self._log_available is False:
+            return
+        # Through the writer: reader checkouts fail once the request's scope is cancelled
+        try:
+            with self.get_write_connection() as conn:
+                if self._log_available is None:
+                    self._log_available = self._has_table(conn, 'query_governor_log')
+                    if not self._log_available:
+                        return
+                conn.execute("""
+                    INSERT INTO query_governor_log
+                        (outcome, reason, sql_text, plan, vm_steps, elapsed_ms, rows_returned)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (outcome, reason, sql, '\n'.join(plan) if plan else None, steps,
+                      round(elapsed_ms, 1) if elapsed_ms is not None else None, rows))
+        except sqlite3.Error as e:
+            logger.error(f"Could not record governed query: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since startup plus the configured budgets"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['budgets'] = {
+            'max_rows': self.max_rows,
+            'max_bytes': self.max_bytes,
+            'vm_step_budget': self.vm_step_budget,
+            'time_budget_seconds': self.time_budget,
+            'large_table_rows': self.large_table_rows,
+            'max_full_scan_rows': self.max_full_scan_rows,
+        }
+        return stats
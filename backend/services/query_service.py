@@ -9,10 +9,11 @@ import sys
 import os
 import re
 import json
+import time
+import hashlib
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from openai import OpenAI
 
 # Add scripts/core to path to import query_brain
 project_root = Path(__file__).parent.parent.parent
@@ -21,6 +22,25 @@ sys.path.insert(0, str(scripts_core_path))
 
 from query_brain import QueryBrain
 from .base_service import BaseService
+from .email_participants import participant_condition
+from .query_cache import QueryCache
+from .query_governor import QueryGovernor
+from .schema_context import SchemaContextBuilder
+from .search_service import SearchService
+
+# USD per 1M tokens (input, output), for the cache's saved-cost figures
+LLM_PRICING_PER_M = {
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+}
+
+
+def _llm_cost(model: str, usage) -> float:
+    """Cost of one completion from its usage block (0 if unknown)"""
+    if usage is None or model not in LLM_PRICING_PER_M:
+        return 0.0
+    input_price, output_price = LLM_PRICING_PER_M[model]
+    return (usage.prompt_tokens * input_price + usage.completion_tokens * output_price) / 1_000_000
 
 
 class QueryService(BaseService):
@@ -29,42 +49,46 @@ class QueryService(BaseService):
     def __init__(self, db_path: str = None):
         super().__init__(db_path)
         self.query_brain = QueryBrain(str(self.db_path))
+        self.governor = QueryGovernor(str(self.db_path))
+        self.cache = QueryCache(str(self.db_path))
+        self.schema_context = SchemaContextBuilder(str(self.db_path))
 
         # Initialize OpenAI if available
         api_key = os.environ.get('OPENAI_API_KEY')
         self.ai_enabled = bool(api_key)
         if self.ai_enabled:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
-            self._schema_cache = None  # Lazy load schema when needed
         else:
             self.client = None
-            self._schema_cache = None
-
-    def _get_schema(self) -> str:
-        """Get database schema for AI context (with caching)"""
-        # Return cached schema if available
-        if self._schema_cache is not None:
-            return self._schema_cache
-
-        # Load schema from database using context manager
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT sql FROM sqlite_master
-                WHERE type='table' AND name NOT LIKE 'sqlite_%'
-                ORDER BY name
-            """)
-
-            tables = cursor.fetchall()
-            schema_text = "DATABASE SCHEMA:\n\n"
-
-            for table in tables:
-                if table['sql']:
-                    schema_text += table['sql'] + "\n\n"
 
-        # Cache for future use
-        self._schema_cache = schema_text
-        return schema_text
+    def _get_schema(self, question: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Schema context for a SQL prompt: only the tables relevant to the
+        question (plus their join partners), within the schema token budget.
+        Returns SchemaContextBuilder.build() output - the prompt text is ['text'].
+        """
+        return self.schema_context.build(question)
+
+    @staticmethod
+    def _prompt_stats(response, schema: Dict[str, Any], latency_ms: float) -> Dict[str, Any]:
+        """Per-query prompt size, so schema trimming can be checked against real usage"""
+        usage = getattr(response, 'usage', None)
+        return {
+            'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+            'completion_tokens': getattr(usage, 'completion_tokens', None),
+            'schema_tables': schema['tables'],
+            'schema_tokens': schema['tokens'],
+            'full_schema_tokens': schema['full_tokens'],
+            'generation_ms': round(latency_ms, 1),
+        }
+
+    def _timed_completion(self, **kwargs):
+        """chat.completions.create plus (latency_ms, cost_usd) for cache accounting"""
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(**kwargs)
+        latency_ms = (time.perf_counter() - start) * 1000
+        return response, latency_ms, _llm_cost(kwargs.get('model'), getattr(response, 'usage', None))
 
     def _get_financial_query_hints(self, question: str) -> str:
         """Get specialized hints for financial/invoice/payment questions"""
@@ -532,8 +556,11 @@ IMPORTANT:
     def _query_with_ai(self, question: str) -> Dict[str, Any]:
         """Execute query using GPT-4o to generate SQL"""
         try:
-            # Generate SQL with AI
-            sql_result = self._generate_sql_with_ai(question)
+            # Same question asked before -> reuse its SQL
+            sql_result = self.cache.get_sql(question, 'ai')
+            cached_sql = sql_result is not None
+            if not cached_sql:
+                sql_result = self._generate_sql_with_ai(question)
 
             if not sql_result or not sql_result.get('sql'):
                 return {
@@ -546,10 +573,17 @@ IMPORTANT:
             sql = sql_result['sql']
 
             # Execute the query safely
-            results = self._execute_safe_query(sql)
+            try:
+                results = self._execute_safe_query(sql)
+            except Exception:
+                if cached_sql:
+                    self.cache.invalidate_sql(sql)
+                raise
+            if not cached_sql:
+                self.cache.put_sql(question, 'ai', sql_result)
 
             # Generate natural language summary
-            summary = self._generate_summary(question, results)
+            summary = self._cached_summary(question, sql, results)
 
             # Log for training data
             self._log_successful_query(
@@ -570,6 +604,8 @@ IMPORTANT:
                 'summary': summary,
                 'reasoning': sql_result.get('reasoning'),
                 'confidence': sql_result.get('confidence'),
+                'cached_sql': cached_sql,
+                'prompt': None if cached_sql else sql_result.get('prompt'),
                 'method': 'ai'
             }
 
@@ -602,7 +638,7 @@ IMPORTANT:
             results = self._execute_safe_query(sql)
 
             # Generate natural language summary with context
-            summary = self._generate_summary(question, results)
+            summary = self._cached_summary(question, sql, results)
 
             # Log for training data
             self._log_successful_query(
@@ -623,6 +659,7 @@ IMPORTANT:
                 'summary': summary,
                 'reasoning': sql_result.get('reasoning'),
                 'confidence': sql_result.get('confidence'),
+                'prompt': sql_result.get('prompt'),
                 'method': 'ai_with_context'
             }
 
@@ -638,12 +675,12 @@ IMPORTANT:
     def _generate_sql_with_context(self, question: str, conversation_context: str) -> Optional[Dict[str, Any]]:
         """Use GPT-4o to generate SQL query using conversation context"""
 
-        # Get schema (lazy loaded and cached)
-        schema = self._get_schema()
+        # Follow-ups ("what about their invoices?") name tables only in the history
+        schema = self._get_schema(f"{conversation_context}\n{question}")
 
         prompt = f"""You are a SQL expert for a design firm's operations database.
 
-{schema}
+{schema['text']}
 
 CONVERSATION HISTORY:
 {conversation_context}
@@ -680,7 +717,7 @@ If the question is unclear or cannot be answered with available data, set sql to
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response, latency_ms, cost_usd = self._timed_completion(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a SQL expert that generates safe, efficient queries. You excel at understanding follow-up questions using conversation context."},
@@ -691,6 +728,9 @@ If the question is unclear or cannot be answered with available data, set sql to
             )
 
             result = json.loads(response.choices[0].message.content)
+            result['generation_ms'] = latency_ms
+            result['generation_cost_usd'] = cost_usd
+            result['prompt'] = self._prompt_stats(response, schema, latency_ms)
             return result
 
         except Exception as e:
@@ -728,15 +768,15 @@ If the question is unclear or cannot be answered with available data, set sql to
     def _generate_sql_with_ai(self, question: str) -> Optional[Dict[str, Any]]:
         """Use GPT-4o to generate SQL query from natural language"""
 
-        # Get schema (lazy loaded and cached)
-        schema = self._get_schema()
+        # Only the tables this question needs
+        schema = self._get_schema(question)
 
         # Get financial query hints if this looks like a financial question
         financial_hints = self._get_financial_query_hints(question)
 
         prompt = f"""You are a SQL expert for a design firm's operations database.
 
-{schema}
+{schema['text']}
 
 IMPORTANT RULES:
 1. ONLY use SELECT queries - no INSERT, UPDATE, DELETE, DROP
@@ -764,7 +804,7 @@ If the question is unclear or cannot be answered with available data, set sql to
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response, latency_ms, cost_usd = self._timed_completion(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a SQL expert that generates safe, efficient queries for a design firm's database."},
@@ -775,6 +815,9 @@ If the question is unclear or cannot be answered with available data, set sql to
             )
 
             result = json.loads(response.choices[0].message.content)
+            result['generation_ms'] = latency_ms
+            result['generation_cost_usd'] = cost_usd
+            result['prompt'] = self._prompt_stats(response, schema, latency_ms)
             return result
 
         except Exception as e:
@@ -782,27 +825,40 @@ If the question is unclear or cannot be answered with available data, set sql to
             return None
 
     def _execute_safe_query(self, sql: str) -> List[Dict[str, Any]]:
-        """Execute SQL query safely (SELECT only)"""
-
-        # Security check: only allow SELECT queries
-        sql_lower = sql.lower().strip()
-        if not sql_lower.startswith('select'):
-            raise ValueError("Only SELECT queries are allowed")
+        """
+        Execute AI-generated SQL under the query governor (SELECT only,
+        read-only connection, plan check, instruction budget, row cap).
 
-        # Block dangerous operations (use word boundary to avoid false positives like 'updated_at')
-        dangerous_keywords = ['drop', 'delete', 'insert', 'update', 'alter', 'create', 'truncate']
-        for keyword in dangerous_keywords:
-            if re.search(rf'\b{keyword}\b', sql_lower):
-                raise ValueError(f"Operation '{keyword}' is not allowed")
+        Results are served from the query cache while the tables the SQL
+        reads are unchanged.
 
-        # Execute query
-        return self.execute_query(sql, [])
+        Raises:
+            QueryRejected / QueryCancelled (both ValueError subclasses)
+        """
+        rows = self.cache.get_results(sql)
+        if rows is None:
+            result = self.governor.execute(sql)
+            rows = result['rows']
+            self.cache.put_results(sql, rows, result['tables'], result['elapsed_ms'])
+        return rows
 
     def _generate_summary(self, question: str, results: List[Dict]) -> str:
         """Generate natural language summary of results"""
+        return self._summarize(question, results)[0]
+
+    def _cached_summary(self, question: str, sql: str, results: List[Dict]) -> str:
+        """Summary for (question, results), reused while the cached results are valid"""
+        summary = self.cache.get_summary(sql, question)
+        if summary is None:
+            summary, latency_ms, cost_usd = self._summarize(question, results)
+            self.cache.put_summary(sql, question, summary, latency_ms, cost_usd)
+        return summary
+
+    def _summarize(self, question: str, results: List[Dict]):
+        """Summary text plus (latency_ms, cost_usd) of the LLM call"""
 
         if not results:
-            return "No results found."
+            return "No results found.", 0.0, 0.0
 
         # For small result sets, generate detailed summary
         if len(results) <= 5:
@@ -822,7 +878,7 @@ Found {len(results)} results. First 3:
 Provide a concise natural language summary in 1-2 sentences."""
 
         try:
-            response = self.client.chat.completions.create(
+            response, latency_ms, cost_usd = self._timed_completion(
                 model="gpt-4o-mini",  # Cheaper model for simple task
                 messages=[
                     {"role": "system", "content": "You summarize database query results in clear, concise language."},
@@ -832,10 +888,10 @@ Provide a concise natural language summary in 1-2 sentences."""
                 max_tokens=100
             )
 
-            return response.choices[0].message.content.strip()
+            return response.choices[0].message.content.strip(), latency_ms, cost_usd
 
         except Exception:
-            return f"Found {len(results)} results."
+            return f"Found {len(results)} results.", 0.0, 0.0
 
     def get_query_suggestions(self) -> List[str]:
         """Get example query suggestions for users"""
@@ -1001,8 +1057,13 @@ Provide a concise natural language summary in 1-2 sentences."""
             # Get pattern-based hints
             pattern_hints = self._get_query_hints_from_patterns(question)
 
-            # Generate enhanced SQL
-            sql_result = self._generate_sql_with_patterns(question, pattern_hints)
+            # Cached per set of matching hints, so new corrections get new SQL
+            variant = 'patterns:' + hashlib.sha256(pattern_hints.encode('utf-8')).hexdigest()[:16]
+            sql_result = self.cache.get_sql(question, variant)
+            cached_sql = sql_result is not None
+            if not cached_sql:
+                # Generate enhanced SQL
+                sql_result = self._generate_sql_with_patterns(question, pattern_hints)
 
             if not sql_result or not sql_result.get('sql'):
                 return {
@@ -1014,8 +1075,15 @@ Provide a concise natural language summary in 1-2 sentences."""
                 }
 
             sql = sql_result['sql']
-            results = self._execute_safe_query(sql)
-            summary = self._generate_summary(question, results)
+            try:
+                results = self._execute_safe_query(sql)
+            except Exception:
+                if cached_sql:
+                    self.cache.invalidate_sql(sql)
+                raise
+            if not cached_sql:
+                self.cache.put_sql(question, variant, sql_result)
+            summary = self._cached_summary(question, sql, results)
 
             # Log for training data
             self._log_successful_query(
@@ -1037,6 +1105,8 @@ Provide a concise natural language summary in 1-2 sentences."""
                 'reasoning': sql_result.get('reasoning'),
                 'confidence': sql_result.get('confidence'),
                 'patterns_used': sql_result.get('patterns_used', []),
+                'cached_sql': cached_sql,
+                'prompt': None if cached_sql else sql_result.get('prompt'),
                 'method': 'pattern_enhanced'
             }
 
@@ -1051,11 +1121,11 @@ Provide a concise natural language summary in 1-2 sentences."""
 
     def _generate_sql_with_patterns(self, question: str, pattern_hints: str) -> Optional[Dict[str, Any]]:
         """Generate SQL using AI with pattern-based enhancements"""
-        schema = self._get_schema()
+        schema = self._get_schema(question)
 
         prompt = f"""You are a SQL expert for a design firm's operations database.
 
-{schema}
+{schema['text']}
 
 {pattern_hints}
 
@@ -1085,7 +1155,7 @@ If the question is unclear or cannot be answered with available data, set sql to
 """
 
         try:
-            response = self.client.chat.completions.create(
+            response, latency_ms, cost_usd = self._timed_completion(
                 model="gpt-4o",
                 messages=[
                     {"role": "system", "content": "You are a SQL expert that learns from previous corrections."},
@@ -1096,6 +1166,9 @@ If the question is unclear or cannot be answered with available data, set sql to
             )
 
             result = json.loads(response.choices[0].message.content)
+            result['generation_ms'] = latency_ms
+            result['generation_cost_usd'] = cost_usd
+            result['prompt'] = self._prompt_stats(response, schema, latency_ms)
             return result
 
         except Exception as e:
@@ -1147,11 +1220,15 @@ If the question is unclear or cannot be answered with available data, set sql to
 
                 conn.commit()
 
-                return {
-                    'success': True,
-                    'feedback_id': feedback_id,
-                    'message': 'Feedback recorded for learning'
-                }
+            # Wrong answers must not be served from the cache again
+            if not was_correct:
+                self.cache.invalidate_question(question)
+
+            return {
+                'success': True,
+                'feedback_id': feedback_id,
+                'message': 'Feedback recorded for learning'
+            }
 
         except Exception as e:
             return {
@@ -1595,6 +1672,9 @@ If the question is unclear or cannot be answered with available data, set sql to
                 stats['incorporated'] = feedback_count[0]['incorporated'] or 0
                 stats['corrected_queries'] = feedback_count[0]['corrected'] or 0
 
+            stats['cache'] = self.cache.stats()
+            stats['governor'] = self.governor.stats()
+            stats['schema_context'] = self.schema_context.stats()
             return stats
 
         except Exception as e:
@@ -2048,9 +2128,14 @@ Focus on what needs attention and the overall project health."""
                     'meetings': []
                 }
 
-                # Build email query
-                email_conditions = ["(e.subject LIKE ? OR e.snippet LIKE ? OR e.body_full LIKE ?)"]
-                email_params = [f"%{topic}%", f"%{topic}%", f"%{topic}%"]
+                # Build email query (FTS index when available, LIKE scan otherwise)
+                fts_filter = SearchService(self.db_path).match_filter('emails', topic, 'e.email_id')
+                if fts_filter:
+                    email_conditions = [fts_filter[0]]
+                    email_params = [fts_filter[1]]
+                else:
+                    email_conditions = ["(e.subject LIKE ? OR e.snippet LIKE ? OR e.body_full LIKE ?)"]
+                    email_params = [f"%{topic}%", f"%{topic}%", f"%{topic}%"]
 
                 if project_search:
                     project = self._find_project(cursor, project_search)
@@ -2059,8 +2144,13 @@ Focus on what needs attention and the overall project health."""
                         email_params.append(project['project_code'])
 
                 if sender:
-                    email_conditions.append("(e.sender_email LIKE ? OR e.sender_name LIKE ?)")
-                    email_params.extend([f"%{sender}%", f"%{sender}%"])
+                    participant = participant_condition(sender, role='from')
+                    if participant:
+                        email_conditions.append(participant[0])
+                        email_params.extend(participant[1])
+                    else:
+                        email_conditions.append("(e.sender_email LIKE ? OR e.sender_name LIKE ?)")
+                        email_params.extend([f"%{sender}%", f"%{sender}%"])
 
                 email_sql = f"""
                     SELECT DISTINCT e.email_id, e.subject, e.sender_email, e.sender_name,
@@ -23,7 +23,6 @@ import re
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
-from openai import OpenAI
 
 from .base_service import BaseService
 
@@ -106,6 +105,7 @@ class SchedulingEmailParser(BaseService):
         api_key = os.environ.get('OPENAI_API_KEY')
         self.ai_enabled = bool(api_key)
         if self.ai_enabled:
+            from openai import OpenAI
             self.client = OpenAI(api_key=api_key)
 
     def parse(self, email_body: str, subject: str = "") -> Dict[str, Any]:
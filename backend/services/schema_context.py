@@ -0,0 +1,310 @@
+"""
+Schema Context - compact, question-specific schema for SQL-generation prompts
+
+QueryService used to paste the CREATE TABLE statement of every table into
+every prompt, cached until restart. This module keeps a compiled catalogue
+of tables, columns, join columns and approximate row counts and renders
+only what a question needs:
+
+    invoices (~4,210 rows): invoice_id INTEGER PK, project_code TEXT -> projects.project_code, ...
+
+- Relevance: question words against table names, column names and
+  TABLE_KEYWORDS (invoice/paid/outstanding -> invoices, ...), then tables
+  one join away from the matches (declared foreign keys plus *_id / *_code
+  columns that name another table's key)
+- Budget: tables are added best-first until SCHEMA_CONTEXT_TOKEN_BUDGET
+  (~4 chars per token) or SCHEMA_CONTEXT_MAX_TABLES; a table that doesn't
+  fit with types is retried as column names only
+- Invalidation: the catalogue is rebuilt when PRAGMA schema_version or
+  schema_migrations changes (migrations applied while the API runs);
+  row counts are refreshed every SCHEMA_CONTEXT_COUNTS_TTL_SECONDS
+
+Usage:
+    builder = SchemaContextBuilder(db_path)
+    context = builder.build("What's outstanding on 24 BK-089?")
+    prompt = context['text']          # plus context['tables'], context['tokens'], context['full_tokens']
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .base_service import BaseService
+from .query_governor import estimate_table_rows
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUDGET = int(os.getenv('SCHEMA_CONTEXT_TOKEN_BUDGET', '1500'))
+MAX_TABLES = int(os.getenv('SCHEMA_CONTEXT_MAX_TABLES', '8'))
+COUNTS_TTL_SECONDS = float(os.getenv('SCHEMA_CONTEXT_COUNTS_TTL_SECONDS', '3600'))
+
+CHARS_PER_TOKEN = 4
+NEIGHBOR_WEIGHT = 0.4
+DEFAULT_TABLES = ['projects', 'proposals', 'invoices']
+
+# Words people use for a table that its name/columns don't contain
+TABLE_KEYWORDS = {
+    'invoices': ['invoice', 'invoiced', 'payment', 'paid', 'unpaid', 'outstanding', 'overdue',
+                 'billing', 'billed', 'receivable', 'owe', 'owed'],
+    'project_fee_breakdown': ['fee', 'phase', 'breakdown', 'discipline', 'remaining'],
+    'projects': ['project', 'contract', 'active', 'client', 'signed'],
+    'proposals': ['proposal', 'pipeline', 'pitch', 'win', 'won', 'lost', 'bid', 'opportunity'],
+    'emails': ['email', 'mail', 'correspondence', 'sent', 'received', 'wrote', 'inbox'],
+    'contacts': ['contact', 'person', 'people', 'who'],
+    'meetings': ['meeting', 'call', 'calendar'],
+    'rfis': ['rfi'],
+    'project_milestones': ['milestone', 'deadline', 'due'],
+    'deliverables': ['deliverable', 'drawing', 'submission'],
+    'tasks': ['task', 'todo'],
+}
+
+# Bookkeeping tables that never help answer a business question (plus FTS
+# shadow tables and *_backup / *_old / *_new copies left by migrations)
+INTERNAL_TABLES = {
+    'schema_migrations', 'kpi_project_snapshot', 'kpi_global_snapshot', 'kpi_dirty',
+    'query_governor_log', 'query_sql_cache', 'data_versions', 'blobs', 'blob_refs',
+}
+_INTERNAL_RE = re.compile(r'^(sqlite_|_)|(_backup|_bak|_old|_new|_archive)(_\d+)?$|_fts\d?(_\w+)?$')
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_PROJECT_CODE_RE = re.compile(r'\b\d{2}\s*bk-?\d+', re.I)
+
+
+def estimate_tokens(text: str) -> int:
+    """~4 characters per token (same estimate as ContextBundler)"""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def _stem(word: str) -> str:
+    if len(word) > 3 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+@dataclass
+class TableInfo:
+    name: str
+    columns: List[Tuple[str, str, bool]]            # (name, type, is_pk)
+    joins: Dict[str, str] = field(default_factory=dict)  # column -> "table.column"
+    rows: int = 0
+    words: Set[str] = field(default_factory=set)     # stemmed name parts
+    column_words: Set[str] = field(default_factory=set)
+
+    @property
+    def neighbors(self) -> Set[str]:
+        return {target.split('.')[0] for target in self.joins.values()}
+
+    def render(self, with_types: bool = True) -> str:
+        columns = []
+        for name, col_type, is_pk in self.columns:
+            text = f"{name} {col_type}".strip() if with_types else name
+            if is_pk:
+                text += " PK"
+            if name in self.joins:
+                text += f" -> {self.joins[name]}"
+            columns.append(text)
+        return f"{self.name} (~{self.rows:,} rows): {', '.join(columns)}"
+
+
+class SchemaContextBuilder(BaseService):
+    """Compiled schema catalogue with per-question table selection"""
+
+    def __init__(self, db_path: Optional[str] = None, token_budget: int = TOKEN_BUDGET,
+                 max_tables: int = MAX_TABLES):
+        super().__init__(db_path)
+        self.token_budget = token_budget
+        self.max_tables = max_tables
+
+        self._lock = threading.Lock()
+        self._catalog: Dict[str, TableInfo] = {}
+        self._catalog_key: Optional[Tuple] = None
+        self._counts_at = 0.0
+        self._full_tokens = 0
+        self._stats = {'builds': 0, 'catalog_rebuilds': 0, 'tokens': 0, 'full_tokens': 0, 'tables': 0}
+
+    # ------------------------------------------------------------------
+    # Catalogue
+    # ------------------------------------------------------------------
+
+    def _current_key(self, conn) -> Tuple:
+        schema_version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        try:
+            migrations = tuple(conn.execute(
+                "SELECT COUNT(*), MAX(version) FROM schema_migrations").fetchone())
+        except Exception:
+            migrations = (0, None)
+        return (schema_version,) + migrations
+
+    def catalog(self) -> Dict[str, TableInfo]:
+        """Current catalogue, rebuilt if the schema changed since the last call"""
+        with self.get_connection() as conn:
+            key = self._current_key(conn)
+            with self._lock:
+                if key != self._catalog_key:
+                    self._catalog = self._compile(conn)
+                    self._catalog_key = key
+                    self._counts_at = time.monotonic()
+                    self._full_tokens = estimate_tokens(self.full_text())
+                    self._stats['catalog_rebuilds'] += 1
+                    logger.info(f"Schema context compiled: {len(self._catalog)} tables, "
+                                f"~{self._full_tokens} tokens in full")
+                elif time.monotonic() - self._counts_at > COUNTS_TTL_SECONDS:
+                    for info in self._catalog.values():
+                        info.rows = estimate_table_rows(conn, info.name)
+                    self._counts_at = time.monotonic()
+            return self._catalog
+
+    def _compile(self, conn) -> Dict[str, TableInfo]:
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+        catalog: Dict[str, TableInfo] = {}
+        for name in names:
+            if name in INTERNAL_TABLES or _INTERNAL_RE.search(name):
+                continue
+            columns = [(row[1], row[2] or '', bool(row[5]))
+                       for row in conn.execute(f'PRAGMA table_info("{name}")')]
+            info = TableInfo(name=name, columns=columns, rows=estimate_table_rows(conn, name))
+            info.words = {_stem(w) for w in name.lower().split('_') if w and not w.isdigit()}
+            info.column_words = {_stem(w) for column, _, _ in columns
+                                 for w in column.lower().split('_') if len(w) > 2}
+            for fk in conn.execute(f'PRAGMA foreign_key_list("{name}")'):
+                ref_table, from_col, to_col = fk[2], fk[3], fk[4]
+                info.joins[from_col] = f"{ref_table}.{to_col or 'rowid'}"
+            catalog[name] = info
+
+        self._infer_joins(catalog)
+        return catalog
+
+    @staticmethod
+    def _infer_joins(catalog: Dict[str, TableInfo]):
+        """
+        Most tables here link by project_code / *_id without declaring a
+        foreign key. A column <stem>_id or <stem>_code joins the table whose
+        primary key it is, or the table named <stem>s that has that column.
+        """
+        owners: Dict[str, str] = {}
+        for info in catalog.values():
+            for column, _, is_pk in info.columns:
+                if is_pk and column.endswith(('_id', '_code')):
+                    owners.setdefault(column, info.name)
+        for info in catalog.values():
+            for column, _, _is_pk in info.columns:
+                if column in info.joins or not column.endswith(('_id', '_code')):
+                    continue
+                stem = column.rsplit('_', 1)[0]
+                owner = owners.get(column)
+                if owner is None:
+                    for candidate in (f"{stem}s", f"{stem}es", stem):
+                        target = catalog.get(candidate)
+                        if target and any(c[0] == column for c in target.columns):
+                            owner = candidate
+                            break
+                if owner and owner != info.name:
+                    info.joins[column] = f"{owner}.{column}"
+
+    def full_text(self) -> str:
+        """Every (non-internal) table - what prompts used to carry"""
+        return "\n".join(info.render() for info in self._catalog.values())
+
+    # ------------------------------------------------------------------
+    # Selection
+    # ------------------------------------------------------------------
+
+    def score_tables(self, question: str) -> List[Tuple[str, float]]:
+        """Tables ranked by relevance to the question (score > 0 only)"""
+        catalog = self.catalog()
+        text = question.lower()
+        words = {_stem(w) for w in _WORD_RE.findall(text)}
+
+        scores: Dict[str, float] = {}
+        for name, info in catalog.items():
+            # "proposals" outranks proposal_decision_info for the same word
+            matched = len(info.words & words)
+            score = 2.0 * matched + 2.0 * matched / max(1, len(info.words))
+            keywords = TABLE_KEYWORDS.get(name, [])
+            score += 4.0 * sum(1 for kw in keywords if _stem(kw) in words or (' ' in kw and kw in text))
+            score += min(3, len(info.column_words & words))
+            if score:
+                scores[name] = score
+
+        if _PROJECT_CODE_RE.search(question):
+            for name, bonus in (('projects', 3.0), ('proposals', 2.0)):
+                if name in catalog:
+                    scores[name] = scores.get(name, 0) + bonus
+
+        # One join away from a match: needed to connect matches (and often asked about implicitly)
+        seeds = dict(scores)
+        for name, score in seeds.items():
+            for neighbor in catalog[name].neighbors | self._referenced_by(catalog, name):
+                if neighbor in catalog:
+                    scores[neighbor] = max(scores.get(neighbor, 0), NEIGHBOR_WEIGHT * min(score, 8.0)) \
+                        if neighbor not in seeds else scores[neighbor]
+
+        if not seeds:
+            scores = {name: 1.0 for name in DEFAULT_TABLES if name in catalog}
+
+        return sorted(scores.items(), key=lambda item: (-item[1], -catalog[item[0]].rows, item[0]))
+
+    @staticmethod
+    def _referenced_by(catalog: Dict[str, TableInfo], name: str) -> Set[str]:
+        return {info.name for info in catalog.values() if name in info.neighbors}
+
+    def build(self, question: Optional[str] = None, token_budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Schema text for a prompt.
+
+        Args:
+            question: Text to select tables for (question plus any conversation context);
+                      None renders the full catalogue
+            token_budget: Override SCHEMA_CONTEXT_TOKEN_BUDGET
+
+        Returns:
+            {'text', 'tables': [...], 'tokens': n, 'full_tokens': n}
+        """
+        budget = self.token_budget if token_budget is None else token_budget
+        catalog = self.catalog()
+
+        if question is None:
+            lines = [info.render() for info in catalog.values()]
+            selected = list(catalog)
+        else:
+            lines, selected, used = [], [], 0
+            for name, _ in self.score_tables(question):
+                if len(selected) >= self.max_tables:
+                    break
+                for with_types in (True, False):
+                    line = catalog[name].render(with_types)
+                    if used + estimate_tokens(line) <= budget:
+                        lines.append(line)
+                        selected.append(name)
+                        used += estimate_tokens(line) + 1
+                        break
+
+        text = ("DATABASE SCHEMA (relevant tables, approximate row counts; "
+                "'->' marks join columns):\n\n" + "\n".join(lines) + "\n")
+        tokens = estimate_tokens(text)
+        with self._lock:
+            self._stats['builds'] += 1
+            self._stats['tokens'] += tokens
+            self._stats['full_tokens'] += self._full_tokens
+            self._stats['tables'] += len(selected)
+        return {'text': text, 'tables': selected, 'tokens': tokens, 'full_tokens': self._full_tokens}
+
+    def stats(self) -> Dict[str, Any]:
+        """Average schema tokens per prompt vs. the full catalogue"""
+        with self._lock:
+            stats = dict(self._stats)
+        builds = stats['builds']
+        stats['avg_tokens'] = round(stats['tokens'] / builds, 1) if builds else 0
+        stats['avg_tables'] = round(stats['tables'] / builds, 1) if builds else 0
+        stats['full_catalog_tokens'] = self._full_tokens
+        stats['token_reduction_pct'] = (
+            round(100 * (1 - stats['tokens'] / stats['full_tokens']), 1) if stats['full_tokens'] else 0
+        )
+        stats['catalog_tables'] = len(self._catalog)
+        return stats
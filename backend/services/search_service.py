@@ -0,0 +1,283 @@
+"""
+Search Service
+
+Ranked full-text search over the FTS5 indexes from migrations 105 and 122:
+- emails_fts      (subject, sender, snippet, body)
+- documents_fts   (file name, project code, type, extracted text)
+- contacts_fts    (name, email, company, role)
+- projects_fts    (project code, title, client name)
+- proposals_fts   (project code, name, client company)
+
+Results are ordered by BM25 and carry a snippet and a highlighted title.
+If the FTS tables haven't been created yet, is_available() returns False
+and callers fall back to their old LIKE queries.
+
+Usage:
+    from services.search_service import SearchService
+
+    search = SearchService(db_path)
+    search.search("wynn marina", sources=['emails', 'proposals'])
+    search.search_source('emails', "fee proposal", limit=50)
+    search.rebuild()      # re-index existing rows
+"""
+
+import re
+import logging
+from typing import Optional, List, Dict, Any, Tuple
+
+from .base_service import BaseService
+
+logger = logging.getLogger(__name__)
+
+
+# Per-source index definition. Weights follow the FTS column order and are
+# passed to bm25() - title-like columns count more than bodies.
+SEARCH_SOURCES: Dict[str, Dict[str, Any]] = {
+    'emails': {
+        'fts': 'emails_fts',
+        'table': 'emails',
+        'key': 'email_id',
+        'select': 't.email_id, t.subject, t.sender_email, t.date, t.snippet',
+        'weights': (10.0, 4.0, 2.0, 1.0),
+        'highlight_column': 0,   # subject
+        'snippet_column': -1,    # best matching column
+    },
+    'documents': {
+        'fts': 'documents_fts',
+        'table': 'documents',
+        'key': 'document_id',
+        'select': 't.document_id, t.file_name, t.file_path, t.document_type, '
+                  't.modified_date, t.project_code',
+        'weights': (10.0, 6.0, 2.0, 1.0),
+        'highlight_column': 0,   # file_name
+        'snippet_column': 3,     # text_content
+    },
+    'contacts': {
+        'fts': 'contacts_fts',
+        'table': 'contacts',
+        'key': 'contact_id',
+        'select': 't.contact_id, t.name, t.email, t.company, t.role',
+        'weights': (10.0, 6.0, 4.0, 1.0),
+        'highlight_column': 0,   # name
+        'snippet_column': -1,
+    },
+    'projects': {
+        'fts': 'projects_fts',
+        'table': 'projects',
+        'key': 'project_id',
+        'select': 't.project_id, t.project_code, t.project_title, t.client_name, t.status, '
+                  't.is_active_project',
+        'weights': (10.0, 5.0, 3.0),
+        'highlight_column': 1,   # project_title
+        'snippet_column': -1,
+    },
+    'proposals': {
+        'fts': 'proposals_fts',
+        'table': 'proposals',
+        'key': 'proposal_id',
+        'select': 't.proposal_id, t.project_code, t.project_name, t.client_company, t.status',
+        'weights': (10.0, 5.0, 3.0),
+        'highlight_column': 1,   # project_name
+        'snippet_column': -1,
+    },
+}
+
+HIGHLIGHT_OPEN = '<mark>'
+HIGHLIGHT_CLOSE = '</mark>'
+SNIPPET_TOKENS = 16
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(query: Optional[str]) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Each whitespace-separated word becomes a quoted phrase of its tokens
+    (so "john@example.com" and "BK-089" still match), words are ANDed, and
+    the last word is a prefix match so search-as-you-type works.
+
+    Returns:
+        MATCH expression, or None if the query has no searchable tokens
+    """
+    if not query:
+        return None
+
+    phrases = []
+    for word in query.split():
+        tokens = _TOKEN_RE.findall(word)
+        if tokens:
+            phrases.append('"' + ' '.join(tokens) + '"')
+
+    if not phrases:
+        return None
+
+    phrases[-1] += '*'
+    return ' '.join(phrases)
+
+
+class SearchService(BaseService):
+    """Ranked FTS5 search shared by the email, document and brain services"""
+
+    # db_path -> set of FTS tables present (checked once per process)
+    _available_tables: Dict[str, set] = {}
+
+    # ------------------------------------------------------------------
+    # Availability
+    # ------------------------------------------------------------------
+
+    def _fts_tables(self) -> set:
+        key = str(self.db_path)
+        if key not in self._available_tables:
+            rows = self.execute_query(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%\\_fts' ESCAPE '\\'"
+            )
+            SearchService._available_tables[key] = {row['name'] for row in rows}
+        return self._available_tables[key]
+
+    def is_available(self, source: str) -> bool:
+        """True if the FTS index for this source exists (migration 105 applied)"""
+        spec = SEARCH_SOURCES.get(source)
+        return bool(spec) and spec['fts'] in self._fts_tables()
+
+    @classmethod
+    def reset_availability_cache(cls):
+        """Forget which FTS tables exist (call after running migrations)"""
+        cls._available_tables.clear()
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search_source(
+        self,
+        source: str,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        where: Optional[str] = None,
+        params: Tuple = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked search over one source
+
+        Args:
+            source: Key of SEARCH_SOURCES ('emails', 'documents', ...)
+            query: Free-text query
+            limit: Max results
+            offset: Results to skip
+            where: Optional extra filter on the base table (alias `t`)
+            params: Parameters for `where`
+
+        Returns:
+            Rows of the base table plus search_rank, search_snippet and
+            search_highlight (lower rank = better match)
+        """
+        spec = SEARCH_SOURCES[source]
+        match = build_match_query(query)
+        if not match:
+            return []
+
+        fts = spec['fts']
+        weights = ', '.join(str(w) for w in spec['weights'])
+        sql = f"""
+            SELECT
+                {spec['select']},
+                bm25({fts}, {weights}) AS search_rank,
+                snippet({fts}, {spec['snippet_column']}, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}',
+                        '…', {SNIPPET_TOKENS}) AS search_snippet,
+                highlight({fts}, {spec['highlight_column']}, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}')
+                    AS search_highlight
+            FROM {fts}
+            JOIN {spec['table']} t ON t.{spec['key']} = {fts}.rowid
+            WHERE {fts} MATCH ?
+        """
+        all_params: Tuple = (match,)
+        if where:
+            sql += f" AND ({where})"
+            all_params += tuple(params)
+        sql += " ORDER BY search_rank LIMIT ? OFFSET ?"
+        all_params += (limit, offset)
+
+        return self.execute_query(sql, all_params)
+
+    def search(
+        self,
+        query: str,
+        sources: Optional[List[str]] = None,
+        limit: int = 20
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Ranked search across several sources
+
+        Args:
+            query: Free-text query
+            sources: Source keys to search (default: all available)
+            limit: Max results per source
+
+        Returns:
+            Dict of source -> ranked results
+        """
+        sources = sources or list(SEARCH_SOURCES.keys())
+        results = {}
+        for source in sources:
+            if self.is_available(source):
+                results[source] = self.search_source(source, query, limit=limit)
+            else:
+                results[source] = []
+        return results
+
+    def match_filter(self, source: str, query: str, key_expr: str) -> Optional[Tuple[str, str]]:
+        """
+        SQL filter restricting another query to rows matching `query`
+
+        Lets list endpoints keep their own joins/sorting while replacing a
+        LIKE scan with an index lookup.
+
+        Args:
+            source: Key of SEARCH_SOURCES
+            query: Free-text query
+            key_expr: Column in the caller's query holding the row id (e.g. 'e.email_id')
+
+        Returns:
+            (sql_fragment, match_param), or None if FTS is unavailable or
+            the query has no searchable tokens
+        """
+        if not self.is_available(source):
+            return None
+        match = build_match_query(query)
+        if not match:
+            return None
+        fts = SEARCH_SOURCES[source]['fts']
+        return f"{key_expr} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)", match
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def rebuild(self, sources: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Rebuild FTS indexes from their base tables and merge segments
+
+        Args:
+            sources: Source keys to rebuild (default: all available)
+
+        Returns:
+            Dict of source -> number of indexed rows
+        """
+        self.reset_availability_cache()
+        sources = sources or list(SEARCH_SOURCES.keys())
+        counts = {}
+
+        for source in sources:
+            if not self.is_available(source):
+                logger.warning(f"Skipping {source}: FTS table missing (apply migration 105)")
+                continue
+            fts = SEARCH_SOURCES[source]['fts']
+            with self.get_write_connection() as conn:
+                conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+                conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+            counts[source] = self.count_rows(SEARCH_SOURCES[source]['table'])
+            logger.info(f"Rebuilt {fts}: {counts[source]} rows")
+
+        return counts
@@ -0,0 +1,249 @@
+"""
+Section Composer - build a page from independent query sections in parallel
+
+Pages like /api/my-day and the proposal story ran a dozen queries one after
+another on one connection, so the page took the sum of their latencies and
+one slow or broken query failed all of it. Here a page is a set of sections.
+Each one declares:
+- fetch(conn, inputs): its queries, run on a pooled reader on the database
+  executor (services.async_db)
+- depends_on: sections whose results it needs (in inputs[name])
+- timeout: deadline for its own queries
+- ttl: seconds its result may be reused for the same inputs. If it also
+  lists its tables, a cached result is dropped as soon as their
+  data_versions stamp changes (migrations 112/119/120).
+- default: what the page shows if it fails
+
+Sections whose dependencies are met run concurrently. A failed or timed-out
+section degrades to its default, and sections depending on it are skipped.
+The page is still returned. Only a `required` section fails the page.
+
+Usage:
+    composer = SectionComposer(db_path, [
+        Section('proposal', fetch_proposal, required=True),
+        Section('emails', fetch_emails, depends_on=('proposal',), ttl=30,
+                tables=('emails', 'email_proposal_links'), default=[]),
+    ])
+    results, meta = await composer.compose({'project_code': code})
+    # meta: {'total_ms', 'degraded', 'sections': {name: {'status', 'ms'}}}
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .async_db import QueryTimeout, get_db_executor
+from .connection_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+SECTION_CACHE_SIZE = 512
+
+
+class SectionFailed(RuntimeError):
+    """A required section failed or timed out"""
+
+    def __init__(self, name: str, status: str):
+        super().__init__(f"Section {name} {status}")
+        self.name = name
+        self.status = status
+
+
+class Section:
+    """One independently fetched part of a page"""
+
+    __slots__ = ('name', 'fetch', 'depends_on', 'timeout', 'ttl', 'tables', 'default', 'required')
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[Any, Dict[str, Any]], Any],
+        depends_on: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        ttl: float = 0,
+        tables: Iterable[str] = (),
+        default: Any = None,
+        required: bool = False,
+    ):
+        self.name = name
+        self.fetch = fetch
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout          # None: the executor's DB_QUERY_TIMEOUT_SECONDS
+        self.ttl = ttl
+        self.tables = tuple(tables)
+        self.default = default
+        self.required = required
+
+
+class SectionComposer:
+    """Runs a page's sections concurrently, in dependency order"""
+
+    def __init__(self, db_path: str, sections: Iterable[Section]):
+        self.db_path = db_path
+        self.sections: Dict[str, Section] = {}
+        for section in sections:
+            if section.name in self.sections:
+                raise ValueError(f"Duplicate section: {section.name}")
+            self.sections[section.name] = section
+        self._check_dependencies()
+
+        self._cache: 'OrderedDict[str, Tuple[Any, Optional[str], float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_dependencies(self):
+        """Unknown dependencies and cycles are programming errors - fail at import"""
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Section dependency cycle: {' -> '.join(path + (name,))}")
+            state[name] = 'visiting'
+            for dependency in self.sections[name].depends_on:
+                if dependency not in self.sections:
+                    raise ValueError(f"Section {name} depends on unknown section {dependency}")
+                visit(dependency, path + (name,))
+            state[name] = 'done'
+
+        for name in self.sections:
+            visit(name, ())
+
+    # ------------------------------------------------------------------
+    # Composition
+    # ------------------------------------------------------------------
+
+    async def compose(self, params: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Fetch every section.
+
+        Args:
+            params: Request inputs, passed to every section's fetch
+
+        Returns:
+            (results by section name, meta with per-section status and ms)
+
+        Raises:
+            SectionFailed: A required section failed or timed out
+        """
+        started = time.perf_counter()
+        meta: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        def task_for(name: str) -> asyncio.Task:
+            if name not in tasks:
+                tasks[name] = asyncio.ensure_future(self._run(self.sections[name], params, task_for, meta))
+            return tasks[name]
+
+        for name in self.sections:
+            task_for(name)
+        try:
+            outcomes = dict(zip(tasks.keys(), await asyncio.gather(*tasks.values()), strict=True))
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        for name, section in self.sections.items():
+            if section.required and not outcomes[name][0]:
+                raise SectionFailed(name, meta[name]['status'])
+
+        results = {name: value for name, (_, value) in outcomes.items()}
+        return results, {
+            'total_ms': round((time.perf_counter() - started) * 1000, 1),
+            'degraded': [name for name in self.sections if not outcomes[name][0]],
+            'sections': {name: meta[name] for name in self.sections},
+        }
+
+    async def _run(self, section: Section, params: Dict[str, Any],
+                   task_for: Callable[[str], asyncio.Task],
+                   meta: Dict[str, Dict[str, Any]]) -> Tuple[bool, Any]:
+        """(ok, value) for one section; never raises except on cancellation"""
+        inputs = dict(params)
+        for dependency in section.depends_on:
+            ok, value = await task_for(dependency)
+            if not ok:
+                meta[section.name] = {'status': 'skipped', 'ms': 0.0, 'missing': dependency}
+                return False, section.default
+            inputs[dependency] = value
+
+        started = time.perf_counter()
+        key = self._cache_key(section, inputs) if section.ttl > 0 else None
+        stamp = None
+        try:
+            if key is not None:
+                stamp = self._stamp(section)
+                hit, value = self._cached(key, stamp, section.ttl)
+                if hit:
+                    meta[section.name] = {'status': 'cached', 'ms': self._ms(started)}
+                    return True, value
+
+            value = await get_db_executor().run(
+                functools.partial(self._fetch, section, inputs), timeout=section.timeout
+            )
+        except asyncio.CancelledError:
+            raise
+        except QueryTimeout:
+            meta[section.name] = {'status': 'timeout', 'ms': self._ms(started)}
+            return False, section.default
+        except Exception as e:
+            logger.error(f"Section {section.name} failed: {e}", exc_info=True)
+            meta[section.name] = {'status': 'error', 'ms': self._ms(started)}
+            return False, section.default
+
+        if key is not None:
+            self._store(key, value, stamp)
+        meta[section.name] = {'status': 'ok', 'ms': self._ms(started)}
+        return True, value
+
+    def _fetch(self, section: Section, inputs: Dict[str, Any]) -> Any:
+        with get_pool(self.db_path).reader() as conn:
+            return section.fetch(conn, inputs)
+
+    @staticmethod
+    def _ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    # ------------------------------------------------------------------
+    # Per-section TTL cache
+    # ------------------------------------------------------------------
+
+    def _stamp(self, section: Section) -> Optional[str]:
+        if not section.tables:
+            return None
+        from .data_version_service import get_data_version_service
+        return get_data_version_service(self.db_path).stamp(section.tables)
+
+    @staticmethod
+    def _cache_key(section: Section, inputs: Dict[str, Any]) -> str:
+        raw = json.dumps([section.name, inputs], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def _cached(self, key: str, stamp: Optional[str], ttl: float) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return False, None
+            value, cached_stamp, stored_at = entry
+            if time.monotonic() - stored_at >= ttl or cached_stamp != stamp:
+                del self._cache[key]
+                return False, None
+            self._cache.move_to_end(key)
+            return True, value
+
+    def _store(self, key: str, value: Any, stamp: Optional[str]):
+        with self._lock:
+            self._cache[key] = (value, stamp, time.monotonic())
+            self._cache.move_to_end(key)
+            while len(self._cache) > SECTION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
@@ -35,6 +35,7 @@ project_root = Path(__file__).parent.parent.parent
 import sys
 sys.path.insert(0, str(project_root))
 from utils.logger import get_logger
+from backend.services.email_participants import index_email_participants
 
 load_dotenv()
 logger = get_logger(__name__)
@@ -554,9 +555,11 @@ class SentEmailDetector:
             detection['email_date'],
             1 if detection['attachments'] else 0
         ))
+        email_id = cursor.lastrowid
+        index_email_participants(conn, [email_id])
         conn.commit()
 
-        return cursor.lastrowid
+        return email_id
 
     def _get_active_proposals(self) -> List[Dict]:
         """Get proposals that could receive proposal_sent status."""
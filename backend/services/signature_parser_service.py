@@ -8,6 +8,9 @@ Parses email signatures to extract:
 - LinkedIn URLs
 - Location/address hints
 
+Enrichment also reports other contacts with the same name (contact name
+index), which are usually the same person writing from another address.
+
 Part of Issue #19: Contact Auto-Research
 """
 
@@ -18,6 +21,8 @@ from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 
 from .base_service import BaseService
+from .contact_name_index import get_contact_name_index
+from .email_participants import normalize_address
 
 logger = logging.getLogger(__name__)
 
@@ -433,20 +438,20 @@ class SignatureParserService(BaseService):
         if not contact_email:
             return {'success': False, 'error': 'No email address provided'}
 
-        # Clean email address
-        match = re.search(r'<([^>]+@[^>]+)>', contact_email)
-        clean_email = match.group(1).lower() if match else contact_email.lower().strip()
+        clean_email = normalize_address(contact_email)
+        if not clean_email:
+            return {'success': False, 'error': f'Not an email address: {contact_email}'}
 
-        # Get emails from this contact
+        # Get emails from this contact (index seek on sender_address, date)
         emails = self.execute_query("""
             SELECT email_id, body_full, subject, date
             FROM emails
-            WHERE LOWER(sender_email) LIKE ?
+            WHERE sender_address = ?
             AND body_full IS NOT NULL
             AND LENGTH(body_full) > 50
             ORDER BY date DESC
             LIMIT 10
-        """, (f'%{clean_email}%',))
+        """, (clean_email,))
 
         if not emails:
             return {
@@ -537,6 +542,7 @@ class SignatureParserService(BaseService):
             'emails_with_signatures': len(extraction_sources),
             'extracted': best_result.to_dict(),
             'updates_needed': updates_needed,
+            'possible_duplicates': self.find_same_name_contacts(contact_id, contact.get('name')),
             'suggestion_ids': []
         }
 
@@ -554,6 +560,34 @@ class SignatureParserService(BaseService):
 
         return result
 
+    def find_same_name_contacts(self, contact_id: int, name: Optional[str],
+                                min_score: float = 0.95) -> List[Dict[str, Any]]:
+        """
+        Other contacts whose full name matches this one's.
+
+        Args:
+            contact_id: Contact being enriched (left out of the results)
+            name: Its name; a single word (first name only) matches nothing
+            min_score: Name index score required (0.95: the same name up to accents,
+                punctuation and word order)
+
+        Returns:
+            Matching contacts with contact_id, name, email, company and score
+        """
+        if not name or len(name.split()) < 2:
+            return []
+        try:
+            matches = get_contact_name_index(str(self.db_path)).candidates(
+                name, k=5, min_score=min_score, exclude=(contact_id,)
+            )
+        except Exception as e:
+            logger.warning(f"Contact name index lookup failed: {e}")
+            return []
+        return [
+            {key: match.get(key) for key in ('contact_id', 'name', 'email', 'company', 'score')}
+            for match in matches
+        ]
+
     def _create_enrichment_suggestion(
         self,
         contact_id: int,
@@ -636,8 +670,8 @@ class SignatureParserService(BaseService):
             query = """
                 SELECT DISTINCT c.contact_id, c.email, c.name, c.company, c.role, c.phone
                 FROM contacts c
-                JOIN emails e ON LOWER(e.sender_email) LIKE '%' || LOWER(c.email) || '%'
-                JOIN email_project_links epl ON e.email_id = epl.email_id
+                JOIN email_participants ep ON ep.address = LOWER(TRIM(c.email)) AND ep.role = 'from'
+                JOIN email_project_links epl ON ep.email_id = epl.email_id
                 WHERE (c.company IS NULL OR c.company = ''
                     OR c.role IS NULL OR c.role = ''
                     OR c.phone IS NULL OR c.phone = '')
@@ -14,6 +14,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from .base_service import BaseService
+from .usage_counters import get_usage_counters
 
 logger = logging.getLogger(__name__)
 
@@ -136,18 +137,15 @@ class SuggestionWriter(BaseService):
             was_correct: If known, whether suggestion was approved (True) or rejected (False)
         """
         try:
+            if was_correct is None:
+                # Just record usage, don't know outcome yet (batched write-behind)
+                get_usage_counters(self.db_path).record('email_learned_patterns', pattern_id)
+                return
+
             with self.get_connection() as conn:
                 cursor = conn.cursor()
 
-                if was_correct is None:
-                    # Just record usage, don't know outcome yet
-                    cursor.execute("""
-                        UPDATE email_learned_patterns
-                        SET times_used = times_used + 1,
-                            last_used_at = datetime('now')
-                        WHERE pattern_id = ?
-                    """, (pattern_id,))
-                elif was_correct:
+                if was_correct:
                     # Pattern was correct - boost confidence
                     cursor.execute("""
                         UPDATE email_learned_patterns
@@ -0,0 +1,368 @@
+"""
+Timeline Service
+
+Unified project timeline (emails, meeting transcripts, invoices, RFIs) in
+date order, one page at a time.
+
+Each source is queried with its filters pushed into SQL. Each query is
+ordered by (date, id) and limited to the page size, and the results are
+combined with a k-way merge (heapq.merge). A page therefore reads at most
+`limit + 1` rows per source, however long the project history is.
+Migration 118 adds the indexes that let each source return rows in date
+order without a sort. Rows without a date (NULL or '') sort last as date ''
+and are read as a separate segment ordered by id, so the dated segment
+can compare the raw, indexed column.
+
+Pages are keyset-paginated. `next_cursor` encodes the (date, type, id) of
+the last item. Passing it back resumes strictly after that item, so pages
+neither repeat nor skip items when new ones arrive.
+
+Usage:
+    from services.timeline_service import TimelineService
+
+    timeline = TimelineService(db_path)
+    page = timeline.get_project_timeline("25 BK-033", limit=100)
+    older = timeline.get_project_timeline("25 BK-033", limit=100, cursor=page["next_cursor"])
+"""
+
+import base64
+import heapq
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .base_service import BaseService
+from .email_participants import participant_condition
+
+logger = logging.getLogger(__name__)
+
+
+# Per-source query. `params` names the values bound to the select's
+# placeholders. `date` and `id` are the columns the source is ordered and
+# paginated by; `date` is compared raw so its index serves the order, and
+# the select reports a missing date as ''. `person` lists the columns a name/address
+# substring is matched against; sources without any ignore the person
+# filter. Optional sources are skipped if their table is missing.
+TIMELINE_SOURCES: Dict[str, Dict[str, Any]] = {
+    'email': {
+        'select': """
+            SELECT
+                e.email_id as id,
+                'email' as type,
+                COALESCE(epl.email_date, '') as date,
+                e.subject as title,
+                COALESCE(e.snippet, SUBSTR(e.body_full, 1, 200)) as summary,
+                e.sender_email as sender,
+                e.sender_name,
+                e.recipient_emails,
+                ec.category,
+                e.folder,
+                epl.confidence,
+                epl.link_method
+            FROM email_project_links epl
+            JOIN emails e ON e.email_id = epl.email_id
+            LEFT JOIN email_content ec ON e.email_id = ec.email_id
+            WHERE epl.project_id = ?
+        """,
+        'params': ('project_id',),
+        'date': 'epl.email_date',
+        'id': 'epl.email_id',
+        'person': ('e.sender_email', 'e.sender_name', 'e.recipient_emails'),
+    },
+    'transcript': {
+        'select': """
+            SELECT
+                id,
+                'transcript' as type,
+                COALESCE(meeting_date, recorded_date, created_at, '') as date,
+                COALESCE(meeting_title, audio_filename, 'Meeting Transcript') as title,
+                COALESCE(summary, 'No summary available') as summary,
+                participants,
+                duration_seconds
+            FROM meeting_transcripts
+            WHERE (project_id = ? OR detected_project_code = ?)
+        """,
+        'params': ('project_id', 'project_code'),
+        'date': "COALESCE(meeting_date, recorded_date, created_at, '')",
+        'id': 'id',
+        'person': ('participants',),
+    },
+    'invoice': {
+        'select': """
+            SELECT
+                invoice_id as id,
+                'invoice' as type,
+                COALESCE(invoice_date, '') as date,
+                invoice_number as title,
+                printf('$%.2f - %s', invoice_amount, COALESCE(status, 'unknown')) as summary,
+                invoice_amount,
+                payment_amount,
+                status
+            FROM invoices
+            WHERE project_id = ?
+        """,
+        'params': ('project_id',),
+        'date': 'invoice_date',
+        'id': 'invoice_id',
+        'person': None,
+    },
+    'rfi': {
+        'select': """
+            SELECT
+                rfi_id as id,
+                'rfi' as type,
+                COALESCE(created_at, '') as date,
+                COALESCE(rfi_number, 'RFI') || ': ' || COALESCE(subject, 'No subject') as title,
+                COALESCE(description, 'No description') as summary,
+                status,
+                priority
+            FROM rfis
+            WHERE project_id = ?
+        """,
+        'params': ('project_id',),
+        'date': 'created_at',
+        'id': 'rfi_id',
+        'person': ('sender_email', 'sender_name'),
+        'optional': True,
+    },
+}
+
+# Bensley internal domains
+INTERNAL_DOMAINS = ['bensley.com', 'bensley.co.id']
+
+# Email categories that are likely project-related client communications
+CLIENT_CATEGORIES = ['contract', 'design', 'financial', 'meeting', 'administrative']
+
+
+def encode_cursor(item: Dict[str, Any]) -> str:
+    """Opaque cursor for the position just after `item`"""
+    raw = json.dumps([item.get('date') or '', item['type'], item['id']])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, int]:
+    """(date, type, id) from encode_cursor; ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date, item_type, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid timeline cursor: {cursor}") from e
+    if item_type not in TIMELINE_SOURCES or not isinstance(date, str) or not isinstance(item_id, int):
+        raise ValueError(f"Invalid timeline cursor: {cursor}")
+    return date, item_type, item_id
+
+
+def _sort_key(item: Dict[str, Any]) -> Tuple[str, str, int]:
+    return (item.get('date') or '', item['type'], item['id'])
+
+
+class TimelineService(BaseService):
+    """Keyset-paginated, k-way merged project timeline"""
+
+    def get_project_timeline(
+        self,
+        project_code: str,
+        limit: int = 100,
+        item_types: Optional[List[str]] = None,
+        person: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        One page of a project's timeline, newest first.
+
+        Args:
+            project_code: Project code
+            limit: Page size
+            item_types: Sources to include (email, transcript, invoice, rfi); all if None
+            person: Address, @domain or name. Filters emails, transcripts and RFIs.
+                    Invoices have no people and are not filtered.
+            date_from: First day to include (YYYY-MM-DD)
+            date_to: Last day to include (YYYY-MM-DD)
+            cursor: next_cursor of the previous page
+
+        Returns:
+            Timeline page dict, or None if the project does not exist
+
+        Raises:
+            ValueError: Malformed cursor or date
+        """
+        position = decode_cursor(cursor) if cursor else None
+        date_to_exclusive = None
+        if date_to:
+            # Dates are stored as 'YYYY-MM-DD hh:mm:ss' or ISO with 'T';
+            # "< next day" covers both
+            day = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)
+            date_to_exclusive = day.strftime('%Y-%m-%d')
+        if date_from:
+            datetime.strptime(date_from, '%Y-%m-%d')
+
+        sources = [s for s in TIMELINE_SOURCES if not item_types or s in item_types]
+
+        with self.get_connection() as conn:
+            project = conn.execute(
+                "SELECT project_id FROM projects WHERE project_code = ?", (project_code,)
+            ).fetchone()
+            if not project:
+                return None
+
+            params = {
+                'project_id': project['project_id'],
+                'project_code': project_code,
+                'date_from': date_from,
+                'date_to': date_to_exclusive,
+                'limit': limit + 1,
+            }
+            streams = []
+            for source in sources:
+                stream = self._source_rows(conn, source, params, person, position)
+                if stream is not None:
+                    streams.append(stream)
+
+            # Each stream is already in (date, id) order - merge lazily and
+            # stop one past the page to know whether there is more
+            items = []
+            for item in heapq.merge(*streams, key=_sort_key, reverse=True):
+                items.append(item)
+                if len(items) > limit:
+                    break
+
+        has_more = len(items) > limit
+        items = items[:limit]
+        for item in items:
+            if item['type'] == 'email':
+                self._classify_email(item)
+
+        return {
+            "success": True,
+            "project_code": project_code,
+            "timeline": items,
+            "total": len(items),
+            "has_more": has_more,
+            "next_cursor": encode_cursor(items[-1]) if has_more else None,
+            "item_counts": {
+                source: sum(1 for i in items if i['type'] == source) for source in TIMELINE_SOURCES
+            },
+            "email_category_counts": {
+                category: sum(1 for i in items if i['type'] == 'email' and i.get('email_category') == category)
+                for category in ('internal', 'client', 'external')
+            },
+            "unique_people": self._unique_people(items),
+        }
+
+    def _source_rows(self, conn, source: str, params: Dict[str, Any], person: Optional[str],
+                     position: Optional[Tuple[str, str, int]]) -> Optional[Iterator[Dict[str, Any]]]:
+        """Run one source's page query; rows are read lazily by the merge"""
+        spec = TIMELINE_SOURCES[source]
+        date_sql, id_sql = spec['date'], spec['id']
+        sql = spec['select']
+        args = [params[name] for name in spec['params']]
+
+        if person and spec['person']:
+            # Addresses and @domains seek the participant index (migration 117)
+            participant = participant_condition(person) if source == 'email' else None
+            if participant:
+                sql += f" AND {participant[0]}"
+                args.extend(participant[1])
+            else:
+                sql += " AND (" + " OR ".join(f"{column} LIKE ?" for column in spec['person']) + ")"
+                args.extend([f"%{person}%"] * len(spec['person']))
+
+        dated = f"{date_sql} > ''"
+        dated_args: List[Any] = []
+        if params['date_from']:
+            dated += f" AND {date_sql} >= ?"
+            dated_args.append(params['date_from'])
+        if params['date_to']:
+            dated += f" AND {date_sql} < ?"
+            dated_args.append(params['date_to'])
+        # Undated rows sort as '', below any date_from
+        undated = None if params['date_from'] else f"({date_sql} IS NULL OR {date_sql} = '')"
+        undated_args: List[Any] = []
+
+        # Keyset: strictly after the cursor in (date, type, id) descending
+        # order. Same-date rows of a "smaller" type come after the cursor;
+        # of a "larger" type, before it.
+        if position:
+            cursor_date, cursor_type, cursor_id = position
+            if cursor_date == '':
+                dated = None
+                if source == cursor_type and undated:
+                    undated += f" AND {id_sql} < ?"
+                    undated_args.append(cursor_id)
+                elif source > cursor_type:
+                    undated = None
+            elif source == cursor_type:
+                dated += f" AND ({date_sql}, {id_sql}) < (?, ?)"
+                dated_args.extend([cursor_date, cursor_id])
+            else:
+                dated += f" AND {date_sql} {'<=' if source < cursor_type else '<'} ?"
+                dated_args.append(cursor_date)
+
+        segments = []
+        if dated:
+            segments.append((f"{sql} AND {dated} ORDER BY {date_sql} DESC, {id_sql} DESC LIMIT ?",
+                             args + dated_args + [params['limit']]))
+        if undated:
+            segments.append((f"{sql} AND {undated} ORDER BY {id_sql} DESC LIMIT ?",
+                             args + undated_args + [params['limit']]))
+        if not segments:
+            return iter(())
+
+        try:
+            rows = conn.execute(*segments[0])
+        except sqlite3.OperationalError as e:
+            if spec.get('optional'):
+                logger.debug(f"Timeline source {source} unavailable: {e}")
+                return None
+            raise
+        return self._read_segments(conn, rows, segments[1:], params['limit'])
+
+    def _read_segments(self, conn, rows, rest: List[Tuple[str, List[Any]]],
+                       limit: int) -> Iterator[Dict[str, Any]]:
+        """Rows of the first segment, then the next ones until `limit` rows were read"""
+        count = 0
+        for row in rows:
+            count += 1
+            yield dict(row)
+        for segment_sql, segment_args in rest:
+            if count >= limit:
+                return
+            for row in conn.execute(segment_sql, segment_args):
+                count += 1
+                yield dict(row)
+
+    def _classify_email(self, item: Dict[str, Any]):
+        """email_category (internal/client/external) and direction"""
+        sender = (item.get('sender') or '').lower()
+        is_internal = any(domain in sender for domain in INTERNAL_DOMAINS)
+        category = item.get('category') or ''
+
+        if is_internal or category == 'internal':
+            item['email_category'] = 'internal'
+        elif category in CLIENT_CATEGORIES:
+            item['email_category'] = 'client'
+        else:
+            item['email_category'] = 'external'
+
+        item['direction'] = 'sent' if item.get('folder') in ('SENT', 'Sent') else 'received'
+
+    def _unique_people(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Names on this page, for the person filter dropdown"""
+        people = set()
+        for item in items:
+            if item['type'] == 'email':
+                sender = item.get('sender_name') or item.get('sender')
+                if sender:
+                    # Clean up sender - remove email-style formatting
+                    sender_clean = sender.split('<')[0].strip().strip('"')
+                    if sender_clean and '@' not in sender_clean:
+                        people.add(sender_clean)
+            elif item['type'] == 'transcript':
+                for participant in (item.get('participants') or '').split(','):
+                    if participant.strip():
+                        people.add(participant.strip())
+        return sorted(people)
@@ -16,6 +16,7 @@ Solution:
 
 Created: 2025-12-02
 Updated: 2025-12-02 - Added participant matching from contacts
+Updated: 2026-01-21 - Contacts come from the contact name index (migration 121)
 """
 
 import sqlite3
@@ -24,18 +25,24 @@ import os
 import json
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
-from openai import OpenAI
 from collections import defaultdict
 
+from .contact_name_index import get_contact_name_index
+
 # Default database path
 DB_PATH = os.getenv('DATABASE_PATH', 'database/bensley_master.db')
 
+# Contacts listed for GPT, and index candidates checked per name
+GPT_CONTACT_LIMIT = 100
+NAME_CANDIDATES = 10
+
 
 class TranscriptConsolidationService:
     """Consolidates chunked transcripts and generates smart titles"""
 
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
+        from openai import OpenAI
         self.client = OpenAI()
         self.stats = {
             'meetings_identified': 0,
@@ -46,8 +53,8 @@ class TranscriptConsolidationService:
             'participants_matched': 0,
             'errors': []
         }
-        # Cache contacts for fuzzy matching
-        self._contacts_cache = None
+        # Phonetic + trigram lookup of contacts by name
+        self.name_index = get_contact_name_index(db_path)
 
     def get_connection(self):
         return sqlite3.connect(self.db_path)
@@ -87,27 +94,25 @@ class TranscriptConsolidationService:
 
         return (chunk_num, part_num)
 
-    def _load_contacts(self) -> List[Dict]:
-        """Load all contacts from database for fuzzy matching."""
-        if self._contacts_cache is not None:
-            return self._contacts_cache
-
-        with self.get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT
-                    contact_id,
-                    name,
-                    email,
-                    role,
-                    company
-                FROM contacts
-                WHERE name IS NOT NULL AND name != ''
-            """)
-            self._contacts_cache = [dict(row) for row in cursor.fetchall()]
+    def _shortlist_contacts(self, text: str, proposal_contacts: List[Dict]) -> List[Dict]:
+        """
+        Contacts whose names appear in the text, for the GPT prompt.
 
-        return self._contacts_cache
+        Capitalized words and word pairs are looked up in the contact name
+        index, so the list holds the contacts actually mentioned rather than
+        the first rows of the table. Proposal contacts come first.
+        """
+        shortlist = {c['contact_id']: c for c in proposal_contacts}
+        scored: Dict[int, Tuple[float, Dict]] = {}
+        mentions = set(re.findall(r"\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?\b", text))
+        for mention in mentions:
+            for contact in self.name_index.candidates(mention, k=3, min_score=0.7):
+                previous = scored.get(contact['contact_id'])
+                if previous is None or contact['score'] > previous[0]:
+                    scored[contact['contact_id']] = (contact['score'], contact)
+        for _, contact in sorted(scored.values(), key=lambda item: -item[0]):
+            shortlist.setdefault(contact['contact_id'], contact)
+        return list(shortlist.values())[:GPT_CONTACT_LIMIT]
 
     def _normalize_name(self, name: str) -> str:
         """Normalize a name for comparison (lowercase, remove extra spaces)."""
@@ -258,9 +263,6 @@ class TranscriptConsolidationService:
             transcript_text = transcript['transcript'] or ''
             proposal_id = transcript.get('proposal_id')
 
-            # Load all contacts
-            all_contacts = self._load_contacts()
-
             # Get proposal-specific contacts if linked
             proposal_contacts = []
             if proposal_id:
@@ -270,8 +272,8 @@ class TranscriptConsolidationService:
             excerpt = transcript_text[:4000]  # First 4000 chars
             summary = transcript.get('summary') or ''
 
-            # Build contacts context for GPT
-            contacts_for_gpt = all_contacts[:100]  # Limit to 100 contacts
+            # Build contacts context for GPT: the contacts the transcript mentions
+            contacts_for_gpt = self._shortlist_contacts(f"{excerpt}\n{summary}", proposal_contacts)
             contacts_list = "\n".join([
                 f"- {c['name']} ({c.get('email', 'no email')}) - {c.get('role', 'unknown role')}"
                 for c in contacts_for_gpt
@@ -332,7 +334,6 @@ Only return the JSON array, nothing else."""
 
             # Now do our own fuzzy matching to verify/improve GPT matches
             matched_participants = []
-            contacts_by_id = {c['contact_id']: c for c in all_contacts}
 
             for p in gpt_participants:
                 name = p.get('name', '')
@@ -344,8 +345,8 @@ Only return the JSON array, nothing else."""
                 best_score = 0.0
 
                 # First check GPT's suggested match
-                if gpt_contact_id and gpt_contact_id in contacts_by_id:
-                    contact = contacts_by_id[gpt_contact_id]
+                contact = self.name_index.get_contact(gpt_contact_id) if gpt_contact_id else None
+                if contact:
                     score = self._fuzzy_match_name(name, contact['name'])
                     if score >= 0.7:
                         best_match = contact
@@ -360,9 +361,9 @@ Only return the JSON array, nothing else."""
                             best_score = score
                             best_match = contact
 
-                    # Then try all contacts
+                    # Then the contacts whose names sound or spell alike
                     if best_score < 0.85:
-                        for contact in all_contacts:
+                        for contact in self.name_index.candidates(name, k=NAME_CANDIDATES):
                             score = self._fuzzy_match_name(name, contact['name'])
                             if score > best_score:
                                 best_score = score
@@ -6,7 +6,8 @@ It NEVER auto-links transcripts - all links must be approved.
 
 Strategies:
 1. Code Extraction: Extract BK project codes from transcript text
-2. Name Matching: Match project/client names mentioned in transcript
+2. Name Matching: Match project/client names mentioned in transcript, and
+   participants who are contacts on a proposal (contact name index)
 3. AI Analysis: Use OpenAI to identify which proposal the transcript relates to
 
 Created: 2025-12-01
@@ -18,11 +19,20 @@ import os
 import json
 from datetime import datetime
 from typing import List, Dict, Optional
-from openai import OpenAI
+
+from .contact_name_index import get_contact_name_index
+from .email_participants import normalize_address
 
 # Default database path
 DB_PATH = os.getenv('DATABASE_PATH', 'database/bensley_master.db')
 
+# A participant on more proposals than this (staff, agents) says nothing
+# about which one the meeting was for
+MAX_PARTICIPANT_PROPOSALS = 3
+# Name index score for a participant to count as a contact (a first name
+# that sounds like the contact's scores about 0.78)
+PARTICIPANT_MIN_SCORE = 0.75
+
 
 class TranscriptLinker:
     """Creates suggestions to link unlinked transcripts to proposals"""
@@ -30,6 +40,7 @@ class TranscriptLinker:
     def __init__(self, db_path: str = DB_PATH, use_ai: bool = True):
         self.db_path = db_path
         self.use_ai = use_ai
+        from openai import OpenAI
         self.client = OpenAI() if use_ai else None
         self.stats = {
             'code_matched': 0,
@@ -60,7 +71,8 @@ class TranscriptLinker:
                     match_confidence,
                     meeting_title,
                     meeting_date,
-                    recorded_date
+                    recorded_date,
+                    participants
                 FROM meeting_transcripts
                 WHERE proposal_id IS NULL
                   AND project_id IS NULL
@@ -189,12 +201,73 @@ class TranscriptLinker:
     # STRATEGY 2: Name Matching
     # =========================================================================
 
+    def _participant_proposals(self, transcript: Dict) -> Dict[int, List[str]]:
+        """
+        proposal_id -> names of transcript participants who email about it.
+
+        Participants are matched to contacts through the contact name index
+        ("Kara" finds Caragh), then to proposals through their linked emails.
+        """
+        raw = transcript.get('participants')
+        if not raw:
+            return {}
+        try:
+            participants = json.loads(raw) if isinstance(raw, str) else raw
+        except (TypeError, ValueError):
+            participants = [name.strip() for name in str(raw).split(',')]
+        if not isinstance(participants, list):
+            return {}
+
+        index = get_contact_name_index(self.db_path)
+        names_by_address: Dict[str, str] = {}
+        for participant in participants:
+            if not isinstance(participant, dict):
+                participant = {'name': str(participant)}
+            contact = index.get_contact(participant['contact_id']) if participant.get('contact_id') else None
+            if contact:
+                contacts = [contact]
+            else:
+                # Every equally good match: namesakes, or one person with two addresses
+                contacts = index.candidates(participant.get('name') or '', k=5, min_score=PARTICIPANT_MIN_SCORE)
+                contacts = [c for c in contacts if c['score'] == contacts[0]['score']]
+            for contact in contacts:
+                address = normalize_address(contact.get('email'))
+                if address:
+                    names_by_address[address] = contact['name']
+        if not names_by_address:
+            return {}
+
+        placeholders = ','.join('?' * len(names_by_address))
+        with self.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT DISTINCT e.sender_address, epl.proposal_id
+                FROM emails e
+                JOIN email_proposal_links epl ON e.email_id = epl.email_id
+                WHERE e.sender_address IN ({placeholders})
+            """, list(names_by_address)).fetchall()
+
+        proposals_by_address: Dict[str, List[int]] = {}
+        for address, proposal_id in rows:
+            proposals_by_address.setdefault(address, []).append(proposal_id)
+        result: Dict[int, List[str]] = {}
+        for address, proposal_ids in proposals_by_address.items():
+            if len(proposal_ids) <= MAX_PARTICIPANT_PROPOSALS:
+                for proposal_id in proposal_ids:
+                    result.setdefault(proposal_id, []).append(names_by_address[address])
+        return result
+
     def match_by_name(self, transcript: Dict, proposals: Dict) -> Optional[Dict]:
-        """Try to match transcript to proposal by project/client names"""
+        """Try to match transcript to proposal by project/client/participant names"""
         text = (transcript.get('transcript', '') + ' ' +
                 (transcript.get('summary') or '') + ' ' +
                 (transcript.get('meeting_title') or '')).lower()
 
+        try:
+            participant_proposals = self._participant_proposals(transcript)
+        except sqlite3.Error as e:
+            print(f"  Participant matching skipped: {e}")
+            participant_proposals = {}
+
         best_match = None
         best_score = 0
 
@@ -202,6 +275,12 @@ class TranscriptLinker:
             score = 0
             reasons = []
 
+            # Check participants who correspond about this proposal
+            participant_names = participant_proposals.get(proposal.get('proposal_id'))
+            if participant_names:
+                score += 0.5
+                reasons.append(f"Participant match: {', '.join(sorted(set(participant_names)))}")
+
             # Check project name
             project_name = (proposal.get('project_name') or '').lower()
             if project_name and len(project_name) > 5:
@@ -412,6 +491,7 @@ Do not explain - just provide the code or UNSURE."""
                     meeting_title,
                     meeting_date,
                     recorded_date,
+                    participants,
                     proposal_id,
                     project_id
                 FROM meeting_transcripts
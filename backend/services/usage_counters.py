@@ -0,0 +1,334 @@
+"""
+Usage Counters - write-behind aggregation of pattern usage counters
+
+Every pattern match used to commit its own
+`UPDATE ... SET times_used = times_used + 1` (category_patterns in the
+email tagger, email_learned_patterns in the linker, batch suggestions and
+the suggestion writer). A 2,000-email batch meant thousands of one-row
+write transactions queueing for the write lock in front of the API.
+
+Matches are now recorded in memory: a count and the latest use per
+(table, pattern). A background thread applies them in one transaction on
+the pool's writer:
+- when USAGE_FLUSH_EVENTS uses have accumulated
+- every USAGE_FLUSH_SECONDS
+- at shutdown (atexit, and flush_all_usage_counters() in the API lifespan)
+
+Durability: each use is also appended to a small spill segment
+(<db dir>/<db name>.usage_spill/<pid>-<token>.spill) before record()
+returns. A flush rotates the segment and deletes it once the transaction
+commits. Segments left behind by a process that died are replayed the
+next time counters are opened for that database. Delivery is at least
+once: a crash between the commit and the unlink counts that batch twice,
+which is harmless for usage analytics.
+
+Usage:
+    from services.usage_counters import get_usage_counters
+
+    get_usage_counters(db_path).record('email_learned_patterns', pattern_id)
+"""
+
+import atexit
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .connection_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+USAGE_FLUSH_EVENTS = int(os.getenv('USAGE_FLUSH_EVENTS', '500'))
+USAGE_FLUSH_SECONDS = float(os.getenv('USAGE_FLUSH_SECONDS', '5'))
+
+
+class CounterTable:
+    """A usage counter column, the timestamp of the last use, and the row key"""
+
+    __slots__ = ('table', 'id_column', 'count_column', 'last_used_column', 'touch_updated_at')
+
+    def __init__(self, table: str, id_column: str, count_column: str, last_used_column: str,
+                 touch_updated_at: bool = False):
+        self.table = table
+        self.id_column = id_column
+        self.count_column = count_column
+        self.last_used_column = last_used_column
+        self.touch_updated_at = touch_updated_at
+
+    def update_sql(self) -> str:
+        # Timestamps are datetime('now')-formatted UTC text, so MAX() keeps the latest
+        touch = ", updated_at = datetime('now')" if self.touch_updated_at else ''
+        return (
+            f"UPDATE {self.table} "
+            f"SET {self.count_column} = {self.count_column} + ?, "
+            f"{self.last_used_column} = MAX(COALESCE({self.last_used_column}, ''), ?){touch} "
+            f"WHERE {self.id_column} = ?"
+        )
+
+
+COUNTER_TABLES: Dict[str, CounterTable] = {
+    'category_patterns': CounterTable('category_patterns', 'pattern_id', 'times_matched', 'last_matched_at'),
+    'email_learned_patterns': CounterTable('email_learned_patterns', 'pattern_id', 'times_used',
+                                           'last_used_at', touch_updated_at=True),
+}
+
+# (table, pattern_id) -> [count, last used]
+Deltas = Dict[Tuple[str, int], List]
+
+# Spill tokens of aggregators alive in this process (their segments are not stale)
+_live_tokens: set = set()
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _merge(deltas: Deltas, table: str, pattern_id: int, count: int, used_at: str):
+    entry = deltas.get((table, pattern_id))
+    if entry is None:
+        deltas[(table, pattern_id)] = [count, used_at]
+    else:
+        entry[0] += count
+        if used_at > entry[1]:
+            entry[1] = used_at
+
+
+def _read_spill(path: Path, deltas: Deltas) -> int:
+    """Merge a spill segment into deltas; returns lines read (torn lines are skipped)"""
+    lines = 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) != 4 or parts[0] not in COUNTER_TABLES:
+                continue
+            try:
+                _merge(deltas, parts[0], int(parts[1]), int(parts[2]), parts[3])
+            except ValueError:
+                continue
+            lines += 1
+    return lines
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class UsageCounters:
+    """Write-behind usage counters for one database"""
+
+    def __init__(self, db_path: str, spill_dir: Optional[str] = None,
+                 flush_events: int = USAGE_FLUSH_EVENTS, flush_seconds: float = USAGE_FLUSH_SECONDS):
+        self.db_path = str(db_path)
+        db = Path(self.db_path)
+        self.spill_dir = Path(spill_dir) if spill_dir else db.parent / f"{db.name}.usage_spill"
+        self.flush_events = flush_events
+        self.flush_seconds = flush_seconds
+
+        self._token = uuid.uuid4().hex[:12]
+        self._pending: Deltas = {}
+        self._pending_events = 0
+        self._lock = threading.Lock()           # pending + active segment
+        self._flush_lock = threading.Lock()     # one flush at a time
+        self._segment_seq = 0
+        self._spill = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._stats = {'recorded': 0, 'flushes': 0, 'rows_flushed': 0, 'failed_flushes': 0,
+                       'recovered_events': 0}
+
+        self.spill_dir.mkdir(parents=True, exist_ok=True)
+        _live_tokens.add(self._token)
+        self.recover()
+        self._open_segment()
+
+        self._thread = threading.Thread(target=self._run, name=f"usage-counters-{self._token}", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, table: str, pattern_id: int, count: int = 1):
+        """
+        Count a use of a pattern. Returns once the use is spilled to disk.
+
+        Raises:
+            KeyError: table is not in COUNTER_TABLES
+        """
+        if table not in COUNTER_TABLES:
+            raise KeyError(f"No usage counter for {table}")
+        if not pattern_id or self._closed:
+            return
+        used_at = _utc_now()
+        with self._lock:
+            self._spill.write(f"{table}\t{int(pattern_id)}\t{count}\t{used_at}\n")
+            _merge(self._pending, table, int(pattern_id), count, used_at)
+            self._pending_events += count
+            self._stats['recorded'] += count
+            full = self._pending_events >= self.flush_events
+        if full:
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, suffix: str) -> Path:
+        return self.spill_dir / f"{os.getpid()}-{self._token}.{suffix}"
+
+    def _open_segment(self):
+        # Line-buffered: a use reaches the OS (and survives a process crash)
+        # before record() returns
+        self._spill = open(self._segment_path('spill'), 'a', encoding='utf-8', buffering=1)
+
+    def flush(self) -> int:
+        """Apply pending counts in one transaction; returns patterns updated"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                deltas, self._pending, self._pending_events = self._pending, {}, 0
+                # Rotate: uses recorded from now on go to a fresh segment
+                self._spill.close()
+                self._segment_seq += 1
+                flushing = self._segment_path(f"{self._segment_seq}.flushing")
+                os.replace(self._segment_path('spill'), flushing)
+                self._open_segment()
+
+            try:
+                self._apply(deltas)
+            except Exception as e:
+                logger.warning(f"Usage counter flush failed, will retry: {e}")
+                with self._lock:
+                    for (table, pattern_id), (count, used_at) in deltas.items():
+                        _merge(self._pending, table, pattern_id, count, used_at)
+                        self._spill.write(f"{table}\t{pattern_id}\t{count}\t{used_at}\n")
+                        self._pending_events += count
+                    self._stats['failed_flushes'] += 1
+                flushing.unlink(missing_ok=True)
+                return 0
+
+            flushing.unlink(missing_ok=True)
+            with self._lock:
+                self._stats['flushes'] += 1
+                self._stats['rows_flushed'] += len(deltas)
+            return len(deltas)
+
+    def _apply(self, deltas: Deltas):
+        by_table: Dict[str, List[Tuple[int, str, int]]] = {}
+        for (table, pattern_id), (count, used_at) in deltas.items():
+            by_table.setdefault(table, []).append((count, used_at, pattern_id))
+        with get_pool(self.db_path).writer() as conn:
+            for table, rows in by_table.items():
+                conn.executemany(COUNTER_TABLES[table].update_sql(), rows)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            if self._closed:
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Usage counter flusher error: {e}")
+
+    def recover(self) -> int:
+        """Replay spill segments left by processes that died; returns uses recovered"""
+        deltas: Deltas = {}
+        stale: List[Path] = []
+        for path in sorted(self.spill_dir.glob('*-*.*')):
+            pid, _, rest = path.name.partition('-')
+            token = rest.split('.', 1)[0]
+            if not pid.isdigit() or token in _live_tokens:
+                continue
+            if int(pid) != os.getpid() and _process_alive(int(pid)):
+                continue
+            try:
+                _read_spill(path, deltas)
+            except OSError as e:
+                logger.warning(f"Cannot read usage spill {path}: {e}")
+                continue
+            stale.append(path)
+
+        if not deltas:
+            for path in stale:
+                path.unlink(missing_ok=True)
+            return 0
+        try:
+            self._apply(deltas)
+        except Exception as e:
+            logger.warning(f"Usage counter recovery failed, segments kept: {e}")
+            return 0
+        for path in stale:
+            path.unlink(missing_ok=True)
+
+        recovered = sum(count for count, _ in deltas.values())
+        self._stats['recovered_events'] += recovered
+        logger.info(f"Recovered {recovered} pattern uses from {len(stale)} spill segment(s)")
+        return recovered
+
+    def close(self):
+        """Stop the flusher and write out everything pending"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        with self._lock:
+            self._spill.close()
+            if self._pending:
+                return  # last flush failed - the segment is replayed by the next process
+            self._segment_path('spill').unlink(missing_ok=True)
+        _live_tokens.discard(self._token)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, 'pending_patterns': len(self._pending),
+                    'pending_events': self._pending_events}
+
+
+# ============================================================================
+# SHARED INSTANCES
+# ============================================================================
+
+_counters: Dict[str, UsageCounters] = {}
+_counters_lock = threading.Lock()
+
+
+def get_usage_counters(db_path: str) -> UsageCounters:
+    """Shared instance per database (created, and stale spills replayed, on first use)"""
+    key = str(Path(db_path).expanduser().resolve())
+    counters = _counters.get(key)
+    if counters is None:
+        with _counters_lock:
+            counters = _counters.get(key)
+            if counters is None:
+                counters = UsageCounters(key)
+                _counters[key] = counters
+    return counters
+
+
+def flush_all_usage_counters():
+    """Flush and close every shared instance (shutdown hook)"""
+    with _counters_lock:
+        counters = list(_counters.values())
+        _counters.clear()
+    for instance in counters:
+        try:
+            instance.close()
+        except Exception as e:
+            logger.error(f"Failed to flush usage counters for {instance.db_path}: {e}")
+
+
+atexit.register(flush_all_usage_counters)
@@ -17,6 +17,7 @@ import json
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from .base_service import BaseService
+from .kpi_snapshot_service import get_kpi_snapshot_service
 
 import logging
 logger = logging.getLogger(__name__)
@@ -230,18 +231,33 @@ class WeeklyReportService(BaseService):
             'at_risk_value': sum(p.get('project_value', 0) or 0 for p in at_risk)
         }
 
+    def _proposal_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Proposal pipeline aggregates from the KPI snapshot (None before migration 110)"""
+        kpis = get_kpi_snapshot_service(str(self.db_path))
+        if not kpis.ensure_fresh():
+            return None
+        return kpis.get_proposal_stats() or None
+
     def _get_pipeline_outlook(self, cursor) -> Dict[str, Any]:
         """Get pipeline metrics and trends."""
         # Active pipeline
-        cursor.execute("""
-            SELECT
-                COUNT(*) as count,
-                COALESCE(SUM(project_value), 0) as total_value,
-                COALESCE(SUM(project_value * COALESCE(win_probability, 50) / 100), 0) as weighted_value
-            FROM proposals
-            WHERE status NOT IN ('Contract Signed', 'Lost', 'Declined')
-        """)
-        pipeline = dict(cursor.fetchone())
+        snapshot = self._proposal_snapshot()
+        if snapshot:
+            pipeline = {
+                'count': snapshot['open_pipeline_count'],
+                'total_value': snapshot['open_pipeline_value'],
+                'weighted_value': snapshot['open_pipeline_weighted'],
+            }
+        else:
+            cursor.execute("""
+                SELECT
+                    COUNT(*) as count,
+                    COALESCE(SUM(project_value), 0) as total_value,
+                    COALESCE(SUM(project_value * COALESCE(win_probability, 50) / 100), 0) as weighted_value
+                FROM proposals
+                WHERE status NOT IN ('Contract Signed', 'Lost', 'Declined')
+            """)
+            pipeline = dict(cursor.fetchone())
 
         # By status
         cursor.execute("""
@@ -596,6 +612,15 @@ class WeeklyReportService(BaseService):
 
     def get_quick_stats(self) -> Dict[str, Any]:
         """Get quick stats for dashboard card."""
+        snapshot = self._proposal_snapshot()
+        if snapshot:
+            return {
+                'pipeline_value': snapshot['open_pipeline_value'],
+                'pipeline_count': snapshot['open_pipeline_count'],
+                'overdue_count': snapshot['overdue_action_count'],
+                'our_move_count': snapshot['our_move_count']
+            }
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
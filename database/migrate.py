@@ -136,6 +136,24 @@ class MigrationRunner:
         print("-"*80)
         print(f"\n✅ {len(applied)} applied  |  ⏳ {pending_count} pending\n")
 
+    @staticmethod
+    def _split_statements(sql):
+        """Split a migration into statements, keeping trigger bodies (BEGIN ... END;) intact"""
+        statements = []
+        buffer = ''
+        for line in sql.splitlines(keepends=True):
+            if not buffer.strip() and line.strip().startswith('--'):
+                continue
+            buffer += line
+            if sqlite3.complete_statement(buffer):
+                statement = buffer.strip()
+                if statement.rstrip(';').strip():
+                    statements.append(statement)
+                buffer = ''
+        if buffer.strip():
+            statements.append(buffer.strip())
+        return statements
+
     def apply_migration(self, migration):
         """Apply a single migration"""
         version = migration['version']
@@ -154,12 +172,8 @@ class MigrationRunner:
         # Execute migration
         start_time = datetime.now()
         try:
-            # Split on semicolons but be careful with compound statements
-            statements = sql.split(';')
-            for statement in statements:
-                statement = statement.strip()
-                if statement and not statement.startswith('--'):
-                    self.cursor.execute(statement)
+            for statement in self._split_statements(sql):
+                self.cursor.execute(statement)
 
             execution_time = int((datetime.now() - start_time).total_seconds() * 1000)
 
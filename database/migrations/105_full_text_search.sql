@@ -0,0 +1,206 @@
+-- Migration 105: Full-text search (FTS5) over emails, documents, contacts, projects, proposals
+-- Created: 2026-01-05
+--
+-- PROBLEM:
+-- Email/document/contact search used LIKE '%q%' scans (no index, no ranking).
+-- The emails_fts table from migration 010 was never queried, and its triggers
+-- wrote to an external-content table incorrectly (rowid never set, deletes
+-- issued as plain DELETEs instead of the FTS5 'delete' command).
+--
+-- FIX:
+-- 1. Recreate emails_fts keyed on email_id (subject, sender, snippet, body)
+-- 2. Add documents_fts, contacts_fts, projects_fts, proposals_fts
+-- 3. Triggers keep every index in sync on INSERT/UPDATE/DELETE
+-- 4. Rebuild all indexes from existing rows
+--
+-- Rebuild later with: python3 scripts/maintenance/rebuild_search_index.py
+
+-- ============================================
+-- STEP 1: Drop the old emails_fts and its triggers
+-- ============================================
+
+DROP TRIGGER IF EXISTS emails_ai;
+DROP TRIGGER IF EXISTS emails_ad;
+DROP TRIGGER IF EXISTS emails_au;
+DROP TABLE IF EXISTS emails_fts;
+
+-- ============================================
+-- STEP 2: Virtual tables (external content - no duplicated text)
+-- ============================================
+
+CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+    subject,
+    sender_email,
+    snippet,
+    body_full,
+    content='emails',
+    content_rowid='email_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    file_name,
+    project_code,
+    document_type,
+    text_content,
+    content='documents',
+    content_rowid='document_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    name,
+    email,
+    company,
+    role,
+    content='contacts',
+    content_rowid='contact_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+    project_code,
+    project_title,
+    content='projects',
+    content_rowid='project_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS proposals_fts USING fts5(
+    project_code,
+    project_name,
+    client_company,
+    content='proposals',
+    content_rowid='proposal_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+-- ============================================
+-- STEP 3: Sync triggers
+-- UPDATE triggers only fire when an indexed column changes, so flag/status
+-- updates on emails don't touch the index.
+-- ============================================
+
+-- emails
+DROP TRIGGER IF EXISTS trg_emails_fts_insert;
+CREATE TRIGGER trg_emails_fts_insert AFTER INSERT ON emails BEGIN
+    INSERT INTO emails_fts(rowid, subject, sender_email, snippet, body_full)
+    VALUES (new.email_id, new.subject, new.sender_email, new.snippet, new.body_full);
+END;
+
+DROP TRIGGER IF EXISTS trg_emails_fts_delete;
+CREATE TRIGGER trg_emails_fts_delete AFTER DELETE ON emails BEGIN
+    INSERT INTO emails_fts(emails_fts, rowid, subject, sender_email, snippet, body_full)
+    VALUES ('delete', old.email_id, old.subject, old.sender_email, old.snippet, old.body_full);
+END;
+
+DROP TRIGGER IF EXISTS trg_emails_fts_update;
+CREATE TRIGGER trg_emails_fts_update AFTER UPDATE OF subject, sender_email, snippet, body_full ON emails BEGIN
+    INSERT INTO emails_fts(emails_fts, rowid, subject, sender_email, snippet, body_full)
+    VALUES ('delete', old.email_id, old.subject, old.sender_email, old.snippet, old.body_full);
+    INSERT INTO emails_fts(rowid, subject, sender_email, snippet, body_full)
+    VALUES (new.email_id, new.subject, new.sender_email, new.snippet, new.body_full);
+END;
+
+-- documents
+DROP TRIGGER IF EXISTS trg_documents_fts_insert;
+CREATE TRIGGER trg_documents_fts_insert AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, file_name, project_code, document_type, text_content)
+    VALUES (new.document_id, new.file_name, new.project_code, new.document_type, new.text_content);
+END;
+
+DROP TRIGGER IF EXISTS trg_documents_fts_delete;
+CREATE TRIGGER trg_documents_fts_delete AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, file_name, project_code, document_type, text_content)
+    VALUES ('delete', old.document_id, old.file_name, old.project_code, old.document_type, old.text_content);
+END;
+
+DROP TRIGGER IF EXISTS trg_documents_fts_update;
+CREATE TRIGGER trg_documents_fts_update AFTER UPDATE OF file_name, project_code, document_type, text_content ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, file_name, project_code, document_type, text_content)
+    VALUES ('delete', old.document_id, old.file_name, old.project_code, old.document_type, old.text_content);
+    INSERT INTO documents_fts(rowid, file_name, project_code, document_type, text_content)
+    VALUES (new.document_id, new.file_name, new.project_code, new.document_type, new.text_content);
+END;
+
+-- contacts
+DROP TRIGGER IF EXISTS trg_contacts_fts_insert;
+CREATE TRIGGER trg_contacts_fts_insert AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts(rowid, name, email, company, role)
+    VALUES (new.contact_id, new.name, new.email, new.company, new.role);
+END;
+
+DROP TRIGGER IF EXISTS trg_contacts_fts_delete;
+CREATE TRIGGER trg_contacts_fts_delete AFTER DELETE ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, name, email, company, role)
+    VALUES ('delete', old.contact_id, old.name, old.email, old.company, old.role);
+END;
+
+DROP TRIGGER IF EXISTS trg_contacts_fts_update;
+CREATE TRIGGER trg_contacts_fts_update AFTER UPDATE OF name, email, company, role ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, name, email, company, role)
+    VALUES ('delete', old.contact_id, old.name, old.email, old.company, old.role);
+    INSERT INTO contacts_fts(rowid, name, email, company, role)
+    VALUES (new.contact_id, new.name, new.email, new.company, new.role);
+END;
+
+-- projects
+DROP TRIGGER IF EXISTS trg_projects_fts_insert;
+CREATE TRIGGER trg_projects_fts_insert AFTER INSERT ON projects BEGIN
+    INSERT INTO projects_fts(rowid, project_code, project_title)
+    VALUES (new.project_id, new.project_code, new.project_title);
+END;
+
+DROP TRIGGER IF EXISTS trg_projects_fts_delete;
+CREATE TRIGGER trg_projects_fts_delete AFTER DELETE ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, project_code, project_title)
+    VALUES ('delete', old.project_id, old.project_code, old.project_title);
+END;
+
+DROP TRIGGER IF EXISTS trg_projects_fts_update;
+CREATE TRIGGER trg_projects_fts_update AFTER UPDATE OF project_code, project_title ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, project_code, project_title)
+    VALUES ('delete', old.project_id, old.project_code, old.project_title);
+    INSERT INTO projects_fts(rowid, project_code, project_title)
+    VALUES (new.project_id, new.project_code, new.project_title);
+END;
+
+-- proposals
+DROP TRIGGER IF EXISTS trg_proposals_fts_insert;
+CREATE TRIGGER trg_proposals_fts_insert AFTER INSERT ON proposals BEGIN
+    INSERT INTO proposals_fts(rowid, project_code, project_name, client_company)
+    VALUES (new.proposal_id, new.project_code, new.project_name, new.client_company);
+END;
+
+DROP TRIGGER IF EXISTS trg_proposals_fts_delete;
+CREATE TRIGGER trg_proposals_fts_delete AFTER DELETE ON proposals BEGIN
+    INSERT INTO proposals_fts(proposals_fts, rowid, project_code, project_name, client_company)
+    VALUES ('delete', old.proposal_id, old.project_code, old.project_name, old.client_company);
+END;
+
+DROP TRIGGER IF EXISTS trg_proposals_fts_update;
+CREATE TRIGGER trg_proposals_fts_update AFTER UPDATE OF project_code, project_name, client_company ON proposals BEGIN
+    INSERT INTO proposals_fts(proposals_fts, rowid, project_code, project_name, client_company)
+    VALUES ('delete', old.proposal_id, old.project_code, old.project_name, old.client_company);
+    INSERT INTO proposals_fts(rowid, project_code, project_name, client_company)
+    VALUES (new.proposal_id, new.project_code, new.project_name, new.client_company);
+END;
+
+-- ============================================
+-- STEP 4: Populate from existing rows
+-- ============================================
+
+INSERT INTO emails_fts(emails_fts) VALUES ('rebuild');
+INSERT INTO documents_fts(documents_fts) VALUES ('rebuild');
+INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild');
+INSERT INTO projects_fts(projects_fts) VALUES ('rebuild');
+INSERT INTO proposals_fts(proposals_fts) VALUES ('rebuild');
+
+-- Record migration
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (105, '105_full_text_search', datetime('now'));
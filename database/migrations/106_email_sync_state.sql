@@ -0,0 +1,27 @@
+-- Migration 106: IMAP sync state (UIDVALIDITY + UID high-water mark per account/folder)
+-- Created: 2026-01-06
+--
+-- PROBLEM:
+-- scheduled_email_sync and EmailImporter ran SEARCH ALL on every run and
+-- downloaded the full RFC822 message for the last N emails before checking
+-- message_id for duplicates - every run re-fetched the same mail.
+--
+-- FIX:
+-- Remember, per account and folder, the mailbox UIDVALIDITY and the highest
+-- UID already synced. Each run only asks the server for UIDs above the mark.
+-- If UIDVALIDITY changes (mailbox rebuilt on the server) the mark is reset
+-- and message_id dedup takes over for that run.
+
+CREATE TABLE IF NOT EXISTS email_sync_state (
+    account_email   TEXT NOT NULL,           -- '' for single-account imports
+    folder          TEXT NOT NULL,
+    uidvalidity     INTEGER NOT NULL,
+    last_uid        INTEGER NOT NULL DEFAULT 0,
+    messages_synced INTEGER NOT NULL DEFAULT 0,
+    last_synced_at  TEXT,
+    PRIMARY KEY (account_email, folder)
+);
+
+-- Record migration
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (106, '106_email_sync_state', datetime('now'));
@@ -0,0 +1,39 @@
+-- Migration 107: Email sync run metrics
+-- Created: 2026-01-07
+--
+-- PROBLEM:
+-- scheduled_email_sync synced accounts one after another and only wrote a
+-- log file - no record of how long each mailbox took, how much it moved or
+-- which one failed.
+--
+-- FIX:
+-- One row per account per sync run, updated while the run is in progress
+-- by the sync scheduler's DB writer (backend/services/email_sync_scheduler.py).
+
+CREATE TABLE IF NOT EXISTS email_sync_runs (
+    id                  INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id              TEXT NOT NULL,
+    account_email       TEXT NOT NULL,
+    folders             TEXT,                       -- comma-separated
+    status              TEXT NOT NULL DEFAULT 'running',  -- running, completed, partial, failed
+    started_at          TEXT NOT NULL,
+    finished_at         TEXT,
+    folders_done        INTEGER NOT NULL DEFAULT 0,
+    new_uids            INTEGER NOT NULL DEFAULT 0,
+    messages_fetched    INTEGER NOT NULL DEFAULT 0,
+    imported            INTEGER NOT NULL DEFAULT 0,
+    skipped             INTEGER NOT NULL DEFAULT 0,
+    errors              INTEGER NOT NULL DEFAULT 0,
+    bytes_fetched       INTEGER NOT NULL DEFAULT 0,
+    duration_seconds    REAL,
+    messages_per_second REAL,
+    error_message       TEXT,
+    UNIQUE (run_id, account_email)
+);
+
+CREATE INDEX IF NOT EXISTS idx_email_sync_runs_started ON email_sync_runs(started_at);
+CREATE INDEX IF NOT EXISTS idx_email_sync_runs_account ON email_sync_runs(account_email, started_at);
+
+-- Record migration
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (107, '107_email_sync_runs', datetime('now'));
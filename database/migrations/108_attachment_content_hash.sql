@@ -0,0 +1,21 @@
+-- Migration 108: SHA-256 content hash on attachments
+-- Created: 2026-01-08
+--
+-- PROBLEM:
+-- EmailImporter decoded every attachment into memory and wrote a new file
+-- for each email, so a drawing set attached to twenty replies was stored
+-- twenty times and nothing could tell the copies apart from new files.
+--
+-- FIX:
+-- The streaming importer (backend/services/mime_stream.py) hashes parts as
+-- they are spooled to disk. The hash is stored per attachment row and an
+-- attachment whose content is already on disk reuses that stored_path.
+-- Existing rows stay NULL until backfilled.
+
+ALTER TABLE attachments ADD COLUMN content_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_attachments_content_hash ON attachments(content_hash);
+
+-- Record migration
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (108, '108_attachment_content_hash', datetime('now'));
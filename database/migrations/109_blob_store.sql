@@ -0,0 +1,68 @@
+-- Migration 109: Content-addressed blob store for attachments and files
+-- Created: 2026-01-09
+--
+-- PROBLEM:
+-- The same contract PDFs and drawing sets are attached to dozens of email
+-- replies and each copy was written to its own file under files/ - the
+-- working set (and every backup/restore of it) was mostly duplicates.
+--
+-- FIX:
+-- File content lives once under files/blobs/ab/cd/<sha256>. blobs holds one
+-- row per stored blob with a reference count; blob_refs links owner rows
+-- (attachments, email_attachments, project_files, documents) to a blob,
+-- keeping the path the owner row recorded so existing paths still resolve.
+-- Triggers keep ref_count in step with blob_refs. Blobs at zero references
+-- are removed by garbage collection after a grace period
+-- (scripts/maintenance/blob_store.py gc).
+
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256          TEXT PRIMARY KEY,
+    size            INTEGER NOT NULL,
+    ref_count       INTEGER NOT NULL DEFAULT 0,
+    created_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    unreferenced_at TEXT                        -- set when ref_count drops to 0
+);
+
+CREATE TABLE IF NOT EXISTS blob_refs (
+    ref_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner_table  TEXT NOT NULL,                 -- attachments, email_attachments, project_files, documents
+    owner_id     INTEGER NOT NULL,
+    sha256       TEXT NOT NULL REFERENCES blobs(sha256),
+    logical_path TEXT,                          -- path stored on the owner row
+    created_at   TEXT NOT NULL DEFAULT (datetime('now')),
+    UNIQUE (owner_table, owner_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_blob_refs_sha256 ON blob_refs(sha256);
+CREATE INDEX IF NOT EXISTS idx_blob_refs_logical_path ON blob_refs(logical_path);
+CREATE INDEX IF NOT EXISTS idx_blobs_unreferenced ON blobs(unreferenced_at) WHERE ref_count <= 0;
+
+CREATE TRIGGER IF NOT EXISTS trg_blob_refs_insert
+AFTER INSERT ON blob_refs
+BEGIN
+    UPDATE blobs SET ref_count = ref_count + 1, unreferenced_at = NULL
+    WHERE sha256 = NEW.sha256;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_blob_refs_delete
+AFTER DELETE ON blob_refs
+BEGIN
+    UPDATE blobs SET ref_count = ref_count - 1,
+        unreferenced_at = CASE WHEN ref_count <= 1 THEN datetime('now') ELSE unreferenced_at END
+    WHERE sha256 = OLD.sha256;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_blob_refs_repoint
+AFTER UPDATE OF sha256 ON blob_refs
+WHEN NEW.sha256 != OLD.sha256
+BEGIN
+    UPDATE blobs SET ref_count = ref_count + 1, unreferenced_at = NULL
+    WHERE sha256 = NEW.sha256;
+    UPDATE blobs SET ref_count = ref_count - 1,
+        unreferenced_at = CASE WHEN ref_count <= 1 THEN datetime('now') ELSE unreferenced_at END
+    WHERE sha256 = OLD.sha256;
+END;
+
+-- Record migration
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (109, '109_blob_store', datetime('now'));
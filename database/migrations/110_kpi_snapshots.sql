@@ -0,0 +1,170 @@
+-- Migration 110: Materialized KPI snapshots for dashboards
+-- Created: 2026-01-10
+--
+-- PROBLEM:
+-- /api/dashboard/stats (every role), /api/dashboard/kpis, the weekly report
+-- and FinancialService.get_invoice_aging_summary recompute pipeline value,
+-- outstanding/overdue invoice totals and aging buckets with invoices x
+-- projects joins on every request, even though the underlying rows change
+-- a few times a day.
+--
+-- FIX:
+-- kpi_project_snapshot holds one row of invoice/contract aggregates per
+-- project code (including invoice codes with no projects row, and '' for
+-- invoices without a code). kpi_global_snapshot holds the aggregates that
+-- are not per project (proposal pipeline, PM counters) as JSON payloads.
+-- Triggers on invoices, projects, proposals, project_milestones and rfis
+-- record what changed in kpi_dirty. KpiSnapshotService recomputes only the
+-- dirty rows (and everything once a day, since overdue/aging buckets move
+-- with the date) and dashboards read the snapshot, reporting when it was
+-- last refreshed.
+
+CREATE TABLE IF NOT EXISTS kpi_project_snapshot (
+    project_code          TEXT PRIMARY KEY,
+    has_project           INTEGER NOT NULL DEFAULT 0,   -- 1 if a projects row exists
+    is_active_project     INTEGER NOT NULL DEFAULT 0,
+    status                TEXT,
+    total_fee_usd         REAL NOT NULL DEFAULT 0,
+    contract_signed_date  TEXT,
+
+    -- Invoice aggregates (balance = invoice_amount - payment_amount)
+    invoice_count         INTEGER NOT NULL DEFAULT 0,
+    paid_total            REAL NOT NULL DEFAULT 0,
+    outstanding_total     REAL NOT NULL DEFAULT 0,      -- positive balances
+    outstanding_30d_ago   REAL NOT NULL DEFAULT 0,      -- positive balances, invoiced 30+ days ago
+    overdue_count         INTEGER NOT NULL DEFAULT 0,
+    overdue_amount        REAL NOT NULL DEFAULT 0,
+    overdue_30_amount     REAL NOT NULL DEFAULT 0,
+    overdue_60_amount     REAL NOT NULL DEFAULT 0,
+    overdue_90_amount     REAL NOT NULL DEFAULT 0,
+    recent_payments_7d    REAL NOT NULL DEFAULT 0,
+    payment_days_sum      REAL NOT NULL DEFAULT 0,      -- for average days to payment
+    payment_days_count    INTEGER NOT NULL DEFAULT 0,
+    largest_outstanding   REAL NOT NULL DEFAULT 0,
+    largest_outstanding_invoice TEXT,
+
+    -- Aging of invoices not marked paid (FinancialService buckets)
+    aging_current_count   INTEGER NOT NULL DEFAULT 0,
+    aging_current_amount  REAL NOT NULL DEFAULT 0,
+    aging_1_30_count      INTEGER NOT NULL DEFAULT 0,
+    aging_1_30_amount     REAL NOT NULL DEFAULT 0,
+    aging_31_60_count     INTEGER NOT NULL DEFAULT 0,
+    aging_31_60_amount    REAL NOT NULL DEFAULT 0,
+    aging_61_90_count     INTEGER NOT NULL DEFAULT 0,
+    aging_61_90_amount    REAL NOT NULL DEFAULT 0,
+    aging_90_plus_count   INTEGER NOT NULL DEFAULT 0,
+    aging_90_plus_amount  REAL NOT NULL DEFAULT 0,
+
+    as_of_date            TEXT NOT NULL,                -- date the date-relative columns were computed for
+    refreshed_at          TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_kpi_project_snapshot_active
+    ON kpi_project_snapshot(is_active_project);
+
+CREATE TABLE IF NOT EXISTS kpi_global_snapshot (
+    metric        TEXT PRIMARY KEY,                     -- proposals, pm, refresh
+    payload       TEXT NOT NULL,                        -- JSON
+    as_of_date    TEXT NOT NULL,
+    refreshed_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+-- Change log: what needs recomputing. key is a project code for scope
+-- 'project', '*' for the global groups.
+CREATE TABLE IF NOT EXISTS kpi_dirty (
+    scope       TEXT NOT NULL,                          -- project, proposals, pm
+    key         TEXT NOT NULL,
+    changed_at  TEXT NOT NULL DEFAULT (datetime('now')),
+    PRIMARY KEY (scope, key)
+);
+
+-- invoices -> the project rows they roll up into
+DROP TRIGGER IF EXISTS trg_kpi_invoices_insert;
+CREATE TRIGGER trg_kpi_invoices_insert AFTER INSERT ON invoices BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', COALESCE(NEW.project_code, ''));
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_invoices_delete;
+CREATE TRIGGER trg_kpi_invoices_delete AFTER DELETE ON invoices BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', COALESCE(OLD.project_code, ''));
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_invoices_update;
+CREATE TRIGGER trg_kpi_invoices_update
+AFTER UPDATE OF project_code, invoice_number, invoice_amount, payment_amount, invoice_date,
+                due_date, payment_date, status ON invoices
+BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', COALESCE(NEW.project_code, ''));
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', COALESCE(OLD.project_code, ''));
+END;
+
+-- projects
+DROP TRIGGER IF EXISTS trg_kpi_projects_insert;
+CREATE TRIGGER trg_kpi_projects_insert AFTER INSERT ON projects BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', NEW.project_code);
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_projects_delete;
+CREATE TRIGGER trg_kpi_projects_delete AFTER DELETE ON projects BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', OLD.project_code);
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_projects_update;
+CREATE TRIGGER trg_kpi_projects_update
+AFTER UPDATE OF project_code, is_active_project, status, total_fee_usd, contract_signed_date ON projects
+BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', NEW.project_code);
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('project', OLD.project_code);
+END;
+
+-- proposals -> pipeline group
+DROP TRIGGER IF EXISTS trg_kpi_proposals_insert;
+CREATE TRIGGER trg_kpi_proposals_insert AFTER INSERT ON proposals BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('proposals', '*');
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_proposals_delete;
+CREATE TRIGGER trg_kpi_proposals_delete AFTER DELETE ON proposals BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('proposals', '*');
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_proposals_update;
+CREATE TRIGGER trg_kpi_proposals_update
+AFTER UPDATE OF project_value, current_status, status, win_probability, action_due, ball_in_court ON proposals
+BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('proposals', '*');
+END;
+
+-- project_milestones / rfis -> PM group
+DROP TRIGGER IF EXISTS trg_kpi_milestones_insert;
+CREATE TRIGGER trg_kpi_milestones_insert AFTER INSERT ON project_milestones BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('pm', '*');
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_milestones_update;
+CREATE TRIGGER trg_kpi_milestones_update AFTER UPDATE OF status, planned_date ON project_milestones BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('pm', '*');
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_milestones_delete;
+CREATE TRIGGER trg_kpi_milestones_delete AFTER DELETE ON project_milestones BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('pm', '*');
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_rfis_insert;
+CREATE TRIGGER trg_kpi_rfis_insert AFTER INSERT ON rfis BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('pm', '*');
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_rfis_update;
+CREATE TRIGGER trg_kpi_rfis_update AFTER UPDATE OF status ON rfis BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('pm', '*');
+END;
+
+DROP TRIGGER IF EXISTS trg_kpi_rfis_delete;
+CREATE TRIGGER trg_kpi_rfis_delete AFTER DELETE ON rfis BEGIN
+    INSERT OR IGNORE INTO kpi_dirty (scope, key) VALUES ('pm', '*');
+END;
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (110, '110_kpi_snapshots', datetime('now'));
@@ -0,0 +1,34 @@
+-- Migration 111: Log of AI-generated SQL stopped by the query governor
+-- Created: 2026-01-11
+--
+-- PROBLEM:
+-- /api/query/ask and /api/query/chat run LLM-generated SQL. It was only
+-- keyword-checked, then run on a read/write connection with no row cap and
+-- no time budget, so one bad cross join could pin a CPU and hold the
+-- database for minutes.
+--
+-- FIX:
+-- QueryGovernor (backend/services/query_governor.py) runs that SQL on a
+-- read-only connection with an instruction/time budget and a row/byte cap,
+-- after an EXPLAIN QUERY PLAN check. Every query it rejects, cancels or
+-- truncates is recorded here so the budgets can be tuned.
+
+CREATE TABLE IF NOT EXISTS query_governor_log (
+    log_id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    outcome        TEXT NOT NULL,                   -- rejected, cancelled, truncated
+    reason         TEXT,
+    sql_text       TEXT NOT NULL,
+    plan           TEXT,                            -- EXPLAIN QUERY PLAN details, one per line
+    vm_steps       INTEGER,
+    elapsed_ms     REAL,
+    rows_returned  INTEGER,
+    created_at     TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_governor_log_created
+    ON query_governor_log(created_at);
+CREATE INDEX IF NOT EXISTS idx_query_governor_log_outcome
+    ON query_governor_log(outcome, created_at);
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (111, '111_query_governor_log', datetime('now'));
@@ -0,0 +1,213 @@
+-- Migration 112: Natural-language query cache and per-table data versions
+-- Created: 2026-01-12
+--
+-- PROBLEM:
+-- Every /api/query/ask call sends the question to the LLM for SQL, even when
+-- the same question ("what's outstanding on 24 BK-089") was asked ten times
+-- that day, and then re-runs the SQL and re-summarizes identical results.
+--
+-- FIX:
+-- query_sql_cache persists normalized question -> generated SQL (the
+-- in-process LRU in front of it lives in QueryCache). SQL results are cached
+-- in memory keyed by the SQL text plus a stamp built from data_versions:
+-- one counter per table, bumped by triggers on every insert/update/delete,
+-- so a cached answer is dropped as soon as a table it read changes. Tables
+-- without triggers here are never result-cached.
+
+CREATE TABLE IF NOT EXISTS query_sql_cache (
+    cache_key            TEXT PRIMARY KEY,          -- sha256(variant, normalized question)
+    normalized_question  TEXT NOT NULL,
+    variant              TEXT NOT NULL,             -- ai, patterns:<hint hash>
+    sql_text             TEXT NOT NULL,
+    reasoning            TEXT,
+    confidence           REAL,
+    tables_used          TEXT,                      -- JSON
+    patterns_used        TEXT,                      -- JSON
+    generation_ms        REAL NOT NULL DEFAULT 0,   -- LLM latency a hit saves
+    generation_cost_usd  REAL NOT NULL DEFAULT 0,   -- LLM cost a hit saves
+    schema_version       INTEGER NOT NULL,          -- PRAGMA schema_version at generation
+    hit_count            INTEGER NOT NULL DEFAULT 0,
+    created_at           TEXT NOT NULL DEFAULT (datetime('now')),
+    last_hit_at          TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_sql_cache_question
+    ON query_sql_cache(normalized_question);
+CREATE INDEX IF NOT EXISTS idx_query_sql_cache_last_used
+    ON query_sql_cache(COALESCE(last_hit_at, created_at));
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    table_name  TEXT PRIMARY KEY,
+    version     INTEGER NOT NULL DEFAULT 0,
+    changed_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+
+INSERT OR IGNORE INTO data_versions (table_name) VALUES
+    ('projects'),
+    ('proposals'),
+    ('invoices'),
+    ('project_fee_breakdown'),
+    ('project_milestones'),
+    ('rfis'),
+    ('meetings'),
+    ('contacts'),
+    ('emails'),
+    ('email_proposal_links'),
+    ('email_project_links');
+
+-- projects
+DROP TRIGGER IF EXISTS trg_dv_projects_insert;
+CREATE TRIGGER trg_dv_projects_insert AFTER INSERT ON projects BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'projects';
+END;
+DROP TRIGGER IF EXISTS trg_dv_projects_update;
+CREATE TRIGGER trg_dv_projects_update AFTER UPDATE ON projects BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'projects';
+END;
+DROP TRIGGER IF EXISTS trg_dv_projects_delete;
+CREATE TRIGGER trg_dv_projects_delete AFTER DELETE ON projects BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'projects';
+END;
+
+-- proposals
+DROP TRIGGER IF EXISTS trg_dv_proposals_insert;
+CREATE TRIGGER trg_dv_proposals_insert AFTER INSERT ON proposals BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'proposals';
+END;
+DROP TRIGGER IF EXISTS trg_dv_proposals_update;
+CREATE TRIGGER trg_dv_proposals_update AFTER UPDATE ON proposals BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'proposals';
+END;
+DROP TRIGGER IF EXISTS trg_dv_proposals_delete;
+CREATE TRIGGER trg_dv_proposals_delete AFTER DELETE ON proposals BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'proposals';
+END;
+
+-- invoices
+DROP TRIGGER IF EXISTS trg_dv_invoices_insert;
+CREATE TRIGGER trg_dv_invoices_insert AFTER INSERT ON invoices BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'invoices';
+END;
+DROP TRIGGER IF EXISTS trg_dv_invoices_update;
+CREATE TRIGGER trg_dv_invoices_update AFTER UPDATE ON invoices BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'invoices';
+END;
+DROP TRIGGER IF EXISTS trg_dv_invoices_delete;
+CREATE TRIGGER trg_dv_invoices_delete AFTER DELETE ON invoices BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'invoices';
+END;
+
+-- project_fee_breakdown
+DROP TRIGGER IF EXISTS trg_dv_project_fee_breakdown_insert;
+CREATE TRIGGER trg_dv_project_fee_breakdown_insert AFTER INSERT ON project_fee_breakdown BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'project_fee_breakdown';
+END;
+DROP TRIGGER IF EXISTS trg_dv_project_fee_breakdown_update;
+CREATE TRIGGER trg_dv_project_fee_breakdown_update AFTER UPDATE ON project_fee_breakdown BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'project_fee_breakdown';
+END;
+DROP TRIGGER IF EXISTS trg_dv_project_fee_breakdown_delete;
+CREATE TRIGGER trg_dv_project_fee_breakdown_delete AFTER DELETE ON project_fee_breakdown BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'project_fee_breakdown';
+END;
+
+-- project_milestones
+DROP TRIGGER IF EXISTS trg_dv_project_milestones_insert;
+CREATE TRIGGER trg_dv_project_milestones_insert AFTER INSERT ON project_milestones BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'project_milestones';
+END;
+DROP TRIGGER IF EXISTS trg_dv_project_milestones_update;
+CREATE TRIGGER trg_dv_project_milestones_update AFTER UPDATE ON project_milestones BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'project_milestones';
+END;
+DROP TRIGGER IF EXISTS trg_dv_project_milestones_delete;
+CREATE TRIGGER trg_dv_project_milestones_delete AFTER DELETE ON project_milestones BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'project_milestones';
+END;
+
+-- rfis
+DROP TRIGGER IF EXISTS trg_dv_rfis_insert;
+CREATE TRIGGER trg_dv_rfis_insert AFTER INSERT ON rfis BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'rfis';
+END;
+DROP TRIGGER IF EXISTS trg_dv_rfis_update;
+CREATE TRIGGER trg_dv_rfis_update AFTER UPDATE ON rfis BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'rfis';
+END;
+DROP TRIGGER IF EXISTS trg_dv_rfis_delete;
+CREATE TRIGGER trg_dv_rfis_delete AFTER DELETE ON rfis BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'rfis';
+END;
+
+-- meetings
+DROP TRIGGER IF EXISTS trg_dv_meetings_insert;
+CREATE TRIGGER trg_dv_meetings_insert AFTER INSERT ON meetings BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'meetings';
+END;
+DROP TRIGGER IF EXISTS trg_dv_meetings_update;
+CREATE TRIGGER trg_dv_meetings_update AFTER UPDATE ON meetings BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'meetings';
+END;
+DROP TRIGGER IF EXISTS trg_dv_meetings_delete;
+CREATE TRIGGER trg_dv_meetings_delete AFTER DELETE ON meetings BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'meetings';
+END;
+
+-- contacts
+DROP TRIGGER IF EXISTS trg_dv_contacts_insert;
+CREATE TRIGGER trg_dv_contacts_insert AFTER INSERT ON contacts BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'contacts';
+END;
+DROP TRIGGER IF EXISTS trg_dv_contacts_update;
+CREATE TRIGGER trg_dv_contacts_update AFTER UPDATE ON contacts BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'contacts';
+END;
+DROP TRIGGER IF EXISTS trg_dv_contacts_delete;
+CREATE TRIGGER trg_dv_contacts_delete AFTER DELETE ON contacts BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'contacts';
+END;
+
+-- emails
+DROP TRIGGER IF EXISTS trg_dv_emails_insert;
+CREATE TRIGGER trg_dv_emails_insert AFTER INSERT ON emails BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'emails';
+END;
+DROP TRIGGER IF EXISTS trg_dv_emails_update;
+CREATE TRIGGER trg_dv_emails_update AFTER UPDATE ON emails BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'emails';
+END;
+DROP TRIGGER IF EXISTS trg_dv_emails_delete;
+CREATE TRIGGER trg_dv_emails_delete AFTER DELETE ON emails BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'emails';
+END;
+
+-- email_proposal_links
+DROP TRIGGER IF EXISTS trg_dv_email_proposal_links_insert;
+CREATE TRIGGER trg_dv_email_proposal_links_insert AFTER INSERT ON email_proposal_links BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_proposal_links';
+END;
+DROP TRIGGER IF EXISTS trg_dv_email_proposal_links_update;
+CREATE TRIGGER trg_dv_email_proposal_links_update AFTER UPDATE ON email_proposal_links BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_proposal_links';
+END;
+DROP TRIGGER IF EXISTS trg_dv_email_proposal_links_delete;
+CREATE TRIGGER trg_dv_email_proposal_links_delete AFTER DELETE ON email_proposal_links BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_proposal_links';
+END;
+
+-- email_project_links
+DROP TRIGGER IF EXISTS trg_dv_email_project_links_insert;
+CREATE TRIGGER trg_dv_email_project_links_insert AFTER INSERT ON email_project_links BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_project_links';
+END;
+DROP TRIGGER IF EXISTS trg_dv_email_project_links_update;
+CREATE TRIGGER trg_dv_email_project_links_update AFTER UPDATE ON email_project_links BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_project_links';
+END;
+DROP TRIGGER IF EXISTS trg_dv_email_project_links_delete;
+CREATE TRIGGER trg_dv_email_project_links_delete AFTER DELETE ON email_project_links BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_project_links';
+END;
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (112, '112_query_cache_data_versions', datetime('now'));
@@ -0,0 +1,24 @@
+-- Migration 113: Prompt-size accounting for context-aware email analysis
+-- Created: 2026-01-13
+--
+-- PROBLEM:
+-- GPTSuggestionAnalyzer used to send every active proposal with every email.
+-- It now sends only the proposals an email plausibly matches, and the rest of
+-- the system prompt is stable per context-bundle version, which lets the
+-- provider's prompt-prefix cache serve it. gpt_usage_log could not show what
+-- either change saves.
+--
+-- FIX:
+-- Each usage row now also records:
+-- - cached_input_tokens: input tokens served from the provider's prompt cache
+-- - baseline_input_tokens / baseline_cost_usd: the estimated size and cost
+--   of the same request with the full proposal list
+-- - context_version: the bundle version the prompt was built from
+
+ALTER TABLE gpt_usage_log ADD COLUMN cached_input_tokens INTEGER;
+ALTER TABLE gpt_usage_log ADD COLUMN baseline_input_tokens INTEGER;
+ALTER TABLE gpt_usage_log ADD COLUMN baseline_cost_usd REAL;
+ALTER TABLE gpt_usage_log ADD COLUMN context_version TEXT;
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (113, '113_gpt_usage_prompt_savings', datetime('now'));
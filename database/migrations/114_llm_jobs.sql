@@ -0,0 +1,42 @@
+-- Migration 114: Durable LLM job table for the dispatch queue
+-- Created: 2026-01-14
+--
+-- PROBLEM:
+-- GPTSuggestionAnalyzer.analyze_batch fanned out to a thread pool with a
+-- fixed 10 workers. It had no token-per-minute accounting and no retry on
+-- 429s, and nothing was persisted. A crash or a burst of rate limits lost
+-- the whole batch, including responses that had already been paid for.
+--
+-- FIX:
+-- LLMDispatcher (backend/services/llm_dispatcher.py) records each request
+-- here before sending it and stores the response as soon as it arrives.
+-- A job moves pending -> running -> done -> applied, or to failed after
+-- its retries run out. applied means the caller has written the results.
+-- After a restart:
+-- - pending and running jobs are sent again
+-- - done jobs return their stored response, so they are not paid for twice
+-- request_hash tells a resubmitted, identical request from a changed one.
+
+CREATE TABLE IF NOT EXISTS llm_jobs (
+    job_id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind          TEXT NOT NULL,              -- suggestion_analysis, transcript_summary
+    ref_id        TEXT NOT NULL,              -- email_id, transcript_id (or request hash)
+    request_hash  TEXT NOT NULL,              -- sha256 of the request JSON
+    request       TEXT NOT NULL,              -- chat.completions kwargs (JSON)
+    status        TEXT NOT NULL DEFAULT 'pending'
+                  CHECK (status IN ('pending', 'running', 'done', 'applied', 'failed')),
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    response      TEXT,                       -- {"content", "usage", "model"} (JSON)
+    error         TEXT,
+    input_tokens  INTEGER,
+    output_tokens INTEGER,
+    created_at    TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at    TEXT NOT NULL DEFAULT (datetime('now')),
+    completed_at  TEXT,
+    UNIQUE (kind, ref_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_jobs_kind_status ON llm_jobs(kind, status);
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (114, '114_llm_jobs', datetime('now'));
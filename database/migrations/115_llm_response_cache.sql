@@ -0,0 +1,50 @@
+-- Migration 115: Persistent LLM response cache
+-- Created: 2026-01-15
+--
+-- PROBLEM:
+-- Suggestion generation is re-run often, from
+-- /api/suggestions/context-aware/generate and
+-- AILearningService.process_recent_emails_for_suggestions. An unchanged email
+-- is then re-analyzed with the identical prompt at temperature 0.1, and we
+-- pay for the same answer every time.
+--
+-- FIX:
+-- llm_response_cache stores each successful chat completion under
+-- sha256(model, system prompt hash, user message hash, parameters).
+-- LLMDispatcher checks it before sending a request.
+-- - Entries expire after their TTL (LLM_CACHE_TTL_SECONDS by default).
+-- - The least recently used entries are evicted once the table passes
+--   LLM_CACHE_MAX_ENTRIES rows or LLM_CACHE_MAX_MB of stored responses.
+-- - A call site can opt out per call.
+-- gpt_usage_log now records, per request:
+-- - response_cache: 'hit', 'miss' or 'bypass'
+-- - response_cache_saved_usd: what a hit would have cost
+-- On a hit, estimated_cost_usd is 0 and the token counts are those of the
+-- cached response.
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key       TEXT PRIMARY KEY,           -- sha256 of the four parts below
+    model           TEXT NOT NULL,
+    system_hash     TEXT NOT NULL,              -- sha256 of the system message(s)
+    user_hash       TEXT NOT NULL,              -- sha256 of the remaining messages
+    params_hash     TEXT NOT NULL,              -- sha256 of temperature, max_tokens, response_format, ...
+    response        TEXT NOT NULL,              -- {"content", "usage", "model"} (JSON)
+    size_bytes      INTEGER NOT NULL,
+    input_tokens    INTEGER,
+    output_tokens   INTEGER,
+    hit_count       INTEGER NOT NULL DEFAULT 0,
+    created_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    last_hit_at     TEXT,
+    expires_at      TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_expires
+    ON llm_response_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_used
+    ON llm_response_cache(COALESCE(last_hit_at, created_at));
+
+ALTER TABLE gpt_usage_log ADD COLUMN response_cache TEXT;
+ALTER TABLE gpt_usage_log ADD COLUMN response_cache_saved_usd REAL;
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (115, '115_llm_response_cache', datetime('now'));
@@ -0,0 +1,45 @@
+-- Migration 116: Provider batch jobs for bulk LLM backfills
+-- Created: 2026-01-16
+--
+-- PROBLEM:
+-- Backfilling a year of emails through GPTSuggestionAnalyzer.analyze_batch
+-- makes thousands of chat-completion calls, each at full price and full
+-- latency. The provider's batch API takes the same requests as a JSONL file
+-- at half the price, in exchange for completion within 24 hours.
+--
+-- FIX:
+-- LLMBatchService (backend/services/llm_batch_service.py) packs llm_jobs
+-- rows into batch input files. It submits each file and records the batch
+-- here. Each job row carries its batch_id, and the job_id is the line's
+-- custom_id.
+-- Polling moves the batch through the provider's statuses. Once the
+-- batch is finished (completed, expired, cancelled or failed), its output
+-- and error files are read back into llm_jobs. Each job becomes done or
+-- failed, and ingested_at is set.
+-- After a restart, open batches are polled again. Done jobs that are not
+-- yet applied are written to SuggestionWriter, so no line is lost or
+-- written twice.
+
+CREATE TABLE IF NOT EXISTS llm_batches (
+    batch_id        TEXT PRIMARY KEY,           -- provider batch id
+    kind            TEXT NOT NULL,              -- llm_jobs.kind of its lines
+    status          TEXT NOT NULL,              -- provider status (validating, in_progress, completed, ...)
+    input_file_id   TEXT NOT NULL,
+    output_file_id  TEXT,
+    error_file_id   TEXT,
+    request_count   INTEGER NOT NULL DEFAULT 0,
+    completed_count INTEGER NOT NULL DEFAULT 0,
+    failed_count    INTEGER NOT NULL DEFAULT 0,
+    created_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at      TEXT NOT NULL DEFAULT (datetime('now')),
+    ingested_at     TEXT                        -- results read back into llm_jobs
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_batches_open
+    ON llm_batches(kind, ingested_at);
+
+ALTER TABLE llm_jobs ADD COLUMN batch_id TEXT;
+CREATE INDEX IF NOT EXISTS idx_llm_jobs_batch ON llm_jobs(batch_id);
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (116, '116_llm_batches', datetime('now'));
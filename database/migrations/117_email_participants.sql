@@ -0,0 +1,76 @@
+-- Migration 117: Normalized sender/recipient addresses and participant index
+-- Created: 2026-01-17
+--
+-- PROBLEM:
+-- emails.sender_email and recipient_emails hold raw header strings, such as
+-- "Name <x@y.com>" or a comma-separated To: line.
+-- Per-contact lookups match them with LOWER(sender_email) LIKE '%x@y%' or
+-- LOWER(sender_email) = LOWER(?). Examples are signature enrichment, the
+-- contact detail/preview endpoints and the unified timeline person filter.
+-- Neither form can use idx_emails_sender, so every lookup scans emails.
+-- The equality form also misses "Name <x@y.com>" senders.
+-- The pattern linker re-parses the sender with a regex on every email.
+--
+-- FIX:
+-- 1. emails.sender_address / sender_domain hold the lower-cased bare address
+--    and its domain.
+-- 2. email_participants(email_id, address, domain, role) has one row per
+--    address. role is 'from' (sender) or 'to' (recipient_emails).
+-- 3. Indexes serve address/domain seeks, with date order for "latest emails
+--    from X".
+-- 4. Senders in the two common header forms are backfilled here.
+--
+-- Importers index new rows with backend/services/email_participants.py.
+-- Backfill recipients and unusual sender headers with:
+--     python3 scripts/maintenance/backfill_email_participants.py
+
+ALTER TABLE emails ADD COLUMN sender_address TEXT;
+ALTER TABLE emails ADD COLUMN sender_domain TEXT;
+
+CREATE TABLE IF NOT EXISTS email_participants (
+    email_id    INTEGER NOT NULL REFERENCES emails(email_id) ON DELETE CASCADE,
+    address     TEXT NOT NULL,              -- lower-cased bare address
+    domain      TEXT NOT NULL,              -- part after '@'
+    role        TEXT NOT NULL CHECK (role IN ('from', 'to')),
+    PRIMARY KEY (email_id, address, role)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_email_participants_address
+    ON email_participants(address, role, email_id);
+CREATE INDEX IF NOT EXISTS idx_email_participants_domain
+    ON email_participants(domain, role);
+
+CREATE INDEX IF NOT EXISTS idx_emails_sender_address
+    ON emails(sender_address, date);
+CREATE INDEX IF NOT EXISTS idx_emails_sender_domain
+    ON emails(sender_domain);
+
+-- Sender backfill: "Name <x@y.com>" and bare "x@y.com". Anything else
+-- (several bare addresses, odd quoting) is left to the backfill script.
+UPDATE emails
+SET sender_address = LOWER(TRIM(
+    CASE
+        WHEN INSTR(sender_email, '<') > 0 AND INSTR(sender_email, '>') > INSTR(sender_email, '<')
+        THEN SUBSTR(sender_email, INSTR(sender_email, '<') + 1,
+                    INSTR(sender_email, '>') - INSTR(sender_email, '<') - 1)
+        ELSE sender_email
+    END
+))
+WHERE sender_email IS NOT NULL AND sender_address IS NULL;
+
+UPDATE emails
+SET sender_address = NULL
+WHERE sender_address IS NOT NULL
+  AND (sender_address NOT LIKE '_%@_%' OR INSTR(sender_address, ' ') > 0);
+
+UPDATE emails
+SET sender_domain = SUBSTR(sender_address, INSTR(sender_address, '@') + 1)
+WHERE sender_address IS NOT NULL;
+
+INSERT OR IGNORE INTO email_participants (email_id, address, domain, role)
+SELECT email_id, sender_address, sender_domain, 'from'
+FROM emails
+WHERE sender_address IS NOT NULL;
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (117, '117_email_participants', datetime('now'));
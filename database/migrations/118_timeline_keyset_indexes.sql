@@ -0,0 +1,51 @@
+-- Migration 118: Date-ordered indexes for the unified project timeline
+-- Created: 2026-01-18
+--
+-- PROBLEM:
+-- /projects/{code}/unified-timeline runs a query per item type (emails,
+-- transcripts, invoices, RFIs). Each query sorts the project's whole
+-- history. Python then merges and sorts the results and truncates them to
+-- `limit`. The email query joins email_project_links to emails to get the
+-- date, so SQLite sorts every linked email of the project in a temp B-tree
+-- even when the page is 100 rows.
+--
+-- FIX:
+-- TimelineService (backend/services/timeline_service.py) runs one keyset
+-- query per source, ordered by (date, id), and k-way merges them. Each
+-- source therefore needs an index that yields rows in date order.
+-- 1. email_project_links.email_date is a copy of emails.date, with NULL
+--    stored as ''. Triggers keep it in sync. It is indexed with
+--    (project_id, email_date, email_id), so a page of a project's emails
+--    is an index range scan.
+-- 2. invoices(project_id, invoice_date) and rfis(project_id, created_at).
+
+ALTER TABLE email_project_links ADD COLUMN email_date TEXT;
+
+UPDATE email_project_links
+SET email_date = COALESCE((SELECT e.date FROM emails e WHERE e.email_id = email_project_links.email_id), '');
+
+CREATE INDEX IF NOT EXISTS idx_epl_project_email_date
+    ON email_project_links(project_id, email_date, email_id);
+
+DROP TRIGGER IF EXISTS trg_epl_email_date_insert;
+CREATE TRIGGER trg_epl_email_date_insert AFTER INSERT ON email_project_links BEGIN
+    UPDATE email_project_links
+    SET email_date = COALESCE((SELECT date FROM emails WHERE email_id = NEW.email_id), '')
+    WHERE email_id = NEW.email_id AND project_id = NEW.project_id;
+END;
+
+DROP TRIGGER IF EXISTS trg_epl_email_date_update;
+CREATE TRIGGER trg_epl_email_date_update AFTER UPDATE OF date ON emails BEGIN
+    UPDATE email_project_links
+    SET email_date = COALESCE(NEW.date, '')
+    WHERE email_id = NEW.email_id;
+END;
+
+CREATE INDEX IF NOT EXISTS idx_invoices_project_date
+    ON invoices(project_id, invoice_date);
+
+CREATE INDEX IF NOT EXISTS idx_rfis_project_created
+    ON rfis(project_id, created_at);
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (118, '118_timeline_keyset_indexes', datetime('now'));
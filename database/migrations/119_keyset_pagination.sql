@@ -0,0 +1,71 @@
+-- Migration 119: Keyset pagination support for list endpoints
+-- Created: 2026-01-19
+--
+-- PROBLEM:
+-- The emails, suggestions, documents and proposals lists paginate with
+-- LIMIT/OFFSET and run COUNT(*) over the full filtered query for every
+-- page. Deep pages walk and discard every earlier row, so each page costs
+-- two passes over the list.
+--
+-- FIX:
+-- The lists now page with keyset cursors (backend/services/pagination.py).
+-- The total is counted once and reused while the data_versions stamp of
+-- the listed tables is unchanged.
+-- 1. data_versions counters for ai_suggestions, documents and email_content.
+--    Without them, a cached total could only be trusted for a short TTL.
+-- 2. ai_suggestions(status, confidence_score) serves the suggestion queue
+--    order (confidence_score DESC, suggestion_id DESC) for a status filter.
+--    emails(date) and documents(modified_date) already serve theirs.
+
+INSERT OR IGNORE INTO data_versions (table_name) VALUES
+    ('ai_suggestions'),
+    ('documents'),
+    ('email_content');
+
+-- ai_suggestions
+DROP TRIGGER IF EXISTS trg_dv_ai_suggestions_insert;
+CREATE TRIGGER trg_dv_ai_suggestions_insert AFTER INSERT ON ai_suggestions BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'ai_suggestions';
+END;
+DROP TRIGGER IF EXISTS trg_dv_ai_suggestions_update;
+CREATE TRIGGER trg_dv_ai_suggestions_update AFTER UPDATE ON ai_suggestions BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'ai_suggestions';
+END;
+DROP TRIGGER IF EXISTS trg_dv_ai_suggestions_delete;
+CREATE TRIGGER trg_dv_ai_suggestions_delete AFTER DELETE ON ai_suggestions BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'ai_suggestions';
+END;
+
+-- documents
+DROP TRIGGER IF EXISTS trg_dv_documents_insert;
+CREATE TRIGGER trg_dv_documents_insert AFTER INSERT ON documents BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'documents';
+END;
+DROP TRIGGER IF EXISTS trg_dv_documents_update;
+CREATE TRIGGER trg_dv_documents_update AFTER UPDATE ON documents BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'documents';
+END;
+DROP TRIGGER IF EXISTS trg_dv_documents_delete;
+CREATE TRIGGER trg_dv_documents_delete AFTER DELETE ON documents BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'documents';
+END;
+
+-- email_content
+DROP TRIGGER IF EXISTS trg_dv_email_content_insert;
+CREATE TRIGGER trg_dv_email_content_insert AFTER INSERT ON email_content BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_content';
+END;
+DROP TRIGGER IF EXISTS trg_dv_email_content_update;
+CREATE TRIGGER trg_dv_email_content_update AFTER UPDATE ON email_content BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_content';
+END;
+DROP TRIGGER IF EXISTS trg_dv_email_content_delete;
+CREATE TRIGGER trg_dv_email_content_delete AFTER DELETE ON email_content BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'email_content';
+END;
+
+CREATE INDEX IF NOT EXISTS idx_ai_suggestions_status_confidence
+    ON ai_suggestions(status, confidence_score);
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (119, '119_keyset_pagination', datetime('now'));
@@ -0,0 +1,126 @@
+-- Migration 120: Data-version ETags for polled read endpoints
+-- Created: 2026-01-20
+--
+-- PROBLEM:
+-- The dashboard polls /api/dashboard/*, /api/my-day, /api/suggestions and
+-- /api/proposals every few seconds. Every poll re-runs every query and
+-- re-serializes the same JSON, although the data rarely changed in between.
+--
+-- FIX:
+-- These endpoints now answer with an ETag built from the data_versions stamp
+-- of the tables they read (backend/api/http_cache.py). If the stamp has not
+-- moved, the client gets 304 Not Modified, or the cached serialized body,
+-- without the endpoint running. A table without a counter makes its routes
+-- uncacheable, so this adds counters for the tables those endpoints read
+-- that migrations 112/119 do not track. The KPI snapshot tables are included
+-- because the dashboard serves them and they are refreshed lazily.
+
+INSERT OR IGNORE INTO data_versions (table_name) VALUES
+    ('tasks'),
+    ('commitments'),
+    ('deliverables'),
+    ('training_data'),
+    ('change_log'),
+    ('kpi_project_snapshot'),
+    ('kpi_global_snapshot');
+
+-- tasks
+DROP TRIGGER IF EXISTS trg_dv_tasks_insert;
+CREATE TRIGGER trg_dv_tasks_insert AFTER INSERT ON tasks BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'tasks';
+END;
+DROP TRIGGER IF EXISTS trg_dv_tasks_update;
+CREATE TRIGGER trg_dv_tasks_update AFTER UPDATE ON tasks BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'tasks';
+END;
+DROP TRIGGER IF EXISTS trg_dv_tasks_delete;
+CREATE TRIGGER trg_dv_tasks_delete AFTER DELETE ON tasks BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'tasks';
+END;
+
+-- commitments
+DROP TRIGGER IF EXISTS trg_dv_commitments_insert;
+CREATE TRIGGER trg_dv_commitments_insert AFTER INSERT ON commitments BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'commitments';
+END;
+DROP TRIGGER IF EXISTS trg_dv_commitments_update;
+CREATE TRIGGER trg_dv_commitments_update AFTER UPDATE ON commitments BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'commitments';
+END;
+DROP TRIGGER IF EXISTS trg_dv_commitments_delete;
+CREATE TRIGGER trg_dv_commitments_delete AFTER DELETE ON commitments BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'commitments';
+END;
+
+-- deliverables
+DROP TRIGGER IF EXISTS trg_dv_deliverables_insert;
+CREATE TRIGGER trg_dv_deliverables_insert AFTER INSERT ON deliverables BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'deliverables';
+END;
+DROP TRIGGER IF EXISTS trg_dv_deliverables_update;
+CREATE TRIGGER trg_dv_deliverables_update AFTER UPDATE ON deliverables BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'deliverables';
+END;
+DROP TRIGGER IF EXISTS trg_dv_deliverables_delete;
+CREATE TRIGGER trg_dv_deliverables_delete AFTER DELETE ON deliverables BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'deliverables';
+END;
+
+-- training_data
+DROP TRIGGER IF EXISTS trg_dv_training_data_insert;
+CREATE TRIGGER trg_dv_training_data_insert AFTER INSERT ON training_data BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'training_data';
+END;
+DROP TRIGGER IF EXISTS trg_dv_training_data_update;
+CREATE TRIGGER trg_dv_training_data_update AFTER UPDATE ON training_data BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'training_data';
+END;
+DROP TRIGGER IF EXISTS trg_dv_training_data_delete;
+CREATE TRIGGER trg_dv_training_data_delete AFTER DELETE ON training_data BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'training_data';
+END;
+
+-- change_log
+DROP TRIGGER IF EXISTS trg_dv_change_log_insert;
+CREATE TRIGGER trg_dv_change_log_insert AFTER INSERT ON change_log BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'change_log';
+END;
+DROP TRIGGER IF EXISTS trg_dv_change_log_update;
+CREATE TRIGGER trg_dv_change_log_update AFTER UPDATE ON change_log BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'change_log';
+END;
+DROP TRIGGER IF EXISTS trg_dv_change_log_delete;
+CREATE TRIGGER trg_dv_change_log_delete AFTER DELETE ON change_log BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'change_log';
+END;
+
+-- kpi_project_snapshot
+DROP TRIGGER IF EXISTS trg_dv_kpi_project_snapshot_insert;
+CREATE TRIGGER trg_dv_kpi_project_snapshot_insert AFTER INSERT ON kpi_project_snapshot BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'kpi_project_snapshot';
+END;
+DROP TRIGGER IF EXISTS trg_dv_kpi_project_snapshot_update;
+CREATE TRIGGER trg_dv_kpi_project_snapshot_update AFTER UPDATE ON kpi_project_snapshot BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'kpi_project_snapshot';
+END;
+DROP TRIGGER IF EXISTS trg_dv_kpi_project_snapshot_delete;
+CREATE TRIGGER trg_dv_kpi_project_snapshot_delete AFTER DELETE ON kpi_project_snapshot BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'kpi_project_snapshot';
+END;
+
+-- kpi_global_snapshot
+DROP TRIGGER IF EXISTS trg_dv_kpi_global_snapshot_insert;
+CREATE TRIGGER trg_dv_kpi_global_snapshot_insert AFTER INSERT ON kpi_global_snapshot BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'kpi_global_snapshot';
+END;
+DROP TRIGGER IF EXISTS trg_dv_kpi_global_snapshot_update;
+CREATE TRIGGER trg_dv_kpi_global_snapshot_update AFTER UPDATE ON kpi_global_snapshot BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'kpi_global_snapshot';
+END;
+DROP TRIGGER IF EXISTS trg_dv_kpi_global_snapshot_delete;
+CREATE TRIGGER trg_dv_kpi_global_snapshot_delete AFTER DELETE ON kpi_global_snapshot BEGIN
+    UPDATE data_versions SET version = version + 1, changed_at = datetime('now') WHERE table_name = 'kpi_global_snapshot';
+END;
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (120, '120_http_etag_data_versions', datetime('now'));
@@ -0,0 +1,66 @@
+-- Migration 121: Phonetic + trigram contact name index
+-- Created: 2026-01-21
+--
+-- PROBLEM:
+-- Transcript participant matching compared every spoken name against every
+-- contact with hand-written rules, and only showed GPT the first 100
+-- contacts, so anyone past contact #100 could not be matched. Signature
+-- parsing and contact dedup had no way to find contacts by name at all.
+--
+-- FIX:
+-- A persistent name index (backend/services/contact_name_index.py):
+-- 1. contact_name_keys holds postings: key -> contact_id. Keys are the
+--    phonetic codes ('p:KR') and character trigrams ('t:kar') of each name token.
+-- 2. contact_name_entries holds each indexed name's tokens and phonetic
+--    codes, so loading the index computes nothing.
+-- 3. Triggers queue contacts whose name (or the email, role or company
+--    returned with matches) changes in contact_name_index_queue. The
+--    service re-indexes just those. version lets it drop only the queue
+--    rows it has indexed.
+-- Every existing contact is queued here and indexed on first lookup.
+-- To re-index from scratch:
+--     python3 scripts/maintenance/find_duplicate_contacts.py --rebuild
+
+CREATE TABLE IF NOT EXISTS contact_name_keys (
+    key TEXT NOT NULL,
+    contact_id INTEGER NOT NULL,
+    PRIMARY KEY (key, contact_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_contact_name_keys_contact
+    ON contact_name_keys(contact_id);
+
+CREATE TABLE IF NOT EXISTS contact_name_entries (
+    contact_id INTEGER PRIMARY KEY,
+    tokens TEXT NOT NULL,
+    indexed_at TEXT DEFAULT (datetime('now'))
+);
+
+CREATE TABLE IF NOT EXISTS contact_name_index_queue (
+    contact_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 1
+);
+
+DROP TRIGGER IF EXISTS trg_contact_name_index_insert;
+CREATE TRIGGER trg_contact_name_index_insert AFTER INSERT ON contacts BEGIN
+    INSERT INTO contact_name_index_queue (contact_id) VALUES (NEW.contact_id)
+    ON CONFLICT(contact_id) DO UPDATE SET version = version + 1;
+END;
+
+DROP TRIGGER IF EXISTS trg_contact_name_index_update;
+CREATE TRIGGER trg_contact_name_index_update AFTER UPDATE OF name, email, role, company ON contacts BEGIN
+    INSERT INTO contact_name_index_queue (contact_id) VALUES (NEW.contact_id)
+    ON CONFLICT(contact_id) DO UPDATE SET version = version + 1;
+END;
+
+DROP TRIGGER IF EXISTS trg_contact_name_index_delete;
+CREATE TRIGGER trg_contact_name_index_delete AFTER DELETE ON contacts BEGIN
+    INSERT INTO contact_name_index_queue (contact_id) VALUES (OLD.contact_id)
+    ON CONFLICT(contact_id) DO UPDATE SET version = version + 1;
+END;
+
+INSERT OR IGNORE INTO contact_name_index_queue (contact_id)
+SELECT contact_id FROM contacts WHERE name IS NOT NULL AND name != '';
+
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (121, '121_contact_name_index', datetime('now'));
@@ -0,0 +1,63 @@
+-- Migration 122: Index client_name in projects_fts
+-- Created: 2026-01-22
+--
+-- PROBLEM:
+-- projects_fts (migration 105) indexes only project_code and project_title.
+-- BensleyBrain.search moved from LIKE scans to the FTS index, and the old
+-- scan also matched client_name - searching a client no longer found
+-- their projects.
+--
+-- FIX:
+-- 1. Recreate projects_fts with client_name as a third column
+-- 2. Recreate its triggers to keep client_name in sync
+-- 3. Rebuild the index from existing rows
+
+-- ============================================
+-- STEP 1: Recreate projects_fts with client_name
+-- ============================================
+
+DROP TRIGGER IF EXISTS trg_projects_fts_insert;
+DROP TRIGGER IF EXISTS trg_projects_fts_delete;
+DROP TRIGGER IF EXISTS trg_projects_fts_update;
+DROP TABLE IF EXISTS projects_fts;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5(
+    project_code,
+    project_title,
+    client_name,
+    content='projects',
+    content_rowid='project_id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+-- ============================================
+-- STEP 2: Sync triggers
+-- ============================================
+
+CREATE TRIGGER trg_projects_fts_insert AFTER INSERT ON projects BEGIN
+    INSERT INTO projects_fts(rowid, project_code, project_title, client_name)
+    VALUES (new.project_id, new.project_code, new.project_title, new.client_name);
+END;
+
+CREATE TRIGGER trg_projects_fts_delete AFTER DELETE ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, project_code, project_title, client_name)
+    VALUES ('delete', old.project_id, old.project_code, old.project_title, old.client_name);
+END;
+
+CREATE TRIGGER trg_projects_fts_update AFTER UPDATE OF project_code, project_title, client_name ON projects BEGIN
+    INSERT INTO projects_fts(projects_fts, rowid, project_code, project_title, client_name)
+    VALUES ('delete', old.project_id, old.project_code, old.project_title, old.client_name);
+    INSERT INTO projects_fts(rowid, project_code, project_title, client_name)
+    VALUES (new.project_id, new.project_code, new.project_title, new.client_name);
+END;
+
+-- ============================================
+-- STEP 3: Populate from existing rows
+-- ============================================
+
+INSERT INTO projects_fts(projects_fts) VALUES ('rebuild');
+
+-- Record migration
+INSERT OR IGNORE INTO schema_migrations (version, name, applied_at)
+VALUES (122, '122_projects_fts_client_name', datetime('now'));
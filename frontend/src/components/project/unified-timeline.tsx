@@ -56,6 +56,8 @@ interface TimelineResponse {
   project_code: string;
   timeline: TimelineEvent[];
   total: number;
+  has_more?: boolean;
+  next_cursor?: string | null;
   item_counts: {
     email: number;
     transcript: number;
@@ -181,6 +181,14 @@ function normalizePaginationResponse<T>(raw: unknown): {
       per_page: perPage,
       total,
       total_pages: totalPages,
+      has_more:
+        typeof paginationSource.has_more === "boolean"
+          ? paginationSource.has_more
+          : undefined,
+      next_cursor:
+        typeof paginationSource.next_cursor === "string"
+          ? paginationSource.next_cursor
+          : null,
     },
   };
 }
@@ -195,6 +203,7 @@ export const api = {
         sort_order: params.sort_order ?? "ASC",
         status: params.status,
         is_active: params.is_active,
+        cursor: params.cursor,
       })}`
     ).then((raw) => normalizePaginationResponse<ProposalSummary>(raw)),
 
@@ -457,6 +466,7 @@ export const api = {
     q?: string;
     sort_by?: "date" | "sender_email" | "subject";
     sort_order?: "ASC" | "DESC";
+    cursor?: string;
   } = {}) =>
     request<unknown>(
       `/api/emails${buildQuery({
@@ -466,6 +476,7 @@ export const api = {
         q: params.q,
         sort_by: params.sort_by,
         sort_order: params.sort_order,
+        cursor: params.cursor,
       })}`
     ).then((raw) => normalizePaginationResponse<EmailSummary>(raw)),
 
@@ -1629,6 +1640,7 @@ export const api = {
     min_confidence?: number;
     limit?: number;
     offset?: number;
+    cursor?: string;
   } = {}) =>
     request<SuggestionsResponse>(
       `/api/suggestions${buildQuery({
@@ -1638,6 +1650,7 @@ export const api = {
         min_confidence: params.min_confidence,
         limit: params.limit ?? 50,
         offset: params.offset ?? 0,
+        cursor: params.cursor,
       })}`
     ),
 
@@ -2423,6 +2436,7 @@ export const api = {
     limit?: number;
     item_types?: string;
     person?: string;
+    cursor?: string;
   }) =>
     request<{
       success: boolean;
@@ -2515,7 +2529,7 @@ export const api = {
     }>(`/api/contracts/by-project/${encodeURIComponent(projectCode)}/fee-breakdown`),
 
   // ============ DOCUMENTS API ============
-  getDocuments: (params: { project_code?: string; document_type?: string; limit?: number } = {}) =>
+  getDocuments: (params: { project_code?: string; document_type?: string; limit?: number; cursor?: string } = {}) =>
     request<{
       success: boolean;
       documents: Array<{
@@ -3418,6 +3432,8 @@ export interface SuggestionsResponse {
   suggestions: SuggestionItem[];
   total: number;
   returned: number;
+  has_more?: boolean;
+  next_cursor?: string | null;
 }
 
 export interface SuggestionsStatsResponse {
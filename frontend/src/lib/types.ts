@@ -3,6 +3,8 @@ export interface Pagination {
   per_page: number;
   total: number;
   total_pages: number;
+  has_more?: boolean;
+  next_cursor?: string | null;
 }
 
 export interface ProposalSummary {
@@ -686,6 +688,7 @@ export interface ProposalsQueryParams {
   per_page?: number;
   sort_by?: string;
   sort_order?: "ASC" | "DESC";
+  cursor?: string;
 }
 
 export interface EmailSummary {
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Contact Lookup Benchmark
+
+Per-contact email lookups before and after migration 117, on a synthetic
+database built in a temp directory (the real database is not touched):
+- recent emails from a contact - signature enrichment and the contact
+  detail page (`LOWER(sender_email) LIKE '%x@y%'` / `LOWER(sender_email) =
+  LOWER(?)` vs the sender_address index)
+- every email a contact took part in - contact preview (sender or
+  recipient LIKE vs the email_participants address index)
+
+Each lookup runs for a sample of contacts. The benchmark reports mean/p95
+latency per contact and the query plan, and checks that both sides return
+the same emails.
+
+Usage:
+    python3 scripts/analysis/benchmark_contact_lookups.py
+    python3 scripts/analysis/benchmark_contact_lookups.py --emails 200000 --contacts 10000 --sample 100
+"""
+
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.email_participants import backfill_email_participants
+
+MIGRATION = PROJECT_ROOT / "database" / "migrations" / "117_email_participants.sql"
+
+LOOKUPS = [
+    (
+        "recent emails (LIKE)",
+        "recent emails (index)",
+        """SELECT email_id FROM emails WHERE LOWER(sender_email) LIKE ?
+           ORDER BY date DESC LIMIT 10""",
+        lambda address: (f"%{address}%",),
+        """SELECT email_id FROM emails WHERE sender_address = ?
+           ORDER BY date DESC LIMIT 10""",
+        lambda address: (address,),
+    ),
+    (
+        "all participation (LIKE)",
+        "all participation (index)",
+        """SELECT email_id FROM emails
+           WHERE LOWER(sender_email) LIKE ? OR LOWER(recipient_emails) LIKE ?""",
+        lambda address: (f"%{address}%", f"%{address}%"),
+        """SELECT DISTINCT email_id FROM email_participants WHERE address = ?""",
+        lambda address: (address,),
+    ),
+]
+
+
+def build_database(path: str, num_emails: int, num_contacts: int, seed: int = 42):
+    """emails with raw From/To headers in the formats the importers store"""
+    rng = random.Random(seed)
+    domains = [f"client{n}.com" for n in range(max(num_contacts // 20, 1))]
+    contacts = [(f"Contact {n}", f"c{n:06d}.name@{rng.choice(domains)}") for n in range(num_contacts)]
+
+    def header(contact):
+        name, address = contact
+        form = rng.random()
+        if form < 0.6:
+            return f"{name} <{address.title() if form < 0.1 else address}>"
+        if form < 0.9:
+            return address
+        return f'"{name}, Ltd" <{address}>'
+
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY AUTOINCREMENT, message_id TEXT UNIQUE, date TEXT,
+            sender_email TEXT, sender_name TEXT, recipient_emails TEXT, subject TEXT, body_full TEXT
+        );
+        CREATE INDEX idx_emails_sender ON emails(sender_email);
+        CREATE INDEX idx_emails_date ON emails(date);
+    """)
+    rows = []
+    for n in range(num_emails):
+        sender = rng.choice(contacts)
+        recipients = ", ".join(header(c) for c in rng.sample(contacts, rng.randint(1, 4)))
+        rows.append((f"<m{n}@bench>", f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                     header(sender), sender[0], recipients, f"Subject {n}", "x" * 200))
+    conn.executemany("""
+        INSERT INTO emails (message_id, date, sender_email, sender_name, recipient_emails, subject, body_full)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    return conn, [address for _, address in contacts]
+
+
+def time_lookup(conn, sql, params_for, addresses):
+    latencies, results = [], []
+    for address in addresses:
+        start = time.perf_counter()
+        rows = conn.execute(sql, params_for(address)).fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(sorted(r[0] for r in rows))
+    latencies.sort()
+    return {
+        'mean': statistics.mean(latencies),
+        'p95': latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        'results': results,
+    }
+
+
+def query_plan(conn, sql, params):
+    return "; ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-contact email lookups before/after migration 117")
+    parser.add_argument('--emails', type=int, default=100000)
+    parser.add_argument('--contacts', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=200, help="Contacts to look up")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"📦 Building {args.emails:,} emails from {args.contacts:,} contacts")
+        conn, addresses = build_database(str(Path(tmp) / "bench.db"), args.emails, args.contacts)
+        sample = random.Random(7).sample(addresses, min(args.sample, len(addresses)))
+
+        start = time.perf_counter()
+        conn.executescript(MIGRATION.read_text())
+        migrate_time = time.perf_counter() - start
+        start = time.perf_counter()
+        backfill = backfill_email_participants(conn, batch_size=5000)
+        backfill_time = time.perf_counter() - start
+        conn.execute("ANALYZE")
+        print(f"   Migration 117: {migrate_time:.1f}s, backfill: {backfill_time:.1f}s "
+              f"({backfill['participants']:,} participant rows)\n")
+
+        print(f"{'Lookup':<28}{'Mean':>10}{'p95':>10}{'Speedup':>10}  Same emails  Plan")
+        all_agree = True
+        for old_label, new_label, old_sql, old_params, new_sql, new_params in LOOKUPS:
+            before = time_lookup(conn, old_sql, old_params, sample)
+            after = time_lookup(conn, new_sql, new_params, sample)
+            # LIMIT 10 on date ties may pick different rows - compare counts there
+            if "LIMIT" in old_sql:
+                agree = [len(r) for r in before['results']] == [len(r) for r in after['results']]
+            else:
+                agree = before['results'] == after['results']
+            all_agree = all_agree and agree
+            speedup = before['mean'] / after['mean'] if after['mean'] else float('inf')
+
+            for label, timing, sql, params in ((old_label, before, old_sql, old_params),
+                                               (new_label, after, new_sql, new_params)):
+                print(f"{label:<28}{timing['mean']:>8.3f}ms{timing['p95']:>8.3f}ms"
+                      f"{'' if timing is before else f'{speedup:.0f}x':>10}"
+                      f"  {'' if timing is before else ('✅' if agree else '❌'):<11}  "
+                      f"{query_plan(conn, sql, params(sample[0]))}")
+        conn.close()
+
+    if not all_agree:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher Benchmark
+
+Compares the compiled KeywordMatcher (Aho-Corasick) against the loops it
+replaced, on a synthetic corpus (no database needed):
+- substring loop  - PatternFirstLinker._check_keyword_pattern (`kw in text`)
+- regex loop      - SmartEmailBrain keyword linking (`re.search(rf'\\b{kw}\\b')`)
+
+The old loops are O(patterns x emails), so they run on a sample of the
+corpus and the full-corpus time is extrapolated. Results from both sides are
+checked for agreement on the sample.
+
+Usage:
+    python3 scripts/analysis/benchmark_keyword_matcher.py
+    python3 scripts/analysis/benchmark_keyword_matcher.py --emails 50000 --patterns 5000 --sample 200
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.keyword_matcher import KeywordMatcher
+
+
+def random_word(rng: random.Random) -> str:
+    return ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+
+
+def build_corpus(num_emails: int, num_patterns: int, seed: int = 42):
+    """Synthetic keywords plus emails (subject + ~1000 char body) that mention some of them"""
+    rng = random.Random(seed)
+
+    keywords = set()
+    while len(keywords) < num_patterns:
+        words = [random_word(rng) for _ in range(rng.choice([1, 1, 1, 2]))]
+        keywords.add(' '.join(words))
+    keywords = sorted(keywords)
+
+    filler = [random_word(rng) for _ in range(2000)]
+    emails = []
+    for _ in range(num_emails):
+        words = rng.choices(filler, k=160)
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        subject = ' '.join(words[:8])
+        body = ' '.join(words[8:])[:1000]
+        emails.append(f"{subject} {body}".lower())
+
+    return keywords, emails
+
+
+def substring_loop(keywords, text):
+    return {kw for kw in keywords if kw in text}
+
+
+def regex_loop(keywords, text):
+    return {kw for kw in keywords if re.search(rf'\b{re.escape(kw)}\b', text)}
+
+
+def time_it(fn, items):
+    start = time.perf_counter()
+    results = [fn(item) for item in items]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KeywordMatcher against the old keyword loops")
+    parser.add_argument('--emails', type=int, default=50000)
+    parser.add_argument('--patterns', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=200,
+                        help="Emails to run the old loops on (time is extrapolated)")
+    args = parser.parse_args()
+
+    print(f"📦 Building corpus: {args.emails:,} emails, {args.patterns:,} patterns")
+    keywords, emails = build_corpus(args.emails, args.patterns)
+    sample = emails[:args.sample]
+    scale = len(emails) / max(len(sample), 1)
+
+    start = time.perf_counter()
+    substring_matcher = KeywordMatcher()
+    boundary_matcher = KeywordMatcher(word_boundary=True)
+    for kw in keywords:
+        substring_matcher.add(kw)
+        boundary_matcher.add(kw)
+    substring_matcher.find_all('warm up')
+    boundary_matcher.find_all('warm up')
+    build_time = time.perf_counter() - start
+    print(f"   Automaton built in {build_time:.2f}s ({substring_matcher.stats()['nodes']:,} nodes)\n")
+
+    rows = []
+    for label, matcher, legacy in (
+        ("substring (PatternFirstLinker)", substring_matcher, substring_loop),
+        ("word boundary (SmartEmailBrain)", boundary_matcher, regex_loop),
+    ):
+        legacy_time, legacy_results = time_it(lambda text, legacy=legacy: legacy(keywords, text), sample)
+        _, sample_results = time_it(lambda text, matcher=matcher: set(matcher.match(text)), sample)
+        matcher_time, _ = time_it(matcher.match, emails)
+
+        agree = legacy_results == sample_results
+        legacy_full = legacy_time * scale
+        rows.append((label, legacy_full, matcher_time, agree))
+
+    print(f"{'Mode':<34}{'Old loop (est.)':>18}{'Matcher':>12}{'Speedup':>10}  Same hits")
+    for label, legacy_full, matcher_time, agree in rows:
+        speedup = legacy_full / matcher_time if matcher_time else float('inf')
+        print(f"{label:<34}{legacy_full:>16.1f}s{matcher_time:>11.1f}s{speedup:>9.0f}x  {'✅' if agree else '❌'}")
+
+    if not all(agree for *_, agree in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Dashboard Load Test
+
+Fires N concurrent clients at dashboard endpoints and reports latency
+percentiles, plus the latency of a DB-free probe (GET /api) sent alongside.
+While blocking sqlite calls run on the event loop the probe queues behind
+them; with the endpoints on the DB executor (services/async_db.py) it
+stays flat.
+
+Two modes:
+  --url        against a running API (run once on the old build and once
+               on the new one for before/after)
+  --synthetic  no production DB needed: starts a local uvicorn serving
+               the same aggregate query from an `async def` route that
+               blocks the loop (before) and from an @off_loop route (after)
+
+Usage:
+    python3 scripts/analysis/load_test_dashboard.py --synthetic
+    python3 scripts/analysis/load_test_dashboard.py --synthetic --clients 50 --requests 10 --rows 200000
+    python3 scripts/analysis/load_test_dashboard.py --url http://localhost:8000 --clients 50 --requests 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+DASHBOARD_ENDPOINTS = [
+    "/api/dashboard/kpis",
+    "/api/dashboard/stats?role=executive",
+    "/api/dashboard/decision-tiles",
+    "/api/dashboard/actions",
+]
+PROBE_ENDPOINT = "/api"
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {
+        'n': len(ordered),
+        'p50': pct(50),
+        'p95': pct(95),
+        'p99': pct(99),
+        'max': ordered[-1],
+        'mean': statistics.fmean(ordered),
+    }
+
+
+def print_row(label, samples, errors=0):
+    if not samples:
+        print(f"   {label:<28} no successful requests ({errors} errors)")
+        return
+    p = percentiles(samples)
+    print(f"   {label:<28} n={p['n']:<5} p50={p['p50']:7.1f}ms  p95={p['p95']:7.1f}ms  "
+          f"p99={p['p99']:7.1f}ms  max={p['max']:7.1f}ms" + (f"  errors={errors}" if errors else ""))
+
+
+async def run_load(client: httpx.AsyncClient, endpoints, clients: int, requests_per_client: int,
+                   probe: str):
+    """N clients loop over the endpoints while one client probes every 20 ms"""
+    latencies, probe_latencies = [], []
+    errors = 0
+    done = asyncio.Event()
+
+    async def worker(seed):
+        nonlocal errors
+        rng = random.Random(seed)
+        for _ in range(requests_per_client):
+            path = rng.choice(endpoints)
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 500:
+                    errors += 1
+                    continue
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    async def prober():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get(probe)
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.02)
+
+    probe_task = asyncio.create_task(prober())
+    wall = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(clients)))
+    wall = time.perf_counter() - wall
+    done.set()
+    await probe_task
+    return latencies, probe_latencies, errors, wall
+
+
+# ============================================================================
+# SYNTHETIC MODE
+# ============================================================================
+
+def build_synthetic_db(path: str, rows: int):
+    """An invoices-like table big enough that one aggregate takes tens of ms"""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE invoices (invoice_id INTEGER PRIMARY KEY, project_code TEXT, "
+                 "invoice_amount REAL, payment_amount REAL, invoice_date TEXT)")
+    rng = random.Random(7)
+    conn.executemany(
+        "INSERT INTO invoices (project_code, invoice_amount, payment_amount, invoice_date) VALUES (?, ?, ?, ?)",
+        ((f"25 BK-{rng.randint(1, 400):03d}", rng.uniform(1000, 90000), rng.uniform(0, 90000),
+          f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}") for _ in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def build_synthetic_app(db_path: str):
+    from fastapi import FastAPI
+    from backend.services.connection_pool import get_pool
+    from backend.services.async_db import off_loop
+
+    aggregate = """
+        SELECT project_code, substr(invoice_date, 1, 7) AS month,
+               SUM(invoice_amount - COALESCE(payment_amount, 0)) AS outstanding
+        FROM invoices GROUP BY project_code, month ORDER BY outstanding DESC LIMIT 20
+    """
+
+    def kpis():
+        conn = get_pool(db_path).acquire()
+        try:
+            return {"top": conn.execute(aggregate).fetchall()}
+        finally:
+            conn.close()
+
+    app = FastAPI()
+
+    @app.get("/blocking/kpis")
+    async def blocking_kpis():
+        return kpis()
+
+    @app.get("/off-loop/kpis")
+    @off_loop
+    def off_loop_kpis():
+        return kpis()
+
+    @app.get(PROBE_ENDPOINT)
+    async def probe():
+        return {"ok": True}
+
+    return app
+
+
+def start_server(app):
+    """Serve the app with uvicorn on a free local port in a background thread"""
+    import socket
+    import threading
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def synthetic(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "load_test.db")
+        print(f"🏗️  Building synthetic database ({args.rows:,} invoice rows)...")
+        build_synthetic_db(db_path, args.rows)
+        server, url = start_server(build_synthetic_app(db_path))
+
+        try:
+            async with httpx.AsyncClient(base_url=url, timeout=300,
+                                         limits=httpx.Limits(max_connections=args.clients + 1)) as client:
+                await client.get("/off-loop/kpis")  # warm the page cache
+                for label, prefix in (("before (async def, blocking)", "/blocking"),
+                                      ("after (@off_loop)", "/off-loop")):
+                    latencies, probes, errors, wall = await run_load(
+                        client, [f"{prefix}/kpis"], args.clients, args.requests, PROBE_ENDPOINT)
+                    print(f"\n📊 {label} - {args.clients} clients x {args.requests} requests, "
+                          f"{len(latencies) / wall:.1f} req/s")
+                    print_row("dashboard query", latencies, errors)
+                    print_row(f"probe {PROBE_ENDPOINT} (no DB)", probes)
+        finally:
+            server.should_exit = True
+
+    from backend.services.async_db import get_db_executor
+    stats = get_db_executor().stats()
+    print(f"\n   Executor: {stats['workers']} workers, avg queue wait {stats['avg_queue_wait_ms']:.1f}ms, "
+          f"max {stats['max_queue_wait_ms']:.1f}ms")
+
+
+async def live(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=120,
+                                 limits=httpx.Limits(max_connections=args.clients + 1)) as client:
+        print(f"🌐 {args.url}: {args.clients} clients x {args.requests} requests over "
+              f"{len(DASHBOARD_ENDPOINTS)} dashboard endpoints")
+        latencies, probes, errors, wall = await run_load(
+            client, DASHBOARD_ENDPOINTS, args.clients, args.requests, PROBE_ENDPOINT)
+        print(f"\n📊 {len(latencies) / wall:.1f} req/s over {wall:.1f}s")
+        print_row("dashboard endpoints", latencies, errors)
+        print_row(f"probe {PROBE_ENDPOINT} (no DB)", probes)
+
+        try:
+            executor = (await client.get("/api/health/db")).json().get("executor")
+        except (httpx.HTTPError, ValueError):
+            executor = None
+        if executor:
+            print(f"\n   Executor: {executor['timeouts']} timeouts, {executor['rejected']} rejected, "
+                  f"avg queue wait {executor['avg_queue_wait_ms']:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard tail-latency load test")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--url", help="Base URL of a running API")
+    mode.add_argument("--synthetic", action="store_true", help="In-process before/after comparison")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=4, help="Requests per client")
+    parser.add_argument("--rows", type=int, default=50000, help="Synthetic invoice rows")
+    args = parser.parse_args()
+
+    asyncio.run(synthetic(args) if args.synthetic else live(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Backfill Email Suggestions (Batch API)
+
+Runs context-aware analysis over a range of past emails through the
+provider's batch API, which bills at half price and answers within 24
+hours. Suggestions are written as each batch finishes.
+
+Re-running is safe. Finished batches are applied, open ones are polled,
+and only emails without a request in flight are submitted. Use --no-wait
+to submit and exit, then run again later to collect.
+
+Usage:
+    # Submit 2025 and wait for the results
+    python scripts/core/backfill_email_suggestions.py --since 2025-01-01 --until 2025-12-31
+
+    # Submit only; collect with a later run
+    python scripts/core/backfill_email_suggestions.py --since 2025-01-01 --no-wait
+
+    # Show batch and job status
+    python scripts/core/backfill_email_suggestions.py --status
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.services.context_aware_suggestion_service import BACKFILL_KIND, ContextAwareSuggestionService
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Database path
+DB_PATH = os.getenv('DATABASE_PATH', 'database/bensley_master.db')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill context-aware email suggestions via the batch API')
+    parser.add_argument('--since', help='First email date (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Last email date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=5000, help='Max emails to submit this run')
+    parser.add_argument('--no-wait', action='store_true', help='Submit and exit without waiting for results')
+    parser.add_argument('--poll-interval', type=float, default=60.0, help='Seconds between polls')
+    parser.add_argument('--timeout', type=float, help='Stop waiting after this many seconds')
+    parser.add_argument('--no-cache', action='store_true', help='Do not reuse cached LLM responses')
+    parser.add_argument('--status', action='store_true', help='Show batch/job status and exit')
+    args = parser.parse_args()
+
+    service = ContextAwareSuggestionService(DB_PATH)
+
+    if args.status:
+        print(json.dumps(service.batch_service.stats(BACKFILL_KIND), indent=2))
+        return
+
+    result = service.backfill_suggestions(
+        since=args.since,
+        until=args.until,
+        limit=args.limit,
+        wait=not args.no_wait,
+        poll_interval=args.poll_interval,
+        timeout=args.timeout,
+        use_cache=not args.no_cache,
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -27,7 +27,9 @@ DB_PATH = os.getenv("DATABASE_PATH", "database/bensley_master.db")
 class QueryBrain:
     def __init__(self, db_path):
         self.db_path = Path(db_path)
-        self.conn = sqlite3.connect(self.db_path)
+        # Created by whichever thread first uses QueryService (lazy registry/warm-up),
+        # then used from request threads
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self.conn.row_factory = sqlite3.Row
         self.cursor = self.conn.cursor()
 
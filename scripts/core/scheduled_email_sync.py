@@ -23,6 +23,7 @@ Environment Variables:
     DATABASE_PATH - Path to SQLite database
     EMAIL_SERVER - IMAP server hostname (default: tmail.bensley.com)
     EMAIL_PORT - IMAP port (default: 993)
+    EMAIL_SYNC_WORKERS - Concurrent IMAP connections (default: 4, one per account/folder)
 
     # Option 1: Multiple accounts (JSON array)
     EMAIL_ACCOUNTS=[{"email":"lukas@bensley.com","password":"xxx"},{"email":"projects@bensley.com","password":"yyy"}]
@@ -33,6 +34,7 @@ Environment Variables:
 
 Created: 2025-11-30
 Updated: 2025-12-08 - Added multi-account support
+Updated: 2026-01-07 - Incremental UID sync, parallel accounts (--sequential for the old walk)
 """
 
 import imaplib
@@ -41,7 +43,6 @@ from email.header import decode_header
 import sqlite3
 import os
 import sys
-import time
 import json
 from datetime import datetime
 from pathlib import Path
@@ -57,6 +58,14 @@ from backend.services.email_orchestrator import EmailOrchestrator
 from backend.services.batch_suggestion_service import get_batch_service
 # Import the pattern-first email linker for automatic email-to-proposal linking
 from backend.services.email_link_processor import process_emails as process_email_links
+# UID high-water mark sync (only new messages are downloaded)
+from backend.services.imap_sync import ImapUidSync
+# Streaming MIME parse (no full message tree in memory)
+from backend.services.mime_stream import ParsedEmail, parse_stream
+# Parallel account/folder sync with a single batched DB writer
+from backend.services.email_sync_scheduler import EmailSyncScheduler
+# Normalized sender/recipient addresses for indexed contact lookups
+from backend.services.email_participants import index_email_participants
 
 # Note: email_project_linker was disabled 2025-12-02 due to flawed logic
 # All linking is now handled by the orchestrator's suggestion pipeline
@@ -71,7 +80,7 @@ IMAP_PORT = int(os.getenv('EMAIL_PORT', '993'))
 
 # Safety settings
 MAX_EMAILS_PER_RUN = int(os.getenv('MAX_EMAILS_PER_RUN', '100'))
-DELAY_BETWEEN_EMAILS = 0.2  # 200ms delay
+DELAY_BETWEEN_EMAILS = 0.2  # 200ms delay after each new message download
 FOLDERS_TO_SYNC = ['INBOX', 'Sent']
 
 
@@ -194,46 +203,70 @@ def decode_header_value(value) -> str:
     return ' '.join(parts)
 
 
-def get_email_body(msg) -> str:
-    """Extract email body - prefer plain text, fall back to HTML"""
-    body = ""
-    html_body = ""
+def email_row(parsed: ParsedEmail, uid: int, message_id: Optional[str],
+              account_email: str, folder: str) -> dict:
+    """emails row (column -> value) from a streamed parse - attachments are not kept
 
-    if msg.is_multipart():
-        for part in msg.walk():
-            content_type = part.get_content_type()
-            try:
-                payload = part.get_payload(decode=True)
-                if payload:
-                    text = payload.decode('utf-8', errors='ignore')
-                    if content_type == 'text/plain' and not body:
-                        body = text
-                    elif content_type == 'text/html' and not html_body:
-                        html_body = text
-            except Exception:
-                pass
-    else:
-        try:
-            payload = msg.get_payload(decode=True)
-            if payload:
-                body = payload.decode('utf-8', errors='ignore')
-        except Exception:
-            pass
+    Used by both paths: the sequential loop below and the parallel
+    scheduler (as its build_row).
+    """
+    msg = parsed.headers
+
+    # Extract fields
+    message_id = message_id or f"<sync-{uid}-{datetime.now().timestamp()}>"
+    subject = decode_header_value(msg.get('Subject', ''))
+    sender = decode_header_value(msg.get('From', ''))
+    recipients = decode_header_value(msg.get('To', ''))
+    date_str = msg.get('Date', '')
+    thread_id = msg.get('References', '') or msg.get('In-Reply-To', '')
 
-    # Fall back to HTML if no plain text
-    if not body and html_body:
-        import re
-        body = re.sub(r'<style[^>]*>.*?</style>', '', html_body, flags=re.DOTALL)
-        body = re.sub(r'<script[^>]*>.*?</script>', '', body, flags=re.DOTALL)
-        body = re.sub(r'<[^>]+>', ' ', body)
-        body = re.sub(r'&nbsp;', ' ', body)
-        body = re.sub(r'\s+', ' ', body).strip()
+    # Parse date
+    try:
+        email_date = email.utils.parsedate_to_datetime(date_str)
+    except:
+        email_date = datetime.now()
+
+    # Get body
+    body = parsed.body
+    snippet = body[:500] if body else ""
+
+    # Build folder with account prefix for multi-account tracking
+    folder_with_account = f"{account_email}:{folder}" if account_email else folder
+
+    # Determine inbox source and category for routing
+    inbox_source = account_email if account_email else 'unknown'
+    inbox_category = categorize_inbox(inbox_source)
+
+    return {
+        'message_id': message_id,
+        'sender_email': sender,
+        'recipient_emails': recipients,
+        'subject': subject,
+        'snippet': snippet,
+        'body_full': body,
+        'date': email_date.isoformat(),
+        'date_normalized': email_date.isoformat(),
+        'processed': 0,
+        'folder': folder_with_account,
+        'thread_id': thread_id,
+        'inbox_source': inbox_source,
+        'inbox_category': inbox_category,
+    }
 
-    return body
+
+def connect_imap(account: Dict[str, any]):
+    """Open and log in an IMAP connection for one account"""
+    imap_conn = imaplib.IMAP4_SSL(IMAP_SERVER, IMAP_PORT)
+    imap_conn.login(account['email'], account['password'])
+    return imap_conn
 
 
 def sync_folder(imap_conn, folder: str, db_cursor, db_conn, account_email: str = '') -> dict:
-    """Sync emails from a single folder
+    """Sync new emails from a single folder
+
+    Only UIDs above the folder's stored high-water mark are considered
+    (see backend/services/imap_sync.py); messages whose Message-ID is
+    already in the database are skipped before their bodies are downloaded.
 
     Args:
         imap_conn: IMAP connection
@@ -248,97 +281,49 @@ def sync_folder(imap_conn, folder: str, db_cursor, db_conn, account_email: str =
     stats = {'imported': 0, 'skipped': 0, 'errors': 0}
 
     try:
-        # Select folder
-        status, _ = imap_conn.select(f'"{folder}"', readonly=True)
-        if status != 'OK':
+        sync = ImapUidSync(imap_conn, db_conn, folder, account_email,
+                           body_delay=DELAY_BETWEEN_EMAILS)
+        if not sync.select():
             log(f"Failed to select folder: {folder}", 'ERROR')
             return stats
 
-        # Search for all emails
-        status, messages = imap_conn.search(None, 'ALL')
-        if status != 'OK':
-            log(f"Failed to search folder: {folder}", 'ERROR')
-            return stats
-
-        email_ids = messages[0].split()
-        total = len(email_ids)
-        log(f"  Found {total} emails in {folder}")
-
-        # Limit for safety
-        if total > MAX_EMAILS_PER_RUN:
-            email_ids = email_ids[-MAX_EMAILS_PER_RUN:]  # Most recent
-            log(f"  Limiting to last {MAX_EMAILS_PER_RUN} emails")
+        pending = sync.plan(limit=MAX_EMAILS_PER_RUN)
+        stats['skipped'] = sync.stats['known']
+        log(f"  {sync.stats['new_uids']} new UIDs in {folder} since UID {sync.last_uid} "
+            f"({sync.stats['known']} already imported, {len(pending)} to download"
+            + (f", {sync.stats['deferred']} deferred to next run" if sync.stats['deferred'] else "")
+            + ")")
 
-        for i, email_id in enumerate(email_ids, 1):
+        for i, (new_msg, chunks) in enumerate(sync.stream(pending), 1):
             try:
-                # Fetch email
-                status, msg_data = imap_conn.fetch(email_id, '(RFC822)')
-                if status != 'OK':
-                    stats['errors'] += 1
-                    continue
-
-                msg = email.message_from_bytes(msg_data[0][1])
-
-                # Extract fields
-                message_id = msg.get('Message-ID', f"<sync-{email_id.decode()}-{datetime.now().timestamp()}>")
-                subject = decode_header_value(msg.get('Subject', ''))
-                sender = decode_header_value(msg.get('From', ''))
-                recipients = decode_header_value(msg.get('To', ''))
-                date_str = msg.get('Date', '')
-                thread_id = msg.get('References', '') or msg.get('In-Reply-To', '')
-
-                # Parse date
-                try:
-                    email_date = email.utils.parsedate_to_datetime(date_str)
-                except:
-                    email_date = datetime.now()
-
-                # Check if already exists
-                db_cursor.execute("SELECT email_id FROM emails WHERE message_id = ?", (message_id,))
-                if db_cursor.fetchone():
-                    stats['skipped'] += 1
-                    continue
-
-                # Get body
-                body = get_email_body(msg)
-                snippet = body[:500] if body else ""
-
-                # Build folder with account prefix for multi-account tracking
-                folder_with_account = f"{account_email}:{folder}" if account_email else folder
-
-                # Determine inbox source and category for routing
-                inbox_source = account_email if account_email else 'unknown'
-                inbox_category = categorize_inbox(inbox_source)
-
-                # Insert email with inbox routing info
-                db_cursor.execute("""
-                    INSERT INTO emails
-                    (message_id, sender_email, recipient_emails, subject, snippet, body_full,
-                     date, date_normalized, processed, folder, thread_id,
-                     inbox_source, inbox_category)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
-                """, (
-                    message_id, sender, recipients, subject, snippet, body,
-                    email_date.isoformat(), email_date.isoformat(), folder_with_account, thread_id,
-                    inbox_source, inbox_category
-                ))
+                parsed = parse_stream(chunks, spool_attachments=False)
+                row = email_row(parsed, new_msg.uid, new_msg.message_id, account_email, folder)
+                columns = ', '.join(row)
+                db_cursor.execute(
+                    f"INSERT INTO emails ({columns}) VALUES ({', '.join('?' * len(row))})",
+                    tuple(row.values())
+                )
+                index_email_participants(db_conn, [db_cursor.lastrowid])
+                sync.mark_done(new_msg.uid)
 
                 stats['imported'] += 1
 
-                # Rate limiting
-                time.sleep(DELAY_BETWEEN_EMAILS)
-
                 # Progress logging
                 if i % 25 == 0:
-                    log(f"  Progress: {i}/{len(email_ids)} ({stats['imported']} new)")
+                    log(f"  Progress: {i}/{len(pending)} ({stats['imported']} new)")
+                    sync.save_state()
                     db_conn.commit()
 
             except Exception as e:
-                log(f"  Error processing email {i}: {e}", 'ERROR')
-                stats['errors'] += 1
+                # Counted in sync.stats['errors']; the mark stays below it for a retry
+                log(f"  Error processing email UID {new_msg.uid}: {e}", 'ERROR')
+                sync.mark_failed(new_msg.uid)
                 continue
 
+        stats['errors'] += sync.stats['errors']
+        last_uid = sync.save_state()
         db_conn.commit()
+        log(f"  {folder} synced up to UID {last_uid}")
 
     except Exception as e:
         log(f"Error syncing folder {folder}: {e}", 'ERROR')
@@ -358,7 +343,6 @@ def sync_account(account: Dict[str, any], db_cursor, db_conn) -> dict:
         dict with 'imported', 'skipped', 'errors' counts
     """
     account_email = account['email']
-    account_password = account['password']
     folders = account.get('folders', FOLDERS_TO_SYNC)
 
     log(f"\n{'='*60}")
@@ -370,8 +354,7 @@ def sync_account(account: Dict[str, any], db_cursor, db_conn) -> dict:
     # Connect to IMAP
     try:
         log(f"Connecting to IMAP: {IMAP_SERVER}:{IMAP_PORT}")
-        imap_conn = imaplib.IMAP4_SSL(IMAP_SERVER, IMAP_PORT)
-        imap_conn.login(account_email, account_password)
+        imap_conn = connect_imap(account)
         log("IMAP connection successful")
     except Exception as e:
         log(f"IMAP connection failed for {account_email}: {e}", 'ERROR')
@@ -396,8 +379,47 @@ def sync_account(account: Dict[str, any], db_cursor, db_conn) -> dict:
     return total_stats
 
 
-def run_sync():
-    """Run the full sync process for all configured accounts"""
+def sync_accounts_parallel(accounts: List[Dict[str, any]]) -> List[Dict]:
+    """Sync all accounts/folders concurrently through the sync scheduler
+
+    Metrics for every account land in email_sync_runs.
+
+    Returns:
+        List of {'email', 'stats'} like the sequential path
+    """
+    scheduler = EmailSyncScheduler(
+        DB_PATH,
+        build_row=email_row,
+        connect=connect_imap,
+        max_per_folder=MAX_EMAILS_PER_RUN,
+        body_delay=DELAY_BETWEEN_EMAILS,
+    )
+    summary = scheduler.run(accounts)
+    log(f"Sync run {summary['run_id']} finished in {summary['duration_seconds']}s")
+
+    account_results = []
+    for account_email, metrics in summary['accounts'].items():
+        rate = metrics['messages_fetched'] / summary['duration_seconds'] if summary['duration_seconds'] else 0
+        log(f"  {account_email}: {metrics['messages_fetched']} downloaded "
+            f"({metrics['bytes_fetched'] / 1024 / 1024:.1f} MB, {rate:.1f} msg/s)")
+        for failure in metrics['failed_folders']:
+            log(f"  {account_email}: {failure}", 'ERROR')
+        account_results.append({
+            'email': account_email,
+            'stats': {key: metrics[key] for key in ('imported', 'skipped', 'errors')},
+        })
+    if summary['totals'].get('writer_error'):
+        log(f"DB writer error: {summary['totals']['writer_error']}", 'ERROR')
+    return account_results
+
+
+def run_sync(parallel: bool = True):
+    """Run the full sync process for all configured accounts
+
+    Args:
+        parallel: Sync accounts/folders concurrently (default). False walks
+                  them one by one over a single connection per account.
+    """
     log("=" * 60)
     log("BENSLEY EMAIL SYNC - Starting")
     log(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -435,17 +457,21 @@ def run_sync():
 
     # Sync each account
     total_stats = {'imported': 0, 'skipped': 0, 'errors': 0}
-    account_results = []
 
-    for account in accounts:
-        stats = sync_account(account, db_cursor, db_conn)
-        total_stats['imported'] += stats['imported']
-        total_stats['skipped'] += stats['skipped']
-        total_stats['errors'] += stats['errors']
-        account_results.append({
-            'email': account['email'],
-            'stats': stats
-        })
+    if parallel:
+        account_results = sync_accounts_parallel(accounts)
+    else:
+        account_results = []
+        for account in accounts:
+            stats = sync_account(account, db_cursor, db_conn)
+            account_results.append({
+                'email': account['email'],
+                'stats': stats
+            })
+
+    for result in account_results:
+        for key in total_stats:
+            total_stats[key] += result['stats'][key]
 
     # Get final count
     db_cursor.execute("SELECT COUNT(*) FROM emails")
@@ -550,6 +576,8 @@ def main():
     parser.add_argument('--dry-run', action='store_true', help='Test IMAP connection only')
     parser.add_argument('--orchestrate-only', action='store_true', help='Run orchestrator only (no email import)')
     parser.add_argument('--list-accounts', action='store_true', help='List configured accounts')
+    parser.add_argument('--sequential', action='store_true',
+                        help='Sync accounts one at a time instead of in parallel')
     args = parser.parse_args()
 
     if args.list_accounts:
@@ -626,7 +654,7 @@ def main():
                 log(f"  ❌ Connection failed: {e}", 'ERROR')
         return
 
-    run_sync()
+    run_sync(parallel=not args.sequential)
 
 
 if __name__ == '__main__':
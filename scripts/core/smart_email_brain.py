@@ -32,6 +32,8 @@ DB_PATH = os.getenv('DATABASE_PATH', 'database/bensley_master.db')
 backend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'backend')
 sys.path.insert(0, backend_path)
 
+from services.keyword_matcher import KeywordMatcher
+
 try:
     from services.ai_learning_service import AILearningService
     AI_LEARNING_ENABLED = True
@@ -62,6 +64,7 @@ class SmartEmailBrain:
         self.contacts = []
         self.learned_patterns = []
         self.business_context = ""
+        self._keyword_matcher = None
 
     def get_connection(self):
         conn = sqlite3.connect(self.db_path)
@@ -450,27 +453,13 @@ LEARNED PROJECT ALIASES:
         # - City names, client names = 3 points
         # - Project words = 2 points
         # - Countries (if many projects) = 0.5 points
-        import re
-
-        keyword_index = self._build_smart_keyword_index(cursor)
+        matcher = self._get_keyword_matcher(cursor)
 
         body = (email.get('body_full', '') or '')[:300].lower()
         text_to_match = f"{subject.lower()} {body}"
 
         # Find matching keywords with weighted scoring
-        scores = {}
-        match_reasons = {}
-
-        for keyword, proposals_list in keyword_index.items():
-            if re.search(rf'\b{re.escape(keyword)}\b', text_to_match):
-                for p in proposals_list:
-                    pid = p['proposal_id']
-                    weight = p['weight']
-                    if pid not in scores:
-                        scores[pid] = 0
-                        match_reasons[pid] = []
-                    scores[pid] += weight
-                    match_reasons[pid].append((keyword, weight))
+        scores, match_reasons = self._score_keyword_matches(matcher, text_to_match)
 
         # Require score >= 3 (one city name, or country + project word)
         if scores:
@@ -1081,6 +1070,41 @@ Return ONLY valid JSON."""
             'weight': weight
         })
 
+    def _get_keyword_matcher(self, cursor, refresh: bool = False) -> KeywordMatcher:
+        """
+        Compile the weighted keyword index into a word-boundary matcher.
+
+        Built once per run and reused for every email; refresh=True re-reads
+        proposals and applies only the changed keywords.
+        """
+        if self._keyword_matcher is None or refresh:
+            keyword_index = self._build_smart_keyword_index(cursor)
+            if self._keyword_matcher is None:
+                self._keyword_matcher = KeywordMatcher(word_boundary=True)
+            self._keyword_matcher.sync({
+                keyword: [(p, p['weight']) for p in proposals_list]
+                for keyword, proposals_list in keyword_index.items()
+            })
+        return self._keyword_matcher
+
+    def _score_keyword_matches(self, matcher: KeywordMatcher, text: str) -> Tuple[dict, dict]:
+        """
+        Weighted score per proposal for one text (each keyword counted once).
+
+        Returns: (scores {proposal_id: score}, match_reasons {proposal_id: [(keyword, weight), ...]})
+        """
+        scores = {}
+        match_reasons = {}
+        for keyword, hits in matcher.match(text).items():
+            for hit in hits:
+                pid = hit.payload['proposal_id']
+                if pid not in scores:
+                    scores[pid] = 0
+                    match_reasons[pid] = []
+                scores[pid] += hit.weight
+                match_reasons[pid].append((keyword, hit.weight))
+        return scores, match_reasons
+
     def link_emails_by_subject_keywords(self) -> int:
         """
         Strategy 2: Smart fuzzy match using weighted keyword index.
@@ -1093,14 +1117,12 @@ Return ONLY valid JSON."""
 
         Requires score >= 3 to link (e.g., one city name, or country + project word)
         """
-        import re
-
         conn = self.get_connection()
         cursor = conn.cursor()
 
         # Build the smart weighted keyword index
-        keyword_index = self._build_smart_keyword_index(cursor)
-        print(f"  Built weighted keyword index with {len(keyword_index)} terms")
+        matcher = self._get_keyword_matcher(cursor, refresh=True)
+        print(f"  Built weighted keyword index with {len(matcher)} terms")
 
         # Get unlinked emails
         cursor.execute("""
@@ -1115,21 +1137,8 @@ Return ONLY valid JSON."""
             # Combine subject and first part of body for matching
             text = f"{row['subject'] or ''} {(row['body_full'] or '')[:500]}".lower()
 
-            # Find matching keywords with weighted scoring
-            scores = {}  # proposal_id -> weighted score
-            match_reasons = {}  # proposal_id -> [(keyword, weight), ...]
-
-            for keyword, proposals_list in keyword_index.items():
-                # Use word boundary matching to avoid partial matches
-                if re.search(rf'\b{re.escape(keyword)}\b', text):
-                    for p in proposals_list:
-                        pid = p['proposal_id']
-                        weight = p['weight']
-                        if pid not in scores:
-                            scores[pid] = 0
-                            match_reasons[pid] = []
-                        scores[pid] += weight
-                        match_reasons[pid].append((keyword, weight))
+            # Find matching keywords with weighted scoring (word-boundary matches only)
+            scores, match_reasons = self._score_keyword_matches(matcher, text)
 
             # Link to the proposal with the highest score (if score >= 3)
             # Score 3 = one city name, or country + distinctive word, or 1.5 city names
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Backfill Email Participants
+
+Fills emails.sender_address / sender_domain and the email_participants
+table (migration 117) for emails imported before the importers indexed
+them. Migration 117 backfills plain senders only. This script parses every
+sender and recipient header and replaces each email's participant rows.
+
+Commits every batch and is safe to stop and re-run.
+
+Usage:
+    python3 scripts/maintenance/backfill_email_participants.py                  # all emails
+    python3 scripts/maintenance/backfill_email_participants.py --after-id 250000 # resume
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.email_participants import backfill_email_participants, has_participant_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill normalized email addresses and email_participants")
+    parser.add_argument('--after-id', type=int, default=0, help="Start after this email_id")
+    parser.add_argument('--batch-size', type=int, default=2000, help="Emails per transaction")
+    parser.add_argument('--limit', type=int, help="Stop after this many emails")
+    args = parser.parse_args()
+
+    db_path = os.getenv('DATABASE_PATH', str(PROJECT_ROOT / "database" / "bensley_master.db"))
+    conn = sqlite3.connect(db_path)
+
+    if not has_participant_index(conn):
+        print("⚠️  No email_participants table - apply migration 117 first (python3 database/migrate.py)")
+        sys.exit(1)
+
+    print(f"📇 Indexing email participants in {db_path}")
+    start = time.perf_counter()
+    result = backfill_email_participants(
+        conn,
+        after_id=args.after_id,
+        batch_size=args.batch_size,
+        limit=args.limit,
+        progress=lambda done, last_id: print(f"   {done:,} emails (through email_id {last_id})"),
+    )
+    conn.close()
+
+    print(f"   ✅ {result['emails']:,} emails indexed, {result['participants']:,} participant rows "
+          f"in {time.perf_counter() - start:.1f}s")
+    print(f"   Resume with --after-id {result['last_email_id']}")
+
+
+if __name__ == "__main__":
+    main()
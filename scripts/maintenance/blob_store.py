@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Blob Store Maintenance
+
+Content-addressed attachment/file store from migration 109
+(backend/services/blob_store.py).
+
+    ingest  - move files under files/ that the database points at into the
+              store, collapsing duplicates (one-off after applying 109;
+              safe to re-run)
+    gc      - delete blobs nothing has referenced for --grace-hours
+    stats   - stored vs logical size
+
+Usage:
+    python3 scripts/maintenance/blob_store.py ingest --dry-run
+    python3 scripts/maintenance/blob_store.py ingest [--files-root files] [--keep-originals]
+    python3 scripts/maintenance/blob_store.py gc [--grace-hours 24] [--dry-run]
+    python3 scripts/maintenance/blob_store.py stats
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.blob_store import BlobStore, GC_GRACE_HOURS
+
+
+def mb(num_bytes: int) -> str:
+    return f"{num_bytes / 1024 / 1024:,.1f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blob store maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Deduplicate existing files into the store")
+    ingest.add_argument("--files-root", default=str(PROJECT_ROOT / "files"))
+    ingest.add_argument("--keep-originals", action="store_true", help="Copy instead of moving")
+    ingest.add_argument("--dry-run", action="store_true")
+
+    gc = sub.add_parser("gc", help="Delete unreferenced blobs")
+    gc.add_argument("--grace-hours", type=float, default=GC_GRACE_HOURS)
+    gc.add_argument("--dry-run", action="store_true")
+
+    sub.add_parser("stats", help="Show dedup savings")
+
+    args = parser.parse_args()
+    db_path = os.getenv('DATABASE_PATH', str(PROJECT_ROOT / "database" / "bensley_master.db"))
+    store = BlobStore(db_path)
+
+    if not store.table_exists('blob_refs'):
+        print("⚠️  blob tables not found - apply migration 109 first (python3 database/migrate.py)")
+        sys.exit(1)
+
+    if args.command == "ingest":
+        print(f"📦 Ingesting files under {args.files_root} into {store.root}"
+              + (" (dry run)" if args.dry_run else ""))
+        result = store.ingest_existing(args.files_root, dry_run=args.dry_run,
+                                       keep_originals=args.keep_originals)
+        print(f"   Files: {result['files']} ({mb(result['bytes'])})")
+        print(f"   Duplicates: {result['duplicates']} ({mb(result['duplicate_bytes'])} saved)")
+        if not args.dry_run:
+            print(f"   References: {result['refs']}")
+        if result['missing']:
+            print(f"   ⚠️  Recorded paths not on disk: {result['missing']}")
+        if result['errors']:
+            print(f"   ❌ Errors: {result['errors']} (see logs)")
+
+    elif args.command == "gc":
+        result = store.gc(grace_hours=args.grace_hours, dry_run=args.dry_run)
+        verb = "Would delete" if args.dry_run else "Deleted"
+        print(f"🧹 {verb} {result['blobs_deleted']} blobs and {result['orphan_files']} orphan files "
+              f"({mb(result['bytes_freed'])})")
+        if result['dangling_refs']:
+            print(f"   Dropped {result['dangling_refs']} refs to deleted rows")
+
+    else:
+        stats = store.stats()
+        print(f"📊 {stats['blobs']} blobs, {mb(stats['stored_bytes'])} on disk")
+        print(f"   {stats['refs']} references, {mb(stats['logical_bytes'])} logical")
+        print(f"   Saved by dedup: {mb(stats['saved_bytes'])}")
+        print(f"   Unreferenced (awaiting gc): {stats['unreferenced_blobs']}")
+
+
+if __name__ == "__main__":
+    main()
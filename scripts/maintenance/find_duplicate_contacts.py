@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Find Duplicate Contacts by Name
+
+cleanup_contacts.py merges contacts that share an email address. This
+reports the other kind of duplicate: one person with contacts under
+several addresses ("Caragh Smith" at gmail and at the client's domain).
+Names are compared through the contact name index from migration 121
+(phonetic + trigram keys), so accents, punctuation and word order do not
+hide a match. Nothing is changed - review the groups and merge by hand.
+
+Usage:
+    python3 scripts/maintenance/find_duplicate_contacts.py                # report groups
+    python3 scripts/maintenance/find_duplicate_contacts.py --min-score 0.9
+    python3 scripts/maintenance/find_duplicate_contacts.py --rebuild      # re-index all contacts first
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.contact_name_index import ContactNameIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report contacts that are likely the same person")
+    parser.add_argument("--min-score", type=float, default=0.95, help="Name match score (0-1)")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every contact first")
+    args = parser.parse_args()
+
+    db_path = os.getenv('DATABASE_PATH', str(PROJECT_ROOT / "database" / "bensley_master.db"))
+    index = ContactNameIndex(db_path)
+
+    if args.rebuild:
+        print(f"🔎 Re-indexing contact names in {db_path}")
+        print(f"   ✅ {index.rebuild()} contacts indexed")
+
+    groups = index.duplicate_groups(min_score=args.min_score)
+    stats = index.stats()
+    if not stats['persistent']:
+        print("⚠️  Migration 121 not applied - index built in memory (python3 database/migrate.py)")
+
+    print(f"👥 {len(groups)} group(s) of same-name contacts among {stats['contacts']} contacts")
+    for group in groups:
+        print(f"\n   {group[0]['name']}")
+        for contact in group:
+            company = f" ({contact['company']})" if contact.get('company') else ''
+            print(f"     #{contact['contact_id']:<6} {contact.get('email') or '-'}{company}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Rebuild Full-Text Search Indexes
+
+Re-indexes the FTS5 tables from migration 105 (emails, documents, contacts,
+projects, proposals) from their base tables and merges index segments.
+Triggers keep the indexes in sync day to day - run this after bulk imports
+done with triggers disabled, restores, or if search results look stale.
+
+Usage:
+    python3 scripts/maintenance/rebuild_search_index.py                  # all sources
+    python3 scripts/maintenance/rebuild_search_index.py emails contacts  # selected sources
+"""
+
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.search_service import SearchService, SEARCH_SOURCES
+
+
+def main():
+    db_path = os.getenv('DATABASE_PATH', str(PROJECT_ROOT / "database" / "bensley_master.db"))
+    sources = sys.argv[1:] or None
+
+    unknown = [s for s in (sources or []) if s not in SEARCH_SOURCES]
+    if unknown:
+        print(f"❌ Unknown source(s): {', '.join(unknown)}. Choose from: {', '.join(SEARCH_SOURCES)}")
+        sys.exit(1)
+
+    print(f"🔎 Rebuilding search indexes in {db_path}")
+    counts = SearchService(db_path).rebuild(sources)
+
+    if not counts:
+        print("⚠️  No FTS tables found - apply migration 105 first (python3 database/migrate.py)")
+        sys.exit(1)
+
+    for source, count in counts.items():
+        print(f"   ✅ {source}: {count} rows indexed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+KPI Snapshot Refresh
+
+Brings the dashboard KPI snapshot tables from migration 110
+(backend/services/kpi_snapshot_service.py) up to date. The API refreshes
+them on read; run this from cron after bulk imports so the first dashboard
+load of the day doesn't pay for the full rebuild.
+
+Usage:
+    python3 scripts/maintenance/refresh_kpi_snapshots.py           # dirty rows only
+    python3 scripts/maintenance/refresh_kpi_snapshots.py --full    # rebuild everything
+    python3 scripts/maintenance/refresh_kpi_snapshots.py --status  # staleness only
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.kpi_snapshot_service import KpiSnapshotService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh KPI snapshot tables")
+    parser.add_argument("--full", action="store_true", help="Recompute every project row")
+    parser.add_argument("--status", action="store_true", help="Show staleness without refreshing")
+    args = parser.parse_args()
+
+    db_path = os.getenv('DATABASE_PATH', str(PROJECT_ROOT / "database" / "bensley_master.db"))
+    kpis = KpiSnapshotService(db_path)
+
+    if not kpis.available():
+        print("⚠️  KPI snapshot tables not found - apply migration 110 first (python3 database/migrate.py)")
+        sys.exit(1)
+
+    if not args.status:
+        result = kpis.refresh(full=args.full)
+        print(f"🔄 {result['mode']} refresh: {result['projects']} project rows, "
+              f"groups={result['groups']}, {result['duration_ms']}ms")
+
+    status = kpis.staleness()
+    print(f"📊 Snapshot as of {status['as_of_date']}, refreshed {status['refreshed_at']} UTC")
+    print(f"   Pending changes: {status['pending_changes']}"
+          + (f" (oldest {status['oldest_pending_change']})" if status['pending_changes'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -124,3 +124,340 @@ def setup_test_environment(monkeypatch, temp_database):
     """
     monkeypatch.setenv("DATABASE_PATH", temp_database)
     monkeypatch.setenv("TESTING", "true")
+
+
+# ============================================
+# Migrated test databases
+# ============================================
+
+MIGRATIONS = PROJECT_ROOT / "database" / "migrations"
+
+# Tables each data_versions migration hangs triggers on. A test creates the
+# ones it reads with real columns; the rest get a bare stub here.
+TRIGGER_TABLES = {
+    "112_query_cache_data_versions.sql": (
+        "projects", "proposals", "invoices", "project_fee_breakdown", "project_milestones",
+        "rfis", "meetings", "contacts", "emails", "email_proposal_links", "email_project_links",
+    ),
+    "119_keyset_pagination.sql": ("ai_suggestions", "documents", "email_content"),
+    "120_http_etag_data_versions.sql": (
+        "tasks", "commitments", "deliverables", "training_data", "change_log",
+        "kpi_project_snapshot", "kpi_global_snapshot",
+    ),
+}
+
+BASE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+"""
+
+# Stub columns where a bare id is not enough to insert into the table
+STUB_COLUMNS = {
+    "email_proposal_links": "email_id INTEGER, proposal_id INTEGER",
+    "email_project_links": "email_id INTEGER, project_id INTEGER",
+}
+
+
+def build_migrated_db(path, schema="", migrations=(), seed=None) -> str:
+    """
+    Create a SQLite DB at path: the test's own schema, then BASE_SCHEMA plus a
+    stub for every trigger table the migrations need and the schema lacks,
+    then seed(conn), then the migrations in order.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.executescript(BASE_SCHEMA)
+    for migration in migrations:
+        for table in TRIGGER_TABLES.get(migration, ()):
+            columns = STUB_COLUMNS.get(table, "id INTEGER PRIMARY KEY")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+    if seed:
+        seed(conn)
+    for migration in migrations:
+        conn.executescript((MIGRATIONS / migration).read_text())
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def migrated_db(tmp_path):
+    """Build a migrated test DB: migrated_db(schema, migrations, seed=None) -> path"""
+    def build(schema="", migrations=(), seed=None, name="test.db"):
+        return build_migrated_db(tmp_path / name, schema, migrations, seed)
+    return build
+
+
+# ============================================
+# IMAP stand-in for sync tests
+# ============================================
+
+def make_imap_message(n: int) -> bytes:
+    """Minimal RFC822 message with a predictable Message-ID"""
+    return (
+        f"Message-ID: <msg-{n}@example.com>\r\n"
+        f"From: sender{n}@example.com\r\n"
+        f"Subject: Message {n}\r\n"
+        f"\r\n"
+        f"Body {n}\r\n"
+    ).encode()
+
+
+class FakeImap:
+    """Just enough of imaplib.IMAP4 for the sync engine (SELECT, UID SEARCH/FETCH, LOGOUT)"""
+
+    def __init__(self, messages=None, uidvalidity=1):
+        self.messages = dict(messages or {})   # uid -> raw bytes
+        self.uidvalidity = uidvalidity
+        self.commands = []
+
+    def select(self, mailbox, readonly=False):
+        self.commands.append(('SELECT', mailbox, readonly))
+        return 'OK', [str(len(self.messages)).encode()]
+
+    def logout(self):
+        self.commands.append(('LOGOUT',))
+        return 'BYE', []
+
+    def response(self, code):
+        return code, [str(self.uidvalidity).encode()]
+
+    def status(self, mailbox, names):
+        return 'OK', [f'{mailbox} (UIDVALIDITY {self.uidvalidity})'.encode()]
+
+    def _uids(self, uid_set):
+        uids = set()
+        highest = max(self.messages, default=0)
+        for part in uid_set.split(','):
+            start, _, end = part.partition(':')
+            start = int(start)
+            end = highest if end == '*' else int(end or start)
+            if end < start:
+                start, end = end, start
+            uids.update(u for u in self.messages if start <= u <= end)
+        return sorted(uids)
+
+    def uid(self, command, *args):
+        self.commands.append((command,) + args)
+        if command == 'SEARCH':
+            criteria = args[1]
+            assert criteria.startswith('UID ')
+            uids = self._uids(criteria[4:])
+            return 'OK', [' '.join(map(str, uids)).encode()]
+
+        uid_set, items = args
+        data = []
+        for seq, uid in enumerate(self._uids(uid_set), 1):
+            raw = self.messages[uid]
+            if 'HEADER.FIELDS' in items:
+                header = next(line for line in raw.split(b'\r\n') if line.startswith(b'Message-ID'))
+                payload = header + b'\r\n\r\n'
+                data.append((f'{seq} (UID {uid} BODY[HEADER.FIELDS (MESSAGE-ID)] {{{len(payload)}}}'.encode(), payload))
+            elif '<' in items:
+                # Partial fetch: BODY.PEEK[]<offset.size>
+                offset, size = map(int, items[items.index('<') + 1:items.index('>')].split('.'))
+                window = raw[offset:offset + size]
+                data.append((f'{seq} (UID {uid} BODY[]<{offset}> {{{len(window)}}}'.encode(), window))
+            else:
+                data.append((f'{seq} (UID {uid} BODY[] {{{len(raw)}}}'.encode(), raw))
+            data.append(b')')
+        return 'OK', data
+
+
+@pytest.fixture
+def fake_imap():
+    """In-memory IMAP server class: FakeImap({uid: raw_bytes}, uidvalidity=1)"""
+    return FakeImap
+
+
+@pytest.fixture(name="make_imap_message")
+def make_imap_message_fixture():
+    """Build a raw test message: make_imap_message(n)"""
+    return make_imap_message
+
+
+# ============================================
+# OpenAI-compatible HTTP stand-in for LLM dispatch tests
+# ============================================
+
+class FakeOpenAIServer:
+    """
+    Local server speaking the chat.completions wire format, with rate-limit
+    headers. Point a client at it via OPENAI_BASE_URL (the fixture does).
+
+    - responder(request_json) -> message content (default '{}')
+    - cached_tokens(request_json) -> prompt tokens reported as cache hits
+    - fail_next(n, status, headers): the next n requests get that error
+    - delay: seconds each request takes (to observe concurrency)
+
+    Batch API stand-in (/v1/files, /v1/batches): a batch finishes on its
+    batch_polls-th retrieve. Lines whose custom_id is in batch_fail_ids go to
+    the error file. With batch_expire_after=n, only the first n lines are
+    answered and the batch ends 'expired'.
+    """
+
+    def __init__(self):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.requests = []
+        self.failures = []
+        self.responder = lambda request: "{}"
+        self.cached_tokens = lambda request: 0
+        self.delay = 0.0
+        self.rate_headers = {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-limit-tokens": "200000",
+            "x-ratelimit-remaining-requests": "499",
+            "x-ratelimit-remaining-tokens": "199000",
+            "x-ratelimit-reset-requests": "120ms",
+            "x-ratelimit-reset-tokens": "300ms",
+        }
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.files = {}
+        self.batches = {}
+        self.batch_polls = 1
+        self.batch_fail_ids = set()
+        self.batch_expire_after = None
+        self.batch_lines_answered = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, headers):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path.endswith("/content"):
+                    content = server.files[path.split("/")[-2]].encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/octet-stream")
+                    self.send_header("Content-Length", str(len(content)))
+                    self.end_headers()
+                    self.wfile.write(content)
+                    return
+                batch = server.batches.get(path.split("/")[-1])
+                if batch is None:
+                    self._send(404, {"error": {"message": "no such batch", "type": "fake", "code": None}}, {})
+                    return
+                with server._lock:
+                    batch["polls"] += 1
+                    if batch["status"] == "validating" and batch["polls"] >= server.batch_polls:
+                        server._run_batch(batch)
+                self._send(200, {k: v for k, v in batch.items() if k != "polls"}, {})
+
+            def do_POST(self):
+                import time
+                raw = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path.endswith("/files"):
+                    from email.parser import BytesParser
+                    from email.policy import default
+                    message = BytesParser(policy=default).parsebytes(
+                        b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + raw)
+                    part = next(p for p in message.iter_parts()
+                                if p.get_param("name", header="content-disposition") == "file")
+                    file_id = f"file-{len(server.files) + 1}"
+                    server.files[file_id] = part.get_payload(decode=True).decode()
+                    self._send(200, {"id": file_id, "object": "file", "purpose": "batch"}, {})
+                    return
+                if self.path.endswith("/batches"):
+                    body = json.loads(raw)
+                    batch_id = f"batch-{len(server.batches) + 1}"
+                    total = len(server.files[body["input_file_id"]].splitlines())
+                    server.batches[batch_id] = {
+                        "id": batch_id, "object": "batch", "status": "validating",
+                        "input_file_id": body["input_file_id"], "endpoint": body["endpoint"],
+                        "output_file_id": None, "error_file_id": None, "polls": 0,
+                        "request_counts": {"total": total, "completed": 0, "failed": 0},
+                    }
+                    self._send(200, {k: v for k, v in server.batches[batch_id].items() if k != "polls"}, {})
+                    return
+                request = json.loads(raw)
+                with server._lock:
+                    server.requests.append(request)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    failure = server.failures.pop(0) if server.failures else None
+                try:
+                    if server.delay:
+                        time.sleep(server.delay)
+                    if failure:
+                        status, headers = failure
+                        self._send(status, {"error": {"message": f"fake {status}", "type": "fake",
+                                                      "code": None}}, headers)
+                        return
+                    self._send(200, server._completion(request), server.rate_headers)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def _completion(self, request):
+        content = self.responder(request)
+        prompt_tokens = sum(len(m.get("content") or "") for m in request["messages"]) // 4
+        return {
+            "id": f"chatcmpl-{len(self.requests)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": request["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 20,
+                      "total_tokens": prompt_tokens + 20,
+                      "prompt_tokens_details": {"cached_tokens": self.cached_tokens(request)}},
+        }
+
+    def _run_batch(self, batch):
+        import json
+        output, errors = [], []
+        lines = [json.loads(line) for line in self.files[batch["input_file_id"]].splitlines() if line]
+        if self.batch_expire_after is not None:
+            lines = lines[:self.batch_expire_after]
+        for line in lines:
+            self.batch_lines_answered += 1
+            if line["custom_id"] in self.batch_fail_ids:
+                errors.append({"id": f"req-{line['custom_id']}", "custom_id": line["custom_id"], "response": None,
+                               "error": {"code": "server_error", "message": "fake failure"}})
+                continue
+            output.append({"id": f"req-{line['custom_id']}", "custom_id": line["custom_id"], "error": None,
+                           "response": {"status_code": 200, "request_id": "r", "body": self._completion(line["body"])}})
+        for records, key in ((output, "output_file_id"), (errors, "error_file_id")):
+            if records:
+                file_id = f"file-{len(self.files) + 1}"
+                self.files[file_id] = "\n".join(json.dumps(r) for r in records) + "\n"
+                batch[key] = file_id
+        batch["status"] = "expired" if self.batch_expire_after is not None else "completed"
+        batch["request_counts"].update(completed=len(output), failed=len(errors))
+
+    def fail_next(self, count, status=429, headers=None):
+        self.failures.extend([(status, headers or {"retry-after-ms": "50"})] * count)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_openai_server(monkeypatch):
+    """Running FakeOpenAIServer; OPENAI_BASE_URL / OPENAI_API_KEY point at it"""
+    server = FakeOpenAIServer()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    yield server
+    server.close()
@@ -0,0 +1,81 @@
+"""
+API startup tests - `import api.main` stays within its import-time budget:
+services are created on first use (api.services registry), so a cold start
+loads no service module and none of the heavy third-party packages.
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).parent.parent / "backend"
+
+from api.startup_profile import STARTUP_BUDGET_MS, parse_importtime, profile_startup
+
+# Infrastructure the app needs before serving anything
+STARTUP_SERVICE_MODULES = {"services.async_db", "services.connection_pool", "services.section_composer"}
+
+
+@pytest.fixture
+def env(tmp_path):
+    path = tmp_path / "startup.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE invoices (invoice_id INTEGER PRIMARY KEY)")
+    conn.close()
+    return {"DATABASE_PATH": str(path), "OPENAI_API_KEY": "test-key", "API_WARM_SERVICES": "0"}
+
+
+def test_parse_importtime():
+    records = parse_importtime(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     fastapi.params\n"
+        "import time:      2500 |       2620 |   api.main\n"
+    )
+    assert records == [
+        {"module": "fastapi.params", "self_ms": 0.12, "cumulative_ms": 0.12, "depth": 2},
+        {"module": "api.main", "self_ms": 2.5, "cumulative_ms": 2.62, "depth": 1},
+    ]
+
+
+def test_cold_start_within_budget(env):
+    profile = profile_startup("api.main", env=env)
+    assert profile["heavy_modules"] == []
+    assert set(profile["service_modules"]) <= STARTUP_SERVICE_MODULES
+    assert profile["import_ms"] <= STARTUP_BUDGET_MS, (
+        f"import api.main took {profile['import_ms']}ms (budget {STARTUP_BUDGET_MS:.0f}ms); "
+        f"slowest: {[(r['module'], r['cumulative_ms']) for r in profile['top_modules'][:8]]}"
+    )
+
+
+def test_services_are_created_on_first_use(env):
+    probe = """
+import json, sys
+from api.services import email_service, get_service, registry
+before = 'services.email_service' in sys.modules
+db_path = email_service.db_path
+print(json.dumps({
+    'before': before,
+    'after': 'services.email_service' in sys.modules,
+    'same': get_service('email_service') is get_service('email_service'),
+    'loaded': sorted(registry.loaded()),
+    'db_path': str(db_path),
+}))
+"""
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND, capture_output=True, text=True,
+                            env={**os.environ, **env})
+    assert result.returncode == 0, result.stderr[-2000:]
+    state = json.loads(result.stdout.strip().splitlines()[-1])
+    assert state == {"before": False, "after": True, "same": True, "loaded": ["email_service"],
+                     "db_path": env["DATABASE_PATH"]}
+
+
+def test_missing_database_fails_at_startup(env, tmp_path):
+    result = subprocess.run([sys.executable, "-c", "import api.services"], cwd=BACKEND, capture_output=True,
+                            text=True, env={**os.environ, **env, "DATABASE_PATH": str(tmp_path / "nope.db")})
+    assert result.returncode != 0 and "Cannot initialize services: Database not found" in result.stderr
+
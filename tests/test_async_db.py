@@ -0,0 +1,135 @@
+"""
+Async DB executor tests - blocking queries run off the event loop, deadlines
+interrupt running SQLite statements, and queue overflow is rejected.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from backend.services.async_db import DatabaseBusy, DatabaseExecutor, QueryTimeout, off_loop
+from backend.services.connection_pool import QueryScope, get_pool, use_scope
+
+# Recursive CTE that runs for minutes unless interrupted
+ENDLESS = """
+    WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n)
+    SELECT COUNT(*) FROM n
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "async.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.executemany("INSERT INTO items (name) VALUES (?)", [(f"item {i}",) for i in range(10)])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def executor():
+    executor = DatabaseExecutor(workers=2, max_queue=2, timeout=5)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+def endless(db_path):
+    conn = get_pool(db_path).acquire()
+    try:
+        return conn.execute(ENDLESS).fetchone()
+    finally:
+        conn.close()
+
+
+class TestDatabaseExecutor:
+    def test_fetch_helpers(self, executor, db_path):
+        async def go():
+            rows = await executor.fetch_all(db_path, "SELECT * FROM items WHERE id <= ?", (3,))
+            one = await executor.fetch_one(db_path, "SELECT name FROM items WHERE id = ?", (5,))
+            written = await executor.execute(db_path, "UPDATE items SET name = 'x' WHERE id > 8")
+            return rows, one, written
+
+        rows, one, written = asyncio.run(go())
+        assert [r['id'] for r in rows] == [1, 2, 3]
+        assert one == {'name': 'item 4'}
+        assert written == 2
+
+    def test_event_loop_keeps_serving_during_slow_query(self, executor, db_path):
+        async def go():
+            slow = asyncio.create_task(executor.run(endless, db_path, timeout=0.5))
+            ticks = 0
+            while not slow.done():
+                await asyncio.sleep(0.01)
+                ticks += 1
+            with pytest.raises(QueryTimeout):
+                await slow
+            return ticks
+
+        assert asyncio.run(go()) >= 20
+
+    def test_timeout_interrupts_the_running_statement(self, executor, db_path):
+        start = time.perf_counter()
+        with pytest.raises(QueryTimeout):
+            asyncio.run(executor.run(endless, db_path, timeout=0.2))
+
+        # The worker is freed promptly and the pooled connection still works
+        result = asyncio.run(executor.fetch_one(db_path, "SELECT COUNT(*) AS n FROM items"))
+        assert result == {'n': 10}
+        assert time.perf_counter() - start < 5
+        assert executor.stats()['timeouts'] == 1
+
+    def test_full_queue_is_rejected(self, executor, db_path):
+        async def go():
+            tasks = [asyncio.create_task(executor.run(endless, db_path, timeout=0.5)) for _ in range(4)]
+            await asyncio.sleep(0)
+            with pytest.raises(DatabaseBusy):
+                await executor.run(endless, db_path)
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = asyncio.run(go())
+        assert all(isinstance(r, QueryTimeout) for r in results)
+        assert executor.stats()['rejected'] == 1
+
+    def test_off_loop_keeps_signature(self):
+        @off_loop(timeout=1)
+        def endpoint(project_code: str, limit: int = 10):
+            return threading.current_thread().name, project_code, limit
+
+        import inspect
+        assert list(inspect.signature(endpoint).parameters) == ['project_code', 'limit']
+        assert asyncio.iscoroutinefunction(endpoint)
+
+        thread, code, limit = asyncio.run(endpoint("25 BK-001", limit=5))
+        assert thread.startswith('db') and (code, limit) == ("25 BK-001", 5)
+
+    def test_llm_endpoints_stay_off_the_executor(self):
+        # A batch of LLM calls would outlive the deadline and pin an executor slot
+        from api.routers import suggestions
+
+        for endpoint in (suggestions.generate_context_aware_suggestions,
+                         suggestions.approve_suggestion,
+                         suggestions.reject_with_correction):
+            assert not asyncio.iscoroutinefunction(endpoint)
+
+
+class TestQueryScope:
+    def test_cancelled_scope_aborts_later_statements(self, db_path):
+        scope = QueryScope()
+        with use_scope(scope):
+            conn = get_pool(db_path).acquire()
+            scope.cancel()
+            with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+                conn.execute(ENDLESS).fetchone()
+            conn.close()
+            with pytest.raises(sqlite3.OperationalError, match="interrupted"):
+                get_pool(db_path).acquire()
+
+        # Released connections lose the handler
+        conn = get_pool(db_path).acquire()
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone() == (10,)
+        conn.close()
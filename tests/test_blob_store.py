@@ -0,0 +1,157 @@
+"""
+Blob store tests - dedup of existing files, read-through by recorded path,
+reference counting and garbage collection.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from backend.services.blob_store import BlobStore, hash_file
+from backend.services.file_service import FileService
+
+MIGRATIONS = Path(__file__).parent.parent / "database" / "migrations"
+
+
+@pytest.fixture
+def store_env(tmp_path):
+    db_path = tmp_path / "blobs.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE attachments (attachment_id INTEGER PRIMARY KEY, email_id INTEGER, filename TEXT,
+            stored_path TEXT, mime_type TEXT);
+        CREATE TABLE project_files (file_id INTEGER PRIMARY KEY, proposal_id INTEGER, filename TEXT,
+            file_type TEXT, file_path TEXT);
+    """)
+    conn.executescript((MIGRATIONS / "109_blob_store.sql").read_text())
+
+    files = tmp_path / "files"
+    contract = os.urandom(50000)
+    for i in range(3):
+        path = files / "attachments" / "2025-12" / f"Contract_{i}.pdf"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(contract)
+        conn.execute("INSERT INTO attachments (attachment_id, filename, stored_path) VALUES (?, ?, ?)",
+                     (i + 1, path.name, str(path)))
+    drawing = files / "projects" / "plan.dwg"
+    drawing.parent.mkdir(parents=True)
+    drawing.write_bytes(b"DWG" * 1000)
+    conn.execute("INSERT INTO project_files (file_id, proposal_id, filename, file_type, file_path) "
+                 "VALUES (1, 1, 'plan.dwg', 'drawing', ?)", (str(drawing),))
+    (files / "notes.md").write_text("not tracked")
+    conn.commit()
+    conn.close()
+
+    store = BlobStore(str(db_path), root=str(files / "blobs"))
+    return store, files, contract
+
+
+def query(store, sql):
+    conn = sqlite3.connect(store.db_path)
+    rows = conn.execute(sql).fetchall()
+    conn.close()
+    return rows
+
+
+class TestBlobStore:
+    def test_ingest_collapses_duplicates_and_paths_still_resolve(self, store_env):
+        store, files, contract = store_env
+
+        dry = store.ingest_existing(files, dry_run=True)
+        assert (dry['files'], dry['duplicates']) == (4, 2)
+        assert (files / "attachments" / "2025-12" / "Contract_0.pdf").exists()
+
+        result = store.ingest_existing(files)
+        assert result['refs'] == 4 and result['errors'] == 0
+
+        # Originals are gone, untracked files untouched, content stored once
+        assert not any((files / "attachments").rglob("*.pdf"))
+        assert (files / "notes.md").exists()
+        blobs = [p for p in (files / "blobs").rglob("*") if p.is_file()]
+        assert len(blobs) == 2
+
+        recorded = str(files / "attachments" / "2025-12" / "Contract_2.pdf")
+        assert store.resolve(recorded).read_bytes() == contract
+        assert store.blob_info('attachments', 3)['ref_count'] == 3
+
+        stats = store.stats()
+        assert stats['saved_bytes'] == 2 * len(contract)
+
+        # Re-running finds nothing left to do
+        assert store.ingest_existing(files)['files'] == 0
+
+    def test_put_file_moves_spool_and_dedupes(self, store_env, tmp_path):
+        store, files, contract = store_env
+        spool = tmp_path / "spool.part"
+        spool.write_bytes(contract)
+        sha256, _ = hash_file(spool)
+
+        conn = sqlite3.connect(store.db_path)
+        _, first = store.put_file(conn, spool, sha256=sha256, move=True)
+        spool.write_bytes(contract)
+        _, second = store.put_file(conn, spool, sha256=sha256, move=True)
+        conn.commit()
+        conn.close()
+
+        assert first == second == store.blob_path(sha256)
+        assert not spool.exists()
+
+    def test_file_service_reads_through_and_gc_collects_released_blobs(self, store_env):
+        store, files, _ = store_env
+        store.ingest_existing(files)
+
+        service = FileService(str(store.db_path))
+        service._blob_store = store
+        content = service.get_file_content(1)
+        assert Path(content['path']).read_bytes() == b"DWG" * 1000
+        assert content['filename'] == 'plan.dwg'
+
+        named = store.materialize(content['sha256'], 'plan.dwg')
+        assert named.name == 'plan.dwg' and named.read_bytes() == b"DWG" * 1000
+
+        conn = sqlite3.connect(store.db_path)
+        conn.execute("DELETE FROM project_files WHERE file_id = 1")
+        conn.commit()
+        conn.close()
+
+        # Still inside the grace period
+        result = store.gc()
+        assert (result['dangling_refs'], result['blobs_deleted']) == (1, 0)
+        assert store.gc(grace_hours=0)['blobs_deleted'] == 1
+        assert not Path(content['path']).exists()
+        assert not named.exists()
+
+        # The shared contract blob is still referenced
+        assert query(store, "SELECT ref_count FROM blobs") == [(3,)]
+
+    def test_content_outside_the_serve_roots_is_never_served(self, store_env, tmp_path):
+        store, files, _ = store_env
+        secret = tmp_path / "secret.env"
+        secret.write_text("API_KEY=hunter2")
+        conn = sqlite3.connect(store.db_path)
+        conn.execute("INSERT INTO project_files (file_id, proposal_id, filename, file_path) "
+                     "VALUES (2, 1, 'secret.env', ?)", (str(secret),))
+        conn.execute("INSERT INTO project_files (file_id, proposal_id, filename, file_path) "
+                     "VALUES (3, 1, 'escape', ?)", (str(files / "projects" / ".." / ".." / "secret.env"),))
+        conn.commit()
+        conn.close()
+
+        service = FileService(str(store.db_path))
+        service._blob_store = BlobStore(str(store.db_path), root=str(store.root),
+                                        serve_roots=[str(files)])
+        assert service.get_file_content(2) is None
+        assert service.get_file_content(3) is None
+
+        # Not yet ingested, but recorded under a serve root
+        content = service.get_file_content(1)
+        assert Path(content['path']).read_bytes() == b"DWG" * 1000
+
+        # Only the store itself when no serve roots are configured
+        service._blob_store = store
+        store.serve_roots = [store.root.resolve()]
+        assert service.get_file_content(1) is None
+        store.ingest_existing(files)
+        assert service.get_file_content(1)['sha256']
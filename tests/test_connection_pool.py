@@ -0,0 +1,146 @@
+"""
+Connection pool tests - pooled readers, serialized writer, BaseService integration.
+Run against the temporary database from conftest.
+"""
+
+import sqlite3
+import threading
+
+from services.connection_pool import ConnectionPool
+from services.base_service import BaseService
+
+
+class TestConnectionPool:
+    """Test reader/writer checkout behaviour."""
+
+    def test_reader_connection_is_reused_per_thread(self, temp_database):
+        pool = ConnectionPool(temp_database)
+
+        with pool.reader() as first:
+            pass
+        with pool.reader() as second:
+            pass
+
+        assert first is second
+        stats = pool.stats()
+        assert stats["connections_opened"] == 1
+        assert stats["thread_reuse_hits"] == 1
+        assert stats["in_use"] == 0
+        pool.close_all()
+
+    def test_nested_readers_get_distinct_connections(self, temp_database):
+        pool = ConnectionPool(temp_database)
+
+        with pool.reader() as outer:
+            with pool.reader() as inner:
+                assert outer is not inner
+
+        pool.close_all()
+
+    def test_wal_mode_enabled(self, temp_database):
+        pool = ConnectionPool(temp_database)
+
+        with pool.reader() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+
+        assert mode.lower() == "wal"
+        pool.close_all()
+
+    def test_close_returns_connection_to_pool(self, temp_database):
+        pool = ConnectionPool(temp_database)
+
+        conn = pool.acquire()
+        conn.execute("SELECT 1")
+        conn.close()
+        conn.close()  # double close must not double-release
+
+        again = pool.acquire()
+        assert again is conn
+        assert again.row_factory is None
+        again.close()
+        pool.close_all()
+
+    def test_uncommitted_work_rolled_back_on_release(self, temp_database):
+        pool = ConnectionPool(temp_database)
+
+        conn = pool.acquire()
+        conn.execute("INSERT INTO projects (project_code) VALUES ('25 BK-001')")
+        conn.close()
+
+        with pool.reader() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        assert count == 0
+        pool.close_all()
+
+    def test_writer_commits_and_rolls_back(self, temp_database):
+        pool = ConnectionPool(temp_database)
+
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO projects (project_code) VALUES ('25 BK-001')")
+
+        try:
+            with pool.writer() as conn:
+                conn.execute("INSERT INTO projects (project_code) VALUES ('25 BK-002')")
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        with pool.reader() as conn:
+            codes = [r["project_code"] for r in conn.execute("SELECT project_code FROM projects")]
+        assert codes == ["25 BK-001"]
+        assert pool.stats()["writer_checkouts"] == 2
+        pool.close_all()
+
+    def test_concurrent_writers_are_serialized(self, temp_database):
+        pool = ConnectionPool(temp_database)
+
+        def insert_many(prefix):
+            for i in range(25):
+                with pool.writer() as conn:
+                    conn.execute(
+                        "INSERT INTO emails (subject) VALUES (?)", (f"{prefix}-{i}",)
+                    )
+
+        threads = [threading.Thread(target=insert_many, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with pool.reader() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM emails").fetchone()[0] == 100
+        assert pool.stats()["writer_checkouts"] == 100
+        pool.close_all()
+
+    def test_health_check(self, temp_database):
+        pool = ConnectionPool(temp_database)
+        health = pool.health_check()
+        assert health["healthy"] is True
+        assert health["errors"] == []
+        pool.close_all()
+
+
+class TestBaseServicePooling:
+    """BaseService draws its connections from the shared pool."""
+
+    def test_execute_update_and_last_insert_id(self, temp_database):
+        service = BaseService(temp_database)
+
+        rows = service.execute_update(
+            "INSERT INTO projects (project_code, status) VALUES (?, ?)", ("25 BK-010", "Active")
+        )
+        assert rows == 1
+        assert service.get_last_insert_id() > 0
+
+        project = service.execute_query(
+            "SELECT * FROM projects WHERE project_code = ?", ("25 BK-010",), fetch_one=True
+        )
+        assert project["status"] == "Active"
+
+    def test_services_share_one_pool(self, temp_database):
+        assert BaseService(temp_database)._pool is BaseService(temp_database)._pool
+
+    def test_get_connection_yields_row_factory(self, temp_database):
+        service = BaseService(temp_database)
+        with service.get_connection() as conn:
+            assert conn.row_factory is sqlite3.Row
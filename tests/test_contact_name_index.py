@@ -0,0 +1,138 @@
+"""
+Contact name index tests - spoken names find contacts by sound and spelling
+(wherever they are in the table), lookups stay sub-millisecond, and the
+persisted index follows contact inserts, renames and deletes by re-indexing
+only the contacts the triggers queued.
+"""
+
+import random
+import sqlite3
+import string
+import time
+
+import pytest
+
+from services.contact_name_index import ContactNameIndex, phonetic_codes
+from services.signature_parser_service import SignatureParserService
+from services.transcript_linker_service import TranscriptLinker
+
+NAMED = [
+    ("Caragh Whitfield", "caragh@villas.com", "Villas Co"),
+    ("Stephen Lim", "stephen.lim@client.sg", "Client SG"),
+    ("Thomas Müller", "t.muller@studio.de", None),
+    ("Caragh Whitfield", "caragh.w@gmail.com", None),
+    ("Nattapong Srisuk", "nattapong@bensley.com", "Bensley"),
+]
+
+
+@pytest.fixture
+def db_path(migrated_db):
+    def seed(conn):
+        # 300 other contacts first: the named ones are far past the old cap of 100
+        rng = random.Random(7)
+        conn.executemany("INSERT INTO contacts (email, name) VALUES (?, ?)", [
+            (f"person{i}@example.com",
+             ''.join(rng.choices(string.ascii_lowercase, k=6)).title() + ' ' +
+             ''.join(rng.choices(string.ascii_lowercase, k=8)).title())
+            for i in range(300)
+        ])
+        conn.executemany("INSERT INTO contacts (name, email, company) VALUES (?, ?, ?)", NAMED)
+
+    return migrated_db("""
+        CREATE TABLE emails (email_id INTEGER PRIMARY KEY, sender_address TEXT);
+        CREATE TABLE contacts (
+            contact_id INTEGER PRIMARY KEY AUTOINCREMENT, email TEXT UNIQUE NOT NULL, name TEXT,
+            company TEXT, role TEXT, email_count INTEGER DEFAULT 0
+        );
+    """, ["112_query_cache_data_versions.sql", "121_contact_name_index.sql"], seed=seed)
+
+
+def write(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql, params)
+    conn.commit()
+    conn.close()
+
+
+def queue_size(db_path):
+    conn = sqlite3.connect(db_path)
+    size = conn.execute("SELECT COUNT(*) FROM contact_name_index_queue").fetchone()[0]
+    conn.close()
+    return size
+
+
+def test_phonetic_codes_join_spelling_variants():
+    assert phonetic_codes("caragh")[0] == phonetic_codes("kara")[0] == "KR"
+    assert phonetic_codes("stephen")[0] == phonetic_codes("steven")[0]
+    assert phonetic_codes("philip")[0] == phonetic_codes("filip")[0]
+    assert "TMS" in phonetic_codes("thomas") and "TMS" in phonetic_codes("tomas")
+
+
+def test_spoken_names_find_contacts_past_the_first_hundred(db_path):
+    index = ContactNameIndex(db_path)
+    kara = index.candidates("Kara", k=3)
+    assert kara[0]["name"] == "Caragh Whitfield" and kara[0]["contact_id"] > 300
+    assert index.best_match("Steven Lim")["email"] == "stephen.lim@client.sg"
+    assert index.best_match("tomas muller")["name"] == "Thomas Müller"
+    assert index.best_match("Bartholomew Quince") is None
+    assert index.candidates("") == []
+    assert queue_size(db_path) == 0
+
+
+def test_index_follows_contact_changes(db_path):
+    index = ContactNameIndex(db_path)
+    index.candidates("Kara")
+    reindexed = index.stats()["reindexed"]
+    assert reindexed == 305
+
+    write(db_path, "UPDATE contacts SET name = 'Stefan Lim' WHERE email = 'stephen.lim@client.sg'")
+    write(db_path, "INSERT INTO contacts (name, email) VALUES ('Phillipa Grant', 'pg@client.com')")
+    write(db_path, "DELETE FROM contacts WHERE email = 't.muller@studio.de'")
+    # Counter-only updates do not queue anything
+    write(db_path, "UPDATE contacts SET email_count = email_count + 1")
+
+    assert index.best_match("Filippa Grant")["email"] == "pg@client.com"
+    assert index.best_match("Stefan Lim")["name"] == "Stefan Lim"
+    assert index.best_match("Thomas Muller") is None
+    assert index.stats()["reindexed"] == reindexed + 3 and queue_size(db_path) == 0
+
+    # The persisted index loads as is: nothing to re-index
+    reloaded = ContactNameIndex(db_path)
+    assert reloaded.best_match("Filippa Grant")["email"] == "pg@client.com"
+    assert reloaded.stats()["reindexed"] == 0 and reloaded.stats()["persistent"]
+
+
+def test_lookup_is_sub_millisecond(db_path):
+    index = ContactNameIndex(db_path)
+    names = ["Kara", "Steven Lim", "Natapong", "Tomas", "Grant"] * 200
+    index.candidates("warm up")
+    started = time.perf_counter()
+    for name in names:
+        index.candidates(name, k=5)
+    assert (time.perf_counter() - started) / len(names) < 0.001
+
+
+def test_duplicates_and_signature_namesakes(db_path):
+    index = ContactNameIndex(db_path)
+    groups = index.duplicate_groups()
+    assert [[c["email"] for c in group] for group in groups] == [["caragh@villas.com", "caragh.w@gmail.com"]]
+
+    first = groups[0][0]["contact_id"]
+    namesakes = SignatureParserService(db_path).find_same_name_contacts(first, "Caragh Whitfield")
+    assert [c["email"] for c in namesakes] == ["caragh.w@gmail.com"]
+    assert SignatureParserService(db_path).find_same_name_contacts(first, "Caragh") == []
+
+
+def test_transcript_participants_link_to_their_proposals(db_path):
+    write(db_path, "INSERT INTO emails (email_id, sender_address) VALUES (1, 'caragh@villas.com')")
+    write(db_path, "INSERT INTO email_proposal_links VALUES (1, 42)")
+    proposals = {
+        "25 BK-042": {"proposal_id": 42, "project_code": "25 BK-042", "project_name": "Ubud Villas"},
+        "25 BK-043": {"proposal_id": 43, "project_code": "25 BK-043", "project_name": "Hanoi Hotel"},
+    }
+    transcript = {"transcript": "Site walk and fee discussion.", "summary": None, "meeting_title": None,
+                  "participants": '[{"name": "Kara", "type": "client"}, {"name": "Bill"}]'}
+
+    match = TranscriptLinker(db_path, use_ai=False).match_by_name(transcript, proposals)
+    assert match["proposal"]["proposal_id"] == 42
+    assert match["match_reason"] == "Participant match: Caragh Whitfield"
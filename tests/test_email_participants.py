@@ -0,0 +1,188 @@
+"""
+Email participant index tests - raw From/To headers are normalized into
+emails.sender_address/sender_domain and email_participants (migration 117)
+at import time and by the backfill, and per-contact lookups match exact
+addresses through the index instead of LIKE substrings.
+"""
+
+import sqlite3
+
+import pytest
+
+from core.sync_master import MasterSync
+from services.email_participants import (
+    backfill_email_participants,
+    index_email_participants,
+    index_emails_after,
+    max_email_id,
+    parse_addresses,
+    participant_condition,
+)
+from services.pattern_first_linker import PatternFirstLinker
+from services.signature_parser_service import SignatureParserService
+
+SIGNATURE = "Thanks,\n\nJo Smith\nProject Director\nMarina Group\nTel: +66 2 123 4567\n"
+
+
+@pytest.fixture
+def db_path(migrated_db):
+    def seed(conn):
+        conn.executemany(
+            "INSERT INTO emails (email_id, sender_email, recipient_emails, subject, body_full, date) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (1, "Jo Smith <Jo@Marina.com>", "team@bensley.com", "Drawings", SIGNATURE, "2025-01-02"),
+                (2, "jo@marina.com", '"Sherman, Bill" <bill@bensley.com>, Ann <ann@marina.com>',
+                 "Re: Drawings", SIGNATURE, "2025-01-03"),
+                (3, "bjo@marina.com", "jo@marina.com", "Unrelated", SIGNATURE, "2025-01-04"),
+                (4, '"Smith, Jo" <jo@marina.com>', '["lukas@bensley.com", "JO@marina.com"]',
+                 "Fees", SIGNATURE, "2025-01-05"),
+                (5, "Mail Delivery Subsystem", None, "Undeliverable", "", "2025-01-06"),
+            ],
+        )
+
+    return migrated_db("""
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, message_id TEXT, sender_email TEXT, sender_name TEXT,
+            recipient_emails TEXT, subject TEXT, body_full TEXT, date TEXT
+        );
+        CREATE TABLE contacts (contact_id INTEGER PRIMARY KEY, name TEXT, email TEXT,
+                               company TEXT, role TEXT, phone TEXT);
+        CREATE TABLE email_project_links (email_id INTEGER, project_id INTEGER);
+    """, ["117_email_participants.sql"], seed=seed)
+
+
+def participants(db_path, email_id):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        "SELECT role, address, domain FROM email_participants WHERE email_id = ? ORDER BY role, address",
+        (email_id,)
+    ).fetchall()
+    conn.close()
+    return rows
+
+
+def test_parse_addresses():
+    assert parse_addresses('"Sherman, Bill" <Bill@Bensley.com>, ann@marina.com') == \
+        ["bill@bensley.com", "ann@marina.com"]
+    assert parse_addresses('["a@x.com", "A@X.com", "b@y.com"]') == ["a@x.com", "b@y.com"]
+    assert parse_addresses("<mailto:jo@marina.com>") == ["jo@marina.com"]
+    assert parse_addresses("Mail Delivery Subsystem") == []
+    assert parse_addresses(None) == []
+
+
+def test_migration_backfills_plain_senders(db_path):
+    conn = sqlite3.connect(db_path)
+    senders = dict(conn.execute("SELECT email_id, sender_address FROM emails").fetchall())
+    conn.close()
+    assert senders == {1: "jo@marina.com", 2: "jo@marina.com", 3: "bjo@marina.com",
+                       4: "jo@marina.com", 5: None}
+    # Recipients are left to the backfill
+    assert participants(db_path, 2) == [("from", "jo@marina.com", "marina.com")]
+
+
+def test_backfill_indexes_senders_and_recipients(db_path):
+    conn = sqlite3.connect(db_path)
+    result = backfill_email_participants(conn, batch_size=2)
+    again = backfill_email_participants(conn)
+    sender = conn.execute("SELECT sender_address, sender_domain FROM emails WHERE email_id = 4").fetchone()
+    conn.close()
+
+    assert result["emails"] == 5 and result["last_email_id"] == 5
+    assert again["participants"] == result["participants"]  # idempotent
+    assert sender == ("jo@marina.com", "marina.com")
+    assert participants(db_path, 2) == [
+        ("from", "jo@marina.com", "marina.com"),
+        ("to", "ann@marina.com", "marina.com"),
+        ("to", "bill@bensley.com", "bensley.com"),
+    ]
+    assert participants(db_path, 4)[1:] == [("to", "jo@marina.com", "marina.com"),
+                                            ("to", "lukas@bensley.com", "bensley.com")]
+    assert participants(db_path, 5) == []
+
+
+def test_import_indexes_new_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    last_id = max_email_id(conn)
+    conn.execute("INSERT INTO emails (email_id, sender_email, recipient_emails) "
+                 "VALUES (6, 'New <new@client.com>', 'jo@marina.com')")
+    assert index_emails_after(conn, last_id) == 1
+    conn.execute("UPDATE emails SET recipient_emails = 'ann@marina.com' WHERE email_id = 6")
+    index_email_participants(conn, [6])
+    conn.commit()
+    conn.close()
+    assert participants(db_path, 6) == [("from", "new@client.com", "client.com"),
+                                        ("to", "ann@marina.com", "marina.com")]
+
+
+def test_master_sync_indexes_the_emails_it_copies(migrated_db, tmp_path):
+    master = migrated_db("""
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, message_id TEXT UNIQUE, thread_id TEXT, date TEXT,
+            sender_email TEXT, sender_name TEXT, recipient_emails TEXT, subject TEXT, snippet TEXT,
+            has_attachments INTEGER, processed INTEGER, source_ref TEXT
+        );
+        INSERT INTO emails (email_id, message_id, sender_email) VALUES (1, '<old@x>', 'old@x.com');
+    """, ["117_email_participants.sql"], name="bensley_master.db")
+    staging = sqlite3.connect(tmp_path / "emails.db")
+    staging.executescript("""
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, message_id TEXT, thread_id TEXT, date_sent TEXT,
+            sender_email TEXT, sender_name TEXT, subject TEXT, body_text TEXT,
+            has_attachments INTEGER, is_processed INTEGER
+        );
+        INSERT INTO emails VALUES (1, '<old@x>', NULL, '2025-01-01', 'old@x.com', NULL, 'Old', '', 0, 0),
+                                  (2, '<new@x>', NULL, '2025-01-02', 'Jo@Marina.com', 'Jo', 'New', '', 0, 0);
+    """)
+    staging.close()
+
+    sync = MasterSync(str(tmp_path))
+    sync.connect()
+    sync.sync_emails()
+    sync.conn.commit()
+    sync.conn.close()
+
+    assert sync.stats["emails_synced"] == 1
+    assert participants(master, 2) == [("from", "jo@marina.com", "marina.com")]
+
+
+def test_participant_condition(db_path):
+    conn = sqlite3.connect(db_path)
+    backfill_email_participants(conn)
+
+    def matching(term, role=None):
+        sql, params = participant_condition(term, "email_id", role)
+        return [r[0] for r in conn.execute(f"SELECT email_id FROM emails WHERE {sql} ORDER BY email_id", params)]
+
+    assert matching(" JO@marina.com ") == [1, 2, 3, 4]  # sender or recipient, never bjo@
+    assert matching("jo@marina.com", role="from") == [1, 2, 4]
+    assert matching("@bensley.com") == [1, 2, 4]
+    assert participant_condition("Jo Smith") is None
+    assert participant_condition("jo@") is None
+    plan = " ".join(r[-1] for r in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT email_id FROM email_participants WHERE address = ?", ("x",)))
+    conn.close()
+    assert "idx_email_participants_address" in plan
+
+
+def test_signature_enrichment_matches_exact_sender(db_path):
+    conn = sqlite3.connect(db_path)
+    backfill_email_participants(conn)
+    conn.execute("INSERT INTO contacts VALUES (1, 'Jo Smith', 'Jo@marina.com', NULL, NULL, NULL)")
+    conn.commit()
+    conn.close()
+
+    result = SignatureParserService(db_path).enrich_contact_from_emails(
+        1, "Jo Smith <JO@marina.com>", create_suggestions=False)
+    assert result["emails_checked"] == 3  # emails 1, 2 and 4 - not bjo@marina.com
+
+
+def test_linker_uses_stored_sender(db_path):
+    conn = sqlite3.connect(db_path)
+    backfill_email_participants(conn)
+    conn.close()
+
+    linker = PatternFirstLinker(db_path)
+    [email] = linker.execute_query(f"SELECT email_id, sender_email{linker._sender_columns} FROM emails WHERE email_id = 4")
+    assert linker._sender(email) == ("jo@marina.com", "marina.com")
+    assert linker._sender({"sender_email": "Ann <ann@marina.com>"}) == ("ann@marina.com", "marina.com")
@@ -0,0 +1,195 @@
+"""
+Email sync scheduler tests - parallel accounts against the in-memory IMAP
+stand-in, single batched writer, run metrics in email_sync_runs.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from backend.services.email_sync_scheduler import EmailSyncScheduler
+
+MIGRATIONS = Path(__file__).parent.parent / "database" / "migrations"
+
+
+def build_row(parsed, uid, message_id, account_email, folder):
+    return {
+        "message_id": message_id,
+        "subject": parsed.headers["Subject"],
+        "folder": f"{account_email}:{folder}",
+    }
+
+
+class FolderRouter:
+    """One logical IMAP connection over several per-folder stand-ins"""
+
+    def __init__(self, folders):
+        self.folders = folders
+        self.current = None
+
+    def select(self, mailbox, readonly=False):
+        self.current = self.folders[mailbox.strip('"')]
+        return self.current.select(mailbox, readonly)
+
+    def __getattr__(self, name):
+        return getattr(self.current, name)
+
+    def logout(self):
+        return 'BYE', []
+
+
+@pytest.fixture
+def sync_db(tmp_path):
+    db_path = tmp_path / "sync.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE emails (email_id INTEGER PRIMARY KEY, message_id TEXT UNIQUE,
+                             subject TEXT, folder TEXT);
+    """)
+    for name in ("106_email_sync_state.sql", "107_email_sync_runs.sql"):
+        conn.executescript((MIGRATIONS / name).read_text())
+    conn.close()
+    return str(db_path)
+
+
+def query(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(r) for r in conn.execute(sql)]
+    conn.close()
+    return rows
+
+
+class TestEmailSyncScheduler:
+    def test_syncs_all_accounts_and_records_metrics(self, sync_db, fake_imap, make_imap_message):
+        servers = {
+            "a@bensley.com": {"INBOX": fake_imap({1: make_imap_message(1), 2: make_imap_message(2)}),
+                              "Sent": fake_imap({5: make_imap_message(3)})},
+            # Same message delivered to a second mailbox - stored once
+            "b@bensley.com": {"INBOX": fake_imap({7: make_imap_message(2), 8: make_imap_message(4)})},
+        }
+        accounts = [
+            {"email": "a@bensley.com", "password": "x", "folders": ["INBOX", "Sent"]},
+            {"email": "b@bensley.com", "password": "y", "folders": ["INBOX"]},
+        ]
+        opened = []
+
+        def connect(account):
+            # Each task gets its own connection
+            opened.append(account["email"])
+            return FolderRouter(servers[account["email"]])
+
+        summary = EmailSyncScheduler(sync_db, build_row, connect, max_workers=3).run(accounts)
+
+        assert sorted(opened) == ["a@bensley.com", "a@bensley.com", "b@bensley.com"]
+        # The shared message is either skipped by Message-ID at plan time or
+        # ignored on insert, depending on which mailbox gets there first
+        assert summary["totals"]["new_uids"] == 5
+        assert summary["totals"]["imported"] == 4
+        assert summary["totals"]["skipped"] == 1
+        assert query(sync_db, "SELECT COUNT(*) AS n FROM emails")[0]["n"] == 4
+
+        runs = {r["account_email"]: r for r in query(sync_db, "SELECT * FROM email_sync_runs")}
+        assert runs["a@bensley.com"]["status"] == "completed"
+        assert runs["a@bensley.com"]["folders_done"] == 2
+        assert runs["a@bensley.com"]["new_uids"] == 3
+        assert runs["a@bensley.com"]["bytes_fetched"] > 0
+        assert runs["b@bensley.com"]["finished_at"] is not None
+
+        state = query(sync_db, "SELECT account_email, folder, last_uid FROM email_sync_state ORDER BY 1, 2")
+        assert [(s["account_email"], s["folder"], s["last_uid"]) for s in state] == [
+            ("a@bensley.com", "INBOX", 2), ("a@bensley.com", "Sent", 5), ("b@bensley.com", "INBOX", 8),
+        ]
+
+        # Second run: nothing new, nothing downloaded
+        summary = EmailSyncScheduler(sync_db, build_row, connect).run(accounts)
+        assert summary["totals"]["messages_fetched"] == 0
+
+    def test_slow_and_failing_accounts_do_not_block_others(self, sync_db, fake_imap, make_imap_message):
+        release = threading.Event()
+
+        class SlowImap(FolderRouter):
+            def select(self, mailbox, readonly=False):
+                release.wait(5)
+                return super().select(mailbox, readonly)
+
+        def connect(account):
+            if account["email"] == "down@bensley.com":
+                raise ConnectionError("login failed")
+            if account["email"] == "slow@bensley.com":
+                return SlowImap({"INBOX": fake_imap({1: make_imap_message(10)})})
+            return FolderRouter({"INBOX": fake_imap({1: make_imap_message(20)})})
+
+        accounts = [{"email": e, "password": "x", "folders": ["INBOX"]}
+                    for e in ("slow@bensley.com", "fast@bensley.com", "down@bensley.com")]
+
+        scheduler = EmailSyncScheduler(sync_db, build_row, connect, max_workers=3)
+        result = {}
+        runner = threading.Thread(target=lambda: result.update(scheduler.run(accounts)))
+        runner.start()
+
+        # The fast account lands while the slow one is still stuck
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if query(sync_db, "SELECT COUNT(*) AS n FROM emails WHERE folder LIKE 'fast%'")[0]["n"]:
+                break
+            time.sleep(0.05)
+        else:
+            pytest.fail("fast account was blocked by the slow one")
+
+        release.set()
+        runner.join(10)
+
+        runs = {r["account_email"]: r for r in query(sync_db, "SELECT * FROM email_sync_runs")}
+        assert runs["down@bensley.com"]["status"] == "failed"
+        assert "login failed" in runs["down@bensley.com"]["error_message"]
+        assert runs["slow@bensley.com"]["status"] == "completed"
+        assert result["totals"]["imported"] == 2
+
+
+    def test_failed_parse_or_insert_keeps_the_mark_below_it(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2, 3)})
+        accounts = [{"email": "a@bensley.com", "password": "x", "folders": ["INBOX"]}]
+
+        def connect(account):
+            return FolderRouter({"INBOX": imap})
+
+        def failing_parse(parsed, uid, message_id, account_email, folder):
+            if uid == 2:
+                raise ValueError("bad MIME")
+            return build_row(parsed, uid, message_id, account_email, folder)
+
+        summary = EmailSyncScheduler(sync_db, failing_parse, connect).run(accounts)
+        assert summary["totals"]["errors"] == 1
+        assert query(sync_db, "SELECT last_uid FROM email_sync_state")[0]["last_uid"] == 1
+
+        # The insert itself fails (no such column): nothing stored, mark unchanged
+        def broken_row(parsed, uid, message_id, account_email, folder):
+            return {**build_row(parsed, uid, message_id, account_email, folder), "nope": 1}
+
+        summary = EmailSyncScheduler(sync_db, broken_row, connect).run(accounts)
+        assert summary["totals"]["errors"] == 1
+        assert query(sync_db, "SELECT last_uid FROM email_sync_state")[0]["last_uid"] == 1
+
+        summary = EmailSyncScheduler(sync_db, build_row, connect).run(accounts)
+        assert summary["totals"]["messages_fetched"] == 1   # UID 3 is skipped by Message-ID
+        assert query(sync_db, "SELECT last_uid FROM email_sync_state")[0]["last_uid"] == 3
+        assert query(sync_db, "SELECT COUNT(*) AS n FROM emails")[0]["n"] == 3
+
+    def test_bodies_are_streamed_in_windows(self, sync_db, fake_imap, make_imap_message):
+        big = make_imap_message(1) + b"x" * 5000 + b"\r\n"
+        imap = fake_imap({1: big, 2: make_imap_message(2)})
+        accounts = [{"email": "a@bensley.com", "password": "x", "folders": ["INBOX"]}]
+
+        summary = EmailSyncScheduler(sync_db, build_row, lambda account: FolderRouter({"INBOX": imap}),
+                                     chunk_size=1024).run(accounts)
+
+        windows = [c for c in imap.commands if c[0] == "FETCH" and c[1] == "1" and "BODY.PEEK[]<" in c[2]]
+        assert len(windows) == len(big) // 1024 + 1
+        assert not [c for c in imap.commands if c[0] == "FETCH" and c[2] == "(BODY.PEEK[])"]
+        assert summary["totals"]["bytes_fetched"] == len(big) + len(make_imap_message(2))
+        assert query(sync_db, "SELECT subject FROM emails ORDER BY email_id")[0]["subject"] == "Message 1"
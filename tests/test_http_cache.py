@@ -0,0 +1,157 @@
+"""
+HTTP cache tests - polled read endpoints answer 304 (or a cached body)
+without running while the data_versions stamp of their tables is unchanged,
+refetch as soon as a table they read changes, and report hit ratios per
+route.
+"""
+
+import sqlite3
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.http_cache import CachedRoute, HTTPCache
+from services.data_version_service import get_data_version_service
+
+
+@pytest.fixture
+def db_path(migrated_db):
+    return migrated_db("""
+        CREATE TABLE proposals (proposal_id INTEGER PRIMARY KEY, project_code TEXT, status TEXT);
+        CREATE TABLE ai_suggestions (suggestion_id INTEGER PRIMARY KEY, status TEXT, confidence_score REAL);
+        CREATE TABLE tasks (task_id INTEGER PRIMARY KEY, title TEXT);
+        CREATE TABLE untracked (id INTEGER PRIMARY KEY);
+        INSERT INTO proposals (project_code, status) VALUES ('25 BK-001', 'active');
+    """, ["112_query_cache_data_versions.sql", "119_keyset_pagination.sql", "120_http_etag_data_versions.sql"])
+
+
+@pytest.fixture
+def app(db_path):
+    calls = {"proposals": 0, "tasks": 0, "untracked": 0}
+    cache = HTTPCache(db_path, routes={
+        "/proposals": CachedRoute(["proposals"]),
+        "/tasks": CachedRoute(["tasks", "meetings"]),
+        "/untracked": CachedRoute(["untracked"]),
+        "/secure": CachedRoute(["proposals"], auth=True),
+    })
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def conditional_get(request, call_next):
+        return await cache.handle(request, call_next)
+
+    def count(table):
+        calls[table] += 1
+        conn = sqlite3.connect(db_path)
+        total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        conn.close()
+        return {"table": table, "total": total}
+
+    @app.get("/proposals")
+    def proposals(status: str = "active"):
+        return count("proposals")
+
+    @app.get("/tasks")
+    def tasks():
+        return count("tasks")
+
+    @app.get("/untracked")
+    def untracked():
+        return count("untracked")
+
+    @app.get("/secure")
+    def secure():
+        return {"ok": True}
+
+    app.state.calls = calls
+    app.state.cache = cache
+    return app
+
+
+def write(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+def test_not_modified_until_a_read_table_changes(app, db_path):
+    client = TestClient(app)
+    first = client.get("/proposals")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.json()["total"] == 1
+
+    again = client.get("/proposals", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["etag"] == etag and not again.content
+
+    # No validator: the cached body is served, the endpoint still does not run
+    cached = client.get("/proposals")
+    assert cached.status_code == 200 and cached.json() == first.json() and cached.headers["etag"] == etag
+    assert app.state.calls["proposals"] == 1
+
+    # Writes to tables the route does not read keep the ETag
+    write(db_path, "INSERT INTO tasks (title) VALUES ('Call client')")
+    assert client.get("/proposals", headers={"If-None-Match": etag}).status_code == 304
+
+    write(db_path, "UPDATE proposals SET status = 'won'")
+    changed = client.get("/proposals", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert app.state.calls["proposals"] == 2
+
+
+def test_query_string_is_part_of_the_etag(app):
+    client = TestClient(app)
+    active = client.get("/proposals?status=active").headers["etag"]
+    assert client.get("/proposals?status=lost").headers["etag"] != active
+    assert client.get("/proposals?status=active").headers["etag"] == active
+    assert app.state.calls["proposals"] == 2
+
+
+def test_migration_120_tracks_dashboard_tables(app, db_path):
+    client = TestClient(app)
+    etag = client.get("/tasks").headers["etag"]
+    write(db_path, "INSERT INTO tasks (title) VALUES ('Site visit')")
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["total"] == 1
+
+
+def test_untracked_and_unauthenticated_routes_are_not_cached(app):
+    client = TestClient(app)
+    for _ in range(2):
+        response = client.get("/untracked")
+        assert response.status_code == 200 and "etag" not in response.headers
+        assert "etag" not in client.get("/secure").headers
+    assert app.state.calls["untracked"] == 2
+
+
+def test_hit_ratio_per_route(app):
+    client = TestClient(app)
+    etag = client.get("/proposals").headers["etag"]
+    client.get("/proposals", headers={"If-None-Match": etag})
+    client.get("/proposals")
+    client.get("/proposals", headers={"If-None-Match": f'"other", W/{etag}'})
+    client.get("/untracked")
+
+    stats = app.state.cache.stats()
+    assert stats["routes"]["/proposals"] == {
+        "requests": 4, "not_modified": 2, "body_hits": 1, "misses": 1,
+        "uncacheable": 0, "bypassed": 0, "hit_ratio": 0.75,
+    }
+    assert stats["routes"]["/untracked"]["uncacheable"] == 1
+    assert stats["entries"] == 1 and stats["bytes"] > 0
+
+
+def test_stamp_reads_no_table_while_nothing_is_committed(db_path):
+    versions = get_data_version_service(db_path)
+    first = versions.stamp(["proposals", "tasks"])
+
+    statements = []
+    versions._watch.set_trace_callback(statements.append)
+    assert versions.stamp(["proposals", "tasks"]) == first
+    assert statements == ["PRAGMA data_version"]
+
+    write(db_path, "INSERT INTO tasks (title) VALUES ('Invoice follow-up')")
+    assert versions.stamp(["proposals", "tasks"]) != first
+    assert any("FROM data_versions" in sql for sql in statements)
+    versions.close()
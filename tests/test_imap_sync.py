@@ -0,0 +1,191 @@
+"""
+Incremental IMAP sync tests - UID high-water marks, header dedup and
+UIDVALIDITY resets, against the in-memory IMAP stand-in from conftest.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from backend.services.imap_sync import ImapUidSync, compress_uid_set
+
+MIGRATION = Path(__file__).parent.parent / "database" / "migrations" / "106_email_sync_state.sql"
+
+
+@pytest.fixture
+def sync_db(tmp_path):
+    conn = sqlite3.connect(tmp_path / "sync.db")
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE emails (email_id INTEGER PRIMARY KEY, message_id TEXT UNIQUE);
+    """)
+    conn.executescript(MIGRATION.read_text())
+    yield conn
+    conn.close()
+
+
+def run_sync(imap, conn, limit=None, fail_uids=()):
+    sync = ImapUidSync(imap, conn, 'INBOX', account_email='a@bensley.com')
+    assert sync.select()
+    fetched = []
+    for message in sync.fetch(sync.plan(limit=limit)):
+        fetched.append(message.uid)
+        if message.uid in fail_uids:
+            sync.mark_failed(message.uid)
+            continue
+        conn.execute("INSERT INTO emails (message_id) VALUES (?)", (message.message_id,))
+        sync.mark_done(message.uid)
+    sync.save_state()
+    conn.commit()
+    return sync, fetched
+
+
+def body_fetches(imap):
+    return [c for c in imap.commands if c[0] == 'FETCH' and 'BODY.PEEK[]' in c[2]]
+
+
+class TestImapUidSync:
+    def test_uid_set_compression(self):
+        assert compress_uid_set([9, 1, 2, 3, 7, 10]) == '1:3,7,9:10'
+        assert compress_uid_set([]) == ''
+
+    def test_second_run_only_fetches_new_uids(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2, 3)})
+        sync, fetched = run_sync(imap, sync_db)
+        assert fetched == [1, 2, 3]
+        assert sync.last_uid == 3
+        assert imap.commands[0] == ('SELECT', '"INBOX"', True)
+
+        imap.messages[4] = make_imap_message(4)
+        imap.commands.clear()
+        sync, fetched = run_sync(imap, sync_db)
+
+        assert fetched == [4]
+        assert ('SEARCH', None, 'UID 4:*') in imap.commands
+        assert len(body_fetches(imap)) == 1
+
+    def test_nothing_new_downloads_nothing(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2)})
+        run_sync(imap, sync_db)
+
+        imap.commands.clear()
+        sync, fetched = run_sync(imap, sync_db)
+        assert fetched == []
+        assert sync.stats['new_uids'] == 0   # "4:*" returned UID 2, filtered out
+        assert body_fetches(imap) == []
+
+    def test_known_message_ids_skip_body_download(self, sync_db, fake_imap, make_imap_message):
+        sync_db.execute("INSERT INTO emails (message_id) VALUES ('<msg-2@example.com>')")
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2, 3)})
+
+        sync, fetched = run_sync(imap, sync_db)
+        assert fetched == [1, 3]
+        assert sync.stats['known'] == 1
+        assert sync.last_uid == 3
+
+    def test_limit_defers_remaining_to_next_run(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({1: make_imap_message(1)})
+        run_sync(imap, sync_db)
+
+        imap.messages.update({uid: make_imap_message(uid) for uid in range(2, 7)})
+        sync, fetched = run_sync(imap, sync_db, limit=2)
+        assert fetched == [2, 3]
+        assert sync.stats['deferred'] == 3
+        assert sync.last_uid == 3
+
+        sync, fetched = run_sync(imap, sync_db, limit=10)
+        assert fetched == [4, 5, 6]
+
+    def test_uidvalidity_change_resyncs_without_duplicates(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2)}, uidvalidity=1)
+        run_sync(imap, sync_db)
+
+        # Server rebuilt the mailbox: same mail, new UIDs
+        imap = fake_imap({10: make_imap_message(1), 11: make_imap_message(2), 12: make_imap_message(3)}, uidvalidity=2)
+        sync, fetched = run_sync(imap, sync_db)
+
+        assert sync.stats['resync'] is True
+        assert fetched == [12]
+        assert sync_db.execute("SELECT COUNT(*) FROM emails").fetchone()[0] == 3
+        state = sync_db.execute("SELECT uidvalidity, last_uid FROM email_sync_state").fetchone()
+        assert state == (2, 12)
+
+    def test_failed_store_is_retried_next_run(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2, 3)})
+        sync = ImapUidSync(imap, sync_db, 'INBOX')
+        sync.select()
+        with pytest.raises(RuntimeError):
+            for message in sync.fetch(sync.plan()):
+                if message.uid == 2:
+                    raise RuntimeError("disk full")
+                sync.mark_done(message.uid)
+        assert sync.save_state() == 1
+
+    def test_failed_insert_keeps_the_mark_below_it(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2, 3)})
+        sync, fetched = run_sync(imap, sync_db, fail_uids={2})
+        assert fetched == [1, 2, 3]
+        assert sync.last_uid == 1
+        assert sync.stats['errors'] == 1
+        assert sync_db.execute("SELECT last_uid, messages_synced FROM email_sync_state").fetchone() == (1, 2)
+
+        # UID 2 is fetched again; UID 3 is skipped by Message-ID
+        imap.commands.clear()
+        sync, fetched = run_sync(imap, sync_db)
+        assert fetched == [2]
+        assert sync.stats['known'] == 1
+        assert sync.last_uid == 3
+        assert sync_db.execute("SELECT COUNT(*) FROM emails").fetchone()[0] == 3
+
+    def test_stream_downloads_in_windows(self, sync_db, fake_imap, make_imap_message):
+        imap = fake_imap({uid: make_imap_message(uid) for uid in (1, 2)})
+        sync = ImapUidSync(imap, sync_db, 'INBOX')
+        sync.select()
+
+        received = {}
+        for stub, chunks in sync.stream(sync.plan(), chunk_size=16):
+            received[stub.uid] = b''.join(chunks)
+            sync.mark_done(stub.uid)
+
+        assert received == {1: make_imap_message(1), 2: make_imap_message(2)}
+        windows = [c[2] for c in body_fetches(imap) if c[1] == '1']
+        assert windows[:2] == ['(BODY.PEEK[]<0.16>)', '(BODY.PEEK[]<16.16>)']
+        assert sync.save_state() == 2
+
+    def test_refused_body_is_retried_and_expunged_is_skipped(self, sync_db, fake_imap, make_imap_message):
+        class FlakyImap(fake_imap):
+            refuse = {2}
+
+            def uid(self, command, *args):
+                if command == 'FETCH' and 'BODY.PEEK[]' in args[1] and int(args[0]) in self.refuse:
+                    self.commands.append((command,) + args)
+                    return 'NO', [b'temporary failure']
+                return super().uid(command, *args)
+
+        for method in ('fetch', 'stream'):
+            conn = sqlite3.connect(':memory:')
+            conn.executescript(
+                "CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);"
+                "CREATE TABLE emails (email_id INTEGER PRIMARY KEY, message_id TEXT UNIQUE);"
+            )
+            conn.executescript(MIGRATION.read_text())
+            imap = FlakyImap({uid: make_imap_message(uid) for uid in (1, 2, 3, 4)})
+            sync = ImapUidSync(imap, conn, 'INBOX')
+            sync.select()
+            pending = sync.plan()
+            del imap.messages[4]    # expunged between plan and download
+            for item in getattr(sync, method)(pending):
+                sync.mark_done(item.uid if method == 'fetch' else item[0].uid)
+            assert sync.stats['errors'] == 1 and sync.stats['expunged'] == 1
+            assert sync.save_state() == 1
+
+            # Next run the server answers: the mark moves past 2 and the expunged 4
+            imap.refuse = set()
+            sync = ImapUidSync(imap, conn, 'INBOX')
+            sync.select()
+            for item in getattr(sync, method)(sync.plan()):
+                sync.mark_done(item.uid if method == 'fetch' else item[0].uid)
+            assert sync.stats['stored'] == 2    # 2 again, and 3 (nothing was inserted)
+            assert sync.save_state() == 3
+            conn.close()
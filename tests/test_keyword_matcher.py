@@ -0,0 +1,126 @@
+"""
+Keyword matcher tests - Aho-Corasick matching, word boundaries, incremental
+updates, and PatternFirstLinker keyword priority.
+"""
+
+import re
+import sqlite3
+
+from services.keyword_matcher import KeywordMatcher
+from services.pattern_first_linker import PatternFirstLinker
+
+
+class TestKeywordMatcher:
+    def test_finds_overlapping_keywords_in_one_pass(self):
+        matcher = KeywordMatcher()
+        for kw in ["he", "she", "his", "hers"]:
+            matcher.add(kw, kw)
+
+        hits = [(h.keyword, h.start) for h in matcher.find_all("ushers")]
+        assert hits == [("she", 1), ("he", 2), ("hers", 2)]
+
+    def test_case_insensitive_with_multiple_payloads(self):
+        matcher = KeywordMatcher()
+        matcher.add("Bali", {"proposal_id": 1}, weight=3)
+        matcher.add("bali", {"proposal_id": 2}, weight=1)
+
+        result = matcher.match("Site visit to BALI next week")
+        assert list(result) == ["bali"]
+        assert [h.payload["proposal_id"] for h in result["bali"]] == [1, 2]
+        assert matcher.score("bali, bali and bali", "proposal_id") == {1: 3, 2: 1}
+
+    def test_word_boundary_matches_regex(self):
+        keywords = ["ritz", "bali", "sri lanka", "c++", "an"]
+        texts = ["the ritz-carlton", "ritzy bali", "sri lankan resort", "sri lanka.",
+                 "c++ code", "banana an", "_bali"]
+        matcher = KeywordMatcher(word_boundary=True)
+        for kw in keywords:
+            matcher.add(kw)
+
+        for text in texts:
+            expected = [kw for kw in keywords if re.search(rf'\b{re.escape(kw)}\b', text)]
+            assert list(matcher.match(text)) == expected, text
+
+    def test_incremental_add_and_remove(self):
+        matcher = KeywordMatcher()
+        matcher.add("marina")
+        assert "marina" in matcher.match("marina bay")
+
+        matcher.add("bay")
+        matcher.remove("marina")
+        assert list(matcher.match("marina bay")) == ["bay"]
+        assert "marina" not in matcher
+
+    def test_remove_keeps_links_valid_without_a_relink(self):
+        matcher = KeywordMatcher()
+        for keyword in ("he", "she", "hers", "his"):
+            matcher.add(keyword)
+        matcher.find_all("warm up")
+        rebuilds = matcher.stats()["rebuilds"]
+
+        matcher.remove("he")
+        matcher.remove("his")
+        assert [hit.keyword for hit in matcher.find_all("ushers this")] == ["she", "hers"]
+        assert matcher.stats()["rebuilds"] == rebuilds
+
+        matcher.add("he")
+        assert [hit.keyword for hit in matcher.find_all("ushers")] == ["she", "he", "hers"]
+
+    def test_sync_only_applies_differences(self):
+        matcher = KeywordMatcher()
+        matcher.sync({"alpha": [("a", 1.0)], "beta": [("b", 1.0)]})
+        matcher.find_all("alpha")
+        rebuilds = matcher.stats()["rebuilds"]
+
+        changes = matcher.sync({"alpha": [("a2", 2.0)], "beta": [("b", 1.0)]})
+        assert changes == {"added": 0, "removed": 0, "updated": 1}
+        assert matcher.find_all("alpha")[0].payload == "a2"
+        assert matcher.stats()["rebuilds"] == rebuilds  # payload swap, no relink
+
+        changes = matcher.sync({"gamma": [("g", 1.0)]})
+        assert changes == {"added": 1, "removed": 2, "updated": 0}
+        assert list(matcher.match("alpha beta gamma")) == ["gamma"]
+
+
+class TestLinkerKeywordPatterns:
+    def _make_linker(self, temp_database):
+        conn = sqlite3.connect(temp_database)
+        conn.executescript("""
+            CREATE TABLE email_learned_patterns (
+                pattern_id INTEGER PRIMARY KEY, pattern_type TEXT, pattern_key TEXT,
+                pattern_key_normalized TEXT, target_type TEXT, target_id INTEGER,
+                target_code TEXT, target_name TEXT, confidence REAL, is_active INTEGER DEFAULT 1
+            );
+            INSERT INTO email_learned_patterns
+                (pattern_id, pattern_type, pattern_key, target_type, target_id, target_code, target_name, confidence)
+            VALUES
+                (1, 'keyword_to_project', 'wynn', 'project', 10, '24 BK-010', 'Wynn Marjan', 0.9),
+                (2, 'keyword_to_proposal', 'marjan', 'proposal', 20, '25 BK-020', 'Marjan Island', 0.7),
+                (3, 'keyword_to_proposal', 'island', 'proposal', 30, '25 BK-030', 'Island Villas', 0.8);
+        """)
+        conn.commit()
+        conn.close()
+        return PatternFirstLinker(temp_database)
+
+    def test_proposal_patterns_win_then_confidence(self, temp_database):
+        linker = self._make_linker(temp_database)
+        patterns = linker._load_patterns()
+
+        match = linker._check_keyword_pattern({"subject": "Wynn Marjan Island update"}, patterns)
+        assert match["pattern_id"] == 3
+        assert match["reason"] == "Keyword pattern: 'island'"
+
+        match = linker._check_keyword_pattern({"subject": "Wynn site photos"}, patterns)
+        assert match["match_type"] == "keyword_to_project"
+
+        assert linker._check_keyword_pattern({"subject": "Lunch"}, patterns) is None
+
+    def test_other_patterns_leave_the_shared_matcher_alone(self, temp_database):
+        linker = self._make_linker(temp_database)
+        patterns = linker._load_patterns()
+        shared = linker._keyword_matcher.stats()
+
+        stale = {"keyword_to_proposal": {"lunch": dict(patterns["keyword_to_proposal"]["island"])}}
+        assert linker._check_keyword_pattern({"subject": "Lunch"}, stale)["reason"] == "Keyword pattern: 'lunch'"
+        assert linker._keyword_matcher.stats() == shared
+        assert linker._check_keyword_pattern({"subject": "Lunch"}, patterns) is None
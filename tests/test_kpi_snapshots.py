@@ -0,0 +1,185 @@
+"""
+KPI snapshot tests - the snapshot tables must give the same dashboard figures
+as the live queries, and triggers must limit a refresh to what changed.
+"""
+
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from services.financial_service import FinancialService
+from services.kpi_snapshot_service import KpiSnapshotService
+
+MIGRATION = Path(__file__).parent.parent / "database" / "migrations" / "110_kpi_snapshots.sql"
+
+
+def days(n):
+    return (date.today() + timedelta(days=n)).isoformat()
+
+
+SCHEMA = """
+    CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+    CREATE TABLE projects (
+        project_id INTEGER PRIMARY KEY, project_code TEXT UNIQUE, status TEXT,
+        is_active_project INTEGER DEFAULT 0, total_fee_usd REAL, contract_signed_date TEXT
+    );
+    CREATE TABLE invoices (
+        invoice_id INTEGER PRIMARY KEY, project_code TEXT, invoice_number TEXT,
+        invoice_amount REAL, payment_amount REAL, invoice_date TEXT, due_date TEXT,
+        payment_date TEXT, status TEXT
+    );
+    CREATE TABLE proposals (
+        proposal_id INTEGER PRIMARY KEY, project_code TEXT, project_value REAL,
+        current_status TEXT, status TEXT, win_probability REAL, action_due TEXT, ball_in_court TEXT
+    );
+    CREATE TABLE project_milestones (milestone_id INTEGER PRIMARY KEY, status TEXT, planned_date TEXT);
+    CREATE TABLE rfis (rfi_id INTEGER PRIMARY KEY, status TEXT);
+"""
+
+
+def seed(conn):
+    conn.executemany("INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?)", [
+        (1, '24 BK-001', 'Active', 1, 1000000, days(-400)),
+        (2, '24 BK-002', 'Active', 1, 500000, days(-200)),
+        (3, '25 BK-003', 'proposal', 0, 0, None),
+        (4, '23 BK-004', 'lost', 0, 0, None),
+    ])
+    conn.executemany("""
+        INSERT INTO invoices (project_code, invoice_number, invoice_amount, payment_amount,
+                              invoice_date, due_date, payment_date, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        ('24 BK-001', 'I-1', 100000, 100000, days(-120), days(-90), days(-100), 'paid'),
+        ('24 BK-001', 'I-2', 80000, 0, days(-80), days(-50), None, 'outstanding'),
+        ('24 BK-001', 'I-3', 60000, 20000, days(-20), days(10), days(-3), 'partial'),
+        ('24 BK-002', 'I-4', 50000, 0, days(-150), days(-120), None, 'outstanding'),
+        ('24 BK-002', 'I-5', 30000, 0, days(-40), days(-10), None, 'outstanding'),
+        ('99 BK-999', 'I-6', 9000, 0, days(-70), days(-40), None, 'outstanding'),
+        (None, 'I-7', 1000, 0, days(-5), None, None, 'outstanding'),
+    ])
+    conn.executemany("INSERT INTO proposals VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (1, '25 BK-010', 200000, 'Proposal Sent', 'Proposal Sent', 50, days(-2), 'us'),
+        (2, '25 BK-011', 300000, 'First Contact', 'First Contact', 20, days(5), 'them'),
+        (3, '25 BK-012', 400000, 'Lost', 'Lost', None, days(-9), 'us'),
+    ])
+    conn.executemany("INSERT INTO project_milestones VALUES (?, ?, ?)", [
+        (1, 'pending', days(2)), (2, 'completed', days(3)), (3, 'pending', days(20)),
+    ])
+    conn.executemany("INSERT INTO rfis VALUES (?, ?)", [(1, 'open'), (2, 'open'), (3, 'closed')])
+
+
+def build_db(path, with_snapshots=True):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    seed(conn)
+    if with_snapshots:
+        conn.executescript(MIGRATION.read_text())
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return build_db(tmp_path / "kpi.db")
+
+
+@pytest.fixture
+def kpis(db_path):
+    service = KpiSnapshotService(db_path)
+    service.refresh(full=True)
+    return service
+
+
+class TestSnapshotFigures:
+    def test_role_stats(self, kpis):
+        executive = kpis.get_role_stats('executive')
+        assert executive['pipeline_value'] == 500000
+        assert executive['active_projects_count'] == 2
+        # Active projects only: I-2 80k + I-3 40k + I-4 50k + I-5 30k
+        assert executive['outstanding_invoices_total'] == 200000
+        assert executive['overdue_invoices_count'] == 3
+        assert executive['snapshot']['source'] == 'snapshot'
+        assert executive['snapshot']['pending_changes'] == 0
+
+        pm = kpis.get_role_stats('pm')
+        assert (pm['deliverables_due_this_week'], pm['open_rfis_count']) == (1, 2)
+
+        finance = kpis.get_role_stats('finance')
+        assert finance['overdue_30_days'] == 130000
+        assert finance['overdue_60_days'] == 50000
+        assert finance['overdue_90_plus'] == 50000
+        assert finance['recent_payments_7_days'] == 20000
+
+        with pytest.raises(ValueError):
+            kpis.get_role_stats('intern')
+
+    def test_kpi_totals(self, kpis):
+        totals = kpis.get_kpi_totals()
+        assert totals['total_contract_value'] == 1500000
+        assert totals['paid_for_active'] == 120000
+        assert totals['outstanding_for_active'] == 200000
+        assert totals['outstanding_prev'] == 160000
+        assert (totals['active_projects'], totals['active_proposals'], totals['lost']) == (2, 1, 1)
+        assert totals['largest_outstanding'] == {'amount': 80000, 'invoice_number': 'I-2'}
+        assert totals['avg_days_to_payment'] == 18.5
+        assert (totals['overdue_count'], totals['overdue_amount']) == (3, 160000)
+
+    def test_aging_matches_live_query(self, tmp_path, kpis):
+        live = FinancialService(build_db(tmp_path / "live.db", with_snapshots=False))
+        expected = live.get_invoice_aging_summary()
+        assert 'snapshot' not in expected
+
+        snapshot = FinancialService(kpis.db_path).get_invoice_aging_summary()
+        assert snapshot.pop('snapshot')['source'] == 'snapshot'
+        assert snapshot == expected
+
+    def test_proposal_stats(self, kpis):
+        stats = kpis.get_proposal_stats()
+        assert (stats['open_pipeline_count'], stats['open_pipeline_value']) == (2, 500000)
+        assert stats['open_pipeline_weighted'] == 160000
+        assert (stats['overdue_action_count'], stats['our_move_count']) == (1, 1)
+
+
+class TestIncrementalRefresh:
+    def test_triggers_mark_only_changed_rows(self, db_path, kpis):
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE invoices SET payment_amount = 80000, status = 'paid' WHERE invoice_number = 'I-2'")
+        conn.execute("UPDATE rfis SET status = 'closed' WHERE rfi_id = 1")
+        conn.commit()
+        dirty = conn.execute("SELECT scope, key FROM kpi_dirty ORDER BY scope").fetchall()
+        conn.close()
+        assert dirty == [('pm', '*'), ('project', '24 BK-001')]
+        assert kpis.staleness()['pending_changes'] == 2
+
+        result = kpis.refresh()
+        assert (result['mode'], result['projects'], result['groups']) == ('incremental', 1, ['pm'])
+        assert kpis.get_role_stats('executive')['outstanding_invoices_total'] == 120000
+        assert kpis.get_role_stats('pm')['open_rfis_count'] == 1
+        assert kpis.staleness()['pending_changes'] == 0
+        assert kpis.refresh()['mode'] == 'noop'
+
+    def test_moving_an_invoice_updates_both_codes(self, db_path, kpis):
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE invoices SET project_code = '24 BK-002' WHERE invoice_number = 'I-6'")
+        conn.commit()
+        conn.close()
+
+        assert kpis.refresh()['projects'] == 1  # 99 BK-999 has nothing left
+        codes = [row['project_code'] for row in kpis.execute_query(
+            "SELECT project_code FROM kpi_project_snapshot ORDER BY project_code")]
+        assert '99 BK-999' not in codes
+        assert kpis.get_role_stats('executive')['outstanding_invoices_total'] == 209000
+
+    def test_stale_date_forces_full_rebuild(self, db_path, kpis):
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE kpi_global_snapshot SET as_of_date = '2000-01-01' WHERE metric = 'refresh'")
+        conn.commit()
+        conn.close()
+        assert kpis.refresh()['mode'] == 'full'
+
+    def test_missing_tables_fall_back_to_live(self, tmp_path):
+        service = KpiSnapshotService(build_db(tmp_path / "old.db", with_snapshots=False))
+        assert service.ensure_fresh() is False
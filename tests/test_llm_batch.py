@@ -0,0 +1,216 @@
+"""
+LLM batch service tests - requests are packed into batch files against a
+local stand-in for the provider's files/batches endpoints; results are
+ingested into llm_jobs once, partial batches resume, and the backfill
+writes each email's result exactly once at batch pricing.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from services.context_aware_suggestion_service import BACKFILL_KIND, ContextAwareSuggestionService
+from services.llm_batch_service import LLMBatchService
+from services.llm_dispatcher import LLMDispatcher
+
+MIGRATIONS = Path(__file__).parent.parent / "database" / "migrations"
+KIND = "suggestion_backfill"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "batch.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE gpt_usage_log (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT, request_type TEXT NOT NULL,
+            model TEXT NOT NULL DEFAULT 'gpt-4o-mini', input_tokens INTEGER, output_tokens INTEGER,
+            estimated_cost_usd REAL, email_ids TEXT, batch_size INTEGER DEFAULT 1,
+            processing_time_ms INTEGER, success INTEGER DEFAULT 1, error_message TEXT,
+            created_at TEXT DEFAULT (datetime('now'))
+        );
+        CREATE TABLE proposals (
+            proposal_id INTEGER PRIMARY KEY, project_code TEXT, project_name TEXT, client_company TEXT,
+            country TEXT, status TEXT, health_score REAL, days_since_contact INTEGER,
+            project_value REAL, phase TEXT
+        );
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, subject TEXT, sender_email TEXT, recipient_emails TEXT,
+            body_full TEXT, body_preview TEXT, date TEXT, folder TEXT, thread_id TEXT
+        );
+        CREATE TABLE email_content (
+            email_id INTEGER PRIMARY KEY, category TEXT, ai_summary TEXT, entities TEXT,
+            linked_project_code TEXT, urgency_level TEXT
+        );
+        CREATE TABLE ai_suggestions (
+            suggestion_id INTEGER PRIMARY KEY AUTOINCREMENT, suggestion_type TEXT, priority TEXT,
+            confidence_score REAL, source_type TEXT, source_id INTEGER, source_reference TEXT,
+            title TEXT, description TEXT, suggested_action TEXT, suggested_data TEXT,
+            target_table TEXT, project_code TEXT, status TEXT, created_at TEXT
+        );
+        CREATE TABLE email_proposal_links (email_id INTEGER, proposal_id INTEGER, confidence_score REAL);
+        CREATE TABLE email_learned_patterns (
+            pattern_type TEXT, pattern_key TEXT, pattern_key_normalized TEXT, target_type TEXT,
+            target_code TEXT, target_name TEXT, confidence REAL, times_correct INTEGER, is_active INTEGER
+        );
+        CREATE TABLE contact_context (email TEXT, is_multi_project INTEGER, email_handling_preference TEXT,
+                                      relationship_type TEXT, role TEXT, context_notes TEXT, confidence REAL);
+        INSERT INTO proposals VALUES (1, '25 BK-033', 'Ubud Retreat', 'BDL Bali', 'Indonesia',
+                                      'proposal', NULL, NULL, NULL, NULL);
+    """)
+    conn.executemany(
+        "INSERT INTO emails (email_id, subject, sender_email, body_full, body_preview, date) VALUES (?, ?, ?, ?, ?, ?)",
+        [(n, f"Site visit {n}", "wayan@bdlbali.com", f"Body {n}", f"Body {n}", f"2025-03-{n:02d}")
+         for n in range(1, 6)]
+    )
+    for name in ("113_gpt_usage_prompt_savings.sql", "114_llm_jobs.sql", "115_llm_response_cache.sql",
+                 "116_llm_batches.sql"):
+        conn.executescript((MIGRATIONS / name).read_text())
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def batches(db_path, fake_openai_server):
+    fake_openai_server.responder = lambda req: json.dumps({"echo": req["messages"][-1]["content"]})
+    return LLMBatchService(db_path, dispatcher=LLMDispatcher(db_path))
+
+
+def request(n):
+    return {"model": "gpt-4o-mini", "max_tokens": 50, "temperature": 0.1,
+            "messages": [{"role": "system", "content": "Classify."},
+                         {"role": "user", "content": f"email {n}"}]}
+
+
+def job_statuses(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = dict(conn.execute("SELECT ref_id, status FROM llm_jobs ORDER BY job_id").fetchall())
+    conn.close()
+    return rows
+
+
+class TestBatchService:
+    def test_submit_poll_and_collect(self, batches, db_path, fake_openai_server):
+        fake_openai_server.batch_polls = 2
+        batches.max_requests = 2
+        submitted = batches.submit(KIND, [(n, request(n)) for n in range(1, 4)])
+        assert submitted["submitted"] == 3 and len(submitted["batch_ids"]) == 2  # split by max_requests
+
+        uploaded = fake_openai_server.files["file-1"].splitlines()
+        line = json.loads(uploaded[0])
+        assert line["url"] == "/v1/chat/completions" and line["body"] == request(1)
+
+        assert [p["status"] for p in batches.poll(KIND)] == ["validating", "validating"]
+        assert batches.ready(KIND) == []
+        assert [p["status"] for p in batches.poll(KIND)] == ["completed", "completed"]
+        outcomes = batches.ready(KIND)
+        assert [json.loads(o["content"])["echo"] for o in outcomes] == ["email 1", "email 2", "email 3"]
+        assert all(o["batch"] for o in outcomes)
+        assert batches.open_batches(KIND) == []
+        assert len(fake_openai_server.requests) == 0  # nothing went through chat completions
+
+    def test_in_flight_and_answered_requests_are_not_resubmitted(self, batches, db_path, fake_openai_server):
+        fake_openai_server.batch_polls = 99
+        batches.submit(KIND, [(1, request(1))])
+        again = batches.submit(KIND, [(1, request(1)), (2, request(2))])
+        assert again["in_flight"] == 1 and again["submitted"] == 1
+
+        fake_openai_server.batch_polls = 1
+        batches.poll(KIND)
+        assert batches.submit(KIND, [(1, request(1))])["already_done"] == 1
+        # Once applied, an identical request for another email is answered by the response cache
+        batches.dispatcher.mark_applied([o["job_id"] for o in batches.ready(KIND)])
+        assert batches.submit(KIND, [(3, request(1))])["cached"] == 1
+
+    def test_failed_lines_and_partial_batches(self, batches, db_path, fake_openai_server):
+        batches.submit(KIND, [(n, request(n)) for n in range(1, 5)])
+        fake_openai_server.batch_fail_ids = {"1"}  # custom_id = job_id
+        fake_openai_server.batch_expire_after = 2
+        batches.poll(KIND)
+        assert job_statuses(db_path) == {"1": "failed", "2": "done", "3": "pending", "4": "pending"}
+
+        # A restarted run picks up the unanswered lines and the failed one
+        fake_openai_server.batch_fail_ids = set()
+        fake_openai_server.batch_expire_after = None
+        restarted = LLMBatchService(db_path, dispatcher=LLMDispatcher(db_path))
+        resubmit = restarted.submit(KIND, [(n, request(n)) for n in range(1, 5)])
+        assert resubmit["submitted"] == 3 and resubmit["already_done"] == 1
+        restarted.poll(KIND)
+        assert set(job_statuses(db_path).values()) == {"done"}
+        assert fake_openai_server.batch_lines_answered == 5
+
+
+class TestBackfill:
+    @pytest.fixture
+    def service(self, db_path, fake_openai_server):
+        fake_openai_server.responder = lambda req: json.dumps({"email_links": []})
+        return ContextAwareSuggestionService(db_path)
+
+    def test_backfill_writes_each_result_once(self, service, db_path, fake_openai_server, monkeypatch):
+        written = []
+        monkeypatch.setattr(service.writer, "write_suggestions_from_analysis",
+                            lambda email_id, analysis, email: written.append(email_id) or [])
+
+        first = service.backfill_suggestions(since="2025-03-01", until="2025-03-03", wait=False)
+        assert first["emails_submitted"] == 3 and first["open_batches"] == 1 and written == []
+
+        # Next run (e.g. after a restart) collects the finished batch and submits the rest
+        second = service.backfill_suggestions(since="2025-03-01", until="2025-03-31", poll_interval=0)
+        assert second["results_applied"] == 5 and sorted(written) == [1, 2, 3, 4, 5]
+        assert second["emails_submitted"] == 2
+
+        third = service.backfill_suggestions(since="2025-03-01", until="2025-03-31", poll_interval=0)
+        assert third["emails_submitted"] == 0 and third["results_applied"] == 0
+        assert len(written) == 5
+        assert set(job_statuses(db_path).values()) == {"applied"}
+
+    def test_batch_results_billed_at_half_price(self, service, db_path, fake_openai_server, monkeypatch):
+        monkeypatch.setattr(service.writer, "write_suggestions_from_analysis", lambda *args: [])
+        service.backfill_suggestions(email_ids=[1], poll_interval=0)
+        conn = sqlite3.connect(db_path)
+        request_type, cost, input_tokens = conn.execute(
+            "SELECT request_type, estimated_cost_usd, input_tokens FROM gpt_usage_log").fetchone()
+        conn.close()
+
+        full_price = service.analyzer._calculate_cost(input_tokens, 20)
+        assert request_type == "batch_backfill_analysis"
+        assert cost == pytest.approx(full_price / 2, abs=1e-6)
+        assert service.batch_service.stats(BACKFILL_KIND)["jobs"] == {"applied": 1}
+
+
+class TestRealtimeBatch:
+    @pytest.fixture
+    def service(self, db_path, fake_openai_server):
+        fake_openai_server.responder = lambda req: json.dumps({"email_links": []})
+        return ContextAwareSuggestionService(db_path)
+
+    def leave_unfinished(self, service, email_ids):
+        # An earlier batch got its answers but crashed before writing them
+        service.analyzer.dispatcher.dispatch_sync(
+            "suggestion_analysis", [(n, request(n)) for n in email_ids])
+
+    def test_resume_is_opt_in_and_capped_at_limit(self, service, monkeypatch):
+        written = []
+        monkeypatch.setattr(service.writer, "write_suggestions_from_analysis",
+                            lambda email_id, analysis, email: written.append(email_id) or [])
+        self.leave_unfinished(service, [1, 2, 3, 4])
+
+        result = service.generate_suggestions_batch(email_ids=[5], limit=2)
+        assert result["emails_processed"] == 1 and written == [5]
+
+        result = service.generate_suggestions_batch(email_ids=[5], limit=2, resume=True)
+        assert result["emails_processed"] == 2 and written == [5, 1, 2]
+
+    def test_failed_write_is_not_resumed_again(self, service, db_path, monkeypatch):
+        def broken(email_id, analysis, email):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(service.writer, "write_suggestions_from_analysis", broken)
+        result = service.generate_suggestions_batch(email_ids=[1, 2], limit=5)
+        assert result["failed_email_ids"] == [1, 2]
+        assert set(job_statuses(db_path).values()) == {"failed"}
+        assert service.analyzer.dispatcher.unfinished("suggestion_analysis") == []
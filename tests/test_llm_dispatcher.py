@@ -0,0 +1,139 @@
+"""
+LLM dispatcher tests - requests go through a local OpenAI-compatible
+server; 429s are retried with backoff, concurrency adapts, and jobs are
+durable, so interrupted work resumes without paying twice.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from services.llm_dispatcher import LLMDispatcher, RateLimiter, TokenBucket, parse_reset
+
+MIGRATION = Path(__file__).parent.parent / "database" / "migrations" / "114_llm_jobs.sql"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "llm.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)")
+    conn.executescript(MIGRATION.read_text())
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def dispatcher(db_path, fake_openai_server):
+    return LLMDispatcher(db_path, max_concurrency=4, retry_base_seconds=0.01)
+
+
+def request(n):
+    return {"model": "gpt-4o-mini", "max_tokens": 50,
+            "messages": [{"role": "system", "content": "Classify."},
+                         {"role": "user", "content": f"email {n}"}]}
+
+
+def jobs(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT ref_id, status, attempts FROM llm_jobs ORDER BY job_id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_parse_reset():
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("120ms") == pytest.approx(0.12)
+    assert parse_reset("1.5") == 1.5
+    assert parse_reset(None) is None
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60)  # one per second
+    bucket.take(60)
+    assert bucket.wait_time(1, bucket._updated) == pytest.approx(1.0)
+    bucket.observe(limit=120, remaining=0, now=bucket._updated)
+    assert bucket.wait_time(1, bucket._updated) == pytest.approx(0.5)
+
+
+class TestDispatch:
+    def test_results_in_order_and_jobs_recorded(self, dispatcher, db_path, fake_openai_server):
+        fake_openai_server.responder = lambda req: json.dumps({"echo": req["messages"][-1]["content"]})
+        outcomes = dispatcher.dispatch_sync("suggestion_analysis", [(n, request(n)) for n in range(5)])
+
+        assert [json.loads(o["content"])["echo"] for o in outcomes] == [f"email {n}" for n in range(5)]
+        assert all(o["success"] and o["usage"]["prompt_tokens"] > 0 for o in outcomes)
+        assert [row[1] for row in jobs(db_path)] == ["done"] * 5
+
+        dispatcher.mark_applied([o["job_id"] for o in outcomes])
+        assert dispatcher.unfinished("suggestion_analysis") == []
+        assert dispatcher.stats()["jobs"] == {"suggestion_analysis": {"applied": 5}}
+
+    def test_rate_limited_requests_are_retried(self, dispatcher, db_path, fake_openai_server):
+        fake_openai_server.fail_next(2, 429, {"retry-after-ms": "20", "x-ratelimit-remaining-requests": "0"})
+        [outcome] = dispatcher.dispatch_sync("suggestion_analysis", [(1, request(1))])
+
+        assert outcome["success"] and outcome["attempts"] == 3
+        stats = dispatcher.stats()
+        assert stats["rate_limited"] == 2 and stats["retries"] == 2
+        assert stats["concurrency"] < 4  # backed off
+
+    def test_bad_request_is_not_retried(self, dispatcher, db_path, fake_openai_server):
+        fake_openai_server.fail_next(1, 400, {})
+        [outcome] = dispatcher.dispatch_sync("suggestion_analysis", [(1, request(1))])
+        assert not outcome["success"] and "400" in outcome["error"]
+        assert jobs(db_path) == [("1", "failed", 1)]
+        assert len(fake_openai_server.requests) == 1
+
+    def test_concurrency_capped_and_follows_remaining_requests(self, dispatcher, fake_openai_server):
+        fake_openai_server.delay = 0.05
+        dispatcher.dispatch_sync("suggestion_analysis", [(n, request(n)) for n in range(8)], max_concurrency=2)
+        assert fake_openai_server.max_in_flight <= 2
+
+        fake_openai_server.max_in_flight = 0
+        fake_openai_server.rate_headers["x-ratelimit-remaining-requests"] = "1"
+        dispatcher.dispatch_sync("suggestion_analysis", [(n, request(n)) for n in range(10, 16)])
+        assert dispatcher.concurrency < 2
+
+    def test_token_budget_spaces_requests(self, db_path, fake_openai_server):
+        limiter = RateLimiter(rpm=500, tpm=6000)  # 100 tokens/second
+        dispatcher = LLMDispatcher(db_path, limiter=limiter)
+        fake_openai_server.rate_headers = {}
+        limiter.tokens.available = 0
+        import time
+        start = time.monotonic()
+        dispatcher.dispatch_sync("suggestion_analysis", [(1, request(1))])  # ~55 tokens
+        assert time.monotonic() - start >= 0.4
+
+
+class TestDurability:
+    def test_finished_but_unapplied_job_is_not_resent(self, dispatcher, db_path, fake_openai_server):
+        dispatcher.dispatch_sync("suggestion_analysis", [(7, request(7))])
+        # crash before results were written: job stays 'done'
+        assert dispatcher.unfinished("suggestion_analysis") == ["7"]
+
+        restarted = LLMDispatcher(db_path, retry_base_seconds=0.01)
+        [outcome] = restarted.dispatch_sync("suggestion_analysis", [(7, request(7))])
+        assert outcome["success"] and outcome["resumed"]
+        assert len(fake_openai_server.requests) == 1
+
+        # A changed prompt for the same email is sent again
+        changed = request(7)
+        changed["messages"][0]["content"] = "Classify carefully."
+        restarted.dispatch_sync("suggestion_analysis", [(7, changed)])
+        assert len(fake_openai_server.requests) == 2
+
+    def test_interrupted_job_resumes(self, dispatcher, db_path, fake_openai_server):
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO llm_jobs (kind, ref_id, request_hash, request, status, attempts) "
+                     "VALUES ('suggestion_analysis', '9', 'x', '{}', 'running', 1)")
+        conn.commit()
+        conn.close()
+
+        assert dispatcher.unfinished("suggestion_analysis") == ["9"]
+        [outcome] = dispatcher.dispatch_sync("suggestion_analysis", [(9, request(9))])
+        assert outcome["success"] and outcome["resumed"]
+        assert jobs(db_path) == [("9", "done", 1)]
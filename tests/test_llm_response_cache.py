@@ -0,0 +1,152 @@
+"""
+LLM response cache tests - an identical request (model, system prompt,
+user message, parameters) is answered from llm_response_cache without a
+provider call; entries expire, are evicted by count and size, can be
+bypassed per call, and hits are recorded in gpt_usage_log.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from services.gpt_suggestion_analyzer import GPTSuggestionAnalyzer, GPTUsageTracker
+from services.llm_dispatcher import LLMDispatcher
+from services.llm_response_cache import LLMResponseCache, cache_parts
+
+MIGRATIONS = Path(__file__).parent.parent / "database" / "migrations"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "llm_cache.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE gpt_usage_log (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT, request_type TEXT NOT NULL,
+            model TEXT NOT NULL DEFAULT 'gpt-4o-mini', input_tokens INTEGER, output_tokens INTEGER,
+            estimated_cost_usd REAL, email_ids TEXT, batch_size INTEGER DEFAULT 1,
+            processing_time_ms INTEGER, success INTEGER DEFAULT 1, error_message TEXT,
+            created_at TEXT DEFAULT (datetime('now'))
+        );
+    """)
+    for name in ("113_gpt_usage_prompt_savings.sql", "114_llm_jobs.sql", "115_llm_response_cache.sql"):
+        conn.executescript((MIGRATIONS / name).read_text())
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def dispatcher(db_path, fake_openai_server):
+    return LLMDispatcher(db_path, retry_base_seconds=0.01)
+
+
+def request(body, temperature=0.1):
+    return {"model": "gpt-4o-mini", "max_tokens": 50, "temperature": temperature,
+            "messages": [{"role": "system", "content": "Classify."},
+                         {"role": "user", "content": body}]}
+
+
+def test_key_covers_model_prompts_and_params():
+    base = cache_parts(request("email 1"))
+    assert cache_parts(request("email 1"))["cache_key"] == base["cache_key"]
+    assert cache_parts(request("email 2"))["user_hash"] != base["user_hash"]
+    assert cache_parts(request("email 1", temperature=0.7))["params_hash"] != base["params_hash"]
+    changed_system = request("email 1")
+    changed_system["messages"][0]["content"] = "Classify carefully."
+    assert cache_parts(changed_system)["system_hash"] != base["system_hash"]
+    assert cache_parts({**request("email 1"), "model": "gpt-4o"})["cache_key"] != base["cache_key"]
+
+
+class TestDispatcherCache:
+    def test_rerun_is_served_from_cache(self, dispatcher, fake_openai_server):
+        fake_openai_server.responder = lambda req: json.dumps({"n": len(fake_openai_server.requests)})
+        [first] = dispatcher.dispatch_sync("suggestion_analysis", [(1, request("email 1"))])
+        dispatcher.mark_applied([first["job_id"]])
+
+        [again] = dispatcher.dispatch_sync("suggestion_analysis", [(1, request("email 1"))])
+        # Same prompt for another email shares the answer too
+        [other] = dispatcher.dispatch_sync("suggestion_analysis", [(2, request("email 1"))])
+
+        assert first["cache"] == "miss" and again["cache"] == "hit" and other["cache"] == "hit"
+        assert again["content"] == first["content"] == other["content"]
+        assert len(fake_openai_server.requests) == 1
+        assert dispatcher.stats()["response_cache"]["hits"] == 2
+
+    def test_opt_out_sends_again(self, dispatcher, fake_openai_server):
+        dispatcher.dispatch_sync("suggestion_analysis", [(1, request("email 1"))])
+        [outcome] = dispatcher.dispatch_sync("suggestion_analysis", [(2, request("email 1"))], cache=False)
+        assert outcome["cache"] == "bypass"
+        assert len(fake_openai_server.requests) == 2
+
+    def test_failures_are_not_cached(self, dispatcher, fake_openai_server):
+        fake_openai_server.fail_next(1, 400, {})
+        dispatcher.dispatch_sync("suggestion_analysis", [(1, request("email 1"))])
+        [outcome] = dispatcher.dispatch_sync("suggestion_analysis", [(2, request("email 1"))])
+        assert outcome["success"] and outcome["cache"] == "miss"
+
+
+class TestExpiryAndEviction:
+    def response(self, size=10):
+        return {"content": "x" * size, "usage": {"prompt_tokens": 5, "completion_tokens": 1}, "model": "m"}
+
+    def test_expired_entries_miss(self, db_path):
+        cache = LLMResponseCache(db_path)
+        cache.put(request("old"), self.response(), ttl_seconds=-1)
+        cache.put(request("new"), self.response())
+        assert cache.get(request("old")) is None
+        assert cache.get(request("new"))["content"] == "x" * 10
+        assert cache.prune() == 1
+
+    def test_least_recently_used_evicted_past_bounds(self, db_path):
+        cache = LLMResponseCache(db_path, max_entries=3)
+        for n in range(5):
+            cache.put(request(f"email {n}"), self.response())
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE llm_response_cache SET created_at = datetime('now', '-1 hour')")
+        conn.commit()
+        conn.close()
+        cache.get(request("email 0"))  # recently used again
+
+        assert cache.prune() == 2
+        assert cache.get(request("email 0")) is not None
+        assert cache.stats()["persisted"]["entries"] == 3
+
+        cache.max_bytes = 250  # room for about two entries
+        cache.prune()
+        assert cache.stats()["persisted"]["entries"] <= 2
+        assert cache.get(request("email 0")) is not None
+
+
+def test_analyzer_logs_hit_and_saving(db_path, fake_openai_server):
+    fake_openai_server.responder = lambda req: json.dumps({"links": []})
+    analyzer = GPTSuggestionAnalyzer(db_path=db_path)
+    email = {"email_id": 3, "subject": "hi", "body": "unchanged"}
+
+    results = []
+    for use_cache in (True, True, False):
+        results.append(analyzer.analyze_email(email, "## Business\nBensley", use_cache=use_cache))
+        analyzer.dispatcher.mark_applied([results[-1]["job_id"]])
+    first, second, fresh = results
+    assert len(fake_openai_server.requests) == 2
+
+    conn = sqlite3.connect(db_path)
+    for result in (first, second, fresh):
+        usage = result["usage"]
+        GPTUsageTracker(conn).log_usage(
+            request_type="suggestion_analysis", model=usage["model"],
+            input_tokens=usage["input_tokens"], output_tokens=usage["output_tokens"],
+            estimated_cost=usage["estimated_cost_usd"], email_ids=[3],
+            processing_time_ms=usage["processing_time_ms"],
+            response_cache=usage["response_cache"], response_cache_saved=usage["response_cache_saved_usd"],
+        )
+    rows = conn.execute(
+        "SELECT response_cache, estimated_cost_usd, response_cache_saved_usd FROM gpt_usage_log ORDER BY log_id"
+    ).fetchall()
+    conn.close()
+
+    assert [r[0] for r in rows] == ["miss", "hit", "bypass"]
+    assert rows[1][1] == 0 and rows[1][2] == pytest.approx(rows[0][1])
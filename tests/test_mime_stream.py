@@ -0,0 +1,131 @@
+"""
+Streaming MIME parser tests - results match the stdlib parser for any
+chunking, attachments land on disk hashed, and the importer stores
+identical attachments once.
+"""
+
+import hashlib
+import os
+import sqlite3
+from email.message import EmailMessage
+from email.mime.application import MIMEApplication
+from email.mime.message import MIMEMessage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from pathlib import Path
+
+import pytest
+
+from backend.services.mime_stream import parse_bytes
+
+MIGRATION = Path(__file__).parent.parent / "database" / "migrations" / "108_attachment_content_hash.sql"
+
+
+def drawing_email(n, payload, crlf=True):
+    msg = MIMEMultipart("mixed")
+    msg["Message-ID"] = f"<msg-{n}@example.com>"
+    msg["Subject"] = f"Drawings {n}"
+    msg["Date"] = "Mon, 05 Jan 2026 10:00:00 +0700"
+    body = MIMEMultipart("alternative")
+    # Lines that look like delimiters but are not
+    body.attach(MIMEText("Please see attached.\n-- \nBill\n--not-a-boundary", "plain"))
+    body.attach(MIMEText("<p>Please see attached.</p>", "html"))
+    msg.attach(body)
+    part = MIMEApplication(payload, "pdf")
+    part.add_header("Content-Disposition", "attachment", filename="Site Plan.pdf")
+    msg.attach(part)
+    raw = msg.as_bytes()
+    return raw.replace(b"\n", b"\r\n") if crlf else raw
+
+
+class TestStreamingMimeParser:
+    @pytest.mark.parametrize("chunk_size", [1, 3, 76, 4096, 1 << 20])
+    @pytest.mark.parametrize("crlf", [True, False])
+    def test_matches_stdlib_for_any_chunking(self, tmp_path, chunk_size, crlf):
+        payload = os.urandom(20000)
+        raw = drawing_email(1, payload, crlf)
+
+        with parse_bytes(raw, spool_dir=str(tmp_path), chunk_size=chunk_size) as parsed:
+            assert parsed.headers["Subject"] == "Drawings 1"
+            assert parsed.text.replace("\r\n", "\n") == "Please see attached.\n-- \nBill\n--not-a-boundary"
+            assert parsed.html == "<p>Please see attached.</p>"
+
+            [att] = parsed.attachments
+            assert att.filename == "Site Plan.pdf"
+            assert att.mime_type == "application/pdf"
+            assert att.size == len(payload)
+            assert att.sha256 == hashlib.sha256(payload).hexdigest()
+            assert Path(att.path).read_bytes() == payload
+
+        # Unclaimed spool files are removed
+        assert os.listdir(tmp_path) == []
+
+    def test_quoted_printable_and_forwarded_attachments(self, tmp_path):
+        outer = EmailMessage()
+        outer["Subject"] = "Fwd: contract"
+        outer.set_content("Fee = 1,000,000 THB café " * 40, cte="quoted-printable")
+        outer.make_mixed()
+
+        forwarded = MIMEMultipart()
+        forwarded["Subject"] = "contract"
+        contract = MIMEApplication(b"%PDF contract", "pdf")
+        contract.add_header("Content-Disposition", "attachment", filename="contract.pdf")
+        forwarded.attach(contract)
+        outer.attach(MIMEMessage(forwarded))
+        assert b"=C3=A9" in outer.as_bytes()
+
+        with parse_bytes(outer.as_bytes(), spool_dir=str(tmp_path), chunk_size=7) as parsed:
+            assert parsed.text.rstrip("\n") == "Fee = 1,000,000 THB café " * 40
+            assert parsed.headers["Subject"] == "Fwd: contract"
+            assert [a.filename for a in parsed.attachments] == ["contract.pdf"]
+
+    def test_body_falls_back_to_stripped_html(self):
+        msg = MIMEMultipart("alternative")
+        msg.attach(MIMEText("<style>p {}</style><p>Hello&nbsp;there</p>", "html"))
+        parsed = parse_bytes(msg.as_bytes(), spool_attachments=False)
+        assert parsed.body == "Hello there"
+        assert parsed.attachments == []
+
+
+class TestImporterDedup:
+    def test_identical_attachments_stored_once(self, tmp_path, monkeypatch, fake_imap):
+        from backend.services.email_importer import EmailImporter
+
+        db_path = tmp_path / "import.db"
+        conn = sqlite3.connect(db_path)
+        conn.executescript("""
+            CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+            CREATE TABLE emails (email_id INTEGER PRIMARY KEY, message_id TEXT UNIQUE, sender_email TEXT,
+                recipient_emails TEXT, subject TEXT, snippet TEXT, body_full TEXT, date TEXT,
+                date_normalized TEXT, processed INTEGER, has_attachments INTEGER, folder TEXT);
+            CREATE TABLE attachments (attachment_id INTEGER PRIMARY KEY, email_id INTEGER, filename TEXT,
+                file_type TEXT, file_size INTEGER, mime_type TEXT, stored_path TEXT, category TEXT);
+        """)
+        for name in ("106_email_sync_state.sql", "108_attachment_content_hash.sql", "109_blob_store.sql"):
+            conn.executescript((MIGRATION.parent / name).read_text())
+        conn.close()
+
+        monkeypatch.setenv("DATABASE_PATH", str(db_path))
+        monkeypatch.setenv("BLOB_STORE_DIR", str(tmp_path / "blobs"))
+
+        contract = os.urandom(120000)
+        importer = EmailImporter()
+        importer.imap = fake_imap({1: drawing_email(1, contract), 2: drawing_email(2, contract),
+                                   3: drawing_email(3, os.urandom(60000))})
+
+        assert importer.import_emails("INBOX") == 3
+
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT email_id, stored_path, content_hash FROM attachments ORDER BY email_id").fetchall()
+        blobs = conn.execute("SELECT sha256, ref_count FROM blobs ORDER BY ref_count DESC").fetchall()
+        conn.close()
+
+        assert len(rows) == 3
+        assert rows[0][1] == rows[1][1]
+        assert rows[0][2] == hashlib.sha256(contract).hexdigest()
+        assert Path(rows[0][1]).read_bytes() == contract
+        assert rows[2][1] != rows[0][1]
+        assert blobs[0] == (rows[0][2], 2) and blobs[1][1] == 1
+
+        assert len([p for p in (tmp_path / "blobs").rglob("*") if p.is_file()]) == 2
+        assert os.listdir(tmp_path / "blobs" / ".spool") == []
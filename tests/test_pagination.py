@@ -0,0 +1,187 @@
+"""
+Pagination tests - keyset cursors walk a list in the same order as
+ORDER BY/OFFSET (NULL sort values included) without skipping or repeating
+rows, deep pages seek an index instead of scanning, and totals are counted
+once per data version instead of once per page.
+"""
+
+import sqlite3
+
+import pytest
+
+from services.document_service import DocumentService
+from services.email_service import EmailService
+from services.pagination import clear_count_cache, keyset_page
+
+@pytest.fixture
+def db_path(migrated_db):
+    clear_count_cache()
+
+    def seed(conn):
+        # 60 emails: dates tie in threes, every tenth has no date
+        for n in range(1, 61):
+            date = None if n % 10 == 0 else f"2025-02-{(n + 2) // 3:02d} 10:00:00"
+            conn.execute("INSERT INTO emails (email_id, subject, sender_email, date, inbox_category) "
+                         "VALUES (?, ?, ?, ?, ?)",
+                         (n, f"Email {n}", f"sender{n % 7}@x.com", date, "projects" if n % 2 else "general"))
+            conn.execute("INSERT INTO email_content (email_id, category) VALUES (?, ?)",
+                         (n, "design" if n % 3 else "contract"))
+        for n in range(1, 26):
+            conn.execute("INSERT INTO documents (document_id, file_name, modified_date) VALUES (?, ?, ?)",
+                         (n, f"doc{n}.pdf", None if n % 8 == 0 else f"2025-01-{n % 5 + 1:02d}"))
+
+    return migrated_db("""
+        CREATE TABLE proposals (proposal_id INTEGER PRIMARY KEY, project_code TEXT, is_active_project INTEGER);
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, subject TEXT, sender_email TEXT, date DATETIME, snippet TEXT,
+            inbox_source TEXT, inbox_category TEXT
+        );
+        CREATE INDEX idx_emails_date ON emails(date);
+        CREATE TABLE email_content (
+            email_id INTEGER PRIMARY KEY, category TEXT, subcategory TEXT, importance_score REAL,
+            ai_summary TEXT
+        );
+        CREATE TABLE email_proposal_links (email_id INTEGER, proposal_id INTEGER, created_at TEXT);
+        CREATE TABLE email_project_links (email_id INTEGER, project_id INTEGER);
+        CREATE TABLE ai_suggestions (
+            suggestion_id INTEGER PRIMARY KEY, status TEXT, confidence_score REAL
+        );
+        CREATE TABLE documents (
+            document_id INTEGER PRIMARY KEY, file_name TEXT, file_path TEXT, document_type TEXT,
+            file_size INTEGER, modified_date TEXT, project_code TEXT
+        );
+        CREATE INDEX idx_documents_modified ON documents(modified_date);
+    """, ["112_query_cache_data_versions.sql", "119_keyset_pagination.sql"], seed=seed)
+
+
+@pytest.fixture
+def emails(db_path):
+    return EmailService(db_path)
+
+
+def offset_order(db_path, column, descending, where="1=1"):
+    """Reference order: what ORDER BY ... LIMIT/OFFSET would page through"""
+    direction = "DESC" if descending else "ASC"
+    conn = sqlite3.connect(db_path)
+    ids = [r[0] for r in conn.execute(
+        f"SELECT email_id FROM emails e WHERE {where} "
+        f"ORDER BY {column} IS NULL {'ASC' if descending else 'DESC'}, {column} {direction}, email_id {direction}"
+    )]
+    conn.close()
+    return ids
+
+
+def walk(service_call, **kwargs):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = service_call(cursor=cursor, **kwargs)
+        ids.extend(item["email_id"] if "email_id" in item else item["document_id"] for item in page["items"])
+        pages += 1
+        if not page["has_more"]:
+            return ids, pages
+        cursor = page["next_cursor"]
+
+
+@pytest.mark.parametrize("sort_by,sort_order", [
+    ("date", "DESC"), ("date", "ASC"), ("sender_email", "DESC"), ("email_id", "ASC"),
+])
+def test_cursor_walk_matches_offset_order(emails, db_path, sort_by, sort_order):
+    ids, pages = walk(emails.get_all_emails, per_page=7, sort_by=sort_by, sort_order=sort_order)
+    assert ids == offset_order(db_path, sort_by, sort_order == "DESC")
+    assert pages == 9
+
+    # Page numbers still work and land on the same rows
+    page_4 = emails.get_all_emails(page=4, per_page=7, sort_by=sort_by, sort_order=sort_order)
+    assert [e["email_id"] for e in page_4["items"]] == ids[21:28]
+
+
+def test_filters_and_page_across_null_dates(emails, db_path):
+    ids, _ = walk(emails.get_all_emails, per_page=4, category="contract")
+    assert ids == offset_order(db_path, "date", True,
+                               "email_id IN (SELECT email_id FROM email_content WHERE category = 'contract')")
+    # The last page mixes dated rows with the NULL-date tail
+    last = emails.get_all_emails(page=5, per_page=4, category="contract")
+    assert [e["date"] is None for e in last["items"]] == [False, False, True, True]
+
+
+def test_bad_cursor(emails):
+    first = emails.get_all_emails(per_page=5, sort_by="date")
+    with pytest.raises(ValueError):
+        emails.get_all_emails(per_page=5, sort_by="subject", cursor=first["next_cursor"])
+    with pytest.raises(ValueError):
+        emails.get_all_emails(per_page=5, cursor="garbage")
+
+
+def test_deep_page_seeks_the_index(db_path, emails):
+    deep = emails.get_all_emails(page=7, per_page=7)["items"][-1]
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    statements = []
+    conn.set_trace_callback(statements.append)
+    cursor = emails.get_all_emails(page=7, per_page=7)["next_cursor"]
+    keyset_page(conn, "SELECT e.email_id, e.date FROM emails e WHERE 1=1", (),
+                sort_column="date", id_column="email_id", cursor=cursor, per_page=7)
+    conn.set_trace_callback(None)
+    plan = " | ".join(r[-1] for r in conn.execute(f"EXPLAIN QUERY PLAN {statements[0]}"))
+    conn.close()
+    assert deep["date"] in statements[0] and "OFFSET 0" in statements[0]
+    assert "idx_emails_date" in plan and "TEMP B-TREE" not in plan
+
+
+def test_total_is_counted_once_per_data_version(db_path, emails):
+    counts = []
+    original = emails.get_connection
+
+    def traced():
+        context = original()
+        conn = context.__enter__()
+        conn.set_trace_callback(lambda sql: counts.append(sql) if "COUNT(*)" in sql else None)
+        return _Wrapped(context, conn)
+
+    emails.get_connection = traced
+    first = emails.get_all_emails(per_page=10, category="design")
+    emails.get_all_emails(per_page=10, category="design", cursor=first["next_cursor"])
+    emails.get_all_emails(page=3, per_page=10, category="design")
+    assert len(counts) == 1 and first["total"] == 40 and not first["total_estimated"]
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE email_content SET category = 'design' WHERE email_id = 3")
+    conn.commit()
+    conn.close()
+    assert emails.get_all_emails(per_page=10, category="design")["total"] == 41
+    assert len(counts) == 2
+
+
+def test_unfiltered_total_uses_analyze_estimate(db_path, emails):
+    assert emails.get_all_emails(per_page=10)["total_estimated"] is False  # never analyzed
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+    result = emails.get_all_emails(per_page=10)
+    assert result["total"] == 60 and result["total_estimated"] is True
+    assert emails.get_all_emails(per_page=10, inbox_category="projects")["total_estimated"] is False
+
+
+def test_documents_page_by_modified_date(db_path):
+    documents = DocumentService(db_path)
+    ids, pages = walk(documents.get_all_documents, per_page=6)
+    conn = sqlite3.connect(db_path)
+    expected = [r[0] for r in conn.execute(
+        "SELECT document_id FROM documents ORDER BY modified_date IS NULL, modified_date DESC, document_id DESC")]
+    conn.close()
+    assert ids == expected and pages == 5
+    assert documents.get_all_documents(limit=6)["total"] == 25
+
+
+class _Wrapped:
+    def __init__(self, context, conn):
+        self.context, self.conn = context, conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, *exc):
+        self.conn.set_trace_callback(None)
+        return self.context.__exit__(*exc)
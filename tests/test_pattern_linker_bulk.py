@@ -0,0 +1,148 @@
+"""
+PatternFirstLinker bulk mode tests - the set-based process_batch must make
+the same links, category updates, usage counts and review suggestions as the
+row-by-row mode.
+"""
+
+import sqlite3
+
+import pytest
+
+from services.pattern_first_linker import PatternFirstLinker
+
+SCHEMA = """
+    CREATE TABLE emails (
+        email_id INTEGER PRIMARY KEY, sender_email TEXT, recipient_emails TEXT, subject TEXT,
+        body_full TEXT, body_preview TEXT, date TEXT, folder TEXT, thread_id TEXT,
+        primary_category TEXT
+    );
+    CREATE TABLE proposals (proposal_id INTEGER PRIMARY KEY, project_code TEXT, project_name TEXT);
+    CREATE TABLE projects (project_id INTEGER PRIMARY KEY, project_code TEXT, project_title TEXT);
+    CREATE TABLE email_proposal_links (
+        email_id INTEGER, proposal_id INTEGER, confidence_score REAL, match_method TEXT,
+        created_at TEXT, needs_review INTEGER, UNIQUE(email_id, proposal_id)
+    );
+    CREATE TABLE email_project_links (
+        email_id INTEGER, project_id INTEGER, confidence REAL, link_method TEXT,
+        created_at TEXT, needs_review INTEGER, UNIQUE(email_id, project_id)
+    );
+    CREATE TABLE email_learned_patterns (
+        pattern_id INTEGER PRIMARY KEY, pattern_type TEXT, pattern_key TEXT,
+        pattern_key_normalized TEXT, target_type TEXT, target_id INTEGER, target_code TEXT,
+        target_name TEXT, confidence REAL, is_active INTEGER DEFAULT 1,
+        times_used INTEGER DEFAULT 0, last_used_at TEXT, updated_at TEXT
+    );
+    CREATE TABLE ai_suggestions (
+        suggestion_id INTEGER PRIMARY KEY, source_type TEXT, source_id INTEGER,
+        suggestion_type TEXT, title TEXT, description TEXT, suggested_data TEXT,
+        confidence_score REAL, project_code TEXT, proposal_id INTEGER, status TEXT, created_at TEXT
+    );
+
+    INSERT INTO proposals VALUES (1, '25 BK-001', 'Marina Resort'), (2, '25 BK-002', 'Hill Villas');
+    INSERT INTO projects VALUES (10, '24 BK-010', 'Desert Camp');
+
+    INSERT INTO email_learned_patterns
+        (pattern_id, pattern_type, pattern_key, target_type, target_id, target_code, target_name, confidence)
+    VALUES
+        (1, 'sender_to_proposal', 'ann@marina.com', 'proposal', 1, '25 BK-001', 'Marina Resort', 0.9),
+        (2, 'domain_to_project', 'desert.ae', 'project', 10, '24 BK-010', 'Desert Camp', 0.97),
+        (3, 'keyword_to_proposal', 'hill villas', 'proposal', 2, '25 BK-002', 'Hill Villas', 0.8);
+
+    -- Thread t1 already has a linked email
+    INSERT INTO emails (email_id, sender_email, subject, date, thread_id) VALUES
+        (1, 'old@client.com', 'Kickoff', '2020-01-01', 't1');
+    INSERT INTO email_proposal_links (email_id, proposal_id) VALUES (1, 2);
+
+    INSERT INTO emails (email_id, sender_email, subject, body_full, date, thread_id) VALUES
+        (2, 'someone@client.com', 'Re: Kickoff', '', '2099-01-01', 't1'),
+        (3, 'Ann <ann@marina.com>', 'Drawings', '', '2099-01-02', 't2'),
+        (4, 'bob@other.com', 'Re: Drawings', '', '2099-01-03', 't2'),
+        (5, 'sam@desert.ae', 'Site visit', '', '2099-01-04', NULL),
+        (6, 'x@y.com', 'Update on [25 BK-001]', '', '2099-01-05', NULL),
+        (7, 'x@y.com', 'Photos', 'Hill Villas terrace photos', '2099-01-06', NULL),
+        (8, 'noreply@zoom.us', 'Your meeting', '', '2099-01-07', NULL),
+        (9, 'who@unknown.com', 'Hello', 'nothing here', '2099-01-08', NULL),
+        (10, 'ann@marina.com', 'Again', '', '2099-01-09', NULL);
+"""
+
+EMAIL_IDS = list(range(2, 11))
+
+
+def _make_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def _snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    snapshot = {
+        "proposal_links": conn.execute(
+            "SELECT email_id, proposal_id, confidence_score, match_method, needs_review "
+            "FROM email_proposal_links ORDER BY email_id").fetchall(),
+        "project_links": conn.execute(
+            "SELECT email_id, project_id, confidence, link_method, needs_review "
+            "FROM email_project_links ORDER BY email_id").fetchall(),
+        "categories": conn.execute(
+            "SELECT email_id, primary_category FROM emails ORDER BY email_id").fetchall(),
+        "usage": conn.execute(
+            "SELECT pattern_id, times_used FROM email_learned_patterns ORDER BY pattern_id").fetchall(),
+        "suggestions": conn.execute(
+            "SELECT source_id, suggestion_type, title, suggested_data, project_code, proposal_id "
+            "FROM ai_suggestions ORDER BY source_id").fetchall(),
+    }
+    conn.close()
+    return snapshot
+
+
+@pytest.fixture
+def linker_dbs(tmp_path):
+    return _make_db(tmp_path / "rows.db"), _make_db(tmp_path / "bulk.db")
+
+
+class TestBulkProcessBatch:
+    def test_bulk_matches_row_by_row(self, linker_dbs):
+        rows_db, bulk_db = linker_dbs
+
+        row_result = PatternFirstLinker(rows_db).process_batch(EMAIL_IDS)
+        bulk_result = PatternFirstLinker(bulk_db).process_batch(EMAIL_IDS, bulk=True)
+
+        timings = bulk_result.pop("timings")
+        assert set(timings) == {"fetch", "prefetch", "match", "write"}
+        assert bulk_result == row_result
+        assert _snapshot(bulk_db) == _snapshot(rows_db)
+
+    def test_bulk_decisions(self, linker_dbs):
+        _, bulk_db = linker_dbs
+        result = PatternFirstLinker(bulk_db).process_batch(EMAIL_IDS, bulk=True)
+
+        assert result["auto_linked"] == 7
+        assert result["links_applied"] == 7
+        assert result["skipped_spam"] == 1
+        assert result["needs_gpt_ids"] == [9]
+
+        links = {r[0]: r[1:] for r in _snapshot(bulk_db)["proposal_links"]}
+        assert links[2][2] == "thread_inheritance"       # existing thread link
+        assert links[4][2] == "thread_inheritance"       # inherits email 3's link from this batch
+        assert links[6][2] == "project_code_in_subject"
+        assert links[7][2] == "keyword_to_proposal"
+
+        usage = dict(_snapshot(bulk_db)["usage"])
+        assert usage == {1: 2, 2: 1, 3: 1}
+
+    def test_existing_review_suggestion_not_duplicated(self, linker_dbs):
+        _, bulk_db = linker_dbs
+        conn = sqlite3.connect(bulk_db)
+        conn.execute("""
+            INSERT INTO ai_suggestions (source_id, suggestion_type, project_code, status)
+            VALUES (3, 'email_link', '25 BK-001', 'pending')
+        """)
+        conn.commit()
+        conn.close()
+
+        PatternFirstLinker(bulk_db).process_batch(EMAIL_IDS, bulk=True)
+
+        suggestions = _snapshot(bulk_db)["suggestions"]
+        assert [s[0] for s in suggestions if s[1] == "link_review"] == [7, 10]
@@ -0,0 +1,161 @@
+"""
+Prompt context tests - the context bundle is versioned by content, its
+formatted prompt is built once per version, the system prompt is identical
+for every email (prefix-cacheable), and each email carries only the
+proposals it plausibly matches, with before/after usage logged.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from services.context_bundler import ContextBundler, normalize_project_code
+from services.gpt_suggestion_analyzer import GPTSuggestionAnalyzer, GPTUsageTracker
+
+MIGRATIONS = Path(__file__).parent.parent / "database" / "migrations"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "context.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE proposals (
+            proposal_id INTEGER PRIMARY KEY, project_code TEXT, project_name TEXT, client_company TEXT,
+            country TEXT, status TEXT, health_score REAL, days_since_contact INTEGER,
+            project_value REAL, phase TEXT
+        );
+        CREATE TABLE emails (email_id INTEGER PRIMARY KEY, sender_email TEXT, date TEXT);
+        CREATE TABLE email_proposal_links (email_id INTEGER, proposal_id INTEGER, confidence_score REAL);
+        CREATE TABLE email_learned_patterns (
+            pattern_type TEXT, pattern_key TEXT, pattern_key_normalized TEXT, target_type TEXT,
+            target_code TEXT, target_name TEXT, confidence REAL, times_correct INTEGER, is_active INTEGER
+        );
+        CREATE TABLE contact_context (email TEXT, is_multi_project INTEGER, email_handling_preference TEXT,
+                                      relationship_type TEXT, role TEXT, context_notes TEXT, confidence REAL);
+        CREATE TABLE gpt_usage_log (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT, request_type TEXT NOT NULL,
+            model TEXT NOT NULL DEFAULT 'gpt-4o-mini', input_tokens INTEGER, output_tokens INTEGER,
+            estimated_cost_usd REAL, email_ids TEXT, batch_size INTEGER DEFAULT 1,
+            processing_time_ms INTEGER, success INTEGER DEFAULT 1, error_message TEXT,
+            created_at TEXT DEFAULT (datetime('now'))
+        );
+        INSERT INTO email_learned_patterns VALUES
+            ('domain_to_proposal', '@bdlbali.com', 'bdlbali.com', 'proposal', '25 BK-033', 'Ubud Retreat',
+             0.9, 5, 1);
+    """)
+    conn.executemany(
+        "INSERT INTO proposals VALUES (?, ?, ?, ?, ?, 'proposal', NULL, NULL, NULL, NULL)",
+        [(1, '25 BK-033', 'Ubud Retreat', 'BDL Bali', 'Indonesia'),
+         (2, '24 BK-089', 'Marina Resort', 'Capella Hotels', 'Vietnam'),
+         (3, '25 BK-101', 'Kyoto Ryokan', 'Hoshino Group', 'Japan')] +
+        [(10 + n, f'25 BK-2{n:02d}', f'Resort Number {n}', f'Client {n}', 'Thailand') for n in range(40)]
+    )
+    conn.executescript((MIGRATIONS / "113_gpt_usage_prompt_savings.sql").read_text())
+    conn.executescript((MIGRATIONS / "114_llm_jobs.sql").read_text())
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def analyzer(db_path, fake_openai_server):
+    fake_openai_server.responder = lambda request: json.dumps({"links": []})
+    # The provider caches the shared system prompt after the first request
+    fake_openai_server.cached_tokens = lambda request: 200 if len(fake_openai_server.requests) > 1 else 0
+    return GPTSuggestionAnalyzer(db_path=db_path)
+
+
+def test_normalize_project_code():
+    assert normalize_project_code("re: 25BK033 drawings") == "25 BK-033"
+    assert normalize_project_code("24 bk-89") == "24 BK-089"
+    assert normalize_project_code("no code") is None
+
+
+class TestBundleVersion:
+    def test_version_tracks_content_and_prompt_is_memoized(self, db_path):
+        bundler = ContextBundler(db_path)
+        first = bundler.get_prompt_context()
+        assert bundler.get_bundle(force_refresh=True)["version"] == first.version
+        assert bundler.get_prompt_context() is first
+        assert "## Active Proposals" in bundler.format_for_prompt()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE proposals SET status = 'negotiation' WHERE proposal_id = 2")
+        conn.commit()
+        conn.close()
+        assert bundler.get_bundle(force_refresh=True)["version"] != first.version
+        assert bundler.get_prompt_context() is not first
+
+
+class TestCandidateProposals:
+    @pytest.fixture
+    def context(self, db_path):
+        return ContextBundler(db_path).get_prompt_context()
+
+    def codes(self, context, **email):
+        return [p["project_code"] for p in context.candidate_proposals(email)]
+
+    def test_code_in_subject(self, context):
+        assert self.codes(context, subject="25BK101 - revised fee", body="")[0] == "25 BK-101"
+
+    def test_mapped_sender_domain(self, context):
+        assert self.codes(context, sender_email="wayan@bdlbali.com", subject="site visit") == ["25 BK-033"]
+
+    def test_name_words(self, context):
+        assert self.codes(context, subject="Marina drawings", body="Capella team comments") == ["24 BK-089"]
+
+    def test_unrelated_email_gets_none(self, context):
+        assert self.codes(context, sender_email="news@vendor.com", subject="Newsletter", body="hello") == []
+
+
+class TestAnalyzer:
+    def test_stable_system_prompt_and_narrowed_proposals(self, db_path, analyzer, fake_openai_server):
+        context = ContextBundler(db_path).get_prompt_context()
+        first = analyzer.analyze_email(
+            {"email_id": 1, "sender_email": "wayan@bdlbali.com", "subject": "site visit", "body": "Tuesday"},
+            context)
+        second = analyzer.analyze_email(
+            {"email_id": 2, "sender_email": "a@capella.com", "subject": "Marina Resort", "body": ""},
+            context)
+
+        (system_1, user_1), (system_2, user_2) = [r["messages"] for r in fake_openai_server.requests]
+        assert system_1 == system_2  # same prefix for every email of this bundle version
+        assert "Resort Number 7" not in system_1["content"]
+        assert "25 BK-033: Ubud Retreat" in user_1["content"]
+        assert "24 BK-089" not in user_1["content"] and "24 BK-089" in user_2["content"]
+
+        usage = second["usage"]
+        assert usage["candidate_proposals"] == 1 and usage["cached_input_tokens"] == 200
+        assert usage["baseline_input_tokens"] > usage["input_tokens"]
+        assert usage["baseline_cost_usd"] > usage["estimated_cost_usd"]
+        assert usage["context_version"] == context.version
+        assert first["usage"]["cached_input_tokens"] == 0
+
+    def test_context_string_still_accepted(self, db_path, analyzer, fake_openai_server):
+        text = ContextBundler(db_path).format_for_prompt()
+        result = analyzer.analyze_email({"email_id": 1, "subject": "hi", "body": ""}, text)
+        assert result["success"]
+        assert "Resort Number 7" in fake_openai_server.requests[0]["messages"][0]["content"]
+        assert result["usage"]["context_version"] is None
+
+    def test_usage_logged_with_baseline(self, db_path, analyzer):
+        context = ContextBundler(db_path).get_prompt_context()
+        usage = analyzer.analyze_email({"email_id": 5, "subject": "25 BK-101", "body": ""}, context)["usage"]
+
+        conn = sqlite3.connect(db_path)
+        GPTUsageTracker(conn).log_usage(
+            request_type="suggestion_analysis", model=usage["model"],
+            input_tokens=usage["input_tokens"], output_tokens=usage["output_tokens"],
+            estimated_cost=usage["estimated_cost_usd"], email_ids=[5],
+            processing_time_ms=usage["processing_time_ms"],
+            cached_input_tokens=usage["cached_input_tokens"],
+            baseline_input_tokens=usage["baseline_input_tokens"],
+            baseline_cost=usage["baseline_cost_usd"], context_version=usage["context_version"],
+        )
+        row = conn.execute("SELECT input_tokens, baseline_input_tokens, context_version FROM gpt_usage_log").fetchone()
+        conn.close()
+        assert row == (usage["input_tokens"], usage["baseline_input_tokens"], context.version)
@@ -0,0 +1,177 @@
+"""
+Query cache tests - repeated questions reuse their SQL (across restarts),
+results are reused until a table they read changes, and the savings show up
+in the query stats.
+"""
+
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from services.query_cache import QueryCache, normalize_question
+
+
+@pytest.fixture
+def db_path(migrated_db, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    return migrated_db("""
+        CREATE TABLE projects (project_id INTEGER PRIMARY KEY, project_code TEXT, project_title TEXT,
+                               total_fee_usd REAL);
+        CREATE TABLE proposals (proposal_id INTEGER PRIMARY KEY, project_code TEXT, status TEXT);
+        CREATE TABLE invoices (invoice_id INTEGER PRIMARY KEY, project_code TEXT, invoice_amount REAL,
+                               payment_amount REAL, status TEXT);
+        CREATE TABLE project_fee_breakdown (breakdown_id INTEGER PRIMARY KEY, project_code TEXT);
+        CREATE TABLE project_milestones (milestone_id INTEGER PRIMARY KEY, status TEXT);
+        CREATE TABLE rfis (rfi_id INTEGER PRIMARY KEY, status TEXT);
+        CREATE TABLE emails (email_id INTEGER PRIMARY KEY, subject TEXT);
+        CREATE TABLE email_proposal_links (email_id INTEGER, proposal_id INTEGER);
+        CREATE TABLE email_project_links (email_id INTEGER, project_id INTEGER);
+        CREATE TABLE untracked_notes (note_id INTEGER PRIMARY KEY, body TEXT);
+        CREATE TABLE training_feedback (
+            feedback_id INTEGER PRIMARY KEY, email_id INTEGER, field_name TEXT, original_value TEXT,
+            corrected_value TEXT, feedback_type TEXT, status TEXT, corrected_by TEXT,
+            correction_reason TEXT, incorporated INTEGER, created_at TEXT
+        );
+        CREATE TABLE learned_patterns (
+            pattern_id INTEGER PRIMARY KEY, pattern_name TEXT, pattern_type TEXT, condition TEXT,
+            action TEXT, confidence_score REAL, is_active INTEGER
+        );
+        INSERT INTO projects VALUES (1, '24 BK-089', 'Marina Resort', 1000000);
+        INSERT INTO invoices VALUES (1, '24 BK-089', 50000, 20000, 'partial'),
+                                    (2, '24 BK-089', 30000, 0, 'outstanding');
+        INSERT INTO untracked_notes VALUES (1, 'hello');
+    """, ["111_query_governor_log.sql", "112_query_cache_data_versions.sql"])
+
+
+OUTSTANDING_SQL = """
+    SELECT project_code, SUM(invoice_amount - COALESCE(payment_amount, 0)) AS outstanding
+    FROM invoices WHERE project_code = '24 BK-089' GROUP BY project_code
+"""
+
+
+class FakeOpenAI:
+    """Records chat.completions calls; answers SQL prompts with OUTSTANDING_SQL"""
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls.append(model)
+        if kwargs.get('response_format'):
+            content = json.dumps({'sql': OUTSTANDING_SQL, 'reasoning': 'sum balances',
+                                  'tables_used': ['invoices'], 'confidence': 90})
+        else:
+            content = "24 BK-089 has $60,000 outstanding."
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=4000, completion_tokens=100),
+        )
+
+
+def make_query_service(db_path):
+    from services.query_service import QueryService
+    service = QueryService(db_path)
+    service.ai_enabled = True
+    service.client = FakeOpenAI()
+    return service
+
+
+def execute(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+class TestNormalization:
+    def test_equivalent_questions_share_a_key(self):
+        assert normalize_question("What's outstanding on 24 BK-089?") == \
+            normalize_question("  what's   OUTSTANDING on 24 bk-089 ")
+        assert normalize_question("Fees for 24 BK-089") != normalize_question("Fees for 24 BK-098")
+
+
+class TestSqlCache:
+    def test_lru_and_persisted_backing(self, db_path):
+        cache = QueryCache(db_path, sql_cache_size=2)
+        for n in range(3):
+            cache.put_sql(f"question {n}", 'ai', {'sql': f"SELECT {n}", 'generation_ms': 800,
+                                                  'generation_cost_usd': 0.01})
+        assert cache.stats()['sql_entries_in_memory'] == 2
+
+        # Evicted from memory, still found in query_sql_cache; survives a restart
+        assert QueryCache(db_path).get_sql("Question 0?", 'ai')['sql'] == "SELECT 0"
+        assert cache.get_sql("question 0", 'ai')['sql'] == "SELECT 0"
+        assert cache.get_sql("question 0", 'patterns:abc') is None
+
+        stats = cache.stats()
+        assert (stats['sql_hits'], stats['sql_persisted_hits'], stats['sql_misses']) == (1, 1, 1)
+        assert stats['saved_llm_ms'] == 800 and stats['saved_cost_usd'] == 0.01
+        assert stats['persisted']['hits'] == 2
+
+    def test_schema_change_invalidates(self, db_path):
+        cache = QueryCache(db_path)
+        cache.put_sql("how many notes", 'ai', {'sql': "SELECT COUNT(*) FROM untracked_notes"})
+        execute(db_path, "ALTER TABLE untracked_notes ADD COLUMN author TEXT")
+        assert cache.get_sql("how many notes", 'ai') is None
+
+    def test_invalidate_question(self, db_path):
+        cache = QueryCache(db_path)
+        cache.put_sql("how many notes", 'ai', {'sql': "SELECT 1"})
+        cache.put_sql("how many notes", 'patterns:x', {'sql': "SELECT 2"})
+        assert cache.invalidate_question("How many notes?") == 2
+        assert cache.get_sql("how many notes", 'ai') is None
+
+
+class TestResultCache:
+    def test_invalidated_when_a_read_table_changes(self, db_path):
+        cache = QueryCache(db_path)
+        cache.put_results(OUTSTANDING_SQL, [{'outstanding': 60000}], ['invoices'], query_ms=12)
+        assert cache.get_results(OUTSTANDING_SQL) == [{'outstanding': 60000}]
+
+        execute(db_path, "UPDATE proposals SET status = 'x'")  # not read by the query
+        assert cache.get_results(OUTSTANDING_SQL) is not None
+
+        execute(db_path, "UPDATE invoices SET payment_amount = 30000 WHERE invoice_id = 2")
+        assert cache.get_results(OUTSTANDING_SQL) is None
+
+    def test_untracked_tables_are_not_cached(self, db_path):
+        cache = QueryCache(db_path)
+        cache.put_results("SELECT * FROM untracked_notes", [{'note_id': 1}], ['untracked_notes'])
+        assert cache.get_results("SELECT * FROM untracked_notes") is None
+        assert cache.stats()['result_uncacheable'] == 1
+
+
+class TestQueryServiceIntegration:
+    def test_repeat_question_skips_llm(self, db_path):
+        service = make_query_service(db_path)
+
+        first = service.query("What's outstanding on 24 BK-089?")
+        assert first['success'] and not first['cached_sql']
+        assert first['results'] == [{'project_code': '24 BK-089', 'outstanding': 60000.0}]
+        assert service.client.calls == ['gpt-4o', 'gpt-4o-mini']
+
+        second = service.query("what's outstanding on 24 bk-089")
+        assert second['cached_sql'] and second['results'] == first['results']
+        assert second['summary'] == first['summary']
+        assert len(service.client.calls) == 2  # no new LLM calls
+
+        # A payment lands: SQL is reused, results and summary are recomputed
+        execute(db_path, "UPDATE invoices SET payment_amount = 30000 WHERE invoice_id = 2")
+        third = service.query("What's outstanding on 24 BK-089?")
+        assert third['results'][0]['outstanding'] == 30000.0
+        assert service.client.calls == ['gpt-4o', 'gpt-4o-mini', 'gpt-4o-mini']
+
+        cache = service.get_stats()['cache']
+        assert cache['sql_hits'] == 2 and cache['result_hits'] == 1
+        assert cache['saved_llm_calls'] == 3
+        assert cache['saved_cost_usd'] == pytest.approx(2 * 0.011 + 0.00066)
+
+    def test_negative_feedback_drops_cached_sql(self, db_path):
+        service = make_query_service(db_path)
+        service.query("What's outstanding on 24 BK-089?")
+        service.record_query_feedback("What's outstanding on 24 BK-089?", OUTSTANDING_SQL, was_correct=False)
+
+        assert not service.query("What's outstanding on 24 BK-089?")['cached_sql']
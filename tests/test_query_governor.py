@@ -0,0 +1,141 @@
+"""
+Query governor tests - AI-generated SQL runs read-only, within its
+instruction budget and row cap, and bad plans are rejected before they run.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from services.connection_pool import QueryScope, use_scope
+from services.query_governor import QueryCancelled, QueryGovernor, QueryRejected
+
+MIGRATION = Path(__file__).parent.parent / "database" / "migrations" / "111_query_governor_log.sql"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "governor.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE emails (email_id INTEGER PRIMARY KEY, subject TEXT, sender_email TEXT);
+        CREATE TABLE email_proposal_links (email_id INTEGER, proposal_id INTEGER);
+        CREATE INDEX idx_epl_email ON email_proposal_links(email_id);
+        CREATE TABLE proposals (proposal_id INTEGER PRIMARY KEY, project_name TEXT);
+    """)
+    conn.executemany("INSERT INTO emails VALUES (?, ?, ?)",
+                     [(i, f"Subject {i}", f"user{i % 50}@client.com") for i in range(1, 3001)])
+    conn.executemany("INSERT INTO email_proposal_links VALUES (?, ?)",
+                     [(i, i % 20) for i in range(1, 3001)])
+    conn.executemany("INSERT INTO proposals VALUES (?, ?)", [(i, f"Project {i}") for i in range(20)])
+    conn.executescript(MIGRATION.read_text())
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+@pytest.fixture
+def governor(db_path):
+    return QueryGovernor(db_path, max_rows=100, large_table_rows=1000, max_full_scan_rows=100000)
+
+
+def log_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT outcome, reason FROM query_governor_log ORDER BY log_id").fetchall()
+    conn.close()
+    return rows
+
+
+class TestStatementCheck:
+    @pytest.mark.parametrize("sql", [
+        "DELETE FROM emails",
+        "SELECT 1; DROP TABLE emails",
+        "SELECT * FROM emails; SELECT 1",
+        "ATTACH DATABASE 'x.db' AS x",
+        "SELECT 1 -- harmless\n; UPDATE emails SET subject = ''",
+    ])
+    def test_rejects_non_select(self, governor, db_path, sql):
+        with pytest.raises(QueryRejected):
+            governor.execute(sql)
+        assert log_rows(db_path)[-1][0] == 'rejected'
+
+    def test_allows_updated_at_style_columns(self, governor):
+        assert governor.check_statement("SELECT updated_at FROM t;") == "SELECT updated_at FROM t"
+
+    def test_connection_is_read_only(self, governor):
+        conn = governor._connect()
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO proposals VALUES (99, 'x')")
+        conn.close()
+
+
+class TestLimits:
+    def test_limit_injected_and_rows_capped(self, governor, db_path):
+        result = governor.execute("SELECT * FROM emails ORDER BY email_id")
+        assert result['sql'].endswith("LIMIT 101")
+        assert result['row_count'] == 100 and result['truncated']
+        assert result['rows'][0] == {'email_id': 1, 'subject': 'Subject 1', 'sender_email': 'user1@client.com'}
+        [(outcome, reason)] = log_rows(db_path)
+        assert outcome == 'truncated' and reason.startswith('capped at 100 rows')
+
+    def test_existing_limit_kept(self, governor):
+        result = governor.execute("SELECT email_id FROM emails LIMIT 5 -- top five")
+        assert "LIMIT 101" not in result['sql']
+        assert result['row_count'] == 5 and not result['truncated']
+
+    def test_byte_cap(self, db_path):
+        governor = QueryGovernor(db_path, max_rows=1000, max_bytes=500)
+        result = governor.execute("SELECT subject FROM emails")
+        assert result['truncated'] and result['row_count'] < 60
+
+
+class TestPlanCheck:
+    def test_cross_join_rejected(self, governor, db_path):
+        with pytest.raises(QueryRejected, match="repeated for every row"):
+            governor.execute("""
+                SELECT COUNT(*) FROM emails e, email_proposal_links l
+                WHERE e.subject LIKE '%' || l.proposal_id || '%'
+            """)
+        outcome, reason = log_rows(db_path)[-1]
+        assert outcome == 'rejected' and 'email' in reason
+
+    def test_indexed_join_allowed(self, governor):
+        result = governor.execute("""
+            SELECT e.subject, l.proposal_id FROM email_proposal_links l
+            JOIN emails e ON e.email_id = l.email_id WHERE l.proposal_id = 3
+        """)
+        assert result['row_count'] == 100
+        assert result['tables'] == ['email_proposal_links', 'emails']
+
+    def test_single_scan_of_large_table_allowed(self, governor):
+        result = governor.execute("SELECT COUNT(*) AS n FROM emails WHERE subject LIKE '%9%'")
+        assert result['rows'][0]['n'] > 0
+
+    def test_huge_table_scan_rejected(self, db_path):
+        governor = QueryGovernor(db_path, large_table_rows=1000, max_full_scan_rows=2000)
+        with pytest.raises(QueryRejected, match="full scan of emails"):
+            governor.execute("SELECT COUNT(*) FROM emails WHERE subject LIKE '%9%'")
+
+
+class TestBudgets:
+    ENDLESS = "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) SELECT COUNT(*) FROM n"
+
+    def test_instruction_budget_cancels(self, db_path):
+        governor = QueryGovernor(db_path, vm_step_budget=200000)
+        with pytest.raises(QueryCancelled, match="instruction budget"):
+            governor.execute(self.ENDLESS)
+        assert log_rows(db_path)[-1][0] == 'cancelled'
+        assert governor.stats()['cancelled'] == 1
+
+    def test_time_budget_cancels(self, db_path):
+        governor = QueryGovernor(db_path, time_budget=0.2)
+        with pytest.raises(QueryCancelled, match="time budget"):
+            governor.execute(self.ENDLESS)
+
+    def test_cancelled_request_scope(self, governor):
+        scope = QueryScope()
+        scope.cancel()
+        with use_scope(scope), pytest.raises(QueryCancelled, match="request cancelled"):
+            governor.execute(self.ENDLESS)
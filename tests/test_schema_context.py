@@ -0,0 +1,139 @@
+"""
+Schema context tests - SQL prompts carry only the tables a question needs
+(with their join partners and row counts), stay within the token budget,
+and pick up schema changes without a restart.
+"""
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from services.schema_context import SchemaContextBuilder, estimate_tokens
+
+
+@pytest.fixture
+def db_path(migrated_db, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+
+    def seed(conn):
+        conn.executemany("INSERT INTO invoices VALUES (?, '24 BK-089', ?, 1000, 0, 'outstanding')",
+                         [(i, f"I-{i}") for i in range(1, 51)])
+        for n in range(30):  # the long tail of tables that used to go into every prompt
+            columns = ", ".join(f"field_{c} TEXT" for c in range(12))
+            conn.execute(f"CREATE TABLE misc_table_{n} (id INTEGER PRIMARY KEY, {columns})")
+
+    return migrated_db("""
+        CREATE TABLE projects (project_id INTEGER PRIMARY KEY, project_code TEXT, project_title TEXT,
+                               total_fee_usd REAL, status TEXT);
+        CREATE TABLE proposals (proposal_id INTEGER PRIMARY KEY, project_code TEXT, project_name TEXT,
+                                status TEXT);
+        CREATE TABLE invoices (invoice_id INTEGER PRIMARY KEY, project_code TEXT, invoice_number TEXT,
+                               invoice_amount REAL, payment_amount REAL, status TEXT);
+        CREATE TABLE project_fee_breakdown (breakdown_id INTEGER PRIMARY KEY, project_code TEXT,
+                                            phase TEXT, phase_fee_usd REAL);
+        CREATE TABLE emails (email_id INTEGER PRIMARY KEY, subject TEXT, sender_email TEXT, date TEXT);
+        CREATE TABLE email_proposal_links (email_id INTEGER REFERENCES emails(email_id),
+                                           proposal_id INTEGER REFERENCES proposals(proposal_id));
+        CREATE TABLE contacts (contact_id INTEGER PRIMARY KEY, name TEXT, email TEXT, company TEXT);
+        CREATE TABLE meetings (meeting_id INTEGER PRIMARY KEY, project_code TEXT, meeting_date TEXT);
+        CREATE TABLE rfis (rfi_id INTEGER PRIMARY KEY, project_code TEXT, question TEXT, status TEXT);
+        CREATE TABLE project_milestones (milestone_id INTEGER PRIMARY KEY, project_code TEXT, due_date TEXT);
+        CREATE TABLE email_project_links (email_id INTEGER, project_id INTEGER);
+        CREATE TABLE training_feedback (feedback_id INTEGER PRIMARY KEY, feedback_type TEXT,
+                                        corrected_value TEXT, incorporated INTEGER);
+        CREATE TABLE learned_patterns (pattern_id INTEGER PRIMARY KEY, pattern_type TEXT, is_active INTEGER);
+        CREATE TABLE emails_backup (email_id INTEGER, subject TEXT);
+        INSERT INTO projects VALUES (1, '24 BK-089', 'Marina Resort', 1000000, 'active');
+    """, ["111_query_governor_log.sql", "112_query_cache_data_versions.sql"], seed=seed)
+
+
+def execute(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+class TestCatalog:
+    def test_internal_and_backup_tables_excluded(self, db_path):
+        catalog = SchemaContextBuilder(db_path).catalog()
+        assert 'invoices' in catalog and 'misc_table_0' in catalog
+        for table in ('schema_migrations', 'query_governor_log', 'query_sql_cache',
+                      'data_versions', 'emails_backup'):
+            assert table not in catalog
+
+    def test_declared_and_inferred_joins(self, db_path):
+        catalog = SchemaContextBuilder(db_path).catalog()
+        assert catalog['email_proposal_links'].joins == {
+            'email_id': 'emails.email_id', 'proposal_id': 'proposals.proposal_id'}
+        assert catalog['invoices'].joins == {'project_code': 'projects.project_code'}
+        assert catalog['invoices'].rows == 50
+        assert catalog['invoices'].render().startswith(
+            "invoices (~50 rows): invoice_id INTEGER PK, project_code TEXT -> projects.project_code")
+
+    def test_rebuilt_after_schema_change(self, db_path):
+        builder = SchemaContextBuilder(db_path)
+        assert 'region' not in builder.build("invoices by region")['text']
+        execute(db_path, "ALTER TABLE invoices ADD COLUMN region TEXT")
+        assert 'region TEXT' in builder.build("invoices by region")['text']
+        assert builder.stats()['catalog_rebuilds'] == 2
+
+
+class TestSelection:
+    def test_financial_question_gets_financial_tables(self, db_path):
+        context = SchemaContextBuilder(db_path).build("What's outstanding on 24 BK-089?")
+        assert context['tables'][0] == 'invoices'
+        assert 'projects' in context['tables']
+        assert not any(table.startswith('misc_table') for table in context['tables'])
+        assert context['tokens'] < context['full_tokens'] / 5
+
+    def test_link_tables_pull_in_their_partners(self, db_path):
+        tables = SchemaContextBuilder(db_path).build("emails linked to the proposal")['tables']
+        assert {'emails', 'proposals', 'email_proposal_links'} <= set(tables)
+
+    def test_unmatched_question_falls_back_to_core_tables(self, db_path):
+        assert SchemaContextBuilder(db_path).build("hello there")['tables'] == \
+            ['invoices', 'projects', 'proposals']
+
+    def test_token_budget_respected(self, db_path):
+        builder = SchemaContextBuilder(db_path, token_budget=60)
+        context = builder.build("invoices, proposals, emails, contacts, meetings and rfis")
+        body = context['text'].split("\n\n", 1)[1]
+        assert estimate_tokens(body) <= 60 + len(context['tables'])
+        assert 0 < len(context['tables']) < 6
+
+    def test_full_catalog_without_question(self, db_path):
+        context = SchemaContextBuilder(db_path).build()
+        assert 'misc_table_29' in context['tables']
+        assert context['tokens'] == pytest.approx(context['full_tokens'], abs=30)
+
+
+class TestQueryServiceIntegration:
+    def test_prompt_carries_only_selected_tables(self, db_path):
+        from services.query_service import QueryService
+
+        prompts = []
+
+        def create(model, messages, **kwargs):
+            prompts.append(messages[-1]['content'])
+            content = ('{"sql": "SELECT SUM(invoice_amount) AS total FROM invoices", "confidence": 90}'
+                       if kwargs.get('response_format') else "50 invoices outstanding.")
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=SimpleNamespace(prompt_tokens=4000, completion_tokens=100),
+            )
+
+        service = QueryService(db_path)
+        service.ai_enabled = True
+        service.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+        result = service.query("What's outstanding on 24 BK-089?")
+        assert result['success']
+        assert 'invoices (~50 rows)' in prompts[0] and 'misc_table' not in prompts[0]
+        assert result['prompt']['prompt_tokens'] == 4000
+        assert result['prompt']['schema_tables'][0] == 'invoices'
+
+        assert service.query("What's outstanding on 24 BK-089?")['prompt'] is None  # cached SQL
+        stats = service.get_query_stats()['schema_context']
+        assert stats['builds'] == 1 and stats['token_reduction_pct'] > 80
@@ -0,0 +1,108 @@
+"""
+Full-text search tests - FTS5 indexes from migrations 105 and 122 and SearchService.
+Run against a temporary database built in the test.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from database.migrate import MigrationRunner
+from services.search_service import SearchService, build_match_query
+from services.email_service import EmailService
+
+MIGRATIONS = Path(__file__).parent.parent / "database" / "migrations"
+
+
+@pytest.fixture
+def search_db(tmp_path):
+    db_path = tmp_path / "search.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT);
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, message_id TEXT, subject TEXT, sender_email TEXT,
+            snippet TEXT, body_full TEXT, date TEXT, inbox_source TEXT, inbox_category TEXT
+        );
+        CREATE TABLE email_content (email_id INTEGER, category TEXT, subcategory TEXT,
+            importance_score REAL, ai_summary TEXT);
+        CREATE TABLE email_proposal_links (email_id INTEGER, proposal_id INTEGER, created_at TEXT);
+        CREATE TABLE documents (document_id INTEGER PRIMARY KEY, file_name TEXT, file_path TEXT,
+            project_code TEXT, document_type TEXT, text_content TEXT, modified_date TEXT);
+        CREATE TABLE contacts (contact_id INTEGER PRIMARY KEY, name TEXT, email TEXT,
+            company TEXT, role TEXT);
+        CREATE TABLE projects (project_id INTEGER PRIMARY KEY, project_code TEXT,
+            project_title TEXT, client_name TEXT, status TEXT, is_active_project INTEGER);
+        CREATE TABLE proposals (proposal_id INTEGER PRIMARY KEY, project_code TEXT,
+            project_name TEXT, client_company TEXT, status TEXT, is_active_project INTEGER);
+
+        INSERT INTO emails (email_id, subject, sender_email, snippet, body_full, date) VALUES
+            (1, 'Fee proposal for Marina Resort', 'John Doe <john@marina.com>', 'Please find',
+             'Attached is the revised fee proposal.', '2025-01-01'),
+            (2, 'Lunch', 'jane@example.com', 'Are you free', 'Lunch on Friday?', '2025-01-02');
+    """)
+    for migration in ("105_full_text_search.sql", "122_projects_fts_client_name.sql"):
+        for statement in MigrationRunner._split_statements((MIGRATIONS / migration).read_text()):
+            conn.execute(statement)
+    conn.commit()
+    conn.close()
+    SearchService.reset_availability_cache()
+    yield str(db_path)
+    SearchService.reset_availability_cache()
+
+
+class TestMatchQuery:
+    def test_words_become_prefixed_phrases(self):
+        assert build_match_query("fee proposal") == '"fee" "proposal"*'
+
+    def test_punctuation_is_neutralised(self):
+        assert build_match_query('john@marina.com') == '"john marina com"*'
+        assert build_match_query('" OR NEAR(') == '"OR" "NEAR"*'
+
+    def test_empty_query(self):
+        assert build_match_query("  -- ") is None
+
+
+class TestSearchService:
+    def test_ranked_email_search_with_snippet(self, search_db):
+        results = SearchService(search_db).search_source('emails', 'fee propos')
+
+        assert [r['email_id'] for r in results] == [1]
+        assert '<mark>' in results[0]['search_highlight']
+        assert results[0]['search_snippet']
+
+    def test_triggers_keep_index_in_sync(self, search_db):
+        service = SearchService(search_db)
+        service.execute_update(
+            "INSERT INTO contacts (contact_id, name, email, company) VALUES (1, 'Ploy Sritong', 'ploy@x.com', 'Siam Hotels')"
+        )
+        assert service.search_source('contacts', 'siam')[0]['contact_id'] == 1
+
+        service.execute_update("UPDATE contacts SET company = 'Andaman Group' WHERE contact_id = 1")
+        assert service.search_source('contacts', 'siam') == []
+        assert len(service.search_source('contacts', 'andaman')) == 1
+
+        service.execute_update("DELETE FROM contacts WHERE contact_id = 1")
+        assert service.search_source('contacts', 'andaman') == []
+
+    def test_projects_match_on_client_name(self, search_db):
+        service = SearchService(search_db)
+        service.execute_update(
+            "INSERT INTO projects (project_id, project_code, project_title, client_name) "
+            "VALUES (1, '25 BK-089', 'Ubud Villas', 'Siam Hotels')"
+        )
+        results = service.search_source('projects', 'siam')
+        assert [(r['project_id'], r['client_name']) for r in results] == [(1, 'Siam Hotels')]
+
+        service.execute_update("UPDATE projects SET client_name = 'Andaman Group' WHERE project_id = 1")
+        assert service.search_source('projects', 'siam') == []
+        assert len(service.search_source('projects', 'andaman')) == 1
+
+    def test_get_all_emails_uses_index(self, search_db):
+        result = EmailService(search_db).get_all_emails(search_query='marina.com')
+        assert [e['email_id'] for e in result['items']] == [1]
+
+    def test_rebuild(self, search_db):
+        counts = SearchService(search_db).rebuild(['emails'])
+        assert counts == {'emails': 2}
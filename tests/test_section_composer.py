@@ -0,0 +1,170 @@
+"""
+Section composer tests - independent sections run concurrently on pooled
+readers, dependent ones get their inputs, a failed or timed-out section
+degrades to its default instead of failing the page, and cached sections
+are reused until their TTL or data_versions stamp says otherwise.
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+from services.proposal_detail_story_service import ProposalDetailStoryService
+from services.section_composer import Section, SectionComposer, SectionFailed
+
+
+@pytest.fixture
+def db_path(migrated_db):
+    return migrated_db("""
+        CREATE TABLE proposals (
+            proposal_id INTEGER PRIMARY KEY, project_code TEXT, project_name TEXT, status TEXT,
+            current_status TEXT, client_company TEXT, contact_person TEXT, contact_email TEXT,
+            project_value REAL, currency TEXT, remarks TEXT, correspondence_summary TEXT,
+            status_notes TEXT, notes TEXT, waiting_for TEXT, ball_in_court TEXT, next_action TEXT,
+            next_action_date TEXT, last_contact_date TEXT, first_contact_date TEXT,
+            proposal_sent_date TEXT, win_probability REAL, created_at TEXT
+        );
+        CREATE TABLE meetings (
+            meeting_id INTEGER PRIMARY KEY, title TEXT, description TEXT, meeting_date TEXT,
+            start_time TEXT, location TEXT, status TEXT, transcript_id INTEGER, proposal_id INTEGER,
+            project_code TEXT
+        );
+        CREATE TABLE meeting_transcripts (id INTEGER PRIMARY KEY, summary TEXT, key_points TEXT,
+                                          action_items TEXT);
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, subject TEXT, sender_email TEXT, sender_name TEXT,
+            date TEXT, snippet TEXT, direction TEXT
+        );
+        CREATE TABLE email_content (
+            email_id INTEGER PRIMARY KEY, category TEXT, subcategory TEXT, ai_summary TEXT,
+            key_points TEXT, action_required INTEGER, urgency_level TEXT, sentiment TEXT
+        );
+        CREATE TABLE email_proposal_links (email_id INTEGER, proposal_id INTEGER);
+        CREATE TABLE email_attachments (
+            attachment_id INTEGER PRIMARY KEY, email_id INTEGER, proposal_id INTEGER, filename TEXT,
+            filepath TEXT, mime_type TEXT, document_type TEXT
+        );
+        CREATE TABLE proposal_status_history (
+            id INTEGER PRIMARY KEY, proposal_id INTEGER, project_code TEXT, status TEXT, status_date TEXT
+        );
+        CREATE TABLE ai_suggestions (suggestion_id INTEGER PRIMARY KEY, status TEXT, confidence_score REAL);
+        CREATE TABLE tasks (
+            task_id INTEGER PRIMARY KEY, title TEXT, status TEXT, due_date TEXT, assignee TEXT,
+            priority TEXT
+        );
+        CREATE TABLE commitments (
+            commitment_id INTEGER PRIMARY KEY, commitment_type TEXT, fulfillment_status TEXT,
+            due_date TEXT
+        );
+
+        INSERT INTO proposals (proposal_id, project_code, project_name, status, ball_in_court,
+                               next_action_date, last_contact_date)
+        VALUES (1, '25 BK-001', 'Ubud Villas', 'proposal_sent', 'us', '2026-01-10', '2026-01-01');
+        INSERT INTO emails (email_id, subject, sender_email, date, direction)
+        VALUES (1, 'Fee proposal', 'client@villas.com', '2026-01-02 09:00:00', 'inbound'),
+               (2, 'RE: Fee proposal', 'bill@bensley.com', '2026-01-03 09:00:00', 'outbound');
+        INSERT INTO email_proposal_links VALUES (1, 1), (2, 1);
+        INSERT INTO proposal_status_history (proposal_id, project_code, status, status_date)
+        VALUES (1, '25 BK-001', 'proposal_sent', '2026-01-02');
+        INSERT INTO tasks (title, status, due_date, assignee, priority)
+        VALUES ('Send fee', 'pending', '2026-01-15', NULL, 'high'),
+               ('Old task', 'pending', '2026-01-01', 'bill', 'low');
+    """, ["112_query_cache_data_versions.sql", "119_keyset_pagination.sql", "120_http_etag_data_versions.sql"])
+
+
+def write(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    conn.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+async def test_independent_sections_run_concurrently(db_path):
+    def slow(name):
+        def fetch(conn, inputs):
+            time.sleep(0.3)
+            return conn.execute("SELECT ?", (name,)).fetchone()[0]
+        return fetch
+
+    composer = SectionComposer(db_path, [Section(name, slow(name)) for name in ("a", "b", "c")])
+    started = time.perf_counter()
+    results, meta = await composer.compose({})
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    assert time.perf_counter() - started < 0.75
+    assert all(s["status"] == "ok" and s["ms"] >= 250 for s in meta["sections"].values())
+
+
+async def test_dependencies_feed_inputs_and_failures_degrade(db_path):
+    def boom(conn, inputs):
+        raise sqlite3.OperationalError("no such table: nope")
+
+    composer = SectionComposer(db_path, [
+        Section("proposal", lambda conn, i: dict(conn.execute(
+            "SELECT proposal_id FROM proposals WHERE project_code = ?", (i["code"],)).fetchone())),
+        Section("emails", lambda conn, i: conn.execute(
+            "SELECT COUNT(*) FROM email_proposal_links WHERE proposal_id = ?",
+            (i["proposal"]["proposal_id"],)).fetchone()[0], depends_on=("proposal",)),
+        Section("broken", boom, default=[]),
+        Section("after_broken", lambda conn, i: "never", depends_on=("broken",), default="n/a"),
+        Section("slow", lambda conn, i: time.sleep(0.5), timeout=0.1, default={}),
+    ])
+    results, meta = await composer.compose({"code": "25 BK-001"})
+    assert results == {"proposal": {"proposal_id": 1}, "emails": 2, "broken": [],
+                       "after_broken": "n/a", "slow": {}}
+    assert meta["degraded"] == ["broken", "after_broken", "slow"]
+    assert meta["sections"]["broken"]["status"] == "error"
+    assert meta["sections"]["after_broken"] == {"status": "skipped", "ms": 0.0, "missing": "broken"}
+    assert meta["sections"]["slow"]["status"] == "timeout"
+
+
+async def test_required_section_fails_the_page(db_path):
+    composer = SectionComposer(db_path, [
+        Section("proposal", lambda conn, i: conn.execute("SELECT * FROM nope").fetchall(), required=True),
+        Section("other", lambda conn, i: 1),
+    ])
+    with pytest.raises(SectionFailed):
+        await composer.compose({})
+
+
+def test_bad_dependencies_are_rejected(db_path):
+    with pytest.raises(ValueError):
+        SectionComposer(db_path, [Section("a", None, depends_on=("missing",))])
+    with pytest.raises(ValueError):
+        SectionComposer(db_path, [Section("a", None, depends_on=("b",)), Section("b", None, depends_on=("a",))])
+
+
+async def test_ttl_cache_follows_data_versions(db_path):
+    calls = []
+
+    def tasks(conn, inputs):
+        calls.append(inputs["today"])
+        return conn.execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending' AND due_date = ?",
+                            (inputs["today"],)).fetchone()[0]
+
+    composer = SectionComposer(db_path, [Section("tasks", tasks, ttl=60, tables=("tasks",))])
+    inputs = {"today": "2026-01-15"}
+    first, _ = await composer.compose(inputs)
+    second, meta = await composer.compose(inputs)
+    assert second == first and meta["sections"]["tasks"]["status"] == "cached" and len(calls) == 1
+
+    # Other inputs are another cache entry
+    await composer.compose({**inputs, "today": "2026-01-16"})
+    assert len(calls) == 2
+
+    write(db_path, "UPDATE tasks SET status = 'completed' WHERE title = 'Send fee'")
+    third, meta = await composer.compose(inputs)
+    assert meta["sections"]["tasks"]["status"] == "ok" and third["tasks"] == 0
+
+
+async def test_proposal_story_sections(db_path):
+    story = await ProposalDetailStoryService(db_path).get_story("25 BK-001")
+    assert story["project_name"] == "Ubud Villas" and len(story["threads"]) == 1
+    # proposal_documents and proposal_events do not exist; those sections
+    # check for them and still succeed
+    assert story["meta"]["degraded"] == []
+    assert set(story["meta"]["sections"]) == {"proposal", "emails", "proposal_attachments",
+                                             "formal_documents", "events", "status_history"}
+
+    with pytest.raises(ValueError):
+        await ProposalDetailStoryService(db_path).get_story("99 XX-999")
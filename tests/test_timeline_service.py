@@ -0,0 +1,186 @@
+"""
+Timeline service tests - the unified project timeline is a k-way merge of
+per-source keyset queries: paging with next_cursor returns every item once
+in (date, type, id) order, filters apply in SQL, and each source reads at
+most a page from a date-ordered index (migration 118).
+"""
+
+import sqlite3
+
+import pytest
+
+from services.timeline_service import TimelineService
+
+
+@pytest.fixture
+def db_path(migrated_db):
+    path = migrated_db("""
+        CREATE TABLE projects (project_id INTEGER PRIMARY KEY, project_code TEXT);
+        CREATE TABLE emails (
+            email_id INTEGER PRIMARY KEY, date TEXT, subject TEXT, snippet TEXT, body_full TEXT,
+            sender_email TEXT, sender_name TEXT, recipient_emails TEXT, folder TEXT
+        );
+        CREATE TABLE email_content (email_id INTEGER PRIMARY KEY, category TEXT);
+        CREATE TABLE email_project_links (
+            email_id INTEGER, project_id INTEGER, confidence REAL, link_method TEXT,
+            PRIMARY KEY (email_id, project_id)
+        );
+        CREATE TABLE meeting_transcripts (
+            id INTEGER PRIMARY KEY, project_id INTEGER, detected_project_code TEXT, meeting_date TEXT,
+            recorded_date TEXT, created_at TEXT, meeting_title TEXT, audio_filename TEXT, summary TEXT,
+            participants TEXT, duration_seconds INTEGER
+        );
+        CREATE TABLE invoices (
+            invoice_id INTEGER PRIMARY KEY, project_id INTEGER, invoice_number TEXT, invoice_date TEXT,
+            invoice_amount REAL, payment_amount REAL, status TEXT
+        );
+        CREATE TABLE rfis (
+            rfi_id INTEGER PRIMARY KEY, project_id INTEGER, rfi_number TEXT, subject TEXT,
+            description TEXT, status TEXT, priority TEXT, sender_email TEXT, sender_name TEXT,
+            created_at TEXT
+        );
+        INSERT INTO projects VALUES (1, '25 BK-033'), (2, '25 BK-099');
+    """, ["117_email_participants.sql", "118_timeline_keyset_indexes.sql"])
+    conn = sqlite3.connect(path)
+
+    # 40 emails over 20 days (two per day, so dates tie), half from the client
+    for n in range(1, 41):
+        day = f"2025-03-{(n + 1) // 2:02d}"
+        sender = "Jo <jo@marina.com>" if n % 2 else "Bill <bill@bensley.com>"
+        folder = "Sent" if n % 2 == 0 else "INBOX"
+        conn.execute("INSERT INTO emails (email_id, date, subject, snippet, body_full, sender_email, "
+                     "sender_name, recipient_emails, folder) VALUES (?, ?, ?, ?, NULL, ?, ?, ?, ?)",
+                     (n, f"{day} 09:00:00", f"Email {n}", "...", sender, sender.split()[0],
+                      "team@bensley.com", folder))
+        conn.execute("INSERT INTO email_project_links (email_id, project_id, confidence, link_method) "
+                     "VALUES (?, ?, 0.9, 'pattern')", (n, 1 if n != 40 else 2))
+    conn.execute("UPDATE emails SET date = '2025-03-05T09:00:00' WHERE email_id = 9")  # ISO 'T' format
+    for n in range(1, 6):
+        conn.execute("INSERT INTO meeting_transcripts (id, project_id, meeting_date, meeting_title, participants) "
+                     "VALUES (?, 1, ?, ?, ?)", (n, f"2025-03-{n * 3:02d} 09:00:00", f"Meeting {n}",
+                                                  "Jo Smith, Bill" if n % 2 else "Bill"))
+        conn.execute("INSERT INTO invoices VALUES (?, 1, ?, ?, 1000, 0, 'Unpaid')",
+                     (n, f"I-{n}", f"2025-03-{n * 4:02d} 09:00:00"))
+        conn.execute("INSERT INTO rfis (rfi_id, project_id, rfi_number, subject, sender_name, created_at) "
+                     "VALUES (?, 1, ?, 'Detail', 'Jo', ?)", (n, f"RFI-{n}", f"2025-03-{n * 2:02d} 09:00:00"))
+    conn.commit()
+
+    from services.email_participants import backfill_email_participants
+    backfill_email_participants(conn)
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def timeline(db_path):
+    return TimelineService(db_path)
+
+
+def all_pages(timeline, **kwargs):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = timeline.get_project_timeline("25 BK-033", cursor=cursor, **kwargs)
+        items.extend(page["timeline"])
+        pages += 1
+        if not page["has_more"]:
+            return items, pages
+        cursor = page["next_cursor"]
+
+
+def keys(items):
+    return [(i["date"], i["type"], i["id"]) for i in items]
+
+
+def test_pages_cover_every_item_once_in_order(timeline):
+    everything, pages = all_pages(timeline, limit=7)
+    assert len(everything) == 39 + 5 + 5 + 5 and pages == 8
+    assert keys(everything) == sorted(keys(everything), reverse=True)
+    assert len(set(keys(everything))) == len(everything)
+
+    one_page = timeline.get_project_timeline("25 BK-033", limit=500)
+    assert keys(one_page["timeline"]) == keys(everything) and one_page["next_cursor"] is None
+
+
+def test_page_shape(timeline):
+    page = timeline.get_project_timeline("25 BK-033", limit=10)
+    assert page["total"] == 10 and page["has_more"]
+    assert sum(page["item_counts"].values()) == 10
+    emails = [i for i in page["timeline"] if i["type"] == "email"]
+    assert {e["direction"] for e in emails} == {"sent", "received"}
+    assert {e["email_category"] for e in emails} <= {"internal", "external"}
+    assert "Bill" in page["unique_people"]
+
+
+def test_filters_are_applied_per_source(timeline):
+    march_5_to_8, _ = all_pages(timeline, limit=4, date_from="2025-03-05", date_to="2025-03-08")
+    assert all("2025-03-05" <= i["date"][:10] <= "2025-03-08" for i in march_5_to_8)
+    assert 9 in [i["id"] for i in march_5_to_8 if i["type"] == "email"]  # ISO date on the last day
+    assert {i["type"] for i in march_5_to_8} == {"email", "transcript", "invoice", "rfi"}
+
+    by_address, _ = all_pages(timeline, limit=5, person="JO@marina.com", item_types=["email"])
+    assert len(by_address) == 20 and all(i["id"] % 2 for i in by_address)
+
+    by_name, _ = all_pages(timeline, limit=50, person="Jo Smith")
+    assert {i["type"] for i in by_name} == {"transcript", "invoice"}  # invoices have no people
+    assert [i["id"] for i in by_name if i["type"] == "transcript"] == [5, 3, 1]
+
+
+@pytest.mark.parametrize("source, index, position, expected", [
+    ("email", "idx_epl_project_email_date", ("2025-03-10 09:00:00", "email", 19), [18, 17, 16, 15, 14, 13]),
+    ("invoice", "idx_invoices_project_date", ("2025-03-20 09:00:00", "email", 1), [4, 3, 2, 1]),
+    ("rfi", "idx_rfis_project_created", ("2025-03-08 09:00:00", "rfi", 4), [3, 2, 1]),
+])
+def test_each_source_reads_one_page_from_an_index(timeline, db_path, source, index, position, expected):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    statements = []
+    conn.set_trace_callback(statements.append)
+    params = {"project_id": 1, "project_code": "25 BK-033", "date_from": None, "date_to": None, "limit": 6}
+
+    rows = list(timeline._source_rows(conn, source, params, None, position))
+    assert [r["id"] for r in rows] == expected
+
+    conn.set_trace_callback(None)
+    plan = " | ".join(r[-1] for r in conn.execute(f"EXPLAIN QUERY PLAN {statements[0]}"))
+    conn.close()
+    assert index in plan and "TEMP B-TREE" not in plan
+
+
+def test_undated_items_come_last_on_later_pages(timeline, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE email_project_links SET email_date = NULL WHERE email_id IN (3, 4)")
+    conn.execute("UPDATE email_project_links SET email_date = '' WHERE email_id = 5")
+    conn.execute("UPDATE invoices SET invoice_date = NULL WHERE invoice_id = 2")
+    conn.execute("UPDATE rfis SET created_at = NULL WHERE rfi_id IN (1, 3)")
+    conn.commit()
+    conn.close()
+
+    everything, pages = all_pages(timeline, limit=7)
+    assert len(everything) == 39 + 5 + 5 + 5 and pages == 8
+    assert len(set(keys(everything))) == len(everything)
+    assert keys(everything) == sorted(keys(everything), reverse=True)
+    assert keys(everything)[-6:] == [("", "rfi", 3), ("", "rfi", 1), ("", "invoice", 2),
+                                     ("", "email", 5), ("", "email", 4), ("", "email", 3)]
+
+    dated, _ = all_pages(timeline, limit=7, date_from="2025-03-01")
+    assert all(i["date"] for i in dated) and len(dated) == len(everything) - 6
+
+
+def test_email_date_follows_emails(timeline, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE emails SET date = '2025-04-01 08:00:00' WHERE email_id = 1")
+    conn.execute("INSERT INTO emails (email_id, date, subject) VALUES (41, '2025-04-02 08:00:00', 'New')")
+    conn.execute("INSERT INTO email_project_links (email_id, project_id) VALUES (41, 1)")
+    conn.commit()
+    conn.close()
+
+    first = timeline.get_project_timeline("25 BK-033", limit=2)["timeline"]
+    assert [(i["type"], i["id"]) for i in first] == [("email", 41), ("email", 1)]
+
+
+def test_missing_project_and_bad_input(timeline):
+    assert timeline.get_project_timeline("NONEXISTENT-999") is None
+    with pytest.raises(ValueError):
+        timeline.get_project_timeline("25 BK-033", cursor="not-a-cursor")
+    with pytest.raises(ValueError):
+        timeline.get_project_timeline("25 BK-033", date_to="March")
@@ -0,0 +1,122 @@
+"""
+Usage counter tests - pattern uses are applied in one batched transaction
+on a size or time threshold and at close, and uses recorded by a process
+that crashed before flushing are replayed from its spill segment.
+"""
+
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from services.usage_counters import UsageCounters
+
+BACKEND = Path(__file__).parent.parent / "backend"
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "usage.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE category_patterns (
+            pattern_id INTEGER PRIMARY KEY, times_matched INTEGER DEFAULT 0, last_matched_at TEXT
+        );
+        CREATE TABLE email_learned_patterns (
+            pattern_id INTEGER PRIMARY KEY, times_used INTEGER DEFAULT 0, last_used_at TEXT, updated_at TEXT
+        );
+        INSERT INTO category_patterns (pattern_id) VALUES (1), (2);
+        INSERT INTO email_learned_patterns (pattern_id, last_used_at) VALUES (10, '2099-01-01 00:00:00'), (11, NULL);
+    """)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def counts(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT 'c' || pattern_id, times_matched, last_matched_at FROM category_patterns
+        UNION ALL
+        SELECT 'e' || pattern_id, times_used, last_used_at FROM email_learned_patterns
+    """).fetchall()
+    conn.close()
+    return {key: (count, used) for key, count, used in rows}
+
+
+def test_uses_are_batched_until_flush(db_path):
+    counters = UsageCounters(db_path, flush_events=1000, flush_seconds=60)
+    for _ in range(300):
+        counters.record('category_patterns', 1)
+        counters.record('email_learned_patterns', 11)
+    counters.record('email_learned_patterns', 10)
+    assert counts(db_path)['c1'][0] == 0
+
+    assert counters.flush() == 3
+    after = counts(db_path)
+    assert after['c1'][0] == 300 and after['e11'][0] == 300 and after['c2'] == (0, None)
+    assert after['c1'][1] is not None
+    # The latest use wins; an older pending timestamp never moves it back
+    assert after['e10'] == (1, '2099-01-01 00:00:00')
+    assert counters.stats()['flushes'] == 1 and counters.stats()['pending_events'] == 0
+    counters.close()
+
+    with pytest.raises(KeyError):
+        counters.record('projects', 1)
+
+
+def test_size_and_time_thresholds_flush_in_background(db_path):
+    counters = UsageCounters(db_path, flush_events=50, flush_seconds=60)
+    for _ in range(50):
+        counters.record('category_patterns', 2)
+    deadline = time.monotonic() + 5
+    while counts(db_path)['c2'][0] != 50 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert counts(db_path)['c2'][0] == 50
+    counters.close()
+
+    counters = UsageCounters(db_path, flush_events=1000, flush_seconds=0.1)
+    counters.record('category_patterns', 2)
+    deadline = time.monotonic() + 5
+    while counts(db_path)['c2'][0] != 51 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert counts(db_path)['c2'][0] == 51
+    counters.close()
+
+
+def test_close_flushes_and_removes_its_spill(db_path, tmp_path):
+    spill_dir = tmp_path / "spill"
+    counters = UsageCounters(db_path, spill_dir=str(spill_dir), flush_events=1000, flush_seconds=60)
+    counters.record('email_learned_patterns', 11, count=3)
+    counters.close()
+    assert counts(db_path)['e11'][0] == 3
+    assert list(spill_dir.iterdir()) == []
+
+
+def test_crashed_process_is_replayed_from_its_spill(db_path, tmp_path):
+    spill_dir = tmp_path / "spill"
+    script = (
+        "import os\n"
+        "from services.usage_counters import UsageCounters\n"
+        f"c = UsageCounters({db_path!r}, spill_dir={str(spill_dir)!r}, flush_events=1000, flush_seconds=60)\n"
+        "for _ in range(7): c.record('category_patterns', 1)\n"
+        "c.record('email_learned_patterns', 11)\n"
+        "os._exit(1)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=BACKEND, check=False)
+    assert counts(db_path)['c1'][0] == 0
+    assert len(list(spill_dir.glob("*.spill"))) == 1
+
+    # A torn last line from the crash is skipped
+    with open(next(spill_dir.glob("*.spill")), "a") as f:
+        f.write("category_patterns\t1\t")
+
+    counters = UsageCounters(db_path, spill_dir=str(spill_dir), flush_events=1000, flush_seconds=60)
+    assert counters.stats()['recovered_events'] == 8
+    assert counts(db_path)['c1'][0] == 7 and counts(db_path)['e11'][0] == 1
+    # Only this process's own (empty) segment is left
+    assert [p.name for p in spill_dir.iterdir()] == [counters._segment_path('spill').name]
+    counters.close()